@@ -42,9 +42,10 @@ class RadarController:
                 wallet_data, time_series_data
             )
             
-            # Verbindungen berechnen
+            # Verbindungen berechnen (Graph pro Contract/Zeitfenster gecacht, nur neue Transaktionen werden ergänzt)
             wallet_connections = self.position_calculator.calculate_wallet_connections(
-                wallet_data, transaction_data
+                wallet_data, transaction_data,
+                contract_address=contract_address, chain=chain, time_period_hours=time_period_hours
             )
             
             # Risikoklassifizierung
@@ -4,11 +4,12 @@ Custom Analysis Routes - API Endpoint für Token-Analyse
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, validator, Field
-from typing import Optional, Literal
+from typing import AsyncIterator, Optional, Literal
 from datetime import datetime
 import re
+import asyncio
 import logging
 import json
 
@@ -239,6 +240,63 @@ async def analyze_custom_token(request: CustomAnalysisRequest):
         )
 
 
+async def stream_analysis_events(analyzer, request: CustomAnalysisRequest) -> AsyncIterator[str]:
+    """
+    NDJSON-Events einer Analyse: ein 'wallet'-Event pro klassifiziertem Holder
+    (in Abschlussreihenfolge), danach 'result' bzw. 'error'
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_wallet_classified(wallet_address, classification):
+        queue.put_nowait({
+            "type": "wallet",
+            "wallet_address": wallet_address,
+            "wallet_type": classification.get('wallet_type'),
+            "confidence_score": classification.get('confidence_score'),
+            "risk_score": classification.get('risk_score'),
+            "risk_flags": classification.get('risk_flags', []),
+            "classified": classification.get('classified', False)
+        })
+
+    analysis = asyncio.create_task(analyzer.analyze_custom_token(
+        token_address=request.token_address,
+        chain=request.chain,
+        wallet_source=request.wallet_source,
+        recent_hours=request.recent_hours if request.wallet_source == 'recent_traders' else None,
+        on_wallet_classified=on_wallet_classified
+    ))
+    analysis.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while (event := await queue.get()) is not None:
+            yield json.dumps(sanitize_value(event), cls=SafeJSONEncoder) + "\n"
+
+        try:
+            event = {"type": "result", "analysis_result": analysis.result()}
+        except Exception as e:
+            logger.error(f"Fehler in stream_analysis_events: {e}", exc_info=True)
+            event = {"type": "error", "error_message": str(e)}
+        yield json.dumps(sanitize_value(event), cls=SafeJSONEncoder) + "\n"
+    finally:
+        analysis.cancel()
+
+
+@router.post("/custom/stream")
+async def analyze_custom_token_stream(request: CustomAnalysisRequest):
+    """
+    Wie /custom, liefert aber NDJSON: jede Wallet-Klassifizierung sobald sie
+    fertig ist, zuletzt das vollständige Ergebnis (Event-Typ 'result').
+    """
+    from app.core.backend_crypto_tracker.scanner.token_analyzer import TokenAnalyzer
+
+    async def events():
+        async with TokenAnalyzer() as analyzer:
+            async for line in stream_analysis_events(analyzer, request):
+                yield line
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.get("/health")
 async def health_check():
     """Health Check Endpoint"""
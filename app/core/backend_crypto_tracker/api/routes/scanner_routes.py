@@ -23,7 +23,14 @@ class ScanStatusResponse(BaseModel):
     tokens_found: int
     tokens_analyzed: int
     high_risk_tokens: int
-    duration_seconds: Optional[int] = None
+    duration_seconds: Optional[float] = None
+    # Live-Durchsatz aktiver Scans (ScanProgress)
+    tokens_total: Optional[int] = None
+    tokens_done: Optional[int] = None
+    tokens_failed: Optional[int] = None
+    tokens_remaining: Optional[int] = None
+    tokens_per_minute: Optional[float] = None
+    eta_seconds: Optional[int] = None
 
 class ScannerStatusResponse(BaseModel):
     scheduler: Dict[str, Any]
@@ -57,10 +64,14 @@ class ScanStatisticsResponse(BaseModel):
     last_updated: str
 
 # Dependency Injection
+_scanner_controller: Optional[ScannerController] = None
+
 def get_scanner_controller() -> ScannerController:
-    """Gibt eine ScannerController-Instanz zurück"""
-    scheduler_manager = SchedulerManager()
-    return ScannerController(scheduler_manager)
+    """Gibt die gemeinsame ScannerController-Instanz zurück (Scan-Status überlebt einzelne Requests)"""
+    global _scanner_controller
+    if _scanner_controller is None:
+        _scanner_controller = ScannerController(SchedulerManager())
+    return _scanner_controller
 
 @router.get("/status", response_model=ScannerStatusResponse)
 async def get_scanner_status(controller: ScannerController = Depends(get_scanner_controller)):
@@ -72,3 +83,63 @@ async def get_scanner_status(controller: ScannerController = Depends(get_scanner
     except Exception as e:
         logger.error(f"Error getting scanner status: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/scans/discovery")
+async def start_discovery_scan(
+    request: ScanStartRequest,
+    controller: ScannerController = Depends(get_scanner_controller)
+):
+    """Startet einen Discovery-Scan im Hintergrund"""
+    try:
+        return await controller.start_discovery_scan(
+            request.chains, request.max_market_cap, request.max_tokens, request.priority
+        )
+    except ScannerException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/scans/analysis")
+async def start_analysis_scan(
+    request: AnalysisStartRequest,
+    controller: ScannerController = Depends(get_scanner_controller)
+):
+    """Startet einen Analyse-Scan für die angegebenen Tokens im Hintergrund"""
+    try:
+        return await controller.start_analysis_scan(
+            request.token_addresses, request.chain, request.include_advanced_metrics
+        )
+    except ScannerException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scans/{scan_id}", response_model=ScanStatusResponse)
+async def get_scan_status(
+    scan_id: str = Path(..., description="Scan-ID"),
+    controller: ScannerController = Depends(get_scanner_controller)
+):
+    """Gibt den Status eines Scans zurück (aktive Scans inkl. tokens/min und ETA)"""
+    try:
+        return await controller.get_scan_status(scan_id)
+    except ScannerException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/scans/{scan_id}/stop")
+async def stop_scan(
+    scan_id: str = Path(..., description="Scan-ID"),
+    controller: ScannerController = Depends(get_scanner_controller)
+):
+    """Stoppt einen aktiven Scan (der Checkpoint bleibt erhalten)"""
+    try:
+        return await controller.stop_scan(scan_id)
+    except ScannerException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/scans/{scan_id}/resume")
+async def resume_scan(
+    scan_id: str = Path(..., description="Scan-ID"),
+    controller: ScannerController = Depends(get_scanner_controller)
+):
+    """Setzt einen gestoppten oder fehlgeschlagenen Scan am letzten Checkpoint fort"""
+    try:
+        return await controller.resume_scan(scan_id)
+    except ScannerException as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional
 import aiohttp
 import os
 import asyncio
+from app.core.backend_crypto_tracker.blockchain.utils.http_session import shared_session
 from app.core.backend_crypto_tracker.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -63,7 +64,7 @@ async def get_transactions_moralis(
         
         logger.info(f"🚀 Moralis ({key_label}): Fetching transactions for {wallet_address[:10]}...")
         
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=15)) as response:
                 if response.status == 502 or response.status == 503:
                     logger.warning(f"⚠️ Moralis ({key_label}) server error {response.status} - service unavailable")
@@ -196,7 +197,7 @@ async def get_transactions_etherscan(
             'apikey': api_key
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.get(base_url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status != 200:
                     logger.error(f"❌ Etherscan HTTP Error {response.status}")
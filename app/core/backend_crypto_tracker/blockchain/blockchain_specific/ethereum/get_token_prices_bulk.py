@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional
 import aiohttp
 import os
 import asyncio
+from app.core.backend_crypto_tracker.blockchain.utils.http_session import shared_session
 from app.core.backend_crypto_tracker.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -59,7 +60,7 @@ async def get_token_prices_moralis(
                 
                 params = {'chain': chain}
                 
-                async with aiohttp.ClientSession() as session:
+                async with shared_session() as session:
                     async with session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=15)) as response:
                         if response.status == 200:
                             data = await response.json()
@@ -136,7 +137,7 @@ async def get_token_prices_coingecko(
         
         logger.info(f"🦎 CoinGecko: Fetching prices for {len(token_addresses)} tokens")
         
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status != 200:
                     error_text = await response.text()
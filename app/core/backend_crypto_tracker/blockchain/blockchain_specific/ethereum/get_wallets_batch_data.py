@@ -0,0 +1,341 @@
+"""
+Batched Multi-Wallet Data Fetcher (EVM)
+✅ One call for a whole list of holder addresses
+✅ Token contracts deduplicated across all wallets
+✅ Native + ERC20 balances via JSON-RPC batches (eth_getBalance / eth_call balanceOf)
+✅ decimals() once per distinct token, prices once per distinct token (get_token_prices_bulk)
+✅ All HTTP traffic over the shared pooled session
+
+Coverage: token balances are queried for the contracts seen in each wallet's
+last `tx_limit` transactions plus explicitly requested tokens (the analysed
+token). The single-wallet path (get_wallet_token_balances_and_prices) lists the
+wallet's complete token portfolio instead, so token_balances and
+total_portfolio_value_usd here only cover recently traded tokens.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from app.core.backend_crypto_tracker.blockchain.utils.http_session import get_shared_session
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ERC20 function selectors
+BALANCE_OF_SELECTOR = '0x70a08231'
+DECIMALS_SELECTOR = '0x313ce567'
+
+# Wrapped native token used as price proxy for native values (same as TokenAnalyzer)
+NATIVE_PRICE_PROXY = {
+    'ethereum': '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2',  # WETH
+    'bsc': '0xbb4cdb9cbd36b01bd1cbaebf2de08d9173bc095c',       # WBNB
+}
+
+MAX_PRICE_TOKENS_PER_REQUEST = 100  # hard limit of execute_get_token_prices_bulk
+
+
+def _hex_to_int(value: Any) -> Optional[int]:
+    """JSON-RPC quantity/eth_call result → int (None for missing/invalid)"""
+    if not isinstance(value, str) or not value.startswith('0x'):
+        return None
+    return int(value, 16) if len(value) > 2 else 0
+
+
+def _balance_of_data(wallet_address: str) -> str:
+    return BALANCE_OF_SELECTOR + wallet_address.lower().replace('0x', '').rjust(64, '0')
+
+
+class EvmBatchDataService:
+    """
+    Batched wallet data for EVM holder analysis
+
+    Usage:
+        service = EvmBatchDataService(rpc_url, chain='ethereum')
+        data = await service.fetch_wallets(addresses)
+        data[address] → {'transactions', 'token_balances', 'prices',
+                         'current_balance', 'total_portfolio_value_usd'}
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        chain: str = 'ethereum',
+        session: Optional[aiohttp.ClientSession] = None,
+        max_batch_size: int = 100,
+        max_concurrency: int = 4,
+        tx_limit: int = 10,
+        transactions_fetcher: Optional[Callable[..., Awaitable[List[Dict[str, Any]]]]] = None,
+        price_fetcher: Optional[Callable[..., Awaitable[Dict[str, float]]]] = None
+    ):
+        """
+        Args:
+            rpc_url: JSON-RPC endpoint of the chain
+            chain: 'ethereum' or 'bsc'
+            session: Optional own session (default: shared pooled session)
+            max_batch_size: Calls per JSON-RPC batch request
+            max_concurrency: Parallel batch requests / transaction fetches
+            tx_limit: Transactions per wallet
+            transactions_fetcher: (address, chain=, limit=) → transactions
+                (default: execute_get_address_transactions)
+            price_fetcher: (token_addresses, chain=) → {token: usd}
+                (default: execute_get_token_prices_bulk)
+        """
+        self.rpc_url = rpc_url
+        self.chain = chain
+        self.max_batch_size = max_batch_size
+        self.tx_limit = tx_limit
+        self._session = session
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rpc_id = 0
+
+        if transactions_fetcher is None:
+            from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_address_transactions import execute_get_address_transactions
+            transactions_fetcher = execute_get_address_transactions
+        if price_fetcher is None:
+            from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_token_prices_bulk import execute_get_token_prices_bulk
+            price_fetcher = execute_get_token_prices_bulk
+
+        self.transactions_fetcher = transactions_fetcher
+        self.price_fetcher = price_fetcher
+        self.stats = {'rpc_requests': 0, 'rpc_calls': 0, 'price_requests': 0}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session or get_shared_session()
+
+    # ==================== JSON-RPC ====================
+
+    async def rpc_batch(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """
+        Send JSON-RPC calls as batch requests (max_batch_size calls each, concurrently)
+
+        Returns:
+            Results in call order (None for calls that errored)
+        """
+        chunks = [calls[i:i + self.max_batch_size] for i in range(0, len(calls), self.max_batch_size)]
+        results = await asyncio.gather(*(self._post_batch(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def _post_batch(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        if not calls:
+            return []
+
+        first_id = self._rpc_id
+        self._rpc_id += len(calls)
+        payload = [
+            {'jsonrpc': '2.0', 'id': first_id + i, 'method': method, 'params': params}
+            for i, (method, params) in enumerate(calls)
+        ]
+
+        try:
+            async with self._semaphore:
+                self.stats['rpc_requests'] += 1
+                self.stats['rpc_calls'] += len(calls)
+                async with self.session.post(
+                    self.rpc_url, json=payload, timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    if response.status != 200:
+                        logger.warning(f"⚠️ Batch RPC HTTP {response.status} ({len(calls)} calls)")
+                        return [None] * len(calls)
+                    replies = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"⚠️ Batch RPC error ({len(calls)} calls): {type(e).__name__}")
+            return [None] * len(calls)
+
+        # A provider that rejects batching answers with a single error object
+        if not isinstance(replies, list):
+            logger.warning(f"⚠️ Batch RPC rejected: {replies.get('error') if isinstance(replies, dict) else replies}")
+            return [None] * len(calls)
+
+        by_id = {reply.get('id'): reply for reply in replies if isinstance(reply, dict)}
+        return [(by_id.get(first_id + i) or {}).get('result') for i in range(len(calls))]
+
+    # ==================== BALANCES ====================
+
+    async def get_native_balances(self, addresses: List[str]) -> Dict[str, float]:
+        """ETH/BNB balance per address (one eth_getBalance per address, batched)"""
+        results = await self.rpc_batch([('eth_getBalance', [address, 'latest']) for address in addresses])
+        return {
+            address: (_hex_to_int(result) or 0) / 1e18
+            for address, result in zip(addresses, results)
+        }
+
+    async def get_token_decimals(self, tokens: List[str]) -> Dict[str, int]:
+        """decimals() per distinct token (18 if the call fails)"""
+        results = await self.rpc_batch([
+            ('eth_call', [{'to': token, 'data': DECIMALS_SELECTOR}, 'latest']) for token in tokens
+        ])
+        decimals = {}
+        for token, result in zip(tokens, results):
+            value = _hex_to_int(result)
+            decimals[token] = value if value is not None and value <= 255 else 18
+        return decimals
+
+    async def get_token_balances(
+        self,
+        pairs: List[Tuple[str, str]],
+        decimals: Dict[str, int]
+    ) -> Dict[Tuple[str, str], float]:
+        """balanceOf for (wallet, token) pairs in batched eth_calls"""
+        results = await self.rpc_batch([
+            ('eth_call', [{'to': token, 'data': _balance_of_data(wallet)}, 'latest'])
+            for wallet, token in pairs
+        ])
+        return {
+            (wallet, token): (_hex_to_int(result) or 0) / (10 ** decimals.get(token, 18))
+            for (wallet, token), result in zip(pairs, results)
+        }
+
+    # ==================== PRICES ====================
+
+    async def get_prices(self, tokens: Iterable[str]) -> Dict[str, float]:
+        """One price lookup per distinct token (chunked to the bulk API limit)"""
+        tokens = list(dict.fromkeys(token.lower() for token in tokens))
+        prices: Dict[str, float] = {}
+        for start in range(0, len(tokens), MAX_PRICE_TOKENS_PER_REQUEST):
+            self.stats['price_requests'] += 1
+            prices.update(await self.price_fetcher(
+                tokens[start:start + MAX_PRICE_TOKENS_PER_REQUEST], chain=self.chain
+            ))
+        return prices
+
+    # ==================== WALLETS ====================
+
+    async def _fetch_transactions(self, address: str) -> List[Dict[str, Any]]:
+        try:
+            async with self._semaphore:
+                return await self.transactions_fetcher(address, chain=self.chain, limit=self.tx_limit) or []
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch transactions for {address[:10]}...: {e}")
+            return []
+
+    async def fetch_wallets(
+        self,
+        addresses: List[str],
+        transactions: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        tokens: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Transactions, balances and prices for many wallets at once
+
+        Token contracts come from each wallet's token transfers plus `tokens`.
+        Balances are only queried for (wallet, token) pairs the wallet touched
+        or that were requested for every wallet, decimals and prices once per
+        distinct token across all wallets. Tokens the wallet holds but did not
+        move in its last `tx_limit` transactions are not covered.
+
+        Args:
+            addresses: Wallet addresses
+            transactions: Already known transactions per address (skips fetching)
+            tokens: Token contracts queried for every wallet (e.g. the analysed token)
+
+        Returns:
+            address → {'transactions', 'token_balances', 'prices',
+                       'current_balance', 'total_portfolio_value_usd'}
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        if not addresses:
+            return {}
+
+        # 1. Transactions (per wallet - REST providers have no batch endpoint)
+        transactions = dict(transactions or {})
+        missing = [address for address in addresses if address not in transactions]
+        fetched = await asyncio.gather(*(self._fetch_transactions(address) for address in missing))
+        transactions.update(zip(missing, fetched))
+
+        # 2. Distinct tokens across all wallets (+ tokens requested for every wallet)
+        requested_tokens = [token.lower() for token in tokens or [] if token]
+        wallet_tokens: Dict[str, Dict[str, str]] = {}
+        token_symbols: Dict[str, str] = {}
+        for address in addresses:
+            wallet_token_map = wallet_tokens[address] = dict.fromkeys(requested_tokens, '')
+            for tx in transactions.get(address, []):
+                for transfer in tx.get('token_transfers', []):
+                    token = (transfer.get('token_address') or '').lower()
+                    if token:
+                        wallet_token_map[token] = transfer.get('token_symbol') or ''
+                        token_symbols.setdefault(token, transfer.get('token_symbol') or 'UNKNOWN')
+        for token in requested_tokens:
+            token_symbols.setdefault(token, 'UNKNOWN')
+
+        distinct_tokens = list(token_symbols)
+        pairs = [(address, token) for address, tokens in wallet_tokens.items() for token in tokens]
+
+        logger.info(
+            f"📦 Batch wallet data: {len(addresses)} wallets, "
+            f"{len(distinct_tokens)} distinct tokens, {len(pairs)} balance lookups"
+        )
+
+        # 3. Native balances + decimals (batched), then token balances, prices
+        native_balances, decimals = await asyncio.gather(
+            self.get_native_balances(addresses),
+            self.get_token_decimals(distinct_tokens)
+        )
+        price_tokens = list(distinct_tokens)
+        if self.chain in NATIVE_PRICE_PROXY:
+            price_tokens.append(NATIVE_PRICE_PROXY[self.chain])
+        token_balances, prices = await asyncio.gather(
+            self.get_token_balances(pairs, decimals),
+            self.get_prices(price_tokens)
+        )
+
+        # 4. Per wallet result
+        result = {}
+        for address in addresses:
+            balances = []
+            wallet_prices = {}
+            total_value = 0.0
+            for token in wallet_tokens[address]:
+                price = prices.get(token, 0)
+                if token in prices:
+                    wallet_prices[token] = price
+                balance = token_balances.get((address, token), 0.0)
+                if balance <= 0:
+                    continue
+                value_usd = balance * price
+                total_value += value_usd
+                balances.append({
+                    'token_address': token,
+                    'symbol': token_symbols[token],
+                    'balance': balance,
+                    'decimals': decimals.get(token, 18),
+                    'value_usd': value_usd
+                })
+
+            proxy = NATIVE_PRICE_PROXY.get(self.chain)
+            if proxy in prices:
+                wallet_prices[proxy] = prices[proxy]
+
+            result[address] = {
+                'transactions': transactions.get(address, []),
+                'token_balances': balances,
+                'prices': wallet_prices,
+                'current_balance': native_balances.get(address, 0.0),
+                'total_portfolio_value_usd': total_value
+            }
+
+        logger.info(
+            f"✅ Batch wallet data complete: {self.stats['rpc_requests']} RPC requests "
+            f"({self.stats['rpc_calls']} calls), {self.stats['price_requests']} price requests"
+        )
+        return result
+
+
+async def execute_get_wallets_batch_data(
+    wallet_addresses: List[str],
+    rpc_url: str,
+    chain: str = 'ethereum',
+    tx_limit: int = 10,
+    tokens: Optional[Iterable[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Batched wallet data for many EVM addresses (convenience wrapper)
+
+    Returns:
+        address → {'transactions', 'token_balances', 'prices',
+                   'current_balance', 'total_portfolio_value_usd'}
+    """
+    service = EvmBatchDataService(rpc_url, chain=chain, tx_limit=tx_limit)
+    return await service.fetch_wallets(wallet_addresses, tokens=tokens)
@@ -0,0 +1,64 @@
+"""
+Shared aiohttp session for blockchain API modules
+
+The execute_get_* modules used to open a fresh ClientSession (and TCP/TLS
+connection) for every single request. They now borrow one pooled session
+per event loop instead. Sessions are kept per loop, so a second loop never
+replaces (and orphans) the session of a loop that is still running; the
+app closes its session on shutdown via close_shared_session().
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+import aiohttp
+
+
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 20
+
+# One session per event loop (sessions are bound to the loop they were created on)
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _discard_dead_sessions():
+    """
+    Forget sessions whose loop is already closed
+
+    Nothing can be closed there anymore (aiohttp needs the loop for that),
+    which is why close_shared_session() belongs before the loop ends.
+    """
+    for loop in [loop for loop in _sessions if loop.is_closed()]:
+        del _sessions[loop]
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """Pooled session of the running event loop (created on first use)"""
+    loop = asyncio.get_running_loop()
+    _discard_dead_sessions()
+
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = _sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300
+            )
+        )
+    return session
+
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Drop-in for `async with aiohttp.ClientSession() as session` - does not close the pool"""
+    yield get_shared_session()
+
+
+async def close_shared_session():
+    """Close the running loop's session (call on shutdown, before the loop ends)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+    _discard_dead_sessions()
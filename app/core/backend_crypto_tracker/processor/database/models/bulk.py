@@ -0,0 +1,167 @@
+# processor/database/models/bulk.py
+"""
+Bausteine für die Bulk-Persistenz im DatabaseManager
+
+- Zeilen-Mapping von Analyse-Ergebnissen (Dicts/Dataclasses) auf Tabellen-Spalten
+- INSERT ... ON CONFLICT DO UPDATE (PostgreSQL, SQLite) in Chunks, die unter
+  dem Bind-Parameter-Limit bleiben
+- Keyset-Cursor für die Analyse-Historie (created_at, id) statt OFFSET
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Table, func
+
+from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletTypeEnum
+from app.core.backend_crypto_tracker.utils.json_helpers import SafeJSONEncoder
+
+# PostgreSQL erlaubt 32767 Bind-Parameter pro Statement, SQLite (ältere Builds) 999
+MAX_BIND_PARAMS = {'postgresql': 30000, 'sqlite': 900}
+MAX_ROWS_PER_STATEMENT = 1000
+
+TOKEN_CONFLICT_COLUMNS = ('address',)
+WALLET_ANALYSIS_CONFLICT_COLUMNS = ('token_address', 'chain', 'wallet_address')
+
+
+def to_dict(data: Any) -> Dict[str, Any]:
+    """Dict oder Dataclass/Objekt → Dict (wie bisher über __dict__)"""
+    if isinstance(data, dict):
+        return data
+    if hasattr(data, 'to_dict') and not hasattr(data, '__dataclass_fields__'):
+        return data.to_dict()
+    return dict(data.__dict__)
+
+
+def json_safe(data: Any) -> Any:
+    """Werte für JSON-Spalten (datetime, Decimal, NaN) serialisierbar machen"""
+    if data is None:
+        return None
+    return json.loads(json.dumps(data, cls=SafeJSONEncoder))
+
+
+def token_row(token_data: Any, now: datetime) -> Dict[str, Any]:
+    """Token-Daten auf Spalten der tokens-Tabelle abbilden (unbekannte Keys werden ignoriert)"""
+    from app.core.backend_crypto_tracker.processor.database.models.token import Token
+
+    data = to_dict(token_data)
+    columns = Token.__table__.columns.keys()
+    row = {key: value for key, value in data.items() if key in columns and key not in ('id', 'created_at')}
+    if 'metadata' in data and 'token_metadata' not in row:
+        row['token_metadata'] = data['metadata']
+    if 'token_metadata' in row:
+        row['token_metadata'] = json_safe(row['token_metadata'])
+
+    row.setdefault('name', data.get('name') or '')
+    row.setdefault('symbol', data.get('symbol') or '')
+    row['last_analyzed'] = now
+    row['updated_at'] = now
+    return row
+
+
+def wallet_analysis_row(wallet_analysis: Any, token_address: str, chain: str,
+                        token_id: Optional[int], now: datetime) -> Dict[str, Any]:
+    """WalletAnalysis (Dataclass oder Dict) auf eine wallet_analyses-Zeile abbilden"""
+    data = to_dict(wallet_analysis)
+    wallet_type = data.get('wallet_type') or WalletTypeEnum.UNKNOWN
+    if not isinstance(wallet_type, WalletTypeEnum):
+        wallet_type = WalletTypeEnum(wallet_type)
+
+    return {
+        'wallet_address': data['wallet_address'],
+        'chain': data.get('chain') or chain,
+        'wallet_type': wallet_type,
+        'confidence_score': data.get('confidence_score', data.get('classification_confidence')),
+        'token_id': token_id,
+        'token_address': token_address,
+        'balance': data.get('balance'),
+        'percentage_of_supply': data.get('percentage_of_supply'),
+        'transaction_count': data.get('transaction_count') or 0,
+        'first_transaction': data.get('first_transaction'),
+        'last_transaction': data.get('last_transaction'),
+        'risk_score': data.get('risk_score'),
+        'risk_flags': json_safe(data.get('risk_flags')),
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+def dedupe_rows(rows: Iterable[Dict[str, Any]], key_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Eine Zeile pro Konflikt-Schlüssel (die letzte gewinnt) - PostgreSQL lehnt
+    ON CONFLICT ab, wenn ein Statement dieselbe Zeile zweimal trifft
+    """
+    unique: Dict[Tuple, Dict[str, Any]] = {}
+    for row in rows:
+        unique[tuple(row[column] for column in key_columns)] = row
+    return list(unique.values())
+
+
+def chunk_rows(rows: List[Dict[str, Any]], dialect: str) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Zeilen in Statement-große Chunks teilen (Bind-Parameter-Limit des Dialekts).
+
+    Ein Multi-VALUES-Statement braucht in jeder Zeile dieselben Spalten; Zeilen
+    mit anderen Spalten landen in eigenen Chunks (statt fehlende Spalten mit
+    NULL aufzufüllen und beim Upsert vorhandene Werte zu überschreiben).
+    """
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    for columns, group in groups.items():
+        size = max(1, min(MAX_ROWS_PER_STATEMENT, MAX_BIND_PARAMS.get(dialect, 900) // len(columns)))
+        for start in range(0, len(group), size):
+            yield group[start:start + size]
+
+
+def upsert_statement(target: Union[Table, Any], rows: List[Dict[str, Any]], dialect: str,
+                     conflict_columns: Sequence[str], keep_columns: Sequence[str] = ('created_at',)):
+    """
+    INSERT ... ON CONFLICT (conflict_columns) DO UPDATE für alle übergebenen Spalten
+    außer Konflikt-Schlüssel und keep_columns
+
+    Args:
+        target: Tabelle oder ORM-Modell (für .returning(Modell))
+
+    Raises:
+        ValueError: für Dialekte ohne ON CONFLICT
+    """
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Bulk upsert not supported for dialect '{dialect}'")
+
+    table = getattr(target, '__table__', target)
+    statement = insert(target).values(rows)
+    columns = set().union(*(row.keys() for row in rows))
+    update_columns = columns - set(conflict_columns) - set(keep_columns) - {'id'}
+    set_ = {column: statement.excluded[column] for column in update_columns}
+    if 'updated_at' in table.c and 'updated_at' not in set_:
+        set_['updated_at'] = func.now()
+
+    return statement.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+
+
+# ==================== KEYSET-CURSOR ====================
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaker Cursor für die nächste Seite (Position des letzten Eintrags)"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises:
+        ValueError: bei ungültigem Cursor
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
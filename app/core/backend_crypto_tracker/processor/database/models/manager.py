@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 from typing import Optional, List, Dict, Any, Union, AsyncGenerator
 from datetime import datetime, timedelta
@@ -6,13 +7,25 @@ from contextlib import contextmanager, asynccontextmanager
 
 # Import Models
 from app.core.backend_crypto_tracker.processor.database.models.token import Token
-from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysis, WalletTypeEnum
+from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysis, WalletAnalysisModel, WalletTypeEnum
 from app.core.backend_crypto_tracker.processor.database.models.scan_result import ScanResult
 from app.core.backend_crypto_tracker.processor.database.models.scan_job import ScanJob, ScanStatus
 from app.core.backend_crypto_tracker.processor.database.models.custom_analysis import CustomAnalysis
+from app.core.backend_crypto_tracker.processor.database.models.bulk import (
+    TOKEN_CONFLICT_COLUMNS,
+    WALLET_ANALYSIS_CONFLICT_COLUMNS,
+    chunk_rows,
+    decode_cursor,
+    dedupe_rows,
+    encode_cursor,
+    json_safe,
+    token_row,
+    upsert_statement,
+    wallet_analysis_row,
+)
 
 # Import SQLAlchemy
-from sqlalchemy import create_engine, text, func, and_, or_, select, delete
+from sqlalchemy import create_engine, text, func, and_, or_, select, delete, insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -146,31 +159,18 @@ class DatabaseManager:
                 raise DatabaseException(f"Failed to fetch token by address: {str(e)}")
 
     async def save_token(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Speichert oder aktualisiert ein Token"""
+        """Speichert oder aktualisiert ein Token (ein Upsert statt Select + setattr)"""
         async with self.get_async_session() as session:
             try:
-                stmt = select(Token).where(
-                    and_(Token.address == token_data['address'], Token.chain == token_data['chain'])
-                )
-                result = await session.execute(stmt)
-                existing_token = result.scalars().first()
-
-                if existing_token:
-                    for key, value in token_data.items():
-                        if hasattr(existing_token, key):
-                            setattr(existing_token, key, value)
-                    existing_token.updated_at = datetime.utcnow()
-                    session.add(existing_token)
-                    await session.flush()
-                    token_result = existing_token
-                else:
-                    token = Token(**token_data)
-                    session.add(token)
-                    await session.flush()
-                    token_result = token
+                dialect = session.bind.dialect.name
+                stmt = upsert_statement(
+                    Token, [token_row(token_data, datetime.utcnow())], dialect, TOKEN_CONFLICT_COLUMNS
+                ).returning(Token)
+                result = await session.scalars(stmt, execution_options={"populate_existing": True})
+                token = result.one()
 
                 await session.commit()
-                return token_result.to_dict()
+                return token.to_dict()
             except SQLAlchemyError as e:
                 logger.error(f"Database error saving token: {e}")
                 raise DatabaseException(f"Failed to save token: {str(e)}")
@@ -294,77 +294,187 @@ class DatabaseManager:
 
     async def save_token_analysis(self, analysis_result: Dict) -> bool:
         """Speichert eine vollstaendige Token-Analyse"""
+        await self.save_token_analyses([analysis_result])
+        return True
+
+    async def save_token_analyses(self, analysis_results: List[Dict]) -> int:
+        """
+        Speichert mehrere Token-Analysen in EINER Transaktion:
+        Tokens und Wallet-Analysen per INSERT ... ON CONFLICT in Batches,
+        Scan-Ergebnisse als Bulk-Insert
+
+        Returns:
+            Anzahl gespeicherter Analysen
+        """
+        now = datetime.utcnow()
+        analyses = []
+        for analysis_result in analysis_results:
+            token = token_row(analysis_result.get('token_data', {}), now)
+            if not token.get('address') or not token.get('chain'):
+                logger.warning(f"Skipping token analysis without address/chain: {token.get('symbol', 'Unknown')}")
+                continue
+            analyses.append((token, analysis_result))
+
+        if not analyses:
+            return 0
+
         async with self.get_async_session() as session:
             try:
-                token_data = analysis_result.get('token_data', {})
-                if hasattr(token_data, '__dict__'):
-                    token_dict = token_data.__dict__
-                else:
-                    token_dict = token_data
+                dialect = session.bind.dialect.name
+
+                # 1. Tokens (mehrere Analysen desselben Tokens → die letzte gewinnt)
+                token_ids = {}
+                token_rows = dedupe_rows((token for token, _ in analyses), TOKEN_CONFLICT_COLUMNS)
+                for chunk in chunk_rows(token_rows, dialect):
+                    stmt = upsert_statement(Token, chunk, dialect, TOKEN_CONFLICT_COLUMNS).returning(Token.id, Token.address)
+                    for row in await session.execute(stmt):
+                        token_ids[row.address] = row.id
+
+                # 2. Scan-Ergebnisse (Historie, immer neue Zeilen)
+                scan_rows = []
+                wallet_rows = []
+                for token, analysis_result in analyses:
+                    token_id = token_ids[token['address']]
+                    scan_rows.append({
+                        'scan_id': analysis_result.get('scan_id'),
+                        'scan_type': analysis_result.get('scan_type', 'token_scan'),
+                        'token_id': token_id,
+                        'token_address': token['address'],
+                        'chain': token['chain'],
+                        'score': analysis_result.get('token_score', 0),
+                        'risk_level': analysis_result.get('risk_level'),
+                        'findings': json_safe(analysis_result.get('metrics', {})),
+                        'risk_flags': json_safe(analysis_result.get('risk_flags')),
+                        'created_at': now,
+                        'status': 'completed'
+                    })
+                    wallet_rows.extend(
+                        wallet_analysis_row(wallet_analysis, token['address'], token['chain'], token_id, now)
+                        for wallet_analysis in analysis_result.get('wallet_analyses', [])
+                    )
 
-                token = await self.save_token(token_dict)
+                for chunk in chunk_rows(scan_rows, dialect):
+                    await session.execute(insert(ScanResult.__table__).values(chunk))
+
+                # 3. Wallet-Analysen (eine Zeile pro Holder und Token)
+                wallet_rows = dedupe_rows(wallet_rows, WALLET_ANALYSIS_CONFLICT_COLUMNS)
+                for chunk in chunk_rows(wallet_rows, dialect):
+                    await session.execute(
+                        upsert_statement(WalletAnalysisModel.__table__, chunk, dialect, WALLET_ANALYSIS_CONFLICT_COLUMNS)
+                    )
 
-                scan_result = ScanResult(
-                    token_id=token['id'],
-                    score=analysis_result.get('token_score', 0),
-                    metrics=analysis_result.get('metrics', {}),
-                    analysis_date=datetime.utcnow()
+                await session.commit()
+                logger.info(
+                    f"Saved {len(analyses)} token analyses ({len(token_rows)} tokens, "
+                    f"{len(wallet_rows)} wallet analyses)"
                 )
+                return len(analyses)
+            except SQLAlchemyError as e:
+                await session.rollback()
+                logger.error(f"Error saving token analyses: {e}")
+                raise DatabaseException(f"Failed to save token analyses: {str(e)}")
 
-                session.add(scan_result)
+    async def get_token_analysis_history(self, token_address: Optional[str] = None,
+                                         chain: Optional[str] = None, limit: int = 50,
+                                         cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyse-Historie (neueste zuerst) mit Keyset-Pagination statt OFFSET
 
-                wallet_analyses = analysis_result.get('wallet_analyses', [])
-                for wallet_analysis in wallet_analyses:
-                    if hasattr(wallet_analysis, '__dict__'):
-                        wallet_dict = wallet_analysis.__dict__
-                    else:
-                        wallet_dict = wallet_analysis
+        Args:
+            cursor: next_cursor der vorherigen Seite
 
-                    wallet_dict['token_id'] = token['id']
-                    wallet_analysis_obj = WalletAnalysis(**wallet_dict)
-                    session.add(wallet_analysis_obj)
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
 
-                await session.commit()
-                logger.info(f"Token analysis saved for token {token.get('symbol', 'Unknown')}")
-                return True
-            except SQLAlchemyError as e:
-                await session.rollback()
-                logger.error(f"Error saving token analysis: {e}")
-                raise DatabaseException(f"Failed to save token analysis: {str(e)}")
+        Raises:
+            ValueError: bei ungültigem Cursor
+        """
+        # Vor der Session dekodieren - sonst würde der ValueError zur DatabaseException
+        position = decode_cursor(cursor) if cursor else None
 
-    async def cleanup_old_data(self, cutoff_date: datetime) -> int:
-        """Bereinigt alte Daten aus der Datenbank"""
         async with self.get_async_session() as session:
             try:
-                # Count scan results to delete
-                count_stmt = select(func.count()).select_from(ScanResult).where(
-                    ScanResult.analysis_date < cutoff_date
-                )
-                result = await session.execute(count_stmt)
-                scan_result_count = result.scalar() or 0
+                stmt = select(ScanResult)
 
-                if scan_result_count > 0:
-                    del_stmt = delete(ScanResult).where(ScanResult.analysis_date < cutoff_date)
-                    await session.execute(del_stmt)
+                if token_address:
+                    stmt = stmt.where(ScanResult.token_address == token_address)
 
-                # Count custom analyses to delete
-                count_stmt = select(func.count()).select_from(CustomAnalysis).where(
-                    CustomAnalysis.analysis_date < cutoff_date
-                )
-                result = await session.execute(count_stmt)
-                custom_analysis_count = result.scalar() or 0
+                if chain:
+                    stmt = stmt.where(ScanResult.chain == chain)
 
-                if custom_analysis_count > 0:
-                    del_stmt = delete(CustomAnalysis).where(CustomAnalysis.analysis_date < cutoff_date)
-                    await session.execute(del_stmt)
+                if position:
+                    created_at, row_id = position
+                    stmt = stmt.where(or_(
+                        ScanResult.created_at < created_at,
+                        and_(ScanResult.created_at == created_at, ScanResult.id < row_id)
+                    ))
 
-                await session.commit()
-                logger.info(f"Cleaned up {scan_result_count} scan results and {custom_analysis_count} custom analyses")
-                return scan_result_count + custom_analysis_count
+                stmt = stmt.order_by(ScanResult.created_at.desc(), ScanResult.id.desc()).limit(limit + 1)
+                result = await session.execute(stmt)
+                scan_results = result.scalars().all()
+
+                page = scan_results[:limit]
+                next_cursor = None
+                if len(scan_results) > limit:
+                    next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+                return {
+                    'items': [scan_result.to_dict() for scan_result in page],
+                    'next_cursor': next_cursor
+                }
             except SQLAlchemyError as e:
-                await session.rollback()
-                logger.error(f"Error cleaning up old data: {e}")
-                raise DatabaseException(f"Failed to clean up old data: {str(e)}")
+                logger.error(f"Database error fetching analysis history: {e}")
+                raise DatabaseException(f"Failed to fetch analysis history: {str(e)}")
+
+    async def cleanup_old_data(self, cutoff_date: datetime, chunk_size: int = 5000,
+                               max_seconds: float = 60.0) -> int:
+        """
+        Bereinigt alte Scan-Ergebnisse und Custom-Analysen in Chunks
+
+        Wallet-Analysen bleiben erhalten: sie sind der aktuelle Stand pro
+        Holder und werden beim nächsten Scan überschrieben, nicht angehängt.
+
+        Jeder Chunk ist eine eigene kurze Transaktion (keine langen Locks);
+        ist max_seconds erreicht, wird abgebrochen und der Rest beim
+        nächsten Lauf gelöscht.
+        """
+        targets = [
+            (ScanResult.__table__, ScanResult.__table__.c.created_at),
+            (CustomAnalysis.__table__, CustomAnalysis.__table__.c.analysis_date),
+        ]
+        deadline = time.monotonic() + max_seconds
+        deleted = {}
+        finished = True
+
+        for table, timestamp_column in targets:
+            deleted[table.name] = 0
+            while True:
+                if time.monotonic() >= deadline:
+                    finished = False
+                    break
+
+                chunk_ids = (
+                    select(table.c.id)
+                    .where(timestamp_column < cutoff_date)
+                    .order_by(table.c.id)
+                    .limit(chunk_size)
+                    .scalar_subquery()
+                )
+                async with self.get_async_session() as session:
+                    result = await session.execute(delete(table).where(table.c.id.in_(chunk_ids)))
+                    count = result.rowcount or 0
+
+                deleted[table.name] += count
+                if count < chunk_size:
+                    break
+
+        total = sum(deleted.values())
+        summary = ", ".join(f"{count} {name}" for name, count in deleted.items())
+        if finished:
+            logger.info(f"Cleaned up {summary}")
+        else:
+            logger.warning(f"Cleanup stopped after {max_seconds}s ({summary}); remaining rows follow in the next run")
+        return total
 
     async def save_scan_job(self, scan_job: ScanJob) -> Dict[str, Any]:
         """Speichert einen Scan-Job in der Datenbank"""
@@ -407,6 +517,17 @@ class DatabaseManager:
                 logger.error(f"Database error fetching scan job: {e}")
                 raise DatabaseException(f"Failed to fetch scan job: {str(e)}")
 
+    async def get_scan_checkpoint(self, scan_id: str) -> Optional[str]:
+        """Holt den Resume-Checkpoint (JSON) eines Scan-Jobs"""
+        async with self.get_async_session() as session:
+            try:
+                stmt = select(ScanJob.checkpoint).where(ScanJob.id == scan_id)
+                result = await session.execute(stmt)
+                return result.scalars().first()
+            except SQLAlchemyError as e:
+                logger.error(f"Database error fetching scan checkpoint: {e}")
+                raise DatabaseException(f"Failed to fetch scan checkpoint: {str(e)}")
+
     async def get_scan_jobs(self, limit: int = 50, status: Optional[ScanStatus] = None) -> List[Dict[str, Any]]:
         """Holt eine Liste von Scan-Jobs"""
         async with self.get_async_session() as session:
@@ -27,6 +27,7 @@ class ScanJob(Base):
     high_risk_tokens = Column(Integer, default=0)
     chain = Column(String(50), nullable=True)
     scan_type = Column(String(50), default="discovery")  # discovery, analysis, custom
+    checkpoint = Column(Text, nullable=True)  # JSON: Arbeitsliste + erledigte Tokens (Resume nach Stopp/Absturz)
     
     # Beziehungen
     # scan_results = relationship("ScanResult", back_populates="scan_job")
@@ -39,6 +39,8 @@ class ScanResult(Base):
         Index('idx_scan_result_scan_id', 'scan_id'),
         Index('idx_scan_result_score', 'score'),
         Index('idx_scan_result_created', 'created_at'),
+        # Keyset-Pagination der Analyse-Historie pro Token
+        Index('idx_scan_result_history', 'token_address', 'chain', 'created_at', 'id'),
     )
     
     def __repr__(self):
@@ -1,5 +1,5 @@
 # processor/database/models/wallet.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text, JSON, Float, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text, JSON, Float, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.backend_crypto_tracker.processor.database.models import Base
@@ -79,6 +79,8 @@ class WalletAnalysisModel(Base):
         Index('idx_wallet_analysis_type', 'wallet_type'),
         Index('idx_wallet_analysis_risk', 'risk_score'),
         Index('idx_wallet_analysis_created', 'created_at'),
+        # Eine Analyse pro Holder und Token - Konflikt-Ziel für Bulk-Upserts
+        UniqueConstraint('token_address', 'chain', 'wallet_address', name='uq_wallet_analysis_token_wallet'),
     )
     
     def __repr__(self):
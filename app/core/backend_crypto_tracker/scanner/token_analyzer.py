@@ -5,9 +5,14 @@ Token Analyzer - FINAL VERSION with Frontend-Compatible Data Structure
 """
 
 import asyncio
+import atexit
 import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 from functools import wraps
 import random
 
@@ -20,6 +25,7 @@ from app.core.backend_crypto_tracker.utils.exceptions import (
 )
 from app.core.backend_crypto_tracker.config.scanner_config import scanner_config
 from app.core.backend_crypto_tracker.utils.cache import AnalysisCache
+from app.core.backend_crypto_tracker.utils.rate_limiter import wait_for_api_slot
 from app.core.backend_crypto_tracker.processor.database.models.token import Token
 from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysis, WalletTypeEnum
 from app.core.backend_crypto_tracker.utils.json_helpers import sanitize_float
@@ -28,6 +34,7 @@ from app.core.backend_crypto_tracker.utils.token_data_resolver import TokenDataR
 # Import blockchain functions
 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_token_holders import execute_get_token_holders as ethereum_get_holders
 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_address_transactions import execute_get_address_transactions as ethereum_get_transactions
+from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_wallets_batch_data import EvmBatchDataService
 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.solana.get_token_holders import execute_get_token_holders as solana_get_holders
 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.solana.get_transaction_details import execute_get_transaction_details as solana_get_transaction
 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.sui.get_token_holders import execute_get_token_holders as sui_get_holders
@@ -49,7 +56,7 @@ logger = get_logger(__name__)
 
 
 # Configuration dataclass
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class TokenAnalysisConfig:
@@ -58,11 +65,69 @@ class TokenAnalysisConfig:
     min_liquidity_threshold: float = 50_000
     whale_threshold_percentage: float = 5.0
     dev_threshold_percentage: float = 2.0
-    max_holders_to_analyze: int = 10
+    # Each holder costs one 'transactions' request, so the holder cap and that
+    # rate limit set the floor. Benchmark with 300ms provider latency
+    # (tests/test_holder_classification_benchmark.py): old top-10 path 8.0s,
+    # top 10 at 5 req/s 1.3s, top 100 at 5/10/15 req/s 19.3s/9.3s/6.3s.
+    # The default keeps the top-10 scope. More holders are opt-in via
+    # MAX_HOLDERS_TO_ANALYZE and only fit the old latency budget with a paid
+    # Etherscan plan (>= 10 req/s).
+    max_holders_to_analyze: int = field(default_factory=lambda: int(os.getenv('MAX_HOLDERS_TO_ANALYZE', '10')))
     request_delay_seconds: float = 1.0
     enable_cache: bool = True
     cache_ttl_seconds: int = 300
     btc_price: float = 50000  # For USD conversion
+    # Holder classification pipeline
+    classification_concurrency: int = 16  # wallets fetched at the same time
+    classification_workers: int = 2       # processes for Stage 1-3 (0 = thread pool)
+    # (max_requests, time_window_seconds) per provider, keyed per chain at runtime
+    # 'transactions' goes to Etherscan (free tier: 5 calls/s per key)
+    provider_rate_limits: Dict[str, Tuple[int, int]] = field(default_factory=lambda: {
+        'transactions': (5, 1),
+        'token_balances': (5, 1),
+        'native_balance': (20, 1),
+    })
+
+
+# Stage objects are stateless - one set per process, reused for every wallet
+_classification_stages: Optional[tuple] = None
+_stage_pool: Optional[ProcessPoolExecutor] = None
+
+
+def run_classification_stages(blockchain_data: Dict[str, Any], wallet_address: str) -> Dict[str, Any]:
+    """
+    Stage 1-3 for one wallet (runs inside the worker pool)
+    
+    Returns:
+        Combined raw, derived and context metrics
+    """
+    global _classification_stages
+    if _classification_stages is None:
+        _classification_stages = (Stage1_RawMetrics(), Stage2_DerivedMetrics(), Stage3_ContextAnalysis())
+    stage1, stage2, stage3 = _classification_stages
+    
+    raw_metrics = stage1.execute(blockchain_data, config={})
+    derived_metrics = stage2.execute(raw_metrics, config={})
+    context_metrics = stage3.execute(derived_metrics, wallet_address, context_db=None)
+    
+    return {**raw_metrics, **derived_metrics, **context_metrics}
+
+
+def _get_stage_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool for the CPU-bound classification stages"""
+    global _stage_pool
+    if _stage_pool is None:
+        _stage_pool = ProcessPoolExecutor(max_workers=workers)
+        atexit.register(shutdown_stage_pool)
+    return _stage_pool
+
+
+def shutdown_stage_pool():
+    """Stop the classification worker processes (app shutdown / atexit)"""
+    global _stage_pool
+    if _stage_pool is not None:
+        _stage_pool.shutdown(wait=True, cancel_futures=True)
+        _stage_pool = None
 
 
 def retry_with_backoff(max_retries=3, base_delay=1, max_delay=60):
@@ -167,11 +232,17 @@ class TokenAnalyzer:
         chain: str, 
         use_cache: Optional[bool] = None,
         wallet_source: str = "top_holders",
-        recent_hours: Optional[int] = 3
+        recent_hours: Optional[int] = 3,
+        on_wallet_classified: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Main token analysis method
         ✅ UPDATED: Returns frontend-compatible structure
+        
+        Args:
+            on_wallet_classified: Called with (wallet_address, classification)
+                as each holder finishes, before the full result is ready
+                (not called for cached results)
         """
         self.logger.info(f"Starting analysis for token {token_address} on {chain}")
         self.logger.info(f"Wallet source: {wallet_source}, Recent hours: {recent_hours if wallet_source == 'recent_traders' else 'N/A'}")
@@ -235,7 +306,8 @@ class TokenAnalyzer:
                 chain=chain,
                 token_address=token_address,
                 wallet_source=wallet_source,
-                traders_data=traders_data
+                traders_data=traders_data,
+                on_wallet_classified=on_wallet_classified
             )
             
             # Step 4: Calculate token score (use classified wallets only)
@@ -318,11 +390,14 @@ class TokenAnalyzer:
         chain: str,
         token_address: str,
         wallet_source: str = "top_holders",
-        traders_data: Optional[Dict[str, Any]] = None
+        traders_data: Optional[Dict[str, Any]] = None,
+        on_wallet_classified: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         ✅ COMPLETELY REWRITTEN: Analyze wallets and return frontend-compatible format
         
+        on_wallet_classified receives each classification as it completes.
+        
         Returns:
             {
                 'classified': [Frontend-ready wallet objects with all fields],
@@ -341,8 +416,8 @@ class TokenAnalyzer:
             balance = float(holder.get('balance', 0))
             holder['percentage'] = (balance / total_supply * 100) if total_supply > 0 else 0
         
-        # ✅ Split: Top 30 for classification, rest unclassified
-        max_to_classify = 10
+        # ✅ Split: Top N for classification, rest unclassified
+        max_to_classify = self.config.max_holders_to_analyze
         holders_to_classify = holders[:max_to_classify]
         holders_unclassified = holders[max_to_classify:]
         
@@ -351,73 +426,17 @@ class TokenAnalyzer:
         # Classification results storage
         classification_results = {}
         
-        # ✅ Classify Top 50 with 3-Stage Pipeline
-        for idx, holder in enumerate(holders_to_classify, 1):
-            wallet_address = holder.get('address', '').lower()
-            
-            try:
-                self.logger.info(f"Classifying wallet {idx}/{len(holders_to_classify)}: {wallet_address}")
-                
-                # Get blockchain data with reduced limit
-                blockchain_data = await self._get_wallet_blockchain_data(
-                    wallet_address, 
-                    chain, 
-                    token_address,
-                    limit=10
-                )
-                
-                # Stage 1: Raw metrics
-                stage1 = Stage1_RawMetrics()
-                raw_metrics = stage1.execute(blockchain_data, config={})
-                
-                # Stage 2: Derived metrics
-                stage2 = Stage2_DerivedMetrics()
-                derived_metrics = stage2.execute(raw_metrics, config={})
-                
-                # Stage 3: Context analysis
-                stage3 = Stage3_ContextAnalysis()
-                context_metrics = stage3.execute(derived_metrics, wallet_address, context_db=None)
-                
-                # Combine all metrics
-                all_metrics = {**raw_metrics, **derived_metrics, **context_metrics}
-                
-                # Classify wallet
-                wallet_type, confidence_score = self._classify_wallet_multistage(all_metrics)
-                
-                # ✅ DEBUG: Log scores for debugging
-                self.logger.debug(f"Wallet {wallet_address} metrics sample:")
-                self.logger.debug(f"  - tx_count: {all_metrics.get('tx_count')}")
-                self.logger.debug(f"  - total_value_usd: {all_metrics.get('total_value_usd')}")
-                self.logger.debug(f"  - tx_per_month: {all_metrics.get('tx_per_month')}")
-                self.logger.debug(f"  - holding_period_days: {all_metrics.get('holding_period_days')}")
-                
-                # Calculate risk score
-                risk_score, risk_flags = self._calculate_wallet_risk(all_metrics, wallet_type)
-                
-                # Store classification result
-                classification_results[wallet_address] = {
-                    'wallet_type': wallet_type.value,
-                    'confidence_score': confidence_score,
-                    'risk_score': risk_score,
-                    'risk_flags': risk_flags,
-                    'metrics': all_metrics,
-                    'classified': True
-                }
-                
-                self.logger.info(f"✅ {wallet_address}: {wallet_type.value} (confidence: {confidence_score:.2f})")
-                
-                # Rate limiting
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                self.logger.error(f"Error classifying wallet {wallet_address}: {e}")
-                classification_results[wallet_address] = {
-                    'wallet_type': 'unknown',
-                    'confidence_score': 0.0,
-                    'risk_score': 0,
-                    'risk_flags': ['classification_error'],
-                    'classified': False
-                }
+        # ✅ Classify Top N concurrently with 3-Stage Pipeline
+        async for wallet_address, classification in self.stream_wallet_classifications(
+            holders_to_classify, chain, token_address
+        ):
+            classification_results[wallet_address] = classification
+            self.logger.info(
+                f"Classified {len(classification_results)}/{len(holders_to_classify)}: "
+                f"{wallet_address} → {classification['wallet_type']}"
+            )
+            if on_wallet_classified:
+                on_wallet_classified(wallet_address, classification)
         
         # ✅ Transform wallets to frontend format using WalletDataTransformer
         classified_wallets = []
@@ -461,6 +480,188 @@ class TokenAnalyzer:
             'total': len(classified_wallets) + len(unclassified_wallets)
         }
 
+    async def stream_wallet_classifications(
+        self,
+        holders: List[Dict[str, Any]],
+        chain: str,
+        token_address: str
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Classify holders concurrently and yield results as they complete
+        
+        Stage 1-3 run in the worker pool. On EVM chains every holder's data
+        comes from the batched fetch (EvmBatchDataService), so all holders
+        see the same balance coverage; the first holder is fetched as its own
+        small batch so the first result is not held back by the big one.
+        Other chains (or a failed batch) fetch per wallet, up to
+        `classification_concurrency` at once, paced by the provider rate limits.
+        
+        Yields:
+            (wallet_address, classification_result) in completion order
+        """
+        semaphore = asyncio.Semaphore(self.config.classification_concurrency)
+        rpc_url = {'ethereum': self.ethereum_rpc, 'bsc': self.bsc_rpc}.get(chain)
+        
+        async def classify(holder, prefetch=None):
+            blockchain_data = None
+            if prefetch is not None:
+                prefetched = await asyncio.shield(prefetch)
+                blockchain_data = prefetched.get(holder.get('address', '').lower())
+            return await self._classify_holder(
+                holder, chain, token_address, semaphore, blockchain_data=blockchain_data
+            )
+        
+        prefetches = []
+        if rpc_url:
+            groups = [group for group in (holders[:1], holders[1:]) if group]
+            prefetches = [
+                asyncio.create_task(self._prefetch_evm_wallet_data(group, chain, rpc_url, token_address))
+                for group in groups
+            ]
+            tasks = [
+                asyncio.create_task(classify(holder, prefetch))
+                for group, prefetch in zip(groups, prefetches)
+                for holder in group
+            ]
+        else:
+            tasks = [asyncio.create_task(classify(holder)) for holder in holders]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in prefetches + tasks:
+                task.cancel()
+
+    async def _classify_holder(
+        self,
+        holder: Dict[str, Any],
+        chain: str,
+        token_address: str,
+        semaphore: asyncio.Semaphore,
+        blockchain_data: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Fetch (unless prefetched) + classify a single holder (never raises)"""
+        wallet_address = holder.get('address', '').lower()
+        
+        try:
+            # Get blockchain data with reduced limit
+            if blockchain_data is None:
+                async with semaphore:
+                    blockchain_data = await self._get_wallet_blockchain_data(
+                        wallet_address, 
+                        chain, 
+                        token_address,
+                        limit=10
+                    )
+            
+            # Stage 1-3: raw, derived and context metrics
+            all_metrics = await self._run_classification_stages(blockchain_data, wallet_address)
+            
+            # Classify wallet
+            wallet_type, confidence_score = self._classify_wallet_multistage(all_metrics)
+            
+            # ✅ DEBUG: Log scores for debugging
+            self.logger.debug(f"Wallet {wallet_address} metrics sample:")
+            self.logger.debug(f"  - tx_count: {all_metrics.get('tx_count')}")
+            self.logger.debug(f"  - total_value_usd: {all_metrics.get('total_value_usd')}")
+            self.logger.debug(f"  - tx_per_month: {all_metrics.get('tx_per_month')}")
+            self.logger.debug(f"  - holding_period_days: {all_metrics.get('holding_period_days')}")
+            
+            # Calculate risk score
+            risk_score, risk_flags = self._calculate_wallet_risk(all_metrics, wallet_type)
+            
+            self.logger.info(f"✅ {wallet_address}: {wallet_type.value} (confidence: {confidence_score:.2f})")
+            
+            return wallet_address, {
+                'wallet_type': wallet_type.value,
+                'confidence_score': confidence_score,
+                'risk_score': risk_score,
+                'risk_flags': risk_flags,
+                'metrics': all_metrics,
+                'classified': True
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error classifying wallet {wallet_address}: {e}")
+            return wallet_address, {
+                'wallet_type': 'unknown',
+                'confidence_score': 0.0,
+                'risk_score': 0,
+                'risk_flags': ['classification_error'],
+                'classified': False
+            }
+
+    async def _prefetch_evm_wallet_data(
+        self,
+        holders: List[Dict[str, Any]],
+        chain: str,
+        rpc_url: str,
+        token_address: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Blockchain data for all EVM holders in one batched fetch
+        
+        Token contracts are deduplicated across holders, balances come from
+        JSON-RPC batches and prices from one bulk lookup per distinct token.
+        Balances cover the tokens of each holder's last 10 transactions plus
+        the analysed token (not the full portfolio of the per-wallet path).
+        """
+        async def fetch_transactions(address: str, chain: str, limit: int) -> List[Dict[str, Any]]:
+            await self._provider_slot('transactions', chain)
+            return await ethereum_get_transactions(address, chain=chain, limit=limit)
+        
+        service = EvmBatchDataService(
+            rpc_url,
+            chain=chain,
+            max_concurrency=self.config.classification_concurrency,
+            tx_limit=10,
+            transactions_fetcher=fetch_transactions
+        )
+        
+        try:
+            wallets = await service.fetch_wallets(
+                [holder.get('address', '') for holder in holders],
+                tokens=[token_address] if token_address else None
+            )
+        except Exception as e:
+            self.logger.warning(f"Batched wallet data fetch failed, falling back to per-wallet fetch: {e}")
+            return {}
+        
+        return {
+            address: self._build_blockchain_data(
+                address, chain, data['transactions'], data['token_balances'], data['prices'],
+                data['current_balance'], data['total_portfolio_value_usd']
+            )
+            for address, data in wallets.items()
+        }
+
+    async def _run_classification_stages(
+        self,
+        blockchain_data: Dict[str, Any],
+        wallet_address: str
+    ) -> Dict[str, Any]:
+        """Run Stage 1-3 off the event loop (process pool, thread fallback)"""
+        workers = self.config.classification_workers
+        
+        if workers > 0:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    _get_stage_pool(workers), run_classification_stages, blockchain_data, wallet_address
+                )
+            except (BrokenProcessPool, pickle.PicklingError) as e:
+                self.logger.warning(f"Stage worker pool unavailable ({e}) - falling back to threads")
+                self.config.classification_workers = 0
+        
+        return await asyncio.to_thread(run_classification_stages, blockchain_data, wallet_address)
+
+    async def _provider_slot(self, provider: str, chain: str):
+        """Wait for a request slot of a provider (replaces fixed sleeps)"""
+        max_requests, time_window = self.config.provider_rate_limits.get(provider, (5, 1))
+        while not await wait_for_api_slot(f"token_analyzer_{provider}_{chain}", max_requests, time_window):
+            await asyncio.sleep(time_window / max_requests)
+
     def _prepare_wallet_data(
         self, 
         holder: Dict[str, Any], 
@@ -568,6 +769,9 @@ class TokenAnalyzer:
             # ========================================
             # 1. Fetch Transactions (with token transfers)
             # ========================================
+            if chain in ['ethereum', 'bsc', 'solana', 'sui']:
+                await self._provider_slot('transactions', chain)
+            
             if chain in ['ethereum', 'bsc']:
                 from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_address_transactions import execute_get_address_transactions
                 txs = await execute_get_address_transactions(
@@ -600,6 +804,7 @@ class TokenAnalyzer:
                     self.logger.info(f"📊 Fetching token balances and prices for {wallet_address}")
                     
                     # Get both balances and prices in a single optimized call
+                    await self._provider_slot('token_balances', chain)
                     token_data = await execute_get_wallet_token_balances_and_prices(
                         wallet_address,
                         chain=chain,
@@ -666,70 +871,33 @@ class TokenAnalyzer:
                     prices = {}
             
             # ========================================
-            # 3. 🆕 Enrich transactions with USD values
-            # ========================================
-            for tx in txs:
-                # Add USD value to main transaction value (ETH/BNB)
-                if chain == 'ethereum':
-                    eth_price = prices.get('0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2', 3500.0)  # WETH price as proxy
-                    tx['value_usd'] = tx.get('value', 0) * eth_price
-                elif chain == 'bsc':
-                    bnb_price = prices.get('0xbb4cdb9cbd36b01bd1cbaebf2de08d9173bc095c', 600.0)   # WBNB price as proxy
-                    tx['value_usd'] = tx.get('value', 0) * bnb_price
-                else:
-                    tx['value_usd'] = 0
-                
-                # Add USD values to token transfers
-                for transfer in tx.get('token_transfers', []):
-                    token_addr = transfer.get('token_address', '').lower()
-                    token_value = transfer.get('value', 0)
-                    token_price = prices.get(token_addr, 0)
-                    
-                    transfer['value_usd'] = token_value * token_price
-            
-            # ========================================
-            # 4. 🆕 Get current native balance (ETH/BNB)
+            # 3. 🆕 Get current native balance (ETH/BNB)
             # ========================================
             current_balance = 0
             
             # Only fetch native balance for EVM chains with transactions
             if chain in ['ethereum', 'bsc'] and txs:
                 try:
-                    if chain == 'ethereum' and self.w3_eth and self.w3_eth.is_connected():
-                        balance_wei = self.w3_eth.eth.get_balance(wallet_address)
-                        current_balance = float(balance_wei) / 1e18
-                    elif chain == 'bsc' and self.w3_bsc and self.w3_bsc.is_connected():
-                        balance_wei = self.w3_bsc.eth.get_balance(wallet_address)
+                    w3 = self.w3_eth if chain == 'ethereum' else self.w3_bsc
+                    if w3:
+                        # Web3 HTTPProvider is blocking → keep it off the event loop
+                        await self._provider_slot('native_balance', chain)
+                        balance_wei = await asyncio.to_thread(
+                            lambda: w3.eth.get_balance(w3.to_checksum_address(wallet_address))
+                            if w3.is_connected() else 0
+                        )
                         current_balance = float(balance_wei) / 1e18
                 except Exception as e:
                     self.logger.debug(f"Could not fetch native balance: {e}")
                     current_balance = 0
             
             # ========================================
-            # 5. Build complete blockchain data
+            # 4. Enrich with USD values + build complete blockchain data
             # ========================================
-            blockchain_data = {
-                'address': wallet_address,
-                'transactions': txs,  # ✅ With token_transfers[] for each tx
-                'token_balances': token_balances,  # 🆕 Filtered to max 50 relevant tokens
-                'prices': prices,  # 🆕 Only prices for filtered tokens
-                'current_balance': current_balance,
-                'total_portfolio_value_usd': total_portfolio_value_usd,  # 🆕
-                
-                # Legacy fields for backwards compatibility
-                'txs': txs,
-                'balance': current_balance,
-                'inputs': [],
-                'outputs': []
-            }
-            
-            self.logger.info(f"✅ Optimized blockchain data fetched:")
-            self.logger.info(f"   - Transactions: {len(txs)}")
-            self.logger.info(f"   - Token balances: {len(token_balances)}")
-            self.logger.info(f"   - Token prices: {len(prices)}")
-            self.logger.info(f"   - Portfolio value: ${total_portfolio_value_usd:,.2f}")
-            
-            return blockchain_data
+            return self._build_blockchain_data(
+                wallet_address, chain, txs, token_balances, prices,
+                current_balance, total_portfolio_value_usd
+            )
             
         except Exception as e:
             self.logger.error(f"Error fetching wallet data: {e}", exc_info=True)
@@ -747,6 +915,59 @@ class TokenAnalyzer:
             }
 
 
+    def _build_blockchain_data(
+        self,
+        wallet_address: str,
+        chain: str,
+        txs: List[Dict[str, Any]],
+        token_balances: List[Dict[str, Any]],
+        prices: Dict[str, float],
+        current_balance: float,
+        total_portfolio_value_usd: float
+    ) -> Dict[str, Any]:
+        """Enrich transactions with USD values and build the Stage 1 input"""
+        for tx in txs:
+            # Add USD value to main transaction value (ETH/BNB)
+            if chain == 'ethereum':
+                eth_price = prices.get('0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2', 3500.0)  # WETH price as proxy
+                tx['value_usd'] = tx.get('value', 0) * eth_price
+            elif chain == 'bsc':
+                bnb_price = prices.get('0xbb4cdb9cbd36b01bd1cbaebf2de08d9173bc095c', 600.0)   # WBNB price as proxy
+                tx['value_usd'] = tx.get('value', 0) * bnb_price
+            else:
+                tx['value_usd'] = 0
+            
+            # Add USD values to token transfers
+            for transfer in tx.get('token_transfers', []):
+                token_addr = transfer.get('token_address', '').lower()
+                token_value = transfer.get('value', 0)
+                token_price = prices.get(token_addr, 0)
+                
+                transfer['value_usd'] = token_value * token_price
+        
+        blockchain_data = {
+            'address': wallet_address,
+            'transactions': txs,  # ✅ With token_transfers[] for each tx
+            'token_balances': token_balances,  # 🆕 Filtered to max 50 relevant tokens
+            'prices': prices,  # 🆕 Only prices for filtered tokens
+            'current_balance': current_balance,
+            'total_portfolio_value_usd': total_portfolio_value_usd,  # 🆕
+            
+            # Legacy fields for backwards compatibility
+            'txs': txs,
+            'balance': current_balance,
+            'inputs': [],
+            'outputs': []
+        }
+        
+        self.logger.info(f"✅ Optimized blockchain data fetched:")
+        self.logger.info(f"   - Transactions: {len(txs)}")
+        self.logger.info(f"   - Token balances: {len(token_balances)}")
+        self.logger.info(f"   - Token prices: {len(prices)}")
+        self.logger.info(f"   - Portfolio value: ${total_portfolio_value_usd:,.2f}")
+        
+        return blockchain_data
+
     def _classify_wallet_multistage(self, all_metrics: Dict[str, Any]) -> tuple:
         """
         ✅ OPTIMIZED VERSION - Calls AdaptiveClassifier once instead of 5 times
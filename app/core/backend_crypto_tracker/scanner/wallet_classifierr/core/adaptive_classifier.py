@@ -8,11 +8,16 @@ Adaptive Classifier with detailed logging to debug metrics and classification.
 ✅ Logs missing features
 ✅ Logs classification scores
 ✅ Detects when using default metrics
+✅ NEW: Matrix scoring - all classes in one weight-matrix product,
+   diagnostic logging only with WALLET_CLASSIFIER_DEBUG=1 (or debug=True)
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 import math
+import os
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,9 @@ class AdaptiveClassifier:
     Adaptive classification with comprehensive logging.
     """
     
+    # Per-feature / per-class diagnostic logging (dozens of lines per wallet)
+    DEBUG_LOGGING = os.getenv('WALLET_CLASSIFIER_DEBUG', '').lower() in ('1', 'true', 'yes')
+    
     FEATURE_WEIGHTS = {
         "Dust Sweeper": {
             "avg_inputs_per_tx": 0.15,
@@ -174,13 +182,104 @@ class AdaptiveClassifier:
         normalized = (value - min_val) / (max_val - min_val)
         return max(0.0, min(1.0, normalized))
     
+    # ========================================================================
+    # ⚡ MATRIX SCORING
+    # ========================================================================
+    
     @classmethod
-    def extract_features(cls, metrics: Dict[str, Any]) -> Dict[str, float]:
+    def _compiled(cls) -> Dict[str, Any]:
+        """
+        FEATURE_WEIGHTS / FEATURE_NORMALIZATION as arrays (built once per class)
+        
+        score = (W @ x + offset) / total_weight, where W holds the signed
+        weights and offset = sum of |negative weights| (the 1 - x inversion).
+        """
+        compiled = cls.__dict__.get('_compiled_weights')
+        if compiled is not None:
+            return compiled
+        
+        classes = list(cls.FEATURE_WEIGHTS)
+        features = sorted({name for weights in cls.FEATURE_WEIGHTS.values() for name in weights})
+        column = {name: i for i, name in enumerate(features)}
+        
+        weights = np.zeros((len(classes), len(features)))
+        for row, class_name in enumerate(classes):
+            for feature_name, weight in cls.FEATURE_WEIGHTS[class_name].items():
+                weights[row, column[feature_name]] = weight
+        
+        bounds = np.array([
+            cls.FEATURE_NORMALIZATION.get(name, (np.nan, np.nan)) for name in features
+        ], dtype=np.float64)
+        span = bounds[:, 1] - bounds[:, 0]
+        
+        compiled = {
+            'classes': classes,
+            'features': features,
+            'weights': weights,
+            'offset': np.where(weights < 0, -weights, 0.0).sum(axis=1),
+            'total_weight': np.abs(weights).sum(axis=1),
+            'norm_min': bounds[:, 0],
+            'norm_span': np.where(span == 0, np.nan, span),
+            # Not in table or max == min → 0.5 (like normalize_feature)
+            'fixed': np.isnan(bounds[:, 0]) | (span == 0),
+        }
+        cls._compiled_weights = compiled
+        return compiled
+    
+    @classmethod
+    def feature_matrix(cls, metrics_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Normalized features (wallets x features), same values as extract_features"""
+        compiled = cls._compiled()
+        names = compiled['features']
+        
+        raw = np.array([
+            [np.nan if (value := metrics.get(name)) is None else float(value) for name in names]
+            for metrics in metrics_list
+        ], dtype=np.float64).reshape(len(metrics_list), len(names))
+        missing = np.array([
+            [metrics.get(name) is None for name in names] for metrics in metrics_list
+        ], dtype=bool).reshape(raw.shape)
+        
+        with np.errstate(invalid='ignore'):
+            normalized = np.clip((raw - compiled['norm_min']) / compiled['norm_span'], 0.0, 1.0)
+        # NaN metric values clamp to 1.0 in normalize_feature (min/max with NaN)
+        normalized = np.nan_to_num(normalized, nan=1.0)
+        normalized[:, compiled['fixed']] = 0.5
+        normalized[missing] = 0.5
+        return normalized
+    
+    @classmethod
+    def score_matrix(cls, features: np.ndarray) -> np.ndarray:
+        """Normalized class scores (wallets x classes) - one matrix product"""
+        compiled = cls._compiled()
+        scores = features @ compiled['weights'].T + compiled['offset']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(compiled['total_weight'] > 0, scores / compiled['total_weight'], 0.0)
+    
+    @classmethod
+    def classify_many(cls, metrics_list: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+        """Classify many wallets at once (same probabilities as classify)"""
+        if not metrics_list:
+            return []
+        
+        classes = cls._compiled()['classes']
+        scores = cls.score_matrix(cls.feature_matrix(metrics_list)) * 5
+        exp_scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probabilities = exp_scores / exp_scores.sum(axis=1, keepdims=True)
+        
+        return [dict(zip(classes, row)) for row in probabilities.tolist()]
+    
+    @classmethod
+    def extract_features(cls, metrics: Dict[str, Any], debug: Optional[bool] = None) -> Dict[str, float]:
         """
         Extract and normalize features from metrics.
         
-        WITH LOGGING: Shows which features are found/missing
+        WITH LOGGING (debug): Shows which features are found/missing
         """
+        if not (cls.DEBUG_LOGGING if debug is None else debug):
+            compiled = cls._compiled()
+            return dict(zip(compiled['features'], cls.feature_matrix([metrics])[0].tolist()))
+        
         logger.info("="*70)
         logger.info("🔍 FEATURE EXTRACTION START")
         logger.info("="*70)
@@ -312,18 +411,26 @@ class AdaptiveClassifier:
         return normalized_score
     
     @classmethod
-    def classify(cls, metrics: Dict[str, Any]) -> Dict[str, float]:
+    def classify(cls, metrics: Dict[str, Any], debug: Optional[bool] = None) -> Dict[str, float]:
         """
         Classify wallet and return probabilities.
         
-        WITH LOGGING: Shows full classification process
+        Args:
+            debug: Full diagnostic logging (default: DEBUG_LOGGING)
         """
+        if not (cls.DEBUG_LOGGING if debug is None else debug):
+            probabilities = cls.classify_many([metrics])[0]
+            if logger.isEnabledFor(logging.DEBUG):
+                top_class = max(probabilities, key=probabilities.get)
+                logger.debug(f"🏆 {top_class}: {probabilities[top_class]:.4f}")
+            return probabilities
+        
         logger.info("\n" + "="*70)
         logger.info("🚀 STARTING CLASSIFICATION")
         logger.info("="*70)
         
         # Extract features (with logging)
-        features = cls.extract_features(metrics)
+        features = cls.extract_features(metrics, debug=True)
         
         # Compute scores for all classes (with logging)
         raw_scores = {}
@@ -358,14 +465,15 @@ class AdaptiveClassifier:
     @classmethod
     def classify_with_explanation(
         cls,
-        metrics: Dict[str, Any]
+        metrics: Dict[str, Any],
+        debug: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Classification with detailed explanation."""
         # Extract features
-        features = cls.extract_features(metrics)
+        features = cls.extract_features(metrics, debug=debug)
         
         # Classify
-        probabilities = cls.classify(metrics)
+        probabilities = cls.classify(metrics, debug=debug)
         
         # Top class
         top_class = max(probabilities.items(), key=lambda x: x[1])
@@ -8,6 +8,7 @@ Stage 1: Raw Metrics Extraction from Blockchain Data
 ✅ BEHAVIORAL SCORES from pattern analysis
 ✅ ADVANCED CLASSIFICATION FEATURES
 ✅ NEW: PROPER UTXO METRICS IMPLEMENTATION
+✅ NEW: COLUMNAR ENGINE - transactions parsed once, metrics as NumPy reductions
 """
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
@@ -16,9 +17,50 @@ import statistics
 import math
 import logging
 
+import numpy as np
+
+from .tx_columns import TxColumns, mode_frequency, mean_and_stdev
+
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# KNOWN CONTRACTS & METHOD SIGNATURES (shared by both execution paths)
+# ============================================================================
+
+DEX_ROUTERS = {
+    'ethereum': {
+        '0x7a250d5630b4cf539739df2c5dacb4c659f2488d': 'Uniswap V2',
+        '0xe592427a0aece92de3edee1f18e0157c05861564': 'Uniswap V3',
+        '0xd9e1ce17f2641f24ae83637ab66a2cca9c378b9f': 'SushiSwap',
+        '0x1111111254eeb25477b68fb85ed929f73a960582': '1inch',
+        '0xdef1c0ded9bec7f1a1670819833240f027b25eff': '0x',
+    },
+    'bsc': {
+        '0x10ed43c718714eb63d5aa57b78b54704e256024e': 'PancakeSwap',
+    }
+}
+
+SWAP_SIGNATURES = {
+    '0x38ed1739', '0x8803dbee', '0x7ff36ab5', '0x18cbafe5',
+    '0x791ac947', '0xc04b8d59', '0x414bf389', '0x7c025200'
+}
+
+FLASHLOAN_SIGNATURES = {
+    '0xab9c4b5d',  # flashLoan
+    '0x5cffe9de',  # flashLoanSimple (Aave V3)
+}
+
+AAVE_POOLS = {
+    '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # Aave V2
+    '0x87870bca3f3fd6335c3f4ce8392d69350b4fa4e2',  # Aave V3
+}
+
+COMPOUND_CONTRACTS = {
+    '0x3d9819210a31b4961b30ef54be2aed79b9c9cd3b',  # Compound Comptroller
+}
+
+
 class Stage1_RawMetrics:
     """
     Extract comprehensive metrics from blockchain transaction data.
@@ -33,18 +75,50 @@ class Stage1_RawMetrics:
     ) -> Dict[str, Any]:
         """
         Execute Stage 1 analysis with ULTIMATE metric set
+        
+        Args:
+            config: {'columnar': False} runs the per-transaction reference
+                implementation instead of the columnar engine
         """
         transactions = blockchain_data.get('transactions', [])
+        
+        if not transactions:
+            logger.warning("⚠️ No transactions - returning defaults")
+            return Stage1_RawMetrics._get_default_metrics(blockchain)
+        
+        if (config or {}).get('columnar', True):
+            raw_metrics = Stage1_RawMetrics._execute_columnar(blockchain_data, blockchain)
+        else:
+            raw_metrics = Stage1_RawMetrics._execute_per_tx(blockchain_data, blockchain)
+        
+        logger.debug(
+            f"✅ Stage1 complete: {len(raw_metrics)} metrics | "
+            f"{raw_metrics['tx_count']} txs, "
+            f"{raw_metrics.get('unique_tokens_held', 0)} tokens, "
+            f"portfolio ${raw_metrics.get('total_value_usd', 0):,.2f}, "
+            f"bot score {raw_metrics.get('automated_pattern_score', 0):.3f}, "
+            f"{raw_metrics.get('frontrun_attempts', 0)} frontruns"
+        )
+        
+        return raw_metrics
+
+    # ========================================================================
+    # PER-TRANSACTION REFERENCE IMPLEMENTATION
+    # ========================================================================
+
+    @staticmethod
+    def _execute_per_tx(
+        blockchain_data: Dict[str, Any],
+        blockchain: str
+    ) -> Dict[str, Any]:
+        """Original dict-walking implementation (kept as parity reference)"""
+        transactions = blockchain_data.get('transactions', [])
         address = blockchain_data.get('address', '')
         current_balance = blockchain_data.get('current_balance', 0)
         token_balances = blockchain_data.get('token_balances', [])
         prices = blockchain_data.get('prices', {})
         total_portfolio_value = blockchain_data.get('total_portfolio_value_usd', 0)
         
-        if not transactions:
-            logger.warning("⚠️ No transactions - returning defaults")
-            return Stage1_RawMetrics._get_default_metrics(blockchain)
-        
         # ===== PARSE TRANSACTIONS =====
         timestamps = []
         input_values = []
@@ -124,12 +198,10 @@ class Stage1_RawMetrics:
             first_seen = min(timestamps)
             last_seen = max(timestamps)
             age_days = (datetime.now() - datetime.fromtimestamp(first_seen)).days
-            last_active_days = (datetime.now() - datetime.fromtimestamp(last_seen)).days
         else:
             first_seen = 0
             last_seen = 0
             age_days = 0
-            last_active_days = 0
         
         tx_count = len(transactions)
         
@@ -218,15 +290,304 @@ class Stage1_RawMetrics:
         )
         raw_metrics.update(behavioral_scores)
         
-        logger.info(f"✅ Stage1 complete: {len(raw_metrics)} metrics")
-        logger.info(f"   - Transactions: {tx_count}")
-        logger.info(f"   - Token balances: {len(token_balances)}")
-        logger.info(f"   - Portfolio value: ${total_portfolio_value:,.2f}")
-        logger.info(f"   - Bot score: {raw_metrics.get('automated_pattern_score', 0):.3f}")
-        logger.info(f"   - MEV activity: {raw_metrics.get('frontrun_attempts', 0)} frontruns")
+        return raw_metrics
+
+    # ========================================================================
+    # ⚡ COLUMNAR ENGINE (transactions parsed once, NumPy reductions)
+    # ========================================================================
+
+    @staticmethod
+    def _execute_columnar(
+        blockchain_data: Dict[str, Any],
+        blockchain: str
+    ) -> Dict[str, Any]:
+        """
+        Same metrics as _execute_per_tx, computed from a single TxColumns parse
+        """
+        transactions = blockchain_data.get('transactions', [])
+        address = blockchain_data.get('address', '')
+        current_balance = blockchain_data.get('current_balance', 0)
+        token_balances = blockchain_data.get('token_balances', [])
+        prices = blockchain_data.get('prices', {})
+        total_portfolio_value = blockchain_data.get('total_portfolio_value_usd', 0)
+        
+        cols = TxColumns(transactions, address)
+        incoming = cols.direction == 1
+        outgoing = cols.direction == -1
+        input_values_usd = cols.value_usd[incoming]
+        output_values_usd = cols.value_usd[outgoing]
+        
+        # ===== TIME ANALYSIS =====
+        timestamps = cols.timestamps
+        if timestamps:
+            ts = np.asarray(timestamps)
+            first_seen = ts.min().item()
+            last_seen = ts.max().item()
+            age_days = (datetime.now() - datetime.fromtimestamp(first_seen)).days
+        else:
+            first_seen = 0
+            last_seen = 0
+            age_days = 0
+        
+        contract_calls = cols.has_to & (cols.input_len > 10)
+        
+        # ===== BUILD BASE METRICS =====
+        raw_metrics = {
+            'tx_count': cols.count,
+            'total_received': float(cols.value[incoming].sum()),
+            'total_sent': float(cols.value[outgoing].sum()),
+            'current_balance': current_balance,
+            'first_seen': first_seen,
+            'last_seen': last_seen,
+            'age_days': age_days,
+            'timestamps': timestamps,
+            'input_values': cols.value[incoming].tolist(),
+            'output_values': cols.value[outgoing].tolist(),
+            'inputs_per_tx': cols.inputs_per_tx,
+            'outputs_per_tx': cols.outputs_per_tx,
+            'incoming_tx_count': int(incoming.sum()),
+            'outgoing_tx_count': int(outgoing.sum()),
+            'blockchain': blockchain,
+            'total_received_usd': float(input_values_usd.sum()),
+            'total_sent_usd': float(output_values_usd.sum()),
+            'input_values_usd': input_values_usd.tolist(),
+            'output_values_usd': output_values_usd.tolist(),
+            'avg_input_value_usd': float(input_values_usd.mean()) if len(input_values_usd) else 0,
+            'avg_output_value_usd': float(output_values_usd.mean()) if len(output_values_usd) else 0,
+            'total_value_usd': total_portfolio_value,
+            'unique_contracts_interacted': len(np.unique(cols.to_code[contract_calls])),
+        }
+        
+        raw_metrics.update(Stage1_RawMetrics._columnar_utxo_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._columnar_bot_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._columnar_gas_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._columnar_dex_metrics(cols, blockchain))
+        raw_metrics.update(Stage1_RawMetrics._compute_portfolio_metrics_ultimate(
+            token_balances, prices, blockchain_data
+        ))
+        raw_metrics.update(Stage1_RawMetrics._columnar_mev_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._columnar_defi_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._columnar_nonce_metrics(cols))
+        raw_metrics.update(Stage1_RawMetrics._compute_composite_metrics(
+            raw_metrics, transactions, token_balances
+        ))
+        raw_metrics.update(Stage1_RawMetrics._compute_behavioral_scores(raw_metrics))
         
         return raw_metrics
 
+    @staticmethod
+    def _columnar_utxo_metrics(cols: TxColumns) -> Dict[str, float]:
+        """Columnar _compute_utxo_metrics (token transfers as input/output proxy)"""
+        n = cols.count
+        inputs = cols.transfers_in
+        outputs = cols.transfers_out
+        
+        consolidation = (inputs > 2) & (outputs <= 1)
+        single_output = (outputs == 1) | ((outputs == 0) & cols.has_to)
+        
+        return {
+            'consolidation_rate': int(consolidation.sum()) / n,
+            'micro_tx_ratio': int((cols.value_usd < 10).sum()) / n,
+            'single_output_ratio': int(single_output.sum()) / n,
+            'avg_inputs_per_tx': int(np.maximum(inputs, 1).sum()) / n,
+            'fan_in_score': int((inputs > 5).sum())  # Not normalized, used as count
+        }
+
+    @staticmethod
+    def _columnar_bot_metrics(cols: TxColumns) -> Dict[str, float]:
+        """Columnar _compute_bot_detection_advanced"""
+        if cols.count < 5:
+            return {
+                'tx_timing_precision_score': 0.0,
+                'automated_pattern_score': 0.0,
+                'value_consistency_score': 0.0,
+                'target_consistency_score': 0.0,
+                'method_consistency_score': 0.0
+            }
+        
+        scores = []
+        
+        # 1. TIMING PRECISION
+        timing_score = 0.0
+        if len(cols.timestamps) >= 3:
+            deltas = np.diff(np.sort(np.asarray(cols.timestamps)))
+            intervals = deltas[deltas > 0]
+            
+            if len(intervals) >= 3:
+                mean_interval, std_interval = mean_and_stdev(intervals.astype(np.float64))
+                if mean_interval > 0:
+                    timing_score = max(0, min(1, 1 - std_interval / mean_interval))
+                    
+                    # Exact intervals (bot signature)
+                    if mode_frequency(intervals) / len(intervals) > 0.5:
+                        timing_score = min(1.0, timing_score + 0.3)
+            
+            scores.append(timing_score)
+        
+        # 2. VALUE CONSISTENCY
+        value_consistency_score = 0.0
+        values = cols.value[cols.has_value]
+        if len(values) >= 5:
+            value_consistency_score = mode_frequency(values) / len(values)
+            scores.append(value_consistency_score)
+        
+        # 3. TARGET CONSISTENCY
+        target_consistency_score = 0.0
+        targets = cols.to_code[cols.has_to]
+        if len(targets):
+            target_consistency_score = mode_frequency(targets) / len(targets)
+            if target_consistency_score > 0.7:
+                scores.append(target_consistency_score)
+        
+        # 4. METHOD CONSISTENCY
+        method_consistency_score = 0.0
+        methods = cols.method_code[cols.method_code >= 0]
+        if len(methods):
+            method_consistency_score = mode_frequency(methods) / len(methods)
+            if method_consistency_score > 0.6:
+                scores.append(method_consistency_score)
+        
+        return {
+            'tx_timing_precision_score': timing_score,
+            'value_consistency_score': value_consistency_score,
+            'target_consistency_score': target_consistency_score,
+            'method_consistency_score': method_consistency_score,
+            'automated_pattern_score': float(np.mean(scores)) if scores else 0.0,
+        }
+
+    @staticmethod
+    def _columnar_gas_metrics(cols: TxColumns) -> Dict[str, float]:
+        """Columnar _compute_gas_optimization_metrics"""
+        if len(cols.gas_prices) < 5:
+            return {
+                'gas_price_optimization_score': 0.0,
+                'avg_gas_price': 0.0,
+                'gas_price_variance': 0.0,
+                'block_position_preference': 0.0,
+            }
+        
+        gas_prices = np.asarray(cols.gas_prices)
+        mean_gas, std_gas = mean_and_stdev(gas_prices)
+        cv_gas = std_gas / mean_gas if mean_gas > 0 else 0
+        gas_optimization_score = max(0, min(1, 1 - cv_gas))
+        
+        if mode_frequency(gas_prices) / len(gas_prices) > 0.7:
+            gas_optimization_score = min(1.0, gas_optimization_score + 0.2)
+        
+        # Missing transaction_index (NaN) never passes >= 0
+        positions = cols.tx_index[cols.tx_index >= 0]
+        block_position_preference = (
+            float(np.minimum(1.0, positions / 200).mean()) if len(positions) else 0.5
+        )
+        
+        return {
+            'gas_price_optimization_score': gas_optimization_score,
+            'avg_gas_price': mean_gas,
+            'gas_price_variance': std_gas,
+            'block_position_preference': block_position_preference,
+        }
+
+    @staticmethod
+    def _columnar_dex_metrics(cols: TxColumns, blockchain: str) -> Dict[str, float]:
+        """Columnar _compute_dex_metrics_ultimate"""
+        router_map = DEX_ROUTERS.get(blockchain, {})
+        
+        is_router = cols.to_in(set(router_map))
+        is_dex = (
+            is_router |
+            cols.method_in(SWAP_SIGNATURES) |
+            (cols.transfer_tokens >= 2)  # 2+ different tokens moved
+        )
+        
+        protocols_used = {
+            router_map[cols.to_names[code]] for code in np.unique(cols.to_code[is_router])
+        }
+        swap_count = int(is_dex.sum())
+        
+        return {
+            'dex_swap_count': swap_count,
+            'dex_protocols_used': len(protocols_used),
+            'dex_volume_usd': float(cols.transfer_value_usd[is_dex].sum()),
+            'dex_trading_ratio': swap_count / cols.count,
+            'contract_interaction_diversity': len(np.unique(cols.to_code[cols.input_len > 10])),
+            'contract_creation_count': 0,
+        }
+
+    @staticmethod
+    def _columnar_mev_metrics(cols: TxColumns) -> Dict[str, int]:
+        """Columnar _compute_mev_metrics (sandwich = same block, same target, both swaps)"""
+        if cols.count < 3:
+            return {
+                'frontrun_attempts': 0,
+                'backrun_attempts': 0,
+                'sandwich_attack_count': 0,
+            }
+        
+        # Sort by (block_number, transaction_index) - missing values sort as 0
+        order = np.lexsort((np.nan_to_num(cols.tx_index, nan=0.0), cols.block_key))
+        block = cols.block_key[order]
+        present = cols.block_present[order]
+        target = cols.to_code[order]
+        transfers = cols.transfers[order]
+        
+        def same_block(a: slice, b: slice) -> np.ndarray:
+            # Missing block_number only equals missing block_number
+            return (present[a] == present[b]) & (~present[a] | (block[a] == block[b]))
+        
+        first, middle, last = slice(None, -2), slice(1, -1), slice(2, None)
+        empty_target = cols.to_names.index('') if '' in cols.to_names else -1
+        
+        sandwiches = (
+            same_block(first, middle) & same_block(middle, last) &
+            (target[first] == target[last]) & (target[first] != empty_target) &
+            (transfers[first] >= 2) & (transfers[last] >= 2)
+        )
+        sandwich_attacks = int(sandwiches.sum())
+        
+        # Very early in block + gas paid + swap = likely frontrun
+        early_swaps = (
+            (np.nan_to_num(cols.tx_index, nan=999.0) < 3) &
+            (cols.gas_price > 0) &
+            (cols.transfers >= 2)
+        )
+        
+        return {
+            'frontrun_attempts': sandwich_attacks + int(early_swaps.sum()),
+            'backrun_attempts': sandwich_attacks,
+            'sandwich_attack_count': sandwich_attacks,
+        }
+
+    @staticmethod
+    def _columnar_defi_metrics(cols: TxColumns) -> Dict[str, int]:
+        """Columnar _compute_advanced_defi_metrics"""
+        aave = cols.to_in(AAVE_POOLS)
+        flashloans = cols.method_in(FLASHLOAN_SIGNATURES)
+        
+        return {
+            'flashloan_usage_count': int(flashloans.sum()) + int((aave & (cols.transfers >= 4)).sum()),
+            'aave_interaction_count': int(aave.sum()),
+            'compound_interaction_count': int(cols.to_in(COMPOUND_CONTRACTS).sum()),
+        }
+
+    @staticmethod
+    def _columnar_nonce_metrics(cols: TxColumns) -> Dict[str, float]:
+        """Columnar _compute_nonce_metrics (missing nonces in the observed range)"""
+        if len(cols.nonces) < 3:
+            return {
+                'nonce_gap_ratio': 0.0,
+                'nonce_consistency_score': 1.0,
+            }
+        
+        nonces = np.asarray(cols.nonces)
+        expected_nonces = (nonces.max() - nonces.min()).item() + 1
+        missing_nonces = expected_nonces - len(nonces)
+        nonce_gap_ratio = missing_nonces / expected_nonces if expected_nonces > 0 else 0
+        
+        return {
+            'nonce_gap_ratio': nonce_gap_ratio,
+            'nonce_consistency_score': 1.0 - nonce_gap_ratio,
+        }
+
     # ========================================================================
     # 🆕 UTXO METRICS (CRITICAL FIX)
     # ========================================================================
@@ -471,25 +832,8 @@ class Stage1_RawMetrics:
         🎯 dex_swap_count + contract_interaction_diversity
         Primary metrics for Trader classification
         """
-        dex_routers = {
-            'ethereum': {
-                '0x7a250d5630b4cf539739df2c5dacb4c659f2488d': 'Uniswap V2',
-                '0xe592427a0aece92de3edee1f18e0157c05861564': 'Uniswap V3',
-                '0xd9e1ce17f2641f24ae83637ab66a2cca9c378b9f': 'SushiSwap',
-                '0x1111111254eeb25477b68fb85ed929f73a960582': '1inch',
-                '0xdef1c0ded9bec7f1a1670819833240f027b25eff': '0x',
-            },
-            'bsc': {
-                '0x10ed43c718714eb63d5aa57b78b54704e256024e': 'PancakeSwap',
-            }
-        }
-        
-        swap_signatures = {
-            '0x38ed1739', '0x8803dbee', '0x7ff36ab5', '0x18cbafe5',
-            '0x791ac947', '0xc04b8d59', '0x414bf389', '0x7c025200'
-        }
-        
-        router_map = dex_routers.get(blockchain, {})
+        swap_signatures = SWAP_SIGNATURES
+        router_map = DEX_ROUTERS.get(blockchain, {})
         
         swap_count = 0
         protocols_used = set()
@@ -754,19 +1098,9 @@ class Stage1_RawMetrics:
         compound_interactions = 0
         
         # Flashloan signatures & addresses
-        flashloan_sigs = {
-            '0xab9c4b5d',  # flashLoan
-            '0x5cffe9de',  # flashLoanSimple (Aave V3)
-        }
-        
-        aave_pools = {
-            '0x7d2768de32b0b80b7a3454c06bdac94a69ddc7a9',  # Aave V2
-            '0x87870bca3f3fd6335c3f4ce8392d69350b4fa4e2',  # Aave V3
-        }
-        
-        compound_contracts = {
-            '0x3d9819210a31b4961b30ef54be2aed79b9c9cd3b',  # Compound Comptroller
-        }
+        flashloan_sigs = FLASHLOAN_SIGNATURES
+        aave_pools = AAVE_POOLS
+        compound_contracts = COMPOUND_CONTRACTS
         
         for tx in transactions:
             input_data = tx.get('input', '')
@@ -0,0 +1,169 @@
+# ============================================================================
+# core/tx_columns.py - Columnar transaction view for Stage 1
+# ============================================================================
+"""
+Transactions of one wallet as typed arrays.
+
+Stage1_RawMetrics used to walk the raw transaction dicts once per metric
+group (main loop, UTXO, bot detection, gas, DEX, MEV, DeFi, nonces), each
+time re-reading keys, lowering addresses and slicing input data.
+TxColumns parses every transaction ONCE:
+
+✅ Numeric fields as float64 / int64 arrays
+✅ Addresses and method ids interned (int32 code + name table)
+✅ Token transfers reduced to per-tx counts and USD sums
+✅ Python lists kept only where Stage1 returns them (timestamps, nonces, ...)
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+class TxColumns:
+    """Transactions of one wallet as columns (one index = one transaction)"""
+
+    def __init__(self, transactions: List[Dict[str, Any]], address: str):
+        address = address.lower()
+        n = len(transactions)
+        self.count = n
+
+        self.value = np.empty(n)
+        self.value_usd = np.empty(n)
+        self.gas_price = np.empty(n)
+        self.has_value = np.empty(n, dtype=bool)
+        self.has_to = np.empty(n, dtype=bool)
+        # 1 = incoming, -1 = outgoing, 0 = neither
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.input_len = np.empty(n, dtype=np.int64)
+        # NaN = missing (each metric applies its own default)
+        self.tx_index = np.full(n, np.nan)
+        self.block_key = np.empty(n, dtype=np.int64)
+        self.block_present = np.empty(n, dtype=bool)
+
+        self.to_code = np.empty(n, dtype=np.int32)
+        self.method_code = np.full(n, -1, dtype=np.int32)
+
+        self.transfers = np.empty(n, dtype=np.int64)
+        self.transfers_in = np.empty(n, dtype=np.int64)
+        self.transfers_out = np.empty(n, dtype=np.int64)
+        self.transfer_tokens = np.empty(n, dtype=np.int64)
+        self.transfer_value_usd = np.empty(n)
+
+        to_codes: Dict[str, int] = {}
+        method_codes: Dict[str, int] = {}
+
+        # Lists Stage1 returns as-is (original value types preserved)
+        self.timestamps: List[Any] = []
+        self.gas_prices: List[float] = []
+        self.nonces: List[Any] = []
+        self.block_numbers: List[Any] = []
+        self.inputs_per_tx: Dict[Any, Any] = {}
+        self.outputs_per_tx: Dict[Any, Any] = {}
+
+        for i, tx in enumerate(transactions):
+            tx_to_raw = tx.get('to')
+            tx_to = tx.get('to', '').lower()
+            tx_value = tx.get('value', 0)
+            gas_price = float(tx.get('gas_price', 0))
+            timestamp = tx.get('timestamp', 0)
+            nonce = tx.get('nonce', 0)
+            block = tx.get('block_number', 0)
+            input_data = tx.get('input', '')
+
+            self.value[i] = float(tx_value)
+            self.has_value[i] = bool(tx_value)
+            self.value_usd[i] = float(tx.get('value_usd', 0))
+            self.gas_price[i] = gas_price
+            self.has_to[i] = bool(tx_to_raw)
+            self.input_len[i] = len(input_data)
+
+            if timestamp:
+                self.timestamps.append(timestamp)
+            if gas_price:
+                self.gas_prices.append(gas_price)
+            if nonce is not None:
+                self.nonces.append(nonce)
+            if block:
+                self.block_numbers.append(block)
+
+            self.block_present[i] = 'block_number' in tx
+            self.block_key[i] = block or 0
+            position = tx.get('transaction_index')
+            if position is not None:
+                self.tx_index[i] = position
+
+            code = to_codes.get(tx_to)
+            if code is None:
+                code = to_codes[tx_to] = len(to_codes)
+            self.to_code[i] = code
+
+            if input_data:
+                method = input_data[:10]
+                code = method_codes.get(method)
+                if code is None:
+                    code = method_codes[method] = len(method_codes)
+                self.method_code[i] = code
+
+            if tx_to == address:
+                self.direction[i] = 1
+            elif tx.get('from', '').lower() == address:
+                self.direction[i] = -1
+            if self.direction[i]:
+                tx_hash = tx.get('hash', f'tx_{i}')
+                self.inputs_per_tx[tx_hash] = tx.get('input_count', 1)
+                self.outputs_per_tx[tx_hash] = tx.get('output_count', 1)
+
+            token_transfers = tx.get('token_transfers', [])
+            transfers_in = transfers_out = 0
+            transfer_value = 0.0
+            tokens = set()
+            for transfer in token_transfers:
+                if transfer.get('to', '').lower() == address:
+                    transfers_in += 1
+                if transfer.get('from', '').lower() == address:
+                    transfers_out += 1
+                tokens.add(transfer.get('token_address'))
+                transfer_value += transfer.get('value_usd', 0)
+            self.transfers[i] = len(token_transfers)
+            self.transfers_in[i] = transfers_in
+            self.transfers_out[i] = transfers_out
+            self.transfer_tokens[i] = len(tokens)
+            self.transfer_value_usd[i] = transfer_value
+
+        self.to_names: List[str] = list(to_codes)
+        self.method_names: List[str] = list(method_codes)
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ==================== LOOKUPS ====================
+
+    def to_in(self, addresses: set) -> np.ndarray:
+        """Lowered `to` address in `addresses` (one set lookup per distinct address)"""
+        flags = np.array([name in addresses for name in self.to_names], dtype=bool)
+        return flags[self.to_code]
+
+    def method_in(self, method_ids: set) -> np.ndarray:
+        """Method id (first 10 chars of input, lowered) in `method_ids`"""
+        flags = np.array(
+            [name.lower() in method_ids for name in self.method_names] + [False],
+            dtype=bool
+        )
+        # method_code -1 (no input) → trailing False
+        return flags[self.method_code]
+
+
+def mode_frequency(values: np.ndarray) -> int:
+    """Occurrences of the most common value (0 for empty input)"""
+    if not len(values):
+        return 0
+    _, counts = np.unique(values, return_counts=True)
+    return int(counts.max())
+
+
+def mean_and_stdev(values: np.ndarray) -> tuple:
+    """Mean and sample standard deviation (like statistics.mean/stdev)"""
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if len(values) > 1 else 0
+    return mean, std
@@ -0,0 +1,275 @@
+"""
+Persistenter, inhaltsadressierter Cache für Contract-Analysen.
+
+Schlüssel ist der Hash des analysierten Inhalts (Quellcode), nicht die
+Adresse - Proxies und Clones mit identischem Code teilen sich einen Eintrag.
+Jeder Eintrag trägt die Analyzer-Version, mit der er erzeugt wurde; ändern
+sich Regeln oder Slither-Version, wird er nicht mehr gefunden.
+
+- Backend: SQLite (Default) oder PostgreSQL über SQLAlchemy Core
+- Davor ein kleiner In-Memory-LRU
+- Ohne erreichbare Datenbank läuft der Cache nur im Speicher weiter
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, create_engine, delete, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.backend_crypto_tracker.utils.json_helpers import SafeJSONEncoder
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_URL = "sqlite:///data/contract_analysis_cache.db"
+DEFAULT_MEMORY_SIZE = 1024
+
+_metadata = MetaData()
+
+contract_analysis_cache_table = Table(
+    "contract_analysis_cache",
+    _metadata,
+    Column("namespace", String(64), primary_key=True),
+    Column("content_hash", String(64), primary_key=True),
+    Column("analyzer_version", String(128), primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("created_at", Float, nullable=False),
+)
+
+# Schlüssel pro SELECT (SQLite erlaubt nur begrenzt viele Bind-Parameter)
+SELECT_CHUNK_SIZE = 300
+
+CacheKey = Tuple[str, str, str]
+
+
+class ContractAnalysisCache:
+    """Analyse-Ergebnisse pro (Namespace, Inhalts-Hash, Analyzer-Version)"""
+
+    def __init__(self, url: Optional[str] = None, memory_size: int = DEFAULT_MEMORY_SIZE):
+        """
+        Args:
+            url: SQLAlchemy-URL (sqlite:///..., postgresql://...); "memory://" = nur In-Memory-LRU.
+                 Default: CONTRACT_ANALYSIS_CACHE_URL bzw. lokale SQLite-Datei
+            memory_size: Maximale Anzahl von Einträgen im In-Memory-LRU
+        """
+        self.url = url or os.getenv("CONTRACT_ANALYSIS_CACHE_URL", DEFAULT_CACHE_URL)
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._engine = None
+        self._persistent = not self.url.startswith("memory://")
+        self._engine_lock = asyncio.Lock()
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    # ==================== BACKEND ====================
+
+    def _create_engine(self):
+        """Engine + Tabelle anlegen (synchron, läuft im Thread)"""
+        if self.url.startswith("sqlite:///"):
+            directory = os.path.dirname(self.url[len("sqlite:///"):])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            engine = create_engine(self.url, connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine(self.url, pool_pre_ping=True)
+
+        _metadata.create_all(engine, tables=[contract_analysis_cache_table])
+        return engine
+
+    async def _get_engine(self):
+        """Lazy Engine; bei Fehlern nur noch In-Memory (einmal geloggt)"""
+        if not self._persistent:
+            return None
+        if self._engine is None:
+            async with self._engine_lock:
+                if self._engine is None and self._persistent:
+                    try:
+                        self._engine = await asyncio.to_thread(self._create_engine)
+                        logger.info(f"Contract analysis cache backed by {self._engine.dialect.name}")
+                    except Exception as e:
+                        logger.warning(f"Contract analysis cache not persistent ({self.url}): {str(e)}")
+                        self._persistent = False
+        return self._engine
+
+    def _select_rows(self, engine, keys: list) -> Dict[CacheKey, str]:
+        table = contract_analysis_cache_table
+        key_columns = tuple_(table.c.namespace, table.c.content_hash, table.c.analyzer_version)
+        rows = {}
+
+        with engine.connect() as connection:
+            for start in range(0, len(keys), SELECT_CHUNK_SIZE):
+                query = select(
+                    table.c.namespace, table.c.content_hash, table.c.analyzer_version, table.c.payload
+                ).where(key_columns.in_(keys[start:start + SELECT_CHUNK_SIZE]))
+                for row in connection.execute(query):
+                    rows[(row[0], row[1], row[2])] = row[3]
+
+        return rows
+
+    def _upsert_rows(self, engine, rows: list) -> None:
+        table = contract_analysis_cache_table
+        dialect = engine.dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            statement = insert(table).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["namespace", "content_hash", "analyzer_version"],
+                set_={"payload": statement.excluded.payload, "created_at": statement.excluded.created_at}
+            )
+            with engine.begin() as connection:
+                connection.execute(statement)
+            return
+
+        # Andere Dialekte: delete + insert in einer Transaktion
+        with engine.begin() as connection:
+            for row in rows:
+                connection.execute(delete(table).where(
+                    (table.c.namespace == row["namespace"])
+                    & (table.c.content_hash == row["content_hash"])
+                    & (table.c.analyzer_version == row["analyzer_version"])
+                ))
+            connection.execute(table.insert(), rows)
+
+    def _delete_other_versions(self, engine, namespace: str, analyzer_version: str) -> int:
+        table = contract_analysis_cache_table
+        with engine.begin() as connection:
+            result = connection.execute(delete(table).where(
+                (table.c.namespace == namespace) & (table.c.analyzer_version != analyzer_version)
+            ))
+            return result.rowcount or 0
+
+    # ==================== IN-MEMORY LRU ====================
+
+    def _remember(self, key: CacheKey, data: Any) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ==================== API ====================
+
+    async def get(self, namespace: str, content_hash: str, analyzer_version: str) -> Optional[Any]:
+        """Ergebnis für einen Inhalt holen (None bei Miss)"""
+        results = await self.get_many(namespace, [content_hash], analyzer_version)
+        return results.get(content_hash)
+
+    async def get_many(self, namespace: str, content_hashes: Iterable[str],
+                       analyzer_version: str) -> Dict[str, Any]:
+        """Ergebnisse für mehrere Inhalte (gebündelte Datenbankabfragen, z.B. für Prewarm-Jobs)"""
+        found: Dict[str, Any] = {}
+        missing = []
+
+        for digest in dict.fromkeys(content_hashes):
+            key = (namespace, digest, analyzer_version)
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[digest] = self._memory[key]
+                self.memory_hits += 1
+            else:
+                missing.append(key)
+
+        engine = await self._get_engine() if missing else None
+        if engine is not None:
+            try:
+                rows = await asyncio.to_thread(self._select_rows, engine, missing)
+            except SQLAlchemyError as e:
+                logger.warning(f"Contract analysis cache read failed: {str(e)}")
+                rows = {}
+
+            for key, payload in rows.items():
+                data = json.loads(payload)
+                self._remember(key, data)
+                found[key[1]] = data
+                self.persistent_hits += 1
+
+        self.misses += len(missing) - sum(1 for key in missing if key[1] in found)
+        return found
+
+    async def set(self, namespace: str, content_hash: str, analyzer_version: str, data: Any) -> None:
+        """Ergebnis für einen Inhalt speichern (Speicher + Datenbank)"""
+        await self.set_many(namespace, {content_hash: data}, analyzer_version)
+
+    async def set_many(self, namespace: str, results: Dict[str, Any], analyzer_version: str) -> None:
+        """Mehrere Ergebnisse in einem Upsert speichern"""
+        if not results:
+            return
+
+        rows = []
+        now = time.time()
+        for digest, data in results.items():
+            self._remember((namespace, digest, analyzer_version), data)
+            rows.append({
+                "namespace": namespace,
+                "content_hash": digest,
+                "analyzer_version": analyzer_version,
+                "payload": json.dumps(data, cls=SafeJSONEncoder),
+                "created_at": now,
+            })
+
+        engine = await self._get_engine()
+        if engine is not None:
+            try:
+                await asyncio.to_thread(self._upsert_rows, engine, rows)
+            except SQLAlchemyError as e:
+                logger.warning(f"Contract analysis cache write failed: {str(e)}")
+
+    async def prune(self, namespace: str, analyzer_version: str) -> int:
+        """Einträge eines Namespace mit veralteter Analyzer-Version löschen"""
+        for key in [key for key in self._memory if key[0] == namespace and key[2] != analyzer_version]:
+            del self._memory[key]
+
+        engine = await self._get_engine()
+        if engine is None:
+            return 0
+        try:
+            removed = await asyncio.to_thread(self._delete_other_versions, engine, namespace, analyzer_version)
+        except SQLAlchemyError as e:
+            logger.warning(f"Contract analysis cache prune failed: {str(e)}")
+            return 0
+
+        if removed:
+            logger.info(f"Pruned {removed} outdated '{namespace}' entries from contract analysis cache")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache-Statistiken"""
+        total_requests = self.memory_hits + self.persistent_hits + self.misses
+        hit_rate = ((self.memory_hits + self.persistent_hits) / total_requests * 100) if total_requests > 0 else 0
+
+        return {
+            'backend': self._engine.dialect.name if self._engine is not None else 'memory',
+            'memory_size': len(self._memory),
+            'max_memory_size': self.memory_size,
+            'memory_hits': self.memory_hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': f"{hit_rate:.2f}%",
+        }
+
+    async def close(self) -> None:
+        if self._engine is not None:
+            await asyncio.to_thread(self._engine.dispose)
+            self._engine = None
+
+
+# Globale Instanz (lazy - die Datenbank wird erst beim ersten Zugriff geöffnet)
+_analysis_cache: Optional[ContractAnalysisCache] = None
+
+
+def get_contract_analysis_cache() -> ContractAnalysisCache:
+    """Prozessweiter Analyse-Cache"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = ContractAnalysisCache()
+    return _analysis_cache
@@ -1,11 +1,13 @@
 import os
 import json
 import asyncio
+import hashlib
 import subprocess
-import tempfile
 import aiohttp
 import re
-from typing import Dict, List, Optional, Any, Union, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Any, Union, Tuple
 from datetime import datetime
 from pathlib import Path
 from functools import lru_cache
@@ -13,9 +15,20 @@ from functools import lru_cache
 from app.core.backend_crypto_tracker.utils.logger import get_logger
 from app.core.backend_crypto_tracker.utils.exceptions import APIException, NotFoundException, SecurityScanException
 from app.core.backend_crypto_tracker.services.contract.contract_metadata import ContractMetadataService
+from app.core.backend_crypto_tracker.services.contract.analysis_cache import ContractAnalysisCache, get_contract_analysis_cache
+from app.core.backend_crypto_tracker.services.contract.source_index import ContractSource, PatternScanner
 
 logger = get_logger(__name__)
 
+# Fehlgeschlagene Teilanalysen des laufenden Scans (deren Fallback-Werte dürfen nicht persistiert werden)
+_analysis_failures: ContextVar[Optional[List[str]]] = ContextVar("analysis_failures", default=None)
+
+# Explorer-API pro Chain: (Basis-URL, Env-Variable des API-Keys)
+EXPLORER_APIS = {
+    "ethereum": ("https://api.etherscan.io/api", "ETHERSCAN_API_KEY"),
+    "bsc": ("https://api.bscscan.com/api", "BSCSCAN_API_KEY"),
+}
+
 class SecurityScanner:
     """Service für die Analyse von Smart Contracts auf Sicherheitslücken."""
     
@@ -203,12 +216,60 @@ class SecurityScanner:
         }
     }
     
-    def __init__(self, cache_ttl: int = 3600):
+    # Kritische Funktionen, die Zugriffskontrolle benötigen
+    CRITICAL_FUNCTIONS = [
+        "mint", "burn", "pause", "unpause", "withdraw", "transferownership",
+        "setfee", "settax", "setlimit", "setrate", "setaddress", "changeowner"
+    ]
+    
+    # Version der quellcodebasierten Auswertung - bei Logik-Änderungen erhöhen
+    # (Regeländerungen und Slither-Updates invalidieren den persistenten Cache automatisch)
+    ANALYZER_VERSION = "3"
+    # Version der Slither-Läufe - v2: Slither holt den Contract selbst vom Explorer
+    # (Compiler-Version, Optimizer-Settings, Multi-File-Layout bleiben erhalten)
+    SLITHER_RUN_VERSION = "2"
+    
+    # Namespaces im persistenten Analyse-Cache
+    CONTENT_ANALYSIS_NAMESPACE = "security_scan"
+    SLITHER_NAMESPACE = "slither"
+    
+    ACCESS_CONTROL_MODIFIERS = ["onlyOwner", "onlyAdmin", "whenNotPaused", "whenPaused", "internal", "private"]
+    
+    # Quellcode-Checks für Access Control, Economic Risks und Code Quality (case-sensitive)
+    SOURCE_CHECKS = {
+        "tx_origin": r"tx\.origin",
+        "selfdestruct": r"selfdestruct\s*\(",
+        "delegatecall": r"delegatecall\s*\(",
+        "only_owner": r"onlyOwner",
+        "pause": r"pause\s*\(",
+        "unpause": r"unpause\s*\(",
+        "mint": r"mint\s*\(",
+        "max_supply": r"_maxSupply",
+        "burn": r"burn\s*\(",
+        "withdraw": r"withdraw\s*\(",
+        "fee_assignment": r"fee\s*=\s*[0-9]+",
+        "fee_above_10": r"fee\s*>\s*10",
+        "transfer": r"transfer\s*\(",
+        "require_false": r"require\s*\(\s*false",
+        "anti_whale": r"balanceOf\s*\(\s*msg\.sender\s*\)\s*>\s*max",
+        # \.(call|send|transfer|delegatecall)\s*\( - je Alternative eine Regel (gleiche Trefferzahl)
+        "external_call": r"\.call\s*\(",
+        "external_send": r"\.send\s*\(",
+        "external_transfer": r"\.transfer\s*\(",
+        "external_delegatecall": r"\.delegatecall\s*\(",
+        "function": r"function\s+\w+\s*\(",
+        "modifier": r"modifier\s+\w+\s*\(",
+        "event": r"event\s+\w+\s*\(",
+        "inheritance": r"is\s+\w+",
+    }
+    
+    def __init__(self, cache_ttl: int = 3600, analysis_cache: Optional[ContractAnalysisCache] = None):
         """
         Initialisiere Scanner und Regeln.
         
         Args:
             cache_ttl: Cache Time-To-Live in Sekunden
+            analysis_cache: Persistenter Analyse-Cache (Default: prozessweite Instanz)
         """
         # Initialisiere Contract-Metadaten-Service
         self.metadata_service = ContractMetadataService()
@@ -272,6 +333,19 @@ class SecurityScanner:
         
         # Cache für Analyseergebnisse
         self._cache = {}
+        
+        # Laufende Ladevorgänge/Analysen (gleichzeitige Aufrufe teilen sich ein Ergebnis)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        # Kombinierter Pattern-Scanner (lazy, da vulnerability_patterns anpassbar sind)
+        self._pattern_scanner: Optional[PatternScanner] = None
+        
+        # Persistenter, inhaltsadressierter Cache (überlebt Neustarts, geteilt zwischen Instanzen)
+        self.analysis_cache = analysis_cache or get_contract_analysis_cache()
+        self._slither_version: Optional[str] = None
+        self._analyzer_version: Optional[str] = None
+        # Letzter Slither-Fehler (z.B. Compile-Fehler) pro Code-Hash bzw. Adresse - landet im Report
+        self._slither_errors: Dict[str, str] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -285,6 +359,27 @@ class SecurityScanner:
             await self.session.close()
         await self.metadata_service.__aexit__(exc_type, exc_val, exc_tb)
     
+    def _analysis_failed(self, error_msg: str) -> None:
+        """Fehler einer Teilanalyse loggen und für den laufenden Scan merken."""
+        logger.error(error_msg)
+        failures = _analysis_failures.get()
+        if failures is not None:
+            failures.append(error_msg)
+    
+    @contextmanager
+    def _collect_failures(self) -> Iterator[List[str]]:
+        """Sammelt Teilanalyse-Fehler (verschachtelt: gemeinsame Liste des äußeren Scans)."""
+        failures = _analysis_failures.get()
+        if failures is not None:
+            yield failures
+            return
+        failures = []
+        token = _analysis_failures.set(failures)
+        try:
+            yield failures
+        finally:
+            _analysis_failures.reset(token)
+    
     def _get_cache_key(self, method_name: str, *args) -> str:
         """Erzeuge einen Cache-Schlüssel für eine Methode mit ihren Argumenten."""
         return f"{method_name}:{':'.join(str(arg) for arg in args)}"
@@ -293,6 +388,68 @@ class SecurityScanner:
         """Prüfe, ob ein Cache-Eintrag noch gültig ist."""
         return (datetime.now().timestamp() - timestamp) < self.cache_ttl
     
+    async def _single_flight(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Führe factory() pro key nur einmal gleichzeitig aus - weitere Aufrufer warten auf dasselbe Ergebnis."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    def _get_pattern_scanner(self) -> PatternScanner:
+        """Alle Quellcode-Patterns als ein kombinierter Scanner."""
+        if self._pattern_scanner is None:
+            rules = {}
+            for swc_id, patterns in self.vulnerability_patterns.items():
+                for i, pattern in enumerate(patterns):
+                    rules[("vulnerability", swc_id, i)] = (pattern, re.IGNORECASE)
+            for func in self.CRITICAL_FUNCTIONS:
+                rules[("critical_function", func)] = (rf"function\s+{func}\s*\(", re.IGNORECASE)
+            for name, pattern in self.SOURCE_CHECKS.items():
+                rules[name] = (pattern, 0)
+            self._pattern_scanner = PatternScanner(rules)
+        return self._pattern_scanner
+    
+    async def _get_slither_version(self) -> str:
+        """Installierte Slither-Version ("unavailable", wenn Slither nicht ausführbar ist)."""
+        if self._slither_version is None:
+            async def detect() -> str:
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        self.slither_path, "--version",
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+                    stdout, _ = await process.communicate()
+                    if process.returncode == 0 and stdout.strip():
+                        return stdout.decode().strip()
+                except OSError:
+                    pass
+                return "unavailable"
+            
+            self._slither_version = await self._single_flight("_get_slither_version", detect)
+        return self._slither_version
+    
+    async def _get_slither_cache_version(self) -> str:
+        """Version der persistierten Slither-Ergebnisse (Lauf-Version + Slither-Version)."""
+        return f"{self.SLITHER_RUN_VERSION}:{await self._get_slither_version()}"
+    
+    async def _get_analyzer_version(self) -> str:
+        """Version der quellcodebasierten Analysen: Code-Version + Regel-Fingerprint + Slither-Version."""
+        if self._analyzer_version is None:
+            rules = json.dumps([
+                self.vulnerability_patterns,
+                self.CRITICAL_FUNCTIONS,
+                self.ACCESS_CONTROL_MODIFIERS,
+                self.SOURCE_CHECKS,
+                self.SWC_REGISTRY
+            ], sort_keys=True)
+            fingerprint = hashlib.sha256(rules.encode()).hexdigest()[:12]
+            slither_version = await self._get_slither_version()
+            self._analyzer_version = f"{self.ANALYZER_VERSION}:{fingerprint}:slither-{slither_version}"
+        return self._analyzer_version
+    
     async def scan_contract_security(self, address: str, chain: str) -> Dict[str, Any]:
         """
         Führe eine umfassende Sicherheitsanalyse eines Smart Contracts durch.
@@ -313,29 +470,24 @@ class SecurityScanner:
             
             logger.info(f"Starting security scan for contract {address} on {chain}")
             
-            # Hole Contract-Metadaten
-            metadata = await self.metadata_service.get_contract_metadata(address, chain)
-            
-            # Führe Vulnerability-Check durch
-            vulnerabilities = await self.check_vulnerabilities(address, chain)
-            
-            # Analysiere Zugriffskontrollen
-            access_control_issues = await self.analyze_access_control(address, chain)
-            
-            # Analysiere wirtschaftliche Risiken
-            economic_risks = await self.analyze_economic_risks(address, chain)
-            
-            # Berechne Verifizierungs-Konfidenz
-            verification_confidence = await self.calculate_verification_confidence(address, chain)
+            # Hole Contract-Metadaten und Quellcode (einmal geladen, indiziert und gescannt)
+            metadata, source = await asyncio.gather(
+                self.metadata_service.get_contract_metadata(address, chain),
+                self._get_contract_source(address, chain)
+            )
             
-            # Berechne Code-Qualitäts-Metriken
-            code_quality_metrics = await self._analyze_code_quality(address, chain)
+            # Quellcode-Analysen (persistent pro Code-Hash) und adressbezogene Konfidenz parallel
+            content_analysis, verification_confidence = await asyncio.gather(
+                self._get_content_analysis(address, chain, source),
+                self.calculate_verification_confidence(address, chain)
+            )
             
             result = {
-                "vulnerabilities": vulnerabilities,
-                "code_quality_metrics": code_quality_metrics,
-                "access_control_issues": access_control_issues,
-                "economic_risks": economic_risks,
+                "vulnerabilities": content_analysis["vulnerabilities"],
+                "code_quality_metrics": content_analysis["code_quality_metrics"],
+                "access_control_issues": content_analysis["access_control_issues"],
+                "economic_risks": content_analysis["economic_risks"],
+                "analysis_errors": content_analysis.get("analysis_errors", []),
                 "verification_confidence": verification_confidence
             }
             
@@ -352,6 +504,123 @@ class SecurityScanner:
             logger.error(error_msg)
             raise SecurityScanException(error_msg) from e
     
+    async def _get_content_analysis(self, address: str, chain: str,
+                                    source: Optional[ContractSource]) -> Dict[str, Any]:
+        """
+        Quellcodebasierte Analysen (Vulnerabilities, Access Control, Economic Risks, Code Quality).
+        
+        Persistent pro Quellcode-Hash und Analyzer-Version gecacht - Clones und Proxies
+        mit identischem Code werden nur einmal analysiert, auch über Neustarts hinweg.
+        """
+        if source is None or not source.cacheable:
+            # Kein Quellcode (nicht verifiziert, Solana, Sui) oder Proxy ohne auflösbare
+            # Implementierung - nichts, worauf sich ein Inhalts-Key bilden ließe
+            return await self._analyze_content(address, chain)
+        
+        analyzer_version = await self._get_analyzer_version()
+        cached = await self.analysis_cache.get(
+            self.CONTENT_ANALYSIS_NAMESPACE, source.content_hash, analyzer_version
+        )
+        if cached is not None:
+            logger.info(f"Using persistent analysis results for {address} on {chain} (code {source.content_hash[:12]})")
+            return cached
+        
+        async def analyze_and_store() -> Dict[str, Any]:
+            analysis = await self._analyze_content(address, chain)
+            # Nur vollständige Analysen persistieren: Slither gelaufen (oder nicht installiert)
+            # und keine Teilanalyse ist auf ihren Fallback-Wert ausgewichen
+            if analysis["analysis_errors"]:
+                logger.warning(f"Not caching analysis for {address} on {chain}: {len(analysis['analysis_errors'])} sub-analyses failed")
+            elif await self._slither_settled(source):
+                await self.analysis_cache.set(
+                    self.CONTENT_ANALYSIS_NAMESPACE, source.content_hash, analyzer_version, analysis
+                )
+            return analysis
+        
+        # Clones im selben Batch teilen sich eine laufende Analyse
+        return await self._single_flight(
+            self._get_cache_key("_get_content_analysis", source.content_hash), analyze_and_store
+        )
+    
+    async def _analyze_content(self, address: str, chain: str) -> Dict[str, Any]:
+        """Unabhängige Quellcode-Analysen parallel - alle teilen sich das Quellcode-Artefakt."""
+        with self._collect_failures() as failures:
+            (
+                vulnerabilities,
+                access_control_issues,
+                economic_risks,
+                code_quality_metrics
+            ) = await asyncio.gather(
+                self.check_vulnerabilities(address, chain),
+                self.analyze_access_control(address, chain),
+                self.analyze_economic_risks(address, chain),
+                self._analyze_code_quality(address, chain)
+            )
+        
+        # Fehlgeschlagene Analysen (z.B. Slither-Compile-Fehler) sichtbar machen statt still zu verwerfen
+        source = await self._get_contract_source(address, chain)
+        slither_error = self._slither_errors.get(source.content_hash if source else address)
+        analysis_errors = [{"tool": "analyzer", "error": error} for error in failures]
+        if slither_error:
+            analysis_errors.append({"tool": "slither", "error": slither_error})
+        
+        return {
+            "vulnerabilities": vulnerabilities,
+            "code_quality_metrics": code_quality_metrics,
+            "access_control_issues": access_control_issues,
+            "economic_risks": economic_risks,
+            "analysis_errors": analysis_errors
+        }
+    
+    async def _slither_settled(self, source: ContractSource) -> bool:
+        """Liegt ein Slither-Ergebnis für diesen Code vor (oder ist Slither nicht installiert)?"""
+        if await self._get_slither_version() == "unavailable":
+            return True
+        cached = await self.analysis_cache.get(
+            self.SLITHER_NAMESPACE, source.content_hash, await self._get_slither_cache_version()
+        )
+        return cached is not None
+    
+    async def prewarm_cache(self, contracts: Iterable[Tuple[str, str]], concurrency: int = 4) -> Dict[str, int]:
+        """
+        Bulk-Job: persistenten Analyse-Cache für eine Liste von Contracts füllen.
+        
+        Args:
+            contracts: (Adresse, Chain)-Paare
+            concurrency: Maximale Anzahl parallel analysierter Contracts
+            
+        Returns:
+            Zähler: cached (bereits vorhanden), analyzed, no_source, failed
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        stats = {"cached": 0, "analyzed": 0, "no_source": 0, "failed": 0}
+        
+        async def prewarm(address: str, chain: str) -> None:
+            async with semaphore:
+                try:
+                    source = await self._get_contract_source(address, chain)
+                    if source is None:
+                        stats["no_source"] += 1
+                        return
+                    
+                    analyzer_version = await self._get_analyzer_version()
+                    if await self.analysis_cache.get(
+                        self.CONTENT_ANALYSIS_NAMESPACE, source.content_hash, analyzer_version
+                    ) is not None:
+                        stats["cached"] += 1
+                        return
+                    
+                    await self._get_content_analysis(address, chain, source)
+                    stats["analyzed"] += 1
+                except Exception as e:
+                    logger.error(f"Failed to prewarm analysis cache for {address} on {chain}: {str(e)}")
+                    stats["failed"] += 1
+        
+        await asyncio.gather(*(prewarm(address, chain) for address, chain in contracts))
+        
+        logger.info(f"Prewarmed contract analysis cache: {stats}")
+        return stats
+    
     async def check_vulnerabilities(self, address: str, chain: str) -> List[Dict]:
         """
         Prüfe auf bekannte Vulnerabilities in einem Smart Contract.
@@ -370,35 +639,10 @@ class SecurityScanner:
                 logger.info(f"Using cached vulnerability check results for {address} on {chain}")
                 return self._cache[cache_key]["data"]
             
-            logger.info(f"Checking vulnerabilities for contract {address} on {chain}")
-            
-            vulnerabilities = []
-            
-            if chain.lower() in ["ethereum", "bsc"]:
-                # Verwende Slither für Solidity-Contracts
-                vulnerabilities = await self._check_solidity_vulnerabilities(address, chain)
-                
-                # Führe zusätzliche Regex-basierte Prüfungen durch
-                regex_vulnerabilities = await self._check_vulnerabilities_with_regex(address, chain)
-                vulnerabilities.extend(regex_vulnerabilities)
-                
-            elif chain.lower() == "solana":
-                # Solana-spezifische Vulnerability-Prüfungen
-                vulnerabilities = await self._check_solana_vulnerabilities(address, chain)
-            elif chain.lower() == "sui":
-                # Sui-spezifische Vulnerability-Prüfungen
-                vulnerabilities = await self._check_sui_vulnerabilities(address, chain)
-            else:
-                raise ValueError(f"Unsupported blockchain: {chain}")
-            
-            # Entferne Duplikate basierend auf ID und Zeilennummer
-            unique_vulnerabilities = []
-            seen = set()
-            for vuln in vulnerabilities:
-                key = (vuln.get("id", ""), vuln.get("line_number", 0))
-                if key not in seen:
-                    seen.add(key)
-                    unique_vulnerabilities.append(vuln)
+            # scan_contract_security und calculate_verification_confidence fragen parallel an
+            unique_vulnerabilities = await self._single_flight(
+                cache_key, lambda: self._collect_vulnerabilities(address, chain)
+            )
             
             # Speichere im Cache
             self._cache[cache_key] = {
@@ -406,31 +650,61 @@ class SecurityScanner:
                 "data": unique_vulnerabilities
             }
             
-            logger.info(f"Found {len(unique_vulnerabilities)} vulnerabilities for contract {address} on {chain}")
             return unique_vulnerabilities
         except Exception as e:
             error_msg = f"Failed to check vulnerabilities for {address} on {chain}: {str(e)}"
             logger.error(error_msg)
             raise SecurityScanException(error_msg) from e
     
+    async def _collect_vulnerabilities(self, address: str, chain: str) -> List[Dict]:
+        """Sammle Vulnerabilities aller Prüfungen einer Chain (ohne Duplikate)."""
+        logger.info(f"Checking vulnerabilities for contract {address} on {chain}")
+        
+        vulnerabilities = []
+        
+        if chain.lower() in ["ethereum", "bsc"]:
+            # Slither und Regex-Prüfungen parallel (beide auf demselben Quellcode-Artefakt)
+            vulnerabilities, regex_vulnerabilities = await asyncio.gather(
+                self._check_solidity_vulnerabilities(address, chain),
+                self._check_vulnerabilities_with_regex(address, chain)
+            )
+            vulnerabilities.extend(regex_vulnerabilities)
+            
+        elif chain.lower() == "solana":
+            # Solana-spezifische Vulnerability-Prüfungen
+            vulnerabilities = await self._check_solana_vulnerabilities(address, chain)
+        elif chain.lower() == "sui":
+            # Sui-spezifische Vulnerability-Prüfungen
+            vulnerabilities = await self._check_sui_vulnerabilities(address, chain)
+        else:
+            raise ValueError(f"Unsupported blockchain: {chain}")
+        
+        # Entferne Duplikate basierend auf ID und Zeilennummer
+        unique_vulnerabilities = []
+        seen = set()
+        for vuln in vulnerabilities:
+            key = (vuln.get("id", ""), vuln.get("line_number", 0))
+            if key not in seen:
+                seen.add(key)
+                unique_vulnerabilities.append(vuln)
+        
+        logger.info(f"Found {len(unique_vulnerabilities)} vulnerabilities for contract {address} on {chain}")
+        return unique_vulnerabilities
+    
     async def _check_vulnerabilities_with_regex(self, address: str, chain: str) -> List[Dict]:
         """Prüfe auf Vulnerabilities mit Regex-Patterns im Contract-Quellcode."""
         try:
             vulnerabilities = []
             
-            # Hole Contract-Quellcode
-            source_code = await self._get_contract_source_code(address, chain)
-            if not source_code:
+            # Hole Contract-Quellcode (Treffer stammen aus dem kombinierten Scan)
+            source = await self._get_contract_source(address, chain)
+            if not source or not source.source:
                 return vulnerabilities
             
             # Prüfe für jedes Vulnerability-Pattern
             for swc_id, patterns in self.vulnerability_patterns.items():
-                for pattern in patterns:
-                    matches = re.finditer(pattern, source_code, re.IGNORECASE)
-                    for match in matches:
-                        # Hole Zeilennummer
-                        line_number = source_code[:match.start()].count('\n') + 1
-                        
+                for i in range(len(patterns)):
+                    for _, line_number in source.lines(("vulnerability", swc_id, i)):
                         # Hole Vulnerability-Details
                         vuln_details = self.SWC_REGISTRY.get(swc_id, {})
                         
@@ -447,179 +721,251 @@ class SecurityScanner:
             return vulnerabilities
         except Exception as e:
             error_msg = f"Failed to check vulnerabilities with regex for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return []
     
-    async def _get_contract_source_code(self, address: str, chain: str) -> Optional[str]:
-        """Hole den Quellcode eines Contracts."""
+    async def _get_contract_source(self, address: str, chain: str) -> Optional[ContractSource]:
+        """
+        Hole den Quellcode EINMAL pro (Adresse, Chain) inkl. Zeilen-Index und Pattern-Scan.
+        
+        Alle Analysen (Regex-Checks, Access Control, Economic Risks, Code Quality,
+        Slither) teilen sich dieses Artefakt.
+        """
         try:
             # Prüfe Cache
-            cache_key = self._get_cache_key("_get_contract_source_code", address, chain)
+            cache_key = self._get_cache_key("_get_contract_source", address, chain)
             if cache_key in self._cache and self._is_cache_valid(self._cache[cache_key]["timestamp"]):
                 return self._cache[cache_key]["data"]
             
-            source_code = None
-            
-            if chain.lower() == "ethereum":
-                source_code = await self._get_ethereum_source_code(address)
-            elif chain.lower() == "bsc":
-                source_code = await self._get_bsc_source_code(address)
+            source = await self._single_flight(
+                cache_key, lambda: self._load_contract_source(address, chain)
+            )
             
             # Speichere im Cache
             self._cache[cache_key] = {
                 "timestamp": datetime.now().timestamp(),
-                "data": source_code
+                "data": source
             }
             
-            return source_code
+            return source
         except Exception as e:
             error_msg = f"Failed to get source code for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return None
     
-    async def _get_ethereum_source_code(self, address: str) -> Optional[str]:
-        """Hole den Quellcode eines Ethereum-Contracts."""
-        try:
-            etherscan_api_key = os.getenv("ETHERSCAN_API_KEY")
-            if not etherscan_api_key:
-                logger.warning("ETHERSCAN_API_KEY not set, cannot fetch Ethereum source code")
+    async def _load_contract_source(self, address: str, chain: str) -> Optional[ContractSource]:
+        """
+        Lade den Quellcode und scanne ihn (CPU-Arbeit im Thread).
+        
+        Bei Proxies geht der Code-Hash der aufgelösten Implementierung in den
+        Inhalts-Key ein - sonst teilten sich alle Proxies mit identischem
+        Proxy-Code (z.B. ERC1967Proxy) ein Analyse-Ergebnis.
+        """
+        record = await self._get_explorer_record(address, chain)
+        if record is None:
+            return None
+        
+        implementation_code_hash = None
+        cacheable = True
+        implementation = (record.get("Implementation") or "").strip().lower()
+        if record.get("Proxy") == "1" and implementation:
+            code = await self._get_explorer_code(implementation, chain)
+            if code:
+                implementation_code_hash = hashlib.sha256(code.lower().encode()).hexdigest()
+            else:
+                logger.warning(f"Could not resolve implementation {implementation} of proxy {address} - analysis will not be cached")
+                cacheable = False
+        
+        return await asyncio.to_thread(
+            ContractSource, address, chain, record.get("SourceCode", ""), self._get_pattern_scanner(),
+            implementation_code_hash, cacheable
+        )
+    
+    async def _explorer_get(self, chain: str, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """GET auf die Explorer-API der Chain (None ohne API-Key oder bei HTTP-Fehler)."""
+        explorer = EXPLORER_APIS.get(chain.lower())
+        if explorer is None:
+            return None
+        
+        url, api_key_env = explorer
+        api_key = os.getenv(api_key_env)
+        if not api_key:
+            logger.warning(f"{api_key_env} not set, cannot query the {chain} explorer")
+            return None
+        
+        if not self.session:
+            self.session = aiohttp.ClientSession()
+        
+        async with self.session.get(url, params={**params, "apikey": api_key}) as response:
+            if response.status != 200:
                 return None
-            
-            params = {
+            return await response.json()
+    
+    async def _get_explorer_record(self, address: str, chain: str) -> Optional[Dict[str, Any]]:
+        """getsourcecode-Eintrag eines verifizierten Contracts (Quellcode, Proxy, Implementation, ...)."""
+        try:
+            data = await self._explorer_get(chain, {
                 "module": "contract",
                 "action": "getsourcecode",
-                "address": address,
-                "apikey": etherscan_api_key
-            }
-            
-            url = "https://api.etherscan.io/api"
-            
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-            
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data["status"] == "1" and data["result"]:
-                        contract_data = data["result"][0]
-                        if contract_data.get("ContractName", "") != "":
-                            return contract_data.get("SourceCode", "")
-            
+                "address": address
+            })
+            if data and data.get("status") == "1" and data.get("result"):
+                contract_data = data["result"][0]
+                if contract_data.get("ContractName", "") != "":
+                    return contract_data
             return None
         except Exception as e:
-            error_msg = f"Failed to get Ethereum source code for {address}: {str(e)}"
-            logger.error(error_msg)
+            error_msg = f"Failed to get {chain} source code for {address}: {str(e)}"
+            self._analysis_failed(error_msg)
             return None
     
-    async def _get_bsc_source_code(self, address: str) -> Optional[str]:
-        """Hole den Quellcode eines BSC-Contracts."""
+    async def _get_explorer_code(self, address: str, chain: str) -> Optional[str]:
+        """Deployter Bytecode (eth_getCode über den Explorer-Proxy); None, wenn kein Code."""
         try:
-            bscscan_api_key = os.getenv("BSCSCAN_API_KEY")
-            if not bscscan_api_key:
-                logger.warning("BSCSCAN_API_KEY not set, cannot fetch BSC source code")
-                return None
-            
-            params = {
-                "module": "contract",
-                "action": "getsourcecode",
+            data = await self._explorer_get(chain, {
+                "module": "proxy",
+                "action": "eth_getCode",
                 "address": address,
-                "apikey": bscscan_api_key
-            }
-            
-            url = "https://api.bscscan.com/api"
-            
-            if not self.session:
-                self.session = aiohttp.ClientSession()
-            
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data["status"] == "1" and data["result"]:
-                        contract_data = data["result"][0]
-                        if contract_data.get("ContractName", "") != "":
-                            return contract_data.get("SourceCode", "")
-            
+                "tag": "latest"
+            })
+            code = (data or {}).get("result")
+            if isinstance(code, str) and code.startswith("0x") and len(code) > 2:
+                return code
             return None
         except Exception as e:
-            error_msg = f"Failed to get BSC source code for {address}: {str(e)}"
-            logger.error(error_msg)
+            logger.error(f"Failed to get {chain} bytecode for {address}: {str(e)}")
             return None
     
+    async def _get_contract_source_code(self, address: str, chain: str) -> Optional[str]:
+        """Hole den Quellcode eines Contracts."""
+        source = await self._get_contract_source(address, chain)
+        return source.source if source else None
+    
+    async def _get_abi(self, address: str, chain: str) -> Optional[str]:
+        """ABI über den Metadaten-Service (gleichzeitige Anfragen teilen sich einen Request)."""
+        return await self._single_flight(
+            self._get_cache_key("_get_abi", address, chain),
+            lambda: self.metadata_service.get_abi(address, chain)
+        )
+    
     async def _check_solidity_vulnerabilities(self, address: str, chain: str) -> List[Dict]:
         """Prüfe auf Vulnerabilities in Solidity-Contracts mit Slither."""
         try:
             # Hole Contract-ABI
-            abi = await self.metadata_service.get_abi(address, chain)
+            abi = await self._get_abi(address, chain)
             if not abi:
                 logger.warning(f"No ABI available for contract {address} on {chain}")
                 return []
             
-            # Erstelle eine temporäre Datei für die ABI
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as abi_file:
-                abi_file.write(abi)
-                abi_path = abi_file.name
+            # Slither-Ergebnisse persistent pro Code-Hash und Slither-Version
+            source = await self._get_contract_source(address, chain)
+            if source is None or not source.cacheable:
+                return await self._run_slither(address, chain, source) or []
+            
+            slither_version = await self._get_slither_cache_version()
+            cached = await self.analysis_cache.get(self.SLITHER_NAMESPACE, source.content_hash, slither_version)
+            if cached is not None:
+                return cached
+            
+            async def run_and_store() -> Optional[List[Dict]]:
+                vulnerabilities = await self._run_slither(address, chain, source)
+                if vulnerabilities is not None:
+                    await self.analysis_cache.set(
+                        self.SLITHER_NAMESPACE, source.content_hash, slither_version, vulnerabilities
+                    )
+                return vulnerabilities
+            
+            vulnerabilities = await self._single_flight(
+                self._get_cache_key("_run_slither", source.content_hash), run_and_store
+            )
+            return vulnerabilities or []
+        except Exception as e:
+            error_msg = f"Failed to check Solidity vulnerabilities for {address} on {chain}: {str(e)}"
+            self._analysis_failed(error_msg)
+            return []
+    
+    async def _run_slither(self, address: str, chain: str,
+                           source: Optional[ContractSource]) -> Optional[List[Dict]]:
+        """
+        Führe Slither auf der Contract-Adresse aus.
+        
+        Slither (crytic-compile) lädt den verifizierten Contract selbst vom
+        Explorer - mit Compiler-Version, Optimizer-Settings und Multi-File-
+        Layout. Eine lose .sol-Datei würde all das verlieren und oft gar nicht
+        kompilieren.
+        
+        Returns:
+            Vulnerabilities oder None, wenn Slither fehlschlägt (solche Läufe werden
+            nicht gecacht; der Fehler wird für den Report gemerkt)
+        """
+        error_key = source.content_hash if source else address
+        
+        def failed(message: str) -> None:
+            logger.error(f"Slither failed for {address} on {chain}: {message}")
+            self._slither_errors[error_key] = message
+            return None
+        
+        try:
+            if chain.lower() == "ethereum":
+                target, api_key_option, api_key_env = address, "--etherscan-apikey", "ETHERSCAN_API_KEY"
+            else:
+                target, api_key_option, api_key_env = f"bsc:{address}", "--bscan-apikey", "BSCSCAN_API_KEY"
+            
+            api_key = os.getenv(api_key_env)
+            if not api_key:
+                return failed(f"{api_key_env} not set - cannot fetch verified source with compiler settings")
+            
+            cmd = [self.slither_path, target, "--json", "-", "--detect", "all", api_key_option, api_key]
+            
+            logger.info(f"Running Slither for {target}")
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await process.communicate()
             
+            # Slither beendet sich auch bei Findings mit Code != 0 - maßgeblich ist die JSON-Ausgabe
             try:
-                # Führe Slither aus, um Vulnerabilities zu erkennen
-                cmd = [
-                    self.slither_path,
-                    address,
-                    "--json",
-                    "-",
-                    "--detect",
-                    "all"
-                ]
-                
-                # Füge API-Schlüssel hinzu, falls verfügbar
-                api_key = os.getenv("ETHERSCAN_API_KEY") if chain.lower() == "ethereum" else os.getenv("BSCSCAN_API_KEY")
-                if api_key:
-                    cmd.extend(["--etherscan-apikey", api_key])
-                
-                logger.info(f"Running Slither with command: {' '.join(cmd)}")
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
+                slither_results = json.loads(stdout.decode())
+            except json.JSONDecodeError:
+                stderr_lines = stderr.decode().strip().splitlines()
+                return failed(
+                    f"exit code {process.returncode}, no JSON output"
+                    + (f": {stderr_lines[-1]}" if stderr_lines else "")
                 )
+            
+            if not slither_results.get("success", True):
+                # Compile-Fehler u.ä.: kein Ergebnis, aber im Report sichtbar
+                return failed(str(slither_results.get("error") or "unknown error").strip().splitlines()[0])
+            
+            detectors = slither_results.get("results", {}).get("detectors", slither_results.get("detectors", []))
+            
+            # Konvertiere Slither-Ergebnisse in unser Format
+            vulnerabilities = []
+            for detector_result in detectors:
+                # Mappe Slither-Detector zu SWC-ID, falls möglich
+                swc_id = self._map_slither_to_swc(detector_result.get("check", ""))
                 
-                stdout, stderr = await process.communicate()
-                
-                if process.returncode != 0:
-                    logger.error(f"Slither failed with return code {process.returncode}: {stderr.decode()}")
-                    return []
-                
-                # Parse Slither-Ausgabe
-                try:
-                    slither_results = json.loads(stdout.decode())
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse Slither output as JSON")
-                    return []
+                elements = detector_result.get("elements") or [{}]
+                lines = elements[0].get("source_mapping", {}).get("lines") or [0]
                 
-                # Konvertiere Slither-Ergebnisse in unser Format
-                vulnerabilities = []
-                for detector_result in slither_results.get("detectors", []):
-                    # Mappe Slither-Detector zu SWC-ID, falls möglich
-                    swc_id = self._map_slither_to_swc(detector_result.get("check", ""))
-                    
-                    vulnerability = {
-                        "id": swc_id,
-                        "name": detector_result.get("check", ""),
-                        "severity": self._normalize_severity(detector_result.get("impact", "unknown")),
-                        "description": detector_result.get("description", ""),
-                        "line_number": detector_result.get("first_element", {}).get("line", 0)
-                    }
-                    
-                    vulnerabilities.append(vulnerability)
+                vulnerability = {
+                    "id": swc_id,
+                    "name": detector_result.get("check", ""),
+                    "severity": self._normalize_severity(detector_result.get("impact", "unknown")),
+                    "description": detector_result.get("description", ""),
+                    "line_number": lines[0]
+                }
                 
-                return vulnerabilities
-            finally:
-                # Räume temporäre Datei auf
-                os.unlink(abi_path)
+                vulnerabilities.append(vulnerability)
+            
+            self._slither_errors.pop(error_key, None)
+            return vulnerabilities
         except Exception as e:
-            error_msg = f"Failed to check Solidity vulnerabilities for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
-            return []
+            return failed(str(e))
     
     def _map_slither_to_swc(self, slither_check: str) -> str:
         """Mappe einen Slither-Check-Namen zu einer SWC-ID."""
@@ -703,7 +1049,7 @@ class SecurityScanner:
             return vulnerabilities
         except Exception as e:
             error_msg = f"Failed to check Solana vulnerabilities for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return []
     
     async def _check_sui_vulnerabilities(self, address: str, chain: str) -> List[Dict]:
@@ -747,7 +1093,7 @@ class SecurityScanner:
             return vulnerabilities
         except Exception as e:
             error_msg = f"Failed to check Sui vulnerabilities for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return []
     
     async def analyze_access_control(self, address: str, chain: str) -> List[str]:
@@ -800,59 +1146,46 @@ class SecurityScanner:
             issues = []
             
             # Hole Contract-Quellcode
-            source_code = await self._get_contract_source_code(address, chain)
-            if not source_code:
+            source = await self._get_contract_source(address, chain)
+            if not source or not source.source:
                 issues.append("No source code available to analyze access control")
                 return issues
             
-            # Prüfe auf fehlende Zugriffskontrolle bei kritischen Funktionen
-            critical_functions = [
-                "mint", "burn", "pause", "unpause", "withdraw", "transferownership",
-                "setfee", "settax", "setlimit", "setrate", "setaddress", "changeowner"
-            ]
-            
             # Prüfe auf Funktionen mit Namen, die mit kritischen Funktionen übereinstimmen
-            for func in critical_functions:
-                pattern = rf"function\s+{func}\s*\("
-                matches = re.finditer(pattern, source_code, re.IGNORECASE)
-                for match in matches:
+            for func in self.CRITICAL_FUNCTIONS:
+                for start, _ in source.lines(("critical_function", func)):
                     # Hole die Funktionssignatur
-                    line_start = source_code.rfind('\n', 0, match.start()) + 1
-                    line_end = source_code.find('\n', match.end())
-                    if line_end == -1:
-                        line_end = len(source_code)
-                    
-                    function_line = source_code[line_start:line_end].strip()
+                    function_line = source.index.line_text(start).strip()
                     
                     # Prüfe, ob die Funktion Zugriffskontroll-Modifikatoren hat
                     has_access_control = any(
                         modifier in function_line 
-                        for modifier in ["onlyOwner", "onlyAdmin", "whenNotPaused", "whenPaused", "internal", "private"]
+                        for modifier in self.ACCESS_CONTROL_MODIFIERS
                     )
                     
                     if not has_access_control:
                         issues.append(f"Critical function {func} lacks access control")
             
             # Prüfe auf tx.origin-Nutzung
-            if re.search(r"tx\.origin", source_code):
+            if source.has("tx_origin"):
                 issues.append("Use of tx.origin detected, which can lead to phishing attacks")
             
             # Prüfe auf ungeschützten selfdestruct
-            if re.search(r"selfdestruct\s*\(", source_code) and not re.search(r"onlyOwner", source_code):
+            if source.has("selfdestruct") and not source.has("only_owner"):
                 issues.append("Unprotected selfdestruct function detected")
             
             # Prüfe auf ungeschützten delegatecall
-            if re.search(r"delegatecall\s*\(", source_code) and not re.search(r"onlyOwner", source_code):
+            if source.has("delegatecall") and not source.has("only_owner"):
                 issues.append("Unprotected delegatecall function detected")
             
             # Prüfe auf fehlenden Pausierungsmechanismus
-            if not re.search(r"pause\s*\(", source_code) and not re.search(r"unpause\s*\(", source_code):
+            if not source.has("pause") and not source.has("unpause"):
                 issues.append("No pausing mechanism detected, which could be problematic in emergencies")
             
             return issues
         except Exception as e:
             error_msg = f"Failed to analyze Solidity access control for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze access control due to an error"]
     
     async def _analyze_solana_access_control(self, address: str, chain: str) -> List[str]:
@@ -876,7 +1209,7 @@ class SecurityScanner:
             return issues
         except Exception as e:
             error_msg = f"Failed to analyze Solana access control for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze access control due to an error"]
     
     async def _analyze_sui_access_control(self, address: str, chain: str) -> List[str]:
@@ -900,7 +1233,7 @@ class SecurityScanner:
             return issues
         except Exception as e:
             error_msg = f"Failed to analyze Sui access control for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze access control due to an error"]
     
     async def analyze_economic_risks(self, address: str, chain: str) -> List[str]:
@@ -953,43 +1286,43 @@ class SecurityScanner:
             risks = []
             
             # Hole Contract-Quellcode
-            source_code = await self._get_contract_source_code(address, chain)
-            if not source_code:
+            source = await self._get_contract_source(address, chain)
+            if not source or not source.source:
                 risks.append("No source code available to analyze economic risks")
                 return risks
             
             # Prüfe auf unbegrenztes Minting
-            if re.search(r"mint\s*\(", source_code) and not re.search(r"_maxSupply", source_code):
+            if source.has("mint") and not source.has("max_supply"):
                 risks.append("Potential for unlimited minting detected")
             
             # Prüfe auf übermäßiges Burning
-            if re.search(r"burn\s*\(", source_code) and not re.search(r"onlyOwner", source_code):
+            if source.has("burn") and not source.has("only_owner"):
                 risks.append("Potential for excessive burning detected")
             
             # Prüfe auf Rug-Pull-Potenzial
-            if re.search(r"withdraw\s*\(", source_code) and not re.search(r"onlyOwner", source_code):
+            if source.has("withdraw") and not source.has("only_owner"):
                 risks.append("Potential for rug pull detected")
             
             # Prüfe auf übermäßige Gebühren oder Steuern
-            if re.search(r"fee\s*=\s*[0-9]+", source_code) and re.search(r"fee\s*>\s*10", source_code):
+            if source.has("fee_assignment") and source.has("fee_above_10"):
                 risks.append("Potential for excessive fees or taxes detected")
             
             # Prüfe auf fehlenden Pausierungsmechanismus
-            if not re.search(r"pause\s*\(", source_code) and not re.search(r"unpause\s*\(", source_code):
+            if not source.has("pause") and not source.has("unpause"):
                 risks.append("No pausing mechanism detected, which could be problematic in emergencies")
             
             # Prüfe auf Honeypot-Potenzial
-            if re.search(r"transfer\s*\(", source_code) and re.search(r"require\s*\(\s*false", source_code):
+            if source.has("transfer") and source.has("require_false"):
                 risks.append("Potential honeypot mechanism detected")
             
             # Prüfe auf Anti-Whale-Mechanismen
-            if re.search(r"balanceOf\s*\(\s*msg\.sender\s*\)\s*>\s*max", source_code):
+            if source.has("anti_whale"):
                 risks.append("Anti-whale mechanism detected, which may limit usability")
             
             return risks
         except Exception as e:
             error_msg = f"Failed to analyze Solidity economic risks for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze economic risks due to an error"]
     
     async def _analyze_solana_economic_risks(self, address: str, chain: str) -> List[str]:
@@ -1013,7 +1346,7 @@ class SecurityScanner:
             return risks
         except Exception as e:
             error_msg = f"Failed to analyze Solana economic risks for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze economic risks due to an error"]
     
     async def _analyze_sui_economic_risks(self, address: str, chain: str) -> List[str]:
@@ -1037,7 +1370,7 @@ class SecurityScanner:
             return risks
         except Exception as e:
             error_msg = f"Failed to analyze Sui economic risks for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return ["Failed to analyze economic risks due to an error"]
     
     async def calculate_verification_confidence(self, address: str, chain: str) -> float:
@@ -1071,7 +1404,7 @@ class SecurityScanner:
                 confidence += 0.4
             
             # Prüfe, ob wir eine ABI haben
-            abi = await self.metadata_service.get_abi(address, chain)
+            abi = await self._get_abi(address, chain)
             if abi:
                 confidence += 0.2
             
@@ -1113,7 +1446,7 @@ class SecurityScanner:
             return confidence
         except Exception as e:
             error_msg = f"Failed to calculate verification confidence for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return 0.0
     
     async def _analyze_code_quality(self, address: str, chain: str) -> Dict[str, Any]:
@@ -1142,26 +1475,30 @@ class SecurityScanner:
                 "external_calls": 0
             }
             
-            if chain.lower() in ["ethereum", "bsc"]:
-                metrics = await self._analyze_solidity_code_quality(address, chain)
-            elif chain.lower() == "solana":
-                metrics = await self._analyze_solana_code_quality(address, chain)
-            elif chain.lower() == "sui":
-                metrics = await self._analyze_sui_code_quality(address, chain)
-            else:
-                raise ValueError(f"Unsupported blockchain: {chain}")
-            
-            # Speichere im Cache
-            self._cache[cache_key] = {
-                "timestamp": datetime.now().timestamp(),
-                "data": metrics
-            }
+            with self._collect_failures() as failures:
+                failed_before = len(failures)
+                if chain.lower() in ["ethereum", "bsc"]:
+                    metrics = await self._analyze_solidity_code_quality(address, chain)
+                elif chain.lower() == "solana":
+                    metrics = await self._analyze_solana_code_quality(address, chain)
+                elif chain.lower() == "sui":
+                    metrics = await self._analyze_sui_code_quality(address, chain)
+                else:
+                    raise ValueError(f"Unsupported blockchain: {chain}")
+                failed = len(failures) > failed_before
+            
+            # Speichere im Cache (Fallback-Werte nach einem Fehler nicht)
+            if not failed:
+                self._cache[cache_key] = {
+                    "timestamp": datetime.now().timestamp(),
+                    "data": metrics
+                }
             
             logger.info(f"Analyzed code quality for contract {address} on {chain}")
             return metrics
         except Exception as e:
             error_msg = f"Failed to analyze code quality for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return {
                 "complexity_score": 0,
                 "lines_of_code": 0,
@@ -1172,8 +1509,8 @@ class SecurityScanner:
         """Analysiere Code-Qualitätsmetriken für Solidity-Contracts."""
         try:
             # Hole Contract-Quellcode
-            source_code = await self._get_contract_source_code(address, chain)
-            if not source_code:
+            source = await self._get_contract_source(address, chain)
+            if not source or not source.source:
                 return {
                     "complexity_score": 0,
                     "lines_of_code": 0,
@@ -1181,19 +1518,22 @@ class SecurityScanner:
                 }
             
             # Zähle Codezeilen
-            lines_of_code = len(source_code.split('\n'))
+            lines_of_code = source.index.line_count
             
             # Zähle externe Aufrufe
-            external_calls = len(re.findall(r"\.(call|send|transfer|delegatecall)\s*\(", source_code))
+            external_calls = sum(
+                source.count(name)
+                for name in ("external_call", "external_send", "external_transfer", "external_delegatecall")
+            )
             
             # Zähle Funktionen
-            function_count = len(re.findall(r"function\s+\w+\s*\(", source_code))
+            function_count = source.count("function")
             
             # Zähle Modifikatoren
-            modifier_count = len(re.findall(r"modifier\s+\w+\s*\(", source_code))
+            modifier_count = source.count("modifier")
             
             # Zähle Events
-            event_count = len(re.findall(r"event\s+\w+\s*\(", source_code))
+            event_count = source.count("event")
             
             # Berechne Komplexitäts-Score basierend auf verschiedenen Faktoren
             complexity_score = 0
@@ -1214,7 +1554,7 @@ class SecurityScanner:
             complexity_score += min(10, event_count)
             
             # Füge Komplexität aus Vererbung hinzu
-            inheritance_count = len(re.findall(r"is\s+\w+", source_code))
+            inheritance_count = source.count("inheritance")
             complexity_score += min(10, inheritance_count * 3)
             
             # Stelle sicher, dass der Komplexitäts-Score zwischen 0 und 100 liegt
@@ -1227,7 +1567,7 @@ class SecurityScanner:
             }
         except Exception as e:
             error_msg = f"Failed to analyze Solidity code quality for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return {
                 "complexity_score": 0,
                 "lines_of_code": 0,
@@ -1255,7 +1595,7 @@ class SecurityScanner:
             }
         except Exception as e:
             error_msg = f"Failed to analyze Solana code quality for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return {
                 "complexity_score": 0,
                 "lines_of_code": 0,
@@ -1283,7 +1623,7 @@ class SecurityScanner:
             }
         except Exception as e:
             error_msg = f"Failed to analyze Sui code quality for {address} on {chain}: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return {
                 "complexity_score": 0,
                 "lines_of_code": 0,
@@ -1333,7 +1673,7 @@ class SecurityScanner:
             return risk_score
         except Exception as e:
             error_msg = f"Failed to calculate risk score: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return 0.5  # Standard auf mittleres Risiko
     
     async def generate_security_report(self, address: str, chain: str) -> Dict[str, Any]:
@@ -1418,5 +1758,5 @@ class SecurityScanner:
             return summary
         except Exception as e:
             error_msg = f"Failed to generate summary: {str(e)}"
-            logger.error(error_msg)
+            self._analysis_failed(error_msg)
             return "Unable to generate summary due to an error."
@@ -0,0 +1,164 @@
+"""
+Einmal geladener, indizierter Contract-Quellcode für die Sicherheitsanalyse.
+
+- SourceIndex: Zeilen-Offset-Index (Zeilennummer per bisect statt
+  source_code[:pos].count('\\n') pro Treffer)
+- PatternScanner: alle Regex-Regeln in EINEM Durchlauf über den Quellcode.
+  Jede Regel beginnt mit einem literalen Anker ("function", "tx.origin",
+  ".call", ...); ein kombinierter Anker-Scan findet alle Kandidaten-
+  Positionen, die vollständige Regel wird nur dort geprüft. Die Treffer sind
+  identisch mit re.finditer pro Regel (nicht überlappend, links zuerst).
+- ContractSource: Quellcode + Index + Scan-Ergebnis als gemeinsames Artefakt
+  aller Analysen (Regex-Checks, Access Control, Economic Risks, Code Quality);
+  Slither holt den Contract mit Compiler-Metadaten selbst vom Explorer.
+"""
+
+import hashlib
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+
+# Zeichen, die nach einem Backslash literal sind
+_ESCAPED_LITERALS = set(r".()[]{}*+?|^$\/-")
+_SPECIAL = set(".^$*+?{}[]|()")
+_QUANTIFIERS = set("*?{")
+
+
+def literal_prefix(pattern: str) -> str:
+    """Literaler Anfang eines Regex-Patterns (Anker für den kombinierten Scan)"""
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern) and pattern[i + 1] in _ESCAPED_LITERALS:
+            literal, width = pattern[i + 1], 2
+        elif char == "\\" or char in _SPECIAL:
+            break
+        else:
+            literal, width = char, 1
+
+        # Optionales Zeichen (x*, x?, x{0,..}) gehört nicht zum Anker
+        if i + width < len(pattern) and pattern[i + width] in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+        i += width
+
+    return "".join(prefix)
+
+
+class SourceIndex:
+    """Zeilen-Offset-Index eines Quelltexts"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.newlines = [match.start() for match in re.finditer("\n", source)]
+
+    @property
+    def line_count(self) -> int:
+        """Wie len(source.split('\\n'))"""
+        return len(self.newlines) + 1
+
+    def line_number(self, position: int) -> int:
+        """1-basierte Zeilennummer einer Zeichenposition"""
+        return bisect_left(self.newlines, position) + 1
+
+    def line_text(self, position: int) -> str:
+        """Komplette Zeile, in der position liegt"""
+        line = bisect_left(self.newlines, position)
+        start = self.newlines[line - 1] + 1 if line > 0 else 0
+        end = self.newlines[line] if line < len(self.newlines) else len(self.source)
+        return self.source[start:end]
+
+
+class PatternScanner:
+    """Alle Regeln in einem kombinierten Anker-Scan"""
+
+    def __init__(self, rules: Dict[Hashable, Tuple[str, int]]):
+        """
+        Args:
+            rules: Regel-Key → (Regex-Pattern, re-Flags)
+
+        Raises:
+            ValueError: wenn ein Pattern nicht mit einem Literal beginnt
+        """
+        self.rules = {}
+        self._rules_by_anchor: Dict[str, List[Hashable]] = defaultdict(list)
+
+        for key, (pattern, flags) in rules.items():
+            anchor = literal_prefix(pattern).lower()
+            if not anchor:
+                raise ValueError(f"Pattern {pattern!r} has no literal prefix to anchor on")
+            self.rules[key] = re.compile(pattern, flags)
+            self._rules_by_anchor[anchor].append(key)
+
+        anchors = sorted(self._rules_by_anchor, key=len, reverse=True)
+        # Lookahead → überlappende Anker an verschiedenen Positionen werden alle gefunden;
+        # an derselben Position gewinnt der längste, kürzere Anker sind dessen Präfixe
+        self._anchor_regex = re.compile(
+            "(?=(" + "|".join(re.escape(anchor) for anchor in anchors) + "))",
+            re.IGNORECASE
+        )
+        self._anchor_prefixes = {
+            anchor: [other for other in anchors if anchor.startswith(other)]
+            for anchor in anchors
+        }
+
+    def scan(self, source: str) -> Dict[Hashable, List[Tuple[int, int]]]:
+        """
+        Nicht überlappende Treffer (start, end) pro Regel - wie re.finditer
+
+        Returns:
+            Regel-Key → Treffer in Quelltext-Reihenfolge (leere Liste ohne Treffer)
+        """
+        matches: Dict[Hashable, List[Tuple[int, int]]] = {key: [] for key in self.rules}
+        next_start: Dict[Hashable, int] = dict.fromkeys(self.rules, 0)
+        rules_by_anchor = self._rules_by_anchor
+        anchor_prefixes = self._anchor_prefixes
+
+        for hit in self._anchor_regex.finditer(source):
+            position = hit.start()
+            for anchor in anchor_prefixes[hit.group(1).lower()]:
+                for key in rules_by_anchor[anchor]:
+                    if position < next_start[key]:
+                        continue
+                    match = self.rules[key].match(source, position)
+                    if match:
+                        matches[key].append((position, match.end()))
+                        next_start[key] = max(match.end(), position + 1)
+
+        return matches
+
+
+class ContractSource:
+    """Quellcode eines Contracts inkl. Zeilen-Index und Scan-Ergebnis"""
+
+    def __init__(self, address: str, chain: str, source: str, scanner: PatternScanner,
+                 implementation_code_hash: Optional[str] = None, cacheable: bool = True):
+        self.address = address
+        self.chain = chain
+        self.source = source
+        # Proxy ohne auflösbare Implementierung: Ergebnis nicht persistent cachen
+        self.cacheable = cacheable
+        # Inhaltsadresse für den persistenten Analyse-Cache (Clones mit gleichem Code teilen sie,
+        # Proxies nur bei gleicher Implementierung)
+        content = hashlib.sha256(source.encode()).hexdigest()
+        if implementation_code_hash:
+            content = hashlib.sha256(f"{content}:{implementation_code_hash}".encode()).hexdigest()
+        self.content_hash = content
+        self.index = SourceIndex(source)
+        self.matches = scanner.scan(source)
+
+    def has(self, key: Hashable) -> bool:
+        """Wie re.search(pattern, source) is not None"""
+        return bool(self.matches.get(key))
+
+    def count(self, key: Hashable) -> int:
+        """Wie len(re.findall(pattern, source))"""
+        return len(self.matches.get(key, ()))
+
+    def lines(self, key: Hashable) -> Iterator[Tuple[int, int]]:
+        """(Startposition, Zeilennummer) je Treffer"""
+        for start, _ in self.matches.get(key, ()):
+            yield start, self.index.line_number(start)
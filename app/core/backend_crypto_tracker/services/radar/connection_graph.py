@@ -0,0 +1,216 @@
+# services/radar/connection_graph.py
+"""
+Dünn besetzte Wallet×Wallet-Adjazenz für die Radar-Verbindungen
+
+- Ein Durchlauf über die Transaktionen ordnet jede Transaktion einer
+  ungerichteten Kante (Wallet-Paar) zu; Kanten-ID, Wert und Zeitpunkt
+  landen spaltenweise in NumPy-Arrays
+- Aggregate pro Kante (Anzahl, Summe, zuletzt gesehen) per np.bincount /
+  np.maximum.at statt Paarvergleich über alle Wallets - es existieren nur
+  Kanten zwischen Wallets, die tatsächlich interagiert haben
+- Inkrementell: neue Transaktionen werden angehängt (Dedup über Hash +
+  Log-Index, ohne Hash über Absender, Empfänger, Zeitpunkt und Wert),
+  Transaktionen außerhalb des Zeitfensters werden verworfen
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+# Transaktion ohne Zeitstempel (zählt für Anzahl/Wert, nicht für Aktualität)
+MISSING_TIME = np.iinfo(np.int64).min
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def to_microseconds(value: Any) -> int:
+    """Zeitstempel (datetime, ISO-String, Unix-Sekunden) → µs seit Epoch (naive Zeiten = UTC)"""
+    if type(value) is datetime and value.tzinfo is None:
+        return (value - EPOCH) // ONE_MICROSECOND
+    if value is None or value == "":
+        return MISSING_TIME
+    if isinstance(value, (int, float)):
+        return int(value * 1_000_000)
+
+    timestamp = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - EPOCH) // ONE_MICROSECOND
+
+
+def microseconds_to_datetimes(values: np.ndarray) -> List[datetime]:
+    """µs seit Epoch → naive UTC-datetimes (datetime.min, wenn unbekannt)"""
+    return [
+        datetime.min if timestamp is None else timestamp
+        for timestamp in values.astype("datetime64[us]").tolist()
+    ]
+
+
+class WalletConnectionGraph:
+    """Inkrementell aufgebaute Kantenliste Wallet↔Wallet mit Transaktions-Spalten"""
+
+    def __init__(self, window_hours: Optional[float] = None):
+        """
+        Args:
+            window_hours: Zeitfenster; ältere Transaktionen entfernt evict_expired()
+        """
+        self.window_hours = window_hours
+
+        self.wallets: List[str] = []
+        self._wallet_ids: Dict[str, int] = {}
+        # (kleinere Wallet-ID, größere Wallet-ID) → Kanten-ID
+        self._edge_ids: Dict[Tuple[int, int], int] = {}
+        # (from_address, to_address) → Kanten-ID (spart die Wallet-Lookups im Durchlauf)
+        self._pair_edges: Dict[Tuple[str, str], int] = {}
+        self._edge_lo: List[int] = []
+        self._edge_hi: List[int] = []
+
+        # Eine Zeile pro Transaktion
+        self.tx_edges = np.empty(0, dtype=np.int64)
+        self.tx_values = np.empty(0, dtype=np.float64)
+        self.tx_times = np.empty(0, dtype=np.int64)
+        self._tx_keys: List[Tuple] = []
+        self._seen: set = set()
+
+        # Wird bei jeder Änderung erhöht (Cache-Invalidierung)
+        self.version = 0
+        self._aggregates: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_lo)
+
+    @property
+    def transaction_count(self) -> int:
+        return len(self.tx_edges)
+
+    def _wallet_id(self, address: str) -> int:
+        wallet_id = self._wallet_ids.get(address)
+        if wallet_id is None:
+            wallet_id = len(self.wallets)
+            self._wallet_ids[address] = wallet_id
+            self.wallets.append(address)
+        return wallet_id
+
+    def _edge_id(self, from_address: str, to_address: str) -> int:
+        a, b = self._wallet_id(from_address), self._wallet_id(to_address)
+        key = (a, b) if a < b else (b, a)
+        edge_id = self._edge_ids.get(key)
+        if edge_id is None:
+            edge_id = len(self._edge_lo)
+            self._edge_ids[key] = edge_id
+            self._edge_lo.append(key[0])
+            self._edge_hi.append(key[1])
+        return edge_id
+
+    def add_transactions(self, transactions: Iterable[Dict[str, Any]]) -> int:
+        """
+        Transaktionen in einem Durchlauf einsortieren
+
+        Transaktionen mit bereits gesehenem (hash, log_index) werden übersprungen;
+        ohne Hash gilt (from, to, timestamp, value) als Schlüssel - sonst würde jede
+        erneute Lieferung sie doppelt zählen. Self-Transfers bilden keine Kante.
+
+        Returns:
+            Anzahl neu aufgenommener Transaktionen
+        """
+        edges, values, times, keys = [], [], [], []
+        pair_edges = self._pair_edges
+
+        for tx in transactions:
+            from_address = tx.get("from_address")
+            to_address = tx.get("to_address")
+            if not from_address or not to_address or from_address == to_address:
+                continue
+
+            value = float(tx.get("value") or 0)
+            time_us = to_microseconds(tx.get("timestamp"))
+            tx_hash = tx.get("hash") or tx.get("tx_hash")
+            if tx_hash:
+                key = (tx_hash, tx.get("log_index"))
+            else:
+                key = ("nohash", from_address, to_address, time_us, value)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+
+            pair = (from_address, to_address)
+            edge_id = pair_edges.get(pair)
+            if edge_id is None:
+                edge_id = pair_edges[pair] = self._edge_id(from_address, to_address)
+
+            edges.append(edge_id)
+            values.append(value)
+            times.append(time_us)
+            keys.append(key)
+
+        if not edges:
+            return 0
+
+        self.tx_edges = np.concatenate([self.tx_edges, np.array(edges, dtype=np.int64)])
+        self.tx_values = np.concatenate([self.tx_values, np.array(values, dtype=np.float64)])
+        self.tx_times = np.concatenate([self.tx_times, np.array(times, dtype=np.int64)])
+        self._tx_keys.extend(keys)
+        self._changed()
+        return len(edges)
+
+    def evict_before(self, cutoff: datetime) -> int:
+        """Transaktionen vor cutoff entfernen (ohne Zeitstempel bleiben sie erhalten)"""
+        cutoff_us = to_microseconds(cutoff)
+        expired = (self.tx_times < cutoff_us) & (self.tx_times != MISSING_TIME)
+        removed = int(expired.sum())
+        if not removed:
+            return 0
+
+        for index in np.flatnonzero(expired):
+            self._seen.discard(self._tx_keys[index])
+
+        keep = ~expired
+        self.tx_edges = self.tx_edges[keep]
+        self.tx_values = self.tx_values[keep]
+        self.tx_times = self.tx_times[keep]
+        self._tx_keys = [key for key, kept in zip(self._tx_keys, keep) if kept]
+        self._changed()
+        return removed
+
+    def evict_expired(self, now: Optional[datetime] = None) -> int:
+        """Transaktionen außerhalb des Zeitfensters entfernen"""
+        if not self.window_hours:
+            return 0
+        return self.evict_before((now or datetime.utcnow()) - timedelta(hours=self.window_hours))
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._aggregates = None
+
+    def edge_nodes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Wallet-IDs (Index in self.wallets) beider Enden jeder Kante"""
+        return np.array(self._edge_lo, dtype=np.int64), np.array(self._edge_hi, dtype=np.int64)
+
+    def aggregates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pro Kante: (Anzahl Transaktionen, Gesamtwert, zuletzt gesehen in µs)
+
+        Kanten, deren Transaktionen alle verworfen wurden, haben Anzahl 0.
+        """
+        if self._aggregates is None:
+            size = self.edge_count
+            counts = np.bincount(self.tx_edges, minlength=size)
+            totals = np.bincount(self.tx_edges, weights=self.tx_values, minlength=size)
+            last_seen = np.full(size, MISSING_TIME, dtype=np.int64)
+            np.maximum.at(last_seen, self.tx_edges, self.tx_times)
+            self._aggregates = (counts, totals, last_seen)
+        return self._aggregates
+
+    def recency_sums(self, now: datetime, horizon_days: float = 30) -> np.ndarray:
+        """
+        Pro Kante: Summe über max(0, 1 - Tage seit Transaktion / horizon_days)
+
+        Tage wie timedelta.days (abgerundet); Transaktionen ohne Zeitstempel zählen 0.
+        """
+        timed = self.tx_times != MISSING_TIME
+        days = (to_microseconds(now) - self.tx_times[timed]) // MICROSECONDS_PER_DAY
+        weights = np.maximum(0.0, 1 - days / horizon_days)
+        return np.bincount(self.tx_edges[timed], weights=weights, minlength=self.edge_count)
@@ -3,7 +3,9 @@ import logging
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 from dataclasses import dataclass
+import numpy as np
 from app.core.backend_crypto_tracker.utils.logger import get_logger
+from app.core.backend_crypto_tracker.services.radar.connection_graph import WalletConnectionGraph, microseconds_to_datetimes
 
 logger = get_logger(__name__)
 
@@ -34,45 +36,46 @@ class PositionCalculator:
         self.max_radius = 0.9  # Maximaler Radius des Radars (0-1)
         self.center_x = 0.5
         self.center_y = 0.5
+        # (contract, chain, Zeitfenster) → inkrementell gepflegter Verbindungsgraph
+        self._graphs: Dict[Tuple[str, Optional[str], Optional[int]], WalletConnectionGraph] = {}
+        self.max_cached_graphs = 100
     
     def calculate_wallet_positions(self, 
                                  wallet_data: List[Dict[str, Any]], 
                                  time_series_data: Dict[str, Any]) -> List[WalletPosition]:
-        """Berechnet Positionen von Wallets im Radar-Koordinatensystem"""
+        """Berechnet Positionen von Wallets im Radar-Koordinatensystem (vektorisiert)"""
         try:
-            positions = []
+            if not wallet_data:
+                return []
             
-            for wallet in wallet_data:
-                # Aktivitäts-Score berechnen
-                activity_score = self._calculate_activity_score(wallet, time_series_data)
-                
-                # Risiko-Score (bereits in den Daten vorhanden)
-                risk_score = wallet.get("risk_score", 0.5)
-                
-                # Verbindungszahl
-                connection_count = len(wallet.get("connections", []))
-                
-                # Distanz vom Zentrum basierend auf Aktivität
-                distance_from_center = self._calculate_distance_from_center(activity_score)
-                
-                # Winkel basierend auf diversen Faktoren
-                angle = self._calculate_wallet_angle(wallet, activity_score, risk_score)
-                
-                # Kartesische Koordinaten berechnen
-                x, y = self._polar_to_cartesian(distance_from_center, angle)
-                
-                positions.append(WalletPosition(
-                    wallet_address=wallet["address"],
-                    x=x,
-                    y=y,
-                    distance_from_center=distance_from_center,
-                    angle=angle,
-                    activity_score=activity_score,
-                    risk_score=risk_score,
-                    connection_count=connection_count
-                ))
+            # Aktivitäts-Scores aller Wallets
+            activity_scores = self._calculate_activity_scores(wallet_data, time_series_data)
             
-            return positions
+            # Risiko-Score (bereits in den Daten vorhanden)
+            risk_scores = np.array([wallet.get("risk_score", 0.5) for wallet in wallet_data], dtype=np.float64)
+            
+            # Distanz vom Zentrum basierend auf Aktivität
+            distances = self._calculate_distance_from_center(activity_scores)
+            
+            # Winkel basierend auf diversen Faktoren
+            angles = self._calculate_wallet_angles(wallet_data, activity_scores, risk_scores)
+            
+            # Kartesische Koordinaten berechnen
+            xs, ys = self._polar_to_cartesian(distances, angles)
+            
+            return [
+                WalletPosition(
+                    wallet_address=wallet["address"],
+                    x=float(xs[row]),
+                    y=float(ys[row]),
+                    distance_from_center=float(distances[row]),
+                    angle=float(angles[row]),
+                    activity_score=float(activity_scores[row]),
+                    risk_score=float(risk_scores[row]),
+                    connection_count=len(wallet.get("connections", []))
+                )
+                for row, wallet in enumerate(wallet_data)
+            ]
             
         except Exception as e:
             logger.error(f"Error calculating wallet positions: {e}")
@@ -80,108 +83,146 @@ class PositionCalculator:
     
     def calculate_wallet_connections(self, 
                                     wallet_data: List[Dict[str, Any]], 
-                                    transaction_data: List[Dict[str, Any]]) -> List[WalletConnection]:
-        """Berechnet Verbindungsstärke zwischen Wallets"""
+                                    transaction_data: List[Dict[str, Any]],
+                                    contract_address: Optional[str] = None,
+                                    chain: Optional[str] = None,
+                                    time_period_hours: Optional[int] = None) -> List[WalletConnection]:
+        """
+        Berechnet Verbindungsstärke zwischen Wallets
+        
+        Die Transaktionen werden in einem Durchlauf in einen dünn besetzten
+        Wallet-Graphen einsortiert; es entstehen nur Paare, die tatsächlich
+        interagiert haben. Mit contract_address wird der Graph pro
+        (Contract, Chain, Zeitfenster) gecacht und bei weiteren Aufrufen nur
+        um neue Transaktionen ergänzt (Dedup über Hash + Log-Index).
+        """
         try:
-            connections = []
-            
-            # Transaktionsdaten für schnellen Zugriff indizieren
-            tx_index = {}
-            for tx in transaction_data:
-                from_addr = tx.get("from_address")
-                to_addr = tx.get("to_address")
-                
-                if from_addr and to_addr:
-                    if from_addr not in tx_index:
-                        tx_index[from_addr] = {}
-                    if to_addr not in tx_index:
-                        tx_index[to_addr] = {}
-                    
-                    if to_addr not in tx_index[from_addr]:
-                        tx_index[from_addr][to_addr] = []
-                    tx_index[from_addr][to_addr].append(tx)
-            
-            # Verbindungen zwischen Wallets analysieren
-            wallet_addresses = [wallet["address"] for wallet in wallet_data]
-            
-            for i, wallet1 in enumerate(wallet_data):
-                addr1 = wallet1["address"]
-                
-                for j, wallet2 in enumerate(wallet_data[i+1:], i+1):
-                    addr2 = wallet2["address"]
-                    
-                    # Transaktionen zwischen den Wallets finden
-                    transactions_1_to_2 = tx_index.get(addr1, {}).get(addr2, [])
-                    transactions_2_to_1 = tx_index.get(addr2, {}).get(addr1, [])
-                    
-                    all_transactions = transactions_1_to_2 + transactions_2_to_1
-                    
-                    if all_transactions:
-                        # Verbindungsstärke berechnen
-                        strength = self._calculate_connection_strength(all_transactions)
-                        
-                        total_value = sum(tx.get("value", 0) for tx in all_transactions)
-                        last_interaction = max(
-                            (tx.get("timestamp") for tx in all_transactions),
-                            default=datetime.min
-                        )
-                        
-                        connections.append(WalletConnection(
-                            from_wallet=addr1,
-                            to_wallet=addr2,
-                            strength=strength,
-                            interaction_count=len(all_transactions),
-                            total_value=total_value,
-                            last_interaction=last_interaction
-                        ))
+            if contract_address:
+                graph = self._get_graph(contract_address, chain, time_period_hours)
+            else:
+                graph = WalletConnectionGraph()
             
-            # Nach Stärke sortieren
-            connections.sort(key=lambda x: x.strength, reverse=True)
+            graph.add_transactions(transaction_data)
+            graph.evict_expired()
             
-            return connections
+            return self._connections_from_graph(graph, wallet_data)
             
         except Exception as e:
             logger.error(f"Error calculating wallet connections: {e}")
             return []
     
-    def _calculate_activity_score(self, wallet: Dict[str, Any], time_series_data: Dict[str, Any]) -> float:
-        """Berechnet Aktivitäts-Score für eine Wallet"""
-        try:
-            # Transaktionsanzahl
-            transaction_count = wallet.get("transaction_count", 0)
-            
-            # Einzigartige Interaktionen
-            unique_interactions = wallet.get("unique_interactions", 0)
-            
-            # Gesamtwert
-            total_value = wallet.get("total_value", 0)
+    def _get_graph(self, contract_address: str, chain: Optional[str],
+                   time_period_hours: Optional[int]) -> WalletConnectionGraph:
+        """Gecachter Verbindungsgraph pro (Contract, Chain, Zeitfenster)"""
+        cache_key = (contract_address, chain, time_period_hours)
+        graph = self._graphs.pop(cache_key, None)
+        if graph is None:
+            graph = WalletConnectionGraph(window_hours=time_period_hours)
             
-            # Letzte Aktivität
-            last_activity = wallet.get("last_activity")
-            recency_score = 0
-            if last_activity:
-                last_activity_dt = datetime.fromisoformat(last_activity)
-                days_since_activity = (datetime.utcnow() - last_activity_dt).days
-                recency_score = max(0, 1 - days_since_activity / 30)  # Innerhalb 30 Tagen
-            
-            # Normalisierte Scores
-            transaction_score = min(1.0, transaction_count / 1000)
-            interaction_score = min(1.0, unique_interactions / 100)
-            value_score = min(1.0, total_value / 1000000)
-            
-            # Gewichteter Gesamtscore
-            activity_score = (
-                transaction_score * 0.4 +
-                interaction_score * 0.3 +
-                value_score * 0.2 +
-                recency_score * 0.1
+            # Am längsten unbenutzten Graphen verwerfen
+            if len(self._graphs) >= self.max_cached_graphs:
+                del self._graphs[next(iter(self._graphs))]
+        
+        # Zuletzt benutzt ans Ende
+        self._graphs[cache_key] = graph
+        return graph
+    
+    def _connections_from_graph(self, graph: WalletConnectionGraph,
+                                wallet_data: List[Dict[str, Any]]) -> List[WalletConnection]:
+        """Verbindungen zwischen den Wallets aus wallet_data (from_wallet = früher in der Liste)"""
+        positions = {}
+        for position, wallet in enumerate(wallet_data):
+            positions.setdefault(wallet["address"], position)
+        
+        if not graph.edge_count or len(positions) < 2:
+            return []
+        
+        # Wallet-ID im Graphen → Position in wallet_data (-1 = nicht im Radar)
+        wallet_positions = np.array([positions.get(address, -1) for address in graph.wallets], dtype=np.int64)
+        
+        edge_lo, edge_hi = graph.edge_nodes()
+        counts, total_values, last_seen = graph.aggregates()
+        recency_sums = graph.recency_sums(datetime.utcnow())
+        
+        position_lo = wallet_positions[edge_lo]
+        position_hi = wallet_positions[edge_hi]
+        connected = (counts > 0) & (position_lo >= 0) & (position_hi >= 0)
+        if not connected.any():
+            return []
+        
+        from_positions = np.minimum(position_lo, position_hi)[connected]
+        to_positions = np.maximum(position_lo, position_hi)[connected]
+        counts = counts[connected]
+        total_values = total_values[connected]
+        last_seen = last_seen[connected]
+        strengths = self._calculate_connection_strengths(counts, total_values, recency_sums[connected])
+        
+        # Nach Stärke sortieren (bei Gleichstand in Wallet-Reihenfolge)
+        order = np.lexsort((to_positions, from_positions, -strengths))
+        addresses = [wallet["address"] for wallet in wallet_data]
+        
+        return [
+            WalletConnection(
+                from_wallet=addresses[from_position],
+                to_wallet=addresses[to_position],
+                strength=strength,
+                interaction_count=count,
+                total_value=total_value,
+                last_interaction=last_interaction
             )
-            
-            return activity_score
-            
-        except Exception as e:
-            logger.error(f"Error calculating activity score: {e}")
-            return 0.5
+            for from_position, to_position, strength, count, total_value, last_interaction in zip(
+                from_positions[order].tolist(),
+                to_positions[order].tolist(),
+                strengths[order].tolist(),
+                counts[order].tolist(),
+                total_values[order].tolist(),
+                microseconds_to_datetimes(last_seen[order])
+            )
+        ]
+    
+    def _calculate_activity_scores(self, wallet_data: List[Dict[str, Any]],
+                                   time_series_data: Dict[str, Any]) -> np.ndarray:
+        """Berechnet Aktivitäts-Scores aller Wallets"""
+        now = datetime.utcnow()
+        # Spalten: Transaktionsanzahl, einzigartige Interaktionen, Gesamtwert, Aktualität
+        metrics = np.zeros((len(wallet_data), 4), dtype=np.float64)
+        failed = np.zeros(len(wallet_data), dtype=bool)
+        
+        for row, wallet in enumerate(wallet_data):
+            try:
+                # Letzte Aktivität
+                last_activity = wallet.get("last_activity")
+                recency_score = 0
+                if last_activity:
+                    last_activity_dt = datetime.fromisoformat(last_activity)
+                    days_since_activity = (now - last_activity_dt).days
+                    recency_score = max(0, 1 - days_since_activity / 30)  # Innerhalb 30 Tagen
+                
+                metrics[row] = (
+                    wallet.get("transaction_count", 0),
+                    wallet.get("unique_interactions", 0),
+                    wallet.get("total_value", 0),
+                    recency_score
+                )
+            except Exception as e:
+                logger.error(f"Error calculating activity score: {e}")
+                failed[row] = True
+        
+        # Normalisierte Scores
+        transaction_scores = np.minimum(1.0, metrics[:, 0] / 1000)
+        interaction_scores = np.minimum(1.0, metrics[:, 1] / 100)
+        value_scores = np.minimum(1.0, metrics[:, 2] / 1000000)
+        
+        # Gewichteter Gesamtscore
+        activity_scores = (
+            transaction_scores * 0.4 +
+            interaction_scores * 0.3 +
+            value_scores * 0.2 +
+            metrics[:, 3] * 0.1
+        )
+        activity_scores[failed] = 0.5
+        
+        return activity_scores
     
     def _calculate_distance_from_center(self, activity_score: float) -> float:
         """Berechnet Distanz vom Zentrum basierend auf Aktivität"""
@@ -189,76 +230,51 @@ class PositionCalculator:
         # Aktivitäts-Score von 0-1, Distanz von max_radius bis 0.1
         return self.max_radius - (activity_score * (self.max_radius - 0.1))
     
-    def _calculate_wallet_angle(self, wallet: Dict[str, Any], activity_score: float, risk_score: float) -> float:
-        """Berechnet Winkel für die Wallet-Position im Radar"""
-        try:
-            # Hash der Wallet-Adresse für konsistente Positionierung
-            address_hash = hash(wallet["address"])
-            
-            # Basis-Winkel aus Hash ableiten
-            base_angle = (address_hash % 360) * (math.pi / 180)
-            
-            # Risiko-basierte Anpassung
-            risk_adjustment = (risk_score - 0.5) * 0.5  # -0.25 bis +0.25
-            
-            # Aktivitäts-basierte Anpassung
-            activity_adjustment = (activity_score - 0.5) * 0.3
-            
-            # Zeitbasierte Anpassung (für dynamische Visualisierung)
-            time_factor = (datetime.utcnow().timestamp() / 3600) % (2 * math.pi)
-            
-            final_angle = (base_angle + risk_adjustment + activity_adjustment + time_factor) % (2 * math.pi)
-            
-            return final_angle
-            
-        except Exception as e:
-            logger.error(f"Error calculating wallet angle: {e}")
-            return 0
+    def _calculate_wallet_angles(self, wallet_data: List[Dict[str, Any]],
+                                 activity_scores: np.ndarray, risk_scores: np.ndarray) -> np.ndarray:
+        """Berechnet Winkel für die Wallet-Positionen im Radar"""
+        # Hash der Wallet-Adresse für konsistente Positionierung
+        address_hashes = np.array([hash(wallet["address"]) % 360 for wallet in wallet_data], dtype=np.float64)
+        
+        # Basis-Winkel aus Hash ableiten
+        base_angles = address_hashes * (math.pi / 180)
+        
+        # Risiko-basierte Anpassung
+        risk_adjustments = (risk_scores - 0.5) * 0.5  # -0.25 bis +0.25
+        
+        # Aktivitäts-basierte Anpassung
+        activity_adjustments = (activity_scores - 0.5) * 0.3
+        
+        # Zeitbasierte Anpassung (für dynamische Visualisierung)
+        time_factor = (datetime.utcnow().timestamp() / 3600) % (2 * math.pi)
+        
+        return (base_angles + risk_adjustments + activity_adjustments + time_factor) % (2 * math.pi)
     
-    def _polar_to_cartesian(self, distance: float, angle: float) -> Tuple[float, float]:
-        """Wandelt Polarkoordinaten in kartesische Koordinaten um"""
-        x = self.center_x + distance * math.cos(angle)
-        y = self.center_y + distance * math.sin(angle)
+    def _polar_to_cartesian(self, distance, angle) -> Tuple[Any, Any]:
+        """Wandelt Polarkoordinaten in kartesische Koordinaten um (Skalare oder Arrays)"""
+        x = self.center_x + distance * np.cos(angle)
+        y = self.center_y + distance * np.sin(angle)
         return x, y
     
-    def _calculate_connection_strength(self, transactions: List[Dict[str, Any]]) -> float:
-        """Berechnet die Stärke einer Verbindung zwischen Wallets"""
-        try:
-            if not transactions:
-                return 0.0
-            
-            # Anzahl der Transaktionen
-            count_weight = min(1.0, len(transactions) / 50)
-            
-            # Gesamtwert
-            total_value = sum(tx.get("value", 0) for tx in transactions)
-            value_weight = min(1.0, total_value / 100000)
-            
-            # Reziprozität (beidseitige Transaktionen)
-            reciprocity_factor = 1.0  # Würde in echter Implementierung berechnet
-            
-            # Zeitliche Nähe (jüngere Transaktionen = stärkere Verbindung)
-            now = datetime.utcnow()
-            recency_weight = 0
-            for tx in transactions:
-                tx_time = tx.get("timestamp")
-                if tx_time:
-                    tx_datetime = datetime.fromisoformat(tx_time) if isinstance(tx_time, str) else tx_time
-                    days_ago = (now - tx_datetime).days
-                    recency_weight += max(0, 1 - days_ago / 30)
-            
-            recency_weight = min(1.0, recency_weight / len(transactions))
-            
-            # Gewichtete Gesamtbewertung
-            strength = (
-                count_weight * 0.4 +
-                value_weight * 0.3 +
-                reciprocity_factor * 0.1 +
-                recency_weight * 0.2
-            )
-            
-            return strength
-            
-        except Exception as e:
-            logger.error(f"Error calculating connection strength: {e}")
-            return 0.0
+    def _calculate_connection_strengths(self, counts: np.ndarray, total_values: np.ndarray,
+                                        recency_sums: np.ndarray) -> np.ndarray:
+        """Berechnet die Stärke der Verbindungen zwischen Wallets (eine Zeile pro Wallet-Paar)"""
+        # Anzahl der Transaktionen
+        count_weights = np.minimum(1.0, counts / 50)
+        
+        # Gesamtwert
+        value_weights = np.minimum(1.0, total_values / 100000)
+        
+        # Reziprozität (beidseitige Transaktionen)
+        reciprocity_factor = 1.0  # Würde in echter Implementierung berechnet
+        
+        # Zeitliche Nähe (jüngere Transaktionen = stärkere Verbindung)
+        recency_weights = np.minimum(1.0, recency_sums / counts)
+        
+        # Gewichtete Gesamtbewertung
+        return (
+            count_weights * 0.4 +
+            value_weights * 0.3 +
+            reciprocity_factor * 0.1 +
+            recency_weights * 0.2
+        )
@@ -3,6 +3,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+import numpy as np
 from app.core.backend_crypto_tracker.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -204,19 +205,15 @@ class TimeSeriesAnalyzer:
             return {"trend": "insufficient_data"}
         
         # Einfache Trend-Analyse
-        transactions = [point.transaction_count for point in time_series]
-        volumes = [point.volume_transferred for point in time_series]
+        transactions = np.fromiter((point.transaction_count for point in time_series), dtype=np.float64, count=len(time_series))
         
-        # Lineare Regression für Transaktions-Trend
+        # Lineare Regression für Transaktions-Trend (Kleinste Quadrate, zentriertes x)
         n = len(transactions)
-        x = list(range(n))
+        x = np.arange(n, dtype=np.float64)
+        x_centered = x - x.mean()
+        denominator = float(np.dot(x_centered, x_centered))
         
-        sum_x = sum(x)
-        sum_y = sum(transactions)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, transactions))
-        sum_x2 = sum(xi ** 2 for xi in x)
-        
-        transaction_slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x ** 2) if n * sum_x2 - sum_x ** 2 != 0 else 0
+        transaction_slope = float(np.dot(x_centered, transactions - transactions.mean()) / denominator) if denominator != 0 else 0
         
         # Trend-Richtung bestimmen
         if transaction_slope > 1:
@@ -230,13 +227,8 @@ class TimeSeriesAnalyzer:
         else:
             transaction_trend = "stable"
         
-        # Volatilität berechnen
-        if len(transactions) > 1:
-            mean_transactions = sum(transactions) / n
-            variance = sum((t - mean_transactions) ** 2 for t in transactions) / n
-            volatility = variance ** 0.5
-        else:
-            volatility = 0
+        # Volatilität berechnen (Standardabweichung der Grundgesamtheit)
+        volatility = float(transactions.std())
         
         return {
             "transaction_trend": transaction_trend,
@@ -0,0 +1,133 @@
+import asyncio
+import os
+
+import pytest
+
+from app.core.backend_crypto_tracker.services.contract.analysis_cache import ContractAnalysisCache
+from app.core.backend_crypto_tracker.services.contract.security_scanner import SecurityScanner
+
+
+STORE_URLS = [
+    pytest.param("sqlite", id="sqlite"),
+    pytest.param(
+        os.getenv("TEST_POSTGRES_URL"), id="postgresql",
+        marks=pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="Set TEST_POSTGRES_URL to run")
+    ),
+]
+
+PROXY_SOURCE = "contract Proxy { function upgradeTo(address impl) external onlyOwner {} }"
+
+
+def make_cache(url, tmp_path, **kwargs):
+    if url == "sqlite":
+        url = f"sqlite:///{tmp_path / 'cache' / 'analysis.db'}"
+    return ContractAnalysisCache(url=url, **kwargs)
+
+
+@pytest.mark.parametrize("url", STORE_URLS)
+def test_store_round_trip_survives_restart_and_prunes_old_versions(url, tmp_path):
+    namespace = f"test-{os.getpid()}"
+
+    async def scenario():
+        writer = make_cache(url, tmp_path)
+        await writer.set_many(namespace, {"a" * 64: {"score": 1}, "b" * 64: [1, 2]}, "v1")
+        await writer.set(namespace, "a" * 64, "v2", {"score": 2})
+        # Upsert überschreibt denselben Schlüssel
+        await writer.set(namespace, "b" * 64, "v1", [3])
+        await writer.close()
+
+        reader = make_cache(url, tmp_path)
+        found = await reader.get_many(namespace, ["a" * 64, "b" * 64, "c" * 64, "a" * 64], "v1")
+        again = await reader.get(namespace, "a" * 64, "v1")
+        stats = reader.get_stats()
+
+        removed = await reader.prune(namespace, "v2")
+        after_prune = await make_cache(url, tmp_path).get_many(namespace, ["a" * 64, "b" * 64], "v1")
+        current = await reader.get(namespace, "a" * 64, "v2")
+        await reader.close()
+        return found, again, stats, removed, after_prune, current
+
+    found, again, stats, removed, after_prune, current = asyncio.run(scenario())
+
+    assert found == {"a" * 64: {"score": 1}, "b" * 64: [3]}
+    assert again == {"score": 1}
+    assert (stats["persistent_hits"], stats["memory_hits"], stats["misses"]) == (2, 1, 1)
+    assert removed == 2
+    assert after_prune == {}
+    assert current == {"score": 2}
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = ContractAnalysisCache(url="memory://", memory_size=2)
+
+    async def scenario():
+        await cache.set("ns", "a", "v1", 1)
+        await cache.set("ns", "b", "v1", 2)
+        await cache.get("ns", "a", "v1")
+        await cache.set("ns", "c", "v1", 3)
+        return await cache.get_many("ns", ["a", "b", "c"], "v1")
+
+    assert asyncio.run(scenario()) == {"a": 1, "c": 3}
+    assert cache.get_stats()["memory_size"] == 2
+
+
+def make_scanner(monkeypatch, implementation_code):
+    scanner = SecurityScanner(analysis_cache=ContractAnalysisCache(url="memory://"))
+    analyses = []
+
+    async def explorer_record(address, chain):
+        return {"SourceCode": PROXY_SOURCE, "Proxy": "1", "Implementation": "0x" + "1" * 40}
+
+    async def explorer_code(address, chain):
+        return implementation_code
+
+    async def analyze_content(address, chain):
+        analyses.append(address)
+        return {"vulnerabilities": [], "analysis_errors": []}
+
+    async def analyzer_version():
+        return "test"
+
+    async def slither_settled(source):
+        return True
+
+    monkeypatch.setattr(scanner, "_get_explorer_record", explorer_record)
+    monkeypatch.setattr(scanner, "_get_explorer_code", explorer_code)
+    monkeypatch.setattr(scanner, "_analyze_content", analyze_content)
+    monkeypatch.setattr(scanner, "_get_analyzer_version", analyzer_version)
+    monkeypatch.setattr(scanner, "_slither_settled", slither_settled)
+    return scanner, analyses
+
+
+def analyze_twice(scanner):
+    async def scenario():
+        for address in ("0x" + "a" * 40, "0x" + "b" * 40):
+            source = await scanner._load_contract_source(address, "ethereum")
+            await scanner._get_content_analysis(address, "ethereum", source)
+        return source
+
+    return asyncio.run(scenario())
+
+
+def test_proxy_with_unresolved_implementation_is_not_cached(monkeypatch):
+    scanner, analyses = make_scanner(monkeypatch, implementation_code=None)
+
+    source = analyze_twice(scanner)
+
+    assert source.cacheable is False
+    assert len(analyses) == 2
+    assert scanner.analysis_cache.get_stats()["memory_size"] == 0
+
+
+def test_proxy_with_resolved_implementation_is_cached_per_implementation(monkeypatch):
+    scanner, analyses = make_scanner(monkeypatch, implementation_code="0x6080")
+
+    source = analyze_twice(scanner)
+
+    assert source.cacheable is True
+    # Zweiter Proxy mit gleichem Code und gleicher Implementierung nutzt den Cache
+    assert len(analyses) == 1
+    assert scanner.analysis_cache.get_stats()["memory_size"] == 1
+
+    other, _ = make_scanner(monkeypatch, implementation_code="0x6081")
+    assert analyze_twice(other).content_hash != source.content_hash
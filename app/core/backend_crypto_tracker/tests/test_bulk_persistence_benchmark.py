@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+BENCHMARK_DATABASE_URL = os.getenv('BENCHMARK_DATABASE_URL')  # postgresql+asyncpg://user:pw@localhost/db
+
+NUM_TOKENS = 500
+WALLETS_PER_TOKEN = 20
+
+
+def make_results(run):
+    return [
+        {
+            'token_data': {
+                'address': f"0x{i:040x}",
+                'chain': 'ethereum',
+                'name': f"Token {i}",
+                'symbol': f"T{i}",
+                'market_cap': 1_000_000 + i + run,
+            },
+            'token_score': float(i % 100),
+            'metrics': {'holder_count': WALLETS_PER_TOKEN, 'analyzed_at': datetime.utcnow()},
+            'risk_flags': ['low_liquidity'] if i % 3 == 0 else [],
+            'wallet_analyses': [
+                {
+                    'wallet_address': f"0x{i * WALLETS_PER_TOKEN + j:040x}",
+                    'wallet_type': 'UNKNOWN',
+                    'balance': float(j + run),
+                    'percentage_of_supply': j / 100,
+                    'transaction_count': j,
+                    'risk_score': 0.5,
+                }
+                for j in range(WALLETS_PER_TOKEN)
+            ],
+        }
+        for i in range(NUM_TOKENS)
+    ]
+
+
+async def save_per_row(session_factory, results):
+    """Bisheriger Pfad: Select + ORM-Objekte, eine Transaktion pro Analyse"""
+    from sqlalchemy import select
+
+    from app.core.backend_crypto_tracker.processor.database.models.scan_result import ScanResult
+    from app.core.backend_crypto_tracker.processor.database.models.token import Token
+    from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysisModel, WalletTypeEnum
+
+    for result in results:
+        async with session_factory() as session:
+            token_data = result['token_data']
+            token = (await session.execute(select(Token).where(Token.address == token_data['address']))).scalars().first()
+            if token is None:
+                token = Token(**token_data)
+                session.add(token)
+            else:
+                for key, value in token_data.items():
+                    setattr(token, key, value)
+            await session.flush()
+
+            session.add(ScanResult(scan_type='token_scan', token_id=token.id, token_address=token.address,
+                                   chain=token.chain, score=result['token_score'], risk_flags=result['risk_flags']))
+            for wallet in result['wallet_analyses']:
+                existing = (await session.execute(select(WalletAnalysisModel).where(
+                    WalletAnalysisModel.token_address == token.address,
+                    WalletAnalysisModel.chain == token.chain,
+                    WalletAnalysisModel.wallet_address == wallet['wallet_address'],
+                ))).scalars().first()
+                if existing is None:
+                    existing = WalletAnalysisModel(token_address=token.address, chain=token.chain, token_id=token.id,
+                                                   wallet_address=wallet['wallet_address'])
+                    session.add(existing)
+                existing.wallet_type = WalletTypeEnum(wallet['wallet_type'])
+                existing.balance = wallet['balance']
+                existing.percentage_of_supply = wallet['percentage_of_supply']
+                existing.transaction_count = wallet['transaction_count']
+                existing.risk_score = wallet['risk_score']
+            await session.commit()
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not BENCHMARK_DATABASE_URL, reason='set BENCHMARK_DATABASE_URL to a local PostgreSQL')
+def test_benchmark_bulk_persistence_rows_per_second():
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.core.backend_crypto_tracker.processor.database.models import Base
+    from app.core.backend_crypto_tracker.processor.database.models.manager import DatabaseManager
+
+    schema = f"bench_{uuid.uuid4().hex[:8]}"
+    rows_per_run = NUM_TOKENS * (2 + WALLETS_PER_TOKEN)  # Token + Scan-Ergebnis + Wallet-Analysen
+
+    async def run():
+        admin = create_async_engine(BENCHMARK_DATABASE_URL)
+        async with admin.begin() as conn:
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+        engine = create_async_engine(BENCHMARK_DATABASE_URL, connect_args={'server_settings': {'search_path': schema}})
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+            db = DatabaseManager()
+            db.AsyncSessionLocal = session_factory
+            db.async_engine = engine
+
+            timings = {}
+            # 1. Lauf: Inserts, 2. Lauf: Updates derselben Tokens/Wallets
+            for run_number in range(2):
+                start = time.perf_counter()
+                await save_per_row(session_factory, make_results(run_number))
+                timings[('per_row', run_number)] = time.perf_counter() - start
+
+            async with engine.begin() as conn:
+                await conn.execute(text("TRUNCATE tokens, scan_results, wallet_analyses RESTART IDENTITY CASCADE"))
+
+            for run_number in range(2):
+                start = time.perf_counter()
+                assert await db.save_token_analyses(make_results(run_number)) == NUM_TOKENS
+                timings[('bulk', run_number)] = time.perf_counter() - start
+
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("SELECT count(*) FROM wallet_analyses"))).scalar_one() == NUM_TOKENS * WALLETS_PER_TOKEN
+                assert (await conn.execute(text("SELECT count(*) FROM scan_results"))).scalar_one() == NUM_TOKENS * 2
+
+            for run_number, label in enumerate(('insert', 'upsert')):
+                per_row = timings[('per_row', run_number)]
+                bulk = timings[('bulk', run_number)]
+                print(
+                    f"\n{label} {rows_per_run} rows: "
+                    f"per-row {rows_per_run / per_row:.0f} rows/s, "
+                    f"bulk {rows_per_run / bulk:.0f} rows/s ({per_row / bulk:.1f}x)"
+                )
+                assert bulk < per_row
+        finally:
+            await engine.dispose()
+            async with admin.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+            await admin.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.backend_crypto_tracker.processor.database.models import Base
+from app.core.backend_crypto_tracker.processor.database.models.custom_analysis import CustomAnalysis
+from app.core.backend_crypto_tracker.processor.database.models.manager import DatabaseManager
+from app.core.backend_crypto_tracker.processor.database.models.scan_result import ScanResult
+from app.core.backend_crypto_tracker.processor.database.models.token import Token
+from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysisModel
+
+
+def make_analysis(token, wallets, balance=1.0, score=50.0):
+    return {
+        'token_data': {'address': token, 'chain': 'ethereum', 'name': token, 'symbol': token[-3:]},
+        'token_score': score,
+        'metrics': {'analyzed_at': datetime(2024, 1, 1)},
+        'risk_flags': [],
+        'wallet_analyses': [
+            {'wallet_address': wallet, 'wallet_type': 'UNKNOWN', 'balance': balance, 'risk_score': 0.5}
+            for wallet in wallets
+        ],
+    }
+
+
+def run_with_manager(tmp_path, scenario):
+    """scenario(db, engine) gegen eine frische SQLite-Datenbank"""
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'manager.db'}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(CustomAnalysis.metadata.create_all)
+
+            db = DatabaseManager()
+            db.AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+            db.async_engine = engine
+            return await scenario(db, engine)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+async def count(engine, model):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+def test_save_token_analyses_upserts_tokens_and_wallets(tmp_path):
+    async def scenario(db, engine):
+        saved = await db.save_token_analyses([
+            make_analysis('0xaaa', ['0x1', '0x2']),
+            make_analysis('0xbbb', ['0x1']),
+            make_analysis('0xaaa', ['0x2', '0x3'], balance=2.0, score=70.0),
+            {'token_data': {'symbol': 'NOADDR'}},
+        ])
+        # Zweiter Scan: dieselben Holder werden aktualisiert, nicht dupliziert
+        await db.save_token_analyses([make_analysis('0xaaa', ['0x1', '0x2', '0x3'], balance=5.0)])
+
+        async with engine.connect() as conn:
+            wallets = (await conn.execute(
+                select(WalletAnalysisModel.token_address, WalletAnalysisModel.wallet_address,
+                       WalletAnalysisModel.balance, WalletAnalysisModel.token_id)
+                .order_by(WalletAnalysisModel.token_address, WalletAnalysisModel.wallet_address)
+            )).all()
+            token_ids = dict((await conn.execute(select(Token.address, Token.id))).all())
+
+        return saved, wallets, token_ids, await count(engine, Token), await count(engine, ScanResult)
+
+    saved, wallets, token_ids, tokens, scans = run_with_manager(tmp_path, scenario)
+
+    assert saved == 3
+    assert tokens == 2
+    assert scans == 4
+    assert [(t, w, b) for t, w, b, _ in wallets] == [
+        ('0xaaa', '0x1', 5.0), ('0xaaa', '0x2', 5.0), ('0xaaa', '0x3', 5.0), ('0xbbb', '0x1', 1.0),
+    ]
+    assert all(token_id == token_ids[token] for token, _, _, token_id in wallets)
+
+
+def test_history_pages_through_ties_without_gaps(tmp_path):
+    async def scenario(db, engine):
+        # Je Aufruf gleiche created_at → Reihenfolge innerhalb der Sekunde über id
+        for batch in range(3):
+            await db.save_token_analyses([
+                make_analysis('0xaaa', [], score=batch * 10 + i) for i in range(3)
+            ] + [make_analysis('0xbbb', [])])
+
+        async with engine.connect() as conn:
+            expected = (await conn.execute(
+                select(ScanResult.id).where(ScanResult.token_address == '0xaaa')
+                .order_by(ScanResult.created_at.desc(), ScanResult.id.desc())
+            )).scalars().all()
+
+        pages, cursor = [], None
+        while True:
+            page = await db.get_token_analysis_history(token_address='0xaaa', limit=4, cursor=cursor)
+            pages.append([item['id'] for item in page['items']])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        with pytest.raises(ValueError):
+            await db.get_token_analysis_history(cursor='not-a-cursor')
+
+        return expected, pages
+
+    expected, pages = run_with_manager(tmp_path, scenario)
+
+    assert [len(page) for page in pages] == [4, 4, 1]
+    assert [row_id for page in pages for row_id in page] == expected
+
+
+def test_cleanup_deletes_old_rows_in_chunks_and_keeps_wallet_analyses(tmp_path):
+    now = datetime.utcnow()
+    old, cutoff = now - timedelta(days=40), now - timedelta(days=30)
+
+    async def scenario(db, engine):
+        await db.save_token_analyses([make_analysis('0xaaa', ['0x1', '0x2'])])
+        async with engine.begin() as conn:
+            await conn.execute(insert(ScanResult.__table__), [
+                {'scan_type': 'token_scan', 'token_address': '0xaaa', 'chain': 'ethereum', 'created_at': old}
+                for _ in range(5)
+            ])
+            await conn.execute(insert(CustomAnalysis.__table__), [
+                {'token_address': '0xaaa', 'chain': 'ethereum', 'total_score': 1.0,
+                 'analysis_date': old if i < 3 else now}
+                for i in range(4)
+            ])
+            await conn.execute(
+                WalletAnalysisModel.__table__.update().values(updated_at=old, created_at=old)
+            )
+
+        # Ohne Zeitbudget wird nichts gelöscht, der nächste Lauf macht weiter
+        assert await db.cleanup_old_data(cutoff, chunk_size=2, max_seconds=0) == 0
+        deleted = await db.cleanup_old_data(cutoff, chunk_size=2)
+
+        return (deleted, await count(engine, ScanResult), await count(engine, CustomAnalysis),
+                await count(engine, WalletAnalysisModel))
+
+    deleted, scans, customs, wallets = run_with_manager(tmp_path, scenario)
+
+    assert deleted == 8
+    assert (scans, customs, wallets) == (1, 1, 2)
@@ -0,0 +1,111 @@
+import asyncio
+
+from app.core.backend_crypto_tracker.workers import enrichment_queue
+from app.core.backend_crypto_tracker.workers.enrichment_queue import FAILED, PENDING, RUNNING, EnrichmentQueue
+
+
+def make_queue(**kwargs):
+    return EnrichmentQueue(url=enrichment_queue.MEMORY_QUEUE_URL, **kwargs)
+
+
+def test_put_deduplicates_and_keeps_highest_priority():
+    async def scenario():
+        queue = make_queue()
+        await queue.put("labels", "ethereum", "0xa", priority=1)
+        await queue.put("labels", "ethereum", "0xb", priority=5)
+        await queue.put("labels", "ethereum", "0xa", data={"n": 2}, priority=9)
+        await queue.put("labels", "ethereum", "0xb", priority=0)
+
+        counts = await queue.counts()
+        tasks = await queue.claim(10)
+        await queue.close()
+        return counts, tasks
+
+    counts, tasks = asyncio.run(scenario())
+
+    assert counts[PENDING] == 2
+    assert [(t.address, t.priority) for t in tasks] == [("0xa", 9), ("0xb", 5)]
+    assert tasks[0].data == {"n": 2}
+
+
+def test_request_while_running_is_requeued_after_complete():
+    async def scenario():
+        queue = make_queue()
+        await queue.put("risk", "ethereum", "0xa")
+        [task] = await queue.claim(1)
+
+        # Während der Bearbeitung erneut angefordert
+        await queue.put("risk", "ethereum", "0xa", priority=3)
+        assert await queue.claim(1) == []
+        assert (await queue.counts())[RUNNING] == 1
+
+        await queue.complete(task)
+        [again] = await queue.claim(1)
+        await queue.complete(again)
+
+        counts = await queue.counts()
+        await queue.close()
+        return again, counts
+
+    again, counts = asyncio.run(scenario())
+
+    assert again.priority == 3
+    assert again.attempts == 0
+    assert counts[PENDING] == counts[RUNNING] == 0
+
+
+def test_failed_task_backs_off_and_ends_as_failed(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(enrichment_queue.time, "time", lambda: clock[0])
+
+    async def scenario():
+        queue = make_queue(max_attempts=3, retry_backoff_seconds=60)
+        await queue.put("labels", "ethereum", "0xa")
+
+        [task] = await queue.claim(1)
+        assert await queue.fail(task, "timeout") is True
+        assert await queue.claim(1) == []
+
+        clock[0] += 61
+        [task] = await queue.claim(1)
+        assert task.attempts == 1
+        assert await queue.fail(task, "timeout") is True
+
+        # Backoff verdoppelt sich: nach 61s noch nicht fällig
+        clock[0] += 61
+        assert await queue.claim(1) == []
+        clock[0] += 60
+        [task] = await queue.claim(1)
+        assert await queue.fail(task, "timeout") is False
+
+        clock[0] += 3600
+        assert await queue.claim(1) == []
+        counts = await queue.counts()
+
+        # Erneutes Einstellen setzt eine fehlgeschlagene Aufgabe zurück
+        await queue.put("labels", "ethereum", "0xa")
+        [fresh] = await queue.claim(1)
+        await queue.close()
+        return counts, fresh
+
+    counts, fresh = asyncio.run(scenario())
+
+    assert counts[FAILED] == 1
+    assert counts[PENDING] == 0
+    assert fresh.attempts == 0
+
+
+def test_recover_requeues_running_tasks():
+    async def scenario():
+        queue = make_queue()
+        await queue.put("labels", "ethereum", "0xa")
+        await queue.claim(1)
+        recovered = await queue.recover()
+        tasks = await queue.claim(1)
+        await queue.close()
+        return recovered, tasks
+
+    recovered, tasks = asyncio.run(scenario())
+
+    assert recovered == 1
+    assert [t.address for t in tasks] == ["0xa"]
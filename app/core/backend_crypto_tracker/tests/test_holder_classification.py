@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from app.core.backend_crypto_tracker.api.routes.custom_analysis_routes import CustomAnalysisRequest, stream_analysis_events
+from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletTypeEnum
+from app.core.backend_crypto_tracker.scanner.token_analyzer import TokenAnalysisConfig, TokenAnalyzer
+
+
+HOLDERS = [{'address': f"0x{i:040x}", 'balance': 100 - i} for i in range(1, 31)]
+
+
+def make_analyzer(**config):
+    analyzer = TokenAnalyzer(TokenAnalysisConfig(classification_workers=0, **config))
+    analyzer.ethereum_rpc = None  # Per-Wallet-Pfad statt JSON-RPC-Batch
+    in_flight = {'now': 0, 'max': 0, 'fetched': []}
+
+    async def fake_fetch(wallet_address, chain, token_address, limit=10):
+        in_flight['now'] += 1
+        in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        # Spätere Holder antworten schneller → Abschlussreihenfolge != Eingabereihenfolge
+        await asyncio.sleep(0.001 * (40 - int(wallet_address, 16)))
+        in_flight['now'] -= 1
+        in_flight['fetched'].append(wallet_address)
+        return {'address': wallet_address}
+
+    async def fake_stages(blockchain_data, wallet_address):
+        return {'tx_count': 1}
+
+    analyzer._get_wallet_blockchain_data = fake_fetch
+    analyzer._run_classification_stages = fake_stages
+    analyzer._classify_wallet_multistage = lambda metrics: (WalletTypeEnum.TRADER, 0.8)
+    return analyzer, in_flight
+
+
+def test_default_config_keeps_top_10_and_etherscan_free_tier(monkeypatch):
+    monkeypatch.delenv('MAX_HOLDERS_TO_ANALYZE', raising=False)
+    config = TokenAnalysisConfig()
+    assert config.max_holders_to_analyze == 10
+    assert config.provider_rate_limits['transactions'] == (5, 1)
+
+    monkeypatch.setenv('MAX_HOLDERS_TO_ANALYZE', '100')
+    assert TokenAnalysisConfig().max_holders_to_analyze == 100
+
+
+def test_holders_are_fetched_concurrently_and_streamed_in_completion_order():
+    analyzer, in_flight = make_analyzer(classification_concurrency=8)
+
+    async def collect():
+        return [address async for address, _ in analyzer.stream_wallet_classifications(HOLDERS, 'ethereum', '0xtoken')]
+
+    order = asyncio.run(collect())
+
+    assert sorted(order) == sorted(h['address'] for h in HOLDERS)
+    assert order == in_flight['fetched']
+    assert order[0] != HOLDERS[0]['address']
+    assert in_flight['max'] == 8
+
+
+def test_analyze_wallets_reports_each_classification_before_returning():
+    analyzer, _ = make_analyzer(max_holders_to_analyze=10)
+    streamed = []
+
+    result = asyncio.run(analyzer._analyze_wallets(
+        [dict(holder) for holder in HOLDERS], 'ethereum', '0xtoken',
+        on_wallet_classified=lambda address, classification: streamed.append((address, classification['wallet_type']))
+    ))
+
+    assert sorted(address for address, _ in streamed) == [h['address'] for h in HOLDERS[:10]]
+    assert {wallet_type for _, wallet_type in streamed} == {'TRADER'}
+    assert len(result['classified']) == 10
+    assert len(result['unclassified']) == 20
+
+
+def test_stream_route_emits_wallet_events_then_the_result():
+    class FakeAnalyzer:
+        async def analyze_custom_token(self, token_address, chain, wallet_source, recent_hours, on_wallet_classified):
+            for i in range(3):
+                await asyncio.sleep(0)
+                on_wallet_classified(f"0x{i}", {'wallet_type': 'WHALE', 'confidence_score': 0.9, 'classified': True})
+            return {'score': 42.0, 'token_info': {'address': token_address}}
+
+    request = CustomAnalysisRequest(token_address='0x' + 'a' * 40, chain='ethereum')
+
+    async def collect():
+        return [json.loads(line) async for line in stream_analysis_events(FakeAnalyzer(), request)]
+
+    events = asyncio.run(collect())
+
+    assert [event['type'] for event in events] == ['wallet', 'wallet', 'wallet', 'result']
+    assert [event['wallet_address'] for event in events[:3]] == ['0x0', '0x1', '0x2']
+    assert events[-1]['analysis_result']['score'] == 42.0
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.backend_crypto_tracker.scanner.token_analyzer import (
+    TokenAnalysisConfig,
+    TokenAnalyzer,
+    run_classification_stages,
+    shutdown_stage_pool,
+)
+from app.core.backend_crypto_tracker.utils.rate_limiter import rate_limiter
+
+PROVIDER_LATENCY = 0.3  # Sekunden pro Etherscan-Request
+
+
+def make_blockchain_data(wallet_address):
+    return {
+        'address': wallet_address,
+        'transactions': [
+            {
+                'hash': f"{wallet_address}{i:02x}",
+                'value': 1.0,
+                'value_usd': 3000.0,
+                'timestamp': 1_700_000_000 + i * 3600,
+                'from': wallet_address,
+                'to': '0x' + '2' * 40,
+                'token_transfers': []
+            }
+            for i in range(10)
+        ],
+        'token_balances': [],
+        'prices': {},
+        'current_balance': 1.0,
+        'total_portfolio_value_usd': 0.0,
+        'txs': [],
+        'balance': 1.0,
+        'inputs': [],
+        'outputs': []
+    }
+
+
+def make_analyzer(max_holders, transactions_per_second):
+    config = TokenAnalysisConfig(max_holders_to_analyze=max_holders)
+    config.provider_rate_limits['transactions'] = (transactions_per_second, 1)
+    analyzer = TokenAnalyzer(config)
+    analyzer.ethereum_rpc = None  # ein 'transactions'-Request pro Holder
+
+    async def fetch(wallet_address, chain, token_address, limit=10):
+        await analyzer._provider_slot('transactions', chain)
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return make_blockchain_data(wallet_address)
+
+    analyzer._get_wallet_blockchain_data = fetch
+    return analyzer
+
+
+async def old_top_10_path(holders):
+    """Bisheriger Pfad: sequentiell, neue Stage-Instanzen, fester Sleep pro Wallet"""
+    for holder in holders[:10]:
+        await asyncio.sleep(PROVIDER_LATENCY)
+        run_classification_stages(make_blockchain_data(holder['address']), holder['address'])
+        await asyncio.sleep(0.5)
+
+
+async def pipeline(holders, max_holders, transactions_per_second):
+    analyzer = make_analyzer(max_holders, transactions_per_second)
+    return await analyzer._analyze_wallets([dict(h) for h in holders], 'ethereum', '0xtoken')
+
+
+@pytest.mark.benchmark
+def test_holder_classification_benchmark():
+    holders = [{'address': f"0x{i:040x}", 'balance': 1000 - i} for i in range(1, 101)]
+
+    timings = {}
+
+    async def run_all():
+        started = time.perf_counter()
+        await old_top_10_path(holders)
+        timings['old top 10'] = time.perf_counter() - started
+
+        for max_holders, rate in ((10, 5), (100, 5), (100, 10), (100, 15)):
+            rate_limiter.reset()
+            started = time.perf_counter()
+            result = await pipeline(holders, max_holders, rate)
+            timings[f"pipeline top {max_holders} @ {rate} req/s"] = time.perf_counter() - started
+            assert len(result['classified']) == max_holders
+
+    # Ein Event-Loop für alle Läufe (der globale RateLimiter hält einen asyncio.Lock)
+    try:
+        asyncio.run(run_all())
+    finally:
+        shutdown_stage_pool()
+        rate_limiter.reset()
+
+    for name, seconds in timings.items():
+        print(f"{name}: {seconds:.2f}s")
+
+    assert timings['pipeline top 10 @ 5 req/s'] < timings['old top 10']
@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.backend_crypto_tracker.workers.job_scheduler import (
+    CronTrigger,
+    IntervalTrigger,
+    JobScheduler,
+    VirtualClock,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def test_interval_jobs_fire_on_time_with_bounded_jitter():
+    async def scenario():
+        clock = VirtualClock(start=1_000.0)
+        scheduler = JobScheduler(clock=clock, seed=7)
+        fired = []
+
+        async def job():
+            fired.append(clock.time())
+
+        scheduler.add_job('tick', job, IntervalTrigger(60, jitter=5))
+        await scheduler.start()
+        await clock.advance(605)
+        await scheduler.shutdown()
+        return fired
+
+    fired = run(scenario())
+    assert len(fired) == 10
+    for i, fired_at in enumerate(fired, start=1):
+        # Jitter verschiebt nur den Lauf, nicht das Raster
+        assert 1_000 + 60 * i <= fired_at <= 1_000 + 60 * i + 5
+
+
+def test_overlapping_runs_are_skipped_and_missed_runs_coalesced():
+    async def scenario():
+        clock = VirtualClock()
+        scheduler = JobScheduler(clock=clock, shutdown_timeout=0.05)
+        active = {'now': 0, 'max': 0}
+
+        async def slow_job():
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            try:
+                await clock.sleep(250)
+            finally:
+                active['now'] -= 1
+
+        job = scheduler.add_job('slow', slow_job, IntervalTrigger(60), run_immediately=True)
+        await scheduler.start()
+        await clock.advance(300)
+        await scheduler.shutdown()
+        return job, active
+
+    job, active = run(scenario())
+    assert active['max'] == 1
+    # t=0 läuft bis 250; die Fälligkeiten 60/120/180/240 fallen in den Lauf
+    assert job.skipped == 4
+    assert job.runs == 2
+    assert [run.status for run in job.history] == ['completed', 'cancelled']
+    # Abgebrochene Läufe verfälschen das Laufzeit-Histogramm nicht
+    assert job.histogram.count == 1
+    assert job.histogram.to_dict()['max_seconds'] == 250
+
+
+def test_coalesce_runs_once_after_a_clock_jump():
+    async def scenario():
+        clock = VirtualClock()
+        scheduler = JobScheduler(clock=clock)
+        runs = []
+
+        async def job():
+            runs.append(clock.time())
+
+        job_state = scheduler.add_job('catch_up', job, IntervalTrigger(10))
+        await scheduler.start()
+        # Uhr springt (z.B. Suspend) ohne dass der Scheduler-Loop dazwischen läuft
+        clock.now += 95
+        await clock.advance(0)
+        await scheduler.shutdown()
+        return runs, job_state
+
+    runs, job = run(scenario())
+    assert runs == [95]
+    assert job.coalesced == 8
+    assert job.due_at == 100
+
+
+def test_timeout_and_failures_are_recorded():
+    async def scenario():
+        clock = VirtualClock()
+        scheduler = JobScheduler(clock=clock)
+
+        async def hangs():
+            await clock.sleep(1_000)
+
+        async def fails():
+            raise ValueError("boom")
+
+        hanging = scheduler.add_job('hangs', hangs, IntervalTrigger(100), timeout=30, run_immediately=True)
+        failing = scheduler.add_job('fails', fails, IntervalTrigger(100), run_immediately=True)
+        await scheduler.start()
+        await clock.advance(50)
+        with pytest.raises(ValueError):
+            await scheduler.run_now('fails')
+        await scheduler.shutdown()
+        return hanging, failing
+
+    hanging, failing = run(scenario())
+    assert hanging.history[0].status == 'timeout'
+    assert hanging.history[0].finished_at == 30
+    assert failing.failures == 2
+    assert [run.manual for run in failing.history] == [False, True]
+
+
+def test_shutdown_stops_services_gracefully_and_cancels_stuck_jobs():
+    async def scenario():
+        clock = VirtualClock()
+        scheduler = JobScheduler(clock=clock, shutdown_timeout=0.05)
+        events = []
+        stopping = asyncio.Event()
+
+        async def service():
+            events.append('service started')
+            await stopping.wait()
+            events.append('service stopped')
+
+        async def stop_service():
+            stopping.set()
+
+        async def stuck():
+            try:
+                await clock.sleep(10_000)
+            except asyncio.CancelledError:
+                events.append('job cancelled')
+                raise
+
+        scheduler.add_service('worker', service, stop_service)
+        job = scheduler.add_job('stuck', stuck, IntervalTrigger(60), run_immediately=True)
+        await scheduler.start()
+        await clock.advance(1)
+        await scheduler.shutdown()
+        return events, job
+
+    events, job = run(scenario())
+    assert events == ['service started', 'service stopped', 'job cancelled']
+    assert job.history[0].status == 'cancelled'
+    assert not job.running
+
+
+def test_cron_trigger_next_fire():
+    every_quarter = CronTrigger("*/15 * * * *")
+    assert every_quarter.next_fire(ts(2024, 1, 1, 10, 7)) == ts(2024, 1, 1, 10, 15)
+    assert every_quarter.next_fire(ts(2024, 1, 1, 10, 45)) == ts(2024, 1, 1, 11, 0)
+
+    weekdays_at_nine = CronTrigger("0 9 * * 1-5")
+    # Freitag 10:00 → Montag 09:00
+    assert weekdays_at_nine.next_fire(ts(2024, 1, 5, 10, 0)) == ts(2024, 1, 8, 9, 0)
+
+    leap_day = CronTrigger("30 6 29 2 *")
+    assert leap_day.next_fire(ts(2024, 3, 1)) == ts(2028, 2, 29, 6, 30)
+
+    with pytest.raises(ValueError):
+        CronTrigger("61 * * * *")
@@ -0,0 +1,178 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.backend_crypto_tracker.services.radar.position_calculator import PositionCalculator
+from app.core.backend_crypto_tracker.services.radar.time_series_analyzer import TimeSeriesAnalyzer, TimeSeriesPoint
+
+
+def make_wallets(count):
+    return [{"address": f"0x{i:040x}", "risk_score": 0.5} for i in range(count)]
+
+
+def make_transactions(wallets, count, seed=0, start=0):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    transactions = []
+    for i in range(start, start + count):
+        sender, receiver = rng.sample(wallets, 2)
+        transactions.append({
+            "hash": f"0x{i:064x}",
+            "from_address": sender["address"],
+            "to_address": receiver["address"],
+            "value": rng.uniform(0, 5000),
+            "timestamp": now - timedelta(days=rng.uniform(0, 40)),
+        })
+    return transactions
+
+
+def reference_connections(wallet_data, transaction_data):
+    """Bisheriger Pfad: Paarvergleich über alle Wallets"""
+    now = datetime.utcnow()
+    tx_index = {}
+    for tx in transaction_data:
+        tx_index.setdefault(tx["from_address"], {}).setdefault(tx["to_address"], []).append(tx)
+
+    connections = []
+    for i, wallet1 in enumerate(wallet_data):
+        for wallet2 in wallet_data[i + 1:]:
+            transactions = (
+                tx_index.get(wallet1["address"], {}).get(wallet2["address"], [])
+                + tx_index.get(wallet2["address"], {}).get(wallet1["address"], [])
+            )
+            if not transactions:
+                continue
+            total_value = sum(tx["value"] for tx in transactions)
+            recency = sum(max(0, 1 - (now - tx["timestamp"]).days / 30) for tx in transactions)
+            strength = (
+                min(1.0, len(transactions) / 50) * 0.4
+                + min(1.0, total_value / 100000) * 0.3
+                + 0.1
+                + min(1.0, recency / len(transactions)) * 0.2
+            )
+            connections.append((wallet1["address"], wallet2["address"], strength, len(transactions),
+                                total_value, max(tx["timestamp"] for tx in transactions)))
+    connections.sort(key=lambda connection: connection[2], reverse=True)
+    return connections
+
+
+def as_tuples(connections):
+    return [(c.from_wallet, c.to_wallet, c.strength, c.interaction_count, c.total_value, c.last_interaction)
+            for c in connections]
+
+
+def assert_same_connections(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got[:2] == want[:2]
+        assert got[2] == pytest.approx(want[2])
+        assert got[3] == want[3]
+        assert got[4] == pytest.approx(want[4])
+        assert got[5] == want[5]
+
+
+def test_connections_match_pairwise_reference():
+    wallets = make_wallets(40)
+    transactions = make_transactions(wallets, 300)
+    transactions.append({"from_address": wallets[0]["address"], "to_address": wallets[0]["address"], "value": 1})
+    transactions.append({"from_address": wallets[1]["address"], "to_address": "0xoutside", "value": 1})
+
+    connections = PositionCalculator().calculate_wallet_connections(wallets, transactions)
+
+    assert_same_connections(as_tuples(connections), reference_connections(wallets, transactions[:-2]))
+
+
+def test_cached_graph_is_updated_incrementally():
+    wallets = make_wallets(30)
+    first = make_transactions(wallets, 200, seed=1)
+    second = make_transactions(wallets, 100, seed=2, start=200)
+    calculator = PositionCalculator()
+
+    calculator.calculate_wallet_connections(wallets, first, contract_address="0xc", chain="ethereum")
+    # Überlappende Lieferung: bereits gesehene Hashes werden nicht doppelt gezählt
+    connections = calculator.calculate_wallet_connections(
+        wallets, first[150:] + second, contract_address="0xc", chain="ethereum"
+    )
+
+    graph = calculator._graphs[("0xc", "ethereum", None)]
+    assert graph.transaction_count == 300
+    assert_same_connections(as_tuples(connections), reference_connections(wallets, first + second))
+
+
+def test_cached_graph_does_not_double_count_hashless_transactions():
+    wallets = make_wallets(20)
+    transactions = [{k: v for k, v in tx.items() if k != "hash"} for tx in make_transactions(wallets, 100, seed=4)]
+    calculator = PositionCalculator()
+
+    calculator.calculate_wallet_connections(wallets, transactions[:60], contract_address="0xc", chain="ethereum")
+    connections = calculator.calculate_wallet_connections(wallets, transactions, contract_address="0xc", chain="ethereum")
+
+    graph = calculator._graphs[("0xc", "ethereum", None)]
+    assert graph.transaction_count == 100
+    assert_same_connections(as_tuples(connections), reference_connections(wallets, transactions))
+
+
+def test_cached_graph_evicts_transactions_outside_window():
+    wallets = make_wallets(20)
+    transactions = make_transactions(wallets, 200, seed=3)
+    calculator = PositionCalculator()
+
+    connections = calculator.calculate_wallet_connections(
+        wallets, transactions, contract_address="0xc", chain="ethereum", time_period_hours=24 * 7
+    )
+
+    cutoff = datetime.utcnow() - timedelta(days=7)
+    recent = [tx for tx in transactions if tx["timestamp"] >= cutoff]
+    assert_same_connections(as_tuples(connections), reference_connections(wallets, recent))
+
+
+def test_positions_stay_inside_radar():
+    wallets = [
+        {"address": f"0x{i:040x}", "transaction_count": i * 40, "unique_interactions": i,
+         "total_value": i * 1e5, "last_activity": datetime.utcnow().isoformat(), "risk_score": i / 20,
+         "connections": ["a"] * (i % 3)}
+        for i in range(20)
+    ]
+    wallets.append({"address": "0xbroken", "last_activity": "not-a-date", "risk_score": 0.5})
+
+    positions = PositionCalculator().calculate_wallet_positions(wallets, {})
+
+    assert [p.wallet_address for p in positions] == [w["address"] for w in wallets]
+    assert positions[-1].activity_score == 0.5
+    assert positions[3].connection_count == 0 and positions[4].connection_count == 1
+    for position in positions:
+        assert 0.1 <= position.distance_from_center <= 0.9
+        assert (position.x - 0.5) ** 2 + (position.y - 0.5) ** 2 == pytest.approx(position.distance_from_center ** 2)
+    # Höhere Aktivität = näher am Zentrum
+    assert positions[19].distance_from_center < positions[1].distance_from_center
+
+
+def test_trend_slope_and_volatility():
+    start = datetime(2024, 1, 1)
+    counts = [10, 14, 18, 22, 26, 30]
+    series = [TimeSeriesPoint(start + timedelta(hours=i), count, [], 0.0, 0.0, {}) for i, count in enumerate(counts)]
+
+    trends = TimeSeriesAnalyzer()._analyze_trends(series)
+
+    assert trends["transaction_slope"] == pytest.approx(4.0)
+    assert trends["transaction_trend"] == "strongly_increasing"
+    assert trends["volatility"] == pytest.approx(6.831300510639732)
+    assert trends["data_points"] == 6
+
+
+@pytest.mark.benchmark
+def test_benchmark_connections_per_second(timed):
+    wallets = make_wallets(1000)
+    transactions = make_transactions(wallets, 5000, seed=4)
+
+    _, reference_seconds = timed(reference_connections, wallets, transactions)
+    _, graph_seconds = timed(PositionCalculator().calculate_wallet_connections, wallets, transactions)
+
+    print(
+        f"\n{len(wallets)} wallets x {len(transactions)} txs: "
+        f"pairwise {len(transactions) / reference_seconds:.0f} txs/s, "
+        f"graph {len(transactions) / graph_seconds:.0f} txs/s "
+        f"({reference_seconds / graph_seconds:.1f}x)"
+    )
+    assert graph_seconds < reference_seconds
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.core.backend_crypto_tracker.workers.scan_executor import ScanCheckpoint, ScanExecutor, ScanProgress
+
+
+ITEMS = [("ethereum", f"0x{i}") for i in range(4)]
+
+
+def run(checkpoint, analyze, max_attempts):
+    executor = ScanExecutor(max_attempts=max_attempts, retry_delay_seconds=0)
+    progress = ScanProgress(total=len(checkpoint.items), done=len(checkpoint.done), failed=checkpoint.failed)
+
+    async def save():
+        pass
+
+    return asyncio.run(executor.run(checkpoint, progress, analyze, save))
+
+
+def test_failed_tokens_stay_open_and_are_retried_on_resume():
+    calls = []
+
+    async def flaky(chain, address):
+        calls.append(address)
+        if address == "0x1":
+            raise RuntimeError("rate limited")
+        return address == "0x2"
+
+    checkpoint = ScanCheckpoint(scan_type="analysis", items=list(ITEMS))
+    progress = run(checkpoint, flaky, max_attempts=2)
+
+    # Zweimal versucht, nicht als erledigt markiert
+    assert calls.count("0x1") == 2
+    assert checkpoint.failed_items == [("ethereum", "0x1")]
+    assert ("ethereum", "0x1") not in checkpoint.done
+    assert (progress.done, progress.failed, progress.high_risk) == (3, 1, 1)
+
+    # Resume aus dem Checkpoint: nur das fehlgeschlagene Token wird erneut analysiert
+    resumed = ScanCheckpoint.from_json(checkpoint.to_json())
+    assert resumed.pending() == [("ethereum", "0x1")]
+
+    calls.clear()
+
+    async def healthy(chain, address):
+        calls.append(address)
+        return False
+
+    progress = run(resumed, healthy, max_attempts=2)
+
+    assert calls == ["0x1"]
+    assert resumed.failed_items == []
+    assert (progress.done, progress.failed) == (4, 0)
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.core.backend_crypto_tracker.api.controllers.scanner_controller import ScannerController
+from app.core.backend_crypto_tracker.workers.scheduler import SchedulerConfig, SchedulerManager
+
+
+class FakeAnalyzer:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.saved = []
+
+    async def save_scan_job(self, scan_job):
+        self.saved.append((scan_job.id, scan_job.status.value))
+
+    async def get_scan_jobs(self, status=None):
+        return []
+
+
+def test_controller_runs_scans_through_the_scheduler_worker():
+    async def scenario():
+        manager = SchedulerManager(SchedulerConfig(enabled=False))
+        controller = ScannerController(manager)
+        await controller.start()
+
+        worker = manager.scanner_worker
+        assert worker is controller.scanner_worker
+
+        worker.token_analyzer = FakeAnalyzer()
+        worker.db_manager = FakeDatabase()
+        release = asyncio.Event()
+
+        async def analyze(chain, token_address):
+            if token_address == "0x3":
+                await release.wait()
+            return token_address == "0x1"
+
+        worker._make_token_analysis = lambda checkpoint: analyze
+
+        started = await controller.start_analysis_scan(["0x1", "0x2", "0x3"], "ethereum", False)
+        scan_id = started["scan_id"]
+        for _ in range(50):
+            await asyncio.sleep(0)
+
+        # Laufender Scan: Live-Fortschritt aus dem Worker
+        status = await controller.get_scan_status(scan_id)
+        assert (status["tokens_done"], status["tokens_remaining"]) == (2, 1)
+        assert "tokens_per_minute" in status
+        assert scan_id in (await controller.get_status())["active_scans"]
+
+        release.set()
+        while scan_id in controller.active_scans:
+            await asyncio.sleep(0)
+
+        # Abgeschlossener Scan: aus dem Verlauf des Workers
+        status = await controller.get_scan_status(scan_id)
+        assert (status["status"], status["tokens_analyzed"], status["high_risk_tokens"]) == ("completed", 3, 1)
+        assert worker.db_manager.saved[-1] == (scan_id, "completed")
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import asyncio
+
+from app.core.backend_crypto_tracker.workers.source_batcher import SourceBatcher
+
+
+def test_batcher_deduplicates_lookups_into_one_batch():
+    calls = []
+
+    async def fetch_many(chain, addresses):
+        calls.append((chain, sorted(addresses)))
+        return {address: address.upper() for address in addresses}
+
+    async def fetch_one(chain, address):
+        raise AssertionError("fetch_many expected")
+
+    async def scenario():
+        batcher = SourceBatcher("test", fetch_one, fetch_many, batch_window=0.01)
+        results = await asyncio.gather(
+            batcher.lookup("ethereum", "0xa"),
+            batcher.lookup("ethereum", "0xb"),
+            batcher.lookup("ethereum", "0xa"),
+            batcher.lookup("solana", "0xa"),
+        )
+        return results, batcher.get_stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert results == ["0XA", "0XB", "0XA", "0XA"]
+    assert sorted(calls) == [("ethereum", ["0xa", "0xb"]), ("solana", ["0xa"])]
+    assert (stats["lookups"], stats["requests"], stats["batches"]) == (4, 2, 2)
+
+
+def test_batcher_failed_batch_reaches_every_caller():
+    async def fetch_many(chain, addresses):
+        raise RuntimeError("source down")
+
+    async def scenario():
+        batcher = SourceBatcher("test", None, fetch_many, batch_window=0.01)
+        results = await asyncio.gather(
+            batcher.lookup("ethereum", "0xa"),
+            batcher.lookup("ethereum", "0xa"),
+            batcher.lookup("ethereum", "0xb"),
+            return_exceptions=True,
+        )
+        return results, batcher.errors
+
+    results, errors = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert errors == 1
+
+
+def test_batcher_single_lookup_errors_stay_per_address():
+    async def fetch_one(chain, address):
+        if address == "0xbad":
+            raise ValueError(address)
+        return address
+
+    async def scenario():
+        batcher = SourceBatcher("test", fetch_one, batch_window=0.01)
+        good = batcher.lookup("ethereum", "0xa")
+        bad = batcher.lookup("ethereum", "0xbad")
+        results = await asyncio.gather(good, bad, return_exceptions=True)
+        await batcher.close()
+        return results, batcher.get_stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert results[0] == "0xa"
+    assert isinstance(results[1], ValueError)
+    assert (stats["requests"], stats["errors"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_batcher_flushes_when_batch_is_full():
+    sizes = []
+
+    async def fetch_many(chain, addresses):
+        sizes.append(len(addresses))
+        return {}
+
+    async def scenario():
+        batcher = SourceBatcher("test", None, fetch_many, batch_size=2, batch_window=10)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.lookup("ethereum", "0xa"), batcher.lookup("ethereum", "0xb")),
+            timeout=1
+        )
+
+    assert asyncio.run(scenario()) == [None, None]
+    assert sizes == [2]
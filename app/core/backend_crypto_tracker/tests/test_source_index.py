@@ -0,0 +1,71 @@
+import random
+import re
+
+import pytest
+
+from app.core.backend_crypto_tracker.services.contract.analysis_cache import ContractAnalysisCache
+from app.core.backend_crypto_tracker.services.contract.security_scanner import SecurityScanner
+from app.core.backend_crypto_tracker.services.contract.source_index import PatternScanner, SourceIndex
+
+
+FRAGMENTS = [
+    "function ", "Function ", "owner", "transferOwnership", "renounceOwnership", "mint", "burn",
+    "(", ")", " ", "  ", "\n", ";", "{", "}", "tx.origin", "TX.ORIGIN", " == ", "require(",
+    ".call", ".call{value: x}(\"\")", ".send(", ".transfer(", "selfdestruct", "delegatecall",
+    "onlyOwner", "pause", "blacklist", "address", "uint256 ", "msg.sender", "_to", "amount",
+    "functionfunction", "tx.tx.origin", "//", "emit ", "x",
+]
+
+
+def make_source(rng, length):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(length))
+
+
+def finditer_spans(scanner, source):
+    return {key: [m.span() for m in regex.finditer(source)] for key, regex in scanner.rules.items()}
+
+
+@pytest.fixture(scope="module")
+def security_rules_scanner():
+    scanner = SecurityScanner(analysis_cache=ContractAnalysisCache(url="memory://"))
+    return scanner._get_pattern_scanner()
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_scanner_matches_finditer_on_random_sources(security_rules_scanner, seed):
+    rng = random.Random(seed)
+    source = make_source(rng, rng.randint(0, 400))
+
+    assert security_rules_scanner.scan(source) == finditer_spans(security_rules_scanner, source)
+
+
+def test_scanner_handles_shared_and_overlapping_anchors():
+    scanner = PatternScanner({
+        "short": (r"ab", 0),
+        "long": (r"abab", 0),
+        "optional_tail": (r"abc?", re.IGNORECASE),
+        "lazy": (r"a.*?b", 0),
+        "escaped": (r"a\.b", 0),
+    })
+    rng = random.Random(11)
+    sources = ["", "ababab", "ABAB abc a.b", "aab"] + [
+        "".join(rng.choice("abAB.c ") for _ in range(60)) for _ in range(50)
+    ]
+
+    for source in sources:
+        assert scanner.scan(source) == finditer_spans(scanner, source)
+
+
+def test_pattern_without_literal_prefix_is_rejected():
+    with pytest.raises(ValueError):
+        PatternScanner({"any": (r"\w+", 0)})
+
+
+def test_source_index_line_numbers_match_counting_newlines():
+    source = make_source(random.Random(5), 300)
+    index = SourceIndex(source)
+
+    assert index.line_count == len(source.split("\n"))
+    for position in range(0, len(source), 7):
+        assert index.line_number(position) == source[:position].count("\n") + 1
+        assert index.line_text(position) == source.split("\n")[index.line_number(position) - 1]
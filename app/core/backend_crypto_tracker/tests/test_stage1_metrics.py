@@ -0,0 +1,141 @@
+import math
+import random
+
+import pytest
+
+from app.core.backend_crypto_tracker.scanner.wallet_classifierr.core.adaptive_classifier import AdaptiveClassifier
+from app.core.backend_crypto_tracker.scanner.wallet_classifierr.core.stages import (
+    Stage2_DerivedMetrics,
+    Stage3_ContextAnalysis,
+)
+from app.core.backend_crypto_tracker.scanner.wallet_classifierr.core.stages_blockchain import (
+    AAVE_POOLS,
+    DEX_ROUTERS,
+    FLASHLOAN_SIGNATURES,
+    SWAP_SIGNATURES,
+    Stage1_RawMetrics,
+)
+
+
+WALLET = '0x00000000000000000000000000000000000000aa'
+COUNTERPARTIES = [f"0x{i:040x}" for i in range(1, 12)] + list(DEX_ROUTERS['ethereum']) + list(AAVE_POOLS)
+METHODS = ['', '0x', '0xa9059cbb'] + [sig + '00' * 32 for sig in SWAP_SIGNATURES | FLASHLOAN_SIGNATURES]
+TOKENS = [f"0x{0xb0 + i:040x}" for i in range(4)]
+
+
+def make_wallet(seed, num_txs):
+    """Synthetic EVM wallet incl. the edge cases Stage1 has defaults for"""
+    rng = random.Random(seed)
+    start = 1_600_000_000 + rng.randrange(10_000_000)
+    step = rng.choice([60, 600, 3_600])
+    block = 15_000_000 + rng.randrange(1_000)
+    transactions = []
+
+    for i in range(num_txs):
+        block += rng.choice([0, 0, 1, 2])
+        counterparty = rng.choice(COUNTERPARTIES)
+        outgoing = rng.random() < 0.5
+        tx = {
+            'hash': f"0x{seed:08x}{i:056x}",
+            'from': (WALLET.upper().replace('0X', '0x') if outgoing else counterparty),
+            'to': (counterparty if outgoing else WALLET),
+            'value': rng.choice([0, 0.1, 1.0, rng.uniform(0, 5)]),
+            'value_usd': rng.choice([0, 5.0, rng.uniform(0, 10_000)]),
+            'timestamp': rng.choice([0] + [start + i * step + rng.choice([0, 0, 7])] * 9),
+            'gas_price': rng.choice([0, 20e9, 20e9, rng.uniform(10e9, 90e9)]),
+            'nonce': rng.choice([None, i, i, i + rng.randrange(3)]),
+            'block_number': block,
+            'input': rng.choice(METHODS).upper() if rng.random() < 0.05 else rng.choice(METHODS),
+            'token_transfers': [
+                {
+                    'from': rng.choice([WALLET, counterparty]),
+                    'to': rng.choice([WALLET, counterparty, '']),
+                    'token_address': rng.choice(TOKENS),
+                    'value_usd': rng.uniform(0, 500),
+                }
+                for _ in range(rng.choice([0, 0, 1, 2, 3, 7]))
+            ],
+        }
+        if rng.random() < 0.8:
+            tx['transaction_index'] = rng.randrange(250)
+        if rng.random() < 0.05:
+            del tx['block_number']
+        if rng.random() < 0.05:
+            del tx['to']
+        transactions.append(tx)
+
+    return {
+        'address': WALLET,
+        'transactions': transactions,
+        'current_balance': rng.uniform(0, 100),
+        'token_balances': [
+            {'token_address': token, 'balance': rng.uniform(0, 1_000), 'symbol': symbol}
+            for token, symbol in zip(TOKENS, ['usdt', 'uni', 'pepe', 'xyz'])
+        ],
+        'prices': {token: rng.uniform(0.1, 10) for token in TOKENS},
+        'total_portfolio_value_usd': rng.uniform(0, 5_000_000),
+    }
+
+
+def assert_same_metrics(columnar, reference):
+    assert list(columnar) == list(reference)
+    for key, expected in reference.items():
+        value = columnar[key]
+        if isinstance(expected, (list, dict, str)):
+            assert value == expected, key
+        else:
+            assert value == pytest.approx(expected, rel=1e-9, abs=1e-12), key
+
+
+@pytest.mark.parametrize('seed,num_txs', [(1, 2), (2, 4), (3, 40), (4, 250), (5, 1_000)])
+def test_columnar_stage1_matches_per_tx_reference(seed, num_txs):
+    data = make_wallet(seed, num_txs)
+
+    columnar = Stage1_RawMetrics.execute(data, config={})
+    reference = Stage1_RawMetrics.execute(data, config={'columnar': False})
+
+    assert_same_metrics(columnar, reference)
+
+
+def test_matrix_classifier_matches_verbose_path():
+    metrics_list = []
+    for seed in range(20):
+        raw = Stage1_RawMetrics.execute(make_wallet(seed, 60 + seed * 10), config={})
+        derived = Stage2_DerivedMetrics().execute(raw, config={})
+        metrics = {**raw, **derived, **Stage3_ContextAnalysis().execute(derived, WALLET, context_db=None)}
+        # Missing, boolean and NaN features
+        metrics.pop('dex_swap_count', None)
+        metrics['institutional_wallet'] = bool(seed % 2)
+        metrics['balance_volatility'] = math.nan if seed == 3 else metrics.get('balance_volatility')
+        metrics_list.append(metrics)
+
+    batched = AdaptiveClassifier.classify_many(metrics_list)
+    for metrics, probabilities in zip(metrics_list, batched):
+        expected = AdaptiveClassifier.classify(metrics, debug=True)
+        assert AdaptiveClassifier.classify(metrics) == pytest.approx(expected, rel=1e-12)
+        assert probabilities == pytest.approx(expected, rel=1e-12)
+        assert AdaptiveClassifier.extract_features(metrics) == pytest.approx(
+            AdaptiveClassifier.extract_features(metrics, debug=True)
+        )
+
+
+@pytest.mark.benchmark
+def test_benchmark_wallets_per_second(timed):
+    wallets = [make_wallet(seed, 500) for seed in range(200)]
+
+    def per_tx():
+        for data in wallets:
+            AdaptiveClassifier.classify(Stage1_RawMetrics.execute(data, config={'columnar': False}), debug=True)
+
+    _, reference_seconds = timed(per_tx)
+    _, columnar_seconds = timed(
+        AdaptiveClassifier.classify_many, [Stage1_RawMetrics.execute(data, config={}) for data in wallets]
+    )
+
+    print(
+        f"\n{len(wallets)} wallets x 500 txs: "
+        f"per-tx {len(wallets) / reference_seconds:.0f} wallets/s, "
+        f"columnar {len(wallets) / columnar_seconds:.0f} wallets/s "
+        f"({reference_seconds / columnar_seconds:.1f}x)"
+    )
+    assert columnar_seconds < reference_seconds
@@ -0,0 +1,162 @@
+import asyncio
+
+from aiohttp import web
+
+from app.core.backend_crypto_tracker.blockchain.blockchain_specific.ethereum.get_wallets_batch_data import (
+    BALANCE_OF_SELECTOR,
+    DECIMALS_SELECTOR,
+    NATIVE_PRICE_PROXY,
+    EvmBatchDataService,
+)
+from app.core.backend_crypto_tracker.blockchain.utils.http_session import close_shared_session
+
+
+WALLETS = [f"0x{i:040x}" for i in range(1, 31)]
+TOKENS = {f"0x{0xa0 + i:040x}": 6 + i * 6 for i in range(3)}  # token → decimals
+
+
+def fake_transactions(wallet):
+    index = int(wallet, 16)
+    tokens = list(TOKENS)
+    touched = [tokens[index % 3], tokens[(index + 1) % 3]]
+    return [
+        {
+            'hash': f"0x{index:064x}",
+            'value': 0,
+            'token_transfers': [{'token_address': token.upper().replace('0X', '0x'), 'token_symbol': f"T{token[-1]}", 'value': 1.0}],
+        }
+        for token in touched
+    ]
+
+
+class FakeRpcNode:
+    """Minimal JSON-RPC node: eth_getBalance, decimals() and balanceOf()"""
+
+    def __init__(self):
+        self.requests = []
+
+    def call(self, method, params):
+        if method == 'eth_getBalance':
+            return hex(int(params[0], 16) * 10 ** 18)
+        to, data = params[0]['to'], params[0]['data']
+        if data == DECIMALS_SELECTOR:
+            return hex(TOKENS[to])
+        assert data.startswith(BALANCE_OF_SELECTOR)
+        wallet = int(data[len(BALANCE_OF_SELECTOR):], 16)
+        return hex(wallet * 10 ** TOKENS[to])
+
+    async def handle(self, request):
+        payload = await request.json()
+        self.requests.append(payload)
+        return web.json_response([
+            {'jsonrpc': '2.0', 'id': call['id'], 'result': self.call(call['method'], call['params'])}
+            for call in payload
+        ])
+
+
+async def run_batch_fetch(max_batch_size, wallets=WALLETS, tokens=None):
+    node = FakeRpcNode()
+    app = web.Application()
+    app.router.add_post('/', node.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    price_calls = []
+
+    async def fake_prices(tokens, chain):
+        price_calls.append(list(tokens))
+        return {token: 2.0 for token in tokens}
+
+    async def fake_fetch_transactions(address, chain, limit):
+        return fake_transactions(address)
+
+    try:
+        service = EvmBatchDataService(
+            f"http://127.0.0.1:{port}/",
+            chain='ethereum',
+            max_batch_size=max_batch_size,
+            transactions_fetcher=fake_fetch_transactions,
+            price_fetcher=fake_prices
+        )
+        result = await service.fetch_wallets(wallets, tokens=tokens)
+    finally:
+        await close_shared_session()
+        await runner.cleanup()
+    return result, node, price_calls, service
+
+
+def test_batch_fetch_dedups_tokens_and_batches_rpc_calls():
+    result, node, price_calls, service = asyncio.run(run_batch_fetch(max_batch_size=25))
+
+    calls = [call for request in node.requests for call in request]
+    decimals_calls = [c for c in calls if c['method'] == 'eth_call' and c['params'][0]['data'] == DECIMALS_SELECTOR]
+    balance_calls = [c for c in calls if c['method'] == 'eth_call' and c['params'][0]['data'] != DECIMALS_SELECTOR]
+
+    # decimals once per distinct token, balanceOf only for touched (wallet, token) pairs
+    assert sorted(c['params'][0]['to'] for c in decimals_calls) == sorted(TOKENS)
+    assert len(balance_calls) == 2 * len(WALLETS)
+    assert len([c for c in calls if c['method'] == 'eth_getBalance']) == len(WALLETS)
+    # 30 + 3 + 60 calls in batches of <= 25
+    assert all(len(request) <= 25 for request in node.requests)
+    assert len(node.requests) == service.stats['rpc_requests'] == 2 + 1 + 3
+
+    # One price lookup for all distinct tokens (+ native price proxy)
+    assert len(price_calls) == 1
+    assert sorted(price_calls[0]) == sorted(list(TOKENS) + [NATIVE_PRICE_PROXY['ethereum']])
+
+    wallet = WALLETS[4]
+    data = result[wallet]
+    assert data['current_balance'] == 5.0
+    assert {b['token_address'] for b in data['token_balances']} == {t['token_transfers'][0]['token_address'].lower() for t in fake_transactions(wallet)}
+    assert all(b['balance'] == 5.0 and b['value_usd'] == 10.0 for b in data['token_balances'])
+    assert data['total_portfolio_value_usd'] == 20.0
+
+
+def test_requested_token_balance_is_fetched_for_every_wallet():
+    untouched = list(TOKENS)[(4 + 2) % 3]
+    result, node, price_calls, service = asyncio.run(
+        run_batch_fetch(max_batch_size=100, wallets=WALLETS[3:6], tokens=[untouched.upper().replace('0X', '0x')])
+    )
+
+    # Alle drei Wallets bekommen die Balance des analysierten Tokens, auch ohne Transfer
+    for wallet in WALLETS[3:6]:
+        balances = {b['token_address']: b for b in result[wallet]['token_balances']}
+        assert untouched in balances
+        assert balances[untouched]['balance'] == int(wallet, 16)
+        assert result[wallet]['prices'][untouched] == 2.0
+    assert len(price_calls) == 1
+
+
+def test_all_evm_holders_use_the_batched_fetch():
+    from app.core.backend_crypto_tracker.scanner.token_analyzer import TokenAnalysisConfig, TokenAnalyzer
+
+    analyzer = TokenAnalyzer(TokenAnalysisConfig(classification_workers=0))
+    holders = [{'address': wallet.upper().replace('0X', '0x')} for wallet in WALLETS[:4]]
+    prefetch_calls = []
+
+    async def fake_prefetch(group, chain, rpc_url, token_address=None):
+        prefetch_calls.append(([holder['address'].lower() for holder in group], token_address))
+        return {holder['address'].lower(): {'address': holder['address'].lower()} for holder in group}
+
+    async def fake_classify(holder, chain, token_address, semaphore, blockchain_data=None):
+        return holder['address'].lower(), {'blockchain_data': blockchain_data}
+
+    analyzer._prefetch_evm_wallet_data = fake_prefetch
+    analyzer._classify_holder = fake_classify
+
+    async def collect(holders):
+        return [item async for item in analyzer.stream_wallet_classifications(holders, 'ethereum', '0xtoken')]
+
+    results = dict(asyncio.run(collect(holders)))
+
+    # Holder #1 als eigener kleiner Batch, alle mit dem analysierten Token
+    assert prefetch_calls == [(WALLETS[:1], '0xtoken'), (WALLETS[1:4], '0xtoken')]
+    assert all(results[wallet]['blockchain_data'] == {'address': wallet} for wallet in WALLETS[:4])
+
+    # Auch ein einzelner Holder geht über den Batch
+    prefetch_calls.clear()
+    asyncio.run(collect(holders[:1]))
+    assert prefetch_calls == [(WALLETS[:1], '0xtoken')]
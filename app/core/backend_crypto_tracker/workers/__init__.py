@@ -1,133 +1,22 @@
 # app/core/backend_crypto_tracker/workers/__init__.py
-# Import worker classes for easy access
-# from .scanner_worker import ScanJobManager, TokenAlertManager, ScanConfig, AlertConfig
-
-# Placeholder for SchedulerManager - needs schedule library and integration
-import schedule
-import time
-import threading
-import asyncio
-import os
-# from .scanner_worker import ScanJobManager, ScanConfig, AlertConfig # Import from same package
-
-class SchedulerManager:
-    def __init__(self):
-        self.job_manager = None
-        self.scheduler_thread = None
-        self.is_running = False
-        # Lade Konfiguration (Placeholder - use actual config loader)
-        # self.scan_config = ScanConfig(...)
-        # self.alert_config = AlertConfig(...)
-        # For now, use placeholder or load from environment
-        self.scan_config = type('ScanConfig', (), {
-            'scan_interval_hours': int(os.getenv('SCAN_INTERVAL_HOURS', 6)),
-            'max_tokens_per_scan': int(os.getenv('MAX_TOKENS_PER_SCAN', 100)),
-            'min_score_for_alert': float(os.getenv('MIN_SCORE_FOR_ALERT', 75.0)),
-            'email_alerts': os.getenv('EMAIL_ALERTS', 'false').lower() == 'true',
-            'telegram_alerts': os.getenv('TELEGRAM_ALERTS', 'false').lower() == 'true',
-            'export_results': True, # Add to env if needed
-            'cleanup_old_data_days': 30 # Add to env if needed
-        })()
-        self.alert_config = type('AlertConfig', (), {
-            'email_user': os.getenv('EMAIL_USER', ''),
-            'email_password': os.getenv('EMAIL_PASSWORD', ''),
-            'email_recipients': os.getenv('EMAIL_RECIPIENTS', '').split(',') if os.getenv('EMAIL_RECIPIENTS') else [],
-            'telegram_bot_token': os.getenv('TELEGRAM_BOT_TOKEN', ''),
-            'telegram_chat_id': os.getenv('TELEGRAM_CHAT_ID', ''),
-            'email_host': "smtp.gmail.com", # Make configurable if needed
-            'email_port': 587 # Make configurable if needed
-        })()
-
-    async def start(self):
-        """Startet den Scheduler"""
-        if self.is_running:
-            # logger.warning("Scheduler läuft bereits")
-            print("Scheduler läuft bereits") # Placeholder
-            return
-        try:
-            # Initialisiere Job Manager
-            # Ensure scanner_worker imports are correct
-            self.job_manager = ScanJobManager(self.scan_config, self.alert_config)
-            # await self.job_manager.initialize() # Uncomment if initialize is implemented
-
-            # Setup Schedule
-            schedule.every(self.scan_config.scan_interval_hours).hours.do(
-                self._run_scheduled_job
-            )
-
-            # Führe ersten Scan sofort aus (optional)
-            # logger.info("Führe initialen Scan aus...")
-            print("Führe initialen Scan aus...") # Placeholder
-            # await self.job_manager.run_scan_job() # Uncomment for initial run
-
-            # Starte Scheduler Thread
-            self.is_running = True
-            self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-            self.scheduler_thread.start()
-            # logger.info(f"Scheduler gestartet - Scans alle {self.scan_config.scan_interval_hours} Stunden")
-            print(f"Scheduler gestartet - Scans alle {self.scan_config.scan_interval_hours} Stunden")
-        except Exception as e:
-            # logger.error(f"Fehler beim Starten des Schedulers: {e}")
-            print(f"Fehler beim Starten des Schedulers: {e}") # Placeholder
-            raise
-
-    def _run_scheduled_job(self):
-        """Wrapper für async Job-Ausführung"""
-        # This runs in a thread, so we need to create a new event loop or use the main one if available
-        # Simple approach: run in new loop
-        # asyncio.run(self.job_manager.run_scan_job())
-        # Better approach if you have a main loop: schedule the coroutine
-        # For now, using asyncio.run
-        try:
-            asyncio.run(self.job_manager.run_scan_job())
-        except Exception as e:
-            print(f"Error in scheduled job: {e}") # Placeholder for logger
-
-    def _run_scheduler(self):
-        """Läuft im separaten Thread"""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-
-    def stop(self):
-        """Stoppt den Scheduler"""
-        self.is_running = False
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=5)
-        # logger.info("Scheduler gestoppt")
-        print("Scheduler gestoppt") # Placeholder
-
-    def get_status(self) -> dict:
-        """Gibt den Scheduler-Status zurück"""
-        # Access schedule jobs (basic info)
-        jobs = schedule.get_jobs()
-        next_run = None
-        if jobs:
-            # Get the next run time of the first job (assuming only one scheduled job)
-            next_run = jobs[0].next_run if hasattr(jobs[0], 'next_run') else None
-
-        return {
-            'is_running': self.is_running,
-            'next_run': next_run.isoformat() if next_run else None,
-            'scheduled_jobs': len(jobs),
-            'job_manager_status': self.job_manager.get_status() if self.job_manager else {}
-        }
-
-
-# Example usage (if running this file directly)
-# if __name__ == "__main__":
-#     import logging
-#     logging.basicConfig(level=logging.INFO)
-#     scheduler = SchedulerManager()
-#     try:
-#         asyncio.run(scheduler.start())
-#         # Keep the main thread alive to run the scheduler
-#         try:
-#             while True:
-#                 time.sleep(1)
-#         except KeyboardInterrupt:
-#             print("Stopping scheduler...")
-#             scheduler.stop()
-#     except Exception as e:
-#         print(f"Failed to start scheduler: {e}")
-
+# Gemeinsamer asyncio-Scheduler für alle Worker.
+# SchedulerManager (periodische Scans + Registrierung der Worker) liegt in
+# workers.scheduler und wird hier nicht importiert, um Zirkel-Imports mit
+# scanner_worker zu vermeiden.
+from .job_scheduler import (
+    CronTrigger,
+    IntervalTrigger,
+    JobScheduler,
+    RunTimeHistogram,
+    SystemClock,
+    VirtualClock,
+)
+
+__all__ = [
+    'CronTrigger',
+    'IntervalTrigger',
+    'JobScheduler',
+    'RunTimeHistogram',
+    'SystemClock',
+    'VirtualClock',
+]
@@ -0,0 +1,320 @@
+# workers/enrichment_queue.py
+"""
+Persistente Prioritäts-Queue für den EnrichmentWorker
+
+- Backend: SQLite (Default) oder PostgreSQL über SQLAlchemy Core
+- Ein Eintrag pro (task_type, chain, address) - erneutes Einstellen derselben
+  Aufgabe hebt nur die Priorität an (Dedup per Upsert)
+- Aufgaben werden nach Priorität geholt und als "running" markiert; nach einem
+  Absturz laufende Aufgaben gehen beim nächsten Start zurück in die Queue
+- Fehlgeschlagene Aufgaben werden mit Backoff wiederholt, danach "failed"
+- Ohne erreichbare Datenbank läuft die Queue in einer In-Memory-SQLite weiter
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import (
+    Column, Float, Index, Integer, MetaData, String, Table, Text, case, create_engine, delete, func,
+    select, update
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import StaticPool
+
+from app.core.backend_crypto_tracker.utils.json_helpers import SafeJSONEncoder
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_QUEUE_URL = "sqlite:///data/enrichment_queue.db"
+MEMORY_QUEUE_URL = "sqlite://"
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+_metadata = MetaData()
+
+enrichment_tasks_table = Table(
+    "enrichment_tasks",
+    _metadata,
+    Column("task_type", String(64), primary_key=True),
+    Column("chain", String(32), primary_key=True),
+    Column("address", String(128), primary_key=True),
+    Column("priority", Integer, nullable=False, default=0),
+    Column("data", Text, nullable=True),
+    Column("status", String(16), nullable=False, default=PENDING),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("last_error", Text, nullable=True),
+    # Wird bei jedem Einstellen erhöht - so erkennt complete(), ob die
+    # Aufgabe während der Bearbeitung erneut angefordert wurde
+    Column("generation", Integer, nullable=False, default=0),
+    Column("enqueued_at", Float, nullable=False),
+    Column("available_at", Float, nullable=False),
+    Index("ix_enrichment_tasks_claim", "status", "priority", "enqueued_at"),
+)
+
+
+@dataclass
+class EnrichmentTask:
+    task_type: str
+    chain: str
+    address: str
+    data: Optional[Dict] = None
+    priority: int = 0
+    attempts: int = 0
+    generation: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+    @property
+    def id(self) -> str:
+        return f"{self.task_type}:{self.chain}:{self.address}"
+
+
+class EnrichmentQueue:
+    """Deduplizierende Prioritäts-Queue für Enrichment-Aufgaben"""
+
+    def __init__(self, url: Optional[str] = None, max_attempts: int = 3, retry_backoff_seconds: float = 60.0):
+        """
+        Args:
+            url: SQLAlchemy-URL (sqlite:///..., postgresql://...); "sqlite://" = nur im Speicher.
+                 Default: ENRICHMENT_QUEUE_URL bzw. lokale SQLite-Datei
+            max_attempts: Versuche pro Aufgabe, danach bleibt sie als "failed" liegen
+            retry_backoff_seconds: Wartezeit vor dem 1. Retry (verdoppelt sich je Versuch)
+        """
+        self.url = url or os.getenv("ENRICHMENT_QUEUE_URL", DEFAULT_QUEUE_URL)
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._engine = None
+        self._engine_lock = asyncio.Lock()
+        # SQLite erlaubt nur einen Schreiber - Zugriffe werden serialisiert
+        self._db_lock = asyncio.Lock()
+
+    # ==================== BACKEND ====================
+
+    def _create_engine(self, url: str):
+        """Engine + Tabelle anlegen (synchron, läuft im Thread)"""
+        if url == MEMORY_QUEUE_URL:
+            engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        elif url.startswith("sqlite:///"):
+            directory = os.path.dirname(url[len("sqlite:///"):])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+        else:
+            engine = create_engine(url, pool_pre_ping=True)
+
+        if engine.dialect.name not in ("sqlite", "postgresql"):
+            raise ValueError(f"Unsupported enrichment queue backend: {engine.dialect.name}")
+
+        _metadata.create_all(engine, tables=[enrichment_tasks_table])
+        return engine
+
+    async def _get_engine(self):
+        """Lazy Engine; ist die Datenbank nicht erreichbar, In-Memory-SQLite (einmal geloggt)"""
+        if self._engine is None:
+            async with self._engine_lock:
+                if self._engine is None:
+                    try:
+                        self._engine = await asyncio.to_thread(self._create_engine, self.url)
+                        logger.info(f"Enrichment queue backed by {self._engine.dialect.name}")
+                    except Exception as e:
+                        logger.warning(f"Enrichment queue not persistent ({self.url}): {str(e)}")
+                        self.url = MEMORY_QUEUE_URL
+                        self._engine = await asyncio.to_thread(self._create_engine, self.url)
+        return self._engine
+
+    async def _run(self, operation, *args):
+        engine = await self._get_engine()
+        async with self._db_lock:
+            return await asyncio.to_thread(operation, engine, *args)
+
+    def _upsert_rows(self, engine, rows: List[Dict]) -> None:
+        table = enrichment_tasks_table
+        if engine.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        statement = insert(table).values(rows)
+        excluded = statement.excluded
+        waiting = table.c.status.in_((PENDING, RUNNING))
+        statement = statement.on_conflict_do_update(
+            index_elements=["task_type", "chain", "address"],
+            set_={
+                "priority": case(
+                    (waiting & (table.c.priority > excluded.priority), table.c.priority),
+                    else_=excluded.priority
+                ),
+                "data": excluded.data,
+                # Laufende Aufgaben bleiben "running"; complete() stellt sie über
+                # die neue Generation erneut ein
+                "status": case((table.c.status == RUNNING, RUNNING), else_=PENDING),
+                "attempts": case((waiting, table.c.attempts), else_=0),
+                "generation": table.c.generation + 1,
+                "enqueued_at": case((waiting, table.c.enqueued_at), else_=excluded.enqueued_at),
+                "available_at": case(
+                    (waiting & (table.c.available_at < excluded.available_at), table.c.available_at),
+                    else_=excluded.available_at
+                ),
+            }
+        )
+        with engine.begin() as connection:
+            connection.execute(statement)
+
+    def _claim_rows(self, engine, limit: int, now: float) -> List[EnrichmentTask]:
+        table = enrichment_tasks_table
+        query = (
+            select(table)
+            .where((table.c.status == PENDING) & (table.c.available_at <= now))
+            .order_by(table.c.priority.desc(), table.c.enqueued_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        with engine.begin() as connection:
+            rows = connection.execute(query).mappings().all()
+            for row in rows:
+                connection.execute(
+                    update(table)
+                    .where(
+                        (table.c.task_type == row["task_type"])
+                        & (table.c.chain == row["chain"])
+                        & (table.c.address == row["address"])
+                    )
+                    .values(status=RUNNING)
+                )
+
+        return [
+            EnrichmentTask(
+                task_type=row["task_type"],
+                chain=row["chain"],
+                address=row["address"],
+                data=json.loads(row["data"]) if row["data"] else None,
+                priority=row["priority"],
+                attempts=row["attempts"],
+                generation=row["generation"],
+                enqueued_at=row["enqueued_at"]
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _task_filter(task: EnrichmentTask):
+        table = enrichment_tasks_table
+        return (
+            (table.c.task_type == task.task_type)
+            & (table.c.chain == task.chain)
+            & (table.c.address == task.address)
+        )
+
+    def _complete_row(self, engine, task: EnrichmentTask) -> None:
+        table = enrichment_tasks_table
+        with engine.begin() as connection:
+            connection.execute(delete(table).where(
+                self._task_filter(task) & (table.c.generation == task.generation)
+            ))
+            # Während der Bearbeitung erneut angefordert → wieder einstellen
+            connection.execute(
+                update(table)
+                .where(self._task_filter(task) & (table.c.status == RUNNING))
+                .values(status=PENDING, attempts=0)
+            )
+
+    def _fail_row(self, engine, task: EnrichmentTask, error: str, now: float) -> bool:
+        table = enrichment_tasks_table
+        attempts = task.attempts + 1
+        retry = attempts < self.max_attempts
+        with engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(self._task_filter(task))
+                .values(
+                    status=PENDING if retry else FAILED,
+                    attempts=attempts,
+                    last_error=error[:1000],
+                    available_at=now + self.retry_backoff_seconds * 2 ** (attempts - 1)
+                )
+            )
+        return retry
+
+    def _recover_rows(self, engine) -> int:
+        table = enrichment_tasks_table
+        with engine.begin() as connection:
+            result = connection.execute(
+                update(table).where(table.c.status == RUNNING).values(status=PENDING)
+            )
+            return result.rowcount or 0
+
+    def _count_rows(self, engine, now: float) -> Dict[str, int]:
+        table = enrichment_tasks_table
+        counts = {PENDING: 0, RUNNING: 0, FAILED: 0, "ready": 0}
+        with engine.connect() as connection:
+            for status, count in connection.execute(
+                select(table.c.status, func.count()).group_by(table.c.status)
+            ):
+                counts[status] = count
+            counts["ready"] = connection.execute(
+                select(func.count()).where((table.c.status == PENDING) & (table.c.available_at <= now))
+            ).scalar_one()
+        return counts
+
+    # ==================== API ====================
+
+    async def put(self, task_type: str, chain: str, address: str,
+                  data: Optional[Dict] = None, priority: int = 0) -> EnrichmentTask:
+        """Aufgabe einstellen (existiert sie schon, gilt die höhere Priorität)"""
+        now = time.time()
+        task = EnrichmentTask(task_type=task_type, chain=chain, address=address,
+                              data=data, priority=priority, enqueued_at=now)
+        await self._run(self._upsert_rows, [{
+            "task_type": task_type,
+            "chain": chain,
+            "address": address,
+            "priority": priority,
+            "data": json.dumps(data, cls=SafeJSONEncoder) if data is not None else None,
+            "status": PENDING,
+            "attempts": 0,
+            "generation": 0,
+            "enqueued_at": now,
+            "available_at": now,
+        }])
+        return task
+
+    async def claim(self, limit: int) -> List[EnrichmentTask]:
+        """Bis zu limit fällige Aufgaben (höchste Priorität zuerst) holen und als running markieren"""
+        if limit <= 0:
+            return []
+        return await self._run(self._claim_rows, limit, time.time())
+
+    async def complete(self, task: EnrichmentTask) -> None:
+        """Erledigte Aufgabe entfernen"""
+        await self._run(self._complete_row, task)
+
+    async def fail(self, task: EnrichmentTask, error: str) -> bool:
+        """Fehlschlag vermerken; True, wenn die Aufgabe erneut versucht wird"""
+        return await self._run(self._fail_row, task, error, time.time())
+
+    async def recover(self) -> int:
+        """Nach einem Absturz liegengebliebene running-Aufgaben wieder einstellen"""
+        recovered = await self._run(self._recover_rows)
+        if recovered:
+            logger.info(f"Requeued {recovered} interrupted enrichment tasks")
+        return recovered
+
+    async def counts(self) -> Dict[str, int]:
+        """Anzahl Aufgaben pro Status (+ "ready": sofort fällige)"""
+        try:
+            return await self._run(self._count_rows, time.time())
+        except SQLAlchemyError as e:
+            logger.warning(f"Enrichment queue count failed: {str(e)}")
+            return {}
+
+    async def close(self) -> None:
+        if self._engine is not None:
+            await asyncio.to_thread(self._engine.dispose)
+            self._engine = None
@@ -1,45 +1,97 @@
 # workers/enrichment_worker.py
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from collections import deque
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
-from dataclasses import dataclass
 from app.core.backend_crypto_tracker.utils.logger import get_logger
 from app.core.backend_crypto_tracker.utils.exceptions import APIException, DatabaseException
 from app.core.backend_crypto_tracker.utils.cache import AnalysisCache
-from app.core.backend_crypto_tracker.processor.database.manager import DatabaseManager
+from app.core.backend_crypto_tracker.processor.database.models.manager import DatabaseManager
 from app.core.backend_crypto_tracker.processor.database.models.token import Token
 from app.core.backend_crypto_tracker.processor.database.models.wallet import WalletAnalysis
 from app.core.backend_crypto_tracker.services.multichain.community_labels_service import CommunityLabelsAPI
-from app.core.backend_crypto_tracker.services.multichain.chainalysis_service import ChainalysisService
-from app.core.backend_crypto_tracker.services.multichain.elliptic_service import EllipticService
+from app.core.backend_crypto_tracker.services.multichain.chainalysis_service import ChainalysisIntegration
+from app.core.backend_crypto_tracker.services.multichain.elliptic_service import EllipticIntegration
+from app.core.backend_crypto_tracker.workers.enrichment_queue import EnrichmentQueue, EnrichmentTask, PENDING, RUNNING, FAILED
+from app.core.backend_crypto_tracker.workers.job_scheduler import JobScheduler
+from app.core.backend_crypto_tracker.workers.source_batcher import SourceBatcher
 
 logger = get_logger(__name__)
 
-@dataclass
-class EnrichmentTask:
-    id: str
-    task_type: str
-    chain: str
-    address: str
-    data: Optional[Dict] = None
-    created_at: datetime = None
-    priority: int = 0
-    
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
+# Gleichzeitige Requests pro externer Quelle (überschreibbar per config['source_concurrency'])
+DEFAULT_SOURCE_CONCURRENCY = {
+    'chainalysis': 2,
+    'elliptic': 4,
+    'community': 8
+}
+
+# Chainalysis erwartet das Asset, nicht die Chain
+CHAINALYSIS_ASSETS = {
+    'ethereum': 'ETH',
+    'bsc': 'BNB',
+    'polygon': 'MATIC',
+    'bitcoin': 'BTC',
+    'solana': 'SOL',
+    'sui': 'SUI'
+}
+
+# Anzahl Latenz-Messwerte für die Perzentile
+LATENCY_SAMPLES = 1000
+
+
+def _percentiles(values) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 (nearest rank) in Sekunden"""
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    ordered = sorted(values)
+    return {
+        f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 3)
+        for p in (50, 95, 99)
+    }
+
 
 class EnrichmentWorker:
     def __init__(self, db_manager: DatabaseManager, config: Dict[str, Any]):
         self.db_manager = db_manager
         self.config = config
-        self.community_labels = CommunityLabelsAPI(config.get('community_labels'))
-        self.chainalysis = ChainalysisService(config.get('chainalysis_api_key'))
-        self.elliptic = EllipticService(config.get('elliptic_api_key'))
+        self.community_labels = CommunityLabelsAPI()
+        self.chainalysis = ChainalysisIntegration(config.get('chainalysis_api_key'))
+        self.elliptic = EllipticIntegration(config.get('elliptic_api_key'), config.get('elliptic_api_secret'))
         self.cache = AnalysisCache()
         self.is_running = False
-        self.tasks: List[EnrichmentTask] = []
+
+        # Persistente Queue (Dedup pro task_type/chain/address)
+        self.queue = EnrichmentQueue(
+            config.get('queue_url'),
+            max_attempts=config.get('max_attempts', 3),
+            retry_backoff_seconds=config.get('retry_backoff_seconds', 60)
+        )
+        self.max_concurrent_tasks = config.get('max_concurrent_tasks', 16)
+        # Fallback-Timer, z.B. für Retries mit Backoff - neue Aufgaben wecken den Worker sofort
+        self.poll_interval = config.get('poll_interval_seconds', 30)
+        self._wakeup = asyncio.Event()
+        self._in_flight: Set[asyncio.Task] = set()
+
+        # Gebündelte Lookups pro Quelle
+        source_concurrency = {**DEFAULT_SOURCE_CONCURRENCY, **config.get('source_concurrency', {})}
+        fetchers = {
+            'chainalysis': self._fetch_chainalysis,
+            'elliptic': self._fetch_elliptic,
+            'community': self._fetch_community
+        }
+        self.sources = {
+            name: SourceBatcher(
+                name,
+                fetch_one,
+                max_concurrency=source_concurrency[name],
+                batch_size=config.get('batch_size', 50),
+                batch_window=config.get('batch_window_seconds', 0.05)
+            )
+            for name, fetch_one in fetchers.items()
+        }
+
         self.stats = {
             'total_tasks_processed': 0,
             'successful_tasks': 0,
@@ -47,6 +99,13 @@ class EnrichmentWorker:
             'tasks_by_type': {},
             'last_run_time': None
         }
+        self._queue_counts: Dict[str, int] = {}
+        self._queue_counts_at = 0.0
+        # Zeit vom Einstellen bis zum Abschluss bzw. reine Bearbeitungszeit
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._durations = deque(maxlen=LATENCY_SAMPLES)
+        self._completed_at = deque(maxlen=10000)
+        self._started_at: Optional[float] = None
     
     async def start(self):
         """Startet den Enrichment Worker"""
@@ -55,67 +114,115 @@ class EnrichmentWorker:
             return
         
         self.is_running = True
+        self._started_at = time.monotonic()
         logger.info("Starting enrichment worker")
-        
+
+        try:
+            await self.queue.recover()
+            if self.config.get('chainalysis_api_key') and self.chainalysis.client is None:
+                await self.chainalysis.__aenter__()
+        except Exception:
+            # Sonst bricht jeder Neustart des Services mit "already running" ab
+            self.is_running = False
+            raise
+
         while self.is_running:
             try:
-                await self._process_tasks()
+                await self._dispatch()
                 self.stats['last_run_time'] = datetime.now()
-                
-                # Wartezeit zwischen den Durchläufen
-                await asyncio.sleep(30)  # 30 Sekunden
             except Exception as e:
                 logger.error(f"Error in enrichment worker: {e}")
                 await asyncio.sleep(15)  # Kürzere Wartezeit bei Fehlern
+
+        # Laufende Aufgaben abschließen
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        for source in self.sources.values():
+            await source.close()
+        if self.chainalysis.client is not None:
+            await self.chainalysis.__aexit__(None, None, None)
+            self.chainalysis.client = None
+        logger.info("Enrichment worker stopped")
     
     async def stop(self):
         """Stoppt den Enrichment Worker"""
         self.is_running = False
+        self._wakeup.set()
         logger.info("Stopping enrichment worker")
     
+    def register(self, scheduler: JobScheduler):
+        """Registriert den Queue-Dispatcher als Service (graceful Stop beim Shutdown)"""
+        scheduler.add_service('enrichment_worker', self.start, self.stop)
+    
     async def add_task(self, task_type: str, chain: str, address: str, data: Optional[Dict] = None, priority: int = 0) -> str:
-        """Fügt eine Anreicherungsaufgabe hinzu"""
-        task_id = f"{task_type}_{chain}_{address}_{datetime.now().timestamp()}"
-        task = EnrichmentTask(
-            id=task_id,
-            task_type=task_type,
-            chain=chain,
-            address=address,
-            data=data,
-            priority=priority
-        )
-        
-        # Füge die Aufgabe sortiert nach Priorität hinzu
-        self.tasks.append(task)
-        self.tasks.sort(key=lambda t: t.priority, reverse=True)
+        """Fügt eine Anreicherungsaufgabe hinzu (existiert sie bereits, gilt die höhere Priorität)"""
+        task = await self.queue.put(task_type, chain, address, data=data, priority=priority)
+        self._wakeup.set()
         
-        logger.debug(f"Added enrichment task: {task_id}")
-        return task_id
+        logger.debug(f"Added enrichment task: {task.id}")
+        return task.id
     
-    async def _process_tasks(self):
-        """Verarbeitet alle anstehenden Aufgaben"""
-        if not self.tasks:
+    async def _dispatch(self):
+        """Holt Aufgaben nach Priorität, solange Slots frei sind; wartet sonst auf neue Arbeit"""
+        free_slots = self.max_concurrent_tasks - len(self._in_flight)
+        if free_slots <= 0:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
             return
-        
-        # Kopiere die Aufgabenliste, um Probleme mit gleichzeitigen Änderungen zu vermeiden
-        tasks_to_process = self.tasks.copy()
-        self.tasks.clear()
-        
-        for task in tasks_to_process:
+
+        # Vor dem Claim zurücksetzen - ein add_task() danach weckt den Worker sicher
+        self._wakeup.clear()
+        tasks = await self.queue.claim(free_slots)
+        await self._refresh_queue_counts()
+
+        if not tasks:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        for task in tasks:
+            running = asyncio.create_task(self._run_task(task))
+            self._in_flight.add(running)
+            running.add_done_callback(self._in_flight.discard)
+
+    async def _run_task(self, task: EnrichmentTask):
+        """Bearbeitet eine Aufgabe und meldet das Ergebnis an die Queue"""
+        started = time.monotonic()
+        try:
             try:
                 await self._process_task(task)
-                self.stats['successful_tasks'] += 1
             except Exception as e:
-                logger.error(f"Error processing task {task.id}: {e}")
+                will_retry = await self.queue.fail(task, str(e))
+                logger.error(f"Error processing task {task.id}: {e}{' (will retry)' if will_retry else ''}")
                 self.stats['failed_tasks'] += 1
-            
-            self.stats['total_tasks_processed'] += 1
-            
-            # Aktualisiere die Statistiken nach Aufgabentyp
-            task_type = task.task_type
-            if task_type not in self.stats['tasks_by_type']:
-                self.stats['tasks_by_type'][task_type] = 0
-            self.stats['tasks_by_type'][task_type] += 1
+            else:
+                await self.queue.complete(task)
+                self.stats['successful_tasks'] += 1
+                self._latencies.append(time.time() - task.enqueued_at)
+                self._completed_at.append(time.monotonic())
+                # Während der Bearbeitung erneut angeforderte Aufgaben liegen wieder in der Queue
+                self._wakeup.set()
+        except Exception as e:
+            logger.error(f"Error finalizing task {task.id}: {e}")
+
+        self._durations.append(time.monotonic() - started)
+        self.stats['total_tasks_processed'] += 1
+        
+        # Aktualisiere die Statistiken nach Aufgabentyp
+        task_type = task.task_type
+        if task_type not in self.stats['tasks_by_type']:
+            self.stats['tasks_by_type'][task_type] = 0
+        self.stats['tasks_by_type'][task_type] += 1
+    
+    async def _refresh_queue_counts(self, max_age: float = 1.0):
+        """Queue-Tiefe für get_stats (höchstens einmal pro max_age Sekunden abgefragt)"""
+        if time.monotonic() - self._queue_counts_at < max_age:
+            return
+        self._queue_counts_at = time.monotonic()
+        counts = await self.queue.counts()
+        if counts:
+            self._queue_counts = counts
     
     async def _process_task(self, task: EnrichmentTask):
         """Verarbeitet eine einzelne Anreicherungsaufgabe"""
@@ -132,6 +239,43 @@ class EnrichmentWorker:
         else:
             logger.warning(f"Unknown task type: {task.task_type}")
     
+    # ==================== QUELLEN ====================
+    
+    async def _fetch_chainalysis(self, chain: str, address: str) -> Optional[Dict]:
+        """Risiko + Entity-Infos von Chainalysis (liefert Labels und Score in einem Request)"""
+        return await self.chainalysis.get_address_risk(address, CHAINALYSIS_ASSETS.get(chain, chain.upper()))
+    
+    async def _fetch_elliptic(self, chain: str, address: str) -> Optional[Dict]:
+        """Wallet-Analyse von Elliptic (liefert Labels und Score in einem Request)"""
+        return await self.elliptic.get_wallet_analysis(address)
+    
+    async def _fetch_community(self, chain: str, address: str) -> Dict[str, Any]:
+        """On-Chain-Muster aus den Community-Quellen"""
+        return await self.community_labels.analyze_transaction_patterns(address, chain)
+    
+    async def _lookup_sources(self, sources: List[str], chain: str, address: str) -> Dict[str, Any]:
+        """Fragt die konfigurierten Quellen parallel (und gebündelt) ab; Fehler einzelner Quellen werden nur geloggt"""
+        configured = {
+            'community': True,
+            'chainalysis': bool(self.config.get('chainalysis_api_key')),
+            'elliptic': bool(self.config.get('elliptic_api_key'))
+        }
+        sources = [source for source in sources if configured[source]]
+        results = await asyncio.gather(
+            *(self.sources[source].lookup(chain, address) for source in sources),
+            return_exceptions=True
+        )
+        
+        found = {}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error getting {source} data for {address}: {result}")
+            elif result:
+                found[source] = result
+        return found
+    
+    # ==================== AUFGABEN ====================
+    
     async def _enrich_address_labels(self, chain: str, address: str):
         """Reichert eine Adresse mit Labels an"""
         try:
@@ -144,36 +288,31 @@ class EnrichmentWorker:
                 return
             
             # Hole Labels von verschiedenen Quellen
+            results = await self._lookup_sources(['community', 'chainalysis', 'elliptic'], chain, address)
             labels = {}
             
-            # Community Labels
-            try:
-                community_labels = await self.community_labels.get_address_labels(address, chain)
-                labels['community'] = community_labels
-            except Exception as e:
-                logger.error(f"Error getting community labels for {address}: {e}")
+            # Community Labels (On-Chain-Muster)
+            if 'community' in results:
+                labels['community'] = results['community']
             
             # Chainalysis Labels (wenn verfügbar)
-            if self.config.get('chainalysis_api_key'):
-                try:
-                    chainalysis_labels = await self.chainalysis.get_address_labels(address, chain)
-                    labels['chainalysis'] = chainalysis_labels
-                except Exception as e:
-                    logger.error(f"Error getting Chainalysis labels for {address}: {e}")
+            if 'chainalysis' in results:
+                chainalysis = results['chainalysis']
+                labels['chainalysis'] = {
+                    'entity_type': chainalysis.get('entity_type'),
+                    'entity_name': chainalysis.get('entity_name'),
+                    'category': chainalysis.get('category')
+                }
             
             # Elliptic Labels (wenn verfügbar)
-            if self.config.get('elliptic_api_key'):
-                try:
-                    elliptic_labels = await self.elliptic.get_address_labels(address, chain)
-                    labels['elliptic'] = elliptic_labels
-                except Exception as e:
-                    logger.error(f"Error getting Elliptic labels for {address}: {e}")
+            if 'elliptic' in results:
+                labels['elliptic'] = results['elliptic'].get('labels', [])
             
             # Speichere die Labels in der Datenbank
             await self.db_manager.save_address_labels(chain, address, labels)
             
             # Speichere die Labels im Cache
-            await self.cache.set(labels, ttl=3600, cache_key)  # 1 Stunde Cache
+            await self.cache.set(labels, 3600, cache_key)  # 1 Stunde Cache
             
             logger.info(f"Enriched address labels for {address} on {chain}")
         except Exception as e:
@@ -217,7 +356,7 @@ class EnrichmentWorker:
             await self.db_manager.save_token_metadata(chain, token_address, metadata)
             
             # Speichere die Metadaten im Cache
-            await self.cache.set(metadata, ttl=3600, cache_key)  # 1 Stunde Cache
+            await self.cache.set(metadata, 3600, cache_key)  # 1 Stunde Cache
             
             logger.info(f"Enriched token metadata for {token_address} on {chain}")
         except Exception as e:
@@ -235,30 +374,14 @@ class EnrichmentWorker:
                 logger.debug(f"Using cached risk score for {address}")
                 return
             
-            risk_scores = {}
-            
-            # Chainalysis Risiko-Score (wenn verfügbar)
-            if self.config.get('chainalysis_api_key'):
-                try:
-                    chainalysis_score = await self.chainalysis.get_address_risk_score(address, chain)
-                    risk_scores['chainalysis'] = chainalysis_score
-                except Exception as e:
-                    logger.error(f"Error getting Chainalysis risk score for {address}: {e}")
-            
-            # Elliptic Risiko-Score (wenn verfügbar)
-            if self.config.get('elliptic_api_key'):
-                try:
-                    elliptic_score = await self.elliptic.get_address_risk_score(address, chain)
-                    risk_scores['elliptic'] = elliptic_score
-                except Exception as e:
-                    logger.error(f"Error getting Elliptic risk score for {address}: {e}")
-            
-            # Community Risiko-Score
-            try:
-                community_score = await self.community_labels.get_address_risk_score(address, chain)
-                risk_scores['community'] = community_score
-            except Exception as e:
-                logger.error(f"Error getting community risk score for {address}: {e}")
+            # Chainalysis / Elliptic (wenn verfügbar) - teilen sich die Requests mit
+            # gleichzeitigen Label-Aufgaben derselben Adresse
+            results = await self._lookup_sources(['chainalysis', 'elliptic'], chain, address)
+            risk_scores = {
+                source: result.get('risk_score')
+                for source, result in results.items()
+                if result.get('risk_score') is not None
+            }
             
             # Berechne einen aggregierten Risiko-Score
             aggregated_score = self._calculate_aggregated_risk_score(risk_scores)
@@ -268,7 +391,7 @@ class EnrichmentWorker:
             await self.db_manager.save_address_risk_scores(chain, address, risk_scores)
             
             # Speichere die Risiko-Scores im Cache
-            await self.cache.set(risk_scores, ttl=3600, cache_key)  # 1 Stunde Cache
+            await self.cache.set(risk_scores, 3600, cache_key)  # 1 Stunde Cache
             
             logger.info(f"Enriched risk score for {address} on {chain}")
         except Exception as e:
@@ -323,7 +446,7 @@ class EnrichmentWorker:
             await self.db_manager.save_transaction_analysis(chain, tx_hash, analysis)
             
             # Speichere die Analyse im Cache
-            await self.cache.set(analysis, ttl=3600, cache_key)  # 1 Stunde Cache
+            await self.cache.set(analysis, 3600, cache_key)  # 1 Stunde Cache
             
             logger.info(f"Enriched transaction analysis for {tx_hash} on {chain}")
         except Exception as e:
@@ -357,9 +480,26 @@ class EnrichmentWorker:
     
     def get_stats(self) -> Dict[str, Any]:
         """Gibt Statistiken des Enrichment Workers zurück"""
+        now = time.monotonic()
+        completed_last_minute = sum(1 for completed_at in self._completed_at if now - completed_at <= 60)
+        uptime = now - self._started_at if self._started_at else 0
+        
         return {
             'is_running': self.is_running,
-            'pending_tasks': len(self.tasks),
+            'pending_tasks': self._queue_counts.get(PENDING, 0),
+            'queue': {
+                'depth': self._queue_counts.get(PENDING, 0) + self._queue_counts.get(RUNNING, 0),
+                'ready': self._queue_counts.get('ready', 0),
+                'running': len(self._in_flight),
+                'failed': self._queue_counts.get(FAILED, 0)
+            },
+            'latency_seconds': _percentiles(self._latencies),
+            'processing_seconds': _percentiles(self._durations),
+            'throughput': {
+                'tasks_last_minute': completed_last_minute,
+                'tasks_per_minute': round(self.stats['successful_tasks'] / uptime * 60, 2) if uptime > 0 else 0.0
+            },
+            'sources': {name: source.get_stats() for name, source in self.sources.items()},
             'stats': self.stats.copy(),
             'last_run_time': self.stats['last_run_time'].isoformat() if self.stats['last_run_time'] else None
         }
@@ -0,0 +1,569 @@
+# workers/job_scheduler.py
+"""
+Asyncio-nativer Job-Scheduler für alle Worker
+
+- Läuft im Event-Loop der Anwendung (kein Thread, kein Polling im Minutentakt):
+  der Scheduler schläft genau bis zur nächsten fälligen Ausführung
+- Trigger: Intervall oder Cron (5 Felder), jeweils mit optionalem Jitter
+- Pro Job maximale Parallelität (Default 1 = keine Überlappung); fällige
+  Läufe über dem Limit werden übersprungen statt aufgestaut
+- Verpasste Läufe (z.B. nach langem Lauf oder Suspend) werden zu einem Lauf
+  zusammengefasst (coalesce)
+- Dauerhaft laufende Worker werden als Service registriert und beim
+  Shutdown erst gestoppt, dann nach Ablauf der Frist abgebrochen
+- Laufzeit-Histogramm und Historie pro Job
+- Die Zeitquelle ist austauschbar - VirtualClock macht den Scheduler ohne
+  echte Wartezeiten testbar
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+# Obergrenzen der Histogramm-Buckets (Sekunden)
+RUNTIME_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600, float("inf"))
+
+# Schutz gegen Endlosschleifen beim Aufholen verpasster Läufe
+MAX_CATCH_UP_RUNS = 1000
+
+
+# ==================== UHREN ====================
+
+class SystemClock:
+    """Echte Zeit"""
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, delay: float) -> None:
+        await asyncio.sleep(max(0.0, delay))
+
+
+class VirtualClock:
+    """
+    Manuell vorgestellte Zeit für Tests.
+
+    sleep() kehrt erst zurück, wenn advance() die Uhr über die Deadline
+    hinaus bewegt hat; dazwischen laufen alle dadurch fälligen Tasks.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._sleepers: List = []
+        self._sequence = itertools.count()
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + delay, next(self._sequence), future))
+        await future
+
+    async def advance(self, seconds: float) -> None:
+        """Uhr vorstellen und alle bis dahin fälligen Sleeper der Reihe nach wecken"""
+        target = self.now + seconds
+        while True:
+            await self.settle()
+            while self._sleepers and self._sleepers[0][2].done():
+                heapq.heappop(self._sleepers)
+            if not self._sleepers or self._sleepers[0][0] > target:
+                break
+            deadline, _, future = heapq.heappop(self._sleepers)
+            self.now = max(self.now, deadline)
+            future.set_result(None)
+        self.now = target
+        await self.settle()
+
+    @staticmethod
+    async def settle(rounds: int = 20) -> None:
+        """Event-Loop laufen lassen, bis keine sofort lauffähigen Tasks mehr warten"""
+        for _ in range(rounds):
+            await asyncio.sleep(0)
+
+
+# ==================== TRIGGER ====================
+
+class IntervalTrigger:
+    """Feste Abstände, optional mit Jitter (0..jitter Sekunden Verzögerung)"""
+
+    def __init__(self, seconds: float, jitter: float = 0.0):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.jitter = jitter
+
+    def next_fire(self, after: float) -> float:
+        return after + self.seconds
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds}s"
+
+
+class CronTrigger:
+    """
+    Cron-Ausdruck mit 5 Feldern: Minute Stunde Tag Monat Wochentag.
+
+    Unterstützt *, Listen (1,15), Bereiche (1-5) und Schritte (*/15, 0-30/10);
+    Wochentag 0 und 7 = Sonntag. Wie bei cron gilt: sind Tag UND Wochentag
+    eingeschränkt, reicht es, wenn einer von beiden passt.
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expression: str, jitter: float = 0.0, tz: tzinfo = timezone.utc):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        self.expression = expression
+        self.jitter = jitter
+        self.tz = tz
+        values = {
+            name: self._parse_field(part, low, high)
+            for part, (name, low, high) in zip(parts, self.FIELDS)
+        }
+        self.minutes = sorted(values["minute"])
+        self.hours = sorted(values["hour"])
+        self.days = values["day"]
+        self.months = values["month"]
+        self.weekdays = {day % 7 for day in values["weekday"]}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(part: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in part.split(","):
+            step = 1
+            if "/" in item:
+                item, step_text = item.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {part!r}")
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(value) for value in item.split("-", 1))
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {part!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_fire(self, after: float) -> float:
+        current = datetime.fromtimestamp(after, self.tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        # Höchstens ~4 Jahre voraus (29. Februar)
+        for _ in range(366 * 4 + 1):
+            if current.month in self.months and self._day_matches(current):
+                for hour in self.hours:
+                    if hour < current.hour:
+                        continue
+                    first_minute = current.minute if hour == current.hour else 0
+                    for minute in self.minutes:
+                        if minute >= first_minute:
+                            return current.replace(hour=hour, minute=minute).timestamp()
+            current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"cron '{self.expression}'"
+
+
+# ==================== STATISTIK ====================
+
+class RunTimeHistogram:
+    """Laufzeit-Verteilung eines Jobs (kumulative Buckets wie bei Prometheus)"""
+
+    def __init__(self, buckets=RUNTIME_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = list(itertools.accumulate(self.counts))
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 3),
+            'avg_seconds': round(self.total / self.count, 3) if self.count else None,
+            'max_seconds': round(self.max, 3),
+            'buckets': {
+                ('+Inf' if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.buckets, cumulative)
+            }
+        }
+
+
+@dataclass
+class JobRun:
+    """Ein einzelner Lauf eines Jobs"""
+    started_at: float
+    manual: bool = False
+    finished_at: Optional[float] = None
+    status: str = 'running'
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'start_time': datetime.fromtimestamp(self.started_at).isoformat(),
+            'end_time': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'duration_seconds': round(self.finished_at - self.started_at, 3) if self.finished_at else None,
+            'status': self.status,
+            'manual': self.manual,
+            'error': str(self.error) if self.error else None
+        }
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: JobFunc
+    trigger: Any
+    max_instances: int = 1
+    coalesce: bool = True
+    timeout: Optional[float] = None
+    # Fälligkeit laut Trigger (ohne Jitter) und tatsächlich geplante Ausführung
+    due_at: Optional[float] = None
+    next_run: Optional[float] = None
+    running: Set[asyncio.Task] = field(default_factory=set)
+    history: Deque[JobRun] = field(default_factory=lambda: deque(maxlen=20))
+    histogram: RunTimeHistogram = field(default_factory=RunTimeHistogram)
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    coalesced: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        last_run = self.history[-1] if self.history else None
+        return {
+            'trigger': repr(self.trigger),
+            'next_run': datetime.fromtimestamp(self.next_run).isoformat() if self.next_run else None,
+            'running': len(self.running),
+            'max_instances': self.max_instances,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'coalesced': self.coalesced,
+            'last_status': last_run.status if last_run else None,
+            'runtime': self.histogram.to_dict()
+        }
+
+
+@dataclass
+class Service:
+    """Dauerhaft laufender Worker (z.B. Queue-Dispatcher)"""
+    name: str
+    start: JobFunc
+    stop: Optional[JobFunc] = None
+    restart_delay: float = 5.0
+    task: Optional[asyncio.Task] = None
+    restarts: int = 0
+
+
+# ==================== SCHEDULER ====================
+
+class JobScheduler:
+    """Ein Scheduler pro Event-Loop, bei dem sich alle Worker registrieren"""
+
+    def __init__(self, clock=None, shutdown_timeout: float = 30.0, seed: Optional[int] = None):
+        """
+        Args:
+            clock: Zeitquelle (Default: SystemClock; in Tests VirtualClock)
+            shutdown_timeout: So lange warten laufende Jobs/Services beim Shutdown, bevor sie abgebrochen werden
+            seed: Seed für den Jitter (reproduzierbar in Tests)
+        """
+        self.clock = clock or SystemClock()
+        self.shutdown_timeout = shutdown_timeout
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.services: Dict[str, Service] = {}
+        self.is_running = False
+        self._random = random.Random(seed)
+        self._changed = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+
+    # ==================== REGISTRIERUNG ====================
+
+    def add_job(self, name: str, func: JobFunc, trigger, max_instances: int = 1,
+                coalesce: bool = True, timeout: Optional[float] = None,
+                run_immediately: bool = False) -> ScheduledJob:
+        """
+        Periodischen Job registrieren.
+
+        Args:
+            name: Eindeutiger Name
+            func: Async-Funktion ohne Argumente
+            trigger: IntervalTrigger oder CronTrigger
+            max_instances: Maximal gleichzeitige Läufe (1 = keine Überlappung)
+            coalesce: Verpasste Läufe zu einem zusammenfassen
+            timeout: Lauf nach so vielen Sekunden abbrechen
+            run_immediately: Erster Lauf sofort statt beim ersten Trigger
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job '{name}' is already registered")
+
+        job = ScheduledJob(name=name, func=func, trigger=trigger, max_instances=max_instances,
+                           coalesce=coalesce, timeout=timeout)
+        now = self.clock.time()
+        job.due_at = now if run_immediately else trigger.next_fire(now)
+        job.next_run = job.due_at if run_immediately else self._with_jitter(job)
+        self.jobs[name] = job
+        self._changed.set()
+
+        logger.info(f"Registered job '{name}' ({trigger!r}), next run at {datetime.fromtimestamp(job.next_run)}")
+        return job
+
+    def add_service(self, name: str, start: JobFunc, stop: Optional[JobFunc] = None,
+                    restart_delay: float = 5.0) -> Service:
+        """
+        Dauerhaft laufenden Worker registrieren (wird mit dem Scheduler gestartet
+        und nach einem Absturz neu gestartet).
+
+        Args:
+            start: Läuft bis der Worker gestoppt wird
+            stop: Fordert den Worker zum Beenden auf (graceful Shutdown)
+        """
+        if name in self.services:
+            raise ValueError(f"Service '{name}' is already registered")
+
+        service = Service(name=name, start=start, stop=stop, restart_delay=restart_delay)
+        self.services[name] = service
+        if self.is_running:
+            service.task = asyncio.create_task(self._supervise(service))
+        return service
+
+    def remove_job(self, name: str) -> None:
+        self.jobs.pop(name, None)
+        self._changed.set()
+
+    def get_job(self, name: str) -> Optional[ScheduledJob]:
+        return self.jobs.get(name)
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self) -> None:
+        """Startet Scheduler-Loop und Services im laufenden Event-Loop"""
+        if self.is_running:
+            logger.warning("Job scheduler is already running")
+            return
+
+        self.is_running = True
+        self._closed.clear()
+        for service in self.services.values():
+            service.task = asyncio.create_task(self._supervise(service))
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"Job scheduler started with {len(self.jobs)} jobs and {len(self.services)} services")
+
+    async def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Keine neuen Läufe mehr; laufende bis zur Frist beenden lassen, dann abbrechen"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        timeout = self.shutdown_timeout if timeout is None else timeout
+
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+
+        for service in self.services.values():
+            if service.stop:
+                try:
+                    await service.stop()
+                except Exception as e:
+                    logger.error(f"Error stopping service '{service.name}': {e}")
+
+        pending = {task for job in self.jobs.values() for task in job.running}
+        pending.update(service.task for service in self.services.values() if service.task)
+        if pending:
+            logger.info(f"Waiting up to {timeout}s for {len(pending)} running jobs/services")
+            _, still_running = await asyncio.wait(pending, timeout=timeout)
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                logger.warning(f"Cancelled {len(still_running)} jobs/services on shutdown")
+                await asyncio.gather(*still_running, return_exceptions=True)
+
+        self._closed.set()
+        logger.info("Job scheduler stopped")
+
+    async def wait_closed(self) -> None:
+        await self._closed.wait()
+
+    # ==================== AUSFÜHRUNG ====================
+
+    def _with_jitter(self, job: ScheduledJob) -> float:
+        jitter = getattr(job.trigger, "jitter", 0.0)
+        return job.due_at + (self._random.uniform(0, jitter) if jitter else 0.0)
+
+    async def _run(self) -> None:
+        while True:
+            self._changed.clear()
+            now = self.clock.time()
+
+            for job in list(self.jobs.values()):
+                if job.next_run is not None and job.next_run <= now:
+                    self._fire(job, now)
+
+            next_runs = [job.next_run for job in self.jobs.values() if job.next_run is not None]
+            waiters = [asyncio.ensure_future(self._changed.wait())]
+            if next_runs:
+                # Höchstens eine Minute am Stück - Sprünge der Systemuhr werden so eingeholt
+                waiters.append(asyncio.ensure_future(self.clock.sleep(min(min(next_runs) - now, 60.0))))
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def _fire(self, job: ScheduledJob, now: float) -> None:
+        """Fällige Läufe starten und die nächste Fälligkeit berechnen"""
+        missed = 0
+        due_at = job.due_at
+        while due_at <= now and missed < MAX_CATCH_UP_RUNS:
+            missed += 1
+            due_at = job.trigger.next_fire(due_at)
+        if due_at <= now:
+            due_at = job.trigger.next_fire(now)
+
+        job.due_at = due_at
+        job.next_run = self._with_jitter(job)
+
+        runs = 1 if job.coalesce else missed
+        if missed > runs:
+            job.coalesced += missed - runs
+            logger.info(f"Job '{job.name}' missed {missed - 1} runs, coalesced into one")
+
+        for _ in range(runs):
+            if len(job.running) >= job.max_instances:
+                job.skipped += 1
+                logger.warning(f"Job '{job.name}' is still running ({len(job.running)}/{job.max_instances}), skipping run")
+                continue
+            self._launch(job)
+
+    def _launch(self, job: ScheduledJob, manual: bool = False) -> asyncio.Task:
+        run = JobRun(started_at=self.clock.time(), manual=manual)
+        task = asyncio.create_task(self._execute(job, run))
+        job.running.add(task)
+        task.add_done_callback(job.running.discard)
+        return task
+
+    async def _execute(self, job: ScheduledJob, run: JobRun) -> JobRun:
+        job.runs += 1
+        job.history.append(run)
+        work = asyncio.ensure_future(job.func())
+        timer = asyncio.ensure_future(self.clock.sleep(job.timeout)) if job.timeout else None
+
+        try:
+            await asyncio.wait([task for task in (work, timer) if task], return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+                run.status = 'timeout'
+                run.error = asyncio.TimeoutError(f"Job timed out after {job.timeout}s")
+                logger.error(f"Job '{job.name}' timed out after {job.timeout}s")
+            elif work.exception() is not None:
+                run.status = 'failed'
+                run.error = work.exception()
+                logger.error(f"Error in job '{job.name}': {run.error}")
+            else:
+                run.status = 'completed'
+                run.result = work.result()
+        except asyncio.CancelledError:
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            run.status = 'cancelled'
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            run.finished_at = self.clock.time()
+            if run.status != 'cancelled':
+                job.histogram.observe(run.finished_at - run.started_at)
+            if run.status in ('failed', 'timeout'):
+                job.failures += 1
+
+        return run
+
+    async def run_now(self, name: str) -> Any:
+        """Job sofort ausführen (manueller Trigger) und sein Ergebnis zurückgeben"""
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(f"Unknown job '{name}'")
+        if len(job.running) >= job.max_instances:
+            raise RuntimeError(f"Job '{name}' is already running")
+
+        run = await self._launch(job, manual=True)
+        if run.error is not None:
+            raise run.error
+        return run.result
+
+    async def _supervise(self, service: Service) -> None:
+        """Startet einen Service und startet ihn nach Abstürzen neu, bis der Scheduler stoppt"""
+        while self.is_running:
+            try:
+                await service.start()
+                if self.is_running:
+                    logger.warning(f"Service '{service.name}' exited, restarting in {service.restart_delay}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Service '{service.name}' crashed: {e} - restarting in {service.restart_delay}s")
+
+            if not self.is_running:
+                break
+            service.restarts += 1
+            await self.clock.sleep(service.restart_delay)
+
+    # ==================== STATUS ====================
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'is_running': self.is_running,
+            'jobs': {name: job.to_dict() for name, job in self.jobs.items()},
+            'services': {
+                name: {
+                    'running': bool(service.task and not service.task.done()),
+                    'restarts': service.restarts
+                }
+                for name, service in self.services.items()
+            }
+        }
@@ -0,0 +1,237 @@
+# workers/scan_executor.py
+"""
+Paralleler Scan-Executor für den ScannerWorker
+
+- Token-Analysen laufen auf einem begrenzten async Worker-Pool
+  (globales Limit + Limit pro Chain, damit eine Chain nicht alle Slots belegt)
+- Alle Tasks eines Scans teilen sich Analyzer, HTTP-Sessions und Caches
+- Der Fortschritt wird regelmäßig als Checkpoint gespeichert - ein gestoppter
+  oder abgestürzter Scan setzt beim Resume dort fort, wo er aufgehört hat
+- Fehlgeschlagene Tokens gelten nicht als erledigt: sie werden am Ende des
+  Laufs erneut versucht und bleiben sonst für das nächste Resume offen
+- Durchsatz (Tokens/min) live über ScanProgress
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (chain, token_address)
+ScanItem = Tuple[str, str]
+
+
+@dataclass
+class ScanCheckpoint:
+    """Resume-Zustand eines Scans (als JSON in ScanJob.checkpoint)"""
+    scan_type: str
+    params: Dict = field(default_factory=dict)
+    # Komplette Arbeitsliste (bei Discovery-Scans nach der Discovery-Phase)
+    items: List[ScanItem] = field(default_factory=list)
+    done: List[ScanItem] = field(default_factory=list)
+    # Letzter Versuch fehlgeschlagen - noch offen, wird erneut versucht
+    failed_items: List[ScanItem] = field(default_factory=list)
+    high_risk: int = 0
+
+    @property
+    def failed(self) -> int:
+        return len(self.failed_items)
+
+    def pending(self) -> List[ScanItem]:
+        """Noch nicht erfolgreich analysierte Tokens (inkl. fehlgeschlagener)"""
+        done = set(self.done)
+        return [item for item in self.items if item not in done]
+
+    def mark_done(self, item: ScanItem) -> bool:
+        """Erfolgreich analysiert → True, wenn das Token vorher als fehlgeschlagen galt"""
+        self.done.append(item)
+        if item in self.failed_items:
+            self.failed_items.remove(item)
+            return True
+        return False
+
+    def mark_failed(self, item: ScanItem) -> bool:
+        """Analyse fehlgeschlagen → True, wenn das Token erstmals fehlschlägt"""
+        if item in self.failed_items:
+            return False
+        self.failed_items.append(item)
+        return True
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ScanCheckpoint":
+        data = json.loads(raw)
+        # Ältere Checkpoints zählten Fehlschläge nur (und hatten die Tokens als erledigt markiert)
+        data.pop('failed', None)
+        data['items'] = [tuple(item) for item in data.get('items', [])]
+        data['done'] = [tuple(item) for item in data.get('done', [])]
+        data['failed_items'] = [tuple(item) for item in data.get('failed_items', [])]
+        return cls(**data)
+
+
+@dataclass
+class ScanProgress:
+    """Live-Fortschritt eines laufenden Scans"""
+    total: int
+    done: int = 0
+    failed: int = 0
+    high_risk: int = 0
+    # Nur Tokens dieses Laufs zählen für den Durchsatz (nicht die aus dem Checkpoint)
+    run_done: int = 0
+    run_started: float = field(default_factory=time.monotonic)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.done - self.failed)
+
+    @property
+    def tokens_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.run_started
+        return self.run_done / elapsed * 60 if elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> float:
+        return (self.done + self.failed) / self.total if self.total else 1.0
+
+    def to_dict(self) -> Dict:
+        tokens_per_minute = self.tokens_per_minute
+        return {
+            "tokens_total": self.total,
+            "tokens_done": self.done,
+            "tokens_failed": self.failed,
+            "tokens_remaining": self.remaining,
+            "tokens_per_minute": round(tokens_per_minute, 2),
+            "eta_seconds": round(self.remaining / tokens_per_minute * 60) if tokens_per_minute > 0 else None
+        }
+
+
+class ScanExecutor:
+    """Führt die Token-Analysen eines Scans parallel aus und checkpointet den Fortschritt"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_chain_concurrency: Optional[Dict[str, int]] = None,
+        default_chain_concurrency: int = 4,
+        checkpoint_every: int = 10,
+        checkpoint_interval_seconds: float = 15.0,
+        max_attempts: int = 2,
+        retry_delay_seconds: float = 5.0
+    ):
+        """
+        Args:
+            max_concurrency: Maximale Anzahl gleichzeitiger Analysen (alle Chains)
+            per_chain_concurrency: Limit pro Chain (z.B. wegen API-Rate-Limits)
+            default_chain_concurrency: Limit für Chains ohne eigenen Eintrag
+            checkpoint_every: Checkpoint nach so vielen erledigten Tokens ...
+            checkpoint_interval_seconds: ... oder spätestens nach so vielen Sekunden
+            max_attempts: Versuche pro Token und Lauf (Fehlschläge werden am Ende erneut versucht)
+            retry_delay_seconds: Pause vor jeder Wiederholungsrunde
+        """
+        self.max_concurrency = max_concurrency
+        self.per_chain_concurrency = per_chain_concurrency or {}
+        self.default_chain_concurrency = default_chain_concurrency
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval_seconds = checkpoint_interval_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay_seconds = retry_delay_seconds
+
+    async def run(
+        self,
+        checkpoint: ScanCheckpoint,
+        progress: ScanProgress,
+        analyze: Callable[[str, str], Awaitable[bool]],
+        save_checkpoint: Callable[[], Awaitable[None]]
+    ) -> ScanProgress:
+        """
+        Analysiert alle noch offenen Tokens des Checkpoints.
+
+        Fehlgeschlagene Tokens landen in checkpoint.failed_items (nicht in done)
+        und werden bis zu max_attempts-mal versucht.
+
+        Args:
+            checkpoint: Resume-Zustand (wird laufend aktualisiert)
+            progress: Live-Fortschritt (wird laufend aktualisiert)
+            analyze: (chain, address) → True, wenn das Token ein hohes Risiko hat
+            save_checkpoint: Persistiert den aktuellen Stand (Fehler werden nur geloggt)
+
+        Returns:
+            Der aktualisierte Fortschritt
+        """
+        pending = checkpoint.pending()
+        if not pending:
+            return progress
+
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        chain_slots = {
+            chain: asyncio.Semaphore(self.per_chain_concurrency.get(chain, self.default_chain_concurrency))
+            for chain in {chain for chain, _ in pending}
+        }
+        save_lock = asyncio.Lock()
+        state = {"since_save": 0, "last_save": time.monotonic()}
+
+        async def checkpoint_if_due() -> None:
+            due = (
+                state["since_save"] >= self.checkpoint_every
+                or time.monotonic() - state["last_save"] >= self.checkpoint_interval_seconds
+            )
+            # Läuft schon ein Save, nimmt der nächste fällige den neuen Stand mit
+            if not due or save_lock.locked():
+                return
+            async with save_lock:
+                state["since_save"] = 0
+                state["last_save"] = time.monotonic()
+                await save_checkpoint()
+
+        async def process(chain: str, address: str) -> None:
+            # Erst den Chain-Slot, dann den globalen - wartende Tasks einer
+            # ausgelasteten Chain blockieren so keine Slots anderer Chains
+            async with chain_slots[chain]:
+                async with global_slots:
+                    try:
+                        high_risk = await analyze(chain, address)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"Error analyzing token {address} on {chain}: {e}")
+                        high_risk = None
+
+            progress.run_done += 1
+            if high_risk is None:
+                if checkpoint.mark_failed((chain, address)):
+                    progress.failed += 1
+            else:
+                progress.done += 1
+                if checkpoint.mark_done((chain, address)):
+                    progress.failed -= 1
+                if high_risk:
+                    checkpoint.high_risk += 1
+                    progress.high_risk += 1
+
+            state["since_save"] += 1
+            await checkpoint_if_due()
+
+        logger.info(
+            f"Analyzing {len(pending)} tokens ({len(checkpoint.done)} already done) "
+            f"with concurrency {self.max_concurrency}"
+        )
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                logger.info(f"Retrying {len(pending)} failed tokens (attempt {attempt}/{self.max_attempts})")
+                await asyncio.sleep(self.retry_delay_seconds)
+            await asyncio.gather(*(process(chain, address) for chain, address in pending))
+
+            pending = list(checkpoint.failed_items)
+            if not pending:
+                break
+
+        if pending:
+            logger.warning(f"{len(pending)} tokens still failing after {self.max_attempts} attempts - left open for resume")
+        return progress
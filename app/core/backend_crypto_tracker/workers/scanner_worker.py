@@ -3,6 +3,7 @@ import asyncio
 import logging
 import os
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import aiofiles
@@ -12,8 +13,10 @@ from app.core.backend_crypto_tracker.utils.logger import get_logger
 from app.core.backend_crypto_tracker.utils.exceptions import APIException, DatabaseException
 from app.core.backend_crypto_tracker.config.scanner_config import scanner_config
 from app.core.backend_crypto_tracker.scanner.token_analyzer import TokenAnalyzer
+from app.core.backend_crypto_tracker.scanner.token_discovery import TokenDiscoveryService
 from app.core.backend_crypto_tracker.processor.database.models.manager import DatabaseManager
-from app.core.backend_crypto_tracker.processor.database.models.scan_job import ScanJob, ScanStatus
+from app.core.backend_crypto_tracker.processor.database.models.scan_job import ScanJob, ScanStatus as ScanJobStatus
+from app.core.backend_crypto_tracker.workers.scan_executor import ScanCheckpoint, ScanExecutor, ScanItem, ScanProgress
 
 logger = get_logger(__name__)
 
@@ -33,6 +36,14 @@ class ScanConfig:
     telegram_alerts: bool = False
     export_results: bool = True
     cleanup_old_data_days: int = 30
+    # Parallele Token-Analysen (ScannerWorker)
+    max_concurrent_analyses: int = 8
+    per_chain_concurrency: Dict[str, int] = field(default_factory=lambda: {
+        "ethereum": 4, "bsc": 4, "solana": 3, "sui": 2
+    })
+    checkpoint_every_tokens: int = 10
+    # Versuche pro Token und Scan-Lauf (fehlgeschlagene bleiben für resume_scan offen)
+    analysis_attempts: int = 2
 
 @dataclass
 class AlertConfig:
@@ -210,15 +221,20 @@ class ScanJobManager:
                 job_result = {'status': 'failed', 'reason': 'no_results'}
                 return job_result
             
-            # Speichere Ergebnisse in Datenbank
+            # Speichere Ergebnisse in Datenbank (eine Transaktion; schlägt sie fehl,
+            # einzeln speichern, damit ein fehlerhaftes Ergebnis nicht alle verwirft)
             saved_count = 0
-            for result in scan_results:
-                try:
-                    await self.db_manager.save_token_analysis(result)
-                    saved_count += 1
-                except Exception as e:
-                    token_symbol = result.get('token_data', {}).get('symbol', 'Unknown')
-                    logger.error(f"Error saving {token_symbol}: {e}")
+            try:
+                saved_count = await self.db_manager.save_token_analyses(scan_results)
+            except Exception as e:
+                logger.warning(f"Bulk save failed, saving results individually: {e}")
+                for result in scan_results:
+                    try:
+                        await self.db_manager.save_token_analysis(result)
+                        saved_count += 1
+                    except Exception as e:
+                        token_symbol = result.get('token_data', {}).get('symbol', 'Unknown')
+                        logger.error(f"Error saving {token_symbol}: {e}")
             
             # Statistiken aktualisieren
             self.scan_stats['successful_scans'] += 1
@@ -336,20 +352,38 @@ class ScanJobManager:
 class ScannerWorker:
     """Worker-Klasse für Scanner-Operationen, die von ScannerController verwendet wird"""
     
-    def __init__(self, scan_config: ScanConfig = None, alert_config: AlertConfig = None):
+    SCAN_HISTORY_LIMIT = 100
+    
+    def __init__(self, scan_config: ScanConfig = None, alert_config: AlertConfig = None,
+                 job_manager: ScanJobManager = None):
         # Standardkonfiguration verwenden, wenn keine angegeben
         self.scan_config = scan_config or ScanConfig()
         self.alert_config = alert_config or AlertConfig()
         
-        # JobManager initialisieren
-        self.job_manager = ScanJobManager(self.scan_config, self.alert_config)
+        # JobManager initialisieren (oder den des SchedulerManagers mitbenutzen)
+        self.job_manager = job_manager or ScanJobManager(self.scan_config, self.alert_config)
         
         # Token Analyzer und Database Manager für direkten Zugriff
+        # (eine Instanz für alle Scans - Sessions und Caches werden geteilt)
         self.token_analyzer = TokenAnalyzer()
         self.db_manager = DatabaseManager()
+        self._scoring_engine = None
+        self._analyzer_users = 0
+        
+        # Paralleler Executor für Token-Analysen
+        self.executor = ScanExecutor(
+            max_concurrency=self.scan_config.max_concurrent_analyses,
+            per_chain_concurrency=self.scan_config.per_chain_concurrency,
+            checkpoint_every=self.scan_config.checkpoint_every_tokens,
+            max_attempts=self.scan_config.analysis_attempts
+        )
         
         # Aktive Scans speichern
         self.active_scans = {}
+        self._scan_tasks: Dict[str, asyncio.Task] = {}
+        self._scan_progress: Dict[str, ScanProgress] = {}
+        # Abgeschlossene/gestoppte Scans dieses Prozesses (die letzten SCAN_HISTORY_LIMIT)
+        self.scan_history: List[ScanJob] = []
         
         logger.info("ScannerWorker initialized")
     
@@ -360,17 +394,22 @@ class ScannerWorker:
         # Neuen Scan-Job erstellen
         scan_job = ScanJob(
             id=scan_id,
-            status=ScanStatus.SCANNING,
+            status=ScanJobStatus.SCANNING,
             progress=0.0,
             start_time=datetime.utcnow(),
             chain=",".join(chains),
-            scan_type="discovery"
+            scan_type="discovery",
+            tokens_found=0,
+            tokens_analyzed=0,
+            high_risk_tokens=0
+        )
+        checkpoint = ScanCheckpoint(
+            scan_type="discovery",
+            params={"chains": chains, "max_market_cap": max_market_cap, "max_tokens": max_tokens}
         )
-        
-        self.active_scans[scan_id] = scan_job
         
         # Scan im Hintergrund starten
-        asyncio.create_task(self._run_discovery_scan(scan_id, chains, max_market_cap, max_tokens))
+        self._launch_scan(scan_job, checkpoint)
         
         logger.info(f"Started discovery scan {scan_id} for chains: {chains}")
         return scan_id
@@ -382,42 +421,107 @@ class ScannerWorker:
         # Neuen Scan-Job erstellen
         scan_job = ScanJob(
             id=scan_id,
-            status=ScanStatus.ANALYZING,
+            status=ScanJobStatus.ANALYZING,
             progress=0.0,
             start_time=datetime.utcnow(),
             chain=chain,
-            scan_type="analysis"
+            scan_type="analysis",
+            tokens_found=len(token_addresses),
+            tokens_analyzed=0,
+            high_risk_tokens=0
+        )
+        checkpoint = ScanCheckpoint(
+            scan_type="analysis",
+            params={"chain": chain, "include_advanced_metrics": include_advanced_metrics},
+            items=[(chain, token_address) for token_address in dict.fromkeys(token_addresses)]
         )
-        
-        self.active_scans[scan_id] = scan_job
         
         # Analyse im Hintergrund starten
-        asyncio.create_task(self._run_analysis_scan(scan_id, token_addresses, chain, include_advanced_metrics))
+        self._launch_scan(scan_job, checkpoint)
         
         logger.info(f"Started analysis scan {scan_id} for {len(token_addresses)} tokens on {chain}")
         return scan_id
     
+    async def resume_scan(self, scan_id: str) -> bool:
+        """Setzt einen gestoppten, fehlgeschlagenen oder abgebrochenen Scan am letzten Checkpoint fort"""
+        if scan_id in self.active_scans:
+            logger.warning(f"Scan {scan_id} is already running")
+            return False
+        
+        try:
+            job_data = await self.db_manager.get_scan_job(scan_id)
+            raw_checkpoint = await self.db_manager.get_scan_checkpoint(scan_id)
+        except Exception as e:
+            logger.error(f"Error loading scan {scan_id} for resume: {e}")
+            return False
+        
+        if not job_data or not raw_checkpoint:
+            logger.warning(f"Scan {scan_id} has no checkpoint to resume from")
+            return False
+        
+        checkpoint = ScanCheckpoint.from_json(raw_checkpoint)
+        scan_job = ScanJob(
+            id=scan_id,
+            status=ScanJobStatus.SCANNING if checkpoint.scan_type == "discovery" else ScanJobStatus.ANALYZING,
+            progress=job_data.get('progress') or 0.0,
+            start_time=datetime.fromisoformat(job_data['start_time']) if job_data.get('start_time') else datetime.utcnow(),
+            chain=job_data.get('chain'),
+            scan_type=checkpoint.scan_type,
+            tokens_found=job_data.get('tokens_found') or len(checkpoint.items),
+            tokens_analyzed=len(checkpoint.done),
+            high_risk_tokens=checkpoint.high_risk
+        )
+        
+        self._launch_scan(scan_job, checkpoint)
+        
+        logger.info(
+            f"Resumed scan {scan_id}: {len(checkpoint.pending())} of {len(checkpoint.items)} tokens left "
+            f"({checkpoint.failed} to retry)"
+        )
+        return True
+    
+    async def resume_interrupted_scans(self) -> List[str]:
+        """Setzt Scans fort, die beim letzten Stopp/Absturz des Prozesses noch liefen (beim Worker-Start)"""
+        resumed = []
+        for status in (ScanJobStatus.SCANNING, ScanJobStatus.ANALYZING):
+            try:
+                jobs = await self.db_manager.get_scan_jobs(status=status)
+            except Exception as e:
+                logger.error(f"Error loading interrupted scans: {e}")
+                return resumed
+            
+            for job in jobs:
+                if job['id'] not in self.active_scans and await self.resume_scan(job['id']):
+                    resumed.append(job['id'])
+        
+        return resumed
+    
     async def stop_scan(self, scan_id: str) -> bool:
-        """Stoppt einen aktiven Scan"""
+        """Stoppt einen aktiven Scan (der letzte Checkpoint bleibt für resume_scan erhalten)"""
         if scan_id not in self.active_scans:
             logger.warning(f"Scan {scan_id} not found or not active")
             return False
         
         scan_job = self.active_scans[scan_id]
-        scan_job.status = ScanStatus.STOPPED
+        scan_job.status = ScanJobStatus.STOPPED
         scan_job.end_time = datetime.utcnow()
         
-        # Zum Verlauf hinzufügen und aus aktiven Scans entfernen
+        # Laufende Analysen abbrechen - der Scan-Task speichert den Checkpoint
+        task = self._scan_tasks.get(scan_id)
+        if task and not task.done():
+            task.cancel()
+        
+        # Aus aktiven Scans entfernen (der Scan-Task trägt ihn in den Verlauf ein)
         self.active_scans.pop(scan_id, None)
         
         logger.info(f"Stopped scan {scan_id}")
         return True
     
     def get_scan_status(self, scan_id: str) -> Optional[Dict[str, Any]]:
-        """Gibt den Status eines Scans zurück"""
+        """Gibt den Status eines Scans zurück (inkl. Live-Durchsatz)"""
         if scan_id in self.active_scans:
             scan_job = self.active_scans[scan_id]
-            return {
+            status = {
                 "scan_id": scan_id,
                 "status": scan_job.status.value,
                 "progress": scan_job.progress,
@@ -428,164 +532,162 @@ class ScannerWorker:
                 "tokens_analyzed": scan_job.tokens_analyzed,
                 "high_risk_tokens": scan_job.high_risk_tokens
             }
+            
+            progress = self._scan_progress.get(scan_id)
+            if progress:
+                status.update(progress.to_dict())
+            return status
         return None
     
-    async def _run_discovery_scan(self, scan_id: str, chains: List[str], max_market_cap: float, max_tokens: int):
-        """Führt einen Discovery-Scan im Hintergrund durch"""
+    def _launch_scan(self, scan_job: ScanJob, checkpoint: ScanCheckpoint):
+        """Registriert den Scan und startet ihn als Hintergrund-Task"""
+        self.active_scans[scan_job.id] = scan_job
+        
+        task = asyncio.create_task(self._run_scan(scan_job, checkpoint))
+        self._scan_tasks[scan_job.id] = task
+        task.add_done_callback(lambda _: self._scan_tasks.pop(scan_job.id, None))
+    
+    @asynccontextmanager
+    async def _shared_analyzer(self):
+        """Ein geöffneter TokenAnalyzer für alle laufenden Scans (geschlossen mit dem letzten)"""
+        if self._analyzer_users == 0:
+            await self.token_analyzer.__aenter__()
+        self._analyzer_users += 1
         try:
-            scan_job = self.active_scans.get(scan_id)
-            if not scan_job:
-                logger.error(f"Scan job {scan_id} not found")
-                return
-            
-            tokens_found = 0
-            high_risk_tokens = 0
-            
-            try:
-                # Token Discovery durchführen
-                for chain in chains:
-                    tokens = await self.token_analyzer.discover_tokens(
-                        chain, max_market_cap, max_tokens // len(chains)
-                    )
-                    
-                    tokens_found += len(tokens)
-                    
-                    # Scan-Fortschritt aktualisieren
-                    if scan_id in self.active_scans:
-                        scan_job.tokens_found = tokens_found
-                        scan_job.progress = min(0.9, tokens_found / max_tokens)
-                    
-                    # Tokens analysieren
-                    for token in tokens:
-                        try:
-                            analysis = await self.token_analyzer.analyze_token(token)
-                            
-                            if analysis.get('token_score', 0) < 30:  # Niedriger Score = hohes Risiko
-                                high_risk_tokens += 1
-                        except Exception as e:
-                            logger.warning(f"Error analyzing token {token.symbol}: {e}")
+            yield self.token_analyzer
+        finally:
+            self._analyzer_users -= 1
+            if self._analyzer_users == 0:
+                await self.token_analyzer.__aexit__(None, None, None)
+    
+    async def _save_checkpoint(self, scan_job: ScanJob, checkpoint: Optional[ScanCheckpoint]):
+        """Persistiert ScanJob + Checkpoint (Datenbankfehler stoppen den Scan nicht)"""
+        scan_job.checkpoint = checkpoint.to_json() if checkpoint else None
+        try:
+            await self.db_manager.save_scan_job(scan_job)
+        except Exception as e:
+            logger.warning(f"Could not checkpoint scan {scan_job.id}: {e}")
+    
+    async def _run_scan(self, scan_job: ScanJob, checkpoint: ScanCheckpoint):
+        """Führt einen Discovery- oder Analyse-Scan im Hintergrund durch"""
+        scan_id = scan_job.id
+        
+        try:
+            async with self._shared_analyzer():
+                # Discovery-Phase (entfällt beim Resume, die Arbeitsliste steht im Checkpoint)
+                if checkpoint.scan_type == "discovery" and not checkpoint.items:
+                    checkpoint.items = await self._discover_items(**checkpoint.params)
+                    scan_job.tokens_found = len(checkpoint.items)
                 
-                # Scan abschließen
-                if scan_id in self.active_scans:
-                    scan_job.status = ScanStatus.COMPLETED
-                    scan_job.end_time = datetime.utcnow()
-                    scan_job.tokens_analyzed = tokens_found
-                    scan_job.high_risk_tokens = high_risk_tokens
-                    scan_job.progress = 1.0
-                    
-                    # Aus aktiven Scans entfernen
-                    self.active_scans.pop(scan_id, None)
-                    
-                    logger.info(f"Discovery scan {scan_id} completed: {tokens_found} tokens found, {high_risk_tokens} high risk")
+                progress = ScanProgress(
+                    total=len(checkpoint.items),
+                    done=len(checkpoint.done),
+                    failed=checkpoint.failed,
+                    high_risk=checkpoint.high_risk
+                )
+                self._scan_progress[scan_id] = progress
                 
-            except Exception as e:
-                logger.error(f"Error in discovery scan {scan_id}: {e}")
+                async def save_progress():
+                    scan_job.tokens_analyzed = progress.done
+                    scan_job.high_risk_tokens = progress.high_risk
+                    scan_job.progress = round(progress.fraction, 4)
+                    await self._save_checkpoint(scan_job, checkpoint)
                 
-                if scan_id in self.active_scans:
-                    scan_job.status = ScanStatus.FAILED
-                    scan_job.end_time = datetime.utcnow()
-                    scan_job.error_message = str(e)
-                    
-                    # Aus aktiven Scans entfernen
-                    self.active_scans.pop(scan_id, None)
-        
+                await save_progress()
+                
+                await self.executor.run(
+                    checkpoint,
+                    progress,
+                    self._make_token_analysis(checkpoint),
+                    save_progress
+                )
+            
+            # Scan abschließen - Checkpoint nur behalten, wenn Tokens fehlgeschlagen sind
+            # (resume_scan versucht dann genau diese erneut)
+            scan_job.status = ScanJobStatus.COMPLETED
+            scan_job.end_time = datetime.utcnow()
+            scan_job.tokens_analyzed = progress.done
+            scan_job.high_risk_tokens = progress.high_risk
+            scan_job.progress = 1.0
+            await self._save_checkpoint(scan_job, checkpoint if checkpoint.failed_items else None)
+            
+            logger.info(
+                f"{checkpoint.scan_type.capitalize()} scan {scan_id} completed: {progress.done} tokens analyzed "
+                f"({progress.failed} failed), {progress.high_risk} high risk, "
+                f"{progress.tokens_per_minute:.1f} tokens/min"
+            )
+        except asyncio.CancelledError:
+            # stop_scan: Stand sichern, damit resume_scan fortsetzen kann
+            scan_job.status = ScanJobStatus.STOPPED
+            scan_job.end_time = scan_job.end_time or datetime.utcnow()
+            await self._save_checkpoint(scan_job, checkpoint)
+            logger.info(f"Scan {scan_id} stopped after {len(checkpoint.done) + checkpoint.failed}/{len(checkpoint.items)} tokens")
+            raise
         except Exception as e:
-            logger.error(f"Critical error in discovery scan {scan_id}: {e}")
+            logger.error(f"Error in {checkpoint.scan_type} scan {scan_id}: {e}")
             
-            if scan_id in self.active_scans:
-                scan_job = self.active_scans[scan_id]
-                scan_job.status = ScanStatus.FAILED
-                scan_job.end_time = datetime.utcnow()
-                scan_job.error_message = str(e)
-                
-                # Aus aktiven Scans entfernen
-                self.active_scans.pop(scan_id, None)
+            scan_job.status = ScanJobStatus.FAILED
+            scan_job.end_time = datetime.utcnow()
+            scan_job.error_message = str(e)
+            await self._save_checkpoint(scan_job, checkpoint)
+        finally:
+            # Aus aktiven Scans entfernen und zum Verlauf hinzufügen
+            self.active_scans.pop(scan_id, None)
+            self._scan_progress.pop(scan_id, None)
+            self.scan_history.append(scan_job)
+            del self.scan_history[:-self.SCAN_HISTORY_LIMIT]
     
-    async def _run_analysis_scan(self, scan_id: str, token_addresses: List[str], chain: str, include_advanced_metrics: bool):
-        """Führt einen Analyse-Scan im Hintergrund durch"""
-        try:
-            scan_job = self.active_scans.get(scan_id)
-            if not scan_job:
-                logger.error(f"Scan job {scan_id} not found")
-                return
+    async def _discover_items(self, chains: List[str], max_market_cap: float, max_tokens: int) -> List[ScanItem]:
+        """Token Discovery für alle Chains parallel"""
+        per_chain = max(1, max_tokens // max(1, len(chains)))
+        
+        async with TokenDiscoveryService() as token_discovery:
+            results = await asyncio.gather(
+                *(token_discovery.discover_tokens(chain, max_market_cap, per_chain) for chain in chains),
+                return_exceptions=True
+            )
+        
+        items = []
+        for chain, tokens in zip(chains, results):
+            if isinstance(tokens, Exception):
+                logger.warning(f"Error discovering tokens on {chain}: {tokens}")
+                continue
+            items.extend((chain, token.address) for token in tokens)
+        
+        return list(dict.fromkeys(items))
+    
+    def _make_token_analysis(self, checkpoint: ScanCheckpoint):
+        """Analyse eines Tokens → True bei hohem Risiko"""
+        include_advanced_metrics = checkpoint.params.get("include_advanced_metrics", False)
+        
+        async def analyze(chain: str, token_address: str) -> bool:
+            analysis = await self.token_analyzer.analyze_custom_token(token_address, chain)
             
-            tokens_analyzed = 0
-            high_risk_tokens = 0
+            # Risiko bewerten
+            score = analysis.get('score', 50)
+            if not include_advanced_metrics:
+                return score < 30  # Niedriger Score = hohes Risiko
             
             try:
-                # Token-Analysen durchführen
-                for i, token_address in enumerate(token_addresses):
-                    try:
-                        analysis = await self.token_analyzer.analyze_custom_token(token_address, chain)
-                        
-                        tokens_analyzed += 1
-                        
-                        # Fortschritt aktualisieren
-                        if scan_id in self.active_scans:
-                            scan_job.tokens_analyzed = tokens_analyzed
-                            scan_job.progress = min(0.9, tokens_analyzed / len(token_addresses))
-                        
-                        # Risiko bewerten
-                        score = analysis.get('score', 50)
-                        if include_advanced_metrics:
-                            try:
-                                # Erweiterte Analyse durchführen
-                                wallet_analyses = analysis.get('wallet_analyses', {}).get('top_holders', [])
-                                
-                                # Erweiterte Scoring-Engine nutzen
-                                from app.core.backend_crypto_tracker.scanner.scoring_engine import MultiChainScoringEngine
-                                scoring_engine = MultiChainScoringEngine()
-                                advanced_score = await scoring_engine.calculate_token_score_advanced(
-                                    analysis.get('token_info', {}),
-                                    wallet_analyses,
-                                    chain
-                                )
-                                
-                                if advanced_score.get('institutional_score', 50) < 30:
-                                    high_risk_tokens += 1
-                            except Exception as e:
-                                logger.warning(f"Error in advanced scoring for {token_address}: {e}")
-                        else:
-                            if score < 30:
-                                high_risk_tokens += 1
-                    except Exception as e:
-                        logger.warning(f"Error analyzing token {token_address}: {e}")
-                
-                # Scan abschließen
-                if scan_id in self.active_scans:
-                    scan_job.status = ScanStatus.COMPLETED
-                    scan_job.end_time = datetime.utcnow()
-                    scan_job.tokens_found = tokens_analyzed
-                    scan_job.high_risk_tokens = high_risk_tokens
-                    scan_job.progress = 1.0
-                    
-                    # Aus aktiven Scans entfernen
-                    self.active_scans.pop(scan_id, None)
-                    
-                    logger.info(f"Analysis scan {scan_id} completed: {tokens_analyzed} tokens analyzed, {high_risk_tokens} high risk")
-                
+                # Erweiterte Scoring-Engine nutzen (eine Instanz für alle Tasks)
+                wallet_analyses = analysis.get('wallet_analyses', {}).get('top_holders', [])
+                advanced_score = await self._get_scoring_engine().calculate_token_score_advanced(
+                    analysis.get('token_info', {}),
+                    wallet_analyses,
+                    chain
+                )
+                return advanced_score.get('institutional_score', 50) < 30
             except Exception as e:
-                logger.error(f"Error in analysis scan {scan_id}: {e}")
-                
-                if scan_id in self.active_scans:
-                    scan_job.status = ScanStatus.FAILED
-                    scan_job.end_time = datetime.utcnow()
-                    scan_job.error_message = str(e)
-                    
-                    # Aus aktiven Scans entfernen
-                    self.active_scans.pop(scan_id, None)
+                logger.warning(f"Error in advanced scoring for {token_address}: {e}")
+                return False
         
-        except Exception as e:
-            logger.error(f"Critical error in analysis scan {scan_id}: {e}")
-            
-            if scan_id in self.active_scans:
-                scan_job = self.active_scans[scan_id]
-                scan_job.status = ScanStatus.FAILED
-                scan_job.end_time = datetime.utcnow()
-                scan_job.error_message = str(e)
-                
-                # Aus aktiven Scans entfernen
-                self.active_scans.pop(scan_id, None)
+        return analyze
+    
+    def _get_scoring_engine(self):
+        if self._scoring_engine is None:
+            from app.core.backend_crypto_tracker.scanner.scoring_engine import MultiChainScoringEngine
+            self._scoring_engine = MultiChainScoringEngine()
+        return self._scoring_engine
     
     def get_active_scans(self) -> Dict[str, Any]:
         """Gibt alle aktiven Scans zurück"""
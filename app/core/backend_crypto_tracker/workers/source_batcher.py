@@ -0,0 +1,147 @@
+# workers/source_batcher.py
+"""
+Gebündelte, begrenzt parallele Lookups gegen eine externe Quelle
+
+- Lookups derselben Quelle und Chain, die innerhalb eines kurzen Zeitfensters
+  eintreffen, werden zu einem Batch zusammengefasst
+- Doppelte Lookups (z.B. Labels + Risiko-Score derselben Adresse) teilen
+  sich einen Aufruf
+- Bietet die Quelle einen Batch-Endpoint (fetch_many), geht der Batch in
+  einem Request raus, sonst als einzelne parallele Requests
+- Ein Semaphore pro Quelle begrenzt die gleichzeitigen Requests (Rate-Limits)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.backend_crypto_tracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (chain, address) → Ergebnis
+FetchOne = Callable[[str, str], Awaitable[Any]]
+# (chain, addresses) → {address: Ergebnis}
+FetchMany = Callable[[str, List[str]], Awaitable[Dict[str, Any]]]
+
+
+class SourceBatcher:
+    """Bündelt Lookups einer Quelle pro Chain"""
+
+    def __init__(
+        self,
+        name: str,
+        fetch_one: FetchOne,
+        fetch_many: Optional[FetchMany] = None,
+        max_concurrency: int = 4,
+        batch_size: int = 50,
+        batch_window: float = 0.05
+    ):
+        """
+        Args:
+            name: Name der Quelle (Logs/Stats)
+            fetch_one: Einzel-Lookup
+            fetch_many: Batch-Lookup, falls die Quelle einen hat
+            max_concurrency: Maximale gleichzeitige Requests an die Quelle
+            batch_size: Maximale Adressen pro Batch
+            batch_window: So lange (Sekunden) wird auf weitere Lookups gewartet
+        """
+        self.name = name
+        self.fetch_one = fetch_one
+        self.fetch_many = fetch_many
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # chain → {address: Future}
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._batches: set = set()
+
+        self.lookups = 0
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def lookup(self, chain: str, address: str) -> Any:
+        """Ergebnis für eine Adresse (wird mit anderen Lookups gebündelt)"""
+        self.lookups += 1
+        loop = asyncio.get_running_loop()
+        pending = self._pending.setdefault(chain, {})
+
+        future = pending.get(address)
+        if future is None:
+            future = loop.create_future()
+            pending[address] = future
+
+            if len(pending) >= self.batch_size:
+                self._flush(chain)
+            elif chain not in self._flush_handles:
+                self._flush_handles[chain] = loop.call_later(self.batch_window, self._flush, chain)
+
+        # shield: ein abgebrochener Aufrufer bricht den Lookup der anderen nicht ab
+        return await asyncio.shield(future)
+
+    def _flush(self, chain: str) -> None:
+        handle = self._flush_handles.pop(chain, None)
+        if handle is not None:
+            handle.cancel()
+
+        batch = self._pending.pop(chain, None)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(chain, batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, chain: str, batch: Dict[str, asyncio.Future]) -> None:
+        self.batches += 1
+        addresses = list(batch)
+
+        try:
+            if self.fetch_many is not None:
+                async with self._slots:
+                    self.requests += 1
+                    results = await self.fetch_many(chain, addresses)
+                for address, future in batch.items():
+                    if not future.done():
+                        future.set_result(results.get(address))
+            else:
+                await asyncio.gather(*(self._run_one(chain, address, future) for address, future in batch.items()))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"{self.name} batch lookup for {len(addresses)} addresses on {chain} failed: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _run_one(self, chain: str, address: str, future: asyncio.Future) -> None:
+        try:
+            async with self._slots:
+                self.requests += 1
+                result = await self.fetch_one(chain, address)
+        except Exception as e:
+            self.errors += 1
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def close(self) -> None:
+        """Offene Batches sofort abschicken und abwarten"""
+        for chain in list(self._pending):
+            self._flush(chain)
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'lookups': self.lookups,
+            'requests': self.requests,
+            'batches': self.batches,
+            'errors': self.errors,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.max_concurrency - self._slots._value,
+        }
@@ -7,7 +7,8 @@ from app.core.backend_crypto_tracker.utils.logger import get_logger
 from app.core.backend_crypto_tracker.utils.exceptions import APIException, DatabaseException
 from app.core.backend_crypto_tracker.processor.blockchain_parser import BlockchainParser
 from app.core.backend_crypto_tracker.processor.database.models.transaction import Transaction
-from app.core.backend_crypto_tracker.processor.database.manager import DatabaseManager
+from app.core.backend_crypto_tracker.processor.database.models.manager import DatabaseManager
+from app.core.backend_crypto_tracker.workers.job_scheduler import IntervalTrigger, JobScheduler
 
 logger = get_logger(__name__)
 
@@ -16,6 +17,7 @@ class TransactionWorker:
         self.db_manager = db_manager
         self.config = config
         self.is_running = False
+        self._scheduler: Optional[JobScheduler] = None
         self.parsers = {
             'ethereum': None,
             'bsc': None,
@@ -114,8 +116,24 @@ class TransactionWorker:
             logger.error(f"Error getting current block for {chain}: {e}")
             return 0
     
+    def register(self, scheduler: JobScheduler):
+        """Registriert den Block-Poll als Job (keine überlappenden Durchläufe)"""
+        scheduler.add_job(
+            'transaction_worker',
+            self.run_once,
+            IntervalTrigger(self.config.get('poll_interval_seconds', 60), jitter=self.config.get('poll_jitter_seconds', 5)),
+            max_instances=1,
+            timeout=self.config.get('job_timeout_seconds', 600),
+            run_immediately=True
+        )
+    
+    async def run_once(self):
+        """Ein Durchlauf über alle Blockchains"""
+        await self._process_all_chains()
+        self.stats['last_run_time'] = datetime.now()
+    
     async def start(self):
-        """Startet den Transaction Worker"""
+        """Startet den Transaction Worker eigenständig (im Verbund: register() beim gemeinsamen Scheduler)"""
         if self.is_running:
             logger.warning("Transaction worker is already running")
             return
@@ -123,21 +141,18 @@ class TransactionWorker:
         self.is_running = True
         logger.info("Starting transaction worker")
         
-        while self.is_running:
-            try:
-                await self._process_all_chains()
-                self.stats['last_run_time'] = datetime.now()
-                
-                # Wartezeit zwischen den Durchläufen
-                await asyncio.sleep(60)  # 1 Minute
-            except Exception as e:
-                logger.error(f"Error in transaction worker: {e}")
-                await asyncio.sleep(30)  # Kürzere Wartezeit bei Fehlern
+        self._scheduler = JobScheduler()
+        self.register(self._scheduler)
+        await self._scheduler.start()
+        await self._scheduler.wait_closed()
     
     async def stop(self):
         """Stoppt den Transaction Worker"""
         self.is_running = False
         logger.info("Stopping transaction worker")
+        if self._scheduler is not None:
+            await self._scheduler.shutdown()
+            self._scheduler = None
     
     async def _process_all_chains(self):
         """Verarbeitet Transaktionen für alle unterstützten Blockchains"""
@@ -0,0 +1,34 @@
+"""
+Gemeinsame Test-Infrastruktur für die Test-Suites unter app/core
+
+- `@pytest.mark.benchmark`: läuft nur mit RUN_BENCHMARKS=1
+- `timed`: führt eine Funktion aus und misst die Laufzeit
+"""
+
+import os
+import time
+
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: Laufzeit-Vergleich, nur mit RUN_BENCHMARKS=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv('RUN_BENCHMARKS'):
+        return
+    skip = pytest.mark.skip(reason='set RUN_BENCHMARKS=1')
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def timed():
+    """timed(fn, *args, **kwargs) -> (Ergebnis, Sekunden)"""
+    def run(fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, time.perf_counter() - start
+    return run
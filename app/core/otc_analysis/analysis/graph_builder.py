@@ -6,6 +6,7 @@ import logging
 from collections import defaultdict
 
 from app.core.otc_analysis.models.wallet import Wallet
+from app.core.otc_analysis.analysis import activity_rollup
 from app.core.otc_analysis.analysis.network_graph import NetworkAnalysisService
 from app.core.otc_analysis.utils.cache import CacheManager
 
@@ -61,7 +62,7 @@ class GraphBuilderService:
         
         # Build Phase 2 data structures
         sankey_data = self._build_sankey_data(wallets, edges)
-        time_heatmap = self._build_time_heatmap(wallets)
+        time_heatmap = self._build_time_heatmap(wallets, db, from_date, to_date)
         timeline_data = self._build_timeline_data(wallets, from_date, to_date)
         distributions = self._build_distributions(wallets)
         
@@ -226,20 +227,36 @@ class GraphBuilderService:
             'links': sankey_links
         }
     
-    def _build_time_heatmap(self, wallets: List[Wallet]) -> Dict:
-        """Build time heatmap data (7x24 matrix)."""
-        # Initialize 7x24 matrix (days x hours)
-        heatmap = [[0 for _ in range(24)] for _ in range(7)]
-        transaction_counts = [[0 for _ in range(24)] for _ in range(7)]
+    def _build_time_heatmap(
+        self,
+        wallets: List[Wallet],
+        db: Optional[Session] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Build time heatmap data (7x24 matrix).
         
-        # Aggregate activity from wallets
-        for wallet in wallets:
-            if wallet.active_hours and wallet.active_days:
-                for hour in wallet.active_hours:
-                    for day in wallet.active_days:
-                        if 0 <= day < 7 and 0 <= hour < 24:
-                            heatmap[day][hour] += wallet.avg_transaction_usd
-                            transaction_counts[day][hour] += 1
+        Reads hourly activity rollups when a session and window are given;
+        falls back to wallet profile hours/days if no rollups exist yet.
+        """
+        heatmap = None
+        
+        if db is not None and from_date is not None and to_date is not None:
+            activity = activity_rollup.load_hour_of_week(
+                db, [w.address for w in wallets], from_date, to_date
+            )
+            if activity['rows']:
+                heatmap = activity['volume']
+                transaction_counts = activity['count']
+        
+        if heatmap is None:
+            # Initialize 7x24 matrix (days x hours)
+            heatmap = [[0 for _ in range(24)] for _ in range(7)]
+            transaction_counts = [[0 for _ in range(24)] for _ in range(7)]
+            
+            # Aggregate activity from wallets
+            self._aggregate_profile_activity(wallets, heatmap, transaction_counts)
         
         # Find peak hours (top 3)
         peaks = []
@@ -265,6 +282,21 @@ class GraphBuilderService:
             'patterns': patterns
         }
     
+    def _aggregate_profile_activity(
+        self,
+        wallets: List[Wallet],
+        heatmap: List[List[float]],
+        transaction_counts: List[List[int]]
+    ):
+        """Approximate activity from wallet profile active hours x days."""
+        for wallet in wallets:
+            if wallet.active_hours and wallet.active_days:
+                for hour in wallet.active_hours:
+                    for day in wallet.active_days:
+                        if 0 <= day < 7 and 0 <= hour < 24:
+                            heatmap[day][hour] += wallet.avg_transaction_usd
+                            transaction_counts[day][hour] += 1
+    
     def _detect_time_patterns(
         self,
         heatmap: List[List[float]],
@@ -229,6 +229,7 @@ async def get_detailed_stats(
 async def sync_all_transactions(
     max_wallets: int = Query(20, le=100, description="Max number of wallets to sync"),
     max_transactions_per_wallet: int = Query(100, le=500, description="Max TXs per wallet"),
+    max_concurrency: int = Query(4, ge=1, le=16, description="Wallets synced in parallel"),
     db: Session = Depends(get_db)
 ):
     """
@@ -247,7 +248,8 @@ async def sync_all_transactions(
     
     **Performance:**
     - 20 Wallets × 100 TXs = ~2000 Transaktionen
-    - Dauer: ca. 2-5 Minuten (abhängig von API Rate Limits)
+    - Wallets parallel (max_concurrency), Bulk-Upsert pro Wallet
+    - Dauer: abhängig von API Rate Limits (rows/s in stats)
     
     **Returns:**
     - wallets_processed: Anzahl erfolgreich verarbeiteter Wallets
@@ -265,7 +267,8 @@ async def sync_all_transactions(
         stats = await sync_all_wallets_transactions(
             db=db,
             max_wallets=max_wallets,
-            max_transactions_per_wallet=max_transactions_per_wallet
+            max_transactions_per_wallet=max_transactions_per_wallet,
+            max_concurrency=max_concurrency
         )
         
         return {
@@ -274,7 +277,7 @@ async def sync_all_transactions(
             "message": (
                 f"✅ Synced {stats['total_saved']} transactions "
                 f"for {stats['wallets_processed']} wallets "
-                f"({stats['errors']} errors)"
+                f"({stats['errors']} errors, {stats.get('rows_per_second', 0):,.1f} rows/s)"
             ),
             "recommendations": [
                 "Run /api/admin/enrich-missing-values to add USD values to transactions without them",
@@ -347,7 +350,7 @@ async def sync_single_wallet_transactions(
 
 @router.post("/enrich-missing-values")
 async def enrich_missing_usd_values(
-    batch_size: int = Query(100, le=500, description="Transactions per batch"),
+    batch_size: int = Query(500, le=5000, description="Transactions per batch"),
     max_batches: int = Query(10, le=50, description="Max batches to process"),
     db: Session = Depends(get_db)
 ):
@@ -364,8 +367,8 @@ async def enrich_missing_usd_values(
     4. Updated Transaktionen in DB
     
     **Performance:**
-    - Rate Limited: 1.2s delay zwischen Calls
-    - Batch Processing: 100 TXs pro Batch
+    - Ein Preis pro (token, day) - gecached in historical_prices
+    - Range-Requests statt Einzel-Calls, Bulk UPDATE pro Batch
     - Smart Priorisierung: Große TXs zuerst
     
     **Use After:**
@@ -389,7 +392,8 @@ async def enrich_missing_usd_values(
             "stats": stats,
             "message": (
                 f"✅ Enriched {stats['enriched']} transactions "
-                f"({stats['failed']} failed, {stats['rate_limit_hits']} rate limits)"
+                f"({stats['failed']} failed, {stats['rate_limit_hits']} rate limits, "
+                f"{stats.get('tx_per_second', 0):.1f} tx/s)"
             )
         }
         
@@ -400,6 +404,46 @@ async def enrich_missing_usd_values(
             "error": str(e)
         }
 
+@router.post("/rebuild-activity-rollups")
+async def rebuild_activity_rollups(
+    start_date: str = Query(None, description="First day to rebuild (YYYY-MM-DD), default: all"),
+    end_date: str = Query(None, description="Last day to rebuild (YYYY-MM-DD), default: all"),
+    db: Session = Depends(get_db)
+):
+    """
+    🧮 Baut die stündlichen Aktivitäts-Rollups (Heatmap) neu auf.
+    
+    Rollups werden beim Sync / Enrichment inkrementell gepflegt. Dieser
+    Endpoint ist für den Erst-Backfill oder nach Schreibzugriffen, die
+    am Ingest-Pfad vorbeigehen.
+    """
+    import asyncio
+    from app.core.otc_analysis.analysis import activity_rollup
+    
+    logger.info("🧮 ADMIN: Rebuilding activity rollups...")
+    
+    try:
+        start = datetime.fromisoformat(start_date).date() if start_date else None
+        end = datetime.fromisoformat(end_date).date() if end_date else None
+        
+        stats = await asyncio.to_thread(activity_rollup.rebuild, db, start, end)
+        
+        return {
+            "success": True,
+            "stats": stats,
+            "message": (
+                f"✅ Rebuilt {stats['rollup_rows']} rollup rows "
+                f"from {stats['transactions_scanned']} transactions"
+            )
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Rollup rebuild failed: {e}", exc_info=True)
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 @router.get("/discover/debug/wallet-edges")
 async def debug_wallet_edges(
     db: Session = Depends(get_db)
@@ -23,7 +23,7 @@ from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 
 # Database
-from app.core.backend_crypto_tracker.config.database import get_db
+from app.core.backend_crypto_tracker.config.database import get_db, SessionLocal
 from app.core.otc_analysis.models.wallet_link import WalletLink
 
 # ✨ API infrastructure
@@ -39,6 +39,7 @@ from app.core.otc_analysis.detection.flow_tracer import FlowTracer
 # Blockchain Services
 from app.core.otc_analysis.blockchain.node_provider import NodeProvider
 from app.core.otc_analysis.blockchain.block_scanner import BlockScanner
+from app.core.otc_analysis.blockchain.contract_cache import ContractCodeCache
 from app.core.otc_analysis.blockchain.transaction_extractor import TransactionExtractor
 from app.core.otc_analysis.blockchain.balance_fetcher import BalanceFetcher  # ✨ NEW
 from app.core.otc_analysis.blockchain.etherscan import EtherscanAPI
@@ -49,6 +50,7 @@ from app.core.otc_analysis.discovery.balance_scorer import BalanceScorer
 
 # Data Sources
 from app.core.otc_analysis.data_sources.price_oracle import PriceOracle
+from app.core.otc_analysis.data_sources.historical_price_service import HistoricalPriceService
 from app.core.otc_analysis.data_sources.otc_desks import OTCDeskRegistry
 from app.core.otc_analysis.data_sources.wallet_labels import WalletLabelingService
 from app.core.otc_analysis.discovery.discovery_scorer import DiscoveryScorer
@@ -92,6 +94,12 @@ price_oracle = PriceOracle(
     etherscan,
     moralis_api_key=os.getenv('MORALIS_API_KEY')  # ✨ NEW
 )
+
+# ✨ NEW: Day-granularity price cache (persisted in historical_prices)
+historical_price_service = HistoricalPriceService(
+    price_oracle,
+    session_factory=SessionLocal
+)
     
 # API infrastructure
 api_health_monitor = ApiHealthMonitor(cooldown_minutes=5, error_threshold=0.5)
@@ -110,7 +118,8 @@ wallet_profiler = WalletProfiler(
 transaction_extractor = TransactionExtractor(
     node_provider, 
     etherscan,
-    use_moralis=True
+    use_moralis=True,
+    price_service=historical_price_service
 )
 
 # ✨ NEW: BalanceFetcher for current wallet balances
@@ -135,7 +144,12 @@ otc_registry = OTCDeskRegistry(cache_manager)
 labeling_service = WalletLabelingService(cache_manager)
 otc_detector = OTCDetector(cache_manager, otc_registry, labeling_service)
 flow_tracer = FlowTracer()
-block_scanner = BlockScanner(node_provider, chain_id=1)
+block_scanner = BlockScanner(
+    node_provider,
+    chain_id=1,
+    contract_cache=ContractCodeCache(cache_manager),
+    checkpoint_path=os.getenv('BLOCK_SCANNER_CHECKPOINT')
+)
 
 # Analysis services
 statistics_service = StatisticsService(cache_manager)
@@ -149,6 +163,7 @@ logger.info(f"   • Strategy: ALWAYS Quick Stats First (15x faster)")
 logger.info(f"   • WalletProfiler: with PriceOracle + WalletStatsAPI")
 logger.info(f"   • WalletStatsAPI: Multi-tier fallback")
 logger.info(f"   • TransactionExtractor: Moralis enabled")
+logger.info(f"   • HistoricalPriceService: (token, day) batch resolution")
 logger.info(f"   • LinkBuilder: Fast link generation with caching")
 logger.info(f"   • BalanceFetcher: Current balance tracking (5min cache)")  # ✨ NEW
 logger.info(f"   • ActivityAnalyzer: Temporal pattern analysis (90d threshold)")  # ✨ NEW
@@ -188,6 +203,11 @@ def get_price_oracle():
     return price_oracle
 
 
+def get_historical_price_service():
+    """Dependency: Get historical price service."""
+    return historical_price_service
+
+
 def get_wallet_profiler():
     """Dependency: Get wallet profiler."""
     return wallet_profiler
@@ -1864,12 +1884,12 @@ async def sync_wallet_transactions_to_db(
     """
     Synchronisiert Transaktionen eines Wallets in die Datenbank.
     
-    ✅ FIXED VERSION v3.1 FINAL:
-    - REMOVED 'needs_enrichment' field (doesn't exist in DB)
-    - Speichert ALLE neuen TXs (mit oder ohne USD value)
-    - Updates existierende TXs wenn neuer USD value verfügbar
-    - Robustes Logging für Debugging
-    - NoneType-safe überall
+    ✅ BULK VERSION v4.0:
+    - Normalisiert alle Transfers in einen spaltenorientierten Batch
+    - Ein INSERT ... ON CONFLICT (tx_hash) DO UPDATE pro Chunk
+    - Updates existierende TXs nur wenn neuer USD value verfügbar
+    - Blockierende API-Calls laufen im Thread-Pool (parallele Syncs möglich)
+    - Meldet rows/s
     
     Args:
         db: Database session
@@ -1881,9 +1901,12 @@ async def sync_wallet_transactions_to_db(
     Returns:
         Dict with sync statistics
     """
-    from app.core.otc_analysis.models.transaction import Transaction
-    from datetime import datetime, timedelta
-    from sqlalchemy import and_, or_
+    import asyncio
+    from app.core.otc_analysis.blockchain.transaction_ingestor import (
+        normalize_transactions,
+        bulk_upsert_transactions,
+        count_wallet_transactions,
+    )
     
     logger.info(f"🔄 Syncing transactions for {wallet_address[:10]}...")
     
@@ -1895,6 +1918,7 @@ async def sync_wallet_transactions_to_db(
         "updated_count": 0,
         "skipped_count": 0,
         "enrichment_failed": 0,
+        "rows_per_second": 0.0,
         "source": "unknown",
         "errors": []
     }
@@ -1907,13 +1931,9 @@ async def sync_wallet_transactions_to_db(
         if not force_refresh:
             cutoff_time = datetime.now() - timedelta(hours=6)
             
-            existing_count = db.query(Transaction).filter(
-                or_(
-                    Transaction.from_address == wallet_address.lower(),
-                    Transaction.to_address == wallet_address.lower()
-                ),
-                Transaction.created_at >= cutoff_time
-            ).count()
+            existing_count = count_wallet_transactions(
+                db, wallet_address, created_since=cutoff_time
+            )
             
             stats["existing_count"] = existing_count
             
@@ -1938,7 +1958,8 @@ async def sync_wallet_transactions_to_db(
         
         logger.info(f"   📡 Fetching transactions via TransactionExtractor...")
         
-        transactions = transaction_extractor.extract_wallet_transactions(
+        transactions = await asyncio.to_thread(
+            transaction_extractor.extract_wallet_transactions,
             wallet_address,
             include_internal=True,
             include_tokens=True
@@ -1971,7 +1992,8 @@ async def sync_wallet_transactions_to_db(
             logger.info(f"   💰 Enriching {len(transactions)} transactions with USD values...")
             
             try:
-                enriched_transactions = transaction_extractor.enrich_with_usd_value(
+                enriched_transactions = await asyncio.to_thread(
+                    transaction_extractor.enrich_with_usd_value,
                     transactions,
                     price_oracle,
                     max_transactions=len(transactions)
@@ -2003,225 +2025,37 @@ async def sync_wallet_transactions_to_db(
             stats["enrichment_failed"] = len(transactions)
         
         # ====================================================================
-        # STEP 4: SAVE TO DATABASE (IMPROVED LOGIC)
+        # STEP 4: BULK UPSERT TO DATABASE
         # ====================================================================
         
-        logger.info(f"   💾 Saving transactions to database...")
-        
-        insert_count = 0
-        update_count = 0
-        skip_count = 0
-        error_count = 0
+        batch = normalize_transactions(enriched_transactions)
         
-        for idx, tx in enumerate(enriched_transactions):
-            try:
-                # ============================================================
-                # PARSE TRANSACTION DATA
-                # ============================================================
-                
-                # Parse timestamp
-                tx_timestamp = tx.get('timestamp')
-                if isinstance(tx_timestamp, str):
-                    try:
-                        tx_timestamp = datetime.fromisoformat(tx_timestamp.replace('Z', '+00:00'))
-                    except:
-                        tx_timestamp = datetime.now()
-                elif isinstance(tx_timestamp, int):
-                    tx_timestamp = datetime.fromtimestamp(tx_timestamp)
-                elif not isinstance(tx_timestamp, datetime):
-                    tx_timestamp = datetime.now()
-                
-                # Extract USD value (check multiple keys)
-                usd_value = None
-                for key in ['value_usd', 'valueUSD', 'usd_value']:
-                    val = tx.get(key)
-                    if val is not None:
-                        try:
-                            usd_value = float(val)
-                            if usd_value > 0:
-                                break
-                        except (ValueError, TypeError):
-                            continue
-                
-                # Get ETH value
-                value_wei = str(tx.get('value', '0'))
-                try:
-                    raw_value = float(tx.get('value', 0))
-                    value_decimal = raw_value / 1e18 if tx.get('value') else 0
-
-                    # ✅ Skip spam tokens with absurd values (>10^27)
-                    if raw_value > 1e27:
-                        logger.debug(f"      🗑️  Skipping spam token TX {tx.get('hash', '')[:10]}: value={raw_value:.2e}")
-                        skip_count += 1
-                        continue
-
-                    # ✅ Cap value_decimal to prevent database overflow (NUMERIC(36,18) max = 10^18)
-                    MAX_DECIMAL = 999999999999999999.0  # 10^18 - 1
-                    if abs(value_decimal) > MAX_DECIMAL:
-                        logger.debug(f"      ⚠️ Capping oversized value_decimal: {value_decimal:.2e} -> {MAX_DECIMAL:.2e}")
-                        value_decimal = MAX_DECIMAL if value_decimal > 0 else -MAX_DECIMAL
-                except:
-                    value_decimal = 0
-                
-                # Calculate OTC score
-                otc_score = 0.0
-                if usd_value and usd_value > 0:
-                    if usd_value > 100000:
-                        otc_score = min(usd_value / 1000000, 1.0)
-                
-                # Get transaction hash
-                tx_hash = tx.get('hash') or tx.get('tx_hash')
-                if not tx_hash:
-                    logger.debug(f"      ⚠️ TX {idx+1}: Missing tx_hash, skipping")
-                    skip_count += 1
-                    continue
-                
-                # ============================================================
-                # CHECK IF TX EXISTS IN DB
-                # ============================================================
-                
-                existing_tx = db.query(Transaction).filter(
-                    Transaction.tx_hash == tx_hash
-                ).first()
-                
-                if existing_tx:
-                    # ========================================================
-                    # UPDATE EXISTING TRANSACTION
-                    # ========================================================
-                    
-                    should_update = False
-                    
-                    # Case 1: We have new USD value, existing doesn't
-                    if usd_value and usd_value > 0:
-                        if not existing_tx.usd_value or existing_tx.usd_value == 0:
-                            existing_tx.usd_value = usd_value
-                            existing_tx.otc_score = otc_score
-                            existing_tx.is_suspected_otc = otc_score > 0.7
-                            existing_tx.updated_at = datetime.now()
-                            should_update = True
-                    
-                    if should_update:
-                        update_count += 1
-                        
-                        if update_count <= 5:
-                            logger.info(
-                                f"      🔄 TX {idx+1} ({tx_hash[:10]}...): "
-                                f"Updated with USD value"
-                            )
-                        
-                        # Commit in batches
-                        if update_count % 20 == 0:
-                            db.commit()
-                            logger.info(f"      ✅ Committed {update_count} updates...")
-                    else:
-                        skip_count += 1
-                    
-                    continue
-                
-                # ============================================================
-                # INSERT NEW TRANSACTION (✅ FIXED: NO needs_enrichment!)
-                # ============================================================
-                
-                new_tx = Transaction(
-                    tx_hash=tx_hash,
-                    block_number=int(tx.get('blockNumber', 0) or tx.get('block_number', 0) or 0),
-                    timestamp=tx_timestamp,
-                    from_address=(tx.get('from_address') or tx.get('from', '')).lower(),
-                    to_address=(tx.get('to_address') or tx.get('to', '')).lower(),
-                    token_address=tx.get('tokenAddress') or tx.get('token_address'),
-                    value=value_decimal,  # ETH-denominated (not raw wei) to fit Numeric(36,18)
-                    value_decimal=value_decimal,
-                    usd_value=usd_value,
-                    gas_used=int(tx.get('gasUsed', 0) or tx.get('gas_used', 0) or 0),
-                    gas_price=int(tx.get('gasPrice', 0) or tx.get('gas_price', 0) or 0),
-                    is_contract_interaction=tx.get('isContractInteraction', False),
-                    method_id=tx.get('methodId') or tx.get('method_id'),
-                    otc_score=otc_score,
-                    is_suspected_otc=otc_score > 0.7,
-                    chain='ethereum',
-                    chain_id=1,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-                
-                # Use savepoint so one failed TX doesn't rollback the whole batch
-                try:
-                    db.begin_nested()  # SAVEPOINT
-                    db.add(new_tx)
-                    db.flush()
-                except Exception as flush_error:
-                    # Savepoint rolled back automatically, session still usable
-                    error_count += 1
-                    if error_count <= 3:
-                        logger.warning(f"      ⚠️ TX {idx+1} ({tx_hash[:10]}...): {str(flush_error)[:80]}")
-                    continue
-
-                insert_count += 1
-
-                if insert_count <= 5:
-                    usd_display = f"${usd_value:,.2f}" if usd_value else "$0.00"
-                    logger.info(
-                        f"      ➕ TX {idx+1} ({tx_hash[:10]}...): "
-                        f"Inserted ({usd_display})"
-                    )
-
-                # Commit in batches
-                if insert_count % 50 == 0:
-                    db.commit()
-                    logger.info(f"      ✅ Committed {insert_count} inserts...")
-
-            except Exception as tx_error:
-                error_count += 1
-                error_msg = f"TX {idx+1}: {str(tx_error)[:100]}"
-                stats["errors"].append(error_msg)
-
-                if error_count <= 3:
-                    logger.warning(f"      ⚠️ Error processing {error_msg}")
-
-                db.rollback()
-
-                continue
+        logger.info(f"   💾 Upserting {len(batch)} transactions ({batch.skipped} skipped)...")
         
-        # ====================================================================
-        # FINAL COMMIT & SUMMARY
-        # ====================================================================
+        # Blocking DB write → off the event loop
+        write_stats = await asyncio.to_thread(bulk_upsert_transactions, db, batch)
         
-        try:
-            db.commit()
-        except Exception as commit_error:
-            logger.error(f"   ❌ Final commit failed: {commit_error}")
-            db.rollback()
-            lost_count = insert_count % 50
-            stats["errors"].append(f"Final commit failed, ~{lost_count} transactions lost: {str(commit_error)[:200]}")
-            logger.warning(f"   ⚠️ ~{lost_count} transactions lost from final batch (previous batches committed OK)")
-
-        stats["saved_count"] = insert_count
-        stats["updated_count"] = update_count
-        stats["skipped_count"] = skip_count
+        stats["saved_count"] = write_stats["inserted"]
+        stats["updated_count"] = write_stats["updated"]
+        stats["skipped_count"] = batch.skipped + write_stats["unchanged"]
+        stats["rows_per_second"] = write_stats["rows_per_second"]
         stats["source"] = "blockchain"
+        stats["errors"].extend(write_stats["errors"])
         
         logger.info(
             f"   ✅ Transaction sync complete: "
-            f"Saved {insert_count}, "
-            f"Updated {update_count}, "
-            f"Skipped {skip_count}"
+            f"Saved {stats['saved_count']}, "
+            f"Updated {stats['updated_count']}, "
+            f"Skipped {stats['skipped_count']} "
+            f"({write_stats['rows_per_second']:,.0f} rows/s)"
         )
         
-        if error_count > 0:
-            logger.warning(f"   ⚠️ {error_count} errors occurred during sync")
-        
         # ====================================================================
         # VERIFICATION: Count actual DB entries
         # ====================================================================
         
-        if insert_count > 0 or update_count > 0:
-            total_in_db = db.query(Transaction).filter(
-                or_(
-                    Transaction.from_address == wallet_address.lower(),
-                    Transaction.to_address == wallet_address.lower()
-                )
-            ).count()
-            
+        if stats["saved_count"] > 0 or stats["updated_count"] > 0:
+            total_in_db = count_wallet_transactions(db, wallet_address)
             logger.info(f"   📊 Total transactions in DB for this wallet: {total_in_db}")
         
         return stats
@@ -2234,158 +2068,40 @@ async def sync_wallet_transactions_to_db(
         
 async def enrich_missing_usd_values(
     db: Session,
-    batch_size: int = 100,
-    delay_between_calls: float = 1.2,
+    batch_size: int = 500,
     max_batches: int = 10
 ) -> Dict[str, Any]:
     """
     Enriched Transaktionen die usd_value = NULL oder 0 haben.
     
-    ✨ SMART ENRICHMENT:
-    - Priorisiert große Transaktionen (> 0.1 ETH)
-    - Rate Limit Protection mit Delays
-    - Batch Processing mit Commits
-    - Stoppt bei zu vielen Fehlern
+    ✨ BATCH ENRICHMENT (HistoricalPriceService):
+    - Gruppiert pro Batch nach (token, day) → jeder Key nur 1x aufgelöst
+    - Range-Endpoint statt Einzel-Calls, Ergebnisse in historical_prices
+    - Bulk UPDATE statt ORM-Updates pro Transaktion
+    - Priorisiert große Transaktionen (> 0.01)
     
     Args:
         db: Database session
-        batch_size: Anzahl TXs pro Batch (default: 100)
-        delay_between_calls: Verzögerung zwischen API-Calls (default: 1.2s)
+        batch_size: Anzahl TXs pro Batch (default: 500)
         max_batches: Max Anzahl Batches (default: 10)
     
     Returns:
-        Dict with stats
+        Dict with stats (incl. tx_per_second)
     """
-    from app.core.otc_analysis.models.transaction import Transaction
-    from datetime import datetime
     import asyncio
     
     logger.info("="*70)
     logger.info("💰 ENRICHING MISSING USD VALUES")
     logger.info("="*70)
     
-    stats = {
-        "total_checked": 0,
-        "enriched": 0,
-        "failed": 0,
-        "skipped": 0,
-        "batches_processed": 0,
-        "rate_limit_hits": 0,
-        "start_time": datetime.now()
-    }
-    
     try:
-        for batch_num in range(max_batches):
-            logger.info(f"\n📦 Processing batch {batch_num + 1}/{max_batches}...")
-            
-            # ✨ OPTIMIERTE QUERY: Priorisiere große TXs
-            transactions = db.query(Transaction).filter(
-                (Transaction.usd_value == None) | (Transaction.usd_value == 0),
-                Transaction.value_decimal > 0.01,  # Nur > 0.01 ETH
-            ).order_by(
-                Transaction.value_decimal.desc()  # Größte zuerst
-            ).limit(batch_size).all()
-            
-            if not transactions:
-                logger.info("   ✅ No more transactions to enrich")
-                break
-            
-            logger.info(f"   Found {len(transactions)} transactions needing enrichment")
-            stats["total_checked"] += len(transactions)
-            
-            for tx in transactions:
-                try:
-                    # Determine token
-                    if tx.token_address and tx.token_address.lower() != '0x' * 20:
-                        token_symbol = tx.token_address  # Will be resolved by price oracle
-                    else:
-                        token_symbol = "ETH"
-                    
-                    # ✨ Get price with retry logic
-                    price = None
-                    retry_count = 0
-                    max_retries = 3
-                    
-                    while retry_count < max_retries and not price:
-                        try:
-                            price = await price_oracle.get_token_price_at_time(
-                                token_symbol,
-                                tx.timestamp
-                            )
-                            
-                            if price and price > 0:
-                                break
-                            
-                            # Delay between retries
-                            if retry_count < max_retries - 1:
-                                await asyncio.sleep(delay_between_calls * (retry_count + 1))
-                            
-                        except Exception as price_error:
-                            error_msg = str(price_error).lower()
-                            
-                            if 'rate' in error_msg or 'limit' in error_msg or '429' in error_msg:
-                                stats["rate_limit_hits"] += 1
-                                logger.warning(f"      ⏱️ Rate limit hit, waiting {delay_between_calls * 2}s...")
-                                await asyncio.sleep(delay_between_calls * 2)
-                            
-                            retry_count += 1
-                    
-                    if price and price > 0:
-                        # Calculate USD value
-                        usd_value = tx.value_decimal * price
-                        
-                        # Update transaction
-                        tx.usd_value = usd_value
-                        tx.otc_score = min(usd_value / 1000000, 1.0) if usd_value > 100000 else 0.0
-                        tx.is_suspected_otc = tx.otc_score > 0.7
-                        tx.updated_at = datetime.now()
-
-                        stats["enriched"] += 1
-                        
-                        # Commit in small batches
-                        if stats["enriched"] % 10 == 0:
-                            db.commit()
-                            logger.info(
-                                f"      ✅ Enriched {stats['enriched']} transactions "
-                                f"(latest: ${usd_value:,.2f})"
-                            )
-                        
-                        # Delay between successful calls
-                        await asyncio.sleep(delay_between_calls)
-                        
-                    else:
-                        tx.updated_at = datetime.now()
-                        stats["failed"] += 1
-                    
-                except Exception as tx_error:
-                    logger.debug(f"      ⚠️ Error enriching TX {tx.tx_hash[:10]}: {tx_error}")
-                    stats["failed"] += 1
-                    
-                    # Stop batch if too many consecutive failures
-                    if stats["failed"] > 20 and stats["enriched"] == 0:
-                        logger.error("   ❌ Too many failures, stopping batch")
-                        break
-                    
-                    continue
-            
-            # Commit batch
-            db.commit()
-            stats["batches_processed"] += 1
-            
-            logger.info(
-                f"   ✅ Batch {batch_num + 1} complete: "
-                f"{stats['enriched']} enriched, "
-                f"{stats['failed']} failed"
-            )
-            
-            # Delay between batches
-            if batch_num < max_batches - 1:
-                await asyncio.sleep(delay_between_calls * 2)
-        
-        stats["end_time"] = datetime.now()
-        stats["duration_seconds"] = (
-            stats["end_time"] - stats["start_time"]
-        ).total_seconds()
+        # Blocking HTTP + DB work → off the event loop
+        stats = await asyncio.to_thread(
+            historical_price_service.enrich_pending_transactions,
+            db,
+            batch_size,
+            max_batches
+        )
         
         logger.info("\n" + "="*70)
         logger.info("✅ ENRICHMENT COMPLETE")
@@ -2393,9 +2109,11 @@ async def enrich_missing_usd_values(
         logger.info(f"Total checked: {stats['total_checked']}")
         logger.info(f"Successfully enriched: {stats['enriched']}")
         logger.info(f"Failed: {stats['failed']}")
-        logger.info(f"Rate limit hits: {stats['rate_limit_hits']}")
+        logger.info(f"Distinct (token, day) keys: {stats['unique_price_keys']}")
+        logger.info(f"Price API requests: {stats['price_requests']}")
         logger.info(f"Batches processed: {stats['batches_processed']}")
         logger.info(f"Duration: {stats['duration_seconds']:.1f}s")
+        logger.info(f"Throughput: {stats['tx_per_second']:.1f} tx/s")
         logger.info("="*70)
         
         return stats
@@ -2403,12 +2121,23 @@ async def enrich_missing_usd_values(
     except Exception as e:
         logger.error(f"❌ Enrichment failed: {e}", exc_info=True)
         db.rollback()
-        return stats
+        return {
+            "total_checked": 0,
+            "enriched": 0,
+            "failed": 0,
+            "skipped": 0,
+            "batches_processed": 0,
+            "rate_limit_hits": 0,
+            "tx_per_second": 0.0,
+            "error": str(e)
+        }
 
 async def sync_all_wallets_transactions(
     db: Session,
     max_wallets: int = 10,
-    max_transactions_per_wallet: int = 100
+    max_transactions_per_wallet: int = 100,
+    max_concurrency: int = 4,
+    addresses: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Synchronisiert Transaktionen für alle aktiven Wallets.
@@ -2416,16 +2145,22 @@ async def sync_all_wallets_transactions(
     Holt Transaktionen für alle OTC Wallets in der DB und speichert sie.
     Dadurch wird die Heatmap mit echten Daten gefüllt.
     
+    ✨ CONCURRENT: Wallets laufen parallel (max_concurrency), jede mit
+    eigener DB-Session. Provider-Limits greifen weiterhin über die
+    Rate Limiter von EtherscanAPI / PriceOracle.
+    
     Args:
         db: Database session
         max_wallets: Max number of wallets to sync (default: 10)
         max_transactions_per_wallet: Max TXs per wallet (default: 100)
+        max_concurrency: Wallets synced at the same time (default: 4)
+        addresses: Restrict to these wallets instead of all active ones
     
     Returns:
-        Dict with overall stats
+        Dict with overall stats (incl. per-wallet and aggregate rows/s)
     """
+    import asyncio
     from app.core.otc_analysis.models.wallet import Wallet as OTCWallet
-    from datetime import datetime, timedelta
     
     logger.info("="*70)
     logger.info("🔄 SYNCING TRANSACTIONS FOR ALL WALLETS")
@@ -2435,49 +2170,92 @@ async def sync_all_wallets_transactions(
         "wallets_processed": 0,
         "total_fetched": 0,
         "total_saved": 0,
+        "total_updated": 0,
         "total_skipped": 0,
         "errors": 0,
+        "per_wallet": [],
         "start_time": datetime.now()
     }
     
+    started = time.perf_counter()
+    
     try:
         # Get active wallets
-        wallets = db.query(OTCWallet).filter(
-            OTCWallet.is_active == True,
-            OTCWallet.confidence_score >= 50.0
-        ).order_by(OTCWallet.total_volume.desc()).limit(max_wallets).all()
+        query = db.query(OTCWallet.address, OTCWallet.label)
         
-        logger.info(f"📊 Found {len(wallets)} active wallets to sync")
+        if addresses:
+            query = query.filter(OTCWallet.address.in_(addresses))
+        else:
+            query = query.filter(
+                OTCWallet.is_active == True,
+                OTCWallet.confidence_score >= 50.0
+            )
         
-        for wallet in wallets:
-            try:
-                logger.info(f"\n🔄 Processing wallet {wallet.address[:10]}... ({wallet.label})")
-                
-                stats = await sync_wallet_transactions_to_db(
-                    db=db,
-                    wallet_address=wallet.address,
-                    max_transactions=max_transactions_per_wallet,
-                    force_refresh=False
-                )
+        wallets = query.order_by(OTCWallet.total_volume.desc()).limit(max_wallets).all()
+        
+        logger.info(
+            f"📊 Found {len(wallets)} active wallets to sync "
+            f"(concurrency: {max_concurrency})"
+        )
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def _sync_one(address: str, label: Optional[str]) -> Dict[str, Any]:
+            async with semaphore:
+                logger.info(f"\n🔄 Processing wallet {address[:10]}... ({label})")
                 
-                overall_stats["wallets_processed"] += 1
-                overall_stats["total_fetched"] += stats["fetched_count"]
-                overall_stats["total_saved"] += stats["saved_count"]
-                overall_stats["total_skipped"] += stats["skipped_count"]
+                # Sessions are not concurrency-safe → one per wallet
+                wallet_db = SessionLocal()
+                wallet_started = time.perf_counter()
                 
-                # Small delay to avoid rate limits
-                import asyncio
-                await asyncio.sleep(0.5)
+                try:
+                    stats = await sync_wallet_transactions_to_db(
+                        db=wallet_db,
+                        wallet_address=address,
+                        max_transactions=max_transactions_per_wallet,
+                        force_refresh=False
+                    )
+                finally:
+                    wallet_db.close()
                 
-            except Exception as wallet_error:
-                logger.error(f"❌ Error processing wallet {wallet.address[:10]}: {wallet_error}")
+                stats["duration_seconds"] = time.perf_counter() - wallet_started
+                return stats
+        
+        results = await asyncio.gather(
+            *(_sync_one(wallet.address, wallet.label) for wallet in wallets),
+            return_exceptions=True
+        )
+        
+        for wallet, stats in zip(wallets, results):
+            if isinstance(stats, Exception):
+                logger.error(f"❌ Error processing wallet {wallet.address[:10]}: {stats}")
                 overall_stats["errors"] += 1
                 continue
+            
+            if stats["errors"]:
+                overall_stats["errors"] += 1
+            
+            overall_stats["wallets_processed"] += 1
+            overall_stats["total_fetched"] += stats["fetched_count"]
+            overall_stats["total_saved"] += stats["saved_count"]
+            overall_stats["total_updated"] += stats["updated_count"]
+            overall_stats["total_skipped"] += stats["skipped_count"]
+            overall_stats["per_wallet"].append({
+                "address": wallet.address,
+                "source": stats["source"],
+                "fetched": stats["fetched_count"],
+                "saved": stats["saved_count"],
+                "updated": stats["updated_count"],
+                "duration_seconds": stats["duration_seconds"],
+                "rows_per_second": stats["rows_per_second"]
+            })
+        
+        duration = time.perf_counter() - started
+        written = overall_stats["total_saved"] + overall_stats["total_updated"]
         
         overall_stats["end_time"] = datetime.now()
-        overall_stats["duration_seconds"] = (
-            overall_stats["end_time"] - overall_stats["start_time"]
-        ).total_seconds()
+        overall_stats["duration_seconds"] = duration
+        overall_stats["rows_per_second"] = written / duration if duration > 0 else 0.0
         
         logger.info("\n" + "="*70)
         logger.info("✅ TRANSACTION SYNC COMPLETE")
@@ -2485,9 +2263,11 @@ async def sync_all_wallets_transactions(
         logger.info(f"Wallets processed: {overall_stats['wallets_processed']}")
         logger.info(f"Transactions fetched: {overall_stats['total_fetched']}")
         logger.info(f"Transactions saved: {overall_stats['total_saved']}")
+        logger.info(f"Transactions updated: {overall_stats['total_updated']}")
         logger.info(f"Transactions skipped: {overall_stats['total_skipped']}")
         logger.info(f"Errors: {overall_stats['errors']}")
         logger.info(f"Duration: {overall_stats['duration_seconds']:.1f}s")
+        logger.info(f"Throughput: {overall_stats['rows_per_second']:,.1f} rows/s (end-to-end)")
         logger.info("="*70)
         
         return overall_stats
@@ -2511,6 +2291,7 @@ __all__ = [
     "get_labeling_service",
     "get_transaction_extractor",
     "get_price_oracle",
+    "get_historical_price_service",
     "get_wallet_profiler",
     "get_otc_detector",
     "get_link_builder",
@@ -2531,6 +2312,7 @@ __all__ = [
     "node_provider",
     "etherscan",
     "price_oracle",
+    "historical_price_service",
     "transaction_extractor",
     "block_scanner",
     "statistics_service",
@@ -11,9 +11,14 @@ Network visualization and activity heatmap endpoints.
 - SQL GROUP BY for performance
 
 Previous versions used Wallet.total_volume (lifetime) / 168 which was incorrect.
-Now queries transactions grouped by EXTRACT(DOW) and EXTRACT(HOUR).
+
+✅ v2.5 - HOURLY ROLLUPS:
+- Reads wallet_hourly_activity (maintained on ingest) instead of
+  scanning transactions with EXTRACT(DOW/HOUR) on every request
+- Auto-sync runs in the background, never inside the request
 """
 
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException, Query, Depends
 from sqlalchemy.orm import Session
@@ -27,6 +32,7 @@ from .dependencies import (
     ensure_registry_wallets_in_db
 )
 
+from app.core.otc_analysis.analysis import activity_rollup
 from app.core.otc_analysis.models.wallet import Wallet as OTCWallet
 from app.core.otc_analysis.models.transaction import Transaction  # ✅ NEW
 from app.core.otc_analysis.models.wallet_link import WalletLink
@@ -37,6 +43,9 @@ logger = logging.getLogger(__name__)
 # Network router
 network_router = APIRouter(prefix="", tags=["Network"])
 
+# Running heatmap auto-sync (at most one at a time)
+_auto_sync_task: Optional[asyncio.Task] = None
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -82,12 +91,50 @@ def _empty_heatmap_response(start: datetime, end: datetime) -> dict:
             "hours_per_day": 24,
             "total_cells": 168,
             "non_zero_cells": 0,
-            "data_source": "transactions_table",
-            "aggregation_method": "postgres_extract"
+            "data_source": "wallet_hourly_activity",
+            "aggregation_method": "hourly_rollup"
         }
     }
 
 
+def _schedule_auto_sync(addresses: List[str]) -> bool:
+    """
+    Start a background transaction sync for the given wallets.
+
+    Returns False if a previous auto-sync is still running.
+    """
+    global _auto_sync_task
+
+    if _auto_sync_task is not None and not _auto_sync_task.done():
+        logger.info("⏳ Auto-sync already running - not scheduling another")
+        return False
+
+    async def _run():
+        from app.core.backend_crypto_tracker.config.database import SessionLocal
+        from app.core.otc_analysis.api.dependencies import sync_all_wallets_transactions
+
+        sync_db = SessionLocal()
+        try:
+            stats = await sync_all_wallets_transactions(
+                db=sync_db,
+                max_wallets=len(addresses),
+                max_transactions_per_wallet=100,
+                addresses=addresses
+            )
+            logger.info(
+                f"✅ Auto-sync complete: "
+                f"{stats.get('wallets_processed', 0)} wallets, "
+                f"{stats.get('total_saved', 0)} transactions saved"
+            )
+        except Exception as e:
+            logger.error(f"❌ Auto-sync failed: {e}", exc_info=True)
+        finally:
+            sync_db.close()
+
+    _auto_sync_task = asyncio.create_task(_run())
+    return True
+
+
 # ============================================================================
 # NETWORK ENDPOINTS
 # ============================================================================
@@ -647,12 +694,6 @@ def _categorize_wallet_tags(tags: List[str]) -> Dict[str, List[str]]:
     return categories
 
 
-"""
-ERSETZE den @network_router.get("/heatmap") Endpoint in network.py
-
-✨ NEU: Auto-Sync wenn keine Transaktionen gefunden werden
-"""
-
 @network_router.get("/heatmap")
 async def get_activity_heatmap(
     start_date: Optional[str] = Query(None),
@@ -663,11 +704,15 @@ async def get_activity_heatmap(
     """
     Get 24x7 activity heatmap with REAL transaction aggregation.
     
-    ✅ ENHANCED IN v2.4:
+    ✅ ENHANCED IN v2.5:
     - Shows ALL transactions (even without USD values)
     - Tracks enrichment rate
-    - Auto-syncs if DB is empty
-    - Uses Transaction table for accurate volumes
+    - Reads hourly rollups (a few hundred rows per wallet), or the
+      transactions table when no rollups exist yet
+    - Auto-sync is scheduled in the background if no activity exists;
+      the response is empty until the sync has landed
+    
+    A transfer between two selected wallets counts once.
     
     Parameters:
         start_date: Start date (ISO format)
@@ -682,7 +727,7 @@ async def get_activity_heatmap(
     """
     try:
         logger.info("=" * 80)
-        logger.info("🔥 HEATMAP REQUEST (TRANSACTION-BASED v2.4 + AUTO-SYNC)")
+        logger.info("🔥 HEATMAP REQUEST (HOURLY ROLLUPS v2.5)")
         logger.info("=" * 80)
         
         # Parse dates
@@ -726,31 +771,28 @@ async def get_activity_heatmap(
             logger.info(f"   Sample addresses: {wallet_addresses[:3]}")
         
         # ================================================================
-        # STEP 2: CHECK IF TRANSACTIONS EXIST IN DB
+        # STEP 2: LOAD HOURLY ROLLUPS
         # ================================================================
         
-        logger.info(f"🔍 Step 2: Checking for existing transactions...")
+        logger.info(f"🔍 Step 2: Loading hourly activity rollups...")
         
-        # Quick check: Do we have ANY transactions for these wallets?
-        tx_check = db.query(Transaction).filter(
-            Transaction.timestamp >= start,
-            Transaction.timestamp <= end,
-            or_(
-                Transaction.from_address.in_(wallet_addresses),
-                Transaction.to_address.in_(wallet_addresses)
-            )
-        ).limit(1).first()
+        activity = activity_rollup.load_hour_of_week(db, wallet_addresses, start, end)
+        
+        total_volume = sum(sum(day) for day in activity["volume"])
+        total_txs = sum(sum(day) for day in activity["count"])
+        total_enriched = sum(sum(day) for day in activity["enriched"])
+        
+        logger.info(f"✅ Aggregated {activity['rows']} rows from {activity['source']}")
         
         # ================================================================
-        # ✨ AUTO-SYNC: If no transactions found, sync them!
+        # ✨ AUTO-SYNC: If no activity found, sync in the background
         # ================================================================
         
-        if not tx_check and auto_sync:
-            logger.warning("⚠️ No transactions found in DB - triggering AUTO-SYNC")
-            logger.info("🔄 Auto-syncing transactions for all wallets...")
+        if total_txs == 0:
+            auto_sync_started = False
             
-            try:
-                from app.core.otc_analysis.api.dependencies import sync_wallet_transactions_to_db
+            if auto_sync:
+                logger.warning("⚠️ No activity found - scheduling background AUTO-SYNC")
                 
                 # Sync top 10 wallets (most active)
                 top_wallets = sorted(
@@ -758,170 +800,49 @@ async def get_activity_heatmap(
                     key=lambda w: w.total_volume or 0,
                     reverse=True
                 )[:10]
-                
-                sync_stats = {
-                    "wallets_synced": 0,
-                    "transactions_saved": 0,
-                    "total_fetched": 0
-                }
-                
-                for wallet in top_wallets:
-                    try:
-                        logger.info(f"   📡 Syncing {wallet.label or wallet.address[:10]}...")
-                        
-                        stats = await sync_wallet_transactions_to_db(
-                            db=db,
-                            wallet_address=wallet.address,
-                            max_transactions=100,
-                            force_refresh=False
-                        )
-                        
-                        sync_stats["wallets_synced"] += 1
-                        sync_stats["transactions_saved"] += stats["saved_count"]
-                        sync_stats["total_fetched"] += stats["fetched_count"]
-                        
-                        # Small delay to avoid rate limits
-                        import asyncio
-                        await asyncio.sleep(0.3)
-                        
-                    except Exception as sync_error:
-                        logger.error(f"   ⚠️ Error syncing {wallet.address[:10]}: {sync_error}")
-                        continue
-                
-                logger.info(
-                    f"✅ Auto-sync complete: "
-                    f"{sync_stats['wallets_synced']} wallets, "
-                    f"{sync_stats['transactions_saved']} transactions saved"
-                )
-                
-                # Refresh DB session to see new transactions
-                db.expire_all()
-                
-            except Exception as auto_sync_error:
-                logger.error(f"❌ Auto-sync failed: {auto_sync_error}", exc_info=True)
-                logger.warning("⚠️ Continuing with empty heatmap...")
-        
-        elif not tx_check and not auto_sync:
-            logger.warning("⚠️ No transactions found - auto_sync=false, returning empty heatmap")
-            logger.info("💡 Tip: Enable auto_sync=true or run: POST /admin/sync-all-transactions")
-            return _empty_heatmap_response(start, end)
-        
-        # ================================================================
-        # STEP 3: AGGREGATE TRANSACTIONS BY DAY/HOUR
-        # ================================================================
-        
-        logger.info(f"🔍 Step 3: Aggregating transactions...")
-        
-        # ✅ KORRIGIERTE QUERY mit case()
-        results = db.query(
-            func.extract('dow', Transaction.timestamp).label('day'),
-            func.extract('hour', Transaction.timestamp).label('hour'),
-            func.count(Transaction.tx_hash).label('tx_count'),
-            func.coalesce(func.sum(Transaction.usd_value), 0).label('volume'),
-            func.sum(
-                case(
-                    (Transaction.usd_value.isnot(None), 1),
-                    else_=0
-                )
-            ).label('enriched_count')
-        ).filter(
-            Transaction.timestamp >= start,
-            Transaction.timestamp <= end,
-            or_(
-                Transaction.from_address.in_(wallet_addresses),
-                Transaction.to_address.in_(wallet_addresses)
-            )
-        ).group_by(
-            func.extract('dow', Transaction.timestamp),
-            func.extract('hour', Transaction.timestamp)
-        ).all()
-        
-        logger.info(f"✅ Query returned {len(results)} aggregated cells")
-        
-        if len(results) > 0:
-            total_volume = sum(r.volume or 0 for r in results)
-            total_txs = sum(r.tx_count or 0 for r in results)
-            total_enriched = sum(r.enriched_count or 0 for r in results)
-            enrichment_rate = (total_enriched / total_txs * 100) if total_txs > 0 else 0
-            
-            logger.info(f"💰 Total volume: ${total_volume:,.2f}")
-            logger.info(f"📊 Total transactions: {total_txs:,}")
-            logger.info(f"💵 Enriched: {total_enriched:,} ({enrichment_rate:.1f}%)")
-            
-            # Show sample results
-            logger.info(f"📋 Sample results:")
-            for r in results[:5]:
-                logger.info(
-                    f"   DOW={int(r.day)} Hour={int(r.hour)} "
-                    f"Vol=${r.volume:,.0f} TXs={r.tx_count} "
-                    f"Enriched={r.enriched_count}"
-                )
+                auto_sync_started = _schedule_auto_sync([w.address for w in top_wallets])
+            else:
+                logger.warning("⚠️ No transactions found - auto_sync=false, returning empty heatmap")
+                logger.info("💡 Tip: Enable auto_sync=true or run: POST /admin/sync-all-transactions")
             
-            # ✅ Warning wenn viele TXs nicht enriched sind
-            if enrichment_rate < 50 and total_txs > 10:
-                logger.warning(
-                    f"⚠️ Low enrichment rate ({enrichment_rate:.1f}%) - "
-                    f"{total_txs - total_enriched} transactions need USD values"
-                )
-                logger.info(f"💡 Run: POST /admin/enrich-missing-values")
-        else:
-            logger.warning("⚠️ Still no transactions after sync - returning empty heatmap")
-            return _empty_heatmap_response(start, end)
+            response = _empty_heatmap_response(start, end)
+            response["metadata"]["total_wallets"] = len(wallets)
+            response["metadata"]["auto_sync_enabled"] = auto_sync
+            response["metadata"]["auto_sync_started"] = auto_sync_started
+            return response
+        
+        enrichment_rate = (total_enriched / total_txs * 100) if total_txs > 0 else 0
+        
+        logger.info(f"💰 Total volume: ${total_volume:,.2f}")
+        logger.info(f"📊 Total transactions: {total_txs:,}")
+        logger.info(f"💵 Enriched: {total_enriched:,} ({enrichment_rate:.1f}%)")
+        
+        # ✅ Warning wenn viele TXs nicht enriched sind
+        if enrichment_rate < 50 and total_txs > 10:
+            logger.warning(
+                f"⚠️ Low enrichment rate ({enrichment_rate:.1f}%) - "
+                f"{total_txs - total_enriched} transactions need USD values"
+            )
+            logger.info(f"💡 Run: POST /admin/enrich-missing-values")
         
         # ================================================================
-        # STEP 4: BUILD 2D HEATMAP ARRAY
+        # STEP 3: BUILD 2D HEATMAP ARRAY
         # ================================================================
         
-        logger.info(f"🏗️ Step 4: Building 2D heatmap array...")
-        
-        # Create lookup: (postgres_dow, hour) -> (volume, tx_count)
-        cell_lookup = {}
-        for r in results:
-            day_idx = int(r.day)
-            hour_idx = int(r.hour)
-            volume = float(r.volume or 0)
-            tx_count = int(r.tx_count or 0)
-            enriched = int(r.enriched_count or 0)
-            
-            cell_lookup[(day_idx, hour_idx)] = {
-                'volume': volume,
-                'tx_count': tx_count,
-                'enriched_count': enriched
-            }
-        
-        logger.info(f"📋 Created lookup with {len(cell_lookup)} entries")
-        
-        # Map PostgreSQL DOW to our Monday-first index
-        dow_to_idx = {
-            1: 0,  # Mon
-            2: 1,  # Tue
-            3: 2,  # Wed
-            4: 3,  # Thu
-            5: 4,  # Fri
-            6: 5,  # Sat
-            0: 6   # Sun
-        }
+        logger.info(f"🏗️ Step 3: Building 2D heatmap array...")
         
+        # Rollups are keyed Monday-first already
         days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        heatmap_2d = []
+        heatmap_2d = activity["volume"]
         peak_data = []
         
-        for our_day_idx, day_name in enumerate(days):
-            day_row = []
-            
-            # Find PostgreSQL DOW
-            pg_dow = [k for k, v in dow_to_idx.items() if v == our_day_idx][0]
+        for day_idx, day_name in enumerate(days):
+            day_row = heatmap_2d[day_idx]
             
             for hour in range(24):
-                cell_data = cell_lookup.get((pg_dow, hour), {'volume': 0, 'tx_count': 0, 'enriched_count': 0})
-                volume = cell_data['volume']
-                
-                day_row.append(volume)
-                
-                if volume > 0 or cell_data['tx_count'] > 0:
-                    peak_data.append((our_day_idx, hour, volume, cell_data['tx_count']))
-            
-            heatmap_2d.append(day_row)
+                tx_count = activity["count"][day_idx][hour]
+                if day_row[hour] > 0 or tx_count > 0:
+                    peak_data.append((day_idx, hour, day_row[hour], tx_count))
             
             day_total = sum(day_row)
             non_zero = sum(1 for v in day_row if v > 0)
@@ -930,10 +851,10 @@ async def get_activity_heatmap(
         logger.info(f"✅ Heatmap built: 7×24")
         
         # ================================================================
-        # STEP 5: DETECT PEAK HOURS
+        # STEP 4: DETECT PEAK HOURS
         # ================================================================
         
-        logger.info(f"🔍 Step 5: Detecting peaks...")
+        logger.info(f"🔍 Step 4: Detecting peaks...")
         
         # Sort by volume (or tx_count if volume is 0)
         peak_data.sort(key=lambda x: (x[2], x[3]), reverse=True)
@@ -958,10 +879,10 @@ async def get_activity_heatmap(
             )
         
         # ================================================================
-        # STEP 6: DETECT PATTERNS
+        # STEP 5: DETECT PATTERNS
         # ================================================================
         
-        logger.info(f"🔍 Step 6: Detecting patterns...")
+        logger.info(f"🔍 Step 5: Detecting patterns...")
         
         patterns = []
         
@@ -995,7 +916,7 @@ async def get_activity_heatmap(
             logger.info(f"   {p['icon']} {p['description']}")
         
         # ================================================================
-        # STEP 7: BUILD RESPONSE
+        # STEP 6: BUILD RESPONSE
         # ================================================================
         
         response = {
@@ -1016,14 +937,15 @@ async def get_activity_heatmap(
                 "hours_per_day": 24,
                 "total_cells": 168,
                 "non_zero_cells": non_zero_cells,
-                "data_source": "transactions_table",
-                "aggregation_method": "postgres_extract",
+                "data_source": activity["source"],
+                "aggregation_method": "hourly_rollup" if activity["source"] == "wallet_hourly_activity" else "live",
+                "rollup_rows_scanned": activity["rows"],
                 "auto_sync_enabled": auto_sync
             }
         }
         
         logger.info("=" * 80)
-        logger.info("✅ HEATMAP READY (TRANSACTION-BASED + AUTO-SYNC)")
+        logger.info("✅ HEATMAP READY (HOURLY ROLLUPS)")
         logger.info(f"   Total volume: ${total_volume:,.2f}")
         logger.info(f"   Total TXs: {total_txs:,}")
         logger.info(f"   Enriched: {total_enriched:,} ({enrichment_rate:.1f}%)")
@@ -151,6 +151,11 @@ async def moralis_webhook(
         logger.info(f"   Internal: {len(internal_txs)}")
         logger.info(f"   Logs: {len(logs)}")
         
+        # Hand transfers to the live feed (priced + broadcast asynchronously)
+        from app.core.otc_analysis.api.websocket import get_live_feed
+        live_feed = get_live_feed()
+        queued = live_feed.ingest_webhook(data) if live_feed else 0
+
         # Process all transfers
         discovered_addresses = set()
         
@@ -166,29 +171,11 @@ async def moralis_webhook(
         
         logger.info(f"Webhook processed: {len(discovered_addresses)} addresses discovered")
 
-        # Broadcast to WebSocket clients
-        if discovered_addresses or confirmed_txs:
-            from app.core.otc_analysis.api.websocket import broadcast_to_all
-            for tx in confirmed_txs:
-                value_wei = int(tx.get('value', 0))
-                value_eth = value_wei / 1e18
-                value_usd = value_eth * 3000
-                if value_usd >= 100_000:
-                    await broadcast_to_all("new_large_transfer", {
-                        "type": "new_large_transfer",
-                        "tx_hash": tx.get('hash', ''),
-                        "from_address": tx.get('fromAddress', ''),
-                        "to_address": tx.get('toAddress', ''),
-                        "value_eth": round(value_eth, 4),
-                        "usd_value": round(value_usd, 2),
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "moralis_webhook",
-                    })
-
         return {
             "success": True,
             "message": "Webhook processed",
             "discovered_addresses": len(discovered_addresses),
+            "queued_live_events": queued,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -455,6 +442,21 @@ async def get_stream_status():
             "note": "Check MORALIS_API_KEY and network connectivity"
         }
 
+@router.get("/live")
+async def get_live_feed_stats():
+    """
+    Get live feed pipeline stats (queue depth, dedup, drops, polling).
+    
+    GET /api/otc/streams/live
+    """
+    from app.core.otc_analysis.api.websocket import get_live_feed
+    
+    live_feed = get_live_feed()
+    if live_feed is None:
+        return {"success": False, "message": "Live feed not running"}
+    
+    return {"success": True, "stats": live_feed.get_stats()}
+
 @router.post("/test")
 async def test_webhook_delivery():
     """
@@ -3,6 +3,7 @@ from typing import List, Dict, Set
 import asyncio
 import json
 import logging
+import os
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -10,6 +11,9 @@ logger = logging.getLogger(__name__)
 # Socket.IO server reference (injected from main.py)
 _sio_instance = None
 
+# Live transfer pipeline (created by live_otc_monitor)
+_live_feed = None
+
 
 def set_socketio(sio):
     """Inject the Socket.IO server so we can broadcast to both WS and SIO clients."""
@@ -200,77 +204,39 @@ async def broadcast_otc_event(event_data: Dict):
     await broadcast_to_all(event_type, event_data)
 
 
+def get_live_feed():
+    """Running LiveTransferFeed (None until live_otc_monitor has started)."""
+    return _live_feed
+
+
 async def live_otc_monitor(shutdown_event: asyncio.Event):
     """
-    Background task that polls known OTC desk addresses for recent large
-    transfers via Moralis and broadcasts matches to WebSocket clients.
+    Background task that runs the live OTC feed.
+
+    Moralis Streams webhooks (POST /streams/webhook) are pushed into the
+    feed's queue; known desk addresses are polled only while no webhooks
+    arrive, with bounded concurrency. Set OTC_LIVE_REPLAY_FILE to replay
+    recorded webhook payloads at startup.
 
     Runs continuously until shutdown_event is set.
     """
-    logger.info("Starting live OTC monitor...")
-
-    backoff = 30  # seconds between polls
-
-    while not shutdown_event.is_set():
-        try:
-            from app.core.otc_analysis.blockchain.moralis import MoralisAPI
-            from app.core.otc_analysis.data_sources.otc_desks import OTCDeskRegistry
-
-            moralis = MoralisAPI()
-            registry = OTCDeskRegistry()
-
-            desk_addresses = registry.get_all_otc_addresses()
-            if not desk_addresses:
-                logger.warning("No OTC desk addresses found, retrying in 60s")
-                await asyncio.sleep(60)
-                continue
+    global _live_feed
 
-            for address in desk_addresses:
-                if shutdown_event.is_set():
-                    break
+    logger.info("Starting live OTC monitor...")
 
-                try:
-                    result = moralis.get_wallet_history(address=address, limit=10)
-                    transactions = result.get('result', []) if result else []
-
-                    for tx in transactions:
-                        value_str = tx.get('value', '0')
-                        try:
-                            value_wei = int(value_str)
-                        except (ValueError, TypeError):
-                            value_wei = 0
-
-                        value_eth = value_wei / 1e18
-                        value_usd = value_eth * 3000  # rough estimate
-
-                        if value_usd >= 100_000:
-                            await broadcast_to_all("new_large_transfer", {
-                                "type": "new_large_transfer",
-                                "tx_hash": tx.get('hash', ''),
-                                "from_address": tx.get('from_address', ''),
-                                "to_address": tx.get('to_address', ''),
-                                "value_eth": round(value_eth, 4),
-                                "usd_value": round(value_usd, 2),
-                                "from_entity": tx.get('from_address_entity', ''),
-                                "to_entity": tx.get('to_address_entity', ''),
-                                "timestamp": tx.get('block_timestamp', datetime.utcnow().isoformat()),
-                            })
+    from app.core.otc_analysis.api.dependencies import price_oracle, otc_registry
+    from app.core.otc_analysis.blockchain.live_feed import LiveTransferFeed
 
-                except Exception as e:
-                    logger.error(f"Error polling address {address[:10]}...: {e}")
+    _live_feed = LiveTransferFeed(
+        price_oracle=price_oracle,
+        registry=otc_registry,
+        broadcast=broadcast_to_all,
+        moralis=otc_registry.moralis
+    )
 
-            # Reset backoff on success
-            backoff = 30
-
-        except Exception as e:
-            logger.error(f"Live OTC monitor error: {e}", exc_info=True)
-            backoff = min(backoff * 2, 300)  # exponential backoff, max 5 min
-
-        # Wait for next poll or shutdown
-        try:
-            await asyncio.wait_for(shutdown_event.wait(), timeout=backoff)
-            break  # shutdown_event was set
-        except asyncio.TimeoutError:
-            pass  # timeout expired, poll again
+    try:
+        await _live_feed.run(shutdown_event, replay_path=os.getenv('OTC_LIVE_REPLAY_FILE'))
+    except Exception as e:
+        logger.error(f"Live OTC monitor error: {e}", exc_info=True)
 
     logger.info("Live OTC monitor stopped.")
@@ -1,18 +1,35 @@
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from otc_analysis.blockchain.node_provider import NodeProvider
-from otc_analysis.models.transaction import Transaction
+from app.core.otc_analysis.blockchain.node_provider import NodeProvider
+from app.core.otc_analysis.blockchain.contract_cache import ContractCodeCache
+
 
 class BlockScanner:
     """
     Continuous block scanner for indexing blockchain transactions.
     Part of background workers - scans new blocks and extracts transactions.
+    
+    Range scans fetch blocks as batched JSON-RPC requests in a bounded
+    concurrency window, resolve contract checks through a shared
+    address cache and hand each window to a sink (e.g. bulk ingestion)
+    instead of collecting everything in memory.
     """
     
-    def __init__(self, node_provider: NodeProvider, chain_id: int = 1):
+    def __init__(
+        self,
+        node_provider: NodeProvider,
+        chain_id: int = 1,
+        contract_cache: Optional[ContractCodeCache] = None,
+        checkpoint_path: Optional[str] = None
+    ):
         self.node_provider = node_provider
         self.chain_id = chain_id
+        self.contract_cache = contract_cache or ContractCodeCache()
+        self.checkpoint_path = checkpoint_path
         self.is_running = False
         self.current_block = None
         self.scan_delay = 12  # Seconds between scans (Ethereum block time ~12s)
@@ -28,52 +45,207 @@ class BlockScanner:
         self.current_block = latest
         print(f"Scanner initialized at latest block {latest}")
     
+    def _read_checkpoint(self) -> Optional[Dict]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        
+        try:
+            with open(self.checkpoint_path) as f:
+                data = json.load(f)
+            if data.get('chain_id') != self.chain_id:
+                return None
+            return data
+        except Exception as e:
+            print(f"⚠ Could not read checkpoint {self.checkpoint_path}: {e}")
+            return None
+    
+    def load_checkpoint(self) -> Optional[int]:
+        """Last processed block from the checkpoint file (if any)."""
+        data = self._read_checkpoint()
+        if data is None:
+            return None
+        try:
+            return int(data['block'])
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠ Invalid checkpoint {self.checkpoint_path}: {e}")
+            return None
+    
+    def load_failed_blocks(self) -> List[int]:
+        """Blocks at or before the checkpoint that still have to be retried."""
+        data = self._read_checkpoint()
+        return [int(n) for n in (data or {}).get('failed_blocks', [])]
+    
+    def save_checkpoint(self, block_number: int, failed_blocks: Optional[Iterable[int]] = None):
+        """
+        Persist the last processed block (atomic replace).
+        
+        Blocks that failed on the way are stored alongside and retried on
+        the next resumed scan, so advancing past them does not lose them.
+        """
+        if not self.checkpoint_path:
+            return
+        
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'chain_id': self.chain_id,
+                'block': block_number,
+                'failed_blocks': sorted(set(failed_blocks or [])),
+                'updated_at': datetime.now().isoformat()
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
     def scan_range(
         self,
         from_block: int,
         to_block: int,
-        callback: Optional[Callable] = None
-    ) -> List[Dict]:
+        callback: Optional[Callable] = None,
+        sink: Optional[Callable[[List[Dict]], None]] = None,
+        batch_size: int = 25,
+        max_concurrency: int = 4,
+        resume: bool = True
+    ) -> Dict:
         """
         Scan a specific range of blocks.
         
+        Blocks are processed in windows of batch_size * max_concurrency.
+        Each window is fetched as max_concurrency parallel batch requests,
+        its contract checks are resolved in one cached lookup, and its
+        transactions are passed to `sink` in block order. The checkpoint
+        advances after every window and carries the blocks that failed;
+        a resumed scan retries those first.
+        
         Args:
             from_block: Start block
             to_block: End block
             callback: Optional function to call for each transaction
+            sink: Optional function receiving each window's transactions
+            batch_size: Blocks per JSON-RPC batch request
+            max_concurrency: Batch requests in flight at once
+            resume: Skip blocks up to the stored checkpoint if it lies at or
+                after from_block (the range is done once it reaches to_block)
         
         Returns:
-            List of transactions
+            Scan stats (blocks, transactions, failed blocks, blocks/s)
         """
-        all_transactions = []
+        start = from_block
+        # Failed blocks outside this range stay in the checkpoint untouched
+        outstanding: List[int] = []
+        retry: List[int] = []
+        if resume:
+            checkpoint = self.load_checkpoint()
+            # Everything up to the checkpoint is done (checkpoint >= to_block: only retries left)
+            if checkpoint is not None and from_block <= checkpoint:
+                start = checkpoint + 1
+                print(f"↻ Resuming from checkpoint {checkpoint}")
+            for block_num in self.load_failed_blocks():
+                if from_block <= block_num < start and block_num <= to_block:
+                    retry.append(block_num)
+                else:
+                    outstanding.append(block_num)
         
-        print(f"Scanning blocks {from_block} to {to_block}...")
+        stats = {
+            'from_block': start,
+            'to_block': to_block,
+            'blocks_scanned': 0,
+            'transactions': 0,
+            'failed_blocks': [],
+            'retried_blocks': len(retry),
+            'contract_lookups': 0,
+            'duration_seconds': 0.0,
+            'blocks_per_second': 0.0
+        }
         
-        for block_num in range(from_block, to_block + 1):
-            try:
-                block_data = self.node_provider.get_block(block_num)
-                
-                if not block_data:
-                    print(f"⚠ Failed to fetch block {block_num}, skipping...")
-                    continue
-                
-                transactions = self._extract_block_transactions(block_data)
+        print(f"Scanning blocks {start} to {to_block}...")
+        
+        batch_size = max(1, batch_size)
+        max_concurrency = max(1, max_concurrency)
+        window = batch_size * max_concurrency
+        lookups_before = self.contract_cache.stats['rpc_lookups']
+        started = time.perf_counter()
+        
+        windows = [retry[i:i + window] for i in range(0, len(retry), window)]
+        windows += [
+            list(range(window_start, min(window_start + window - 1, to_block) + 1))
+            for window_start in range(start, to_block + 1, window)
+        ]
+        last_block = start - 1
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for numbers in windows:
+                window_transactions, failed = self._process_window(
+                    executor, numbers, batch_size, callback
+                )
                 
-                # Process each transaction
-                for tx in transactions:
-                    if callback:
-                        callback(tx)
-                    all_transactions.append(tx)
+                if sink and window_transactions:
+                    sink(window_transactions)
                 
-                if block_num % 100 == 0:
-                    print(f"Processed block {block_num}, found {len(transactions)} transactions")
+                stats['blocks_scanned'] += len(numbers)
+                stats['transactions'] += len(window_transactions)
+                stats['failed_blocks'].extend(failed)
+                outstanding.extend(failed)
+                last_block = max(last_block, numbers[-1])
+                self.save_checkpoint(last_block, outstanding)
                 
+                elapsed = time.perf_counter() - started
+                print(
+                    f"Processed blocks {numbers[0]}-{numbers[-1]}: "
+                    f"{len(window_transactions)} transactions "
+                    f"({stats['blocks_scanned'] / elapsed if elapsed > 0 else 0:.1f} blocks/s)"
+                )
+        
+        duration = time.perf_counter() - started
+        stats['contract_lookups'] = self.contract_cache.stats['rpc_lookups'] - lookups_before
+        stats['duration_seconds'] = duration
+        stats['blocks_per_second'] = stats['blocks_scanned'] / duration if duration > 0 else 0.0
+        
+        print(
+            f"✓ Scan complete. Total transactions: {stats['transactions']} "
+            f"({stats['blocks_per_second']:.1f} blocks/s, {len(stats['failed_blocks'])} failed blocks)"
+        )
+        return stats
+    
+    def _process_window(
+        self,
+        executor: ThreadPoolExecutor,
+        numbers: List[int],
+        batch_size: int,
+        callback: Optional[Callable]
+    ) -> Tuple[List[Dict], List[int]]:
+        """Fetch and extract one window of blocks. Returns (transactions, failed block numbers)."""
+        chunks = [numbers[i:i + batch_size] for i in range(0, len(numbers), batch_size)]
+        failed: List[int] = []
+        
+        blocks: Dict[int, Optional[Dict]] = {}
+        for fetched in executor.map(self.node_provider.get_blocks, chunks):
+            blocks.update(fetched)
+        
+        # Batch misses get one retry through the single-block path
+        for block_num in numbers:
+            if not blocks.get(block_num):
+                blocks[block_num] = self.node_provider.get_block(block_num)
+                if not blocks[block_num]:
+                    print(f"⚠ Failed to fetch block {block_num}, will retry on resume")
+                    failed.append(block_num)
+        
+        fetched_numbers = [n for n in numbers if blocks.get(n)]
+        contract_flags = self._resolve_contracts(blocks[n] for n in fetched_numbers)
+        
+        window_transactions = []
+        for block_num in fetched_numbers:
+            try:
+                transactions = self._extract_block_transactions(blocks[block_num], contract_flags)
             except Exception as e:
                 print(f"Error scanning block {block_num}: {e}")
+                failed.append(block_num)
                 continue
+            
+            if callback:
+                for tx in transactions:
+                    callback(tx)
+            window_transactions.extend(transactions)
         
-        print(f"✓ Scan complete. Total transactions: {len(all_transactions)}")
-        return all_transactions
+        return window_transactions, failed
     
     def scan_continuous(
         self,
@@ -138,12 +310,34 @@ class BlockScanner:
         self.is_running = False
         print(f"Scanner stopped at block {self.current_block}")
     
-    def _extract_block_transactions(self, block_data: Dict) -> List[Dict]:
+    def _resolve_contracts(self, blocks: Iterable[Dict]) -> Dict[str, bool]:
+        """Resolve is_contract for all value-transfer recipients at once."""
+        recipients = {
+            tx['to']
+            for block_data in blocks
+            for tx in block_data.get('transactions', [])
+            if tx.get('value', 0) != 0 and tx.get('to')
+        }
+        return self.contract_cache.resolve(recipients, self.node_provider)
+    
+    def _extract_block_transactions(
+        self,
+        block_data: Dict,
+        contract_flags: Optional[Dict[str, bool]] = None
+    ) -> List[Dict]:
         """
         Extract and format transactions from block data.
         
+        Args:
+            block_data: Block with full transactions
+            contract_flags: Pre-resolved lowercase address -> is_contract;
+                resolved through the contract cache if omitted
+        
         Returns list of transaction dicts ready for further processing.
         """
+        if contract_flags is None:
+            contract_flags = self._resolve_contracts([block_data])
+        
         transactions = []
         block_timestamp = datetime.fromtimestamp(block_data['timestamp'])
         
@@ -167,7 +361,7 @@ class BlockScanner:
             }
             
             # Determine if contract interaction
-            if tx['to'] and self.node_provider.is_contract(tx['to']):
+            if tx['to'] and contract_flags.get(tx['to'].lower(), False):
                 tx_formatted['is_contract_interaction'] = True
                 # Extract method ID (first 4 bytes of input data)
                 if tx_formatted['input_data'] and len(tx_formatted['input_data']) >= 10:
@@ -188,3 +382,24 @@ class BlockScanner:
         latest = self.node_provider.get_latest_block_number()
         current = self.current_block if self.current_block else latest
         return latest - current
+
+
+def bulk_ingest_sink(session_factory, chain: str = 'ethereum', chain_id: int = 1) -> Callable[[List[Dict]], None]:
+    """
+    Sink for `BlockScanner.scan_range` that writes each window through
+    the bulk upsert path (one session per window). Used by
+    `workers.block_indexer`.
+    """
+    from app.core.otc_analysis.blockchain.transaction_ingestor import (
+        normalize_transactions,
+        bulk_upsert_transactions
+    )
+    
+    def _sink(transactions: List[Dict]):
+        db = session_factory()
+        try:
+            bulk_upsert_transactions(db, normalize_transactions(transactions, chain, chain_id))
+        finally:
+            db.close()
+    
+    return _sink
@@ -0,0 +1,113 @@
+"""
+Contract Code Cache
+===================
+
+address → is_contract, damit der Block-Scanner nicht für jeden Transfer
+ein eigenes `eth_getCode` absetzt.
+
+✅ FEATURES:
+- In-Memory LRU (OrderedDict) vor Redis (CacheManager, optional)
+- Fehlende Adressen werden gesammelt per Batch-RPC aufgelöst
+- Contracts lange gecached, EOAs kürzer (können später Code bekommen)
+- Fehlgeschlagene Lookups werden nicht gecached
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ContractCodeCache:
+    """Two-level cache for address → is_contract lookups."""
+
+    PREFIX = 'is_contract'
+    CONTRACT_TTL = 30 * 86400   # Deployed code practically never changes
+    EOA_TTL = 86400             # EOAs may still receive code (CREATE2 / delegation)
+
+    def __init__(self, cache_manager=None, max_size: int = 100_000):
+        self.cache = cache_manager
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'memory_hits': 0,
+            'redis_hits': 0,
+            'rpc_lookups': 0,
+            'rpc_failures': 0
+        }
+
+    def _remember(self, address: str, is_contract: bool):
+        with self._lock:
+            self._entries[address] = is_contract
+            self._entries.move_to_end(address)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, address: str) -> Optional[bool]:
+        """Cached value or None if unknown."""
+        key = address.lower()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._entries[key]
+
+        if self.cache is not None:
+            cached = self.cache.get(key, prefix=self.PREFIX)
+            if cached is not None:
+                self.stats['redis_hits'] += 1
+                self._remember(key, bool(cached))
+                return bool(cached)
+
+        return None
+
+    def put(self, address: str, is_contract: bool):
+        key = address.lower()
+        self._remember(key, is_contract)
+
+        if self.cache is not None:
+            ttl = self.CONTRACT_TTL if is_contract else self.EOA_TTL
+            self.cache.set(key, is_contract, ttl=ttl, prefix=self.PREFIX)
+
+    def resolve(self, addresses: Iterable[str], node_provider) -> Dict[str, bool]:
+        """
+        Resolve is_contract for many addresses.
+
+        Cache misses are fetched with one batched `eth_getCode` request.
+        Addresses whose lookup failed are reported as non-contracts but
+        not cached, so the next scan retries them.
+        """
+        result: Dict[str, bool] = {}
+        missing = []
+
+        for address in {a.lower() for a in addresses if a}:
+            cached = self.get(address)
+            if cached is None:
+                missing.append(address)
+            else:
+                result[address] = cached
+
+        if missing:
+            self.stats['rpc_lookups'] += len(missing)
+            codes = node_provider.get_codes(missing)
+
+            for address in missing:
+                code = codes.get(address)
+                if code is None:
+                    self.stats['rpc_failures'] += 1
+                    result[address] = False
+                    continue
+
+                is_contract = code not in ('0x', '0x0', '')
+                self.put(address, is_contract)
+                result[address] = is_contract
+
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
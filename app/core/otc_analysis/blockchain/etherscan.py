@@ -8,6 +8,7 @@ Interface to Etherscan API V2 with live ETH price support.
 """
 
 import requests
+import threading
 import time
 from typing import List, Dict, Optional
 import os
@@ -31,6 +32,7 @@ class EtherscanAPI:
         self.base_url = self._get_base_url()
         self.rate_limit_delay = 0.2  # 5 requests per second max
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
         self.session = requests.Session()  # ✅ Add session for reuse
     
     def _get_api_key(self) -> str:
@@ -61,14 +63,15 @@ class EtherscanAPI:
         return urls.get(self.chain_id, urls[1])
     
     def _rate_limit(self):
-        """Enforce rate limiting."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        
-        self.last_request_time = time.time()
+        """Enforce rate limiting (thread-safe, shared by concurrent syncs)."""
+        with self._rate_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request_time
+            
+            if time_since_last < self.rate_limit_delay:
+                time.sleep(self.rate_limit_delay - time_since_last)
+            
+            self.last_request_time = time.time()
     
     def _make_request(self, params: Dict) -> Optional[Dict]:
         """Make API request with rate limiting."""
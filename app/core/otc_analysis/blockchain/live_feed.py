@@ -0,0 +1,428 @@
+"""
+Live Transfer Feed
+==================
+
+Event-getriebene Pipeline für den Live-OTC-Stream:
+
+    Moralis Streams Webhook / Replay-Datei / Polling-Fallback
+        → Dedup (tx_hash) → asyncio.Queue (bounded)
+        → Desk-Matching + Live-Preis (gecached)
+        → Broadcast nach Event-Typ
+
+✅ FEATURES:
+- Desk-Adressen als In-Memory-Set (periodisch aus der Registry aufgefrischt)
+- ETH-/Token-Preise mit TTL-Cache statt `* 3000`
+- Backpressure: volle Queue verwirft die ältesten Events (gezählt)
+- Polling nur wenn keine Webhooks ankommen, mit begrenzter Parallelität
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+NATIVE_TOKEN = 'ETH'
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+Broadcaster = Callable[[str, Dict], Awaitable[None]]
+
+
+class LiveTransferFeed:
+    """
+    Async live pipeline from transfer events to WebSocket subscribers.
+
+    Producers (`ingest_webhook`, `replay_file`, the polling fallback) only
+    parse, dedup and enqueue. A single consumer prices, classifies and
+    broadcasts, so slow clients never block webhook responses.
+    """
+
+    def __init__(
+        self,
+        price_oracle,
+        registry,
+        broadcast: Broadcaster,
+        moralis=None,
+        min_usd: float = 100_000,
+        min_desk_usd: float = 10_000,
+        queue_size: int = 1000,
+        dedup_size: int = 10_000,
+        price_ttl: int = 60,
+        price_miss_ttl: int = 300,
+        desk_refresh_seconds: int = 300,
+        poll_interval: int = 30,
+        stream_idle_seconds: int = 120,
+        poll_concurrency: int = 4
+    ):
+        self.price_oracle = price_oracle
+        self.registry = registry
+        self.broadcast = broadcast
+        self.moralis = moralis
+
+        self.min_usd = min_usd
+        self.min_desk_usd = min_desk_usd
+        self.price_ttl = price_ttl
+        self.price_miss_ttl = price_miss_ttl
+        self.desk_refresh_seconds = desk_refresh_seconds
+        self.poll_interval = poll_interval
+        self.stream_idle_seconds = stream_idle_seconds
+        self.poll_concurrency = max(1, poll_concurrency)
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dedup_size = dedup_size
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+        self.desk_addresses: Set[str] = set()
+        self._desks_loaded_at = 0.0
+        self._prices: Dict[str, tuple] = {}  # token_key -> (price, fetched_at)
+        self._price_misses: Dict[str, float] = {}  # token_key -> retry_after (no price / oracle error)
+
+        self.last_webhook_at: Optional[float] = None
+
+        self.stats = {
+            'received': 0,
+            'duplicates': 0,
+            'dropped': 0,
+            'broadcast': 0,
+            'ignored': 0,
+            'unpriced': 0,
+            'price_misses_cached': 0,
+            'webhooks': 0,
+            'polls': 0,
+            'poll_errors': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def submit(self, transfer: Dict[str, Any]) -> bool:
+        """
+        Enqueue one normalized transfer.
+
+        Returns False for duplicates. When the queue is full the oldest
+        pending transfer is dropped to make room.
+        """
+        key = transfer.get('dedup_key') or transfer.get('tx_hash')
+        if not key:
+            return False
+
+        self.stats['received'] += 1
+
+        if key in self._seen:
+            self.stats['duplicates'] += 1
+            return False
+
+        self._seen[key] = None
+        while len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.stats['dropped'] += 1
+            except asyncio.QueueEmpty:
+                pass
+
+        self.queue.put_nowait(transfer)
+        return True
+
+    def ingest_webhook(self, payload: Dict[str, Any], source: str = 'moralis_webhook') -> int:
+        """
+        Parse a Moralis Streams payload (native txs + erc20Transfers).
+
+        Returns:
+            Number of transfers enqueued
+        """
+        if source == 'moralis_webhook':
+            self.last_webhook_at = time.monotonic()
+            self.stats['webhooks'] += 1
+
+        block_ts = (payload.get('block') or {}).get('timestamp')
+        timestamp = (
+            datetime.utcfromtimestamp(int(block_ts)).isoformat()
+            if block_ts else datetime.utcnow().isoformat()
+        )
+
+        enqueued = 0
+
+        for tx in payload.get('txs', []) or []:
+            try:
+                value_raw = int(tx.get('value') or 0)
+            except (ValueError, TypeError):
+                continue
+            if value_raw <= 0:
+                continue
+
+            enqueued += self.submit({
+                'tx_hash': tx.get('hash', ''),
+                'from_address': (tx.get('fromAddress') or '').lower(),
+                'to_address': (tx.get('toAddress') or '').lower(),
+                'token': NATIVE_TOKEN,
+                'token_symbol': NATIVE_TOKEN,
+                'amount': value_raw / 1e18,
+                'timestamp': timestamp,
+                'source': source,
+            })
+
+        for transfer in payload.get('erc20Transfers', []) or []:
+            try:
+                amount = float(transfer.get('valueWithDecimals') or 0)
+            except (ValueError, TypeError):
+                continue
+            if amount <= 0:
+                continue
+
+            tx_hash = transfer.get('transactionHash', '')
+            enqueued += self.submit({
+                'tx_hash': tx_hash,
+                'dedup_key': f"{tx_hash}:{transfer.get('logIndex', '')}",
+                'from_address': (transfer.get('from') or '').lower(),
+                'to_address': (transfer.get('to') or '').lower(),
+                'token': (transfer.get('contract') or '').lower(),
+                'token_symbol': transfer.get('tokenSymbol'),
+                'amount': amount,
+                'timestamp': timestamp,
+                'source': source,
+            })
+
+        return enqueued
+
+    async def replay_file(self, path: str) -> int:
+        """
+        Feed recorded webhook payloads (JSON list or JSON lines) through
+        the pipeline - for local development without a public webhook.
+        """
+        def _load() -> List[Dict]:
+            with open(path) as f:
+                content = f.read().strip()
+            if content.startswith('['):
+                return json.loads(content)
+            return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+        payloads = await asyncio.to_thread(_load)
+        enqueued = 0
+        for payload in payloads:
+            enqueued += self.ingest_webhook(payload, source='replay')
+            await asyncio.sleep(0)
+
+        logger.info(f"📼 Replayed {len(payloads)} payloads from {path}: {enqueued} transfers")
+        return enqueued
+
+    # ------------------------------------------------------------------
+    # Desk set & prices
+    # ------------------------------------------------------------------
+
+    async def refresh_desks(self, force: bool = False) -> Set[str]:
+        """Reload desk addresses from the registry if stale."""
+        if not force and time.monotonic() - self._desks_loaded_at < self.desk_refresh_seconds:
+            return self.desk_addresses
+
+        try:
+            addresses = await asyncio.to_thread(self.registry.get_all_otc_addresses)
+            self.desk_addresses = {a.lower() for a in addresses or [] if a}
+            self._desks_loaded_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"❌ Desk refresh failed: {e}")
+
+        return self.desk_addresses
+
+    async def get_price(self, token: str) -> Optional[float]:
+        """
+        Live USD price, cached for price_ttl seconds.
+
+        Tokens without a price (unknown / spam) and oracle failures are
+        remembered for price_miss_ttl seconds, so they don't cost a
+        blocking oracle call on every transfer.
+        """
+        cached = self._prices.get(token)
+        now = time.monotonic()
+        if cached and now - cached[1] < self.price_ttl:
+            return cached[0]
+
+        retry_after = self._price_misses.get(token)
+        if retry_after is not None:
+            if now < retry_after:
+                self.stats['price_misses_cached'] += 1
+                return cached[0] if cached else None
+            del self._price_misses[token]
+
+        try:
+            if token == NATIVE_TOKEN:
+                price = await asyncio.to_thread(self.price_oracle.get_eth_price_live)
+            else:
+                price = await asyncio.to_thread(self.price_oracle.get_current_price, token)
+        except Exception as e:
+            logger.warning(f"⚠️ Live price for {token[:10]} failed: {e}")
+            price = None
+
+        if price:
+            self._prices[token] = (price, time.monotonic())
+            return price
+
+        self._remember_price_miss(token)
+
+        # Keep serving a stale price rather than none
+        return cached[0] if cached else None
+
+    def _remember_price_miss(self, token: str):
+        now = time.monotonic()
+        if len(self._price_misses) >= self.dedup_size:
+            self._price_misses = {
+                key: retry_after for key, retry_after in self._price_misses.items()
+                if retry_after > now
+            }
+        self._price_misses[token] = now + self.price_miss_ttl
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+
+    async def _process(self, transfer: Dict[str, Any]):
+        price = await self.get_price(transfer['token'])
+        if not price:
+            self.stats['unpriced'] += 1
+            return
+
+        usd_value = transfer['amount'] * price
+
+        from_desk = transfer['from_address'] in self.desk_addresses
+        to_desk = transfer['to_address'] in self.desk_addresses
+
+        if usd_value >= self.min_usd:
+            event_type = 'new_large_transfer'
+        elif (from_desk or to_desk) and usd_value >= self.min_desk_usd:
+            event_type = 'desk_interaction'
+        else:
+            self.stats['ignored'] += 1
+            return
+
+        event = {
+            'type': event_type,
+            'tx_hash': transfer['tx_hash'],
+            'from_address': transfer['from_address'],
+            'to_address': transfer['to_address'],
+            'token': transfer['token'],
+            'token_symbol': transfer.get('token_symbol'),
+            'amount': round(transfer['amount'], 6),
+            'usd_value': round(usd_value, 2),
+            'price_usd': price,
+            'is_desk_interaction': from_desk or to_desk,
+            'from_entity': transfer.get('from_entity', ''),
+            'to_entity': transfer.get('to_entity', ''),
+            'timestamp': transfer['timestamp'],
+            'source': transfer['source'],
+        }
+        if transfer['token'] == NATIVE_TOKEN:
+            event['value_eth'] = event['amount']
+
+        await self.broadcast(event_type, event)
+        self.stats['broadcast'] += 1
+
+    async def _consume(self, shutdown_event: asyncio.Event):
+        while not shutdown_event.is_set():
+            try:
+                transfer = await asyncio.wait_for(self.queue.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+
+            try:
+                await self.refresh_desks()
+                await self._process(transfer)
+            except Exception as e:
+                logger.error(f"❌ Live feed event failed ({transfer.get('tx_hash', '')[:16]}): {e}")
+            finally:
+                self.queue.task_done()
+
+    # ------------------------------------------------------------------
+    # Polling fallback
+    # ------------------------------------------------------------------
+
+    def _streams_active(self) -> bool:
+        return (
+            self.last_webhook_at is not None
+            and time.monotonic() - self.last_webhook_at < self.stream_idle_seconds
+        )
+
+    async def _poll_address(self, address: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                result = await asyncio.to_thread(
+                    self.moralis.get_wallet_history, address=address, limit=10
+                )
+            except Exception as e:
+                self.stats['poll_errors'] += 1
+                logger.error(f"Error polling address {address[:10]}...: {e}")
+                return
+
+        for tx in (result or {}).get('result', []) or []:
+            try:
+                value_raw = int(tx.get('value') or 0)
+            except (ValueError, TypeError):
+                continue
+            if value_raw <= 0:
+                continue
+
+            self.submit({
+                'tx_hash': tx.get('hash', ''),
+                'from_address': (tx.get('from_address') or '').lower(),
+                'to_address': (tx.get('to_address') or '').lower(),
+                'token': NATIVE_TOKEN,
+                'token_symbol': NATIVE_TOKEN,
+                'amount': value_raw / 1e18,
+                'from_entity': tx.get('from_address_entity', ''),
+                'to_entity': tx.get('to_address_entity', ''),
+                'timestamp': tx.get('block_timestamp', datetime.utcnow().isoformat()),
+                'source': 'poll',
+            })
+
+    async def _poll_fallback(self, shutdown_event: asyncio.Event):
+        backoff = self.poll_interval
+
+        while not shutdown_event.is_set():
+            if self.moralis is not None and not self._streams_active():
+                try:
+                    desks = await self.refresh_desks()
+                    semaphore = asyncio.Semaphore(self.poll_concurrency)
+                    await asyncio.gather(*(
+                        self._poll_address(address, semaphore) for address in desks
+                    ))
+                    self.stats['polls'] += 1
+                    backoff = self.poll_interval
+                except Exception as e:
+                    logger.error(f"Live feed polling error: {e}", exc_info=True)
+                    backoff = min(backoff * 2, 300)  # exponential backoff, max 5 min
+
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, shutdown_event: asyncio.Event, replay_path: Optional[str] = None):
+        """Run consumer and polling fallback until shutdown_event is set."""
+        await self.refresh_desks(force=True)
+        logger.info(f"📡 Live feed started ({len(self.desk_addresses)} desk addresses)")
+
+        if replay_path:
+            await self.replay_file(replay_path)
+
+        await asyncio.gather(
+            self._consume(shutdown_event),
+            self._poll_fallback(shutdown_event)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'desk_addresses': len(self.desk_addresses),
+            'streams_active': self._streams_active(),
+            'cached_prices': len(self._prices),
+            'cached_price_misses': len(self._price_misses),
+        }
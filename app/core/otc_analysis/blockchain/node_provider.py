@@ -1,6 +1,8 @@
 from web3 import Web3
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterable, Tuple, Any
 import os
+import threading
+import requests
 from enum import Enum
 
 class ChainID(Enum):
@@ -22,6 +24,10 @@ class NodeProvider:
         self.providers = self._initialize_providers()
         self.active_provider_index = 0
         self.web3 = None
+        self.max_batch_size = 100  # Most public endpoints cap batches around 100-1000
+        self._rpc_session = requests.Session()
+        self._rpc_id = 0
+        self._rpc_lock = threading.Lock()
         self._connect()
     
     def _initialize_providers(self) -> List[str]:
@@ -88,6 +94,109 @@ class NodeProvider:
             print(f"Error fetching block {block_number}: {e}")
             return None
     
+    def rpc_batch(self, calls: List[Tuple[str, list]], timeout: int = 30) -> List[Any]:
+        """
+        Send JSON-RPC calls as batch requests (max_batch_size calls each).
+        
+        Args:
+            calls: List of (method, params)
+        
+        Returns:
+            Results in call order (None for calls that errored)
+        """
+        results = []
+        for start in range(0, len(calls), self.max_batch_size):
+            results.extend(self._post_batch(calls[start:start + self.max_batch_size], timeout))
+        return results
+    
+    def _post_batch(self, calls: List[Tuple[str, list]], timeout: int) -> List[Any]:
+        """Send one JSON-RPC batch request."""
+        if not calls:
+            return []
+        
+        with self._rpc_lock:
+            first_id = self._rpc_id
+            self._rpc_id += len(calls)
+        
+        payload = [
+            {"jsonrpc": "2.0", "id": first_id + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        
+        try:
+            response = self._rpc_session.post(
+                self.providers[self.active_provider_index],
+                json=payload,
+                timeout=timeout
+            )
+            response.raise_for_status()
+            replies = response.json()
+        except Exception as e:
+            print(f"Batch RPC error ({len(calls)} calls): {e}")
+            return [None] * len(calls)
+        
+        # A provider that rejects batching answers with a single error object
+        if not isinstance(replies, list):
+            print(f"Batch RPC rejected: {replies.get('error') if isinstance(replies, dict) else replies}")
+            return [None] * len(calls)
+        
+        by_id = {reply.get("id"): reply for reply in replies}
+        results = []
+        for i in range(len(calls)):
+            reply = by_id.get(first_id + i) or {}
+            results.append(reply.get("result"))
+        return results
+    
+    def get_blocks(self, block_numbers: Iterable[int]) -> Dict[int, Optional[Dict]]:
+        """
+        Fetch several blocks (with full transactions) in one batch request.
+        
+        Blocks are decoded to the shape `get_block` returns: integer
+        number/timestamp and integer value/gas/gasPrice per transaction.
+        """
+        numbers = list(block_numbers)
+        results = self.rpc_batch([
+            ("eth_getBlockByNumber", [hex(number), True]) for number in numbers
+        ])
+        return {
+            number: self._decode_block(raw) if raw else None
+            for number, raw in zip(numbers, results)
+        }
+    
+    @staticmethod
+    def _decode_block(raw: Dict) -> Dict:
+        """Convert hex quantities of a raw JSON-RPC block to ints."""
+        def _int(value):
+            return int(value, 16) if isinstance(value, str) else (value or 0)
+        
+        block = dict(raw)
+        block['number'] = _int(raw.get('number'))
+        block['timestamp'] = _int(raw.get('timestamp'))
+        block['transactions'] = [
+            {
+                **tx,
+                'value': _int(tx.get('value')),
+                'gas': _int(tx.get('gas')),
+                'gasPrice': _int(tx.get('gasPrice')),
+            }
+            for tx in raw.get('transactions', [])
+            if isinstance(tx, dict)
+        ]
+        return block
+    
+    def get_codes(self, addresses: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch bytecode for several addresses in one batch request.
+        
+        Returns:
+            address -> code hex (None if the call failed)
+        """
+        addresses = list(addresses)
+        results = self.rpc_batch([
+            ("eth_getCode", [address, "latest"]) for address in addresses
+        ])
+        return dict(zip(addresses, results))
+    
     def get_latest_block_number(self) -> int:
         """Get latest block number."""
         try:
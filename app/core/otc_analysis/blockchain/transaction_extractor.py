@@ -18,11 +18,14 @@ class TransactionExtractor:
     ✅ FIXED: Shows actual token symbol (USDT, LINK) not "ERC20"
     """
     
-    def __init__(self, node_provider, etherscan, use_moralis: bool = True):
+    def __init__(self, node_provider, etherscan, use_moralis: bool = True, price_service=None):
         self.node_provider = node_provider
         self.etherscan = etherscan
         self.use_moralis = use_moralis
         
+        # ✅ Optional HistoricalPriceService for batched (token, day) lookups
+        self.price_service = price_service
+        
         # ✅ Moralis API Configuration
         self.moralis_api_key = os.getenv('MORALIS_API_KEY', '')
         self.moralis_base_url = "https://deep-index.moralis.io/api/v2.2"
@@ -533,6 +536,16 @@ class TransactionExtractor:
         
         price_cache = {}
         
+        # ✅ Batch-resolve all (token, day) keys up front; the loop below
+        # only falls back to per-key oracle calls for unresolved keys
+        prefetched_count = 0
+        if self.price_service is not None:
+            try:
+                price_cache.update(self.price_service.resolve_for_transactions(txs_to_enrich))
+                prefetched_count = len(price_cache)
+            except Exception as e:
+                logger.warning(f"⚠️ Batch price resolution failed, falling back to per-key lookups: {e}")
+        
         # Tracking
         enriched_count = 0
         cached_count = 0
@@ -791,7 +804,10 @@ class TransactionExtractor:
         if stablecoin_count > 0:
             logger.info(f"   💵 Stablecoin fallback: {stablecoin_count} transactions")
         
-        logger.info(f"📊 Made {len(price_cache)} unique price API calls instead of {len(txs_to_enrich)}")
+        logger.info(
+            f"📊 Resolved {len(price_cache)} unique (token, day) prices for {len(txs_to_enrich)} transactions "
+            f"({prefetched_count} batch-prefetched)"
+        )
         
         total_usd = sum(tx.get('usd_value', 0) for tx in txs_to_enrich if tx.get('usd_value'))
         avg_usd = total_usd / enriched_count if enriched_count > 0 else 0
@@ -0,0 +1,360 @@
+"""
+Transaction Ingestor - Bulk Upsert Path
+=======================================
+
+Schreibt geholte Transfers in einem Rutsch in `transactions`, statt pro
+Transaktion einen ORM-Lookup + Insert/Update zu machen.
+
+✅ FEATURES:
+- Normalisiert alle Transfers einmal in einen spaltenorientierten Batch
+- Ein `INSERT ... ON CONFLICT (tx_hash) DO UPDATE` pro Chunk
+- USD-Werte werden nur nachgetragen, wenn die DB noch keinen hat
+  (gleiche Semantik wie der alte ORM-Pfad)
+- Meldet rows/s pro Aufruf
+- Pflegt wallet_hourly_activity inkrementell mit
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_, select, union
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.otc_analysis.analysis import activity_rollup
+from app.core.otc_analysis.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+# NUMERIC(36,18) max = 10^18 - 1
+MAX_DECIMAL = 999999999999999999.0
+
+# Raw values above this are spam tokens with absurd supplies
+MAX_RAW_VALUE = 1e27
+
+# Columns touched when an existing row gets a (missing) USD value
+USD_UPDATE_COLUMNS = ('usd_value', 'otc_score', 'is_suspected_otc', 'updated_at')
+
+# Row errors kept in the result (the count is always complete)
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class TransactionBatch:
+    """
+    Column-oriented batch of normalized transactions.
+
+    One list per `transactions` column, all of equal length. Rows are
+    unique by tx_hash (ON CONFLICT cannot touch the same row twice).
+    """
+
+    columns: Dict[str, List[Any]] = field(default_factory=dict)
+    skipped: int = 0
+
+    COLUMN_NAMES = (
+        'tx_hash', 'block_number', 'timestamp', 'from_address', 'to_address',
+        'token_address', 'value', 'value_decimal', 'usd_value', 'gas_used',
+        'gas_price', 'is_contract_interaction', 'method_id', 'otc_score',
+        'is_suspected_otc', 'chain', 'chain_id', 'created_at', 'updated_at'
+    )
+
+    def __post_init__(self):
+        for name in self.COLUMN_NAMES:
+            self.columns.setdefault(name, [])
+
+    def __len__(self) -> int:
+        return len(self.columns['tx_hash'])
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Materialize a slice of the batch as row dicts for INSERT ... VALUES."""
+        names = self.COLUMN_NAMES
+        cols = [self.columns[name][start:stop] for name in names]
+        return [dict(zip(names, values)) for values in zip(*cols)]
+
+
+def _parse_timestamp(value: Any, now: datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return now
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value)
+    return now
+
+
+def _pick_usd_value(tx: Dict) -> Optional[float]:
+    usd_value = None
+    for key in ('value_usd', 'valueUSD', 'usd_value'):
+        val = tx.get(key)
+        if val is None:
+            continue
+        try:
+            usd_value = float(val)
+        except (ValueError, TypeError):
+            continue
+        if usd_value > 0:
+            break
+    return usd_value
+
+
+def _to_int(*values: Any) -> int:
+    for value in values:
+        if value:
+            try:
+                return int(value)
+            except (ValueError, TypeError):
+                continue
+    return 0
+
+
+def normalize_transactions(
+    transactions: Iterable[Dict],
+    chain: str = 'ethereum',
+    chain_id: int = 1
+) -> TransactionBatch:
+    """
+    Normalize fetched transfers (Moralis / Etherscan dicts) into one batch.
+
+    Applies the same rules the per-row ORM path used: spam values are
+    skipped, value_decimal is capped to the column range, OTC score is
+    derived from the USD value. Duplicate hashes keep the entry that
+    carries a USD value.
+    """
+    batch = TransactionBatch()
+    cols = batch.columns
+    position: Dict[str, int] = {}
+    now = datetime.now()
+
+    for tx in transactions:
+        tx_hash = tx.get('hash') or tx.get('tx_hash')
+        if not tx_hash:
+            batch.skipped += 1
+            continue
+
+        try:
+            raw_value = float(tx.get('value', 0) or 0)
+        except (ValueError, TypeError):
+            raw_value = 0.0
+
+        if raw_value > MAX_RAW_VALUE:
+            batch.skipped += 1
+            continue
+
+        value_decimal = raw_value / 1e18 if raw_value else 0.0
+        if abs(value_decimal) > MAX_DECIMAL:
+            value_decimal = MAX_DECIMAL if value_decimal > 0 else -MAX_DECIMAL
+
+        usd_value = _pick_usd_value(tx)
+        otc_score = min(usd_value / 1000000, 1.0) if usd_value and usd_value > 100000 else 0.0
+
+        values = {
+            'tx_hash': tx_hash,
+            'block_number': _to_int(tx.get('blockNumber'), tx.get('block_number')),
+            'timestamp': _parse_timestamp(tx.get('timestamp'), now),
+            'from_address': (tx.get('from_address') or tx.get('from') or '').lower(),
+            'to_address': (tx.get('to_address') or tx.get('to') or '').lower(),
+            'token_address': tx.get('tokenAddress') or tx.get('token_address'),
+            'value': value_decimal,  # ETH-denominated (not raw wei) to fit Numeric(36,18)
+            'value_decimal': value_decimal,
+            'usd_value': usd_value,
+            'gas_used': _to_int(tx.get('gasUsed'), tx.get('gas_used')),
+            'gas_price': _to_int(tx.get('gasPrice'), tx.get('gas_price')),
+            'is_contract_interaction': bool(
+                tx.get('isContractInteraction', tx.get('is_contract_interaction', False))
+            ),
+            'method_id': tx.get('methodId') or tx.get('method_id'),
+            'otc_score': otc_score,
+            'is_suspected_otc': otc_score > 0.7,
+            'chain': chain,
+            'chain_id': chain_id,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+        idx = position.get(tx_hash)
+        if idx is None:
+            position[tx_hash] = len(cols['tx_hash'])
+            for name, value in values.items():
+                cols[name].append(value)
+        else:
+            batch.skipped += 1
+            if usd_value and not cols['usd_value'][idx]:
+                for name, value in values.items():
+                    cols[name][idx] = value
+
+    return batch
+
+
+def bulk_upsert_transactions(
+    db: Session,
+    batch: TransactionBatch,
+    chunk_size: int = 1000,
+    update_rollups: bool = True
+) -> Dict[str, Any]:
+    """
+    Write a batch with INSERT ... ON CONFLICT (tx_hash) DO UPDATE.
+
+    Existing rows only receive a USD value (and derived OTC score) when
+    they have none yet and the batch brings one, so re-syncs are cheap
+    no-ops for unchanged transfers. Hourly activity rollups are updated
+    in the same transaction for inserted and newly priced rows.
+
+    Every chunk runs in a savepoint. A failing chunk is split in halves
+    and retried until the offending rows are isolated, so one bad row
+    only loses itself (like the old per-row savepoints), not the batch.
+
+    Returns:
+        Dict with inserted / updated / unchanged / failed counts,
+        row errors and rows_per_second
+    """
+    result = {
+        "rows": len(batch),
+        "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "errors": [],
+        "duration_seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+
+    if not len(batch):
+        return result
+
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Bulk upsert not supported for dialect '{dialect}'")
+
+    started = time.perf_counter()
+
+    try:
+        for start in range(0, len(batch), chunk_size):
+            _upsert_isolated(db, insert, dialect, batch.rows(start, start + chunk_size), update_rollups, result)
+
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        raise
+
+    if result["failed"]:
+        logger.warning(f"⚠️ {result['failed']} transactions could not be written")
+
+    duration = time.perf_counter() - started
+    result["duration_seconds"] = duration
+    result["rows_per_second"] = len(batch) / duration if duration > 0 else 0.0
+
+    return result
+
+
+def _upsert_isolated(
+    db: Session,
+    insert,
+    dialect: str,
+    rows: List[Dict[str, Any]],
+    update_rollups: bool,
+    result: Dict[str, Any]
+):
+    """Upsert rows in a savepoint; on a DB error bisect down to the failing rows."""
+    try:
+        with db.begin_nested():
+            inserted, updated = _upsert_rows(db, insert, dialect, rows, update_rollups)
+    except SQLAlchemyError as e:
+        if len(rows) == 1:
+            result["failed"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append(f"{rows[0]['tx_hash']}: {str(e).splitlines()[0]}")
+            logger.debug(f"   ❌ Failed to write {rows[0]['tx_hash']}: {e}")
+            return
+
+        middle = len(rows) // 2
+        _upsert_isolated(db, insert, dialect, rows[:middle], update_rollups, result)
+        _upsert_isolated(db, insert, dialect, rows[middle:], update_rollups, result)
+        return
+
+    result["inserted"] += inserted
+    result["updated"] += updated
+    result["unchanged"] += len(rows) - inserted - updated
+
+
+def _upsert_rows(
+    db: Session,
+    insert,
+    dialect: str,
+    rows: List[Dict[str, Any]],
+    update_rollups: bool
+) -> Tuple[int, int]:
+    """One INSERT ... ON CONFLICT statement (+ rollups). Returns (inserted, updated)."""
+    table = Transaction.__table__
+
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.tx_hash],
+        set_={name: stmt.excluded[name] for name in USD_UPDATE_COLUMNS},
+        where=(
+            or_(table.c.usd_value == None, table.c.usd_value == 0)
+            & (stmt.excluded.usd_value > 0)
+        )
+    )
+
+    if dialect == 'postgresql':
+        # xmax = 0 only for freshly inserted tuples
+        stmt = stmt.returning(
+            table.c.tx_hash, literal_column('(xmax = 0)').label('inserted')
+        )
+        written = {row.tx_hash: row.inserted for row in db.execute(stmt)}
+    else:
+        existing = set(db.execute(
+            select(table.c.tx_hash).where(
+                table.c.tx_hash.in_([row['tx_hash'] for row in rows])
+            )
+        ).scalars())
+        written = {
+            tx_hash: tx_hash not in existing
+            for tx_hash in db.execute(stmt.returning(table.c.tx_hash)).scalars()
+        }
+
+    inserted = sum(1 for flag in written.values() if flag)
+    updated = len(written) - inserted
+
+    if update_rollups and written:
+        new_rows = [row for row in rows if written.get(row['tx_hash']) is True]
+        enriched_rows = [row for row in rows if written.get(row['tx_hash']) is False]
+        activity_rollup.record_transactions(db, new_rows)
+        activity_rollup.record_enrichment(db, enriched_rows)
+
+    return inserted, updated
+
+
+def count_wallet_transactions(
+    db: Session,
+    wallet_address: str,
+    created_since: Optional[datetime] = None
+) -> int:
+    """
+    Count transactions touching a wallet.
+
+    Uses a UNION of two index-backed lookups (from_address / to_address)
+    instead of an OR filter, which PostgreSQL tends to plan as a scan.
+    """
+    address = wallet_address.lower()
+
+    outgoing = select(Transaction.tx_hash).where(Transaction.from_address == address)
+    incoming = select(Transaction.tx_hash).where(Transaction.to_address == address)
+
+    if created_since is not None:
+        outgoing = outgoing.where(Transaction.created_at >= created_since)
+        incoming = incoming.where(Transaction.created_at >= created_since)
+
+    subquery = union(outgoing, incoming).subquery()
+    return db.execute(select(func.count()).select_from(subquery)).scalar() or 0
@@ -0,0 +1,611 @@
+"""
+Historical Price Service - Day-Granularity Batch Resolution
+============================================================
+
+Löst USD-Preise für viele Transaktionen auf einmal auf, statt pro
+Transaktion einen API-Call (plus Sleep) zu machen.
+
+✅ FEATURES:
+- Gruppiert Transaktionen nach (token, day)
+- Holt jeden Token über CoinGecko market_chart/range (ein Request pro
+  Zeitfenster statt ein Request pro Tag)
+- Persistiert Tagespreise in `historical_prices` → jeder Key wird nur
+  einmal geholt, auch über Prozess-Neustarts hinweg
+- Schreibt USD-Werte per Bulk-UPDATE zurück
+- Meldet Durchsatz als Transaktionen/Sekunde
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.otc_analysis.analysis import activity_rollup
+from app.core.otc_analysis.data_sources.token_registry import get_token_info
+from app.core.otc_analysis.models.historical_price import HistoricalPrice
+from app.core.otc_analysis.models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+PriceKey = Tuple[str, date]
+
+NATIVE_TOKEN_KEY = 'ETH'
+
+NATIVE_ADDRESSES = {
+    '0x0000000000000000000000000000000000000000',
+    '0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee',
+}
+
+STABLECOINS = {
+    'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'FRAX', 'USDP', 'GUSD', 'LUSD'
+}
+
+# Same sanity limit as TransactionExtractor.enrich_with_usd_value
+MAX_REASONABLE_USD = 1_000_000_000
+
+# PriceOracle.last_error messages that mean "the source has no price" (a
+# confirmed miss). Anything else - rate limits, timeouts, HTTP errors - is
+# transient and must not block the key.
+NO_DATA_ERRORS = (
+    'not found',
+    'no usd price',
+    'no market_data',
+    'no current_price',
+    'no price data',
+    'no range data',
+    'no matching price point',
+)
+
+
+def token_key_for(token_address: Optional[str]) -> str:
+    """Normalize a token address to the key used in `historical_prices`."""
+    if not token_address or token_address.lower() in NATIVE_ADDRESSES:
+        return NATIVE_TOKEN_KEY
+    return token_address.lower()
+
+
+def day_of(timestamp: Any) -> Optional[date]:
+    """UTC day of a timestamp (datetime, date or unix seconds)."""
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
+    if isinstance(timestamp, (int, float)):
+        return datetime.utcfromtimestamp(timestamp).date()
+    return None
+
+
+class HistoricalPriceService:
+    """
+    Resolves (token, day) → USD price with a persistent day cache.
+
+    Lookup order per key:
+    1. In-process memory
+    2. `historical_prices` table (one query per batch)
+    3. PriceOracle.get_daily_price_range (one request per token window)
+    4. PriceOracle.get_historical_price (per key, not persisted; skipped
+       when a range request failed transiently)
+    5. Stablecoin peg
+    """
+
+    def __init__(
+        self,
+        price_oracle,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_window_days: int = 90,
+        miss_ttl_seconds: float = 6 * 3600
+    ):
+        """
+        Initialize historical price service.
+
+        Args:
+            price_oracle: PriceOracle instance
+            session_factory: Callable returning a DB session (used when
+                no session is passed to resolve_prices)
+            max_window_days: Max days per range request (CoinGecko keeps
+                hourly granularity up to 90 days)
+            miss_ttl_seconds: How long a confirmed "no data" answer is
+                remembered before the key is asked again
+        """
+        self.price_oracle = price_oracle
+        self.session_factory = session_factory
+        self.max_window_days = max_window_days
+        self.miss_ttl_seconds = miss_ttl_seconds
+
+        self._memory: Dict[PriceKey, float] = {}
+        # key → monotonic expiry; only confirmed misses, never errors
+        self._misses: Dict[PriceKey, float] = {}
+
+        self.stats = {
+            'keys_requested': 0,
+            'memory_hits': 0,
+            'db_hits': 0,
+            'range_requests': 0,
+            'single_requests': 0,
+            'stablecoin_pegs': 0,
+            'unresolved': 0,
+            'rate_limit_hits': 0,
+            'transient_errors': 0,
+        }
+
+    # ========================================================================
+    # KEY RESOLUTION
+    # ========================================================================
+
+    def resolve_prices(
+        self,
+        keys: Iterable[PriceKey],
+        symbols: Optional[Dict[str, str]] = None,
+        db: Optional[Session] = None
+    ) -> Dict[PriceKey, Optional[float]]:
+        """
+        Resolve USD prices for many (token_key, day) keys at once.
+
+        Args:
+            keys: Iterable of (token_key, day) tuples
+            symbols: Optional token_key → symbol map (helps ID lookup
+                and stablecoin fallback)
+            db: Optional DB session (falls back to session_factory)
+
+        Returns:
+            Dict mapping every requested key → price (None if unresolved)
+        """
+        symbols = symbols or {}
+        wanted = {key for key in keys if key[1] is not None}
+        self.stats['keys_requested'] += len(wanted)
+
+        result: Dict[PriceKey, Optional[float]] = {}
+        pending = set()
+        now = time.monotonic()
+
+        for key in wanted:
+            if key in self._memory:
+                result[key] = self._memory[key]
+                self.stats['memory_hits'] += 1
+            elif self._misses.get(key, 0) > now:
+                result[key] = None
+            else:
+                self._misses.pop(key, None)
+                pending.add(key)
+
+        if not pending:
+            return result
+
+        if len(self._misses) > 10_000:
+            self._misses = {key: expiry for key, expiry in self._misses.items() if expiry > now}
+
+        own_session = db is None and self.session_factory is not None
+        session = self.session_factory() if own_session else db
+
+        try:
+            if session is not None:
+                stored = self._load_stored(session, pending)
+                self.stats['db_hits'] += len(stored)
+                self._memory.update(stored)
+                result.update(stored)
+                pending -= stored.keys()
+
+            days_by_token: Dict[str, List[date]] = defaultdict(list)
+            for token_key, day in pending:
+                days_by_token[token_key].append(day)
+
+            new_rows: List[Dict[str, Any]] = []
+
+            for token_key, days in days_by_token.items():
+                symbol = symbols.get(token_key) or self._symbol_for(token_key)
+                fetched, rows, failed = self._fetch_token(token_key, sorted(set(days)), symbol)
+                new_rows.extend(rows)
+
+                for day in days:
+                    key = (token_key, day)
+                    price = fetched.get(day)
+                    result[key] = price
+                    if price:
+                        self._memory[key] = price
+                    else:
+                        self.stats['unresolved'] += 1
+                        # Errors leave the key open for the next batch
+                        if not failed:
+                            self._misses[key] = time.monotonic() + self.miss_ttl_seconds
+
+            if session is not None and new_rows:
+                self._store(session, new_rows)
+
+        finally:
+            if own_session:
+                session.close()
+
+        return result
+
+    def resolve_for_transactions(
+        self,
+        transactions: List[Dict],
+        db: Optional[Session] = None
+    ) -> Dict[Tuple[str, str], float]:
+        """
+        Resolve prices for transaction dicts in one batch.
+
+        Returns only resolved prices, keyed the same way as the local
+        price_cache in TransactionExtractor.enrich_with_usd_value:
+        (token_address or 'ETH', 'YYYY-MM-DD').
+        """
+        keys = set()
+        symbols: Dict[str, str] = {}
+        mapping: Dict[Tuple[str, str], PriceKey] = {}
+
+        for tx in transactions:
+            day = day_of(tx.get('timestamp'))
+            if day is None:
+                continue
+
+            token_address = tx.get('token_address')
+            token_key = token_key_for(token_address)
+            key = (token_key, day)
+            keys.add(key)
+            mapping[(token_address or 'ETH', day.strftime('%Y-%m-%d'))] = key
+
+            if tx.get('token_symbol'):
+                symbols.setdefault(token_key, tx['token_symbol'])
+
+        prices = self.resolve_prices(keys, symbols=symbols, db=db)
+
+        return {
+            cache_key: prices[key]
+            for cache_key, key in mapping.items()
+            if prices.get(key)
+        }
+
+    # ========================================================================
+    # DB ENRICHMENT
+    # ========================================================================
+
+    def enrich_pending_transactions(
+        self,
+        db: Session,
+        batch_size: int = 500,
+        max_batches: int = 10,
+        min_value_decimal: float = 0.01
+    ) -> Dict[str, Any]:
+        """
+        Enrich stored transactions with usd_value NULL/0.
+
+        Each batch groups its transactions by (token, day), resolves all
+        distinct keys at once and writes back with one bulk UPDATE.
+        Batches walk a keyset cursor (value_decimal DESC, tx_hash) so
+        transactions that stay unresolved are not fetched again.
+
+        Returns:
+            Dict with stats (incl. tx_per_second)
+        """
+        stats = {
+            "total_checked": 0,
+            "enriched": 0,
+            "failed": 0,
+            "skipped": 0,
+            "batches_processed": 0,
+            "unique_price_keys": 0,
+            "rate_limit_hits": 0,
+            "start_time": datetime.now()
+        }
+
+        started = time.perf_counter()
+        requests_before = self.stats['range_requests'] + self.stats['single_requests']
+        rate_limits_before = self.stats['rate_limit_hits']
+        cursor: Optional[Tuple[float, str]] = None
+
+        for batch_num in range(max_batches):
+            query = db.query(
+                Transaction.tx_hash,
+                Transaction.token_address,
+                Transaction.timestamp,
+                Transaction.value_decimal,
+                Transaction.from_address,
+                Transaction.to_address
+            ).filter(
+                or_(Transaction.usd_value == None, Transaction.usd_value == 0),
+                Transaction.value_decimal > min_value_decimal
+            )
+
+            if cursor is not None:
+                last_value, last_hash = cursor
+                query = query.filter(or_(
+                    Transaction.value_decimal < last_value,
+                    and_(
+                        Transaction.value_decimal == last_value,
+                        Transaction.tx_hash > last_hash
+                    )
+                ))
+
+            rows = query.order_by(
+                Transaction.value_decimal.desc(),
+                Transaction.tx_hash.asc()
+            ).limit(batch_size).all()
+
+            if not rows:
+                break
+
+            cursor = (rows[-1].value_decimal, rows[-1].tx_hash)
+            stats["total_checked"] += len(rows)
+
+            keys = {
+                (token_key_for(row.token_address), day_of(row.timestamp))
+                for row in rows
+            }
+            stats["unique_price_keys"] += len(keys)
+
+            prices = self.resolve_prices(keys, db=db)
+
+            now = datetime.now()
+            mappings = []
+            rollup_rows = []
+
+            for row in rows:
+                price = prices.get((token_key_for(row.token_address), day_of(row.timestamp)))
+
+                if not price:
+                    stats["failed"] += 1
+                    continue
+
+                usd_value = row.value_decimal * price
+
+                if usd_value > MAX_REASONABLE_USD:
+                    stats["skipped"] += 1
+                    continue
+
+                otc_score = min(usd_value / 1000000, 1.0) if usd_value > 100000 else 0.0
+                mappings.append({
+                    'tx_hash': row.tx_hash,
+                    'usd_value': usd_value,
+                    'otc_score': otc_score,
+                    'is_suspected_otc': otc_score > 0.7,
+                    'updated_at': now
+                })
+                rollup_rows.append({
+                    'from_address': row.from_address,
+                    'to_address': row.to_address,
+                    'timestamp': row.timestamp,
+                    'usd_value': usd_value
+                })
+
+            if mappings:
+                db.execute(update(Transaction), mappings)
+                activity_rollup.record_enrichment(db, rollup_rows)
+            db.commit()
+
+            stats["enriched"] += len(mappings)
+            stats["batches_processed"] += 1
+
+            logger.info(
+                f"   ✅ Batch {batch_num + 1}: {len(mappings)}/{len(rows)} enriched "
+                f"from {len(keys)} (token, day) keys"
+            )
+
+        duration = time.perf_counter() - started
+        stats["rate_limit_hits"] = self.stats['rate_limit_hits'] - rate_limits_before
+
+        stats["price_requests"] = (
+            self.stats['range_requests'] + self.stats['single_requests'] - requests_before
+        )
+        stats["end_time"] = datetime.now()
+        stats["duration_seconds"] = duration
+        stats["tx_per_second"] = stats["enriched"] / duration if duration > 0 else 0.0
+
+        return stats
+
+    # ========================================================================
+    # INTERNALS
+    # ========================================================================
+
+    def _symbol_for(self, token_key: str) -> Optional[str]:
+        if token_key == NATIVE_TOKEN_KEY:
+            return 'ETH'
+        symbol = get_token_info(token_key).get('symbol')
+        return None if symbol == 'UNKNOWN' else symbol
+
+    def _call_oracle(self, method: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Call a PriceOracle method and classify its outcome.
+
+        The error comes from PriceOracle.call_tracked for exactly this
+        call, so concurrent syncs sharing the oracle do not see each
+        other's errors.
+
+        Returns:
+            Tuple of (result, failed) - failed is True for transient errors
+            (rate limit, timeout, HTTP error), False for data or a
+            confirmed "no data" answer
+        """
+        call_tracked = getattr(self.price_oracle, 'call_tracked', None)
+
+        try:
+            if call_tracked is not None:
+                result, error = call_tracked(method, *args, **kwargs)
+            else:
+                result, error = method(*args, **kwargs), None
+        except Exception as e:
+            return None, self._record_error(str(e) or type(e).__name__)
+
+        return result, self._record_error(str(error)) if error else False
+
+    def _record_error(self, error: str) -> bool:
+        """Count an oracle error; True if it is transient."""
+        error = error.lower()
+
+        if 'rate limit' in error or '429' in error:
+            self.stats['rate_limit_hits'] += 1
+        elif any(marker in error for marker in NO_DATA_ERRORS):
+            return False
+
+        self.stats['transient_errors'] += 1
+        return True
+
+    def _plan_windows(self, days: List[date]) -> List[Tuple[date, date]]:
+        """Group sorted days into range windows of at most max_window_days."""
+        windows = []
+        start = prev = None
+
+        for day in days:
+            if start is None:
+                start = prev = day
+            elif (day - start).days >= self.max_window_days:
+                windows.append((start, prev))
+                start = prev = day
+            else:
+                prev = day
+
+        if start is not None:
+            windows.append((start, prev))
+
+        return windows
+
+    def _fetch_token(
+        self,
+        token_key: str,
+        days: List[date],
+        symbol: Optional[str]
+    ) -> Tuple[Dict[date, float], List[Dict[str, Any]], bool]:
+        """
+        Fetch prices for one token.
+
+        Returns:
+            Tuple of (day → price for all resolved days, rows to persist,
+            whether a transient error occurred)
+        """
+        token_address = None if token_key == NATIVE_TOKEN_KEY else token_key
+        fetched: Dict[date, float] = {}
+        rows: List[Dict[str, Any]] = []
+        failed = False
+        fetched_at = datetime.utcnow()
+
+        def _row(day: date, price: float, source: str) -> Dict[str, Any]:
+            return {
+                'token_key': token_key,
+                'price_date': day,
+                'price_usd': price,
+                'token_symbol': symbol,
+                'source': source,
+                'fetched_at': fetched_at
+            }
+
+        # 1️⃣ Range endpoint - persist every day it returns, not only the
+        #    requested ones, so neighbouring keys are warm as well
+        if hasattr(self.price_oracle, 'get_daily_price_range'):
+            for start, end in self._plan_windows(days):
+                self.stats['range_requests'] += 1
+                daily, range_failed = self._call_oracle(
+                    self.price_oracle.get_daily_price_range,
+                    token_address, start, end, token_symbol=symbol
+                )
+                if range_failed:
+                    failed = True
+                    logger.debug(f"   ⏳ Range request failed for {token_key[:10]} {start}..{end}")
+                daily = daily or {}
+
+                for day, price in daily.items():
+                    if price and price > 0:
+                        fetched[day] = price
+                        rows.append(_row(day, price, 'range'))
+
+        missing = [day for day in days if day not in fetched]
+
+        # 2️⃣ Stablecoin peg (persisted - does not go stale)
+        if missing and symbol and symbol.upper() in STABLECOINS:
+            for day in missing:
+                fetched[day] = 1.0
+                rows.append(_row(day, 1.0, 'stablecoin'))
+                self.stats['stablecoin_pegs'] += 1
+            return fetched, rows, False
+
+        # 3️⃣ Per-day history fallback (kept in memory only, since the
+        #    oracle may answer with static fallback prices). Skipped after a
+        #    transient range failure: one request per day would only hit the
+        #    same rate limit harder - the keys stay open for the next batch.
+        if failed:
+            return fetched, rows, True
+
+        if missing and hasattr(self.price_oracle, 'get_historical_price'):
+            for day in missing:
+                self.stats['single_requests'] += 1
+                price, day_failed = self._call_oracle(
+                    self.price_oracle.get_historical_price,
+                    token_address,
+                    datetime.combine(day, dt_time(12, 0)),
+                    token_symbol=symbol
+                )
+                if day_failed:
+                    failed = True
+                    logger.debug(f"   ❌ History fallback failed for {token_key[:10]} @ {day}")
+
+                if price and price > 0:
+                    fetched[day] = price
+
+        return fetched, rows, failed
+
+    def _load_stored(self, db: Session, keys: Iterable[PriceKey]) -> Dict[PriceKey, float]:
+        """Load stored prices for keys with one query."""
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        tokens = {token_key for token_key, _ in keys}
+        days = [day for _, day in keys]
+
+        try:
+            stored = db.query(
+                HistoricalPrice.token_key,
+                HistoricalPrice.price_date,
+                HistoricalPrice.price_usd
+            ).filter(
+                HistoricalPrice.token_key.in_(tokens),
+                HistoricalPrice.price_date >= min(days),
+                HistoricalPrice.price_date <= max(days)
+            ).all()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read historical_prices: {e}")
+            db.rollback()
+            return {}
+
+        return {
+            (row.token_key, row.price_date): row.price_usd
+            for row in stored
+            if (row.token_key, row.price_date) in keys
+        }
+
+    def _store(self, db: Session, rows: List[Dict[str, Any]]):
+        """Insert new day prices, ignoring keys that already exist."""
+        dialect = db.get_bind().dialect.name
+
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            logger.warning(f"⚠️ historical_prices upsert not supported on {dialect}")
+            return
+
+        # Deduplicate within the batch (ON CONFLICT cannot touch a row twice)
+        unique = {(row['token_key'], row['price_date']): row for row in rows}
+
+        try:
+            stmt = insert(HistoricalPrice).values(list(unique.values()))
+            stmt = stmt.on_conflict_do_nothing(index_elements=['token_key', 'price_date'])
+            db.execute(stmt)
+            db.commit()
+            logger.debug(f"💾 Stored {len(unique)} daily prices")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not store historical prices: {e}")
+            db.rollback()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get resolution statistics."""
+        return {
+            **self.stats,
+            'memory_entries': len(self._memory),
+            'known_misses': sum(1 for expiry in self._misses.values() if expiry > time.monotonic())
+        }
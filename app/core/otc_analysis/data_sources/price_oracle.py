@@ -12,9 +12,10 @@ Date: 2024-12-30
 """
 
 import requests
+import threading
 import time
-from typing import Optional, Dict
-from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Dict, Tuple
+from datetime import date, datetime, timedelta, timezone
 import logging
 import os
 
@@ -48,10 +49,11 @@ class PriceOracle:
         self.coingecko_base = "https://api.coingecko.com/api/v3"
         self.rate_limit_delay = 1.5
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
         self.session = requests.Session()
         
-        # Error tracking
-        self.last_error = None
+        # Error tracking (last_error is per thread - parallel syncs share the oracle)
+        self._local = threading.local()
         self.error_count = 0
         self.success_count = 0
         
@@ -162,14 +164,15 @@ class PriceOracle:
         }
     
     def _rate_limit(self):
-        """Enforce rate limiting for API calls."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        
-        self.last_request_time = time.time()
+        """Enforce rate limiting for API calls (thread-safe, shared by concurrent syncs)."""
+        with self._rate_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request_time
+            
+            if time_since_last < self.rate_limit_delay:
+                time.sleep(self.rate_limit_delay - time_since_last)
+            
+            self.last_request_time = time.time()
 
     def _get_token_id(
         self, 
@@ -240,7 +243,7 @@ class PriceOracle:
     # ✨ ENHANCED: LIVE ETH PRICE WITH ERROR TRACKING
     # ========================================================================
     
-    def get_eth_price_live(self) -> float:
+    def get_eth_price_live(self) -> Optional[float]:
         """
         Get live ETH price with multiple fallbacks.
         
@@ -248,7 +251,9 @@ class PriceOracle:
         1. Etherscan API (most accurate, real-time)
         2. Cache (if recent < 5 minutes)
         3. CoinGecko API (backup)
-        4. Fallback constant
+        
+        Returns None when no live price is available - a hard-coded
+        constant would silently misprice every live transfer.
         """
         # 1️⃣ Try Etherscan first
         if self.etherscan:
@@ -287,10 +292,8 @@ class PriceOracle:
             logger.warning(f"⚠️ CoinGecko failed: {e}")
             self.last_error = f"CoinGecko: {str(e)}"
         
-        # 4️⃣ Fallback
-        fallback = self.fallback_prices['ETH']
-        logger.warning(f"⚠️ Using fallback ETH price: ${fallback:,.2f}")
-        return fallback
+        logger.warning("⚠️ No live ETH price available")
+        return None
     
     # ========================================================================
     # CURRENT PRICE METHODS
@@ -312,13 +315,21 @@ class PriceOracle:
             if cached_price is not None:
                 return cached_price
         
-        # Fetch from CoinGecko
-        token_id = self._get_token_id(token_address)
-        price = self._fetch_current_price(token_id)
+        # Fetch from CoinGecko (symbols like 'USDT' are resolved via the symbol map)
+        is_address = token_address.startswith('0x')
+        token_id, _ = self._get_token_id(token_address, None if is_address else token_address)
         
-        if price and not self._validate_price(token_id, price):
-            logger.error(f"Price validation failed for {token_id}, using fallback")
-            price = self._get_fallback_price(token_id)
+        if token_id is None:
+            # Not in our maps: price by contract address
+            price = None
+            if is_address:
+                price = self._fetch_moralis_price(token_address) or self._fetch_current_price_by_contract(token_address)
+        else:
+            price = self._fetch_current_price(token_id)
+            
+            if price and not self._validate_price(token_id, price):
+                logger.error(f"Price validation failed for {token_id}, using fallback")
+                price = self._get_fallback_price(token_id)
         
         if price and self.cache:
             self.cache.cache_price(token_address or 'ETH', price)
@@ -393,6 +404,43 @@ class PriceOracle:
             self.error_count += 1
             return None
     
+    def _fetch_current_price_by_contract(self, token_address: str) -> Optional[float]:
+        """
+        Fetch current price by contract address (tokens not in our ID maps).
+        
+        Uses: /simple/token_price/ethereum
+        """
+        self._rate_limit()
+        
+        url = f"{self.coingecko_base}/simple/token_price/ethereum"
+        contract = token_address.lower()
+        params = {
+            'contract_addresses': contract,
+            'vs_currencies': 'usd'
+        }
+        
+        try:
+            logger.debug(f"🔍 CoinGecko token price: {token_address[:10]}...")
+            
+            response = self.session.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            
+            price = response.json().get(contract, {}).get('usd')
+            if price:
+                self.success_count += 1
+                self.last_error = None
+                return price
+            
+            self.last_error = f"Contract {token_address} not found in CoinGecko response"
+            self.error_count += 1
+            return None
+            
+        except Exception as e:
+            logger.debug(f"   ❌ Error: {str(e)}")
+            self.last_error = str(e)
+            self.error_count += 1
+            return None
+    
     # ========================================================================
     # ✨ ENHANCED: HISTORICAL PRICE WITH DETAILED TRACKING
     # ========================================================================
@@ -465,7 +513,7 @@ class PriceOracle:
         if price and token_id:
             if not self._validate_price(token_id, price):
                 logger.warning(f"⚠️ Validation failed, trying fallback")
-                price = self._get_fallback_price(token_id, timestamp.year, token_symbol)
+                price = self._get_fallback_price(token_id, timestamp.year)
         
         # ====================================================================
         # STEP 5: Last resort - stablecoin or major token fallback
@@ -532,188 +580,188 @@ class PriceOracle:
         
         return None
 
-def get_live_token_price(
-    self,
-    token_address_or_symbol: str
-) -> Optional[float]:
-    """
-    Get CURRENT live price for any token.
+    def get_live_token_price(
+        self,
+        token_address_or_symbol: str
+    ) -> Optional[float]:
+        """
+        Get CURRENT live price for any token.
     
-    ✨ NEW: Moralis-First Strategy für Live-Preise
+        ✨ NEW: Moralis-First Strategy für Live-Preise
     
-    Priority:
-    1. Moralis Price API (aktuelle DEX-aggregierte Preise)
-    2. Etherscan (für ETH)
-    3. CoinGecko Current Price API
-    4. Stablecoin Constants
-    5. Fallback Values
+        Priority:
+        1. Moralis Price API (aktuelle DEX-aggregierte Preise)
+        2. Etherscan (für ETH)
+        3. CoinGecko Current Price API
+        4. Stablecoin Constants
+        5. Fallback Values
     
-    Args:
-        token_address_or_symbol: Token address (0x...) or symbol (ETH, USDT)
+        Args:
+            token_address_or_symbol: Token address (0x...) or symbol (ETH, USDT)
         
-    Returns:
-        Current USD price or None
-    """
-    # ====================================================================
-    # STEP 1: Normalize input
-    # ====================================================================
+        Returns:
+            Current USD price or None
+        """
+        # ====================================================================
+        # STEP 1: Normalize input
+        # ====================================================================
     
-    is_address = token_address_or_symbol and token_address_or_symbol.startswith('0x')
+        is_address = token_address_or_symbol and token_address_or_symbol.startswith('0x')
     
-    # ====================================================================
-    # STEP 2: Handle ETH specially (Etherscan für beste Genauigkeit)
-    # ====================================================================
+        # ====================================================================
+        # STEP 2: Handle ETH specially (Etherscan für beste Genauigkeit)
+        # ====================================================================
     
-    if not is_address:
-        symbol_upper = token_address_or_symbol.upper()
-        
-        # ETH/WETH → Use Etherscan
-        if symbol_upper in ['ETH', 'WETH']:
-            price = self.get_eth_price_live()
-            if price:
-                logger.debug(f"✅ Live ETH: ${price:,.2f} (Etherscan)")
-                return price
-        
-        # Stablecoins → Always $1
-        if symbol_upper in ['USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'FRAX', 'USDP']:
-            logger.debug(f"✅ Stablecoin: {symbol_upper} = $1.00")
-            return 1.0
+        if not is_address:
+            symbol_upper = token_address_or_symbol.upper()
+        
+            # ETH/WETH → Use Etherscan
+            if symbol_upper in ['ETH', 'WETH']:
+                price = self.get_eth_price_live()
+                if price:
+                    logger.debug(f"✅ Live ETH: ${price:,.2f} (Etherscan)")
+                    return price
+        
+            # Stablecoins → Always $1
+            if symbol_upper in ['USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'FRAX', 'USDP']:
+                logger.debug(f"✅ Stablecoin: {symbol_upper} = $1.00")
+                return 1.0
     
-    # ====================================================================
-    # STEP 3: Check cache (5 min TTL für live prices)
-    # ====================================================================
+        # ====================================================================
+        # STEP 3: Check cache (5 min TTL für live prices)
+        # ====================================================================
     
-    cache_key = f"live_price:{token_address_or_symbol}"
+        cache_key = f"live_price:{token_address_or_symbol}"
     
-    if self.cache:
-        cached = self.cache.get(cache_key)
-        if cached:
-            logger.debug(f"💾 Cached live price: ${cached:,.2f}")
-            return cached
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                logger.debug(f"💾 Cached live price: ${cached:,.2f}")
+                return cached
     
-    # ====================================================================
-    # STEP 4: Try Moralis Price API (PRIORITY 1)
-    # ====================================================================
+        # ====================================================================
+        # STEP 4: Try Moralis Price API (PRIORITY 1)
+        # ====================================================================
     
-    price = None
+        price = None
     
-    if is_address:
-        price = self._fetch_moralis_price(token_address_or_symbol)
+        if is_address:
+            price = self._fetch_moralis_price(token_address_or_symbol)
         
-        if price:
-            logger.debug(f"✅ Moralis live price: ${price:,.2f}")
+            if price:
+                logger.debug(f"✅ Moralis live price: ${price:,.2f}")
             
-            # Cache for 5 minutes
-            if self.cache:
-                self.cache.set(cache_key, price, ttl=300)
+                # Cache for 5 minutes
+                if self.cache:
+                    self.cache.set(cache_key, price, ttl=300)
             
-            return price
+                return price
     
-    # ====================================================================
-    # STEP 5: Try CoinGecko Current Price API (Fallback)
-    # ====================================================================
+        # ====================================================================
+        # STEP 5: Try CoinGecko Current Price API (Fallback)
+        # ====================================================================
     
-    if is_address:
-        token_id, _ = self._get_token_id(token_address_or_symbol)
-    else:
-        # Try symbol lookup
-        symbol_upper = token_address_or_symbol.upper()
-        token_id = self.symbol_to_id_map.get(symbol_upper)
+        if is_address:
+            token_id, _ = self._get_token_id(token_address_or_symbol)
+        else:
+            # Try symbol lookup
+            symbol_upper = token_address_or_symbol.upper()
+            token_id = self.symbol_to_id_map.get(symbol_upper)
     
-    if token_id:
-        price = self._fetch_current_price(token_id)
+        if token_id:
+            price = self._fetch_current_price(token_id)
         
-        if price:
-            logger.debug(f"✅ CoinGecko live price: ${price:,.2f}")
+            if price:
+                logger.debug(f"✅ CoinGecko live price: ${price:,.2f}")
             
-            # Cache for 5 minutes
-            if self.cache:
-                self.cache.set(cache_key, price, ttl=300)
+                # Cache for 5 minutes
+                if self.cache:
+                    self.cache.set(cache_key, price, ttl=300)
             
-            return price
+                return price
     
-    # ====================================================================
-    # STEP 6: Fallback to hardcoded values
-    # ====================================================================
+        # ====================================================================
+        # STEP 6: Fallback to hardcoded values
+        # ====================================================================
     
-    if not is_address:
-        fallback = self.fallback_prices.get(token_address_or_symbol.upper())
-        if fallback:
-            logger.debug(f"💵 Fallback: {token_address_or_symbol} = ${fallback:,.2f}")
-            return fallback
+        if not is_address:
+            fallback = self.fallback_prices.get(token_address_or_symbol.upper())
+            if fallback:
+                logger.debug(f"💵 Fallback: {token_address_or_symbol} = ${fallback:,.2f}")
+                return fallback
     
-    logger.debug(f"❌ No live price found for {token_address_or_symbol}")
-    return None
+        logger.debug(f"❌ No live price found for {token_address_or_symbol}")
+        return None
 
 
-def _fetch_moralis_price(self, token_address: str) -> Optional[float]:
-    """
-    Fetch current token price from Moralis Price API.
+    def _fetch_moralis_price(self, token_address: str) -> Optional[float]:
+        """
+        Fetch current token price from Moralis Price API.
     
-    Endpoint: GET /erc20/{address}/price?chain=eth
+        Endpoint: GET /erc20/{address}/price?chain=eth
     
-    Returns:
-        {
-            "usdPrice": 3315.37,
-            "exchangeAddress": "0x...",
-            "exchangeName": "Uniswap v3"
-        }
-    """
-    if not self.moralis_api_key:
-        return None
+        Returns:
+            {
+                "usdPrice": 3315.37,
+                "exchangeAddress": "0x...",
+                "exchangeName": "Uniswap v3"
+            }
+        """
+        if not self.moralis_api_key:
+            return None
     
-    # Handle ETH/WETH
-    if token_address.lower() in [
-        '0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee',
-        '0x0000000000000000000000000000000000000000'
-    ]:
-        # Use WETH for price lookup
-        token_address = '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2'
+        # Handle ETH/WETH
+        if token_address.lower() in [
+            '0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee',
+            '0x0000000000000000000000000000000000000000'
+        ]:
+            # Use WETH for price lookup
+            token_address = '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2'
     
-    try:
-        url = f"https://deep-index.moralis.io/api/v2.2/erc20/{token_address}/price"
-        headers = {
-            'X-API-Key': self.moralis_api_key,
-            'Accept': 'application/json'
-        }
-        params = {'chain': 'eth'}
+        try:
+            url = f"https://deep-index.moralis.io/api/v2.2/erc20/{token_address}/price"
+            headers = {
+                'X-API-Key': self.moralis_api_key,
+                'Accept': 'application/json'
+            }
+            params = {'chain': 'eth'}
         
-        logger.debug(f"   🔍 Moralis Price API: {token_address[:10]}...")
+            logger.debug(f"   🔍 Moralis Price API: {token_address[:10]}...")
         
-        response = self.session.get(url, headers=headers, params=params, timeout=10)
+            response = self.session.get(url, headers=headers, params=params, timeout=10)
         
-        if response.status_code == 200:
-            data = response.json()
-            price = data.get('usdPrice')
-            exchange = data.get('exchangeName', 'Unknown')
+            if response.status_code == 200:
+                data = response.json()
+                price = data.get('usdPrice')
+                exchange = data.get('exchangeName', 'Unknown')
             
-            if price:
-                logger.debug(f"   ✅ ${price:,.4f} (from {exchange})")
-                self.success_count += 1
-                return float(price)
-            else:
-                logger.debug(f"   ❌ No usdPrice in response")
+                if price:
+                    logger.debug(f"   ✅ ${price:,.4f} (from {exchange})")
+                    self.success_count += 1
+                    return float(price)
+                else:
+                    logger.debug(f"   ❌ No usdPrice in response")
+                    return None
+        
+            elif response.status_code == 429:
+                logger.warning("   ⏱️  Moralis rate limited")
+                self.last_error = "Moralis rate limit"
                 return None
         
-        elif response.status_code == 429:
-            logger.warning("   ⏱️  Moralis rate limited")
-            self.last_error = "Moralis rate limit"
-            return None
+            elif response.status_code == 404:
+                logger.debug(f"   ℹ️  Token not found in Moralis")
+                return None
         
-        elif response.status_code == 404:
-            logger.debug(f"   ℹ️  Token not found in Moralis")
-            return None
+            else:
+                logger.debug(f"   ❌ HTTP {response.status_code}")
+                return None
         
-        else:
-            logger.debug(f"   ❌ HTTP {response.status_code}")
+        except requests.exceptions.Timeout:
+            logger.debug(f"   ⏱️  Moralis timeout")
             return None
         
-    except requests.exceptions.Timeout:
-        logger.debug(f"   ⏱️  Moralis timeout")
-        return None
-        
-    except Exception as e:
-        logger.debug(f"   ❌ Moralis error: {e}")
+        except Exception as e:
+            logger.debug(f"   ❌ Moralis error: {e}")
         return None
     
     def _fetch_historical_price(self, token_id: str, date: str, token_address: Optional[str] = None) -> Optional[float]:
@@ -936,7 +984,118 @@ def _fetch_moralis_price(self, token_address: str) -> Optional[float]:
             self.last_error = f"Contract API: {str(e)}"
             self.error_count += 1
             return None
-    
+
+    # ========================================================================
+    # ✨ NEW: RANGE METHODS (one request for many days)
+    # ========================================================================
+
+    def get_daily_price_range(
+        self,
+        token_address: Optional[str],
+        start_date: date,
+        end_date: date,
+        token_symbol: Optional[str] = None
+    ) -> Dict[date, float]:
+        """
+        Fetch one USD price per UTC day for [start_date, end_date].
+
+        Uses CoinGecko market_chart/range (by coin ID or by contract) so a
+        whole window of days costs a single request instead of one
+        /history call per day. For each day the data point closest to
+        00:00 UTC is used, matching what /history returns.
+
+        Args:
+            token_address: Token contract address (None for native ETH)
+            start_date: First UTC day (inclusive)
+            end_date: Last UTC day (inclusive)
+            token_symbol: Token symbol (helps with ID lookup)
+
+        Returns:
+            Dict mapping date → USD price (days without data are omitted)
+        """
+        token_id, lookup_method = self._get_token_id(token_address, token_symbol)
+
+        if token_id:
+            url = f"{self.coingecko_base}/coins/{token_id}/market_chart/range"
+        elif token_address:
+            url = f"{self.coingecko_base}/coins/ethereum/contract/{token_address.lower()}/market_chart/range"
+        else:
+            return {}
+
+        from_ts = int(datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+        to_ts = int(datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc).timestamp())
+
+        params = {
+            'vs_currency': 'usd',
+            'from': from_ts,
+            'to': to_ts
+        }
+
+        self._rate_limit()
+
+        try:
+            logger.debug(
+                f"🌐 CoinGecko range: {token_symbol or token_id or token_address[:10]} "
+                f"{start_date} → {end_date} (method: {lookup_method})"
+            )
+
+            response = self.session.get(url, params=params, timeout=15)
+
+            if response.status_code == 429:
+                logger.warning(f"   ⏱️  RATE LIMITED by CoinGecko!")
+                self.last_error = "Rate limit exceeded (HTTP 429)"
+                self.error_count += 1
+                return {}
+
+            if response.status_code == 404:
+                self.last_error = f"Token not found: {token_id or token_address}"
+                self.error_count += 1
+                return {}
+
+            response.raise_for_status()
+            prices = response.json().get('prices', [])
+
+        except Exception as e:
+            logger.debug(f"   ❌ Range error: {str(e)}")
+            self.last_error = f"Range API: {str(e)}"
+            self.error_count += 1
+            return {}
+
+        # Keep the point closest to midnight for every UTC day
+        daily: Dict[date, float] = {}
+        best_offset: Dict[date, int] = {}
+
+        for ts_ms, price in prices:
+            if not price:
+                continue
+
+            point = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+            day = point.date()
+
+            if day < start_date or day > end_date:
+                continue
+
+            offset = point.hour * 3600 + point.minute * 60 + point.second
+            if day not in best_offset or offset < best_offset[day]:
+                best_offset[day] = offset
+                daily[day] = float(price)
+
+        if token_id:
+            daily = {
+                day: price for day, price in daily.items()
+                if self._validate_price(token_id, price)
+            }
+
+        if daily:
+            self.success_count += 1
+            self.last_error = None
+        else:
+            self.last_error = f"No range data for {token_id or token_address}"
+            self.error_count += 1
+
+        logger.debug(f"   ✅ {len(daily)} daily prices from one range request")
+        return daily
+
     # ========================================================================
     # FALLBACK METHODS
     # ========================================================================
@@ -983,6 +1142,24 @@ def _fetch_moralis_price(self, token_address: str) -> Optional[float]:
     # ✅ NEW: STATISTICS METHODS
     # ========================================================================
     
+    @property
+    def last_error(self) -> Optional[str]:
+        """Error of the last lookup made by the calling thread."""
+        return getattr(self._local, 'last_error', None)
+    
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self._local.last_error = value
+    
+    def call_tracked(self, method: Callable, *args, **kwargs) -> Tuple[Any, Optional[str]]:
+        """
+        Call a lookup method and return its result with the error of exactly
+        this call (None if it succeeded or had no error).
+        """
+        self.last_error = None
+        result = method(*args, **kwargs)
+        return result, self.last_error
+    
     def get_stats(self) -> Dict:
         """Get API call statistics."""
         total_calls = self.success_count + self.error_count
@@ -0,0 +1,42 @@
+"""
+Wallet Hourly Activity Rollup
+=============================
+
+Materialisierte Stunden-Aggregate pro Wallet für Heatmap und Zeitmuster.
+
+✅ FEATURES:
+- Ein Eintrag pro (address, activity_date, hour) - wenige hundert Zeilen pro Wallet
+- day_of_week im Python-Format (0 = Montag) → direkt Heatmap-Index
+- Wird beim Ingest / USD-Enrichment inkrementell gepflegt
+- enriched_count zählt TXs mit usd_value > 0
+"""
+
+from sqlalchemy import Column, String, Float, Integer, SmallInteger, DateTime, Date, PrimaryKeyConstraint, Index
+from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime
+
+Base = declarative_base()
+
+
+class WalletHourlyActivity(Base):
+    __tablename__ = 'wallet_hourly_activity'
+
+    address = Column(String(42), nullable=False)         # Lowercase wallet address
+    activity_date = Column(Date, nullable=False)         # UTC day
+    hour = Column(SmallInteger, nullable=False)          # 0-23
+
+    day_of_week = Column(SmallInteger, nullable=False)   # 0 = Monday ... 6 = Sunday
+
+    tx_count = Column(Integer, nullable=False, default=0)
+    volume_usd = Column(Float, nullable=False, default=0.0)
+    enriched_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('address', 'activity_date', 'hour', name='pk_wallet_hourly_activity'),
+        Index('idx_wallet_hourly_activity_date', 'activity_date'),
+    )
+
+    def __repr__(self):
+        return f"<WalletHourlyActivity {self.address[:10]} {self.activity_date} {self.hour:02d}h: {self.tx_count} txs>"
@@ -0,0 +1,37 @@
+"""
+Historical Price Model
+======================
+
+Persistenter Tagespreis-Cache für die USD-Enrichment-Pipeline.
+
+✅ FEATURES:
+- Ein Eintrag pro (token_key, price_date) - jeder Key wird genau einmal geholt
+- token_key = lowercase Contract-Adresse oder 'ETH' für native Transfers
+- Quelle (range / history / contract / fallback) für Debugging
+"""
+
+from sqlalchemy import Column, String, Float, DateTime, Date, PrimaryKeyConstraint
+from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime
+
+Base = declarative_base()
+
+
+class HistoricalPrice(Base):
+    __tablename__ = 'historical_prices'
+
+    token_key = Column(String(42), nullable=False)  # Contract address (lowercase) or 'ETH'
+    price_date = Column(Date, nullable=False)       # UTC day
+
+    price_usd = Column(Float, nullable=False)
+    token_symbol = Column(String(20), nullable=True)
+    source = Column(String(20), nullable=True)      # 'range', 'history', 'fallback', ...
+
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('token_key', 'price_date', name='pk_historical_prices'),
+    )
+
+    def __repr__(self):
+        return f"<HistoricalPrice {self.token_key[:10]} @ {self.price_date}: ${self.price_usd:,.4f}>"
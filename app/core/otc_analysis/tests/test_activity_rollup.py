@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.otc_analysis.analysis import activity_rollup
+from app.core.otc_analysis.models.activity_rollup import WalletHourlyActivity
+from app.core.otc_analysis.models.transaction import Transaction
+
+
+A = '0x' + 'a' * 40
+B = '0x' + 'b' * 40
+C = '0x' + 'c' * 40
+
+# Montag, 2024-01-01
+START = datetime(2024, 1, 1, 0, 0)
+END = datetime(2024, 1, 7, 23, 59)
+
+
+def make_session():
+    engine = create_engine('sqlite://')
+    Transaction.__table__.create(engine)
+    WalletHourlyActivity.__table__.create(engine)
+    return Session(engine)
+
+
+def add_transfers(db, transfers, rollup=True):
+    rows = []
+    for i, (from_address, to_address, timestamp, usd_value) in enumerate(transfers):
+        db.add(Transaction(
+            tx_hash=f'0x{i:064x}', block_number=i, timestamp=timestamp,
+            from_address=from_address, to_address=to_address,
+            value_decimal=1.0, usd_value=usd_value,
+        ))
+        rows.append({
+            'from_address': from_address, 'to_address': to_address,
+            'timestamp': timestamp, 'usd_value': usd_value,
+        })
+    if rollup:
+        activity_rollup.record_transactions(db, rows)
+    db.commit()
+
+
+TRANSFERS = [
+    (A, B, datetime(2024, 1, 1, 10, 5), 1000.0),   # innerhalb der Menge
+    (A, C, datetime(2024, 1, 1, 10, 30), 500.0),   # nach außen
+    (C, B, datetime(2024, 1, 3, 22, 0), None),     # von außen, ohne USD
+    (A, A, datetime(2024, 1, 3, 22, 15), 10.0),    # Self-Transfer
+]
+
+
+def test_transfer_between_selected_wallets_counts_once():
+    db = make_session()
+    add_transfers(db, TRANSFERS)
+
+    activity = activity_rollup.load_hour_of_week(db, [A, B], START, END)
+
+    assert activity['source'] == 'wallet_hourly_activity'
+    assert activity['count'][0][10] == 2
+    assert activity['volume'][0][10] == 1500.0
+    assert activity['enriched'][0][10] == 2
+    assert activity['count'][2][22] == 2
+    assert activity['volume'][2][22] == 10.0
+    assert activity['enriched'][2][22] == 1
+    assert sum(map(sum, activity['count'])) == 4
+
+    # Für eine einzelne Wallet bleibt alles unverändert
+    single = activity_rollup.load_hour_of_week(db, [B], START, END)
+    assert single['count'][0][10] == 1
+    assert single['count'][2][22] == 1
+
+
+def test_live_fallback_matches_rollups_when_none_exist():
+    with_rollup = make_session()
+    add_transfers(with_rollup, TRANSFERS)
+    without_rollup = make_session()
+    add_transfers(without_rollup, TRANSFERS, rollup=False)
+
+    expected = activity_rollup.load_hour_of_week(with_rollup, [A, B, C], START, END)
+    live = activity_rollup.load_hour_of_week(without_rollup, [A, B, C], START, END)
+
+    assert live['source'] == 'transactions'
+    assert live['rows'] == 4
+    for key in ('count', 'volume', 'enriched'):
+        assert live[key] == expected[key]
+
+
+def test_window_is_applied_at_hour_precision():
+    db = make_session()
+    add_transfers(db, TRANSFERS)
+
+    window_start = datetime(2024, 1, 1, 10, 40)
+    window_end = datetime(2024, 1, 3, 21, 59)
+
+    rolled = activity_rollup.load_hour_of_week(db, [A, B], window_start, window_end)
+    live = activity_rollup.load_hour_of_week_live(db, [A, B], window_start, window_end)
+
+    assert rolled['count'][0][10] == 2
+    assert sum(map(sum, rolled['count'])) == 2
+    assert live['count'] == rolled['count']
@@ -0,0 +1,113 @@
+from app.core.otc_analysis.blockchain.block_scanner import BlockScanner
+from app.core.otc_analysis.workers import block_indexer
+
+
+class FakeNode:
+    """Liefert Blöcke mit je einer Transaktion; `missing` Blöcke schlagen fehl"""
+
+    def __init__(self, latest=100, missing=()):
+        self.latest = latest
+        self.missing = set(missing)
+        self.fetched = []
+
+    def _block(self, number):
+        if number in self.missing:
+            return None
+        self.fetched.append(number)
+        return {
+            'number': number,
+            'timestamp': 1_700_000_000 + number * 12,
+            'transactions': [{
+                'hash': f'0x{number:064x}',
+                'from': '0x' + '1' * 40,
+                'to': '0x' + '2' * 40,
+                'value': 10 ** 18,
+                'gas': 21000,
+                'gasPrice': 1,
+                'input': '0x'
+            }]
+        }
+
+    def get_blocks(self, numbers):
+        return {n: self._block(n) for n in numbers}
+
+    def get_block(self, number):
+        return self._block(number)
+
+    def get_codes(self, addresses):
+        return {a: '0x' for a in addresses}
+
+    def from_wei(self, value, unit):
+        return value / 10 ** 18
+
+    def get_latest_block_number(self):
+        return self.latest
+
+
+def make_scanner(tmp_path, node):
+    return BlockScanner(node, checkpoint_path=str(tmp_path / 'checkpoint.json'))
+
+
+def test_checkpoint_at_range_end_skips_the_range(tmp_path):
+    node = FakeNode()
+    scanner = make_scanner(tmp_path, node)
+
+    first = scanner.scan_range(10, 20, batch_size=3, max_concurrency=2)
+    assert first['blocks_scanned'] == 11
+    assert scanner.load_checkpoint() == 20
+
+    node.fetched.clear()
+    again = scanner.scan_range(10, 20, batch_size=3, max_concurrency=2)
+    assert again['blocks_scanned'] == 0
+    assert node.fetched == []
+
+    # Bereich endet vor dem Checkpoint: ebenfalls erledigt, Checkpoint bleibt
+    scanner.scan_range(12, 15)
+    assert node.fetched == []
+    assert scanner.load_checkpoint() == 20
+
+
+def test_failed_blocks_are_retried_after_the_checkpoint_passed_the_range(tmp_path):
+    node = FakeNode(missing={14})
+    scanner = make_scanner(tmp_path, node)
+
+    stats = scanner.scan_range(10, 20)
+    assert stats['failed_blocks'] == [14]
+    assert scanner.load_failed_blocks() == [14]
+
+    node.missing.clear()
+    node.fetched.clear()
+    stats = scanner.scan_range(10, 20)
+    assert node.fetched == [14]
+    assert stats['transactions'] == 1
+    assert scanner.load_failed_blocks() == []
+
+
+def test_indexer_streams_windows_into_the_bulk_sink(tmp_path, monkeypatch):
+    node = FakeNode(latest=62, missing={45})
+    scanner = make_scanner(tmp_path, node)
+    scanner.save_checkpoint(39)
+
+    written = []
+
+    def fake_sink(session_factory, chain='ethereum', chain_id=1):
+        return lambda transactions: written.append([tx['block_number'] for tx in transactions])
+
+    monkeypatch.setattr(block_indexer, 'bulk_ingest_sink', fake_sink)
+
+    stats = block_indexer.index_to_head(scanner, session_factory=object, confirmations=2, batch_size=5, max_concurrency=2)
+
+    # 40-60 in Fenstern zu 10 Blöcken, Block 45 fehlgeschlagen
+    assert (stats['from_block'], stats['to_block']) == (40, 60)
+    assert [len(window) for window in written] == [9, 10, 1]
+    assert sorted(n for window in written for n in window) == [n for n in range(40, 61) if n != 45]
+    assert scanner.load_checkpoint() == 60
+
+    # Nächster Lauf: nur der fehlgeschlagene Block
+    node.missing.clear()
+    written.clear()
+    block_indexer.index_to_head(scanner, session_factory=object, confirmations=2)
+    assert written == [[45]]
+
+    # Nichts Neues mehr
+    assert block_indexer.index_to_head(scanner, session_factory=object, confirmations=2) is None
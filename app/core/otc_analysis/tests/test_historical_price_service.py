@@ -0,0 +1,95 @@
+import threading
+from datetime import date
+
+from app.core.otc_analysis.data_sources.historical_price_service import HistoricalPriceService
+from app.core.otc_analysis.data_sources.price_oracle import PriceOracle
+
+
+TOKEN = '0x00000000000000000000000000000000000000aa'
+OTHER = '0x00000000000000000000000000000000000000bb'
+DAYS = [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)]
+
+
+class ScriptedOracle(PriceOracle):
+    """Range-Antworten pro Token: dict mit Preisen oder ein Fehlertext"""
+
+    def __init__(self, ranges):
+        super().__init__()
+        self.ranges = ranges
+        self.single_calls = []
+
+    def get_daily_price_range(self, token_address, start, end, token_symbol=None):
+        answer = self.ranges[token_address]
+        if callable(answer):
+            answer = answer()
+        if isinstance(answer, str):
+            self.last_error = answer
+            return {}
+        return answer
+
+    def get_historical_price(self, token_address, timestamp, token_symbol=None):
+        self.single_calls.append((token_address, timestamp.date()))
+        return 42.0
+
+
+def test_rate_limited_range_skips_per_day_fallback_and_retries_later():
+    oracle = ScriptedOracle({TOKEN: "Rate limit exceeded (HTTP 429)"})
+    service = HistoricalPriceService(oracle)
+    keys = [(TOKEN, day) for day in DAYS]
+
+    prices = service.resolve_prices(keys, symbols={TOKEN: 'AAA'})
+
+    assert prices == {key: None for key in keys}
+    assert oracle.single_calls == []
+    assert service.stats['rate_limit_hits'] == 1
+    assert service.get_stats()['known_misses'] == 0
+
+    # Nächster Batch: Range-Endpoint wieder verfügbar
+    oracle.ranges[TOKEN] = {day: 2.0 for day in DAYS}
+    assert service.resolve_prices(keys, symbols={TOKEN: 'AAA'}) == {key: 2.0 for key in keys}
+
+
+def test_confirmed_range_miss_still_uses_per_day_fallback():
+    oracle = ScriptedOracle({TOKEN: f"No range data for {TOKEN}"})
+    service = HistoricalPriceService(oracle)
+
+    prices = service.resolve_prices([(TOKEN, day) for day in DAYS], symbols={TOKEN: 'AAA'})
+
+    assert set(prices.values()) == {42.0}
+    assert sorted(day for _, day in oracle.single_calls) == DAYS
+
+
+def test_concurrent_syncs_do_not_see_each_others_oracle_errors():
+    error_set = threading.Event()
+    other_done = threading.Event()
+
+    def rate_limited():
+        oracle.last_error = "Rate limit exceeded (HTTP 429)"
+        error_set.set()
+        other_done.wait(5)
+        return {}
+
+    def healthy():
+        error_set.wait(5)
+        return {day: 3.0 for day in DAYS}
+
+    oracle = ScriptedOracle({TOKEN: rate_limited, OTHER: healthy})
+    service = HistoricalPriceService(oracle)
+    results = {}
+
+    def sync(token):
+        results[token] = service.resolve_prices([(token, day) for day in DAYS], symbols={token: 'X'})
+        if token == OTHER:
+            other_done.set()
+
+    threads = [threading.Thread(target=sync, args=(token,)) for token in (TOKEN, OTHER)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    # Nur der rate-limitierte Sync zählt den Fehler, der andere bekommt seine Preise
+    assert service.stats['rate_limit_hits'] == 1
+    assert set(results[OTHER].values()) == {3.0}
+    assert set(results[TOKEN].values()) == {None}
+    assert oracle.single_calls == []
@@ -0,0 +1,105 @@
+import asyncio
+
+from app.core.otc_analysis.blockchain.live_feed import LiveTransferFeed
+from app.core.otc_analysis.data_sources.price_oracle import PriceOracle
+
+
+USDC = '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'
+UNLISTED = '0x00000000000000000000000000000000000000aa'
+DESK = '0x00000000000000000000000000000000000000d1'
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.status_code = 200
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class FakeCoinGecko:
+    """Antwortet wie CoinGecko /simple/price bzw. /simple/token_price"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(url)
+        if url.endswith('/simple/price'):
+            return FakeResponse({'usd-coin': {'usd': 1.0}} if params['ids'] == 'usd-coin' else {})
+        if url.endswith('/simple/token_price/ethereum'):
+            return FakeResponse({UNLISTED: {'usd': 2.5}} if params['contract_addresses'] == UNLISTED else {})
+        raise AssertionError(url)
+
+
+class Registry:
+    def get_all_otc_addresses(self):
+        return [DESK]
+
+
+def make_oracle():
+    oracle = PriceOracle(moralis_api_key='')
+    oracle.moralis_api_key = None
+    oracle.rate_limit_delay = 0
+    oracle.session = FakeCoinGecko()
+    return oracle
+
+
+def erc20_payload(contract, amount, to=DESK):
+    return {
+        'block': {'timestamp': '1700000000'},
+        'erc20Transfers': [{
+            'transactionHash': f"0x{contract[-4:]}{amount}",
+            'logIndex': '1',
+            'from': '0x00000000000000000000000000000000000000f1',
+            'to': to,
+            'contract': contract,
+            'tokenSymbol': 'TKN',
+            'valueWithDecimals': str(amount),
+        }],
+    }
+
+
+def run_feed(oracle, payloads):
+    events = []
+
+    async def broadcast(event_type, event):
+        events.append(event)
+
+    async def run():
+        feed = LiveTransferFeed(oracle, Registry(), broadcast)
+        await feed.refresh_desks(force=True)
+        for payload in payloads:
+            feed.ingest_webhook(payload)
+        while not feed.queue.empty():
+            await feed._process(feed.queue.get_nowait())
+        return feed
+
+    return asyncio.run(run()), events
+
+
+def test_erc20_transfers_are_priced_and_broadcast():
+    feed, events = run_feed(make_oracle(), [
+        erc20_payload(USDC, 250_000),
+        erc20_payload(UNLISTED, 20_000),
+    ])
+
+    assert [(e['token'], e['price_usd'], e['usd_value'], e['type']) for e in events] == [
+        (USDC, 1.0, 250_000.0, 'new_large_transfer'),
+        (UNLISTED, 2.5, 50_000.0, 'desk_interaction'),
+    ]
+    assert feed.stats['unpriced'] == 0
+
+
+def test_unknown_price_is_not_replaced_by_a_constant():
+    oracle = make_oracle()
+    assert oracle.get_eth_price_live() is None
+
+    feed, events = run_feed(oracle, [erc20_payload('0x00000000000000000000000000000000000000bb', 1_000_000)])
+
+    assert events == []
+    assert feed.stats['unpriced'] == 1
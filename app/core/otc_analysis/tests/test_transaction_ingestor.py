@@ -0,0 +1,100 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.otc_analysis.analysis import activity_rollup
+from app.core.otc_analysis.blockchain.transaction_ingestor import (
+    bulk_upsert_transactions,
+    normalize_transactions,
+)
+from app.core.otc_analysis.models.activity_rollup import WalletHourlyActivity
+from app.core.otc_analysis.models.transaction import Transaction
+
+
+A = '0x' + 'a' * 40
+B = '0x' + 'b' * 40
+
+
+def make_session():
+    engine = create_engine('sqlite://')
+    Transaction.__table__.create(engine)
+    WalletHourlyActivity.__table__.create(engine)
+    return Session(engine)
+
+
+def make_transfer(i, usd=None, **extra):
+    tx = {
+        'hash': f'0x{i:064x}', 'blockNumber': str(100 + i), 'timestamp': datetime(2024, 1, 1, 10, i),
+        'from': A.upper(), 'to': B, 'value': str(10 ** 18), 'value_usd': usd,
+    }
+    tx.update(extra)
+    return tx
+
+
+def rollup_counts(db):
+    return db.execute(
+        select(WalletHourlyActivity.address, WalletHourlyActivity.tx_count,
+               WalletHourlyActivity.volume_usd, WalletHourlyActivity.enriched_count)
+        .order_by(WalletHourlyActivity.address)
+    ).all()
+
+
+def test_normalize_skips_spam_and_keeps_the_priced_duplicate():
+    batch = normalize_transactions([
+        make_transfer(1),
+        make_transfer(1, usd=2_000_000),
+        make_transfer(2, value=str(10 ** 30)),
+        {'value': '1'},
+    ])
+
+    assert len(batch) == 1
+    assert batch.skipped == 3
+    row = batch.rows()[0]
+    assert row['from_address'] == A
+    assert row['value_decimal'] == 1.0
+    assert (row['usd_value'], row['otc_score'], row['is_suspected_otc']) == (2_000_000, 1.0, True)
+
+
+def test_resync_only_fills_missing_usd_values_and_rolls_up_once():
+    db = make_session()
+
+    first = bulk_upsert_transactions(db, normalize_transactions([make_transfer(1), make_transfer(2, usd=50.0)]))
+    second = bulk_upsert_transactions(db, normalize_transactions([
+        make_transfer(1, usd=200.0),   # Nachträglich bepreist
+        make_transfer(2, usd=999.0),   # Hat schon einen Wert → bleibt
+        make_transfer(3),
+    ]))
+
+    assert (first['inserted'], first['updated'], first['unchanged']) == (2, 0, 0)
+    assert (second['inserted'], second['updated'], second['unchanged']) == (1, 1, 1)
+
+    usd = dict(db.execute(select(Transaction.tx_hash, Transaction.usd_value)).all())
+    assert usd == {f'0x{1:064x}': 200.0, f'0x{2:064x}': 50.0, f'0x{3:064x}': None}
+
+    # Drei TXs gezählt, Volumen aus Insert + Enrichment, nichts doppelt
+    assert rollup_counts(db) == [(A, 3, 250.0, 2), (B, 3, 250.0, 2)]
+
+
+def test_bad_row_is_isolated_from_the_rest_of_the_chunk():
+    db = make_session()
+    batch = normalize_transactions([make_transfer(i) for i in range(5)])
+    batch.columns['timestamp'][3] = None
+
+    result = bulk_upsert_transactions(db, batch, chunk_size=4)
+
+    assert (result['inserted'], result['failed']) == (4, 1)
+    assert result['errors'][0].startswith(f'0x{3:064x}')
+    assert len(db.execute(select(Transaction.tx_hash)).scalars().all()) == 4
+    assert rollup_counts(db) == [(A, 4, 0.0, 0), (B, 4, 0.0, 0)]
+
+
+def test_unsupported_dialect_raises_value_error():
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name='mysql')))
+
+    with pytest.raises(ValueError, match="mysql"):
+        bulk_upsert_transactions(db, normalize_transactions([make_transfer(1)]))
+    with pytest.raises(ValueError, match="mysql"):
+        activity_rollup.record_transactions(db, normalize_transactions([make_transfer(1)]).rows())
@@ -21,6 +21,7 @@ from app.core.price_movers.collectors import ExchangeCollector, ExchangeCollecto
 from app.core.price_movers.services import PriceMoverAnalyzer
 from app.core.price_movers.utils.constants import SUPPORTED_EXCHANGES
 from app.core.price_movers.collectors.unified_collector import UnifiedCollector
+from app.core.price_movers.collectors.trade_tape import get_trade_tape
 
 logger = logging.getLogger(__name__)
 
@@ -163,7 +164,8 @@ async def get_unified_collector() -> UnifiedCollector:
             dexscreener_collector=dex_collectors_dict.get('dexscreener'),
             moralis_collector=dex_collectors_dict.get('moralis'),
             birdeye_collector=dex_collectors_dict.get('birdeye'),
-            cex_credentials=cex_creds
+            cex_credentials=cex_creds,
+            trade_tape=get_trade_tape()
         )
         
         _unified_collector_instance = collector
@@ -186,7 +188,10 @@ async def get_unified_collector() -> UnifiedCollector:
         
         # Fallback: Create minimal UnifiedCollector
         logger.warning("⚠️ Creating FALLBACK UnifiedCollector (CEX only)")
-        collector = UnifiedCollector(cex_credentials={'binance': {'api_key': '', 'api_secret': ''}})
+        collector = UnifiedCollector(
+            cex_credentials={'binance': {'api_key': '', 'api_secret': ''}},
+            trade_tape=get_trade_tape()
+        )
         _unified_collector_instance = collector
         return collector
 
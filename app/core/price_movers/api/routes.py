@@ -10,12 +10,15 @@ Neue Endpoints für interaktiven Candlestick Chart:
 - GET /api/v1/chart/candles - Candlestick-Daten für Chart
 - GET /api/v1/chart/candle/{timestamp}/movers - Price Movers für spezifische Candle
 - POST /api/v1/chart/batch-analyze - Batch-Analyse für mehrere Candles
+- WS /api/v1/chart/movers/live - Live Top-K Movers der offenen Candle
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 
 from app.core.price_movers.api.test_schemas import (
     CandleData,
@@ -31,7 +34,9 @@ from app.core.price_movers.api.dependencies import (
     log_request,
 )
 from app.core.price_movers.collectors import ExchangeCollector
+from app.core.price_movers.collectors.candle_store import TIMEFRAME_SECONDS
 from app.core.price_movers.services import PriceMoverAnalyzer
+from app.core.price_movers.services.streaming_movers import acquire_mover_engine, release_mover_engine
 from pydantic import BaseModel, Field
 
 
@@ -742,5 +747,54 @@ async def check_data_availability(
     }
 
 
+# ==================== LIVE MOVERS ====================
+
+@router.websocket("/movers/live")
+async def live_movers_websocket(
+    websocket: WebSocket,
+    exchange: ExchangeEnum = Query(..., description="Exchange"),
+    symbol: str = Query(..., description="Trading pair"),
+    timeframe: TimeframeEnum = Query(TimeframeEnum.FIVE_MIN, description="Candle timeframe"),
+    top_k: int = Query(10, ge=1, le=100, description="Anzahl Movers"),
+    interval: float = Query(1.0, ge=0.2, le=60, description="Update-Intervall in Sekunden")
+):
+    """
+    ## Live Price Movers der offenen Candle
+    
+    Pusht alle `interval` Sekunden (nur bei neuen Trades) das aktuelle Top-K
+    nach Impact, plus das finale Top-K jeder geschlossenen Candle
+    (`closed: true`). Alle Clients eines (exchange, symbol) teilen sich
+    eine Upstream-Verbindung und eine Engine.
+    """
+    timeframe_seconds = TIMEFRAME_SECONDS[timeframe.value]
+    await websocket.accept()
+    
+    engine = acquire_mover_engine(exchange.value, symbol, timeframe_seconds)
+    sent_trades = -1
+    sent_closed = engine.stats['candles_closed']
+    
+    try:
+        while True:
+            if engine.stats['candles_closed'] != sent_closed:
+                sent_closed = engine.stats['candles_closed']
+                if engine.closed:
+                    await websocket.send_json(jsonable_encoder(engine.closed[-1]))
+            
+            if engine.stats['trades'] != sent_trades:
+                sent_trades = engine.stats['trades']
+                await websocket.send_json(jsonable_encoder(engine.snapshot(top_k)))
+            
+            try:
+                # Client-Messages werden ignoriert; Receive erkennt Disconnects
+                await asyncio.wait_for(websocket.receive_text(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    except WebSocketDisconnect:
+        logger.info(f"Live movers client disconnected ({exchange.value} {symbol})")
+    finally:
+        release_mover_engine(exchange.value, symbol, timeframe_seconds)
+
+
 # Export Router
 __all__ = ['router']
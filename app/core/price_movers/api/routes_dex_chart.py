@@ -5,12 +5,13 @@ Historical from CEX + Current from DEX
 
 import os
 import time
+import hashlib
 import logging
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
 
-from fastapi import APIRouter, Query, Depends, HTTPException, status
+from fastapi import APIRouter, Query, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 
 from app.core.price_movers.api.test_schemas import (
@@ -22,6 +23,10 @@ from app.core.price_movers.api.dependencies import (
     log_request,
 )
 from app.core.price_movers.services.impact_calculator import ImpactCalculator  # ✅ NEU!
+from app.core.price_movers.services.candle_service import (
+    TIMEFRAME_SECONDS,
+    get_candle_service,
+)
 
 try:
     from app.core.price_movers.utils.validators import validate_dex_params
@@ -35,6 +40,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/dex", tags=["DEX Charts"])
 
+# Maximal ausgelieferte geschlossene Candles pro Request (neueste zuerst abgeschnitten)
+MAX_CHART_CANDLES = 1000
+
 
 # ==================== Models ====================
 
@@ -173,6 +181,17 @@ async def fetch_current_dex_candle(
     return None, "none"
 
 
+def _candles_etag(candles: List[ChartCandleWithImpact], data_source: str) -> str:
+    """Weak ETag over candle values (independent of performance_ms)"""
+    digest = hashlib.sha1(data_source.encode())
+    for candle in candles:
+        digest.update(
+            f"{candle.timestamp.isoformat()}|{candle.open}|{candle.high}|"
+            f"{candle.low}|{candle.close}|{candle.volume}".encode()
+        )
+    return f'W/"{digest.hexdigest()}"'
+
+
 # ==================== Main Routes ====================
 
 @router.get(
@@ -183,12 +202,15 @@ async def fetch_current_dex_candle(
     description="🚀 Fast & Reliable: 99 candles from CEX + 1 current candle from DEX with real wallets"
 )
 async def get_dex_chart_candles(
+    request: Request,
+    response: Response,
     dex_exchange: str = Query(..., description="DEX (jupiter/raydium/orca)"),
     symbol: str = Query(..., description="Token pair (e.g., SOL/USDT)"),
     timeframe: TimeframeEnum = Query(..., description="Candle timeframe"),
     start_time: datetime = Query(..., description="Start time"),
     end_time: datetime = Query(..., description="End time"),
     include_impact: bool = Query(default=False, description="Calculate impact (only for current candle)"),
+    since: Optional[datetime] = Query(default=None, description="Only candles at/after this time (incremental polling)"),
     request_id: str = Depends(log_request)
 ) -> DEXChartCandlesResponse:
     """
@@ -212,6 +234,11 @@ async def get_dex_chart_candles(
     **Performance:**
     - Old: ~90s (100 DEX requests)
     - New: ~1s (99 CEX + 1 DEX)
+    - Geschlossene Candles aus dem CandleService (nur Lücken via CEX)
+    
+    **Polling:**
+    - `since=` liefert nur Candles ab diesem Zeitpunkt
+    - `ETag` / `If-None-Match` → 304 wenn sich nichts geändert hat
     """
     start_perf = time.time()
     
@@ -238,77 +265,60 @@ async def get_dex_chart_candles(
         time_range_hours = (end_time - start_time).total_seconds() / 3600
         is_recent = (datetime.now(timezone.utc) - end_time).total_seconds() < 3600
         
-        timeframe_seconds = {
-            '1m': 60, '5m': 300, '15m': 900, '30m': 1800,
-            '1h': 3600, '4h': 14400, '1d': 86400,
-        }.get(str(timeframe.value), 300)
-        
-        num_candles = int((end_time - start_time).total_seconds() / timeframe_seconds)
+        timeframe_seconds = TIMEFRAME_SECONDS.get(str(timeframe.value), 300)
         
         # ==================== STRATEGY: CEX for Historical ====================
-
+        # Geschlossene Candles kommen aus dem CandleService (persistiert, nur Lücken
+        # werden per ccxt nachgeladen). Die offene Candle wird NIE gespeichert.
+        # Fenster ≤ 1h zeigen wie bisher nur die aktuelle DEX-Candle.
+        
         if time_range_hours > 1:
             logger.info(f"📊 Strategy: CEX Historical ({time_range_hours:.1f}h)")
             
-            # ✅ PRIORITÄT: Bitget vor Binance
-            cex_exchange = None
-            ccxt_exchange = None
-            
-            # 1. Versuche zuerst Bitget
-            if 'bitget' in unified_collector.cex_collectors:
-                cex_exchange = 'bitget'
-                ccxt_exchange = unified_collector.cex_collectors['bitget']
-                logger.info("✅ Using Bitget for historical data")
-            
-            # 2. Fallback zu Binance nur wenn Bitget nicht verfügbar
-            elif 'binance' in unified_collector.cex_collectors:
-                cex_exchange = 'binance'
-                ccxt_exchange = unified_collector.cex_collectors['binance']
-                logger.info("⚠️ Using Binance (Bitget not available)")
-            
-            # 3. Versuche Kraken als letzten Fallback
-            elif 'kraken' in unified_collector.cex_collectors:
-                cex_exchange = 'kraken'
-                ccxt_exchange = unified_collector.cex_collectors['kraken']
-                logger.info("⚠️ Using Kraken (Bitget and Binance not available)")
+            # ✅ PRIORITÄT: Bitget vor Binance vor Kraken
+            cex_exchange = next(
+                (name for name in ('bitget', 'binance', 'kraken') if name in unified_collector.cex_collectors),
+                None
+            )
             
-            if ccxt_exchange:
+            if cex_exchange:
                 try:
+                    ccxt_exchange = unified_collector.cex_collectors[cex_exchange]
                     cex_symbol = get_cex_symbol(base_token, quote_token, cex_exchange)
-                    logger.info(f"Fetching {num_candles - 1} candles from {cex_exchange}...")
-                    
-                    # CCXT batch fetch
-                    since = int(start_time.timestamp() * 1000)
-                    limit = min(num_candles, 100)
-                    
-                    ohlcv_data = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: ccxt_exchange.fetch_ohlcv(
-                            cex_symbol,
-                            str(timeframe.value),
-                            since,
-                            limit
-                        )
+                
+                    end_ts = int(end_time.timestamp())
+                    start_ts = max(
+                        int(start_time.timestamp()),
+                        end_ts - MAX_CHART_CANDLES * timeframe_seconds
                     )
-                    
-                    # Convert to candle format (skip last candle)
-                    for candle_data in ohlcv_data[:-1]:
+                    if since is not None:
+                        start_ts = max(start_ts, int(since.timestamp()))
+                
+                    closed_candles = await get_candle_service().get_closed_candles(
+                        source=cex_exchange,
+                        ccxt_exchange=ccxt_exchange,
+                        symbol=cex_symbol,
+                        timeframe=str(timeframe.value),
+                        start_ts=start_ts,
+                        end_ts=end_ts
+                    )
+                
+                    for ts, open_, high, low, close, volume in closed_candles:
                         candles_data.append({
-                            'timestamp': datetime.fromtimestamp(candle_data[0] / 1000, tz=timezone.utc),
-                            'open': float(candle_data[1]),
-                            'high': float(candle_data[2]),
-                            'low': float(candle_data[3]),
-                            'close': float(candle_data[4]),
-                            'volume': float(candle_data[5]),
+                            'timestamp': datetime.fromtimestamp(ts, tz=timezone.utc),
+                            'open': open_,
+                            'high': high,
+                            'low': low,
+                            'close': close,
+                            'volume': volume,
                         })
-                    
-                    logger.info(f"✅ CEX Historical: {len(candles_data)} candles from {cex_exchange}")
+                
+                    logger.info(f"✅ CEX Historical: {len(candles_data)} closed candles from {cex_exchange}")
                     data_source = f"cex_{cex_exchange}"
                     data_quality = "historical_reliable"
-                    
+                
                 except Exception as e:
                     logger.error(f"CEX historical failed ({cex_exchange}): {e}", exc_info=True)
-                    # Fallback logic stays the same...
             else:
                 logger.warning("⚠️ No CEX collectors available for historical data")
         
@@ -368,9 +378,15 @@ async def get_dex_chart_candles(
             )
             chart_candles.append(chart_candle)
         
+        etag = _candles_etag(chart_candles, data_source)
+        if request.headers.get('if-none-match') == etag:
+            logger.info(f"[{request_id}] ♻️ Not modified ({len(chart_candles)} candles)")
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response.headers['ETag'] = etag
+        
         performance_ms = (time.time() - start_perf) * 1000
         
-        response = DEXChartCandlesResponse(
+        chart_response = DEXChartCandlesResponse(
             symbol=symbol,
             dex_exchange=dex_exchange,
             blockchain=blockchain,
@@ -388,7 +404,7 @@ async def get_dex_chart_candles(
             f"(source: {data_source}, quality: {data_quality}) in {performance_ms:.0f}ms"
         )
         
-        return response
+        return chart_response
         
     except HTTPException:
         raise
@@ -503,7 +519,7 @@ async def get_dex_candle_movers(
         candle_obj = HybridCandle(**current_candle)
 
         dex_movers = await analyzer._analyze_dex_trades(
-            trades=trades_result.get('trades', []),
+            trades=trades_result.get('batch') or trades_result.get('trades', []),
             candle=candle_obj,
             symbol=symbol,
             exchange=dex_exchange,
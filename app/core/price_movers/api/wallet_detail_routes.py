@@ -10,6 +10,7 @@ Neue Features:
 - 🔍 ENHANCED DEBUG LOGGING for troubleshooting
 """
 
+import asyncio
 import logging
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta, timezone
@@ -17,6 +18,8 @@ from fastapi import APIRouter, HTTPException, Depends, status, Query
 from pydantic import BaseModel, Field
 import json
 
+import numpy as np
+
 from app.core.price_movers.api.test_schemas import (
     ExchangeEnum,
     ErrorResponse,
@@ -26,6 +29,8 @@ from app.core.price_movers.api.dependencies import (
     get_unified_collector,
     log_request,
 )
+from app.core.price_movers.collectors.trade_batch import SIDE_BUY, SIDE_SELL, TradeBatch
+from app.core.price_movers.collectors.trade_tape import to_epoch
 from app.core.price_movers.utils.constants import (
     BLOCKCHAIN_EXPLORERS,
     BlockchainNetwork
@@ -377,74 +382,63 @@ async def get_enhanced_wallet_details(
                     ('6h', timedelta(hours=6)),
                 ]
                 
+                window_end = datetime.now(timezone.utc)
+                candle_window = None
+                
+                # Use candle timestamp if provided
+                if candle_timestamp and timeframe_minutes:
+                    try:
+                        candle_time = datetime.fromisoformat(candle_timestamp.replace('Z', '+00:00'))
+                        candle_window = (
+                            candle_time - timedelta(minutes=timeframe_minutes * 2),
+                            candle_time + timedelta(minutes=timeframe_minutes * 2)
+                        )
+                        logger.info(f"🎯 Using candle-based time: {candle_window[0].strftime('%H:%M')} - {candle_window[1].strftime('%H:%M')}")
+                    except:
+                        pass
+                
+                # Ranges are nested → fetch the widest once (stored in the trade tape),
+                # then look up the wallet per range from the tape's wallet index
+                if candle_window:
+                    fetch_start, fetch_end = candle_window
+                else:
+                    fetch_start, fetch_end = window_end - time_ranges[-1][1], window_end
+                
+                trades_result = await unified_collector.fetch_trades(
+                    exchange=exchange.lower(),
+                    symbol=symbol,
+                    start_time=fetch_start,
+                    end_time=fetch_end,
+                    limit=10000
+                )
+                all_trades = trades_result.get('trades', [])
+                logger.info(f"📊 Fetched {len(all_trades)} total trades ({fetch_start.strftime('%H:%M')} - {fetch_end.strftime('%H:%M')})")
+                logger.info(f"🔍 Looking for: {wallet_identifier[:16]}...")
+                
+                tape = getattr(unified_collector, 'trade_tape', None)
+                if tape is None:
+                    batch = trades_result.get('batch') or TradeBatch.from_trades(all_trades)
+                    wallet_mask = batch.wallet_mask(wallet_identifier)
+                
                 for range_label, time_delta in time_ranges:
-                    end_time = datetime.now(timezone.utc)
-                    start_time = end_time - time_delta
-                    
-                    # Use candle timestamp if provided
-                    if candle_timestamp and timeframe_minutes:
-                        try:
-                            candle_time = datetime.fromisoformat(candle_timestamp.replace('Z', '+00:00'))
-                            start_time = candle_time - timedelta(minutes=timeframe_minutes * 2)
-                            end_time = candle_time + timedelta(minutes=timeframe_minutes * 2)
-                            logger.info(f"🎯 Using candle-based time: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
-                        except:
-                            pass
-                    
-                    logger.info(f"🔍 Trying {range_label}: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
-                    
-                    trades_result = await unified_collector.fetch_trades(
-                        exchange=exchange.lower(),
-                        symbol=symbol,
-                        start_time=start_time,
-                        end_time=end_time,
-                        limit=10000
-                    )
+                    start_time, end_time = candle_window or (window_end - time_delta, window_end)
                     
-                    all_trades = trades_result.get('trades', [])
-                    logger.info(f"📊 Fetched {len(all_trades)} total trades in {range_label}")
-                    
-                    # 🔍 DEBUG: Sample wallets in all_trades
-                    if all_trades:
-                        sample_wallets = set()
-                        for trade in all_trades[:20]:
-                            w = (
-                                trade.get('wallet_address') or 
-                                trade.get('wallet_id') or
-                                trade.get('fromUserAccount') or
-                                trade.get('toUserAccount') or
-                                'unknown'
-                            )
-                            if w != 'unknown':
-                                sample_wallets.add(w[:16] + '...')
-                        
-                        logger.info(f"🔍 Sample wallets in {len(all_trades)} trades (first 10):")
-                        for sw in list(sample_wallets)[:10]:
-                            logger.info(f"   - {sw}")
-                        
-                        logger.info(f"🔍 Looking for: {wallet_identifier[:16]}...")
-                    
-                    # Filter for wallet
-                    wallet_trades = []
-                    for trade in all_trades:
-                        trade_wallet = (
-                            trade.get('wallet_address') or 
-                            trade.get('wallet_id') or
-                            trade.get('fromUserAccount') or
-                            trade.get('toUserAccount')
+                    if tape is not None:
+                        wallet_trades = await asyncio.to_thread(
+                            tape.query,
+                            exchange.lower(),
+                            symbol,
+                            to_epoch(start_time),
+                            to_epoch(end_time),
+                            wallet_identifier
                         )
-                        
-                        # 🔍 DEBUG: Log matching attempts
-                        if trade_wallet:
-                            logger.debug(f"Comparing: {trade_wallet[:16]}... == {wallet_identifier[:16]}...")
-                        
-                        if trade_wallet == wallet_identifier:
-                            wallet_trades.append(trade)
-                            logger.info(f"✅ MATCH FOUND! Trade wallet: {trade_wallet[:16]}...")
+                    else:
+                        in_window = batch.in_window(to_epoch(start_time), to_epoch(end_time))
+                        wallet_trades = [batch.rows[i] for i in np.flatnonzero(wallet_mask & in_window)]
                     
                     logger.info(f"✅ Found {len(wallet_trades)} trades for wallet in {range_label}")
                     
-                    if len(wallet_trades) >= 5:
+                    if len(wallet_trades) >= 5 or candle_window:
                         logger.info(f"✅ Sufficient trades in {range_label}, stopping search")
                         break
             
@@ -483,56 +477,36 @@ async def get_enhanced_wallet_details(
         # ==================== CALCULATE STATISTICS ====================
         
         if wallet_trades:
-            # Detect trade_type field (can be 'side' or 'trade_type')
-            buy_trades = []
-            sell_trades = []
-            
-            for t in wallet_trades:
-                tt = (t.get('trade_type') or t.get('side', '')).lower()
-                if tt == 'buy':
-                    buy_trades.append(t)
-                elif tt == 'sell':
-                    sell_trades.append(t)
+            # Columnar stats (side = 'trade_type' or 'side' field)
+            stats_batch = TradeBatch.from_trades(wallet_trades, with_wallets=False)
+            buy_count = int((stats_batch.side == SIDE_BUY).sum())
+            sell_count = int((stats_batch.side == SIDE_SELL).sum())
             
-            total_volume = sum(t.get('amount', 0) for t in wallet_trades)
-            total_value_usd = sum(t.get('amount', 0) * t.get('price', 0) for t in wallet_trades)
+            total_volume = float(stats_batch.amount.sum())
+            trade_values = stats_batch.amount * stats_batch.price
+            total_value_usd = float(trade_values.sum())
             
-            trade_values = [t.get('amount', 0) * t.get('price', 0) for t in wallet_trades if t.get('amount') and t.get('price')]
-            largest_trade = max(trade_values) if trade_values else 0.0
-            smallest_trade = min(trade_values) if trade_values else 0.0
+            priced = trade_values[(stats_batch.amount != 0) & (stats_batch.price != 0)]
+            largest_trade = float(priced.max()) if len(priced) else 0.0
+            smallest_trade = float(priced.min()) if len(priced) else 0.0
             
             # Time range
-            timestamps = [t.get('timestamp') for t in wallet_trades if t.get('timestamp')]
-            if timestamps:
-                parsed_timestamps = []
-                for ts in timestamps:
-                    if isinstance(ts, str):
-                        try:
-                            parsed_timestamps.append(datetime.fromisoformat(ts.replace('Z', '+00:00')))
-                        except:
-                            pass
-                    elif isinstance(ts, datetime):
-                        parsed_timestamps.append(ts)
-                
-                if parsed_timestamps:
-                    first_seen = min(parsed_timestamps)
-                    last_seen = max(parsed_timestamps)
-                    active_hours = (last_seen - first_seen).total_seconds() / 3600
-                else:
-                    first_seen = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
-                    last_seen = datetime.now(timezone.utc)
-                    active_hours = time_range_hours
+            timed = np.flatnonzero(~np.isnan(stats_batch.ts))
+            if len(timed):
+                first_seen = stats_batch.datetime_at(timed[np.argmin(stats_batch.ts[timed])])
+                last_seen = stats_batch.datetime_at(timed[np.argmax(stats_batch.ts[timed])])
+                active_hours = (last_seen - first_seen).total_seconds() / 3600
             else:
                 first_seen = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
                 last_seen = datetime.now(timezone.utc)
                 active_hours = time_range_hours
             
-            buy_sell_ratio = len(buy_trades) / max(len(sell_trades), 1)
+            buy_sell_ratio = buy_count / max(sell_count, 1)
             
             statistics = WalletStatistics(
                 total_trades=len(wallet_trades),
-                buy_trades=len(buy_trades),
-                sell_trades=len(sell_trades),
+                buy_trades=buy_count,
+                sell_trades=sell_count,
                 total_volume=total_volume,
                 total_value_usd=total_value_usd,
                 avg_trade_size=total_volume / max(len(wallet_trades), 1),
@@ -4,13 +4,24 @@ Collectors Package
 Exportiert alle Collector-Klassen
 """
 
+from .candle_store import CandleStore, get_candle_store
 from .exchange_collector import ExchangeCollector, ExchangeCollectorFactory
+from .ohlcv_backfill import OHLCVBackfill
 from .orderbook_analyzer import OrderbookAnalyzer
+from .orderbook_recorder import OrderbookRecorder, get_orderbook_recorder
 from .realtime_stream import RealtimeTradeStream
+from .trade_stream_hub import TradeStreamHub, get_trade_stream_hub
 
 __all__ = [
+    'CandleStore',
+    'get_candle_store',
+    'OHLCVBackfill',
     'ExchangeCollector',
     'ExchangeCollectorFactory',
     'OrderbookAnalyzer',
+    'OrderbookRecorder',
+    'get_orderbook_recorder',
     'RealtimeTradeStream',
+    'TradeStreamHub',
+    'get_trade_stream_hub',
 ]
@@ -0,0 +1,149 @@
+"""
+Candle Store - Persistente geschlossene OHLCV Candles
+
+SQLite-Speicher pro (source, symbol, timeframe) plus abgedeckte Bar-Bereiche,
+damit CandleService und OHLCV-Backfill nur fehlende Intervalle nachladen.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+
+DEFAULT_STORE_PATH = os.getenv('CANDLE_STORE_PATH', os.path.join('data', 'candle_store.sqlite'))
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '4h': 14400, '1d': 86400,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (source, symbol, timeframe, ts)
+);
+
+CREATE TABLE IF NOT EXISTS candle_coverage (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candle_coverage ON candle_coverage (source, symbol, timeframe, start_ts);
+"""
+
+Candle = Tuple[int, float, float, float, float, float]  # ts, open, high, low, close, volume
+
+
+class CandleStore:
+    """
+    SQLite store for closed candles + covered bar ranges.
+
+    Coverage is stored as [start_ts, end_ts) in bar-open timestamps, so bars
+    without trades inside a fetched range are not refetched.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def upsert(self, source: str, symbol: str, timeframe: str, candles: List[Candle]) -> int:
+        if not candles:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO candles '
+                '(source, symbol, timeframe, ts, open, high, low, close, volume) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(source, symbol, timeframe, *candle) for candle in candles]
+            )
+            self._conn.commit()
+        return len(candles)
+
+    def query(self, source: str, symbol: str, timeframe: str, start_ts: int, end_ts: int) -> List[Candle]:
+        """Candles with start_ts <= ts < end_ts, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT ts, open, high, low, close, volume FROM candles '
+                'WHERE source = ? AND symbol = ? AND timeframe = ? AND ts >= ? AND ts < ? '
+                'ORDER BY ts',
+                (source, symbol, timeframe, start_ts, end_ts)
+            ).fetchall()
+
+    def mark_covered(self, source: str, symbol: str, timeframe: str, start_ts: int, end_ts: int):
+        """Record [start_ts, end_ts) as complete (merges touching ranges)"""
+        if end_ts <= start_ts:
+            return
+        with self._lock:
+            overlapping = self._conn.execute(
+                'SELECT rowid, start_ts, end_ts FROM candle_coverage '
+                'WHERE source = ? AND symbol = ? AND timeframe = ? AND start_ts <= ? AND end_ts >= ?',
+                (source, symbol, timeframe, end_ts, start_ts)
+            ).fetchall()
+
+            for _, s, e in overlapping:
+                start_ts, end_ts = min(start_ts, s), max(end_ts, e)
+
+            self._conn.executemany(
+                'DELETE FROM candle_coverage WHERE rowid = ?',
+                [(rowid,) for rowid, _, _ in overlapping]
+            )
+            self._conn.execute(
+                'INSERT INTO candle_coverage (source, symbol, timeframe, start_ts, end_ts) VALUES (?, ?, ?, ?, ?)',
+                (source, symbol, timeframe, start_ts, end_ts)
+            )
+            self._conn.commit()
+
+    def missing_ranges(self, source: str, symbol: str, timeframe: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        """Sub-ranges of [start_ts, end_ts) not covered yet"""
+        with self._lock:
+            covered = self._conn.execute(
+                'SELECT start_ts, end_ts FROM candle_coverage '
+                'WHERE source = ? AND symbol = ? AND timeframe = ? AND start_ts < ? AND end_ts > ? '
+                'ORDER BY start_ts',
+                (source, symbol, timeframe, end_ts, start_ts)
+            ).fetchall()
+
+        gaps = []
+        cursor = start_ts
+        for s, e in covered:
+            if s > cursor:
+                gaps.append((cursor, min(s, end_ts)))
+            cursor = max(cursor, e)
+            if cursor >= end_ts:
+                break
+        if cursor < end_ts:
+            gaps.append((cursor, end_ts))
+        return gaps
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[CandleStore] = None
+
+
+def get_candle_store() -> CandleStore:
+    """Process-wide candle store shared by chart service and backfill"""
+    global _default_store
+    if _default_store is None:
+        _default_store = CandleStore()
+    return _default_store
@@ -26,6 +26,7 @@ from typing import List, Dict, Any, Optional
 import ccxt.async_support as ccxt
 
 from .base import BaseCollector
+from .ohlcv_backfill import OHLCVBackfill
 from ..utils.constants import (
     SupportedExchange,
     EXCHANGE_CONFIGS,
@@ -113,6 +114,10 @@ class ExchangeCollector(BaseCollector):
         self.rate_limit = EXCHANGE_RATE_LIMITS.get(self.exchange_name, 20)  # Default: 20
         self._last_request_time = None
         
+        # Geteilte Transports: ccxt-Instanz (Session) + aiohttp für Raw-Endpoints
+        self._http_session = None
+        self._backfill: Optional[OHLCVBackfill] = None
+        
         # Exchange initialisieren (kann fehlschlagen)
         try:
             self.exchange = self._init_exchange(api_key, api_secret)
@@ -427,6 +432,7 @@ class ExchangeCollector(BaseCollector):
                         'amount': volume_per_trade,
                         'price': candle['open'],
                         'value_usd': volume_per_trade * candle['open'],
+                        'synthetic': True,
                     },
                     {
                         'id': f"ohlcv_{candle['timestamp'].isoformat()}_high",
@@ -435,6 +441,7 @@ class ExchangeCollector(BaseCollector):
                         'amount': volume_per_trade,
                         'price': candle['high'],
                         'value_usd': volume_per_trade * candle['high'],
+                        'synthetic': True,
                     },
                     {
                         'id': f"ohlcv_{candle['timestamp'].isoformat()}_low",
@@ -443,6 +450,7 @@ class ExchangeCollector(BaseCollector):
                         'amount': volume_per_trade,
                         'price': candle['low'],
                         'value_usd': volume_per_trade * candle['low'],
+                        'synthetic': True,
                     },
                     {
                         'id': f"ohlcv_{candle['timestamp'].isoformat()}_close",
@@ -451,6 +459,7 @@ class ExchangeCollector(BaseCollector):
                         'amount': volume_per_trade,
                         'price': candle['close'],
                         'value_usd': volume_per_trade * candle['close'],
+                        'synthetic': True,
                     },
                 ])
             
@@ -617,44 +626,49 @@ class ExchangeCollector(BaseCollector):
         start_time = ensure_timezone_aware(start_time)
         end_time = ensure_timezone_aware(end_time)
         
-        await self._rate_limit_wait()
-        
         try:
-            since = int(start_time.timestamp() * 1000)
-            end_ms = int(end_time.timestamp() * 1000)
+            start_ts = int(start_time.timestamp())
+            end_ts = int(end_time.timestamp())
+            timeframe_ms = TIMEFRAME_TO_MS.get(timeframe, 60000)
+            
+            # Geschlossene Candles: parallel nachladen, nur fehlende Intervalle
+            await self.backfill.backfill(symbol, timeframe, start_ts, end_ts + 1)
+            stored = await asyncio.to_thread(
+                self.backfill.query, symbol, timeframe, start_ts, end_ts + 1
+            )
             
-            all_candles = []
+            all_candles = [
+                {
+                    'timestamp': timestamp_to_datetime(ts * 1000),  # 🔧 FIX
+                    'open': open_,
+                    'high': high,
+                    'low': low,
+                    'close': close,
+                    'volume': volume,
+                }
+                for ts, open_, high, low, close, volume in stored
+            ]
             
-            # Fetch in Batches
-            while since < end_ms:
+            # Offene Candle (nie gespeichert) live anhängen
+            now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+            open_bar_ms = now_ms - now_ms % timeframe_ms
+            if start_ts * 1000 <= open_bar_ms <= end_ts * 1000:
                 ohlcv = await self.exchange.fetch_ohlcv(
                     symbol=symbol,
                     timeframe=timeframe,
-                    since=since,
-                    limit=500
+                    since=open_bar_ms,
+                    limit=1
                 )
-                
-                if not ohlcv:
-                    break
-                
-                for candle in ohlcv:
-                    if candle[0] <= end_ms:
+                for candle in ohlcv or []:
+                    if candle[0] == open_bar_ms:
                         all_candles.append({
-                            'timestamp': timestamp_to_datetime(candle[0]),  # 🔧 FIX
+                            'timestamp': timestamp_to_datetime(candle[0]),
                             'open': float(candle[1]),
                             'high': float(candle[2]),
                             'low': float(candle[3]),
                             'close': float(candle[4]),
                             'volume': float(candle[5]),
                         })
-                
-                # Update since
-                since = ohlcv[-1][0] + TIMEFRAME_TO_MS.get(timeframe, 60000)
-                
-                if len(ohlcv) < 500:
-                    break
-                
-                await asyncio.sleep(0.1)
             
             logger.info(
                 f"{len(all_candles)} Candles gefetcht für {symbol} {timeframe}"
@@ -669,6 +683,23 @@ class ExchangeCollector(BaseCollector):
             )
             raise
     
+    @property
+    def backfill(self) -> OHLCVBackfill:
+        """Backfill-Engine auf der geteilten ccxt-Instanz (lazy)"""
+        if self._backfill is None:
+            self._backfill = OHLCVBackfill(self.exchange, self.exchange_name)
+        return self._backfill
+    
+    async def _get_http_session(self):
+        """Geteilte aiohttp Session für Raw-API Calls (statt einer pro Request)"""
+        import aiohttp
+        
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http_session
+    
     async def health_check(self) -> bool:
         """
         Prüft ob Exchange erreichbar ist
@@ -788,8 +819,6 @@ class ExchangeCollector(BaseCollector):
         try:
             # Binance aggTrades nutzt CCXT nicht direkt
             # Wir müssen den Raw API Call machen
-            import aiohttp
-            
             url = "https://data-api.binance.vision/api/v3/aggTrades"
             
             params = {
@@ -799,14 +828,14 @@ class ExchangeCollector(BaseCollector):
                 'limit': min(limit, 1000)  # Max 1000 per request
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Binance aggTrades failed: {response.status}")
-                        # Fallback zu normalen Trades
-                        return await self.fetch_trades(symbol, start_time, end_time, limit)
-                    
-                    agg_trades_raw = await response.json()
+            session = await self._get_http_session()
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    logger.error(f"Binance aggTrades failed: {response.status}")
+                    # Fallback zu normalen Trades
+                    return await self.fetch_trades(symbol, start_time, end_time, limit)
+                
+                agg_trades_raw = await response.json()
             
             # Parse zu unserem Format
             agg_trades = []
@@ -978,6 +1007,8 @@ class ExchangeCollector(BaseCollector):
 
     async def close(self):
         """Schließt Exchange Connection"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
         if self.exchange:
             await self.exchange.close()
             logger.info(f"Exchange Connection geschlossen: {self.exchange_name}")
@@ -0,0 +1,178 @@
+"""
+Helius Transaction Cache - Persistenter Cache für Enhanced-API Transaktionen
+
+signature → geparste Enhanced Transaction (JSON), damit überlappende
+Candle-Requests jede Transaktion nur einmal von Helius parsen lassen.
+
+- SQLite (WAL) auf Disk, überlebt Neustarts
+- LRU im Speicher davor (begrenzt)
+- Bestätigte Solana-Transaktionen ändern sich nicht → kein TTL für
+  Gültigkeit, aber die Datei wird nach Alter (block_time) und Zeilenzahl
+  beschnitten, damit sie nicht unbegrenzt wächst
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_PATH = os.getenv('HELIUS_TX_CACHE_PATH', os.path.join('data', 'helius_tx_cache.sqlite'))
+DEFAULT_MAX_AGE_DAYS = float(os.getenv('HELIUS_TX_CACHE_MAX_AGE_DAYS', 30))
+DEFAULT_MAX_ROWS = int(os.getenv('HELIUS_TX_CACHE_MAX_ROWS', 500_000))
+
+# Prune after this many stored rows (and once on open)
+PRUNE_EVERY = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    signature TEXT PRIMARY KEY,
+    block_time INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions (block_time);
+"""
+
+
+class HeliusTransactionCache:
+    """Two-level (memory LRU + SQLite) cache for Enhanced API transactions"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        memory_size: int = 20_000,
+        max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS
+    ):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stored': 0, 'pruned': 0}
+        self._stored_since_prune = 0
+
+        self.prune()
+
+    def _remember(self, signature: str, tx: Dict[str, Any]):
+        self._memory[signature] = tx
+        self._memory.move_to_end(signature)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, signatures: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached transactions for signatures (missing ones are omitted)"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+
+        with self._lock:
+            for signature in signatures:
+                tx = self._memory.get(signature)
+                if tx is None:
+                    missing.append(signature)
+                else:
+                    self._memory.move_to_end(signature)
+                    found[signature] = tx
+            self.stats['memory_hits'] += len(found)
+
+            disk_hits = 0
+            # SQLite caps bound parameters per statement
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT signature, payload FROM transactions "
+                    f"WHERE signature IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for signature, payload in rows:
+                    tx = json.loads(payload)
+                    found[signature] = tx
+                    self._remember(signature, tx)
+                disk_hits += len(rows)
+
+            self.stats['disk_hits'] += disk_hits
+            self.stats['misses'] += len(missing) - disk_hits
+
+        return found
+
+    def put_many(self, transactions: Iterable[Dict[str, Any]]) -> int:
+        """Store Enhanced API transactions (keyed by their signature)"""
+        transactions = [tx for tx in transactions if tx and tx.get('signature')]
+        if not transactions:
+            return 0
+
+        rows = [(tx['signature'], tx.get('timestamp'), json.dumps(tx)) for tx in transactions]
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO transactions (signature, block_time, payload) VALUES (?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+            for tx in transactions:
+                self._remember(tx['signature'], tx)
+
+        self.stats['stored'] += len(rows)
+        self._stored_since_prune += len(rows)
+        if self._stored_since_prune >= PRUNE_EVERY:
+            self.prune()
+        return len(rows)
+
+    def prune(self) -> int:
+        """
+        Drop transactions older than max_age_days and, beyond max_rows,
+        the oldest ones (by block_time).
+
+        Returns:
+            Number of removed rows
+        """
+        removed = 0
+        with self._lock:
+            if self.max_age_days:
+                cutoff = int(time.time() - self.max_age_days * 86400)
+                removed += self._conn.execute(
+                    'DELETE FROM transactions WHERE block_time < ?', (cutoff,)
+                ).rowcount
+
+            if self.max_rows:
+                removed += self._conn.execute(
+                    'DELETE FROM transactions WHERE signature IN ('
+                    'SELECT signature FROM transactions '
+                    'ORDER BY block_time DESC LIMIT -1 OFFSET ?)',
+                    (self.max_rows,)
+                ).rowcount
+
+            self._conn.commit()
+            self._stored_since_prune = 0
+
+        if removed:
+            self.stats['pruned'] += removed
+            logger.info(f"🧹 Helius tx cache: pruned {removed} old transactions")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._conn.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+        return {**self.stats, 'in_memory': len(self._memory), 'on_disk': stored, 'path': self.path}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
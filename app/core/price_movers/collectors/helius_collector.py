@@ -22,8 +22,11 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional, Tuple
 import time
 import json
+from collections import OrderedDict
 
 from .dex_collector import DEXCollector
+from .helius_cache import HeliusTransactionCache
+from .trade_tape import TradePage
 from ..utils.constants import BlockchainNetwork
 
 
@@ -31,21 +34,26 @@ logger = logging.getLogger(__name__)
 
 
 class SimpleCache:
-    """Thread-safe in-memory cache with TTL"""
-    def __init__(self, ttl_seconds: int = 300):
-        self.cache = {}
+    """In-memory cache with TTL and LRU eviction (bounded size)"""
+    def __init__(self, ttl_seconds: int = 300, max_size: int = 1000):
+        self.cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
         self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
     
     def get(self, key: str) -> Optional[Any]:
         if key in self.cache:
             value, timestamp = self.cache[key]
             if time.time() - timestamp < self.ttl_seconds:
+                self.cache.move_to_end(key)
                 return value
             del self.cache[key]
         return None
     
     def set(self, key: str, value: Any):
         self.cache[key] = (value, time.time())
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
     
     def clear(self):
         self.cache.clear()
@@ -58,6 +66,7 @@ class HeliusCollector(DEXCollector):
     """Helius Collector - Token-based strategy for Solana DEX trades"""
     
     API_BASE = "https://api-mainnet.helius-rpc.com"
+    RPC_BASE = "https://mainnet.helius-rpc.com"
     
     # DEX Program IDs
     DEX_PROGRAM_IDS = {
@@ -110,6 +119,22 @@ class HeliusCollector(DEXCollector):
         self.candle_cache = SimpleCache(ttl_seconds=60)
         self.dexscreener = dexscreener_collector
         
+        # Signature harvesting / Enhanced API ingestion
+        self.signature_page_size = self.config.get('signature_page_size', 1000)
+        self.max_signature_pages = self.config.get('max_signature_pages', 10)
+        self.max_signatures = self.config.get('max_signatures', 5000)
+        self.enhanced_batch_size = self.config.get('enhanced_batch_size', 100)
+        self.enhanced_concurrency = self.config.get('enhanced_concurrency', 4)
+        self.min_request_interval = 1.0 / self.config.get('requests_per_second', 10)
+        self._rate_lock = asyncio.Lock()
+        self._last_request = 0.0
+        
+        # signature → Enhanced API transaction (persistent, shared across candles)
+        self.tx_cache = self.config.get('tx_cache') or HeliusTransactionCache(
+            **({'path': self.config['tx_cache_path']} if self.config.get('tx_cache_path') else {})
+        )
+        self.ingest_stats = {'signature_pages': 0, 'enhanced_batches': 0, 'truncated_windows': 0}
+        
         # Current candle for price validation
         self.current_candle: Optional[Dict[str, Any]] = None
         
@@ -127,6 +152,157 @@ class HeliusCollector(DEXCollector):
             self.session = aiohttp.ClientSession()
         return self.session
     
+    # ============================================================================
+    # INGESTION: SIGNATURE PAGING + BATCHED ENHANCED API
+    # ============================================================================
+    
+    async def _rate_limit_wait(self):
+        """Spaces Helius requests by min_request_interval (shared by all batches)"""
+        async with self._rate_lock:
+            wait = self._last_request + self.min_request_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request = time.monotonic()
+    
+    async def _fetch_signatures(
+        self,
+        address: str,
+        start_ts: int,
+        end_ts: int
+    ) -> Tuple[List[str], bool]:
+        """
+        Pages getSignaturesForAddress backward (newest first) until the
+        window start is reached.
+        
+        Returns:
+            (signatures with start_ts <= blockTime <= end_ts, newest first;
+            False if the window start was not reached - RPC error, page cap
+            or max_signatures)
+        """
+        session = await self._get_session()
+        rpc_url = f"{self.RPC_BASE}/?api-key={self.api_key}"
+        
+        in_window: List[str] = []
+        before: Optional[str] = None
+        
+        for page in range(self.max_signature_pages):
+            options = {"limit": self.signature_page_size}
+            if before:
+                options["before"] = before
+            
+            payload = {
+                "jsonrpc": "2.0",
+                "id": page + 1,
+                "method": "getSignaturesForAddress",
+                "params": [address, options]
+            }
+            
+            await self._rate_limit_wait()
+            async with session.post(rpc_url, json=payload, headers={'Content-Type': 'application/json'}, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"❌ RPC error {response.status}: {error_text[:500]}")
+                    return in_window, False
+                
+                rpc_data = await response.json()
+            
+            self.ingest_stats['signature_pages'] += 1
+            
+            if 'error' in rpc_data:
+                logger.error(f"❌ RPC error: {rpc_data['error']}")
+                return in_window, False
+            
+            signatures = rpc_data.get('result') or []
+            if not signatures:
+                break
+            
+            for sig_info in signatures:
+                block_time = sig_info.get('blockTime')
+                if block_time and start_ts <= block_time <= end_ts:
+                    in_window.append(sig_info['signature'])
+            
+            oldest = signatures[-1].get('blockTime')
+            logger.info(
+                f"📦 Signature page {page + 1}: {len(signatures)} sigs, "
+                f"oldest {datetime.fromtimestamp(oldest or 0, tz=timezone.utc)}, "
+                f"{len(in_window)} in window"
+            )
+            
+            if len(in_window) >= self.max_signatures:
+                self.ingest_stats['truncated_windows'] += 1
+                logger.warning(
+                    f"⚠️ Window truncated at {self.max_signatures} signatures "
+                    f"(newest first) - raise max_signatures for full coverage"
+                )
+                return in_window[:self.max_signatures], False
+            
+            if (oldest and oldest < start_ts) or len(signatures) < self.signature_page_size:
+                break
+            
+            before = signatures[-1]['signature']
+        else:
+            self.ingest_stats['truncated_windows'] += 1
+            logger.warning(
+                f"⚠️ Stopped after {self.max_signature_pages} signature pages "
+                f"before reaching the window start"
+            )
+            return in_window, False
+        
+        return in_window, True
+    
+    async def _post_enhanced_batch(self, signatures: List[str], semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """One Enhanced API request (≤ enhanced_batch_size signatures)"""
+        session = await self._get_session()
+        enhanced_url = f"{self.API_BASE}/v0/transactions"
+        
+        async with semaphore:
+            await self._rate_limit_wait()
+            try:
+                async with session.post(enhanced_url, json={"transactions": signatures}, params={'api-key': self.api_key}, headers={'Content-Type': 'application/json'}, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"❌ Enhanced API error {response.status}: {error_text[:500]}")
+                        return []
+                    
+                    self.ingest_stats['enhanced_batches'] += 1
+                    return await response.json() or []
+                    
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Enhanced API timeout ({len(signatures)} signatures)")
+                return []
+    
+    async def _fetch_enhanced_transactions(self, signatures: List[str]) -> List[Dict[str, Any]]:
+        """
+        Enhanced API transactions for signatures, in input order.
+        
+        Cached transactions are served from the parse cache; the rest is
+        split into concurrent batches and stored in the cache afterwards.
+        Signatures that failed to parse are omitted.
+        """
+        cached = await asyncio.to_thread(self.tx_cache.get_many, signatures)
+        missing = [sig for sig in signatures if sig not in cached]
+        
+        logger.info(
+            f"🗃️ Parse cache: {len(cached)} cached, {len(missing)} to fetch "
+            f"in {-(-len(missing) // self.enhanced_batch_size)} batches"
+        )
+        
+        if missing:
+            semaphore = asyncio.Semaphore(self.enhanced_concurrency)
+            batches = await asyncio.gather(*[
+                self._post_enhanced_batch(missing[i:i + self.enhanced_batch_size], semaphore)
+                for i in range(0, len(missing), self.enhanced_batch_size)
+            ])
+            
+            fetched = [tx for batch in batches for tx in batch if tx]
+            await asyncio.to_thread(self.tx_cache.put_many, fetched)
+            
+            for tx in fetched:
+                if tx.get('signature'):
+                    cached[tx['signature']] = tx
+        
+        return [cached[sig] for sig in signatures if sig in cached]
+
     # ============================================================================
     # DYNAMIC PRICE VALIDATION
     # ============================================================================
@@ -366,7 +542,17 @@ class HeliusCollector(DEXCollector):
         limit: Optional[int] = 100,
         symbol: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Fetch trades with dynamic price validation"""
+        """
+        Fetch trades with dynamic price validation
+        
+        Signatures are parsed newest first, in chunks, until `limit` trades
+        are found or the window is exhausted (most signatures are no swaps,
+        so `limit` signatures usually yield far fewer trades).
+        
+        Returns:
+            TradePage with the newest `limit` trades; complete=False if
+            older trades of the window were left out
+        """
         
         logger.info(f"🔍 Fetching trades from token: {token_address[:8]}...")
         if symbol:
@@ -374,114 +560,55 @@ class HeliusCollector(DEXCollector):
         logger.info(f"⏰ Time range: {start_time} to {end_time}")
         logger.info(f"📊 Limit: {limit}")
         
-        session = await self._get_session()
-        rpc_url = f"https://mainnet.helius-rpc.com/?api-key={self.api_key}"
-        
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getSignaturesForAddress",
-            "params": [token_address, {"limit": min(limit, 1000)}]
-        }
-        
-        logger.info(f"🌐 Step 1: Getting signatures via RPC")
+        logger.info(f"🌐 Step 1: Paging signatures via RPC")
         
         try:
-            async with session.post(rpc_url, json=payload, headers={'Content-Type': 'application/json'}, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                logger.info(f"📡 RPC Response status: {response.status}")
-                
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"❌ RPC error {response.status}: {error_text[:500]}")
-                    return []
-                
-                rpc_data = await response.json()
-                
-                if 'error' in rpc_data:
-                    logger.error(f"❌ RPC error: {rpc_data['error']}")
-                    return []
-                
-                if 'result' not in rpc_data:
-                    logger.error(f"❌ No result in RPC response")
-                    return []
-                
-                signatures = rpc_data['result']
-                logger.info(f"📦 Found {len(signatures)} signatures for token")
-                
-                if not signatures:
-                    logger.warning("⚠️ No signatures found for this token address")
-                    return []
-                
-                if signatures:
-                    first_sig = signatures[0]
-                    last_sig = signatures[-1]
-                    first_time = datetime.fromtimestamp(first_sig.get('blockTime', 0), tz=timezone.utc)
-                    last_time = datetime.fromtimestamp(last_sig.get('blockTime', 0), tz=timezone.utc)
-                    logger.info(f"🔍 Signature time range: {first_time} to {last_time}")
-            
-            # Filter signatures by timestamp
-            filtered_sigs = []
-            start_ts = int(start_time.timestamp())
-            end_ts = int(end_time.timestamp())
-            
-            logger.info(f"📅 Filtering for: {start_time} to {end_time}")
-            
-            for sig_info in signatures:
-                block_time = sig_info.get('blockTime')
-                if block_time and start_ts <= block_time <= end_ts:
-                    filtered_sigs.append(sig_info['signature'])
+            filtered_sigs, signatures_complete = await self._fetch_signatures(
+                token_address,
+                int(start_time.timestamp()),
+                int(end_time.timestamp())
+            )
             
-            logger.info(f"📊 Filtered to {len(filtered_sigs)} signatures in time range")
+            logger.info(f"📊 {len(filtered_sigs)} signatures in time range")
             
             if not filtered_sigs:
                 logger.warning("⚠️ No signatures in requested time range")
-                return []
-            
-            # 🎯 ADAPTIVE LIMIT based on timeframe
-            # Longer timeframes need more signatures to ensure good coverage
-            timeframe_seconds = int((end_time - start_time).total_seconds())
-            
-            if timeframe_seconds <= 900:  # 15min or less
-                max_sigs = 100
-            elif timeframe_seconds <= 1800:  # 30min
-                max_sigs = 200
-            elif timeframe_seconds <= 3600:  # 1h
-                max_sigs = 500
-            else:  # > 1h
-                max_sigs = 1000
+                return TradePage([], complete=signatures_complete)
             
-            logger.info(
-                f"📏 Timeframe: {timeframe_seconds}s ({timeframe_seconds//60}min) "
-                f"→ Max signatures: {max_sigs}"
-            )
-            
-            filtered_sigs = filtered_sigs[:min(len(filtered_sigs), max_sigs)]
-            
-            logger.info(f"✂️ Limited to {len(filtered_sigs)} signatures for parsing")
-            
-            # Parse transactions
-            logger.info(f"🌐 Step 2: Parsing {len(filtered_sigs)} transactions via Enhanced API")
+            # Parse trades
+            trades = []
+            stats = {
+                'swap_count': 0,
+                'unknown_parsed': 0,
+                'liquidity_events': 0,
+                'add_liquidity': 0,
+                'remove_liquidity': 0,
+                'price_rejected': 0,
+                'parse_errors': []
+            }
             
-            enhanced_url = f"{self.API_BASE}/v0/transactions"
+            chunk_size = max(limit or len(filtered_sigs), self.enhanced_batch_size)
+            parsed = 0
+            # Signatures the Enhanced API did not return are missing trades
+            unparsed = 0
             
-            async with session.post(enhanced_url, json={"transactions": filtered_sigs}, params={'api-key': self.api_key}, headers={'Content-Type': 'application/json'}, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                logger.info(f"📡 Enhanced API Response status: {response.status}")
+            while parsed < len(filtered_sigs) and not (limit and len(trades) >= limit):
+                chunk = filtered_sigs[parsed:parsed + chunk_size]
+                parsed += len(chunk)
                 
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"❌ Enhanced API error {response.status}: {error_text[:500]}")
-                    return []
+                # Parse transactions (parse cache + concurrent Enhanced API batches)
+                logger.info(f"🌐 Step 2: Parsing {len(chunk)} transactions via Enhanced API ({parsed}/{len(filtered_sigs)})")
                 
-                transactions = await response.json()
+                transactions = await self._fetch_enhanced_transactions(chunk)
                 logger.info(f"📦 Received {len(transactions)} parsed transactions")
                 
+                unparsed += len(chunk) - len(transactions)
                 if not transactions:
                     logger.warning("⚠️ No transactions returned from Enhanced API")
-                    return []
+                    break
                 
                 # 🔍 DEBUG: Log first transaction structure
-                if transactions and len(transactions) > 0:
-                    logger.info(f"📝 SAMPLE TRANSACTION (first one):\n{json.dumps(transactions[0], indent=2)}")
+                logger.debug(f"📝 SAMPLE TRANSACTION (first one):\n{json.dumps(transactions[0], indent=2)}")
                 
                 tx_types = {}
                 for tx in transactions:
@@ -489,68 +616,21 @@ class HeliusCollector(DEXCollector):
                     tx_types[tx_type] = tx_types.get(tx_type, 0) + 1
                 
                 logger.info(f"📊 Transaction types found: {tx_types}")
+                
+                self._parse_transactions(transactions, symbol, start_time, end_time, trades, stats)
             
-            # Parse trades
-            trades = []
-            stats = {
-                'swap_count': 0,
-                'unknown_parsed': 0,
-                'liquidity_events': 0,
-                'add_liquidity': 0,
-                'remove_liquidity': 0,
-                'price_rejected': 0,
-                'parse_errors': []
-            }
+            complete = signatures_complete and parsed == len(filtered_sigs) and not unparsed
+            if limit and len(trades) > limit:
+                trades.sort(key=lambda trade: trade['timestamp'], reverse=True)
+                trades = trades[:limit]
+                complete = False
             
-            for i, tx in enumerate(transactions):
-                try:
-                    tx_type = tx.get('type')
-                    trade = None
-                    
-                    if tx_type == 'SWAP':
-                        stats['swap_count'] += 1
-                        trade = self._parse_helius_enhanced_swap(tx, symbol)
-                    
-                    elif tx_type == 'UNKNOWN':
-                        trade = self._parse_unknown_transaction(tx, symbol)
-                        
-                        if trade:
-                            stats['unknown_parsed'] += 1
-                            
-                            tx_type_parsed = trade.get('transaction_type', '')
-                            if tx_type_parsed == 'ADD_LIQUIDITY':
-                                stats['add_liquidity'] += 1
-                                stats['liquidity_events'] += 1
-                            elif tx_type_parsed == 'REMOVE_LIQUIDITY':
-                                stats['remove_liquidity'] += 1
-                                stats['liquidity_events'] += 1
-                    
-                    else:
-                        continue
-                    
-                    # Check if trade was rejected due to price
-                    if trade is None and tx_type in ['SWAP', 'UNKNOWN']:
-                        stats['price_rejected'] += 1
-                    
-                    if trade and start_time <= trade['timestamp'] <= end_time:
-                        trades.append(trade)
-                        
-                        if len(trades) <= 5:
-                            tx_type_label = trade.get('transaction_type', 'Trade')
-                            logger.info(
-                                f"✅ {tx_type_label} #{len(trades)}: "
-                                f"{trade['trade_type']} {trade['amount']:.4f} "
-                                f"@ ${trade.get('price', 0):.6f} at {trade['timestamp']}"
-                            )
-                            
-                            if 'liquidity_delta' in trade:
-                                logger.info(f"   💧 Liquidity Delta: {trade['liquidity_delta']:.4f}")
-                    
-                except Exception as e:
-                    stats['parse_errors'].append(str(e))
-                    if len(stats['parse_errors']) <= 3:
-                        logger.error(f"❌ Parse error {len(stats['parse_errors'])}: {e}", exc_info=True)
-                    continue
+            if not complete:
+                logger.warning(
+                    f"⚠️ Window truncated: returning newest {len(trades)} trades, "
+                    f"{len(filtered_sigs) - parsed + unparsed} of {len(filtered_sigs)} signatures not parsed"
+                    + ("" if signatures_complete else ", window start not reached")
+                )
             
             # Summary logging
             logger.info(
@@ -568,7 +648,7 @@ class HeliusCollector(DEXCollector):
                     f"(outside candle range)"
                 )
             
-            return trades
+            return TradePage(trades, complete=complete)
             
         except asyncio.TimeoutError:
             logger.error("❌ Helius API timeout")
@@ -577,6 +657,66 @@ class HeliusCollector(DEXCollector):
             logger.error(f"❌ Helius fetch error: {e}", exc_info=True)
             return []
 
+    def _parse_transactions(
+        self,
+        transactions: List[Dict[str, Any]],
+        symbol: Optional[str],
+        start_time: datetime,
+        end_time: datetime,
+        trades: List[Dict[str, Any]],
+        stats: Dict[str, Any]
+    ):
+        """Appends the trades (swaps, parsed UNKNOWN/liquidity) in [start_time, end_time] to trades"""
+        for i, tx in enumerate(transactions):
+            try:
+                tx_type = tx.get('type')
+                trade = None
+                
+                if tx_type == 'SWAP':
+                    stats['swap_count'] += 1
+                    trade = self._parse_helius_enhanced_swap(tx, symbol)
+                
+                elif tx_type == 'UNKNOWN':
+                    trade = self._parse_unknown_transaction(tx, symbol)
+                    
+                    if trade:
+                        stats['unknown_parsed'] += 1
+                        
+                        tx_type_parsed = trade.get('transaction_type', '')
+                        if tx_type_parsed == 'ADD_LIQUIDITY':
+                            stats['add_liquidity'] += 1
+                            stats['liquidity_events'] += 1
+                        elif tx_type_parsed == 'REMOVE_LIQUIDITY':
+                            stats['remove_liquidity'] += 1
+                            stats['liquidity_events'] += 1
+                
+                else:
+                    continue
+                
+                # Check if trade was rejected due to price
+                if trade is None and tx_type in ['SWAP', 'UNKNOWN']:
+                    stats['price_rejected'] += 1
+                
+                if trade and start_time <= trade['timestamp'] <= end_time:
+                    trades.append(trade)
+                    
+                    if len(trades) <= 5:
+                        tx_type_label = trade.get('transaction_type', 'Trade')
+                        logger.info(
+                            f"✅ {tx_type_label} #{len(trades)}: "
+                            f"{trade['trade_type']} {trade['amount']:.4f} "
+                            f"@ ${trade.get('price', 0):.6f} at {trade['timestamp']}"
+                        )
+                        
+                        if 'liquidity_delta' in trade:
+                            logger.info(f"   💧 Liquidity Delta: {trade['liquidity_delta']:.4f}")
+                
+            except Exception as e:
+                stats['parse_errors'].append(str(e))
+                if len(stats['parse_errors']) <= 3:
+                    logger.error(f"❌ Parse error {len(stats['parse_errors'])}: {e}", exc_info=True)
+                continue
+    
     # ============================================================================
     # SWAP PARSING - WITH DYNAMIC VALIDATION
     # ============================================================================
@@ -1487,27 +1627,8 @@ class HeliusCollector(DEXCollector):
             
             logger.info(f"🌐 Parsing {len(sig_list)} transactions via Enhanced API...")
             
-            enhanced_url = f"{self.API_BASE}/v0/transactions"
-            
-            async with session.post(
-                enhanced_url,
-                json={"transactions": sig_list},
-                params={'api-key': self.api_key},
-                headers={"Content-Type": "application/json"},
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as enhanced_response:
-                
-                if enhanced_response.status != 200:
-                    logger.error(f"❌ Enhanced API failed: {enhanced_response.status}")
-                    return {
-                        'total_transactions': 0,
-                        'pair_trades': [],
-                        'other_activities': [],
-                        'token_summary': {}
-                    }
-                
-                transactions = await enhanced_response.json()
-                logger.info(f"📦 Received {len(transactions)} parsed transactions")
+            transactions = await self._fetch_enhanced_transactions(sig_list)
+            logger.info(f"📦 Received {len(transactions)} parsed transactions")
             
             # 🔍 DEBUG: Sample first 5 transactions
             for i, tx in enumerate(transactions[:5]):
@@ -1697,6 +1818,8 @@ class HeliusCollector(DEXCollector):
         return {
             'known_tokens': len(self.TOKEN_MINTS),
             'cached_candles': self.candle_cache.size(),
+            'ingestion': dict(self.ingest_stats),
+            'tx_cache': self.tx_cache.get_stats(),
         }
     
     def clear_cache(self):
@@ -0,0 +1,247 @@
+"""
+OHLCV Backfill - Parallele ccxt-Pagination mit lokalem Candle Store
+
+Statt einen langen Zeitraum sequentiell (Seite für Seite + fester Sleep) zu
+laden:
+- Fehlende Intervalle kommen aus dem CandleStore (Gap Detection)
+- Jede Lücke wird in unabhängige Zeit-Slices (eine Seite pro Slice) geteilt
+- Slices laufen parallel, begrenzt durch das rateLimit-Budget der Exchange
+- Alle Requests laufen über dieselbe ccxt-Instanz (eine Session pro Exchange)
+- Ergebnis + Statistik (bars/s, requests/s)
+
+Nur geschlossene Candles werden gespeichert.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .candle_store import TIMEFRAME_SECONDS, Candle, CandleStore, get_candle_store
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """
+    Spacing + concurrency limit for one exchange
+
+    Requests start at most every `interval` seconds (ccxt `rateLimit`),
+    with at most `max_concurrency` in flight.
+    """
+
+    def __init__(self, interval: float, max_concurrency: int = 8):
+        self.interval = interval
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + self.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Abbruch vor dem Request (z.B. Cancel während des Sleeps) → Slot freigeben
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+class OHLCVBackfill:
+    """Concurrent OHLCV backfill for one ccxt (async) exchange"""
+
+    def __init__(
+        self,
+        exchange: Any,
+        exchange_name: str,
+        store: Optional[CandleStore] = None,
+        page_limit: int = 500,
+        max_concurrency: int = 8
+    ):
+        """
+        Args:
+            exchange: ccxt.async_support Exchange (shared session)
+            exchange_name: Store key (bitget/binance/kraken)
+            store: CandleStore (default: process-wide store)
+            page_limit: Bars pro Request / Slice
+            max_concurrency: Max. parallele Requests
+        """
+        self.exchange = exchange
+        self.exchange_name = exchange_name
+        self.store = store or get_candle_store()
+        self.page_limit = page_limit
+
+        rate_limit_ms = getattr(exchange, 'rateLimit', None) or 100
+        self.budget = RequestBudget(rate_limit_ms / 1000, max_concurrency)
+
+        self.stats = {'requests': 0, 'bars': 0, 'seconds': 0.0}
+
+    @staticmethod
+    def _row(row: List) -> Candle:
+        return (
+            int(row[0] // 1000),
+            float(row[1]), float(row[2]), float(row[3]), float(row[4]),
+            float(row[5] or 0),
+        )
+
+    def split(self, gaps: List[Tuple[int, int]], timeframe: str) -> List[Tuple[int, int]]:
+        """Gaps → independent slices of at most `page_limit` bars"""
+        step = self.page_limit * TIMEFRAME_SECONDS[timeframe]
+        slices = []
+        for gap_start, gap_end in gaps:
+            for slice_start in range(gap_start, gap_end, step):
+                slices.append((slice_start, min(slice_start + step, gap_end)))
+        return slices
+
+    async def _fetch_slice(self, symbol: str, timeframe: str, start_ts: int, end_ts: int) -> Tuple[int, int]:
+        """
+        Fetch one slice and store it
+
+        Continues within the slice until it is covered, so exchanges with a
+        lower server-side page cap still fill it completely. Only ranges
+        that returned bars are marked covered; an empty page ends the slice.
+
+        Returns:
+            (bars stored, requests made)
+        """
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        since = start_ts
+        bars = requests = 0
+
+        while since < end_ts:
+            async with self.budget:
+                ohlcv = await self.exchange.fetch_ohlcv(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    since=since * 1000,
+                    limit=self.page_limit
+                )
+            requests += 1
+
+            candles = [self._row(row) for row in ohlcv or []]
+            candles = [c for c in candles if start_ts <= c[0] < end_ts]
+
+            # Leere Seite (Lücke, Verzögerung oder Fehler) → nichts als abgedeckt
+            # markieren, der nächste Backfill fragt den Rest erneut an
+            if not candles:
+                break
+
+            await asyncio.to_thread(self.store.upsert, self.exchange_name, symbol, timeframe, candles)
+            bars += len(candles)
+
+            covered_end = min(candles[-1][0] + seconds, end_ts)
+
+            await asyncio.to_thread(
+                self.store.mark_covered, self.exchange_name, symbol, timeframe, since, covered_end
+            )
+            since = covered_end
+
+        return bars, requests
+
+    async def _run_slices(self, symbol: str, timeframe: str, slices: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Run all slices concurrently
+
+        The first failing slice cancels the others and its error is raised.
+        Slices that finished before are stored and covered; the rest stays
+        missing and is fetched by the next backfill.
+        """
+        tasks = [
+            asyncio.ensure_future(self._fetch_slice(symbol, timeframe, slice_start, slice_end))
+            for slice_start, slice_end in slices
+        ]
+        if not tasks:
+            return []
+
+        try:
+            _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # Fehler oder Abbruch des Aufrufers → keine verwaisten Slices
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(
+                    f"Backfill {self.exchange_name} {symbol} {timeframe} failed, "
+                    f"{len(pending)} slices cancelled: {task.exception()}"
+                )
+                raise task.exception()
+
+        return [task.result() for task in tasks]
+
+    async def backfill(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int
+    ) -> Dict[str, Any]:
+        """
+        Fill all missing closed bars in [start_ts, end_ts)
+
+        Returns:
+            Stats dict (gaps, slices, bars, requests, seconds, bars_per_s, requests_per_s)
+        """
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        start_ts -= start_ts % seconds
+        now = int(time.time())
+        end_ts = min(end_ts, now - now % seconds)
+
+        started = time.monotonic()
+        gaps = []
+        if end_ts > start_ts:
+            gaps = await asyncio.to_thread(
+                self.store.missing_ranges, self.exchange_name, symbol, timeframe, start_ts, end_ts
+            )
+        slices = self.split(gaps, timeframe)
+        results = await self._run_slices(symbol, timeframe, slices)
+
+        bars = sum(r[0] for r in results)
+        requests = sum(r[1] for r in results)
+        elapsed = time.monotonic() - started
+
+        self.stats['requests'] += requests
+        self.stats['bars'] += bars
+        self.stats['seconds'] += elapsed
+
+        report = {
+            'gaps': len(gaps),
+            'slices': len(slices),
+            'bars': bars,
+            'requests': requests,
+            'seconds': elapsed,
+            'bars_per_s': bars / elapsed if elapsed > 0 else 0.0,
+            'requests_per_s': requests / elapsed if elapsed > 0 else 0.0,
+        }
+
+        if slices:
+            logger.info(
+                f"📥 Backfill {self.exchange_name} {symbol} {timeframe}: "
+                f"{bars} bars in {requests} requests ({len(slices)} slices) - "
+                f"{report['bars_per_s']:.0f} bars/s, {report['requests_per_s']:.1f} req/s"
+            )
+
+        return report
+
+    def query(self, symbol: str, timeframe: str, start_ts: int, end_ts: int) -> List[Candle]:
+        return self.store.query(self.exchange_name, symbol, timeframe, start_ts, end_ts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        elapsed = self.stats['seconds']
+        return {
+            **self.stats,
+            'bars_per_s': self.stats['bars'] / elapsed if elapsed > 0 else 0.0,
+            'requests_per_s': self.stats['requests'] / elapsed if elapsed > 0 else 0.0,
+        }
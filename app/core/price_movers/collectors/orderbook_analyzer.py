@@ -2,19 +2,22 @@
 Orderbook Analyzer - Analysiert Orderbook-Veränderungen
 
 Für LIVE-Daten (< 5 Minuten):
-- Nimmt Snapshots alle 10 Sekunden
+- Liest Snapshots aus dem geteilten OrderbookRecorder (Ring-Buffer)
+- Analysiert das VERGANGENE Fenster (bisher: die nächsten N Sekunden gepollt)
 - Erkennt große Orders (Walls)
 - Erkennt Order Cancellations
 - Erkennt Aggressive Taker
 """
 
-import asyncio
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
 import numpy as np
 
+from .orderbook_recorder import get_orderbook_recorder
+
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,8 @@ class OrderbookAnalyzer:
     """
     Analysiert Orderbook-Dynamik während einer Candle
     
-    Sammelt Orderbook-Snapshots und erkennt:
+    Snapshots kommen aus einem Hintergrund-Recorder pro Symbol, der von
+    allen Aufrufern geteilt wird. Erkennt:
     - Large Orders (Whale Walls)
     - Order Cancellations
     - Aggressive Market Orders
@@ -43,71 +47,66 @@ class OrderbookAnalyzer:
         self,
         symbol: str,
         duration_seconds: int = 300,  # 5 Minuten
-        snapshot_limit: int = 50
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
-        Nimmt Orderbook-Snapshots während einer Candle-Duration
+        Analysiert Orderbook-Snapshots eines Zeitfensters
+        
+        Ohne start_time/end_time: die LETZTEN duration_seconds (früher wurden
+        ab dem Aufruf duration_seconds lang Snapshots gepollt). Das Fenster
+        wird sofort aus dem Recorder-Buffer bedient. Ist der Recorder kalt
+        (erster Aufruf für das Symbol), wird auf zwei Snapshots gewartet -
+        höchstens 2.5 Snapshot-Intervalle, bei 10s also ~25s. Der Buffer
+        reicht ~1h zurück (Recorder-Kapazität); ältere Fenster sind leer.
         
         Args:
             symbol: Trading Pair
-            duration_seconds: Candle-Duration (default: 300s = 5min)
-            snapshot_limit: Orderbook depth pro Snapshot
+            duration_seconds: Fensterlänge (default: 300s = 5min)
+            start_time: Optionaler Fensterstart
+            end_time: Optionales Fensterende
             
         Returns:
             Dictionary mit Orderbook-Analyse
         """
-        logger.info(
-            f"Starte Orderbook-Analyse für {symbol} ({duration_seconds}s)"
+        recorder = get_orderbook_recorder(
+            self.collector,
+            symbol,
+            interval_seconds=self.snapshot_interval_seconds
         )
         
-        snapshots = []
-        start_time = datetime.now()
-        end_time = start_time + timedelta(seconds=duration_seconds)
+        end_ts = end_time.timestamp() if end_time else time.time()
+        start_ts = start_time.timestamp() if start_time else end_ts - duration_seconds
+        
+        logger.info(
+            f"Starte Orderbook-Analyse für {symbol} ({end_ts - start_ts:.0f}s Fenster)"
+        )
         
-        snapshot_count = 0
+        window = recorder.window(start_ts, end_ts)
         
-        # Sammle Snapshots
-        while datetime.now() < end_time:
-            try:
-                # Hole Orderbook
-                orderbook = await self.collector.fetch_orderbook(
-                    symbol=symbol,
-                    limit=snapshot_limit
-                )
-                
-                snapshots.append({
-                    'timestamp': datetime.now(),
-                    'bids': orderbook['bids'][:20],  # Top 20
-                    'asks': orderbook['asks'][:20],
-                    'spread': orderbook.get('spread', 0),
-                    'spread_pct': orderbook.get('spread_pct', 0),
-                    'best_bid': orderbook.get('bid'),
-                    'best_ask': orderbook.get('ask'),
-                })
-                
-                snapshot_count += 1
-                
-                # Warte bis nächster Snapshot
-                await asyncio.sleep(self.snapshot_interval_seconds)
-                
-            except Exception as e:
-                logger.warning(f"Orderbook snapshot failed: {e}")
-                await asyncio.sleep(self.snapshot_interval_seconds)
+        if len(window['timestamps']) < 2 and end_time is None:
+            # Fresh recorder - wait for the first snapshots
+            window = await recorder.wait_for_snapshots(
+                min_snapshots=2,
+                start_ts=start_ts,
+                timeout=min(duration_seconds, self.snapshot_interval_seconds * 2.5)
+            )
         
-        logger.info(f"✓ {snapshot_count} Orderbook snapshots gesammelt")
+        snapshot_count = len(window['timestamps'])
+        logger.info(f"✓ {snapshot_count} Orderbook snapshots im Fenster")
         
-        if len(snapshots) < 2:
+        if snapshot_count < 2:
             logger.warning("Nicht genug Snapshots für Analyse")
             return self._empty_analysis()
         
         # Analysiere Snapshots
         analysis = {
-            'snapshot_count': len(snapshots),
-            'duration_seconds': duration_seconds,
-            'large_orders': self._detect_large_orders(snapshots),
-            'order_cancellations': self._detect_cancellations(snapshots),
-            'spread_changes': self._analyze_spread_changes(snapshots),
-            'liquidity_profile': self._analyze_liquidity(snapshots),
+            'snapshot_count': snapshot_count,
+            'duration_seconds': int(round(end_ts - start_ts)),
+            'large_orders': self._detect_large_orders(window),
+            'order_cancellations': self._detect_cancellations(window),
+            'spread_changes': self._analyze_spread_changes(window),
+            'liquidity_profile': self._analyze_liquidity(window),
         }
         
         logger.info(
@@ -118,147 +117,138 @@ class OrderbookAnalyzer:
         
         return analysis
     
-    def _detect_large_orders(self, snapshots: List[Dict]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _level_records(
+        timestamps: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        prices: np.ndarray,
+        sizes: np.ndarray,
+        side: str
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(timestamps[r], tz=timezone.utc),
+                'price': float(prices[r, c]),
+                'size': float(sizes[r, c]),
+                'side': side,
+                'value_usd': float(prices[r, c] * sizes[r, c])
+            }
+            for r, c in zip(rows, cols)
+        ]
+    
+    def _detect_large_orders(self, window: Dict[str, np.ndarray], limit: int = 50) -> List[Dict[str, Any]]:
         """
         Findet Orders die > 5x Average Size sind
         
         Diese sind wahrscheinlich von Whales/Institutions
         """
-        all_orders = []
+        sides = (
+            ('bid', window['bid_prices'], window['bid_sizes']),
+            ('ask', window['ask_prices'], window['ask_sizes']),
+        )
         
-        # Sammle alle Orders aus allen Snapshots
-        for snapshot in snapshots:
-            timestamp = snapshot['timestamp']
-            
-            # Bids
-            for bid in snapshot['bids']:
-                all_orders.append({
-                    'timestamp': timestamp,
-                    'price': bid[0],
-                    'size': bid[1],
-                    'side': 'bid',
-                    'value_usd': bid[0] * bid[1]
-                })
-            
-            # Asks
-            for ask in snapshot['asks']:
-                all_orders.append({
-                    'timestamp': timestamp,
-                    'price': ask[0],
-                    'size': ask[1],
-                    'side': 'ask',
-                    'value_usd': ask[0] * ask[1]
-                })
+        # Average Size / Value über alle Levels aller Snapshots (beide Seiten)
+        all_sizes = np.concatenate([sizes[~np.isnan(prices)] for _, prices, sizes in sides])
+        all_prices = np.concatenate([prices[~np.isnan(prices)] for _, prices, sizes in sides])
         
-        if not all_orders:
+        if not len(all_sizes):
             return []
         
-        # Berechne Average Size
-        avg_size = np.mean([o['size'] for o in all_orders])
-        avg_value = np.mean([o['value_usd'] for o in all_orders])
+        avg_size = all_sizes.mean()
+        avg_value = (all_prices * all_sizes).mean()
         
-        # Finde Large Orders (> 5x Average)
-        large_orders = [
-            o for o in all_orders
-            if o['size'] > 5 * avg_size or o['value_usd'] > 5 * avg_value
-        ]
+        large_orders = []
+        
+        for side, prices, sizes in sides:
+            values = prices * sizes
+            # Finde Large Orders (> 5x Average); NaN-Padding vergleicht immer False
+            rows, cols = np.nonzero((sizes > 5 * avg_size) | (values > 5 * avg_value))
+            large_orders.extend(
+                self._level_records(window['timestamps'], rows, cols, prices, sizes, side)
+            )
         
         # Sortiere nach Value
         large_orders.sort(key=lambda x: x['value_usd'], reverse=True)
         
-        return large_orders[:50]  # Top 50
+        return large_orders[:limit]
     
-    def _detect_cancellations(self, snapshots: List[Dict]) -> List[Dict[str, Any]]:
+    def _detect_cancellations(self, window: Dict[str, np.ndarray], limit: int = 30) -> List[Dict[str, Any]]:
         """
         Erkennt Order-Cancellations
         
         Eine Order "verschwindet" zwischen zwei Snapshots
         → Wahrscheinlich gecancelt (oder gefilled)
+        
+        Vergleicht alle aufeinanderfolgenden Snapshots auf einmal:
+        (N-1, depth, depth) Preis-Vergleich pro Seite.
         """
-        if len(snapshots) < 2:
+        timestamps = window['timestamps']
+        if len(timestamps) < 2:
             return []
         
         cancellations = []
         
-        # Vergleiche aufeinanderfolgende Snapshots
-        for i in range(len(snapshots) - 1):
-            prev_snapshot = snapshots[i]
-            curr_snapshot = snapshots[i + 1]
-            
-            # Erstelle Orderbook-State für Vergleich
-            prev_bids = {bid[0]: bid[1] for bid in prev_snapshot['bids']}
-            curr_bids = {bid[0]: bid[1] for bid in curr_snapshot['bids']}
-            
-            prev_asks = {ask[0]: ask[1] for ask in prev_snapshot['asks']}
-            curr_asks = {ask[0]: ask[1] for ask in curr_snapshot['asks']}
+        for side, prices, sizes in (
+            ('bid', window['bid_prices'], window['bid_sizes']),
+            ('ask', window['ask_prices'], window['ask_sizes']),
+        ):
+            prev_prices, curr_prices = prices[:-1], prices[1:]
+            prev_sizes = sizes[:-1]
             
-            # Finde verschwundene Bids
-            for price, size in prev_bids.items():
-                if price not in curr_bids and size > 0:
-                    # Order verschwunden
-                    cancellations.append({
-                        'timestamp': curr_snapshot['timestamp'],
-                        'price': price,
-                        'size': size,
-                        'side': 'bid',
-                        'value_usd': price * size
-                    })
+            # Level of the previous snapshot still present in the next one?
+            still_there = (prev_prices[:, :, None] == curr_prices[:, None, :]).any(axis=2)
+            vanished = ~still_there & (prev_sizes > 0)
             
-            # Finde verschwundene Asks
-            for price, size in prev_asks.items():
-                if price not in curr_asks and size > 0:
-                    cancellations.append({
-                        'timestamp': curr_snapshot['timestamp'],
-                        'price': price,
-                        'size': size,
-                        'side': 'ask',
-                        'value_usd': price * size
-                    })
+            rows, cols = np.nonzero(vanished)
+            records = self._level_records(timestamps[1:], rows, cols, prev_prices, prev_sizes, side)
+            cancellations.extend(records)
         
         # Sortiere nach Value
         cancellations.sort(key=lambda x: x['value_usd'], reverse=True)
         
-        return cancellations[:30]  # Top 30
+        return cancellations[:limit]
     
-    def _analyze_spread_changes(self, snapshots: List[Dict]) -> Dict[str, Any]:
+    def _analyze_spread_changes(self, window: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """
         Analysiert Spread-Veränderungen
         
         Hohe Volatilität im Spread = Hohe Unsicherheit/Aktivität
         """
-        spreads = [s['spread'] for s in snapshots if s.get('spread')]
-        spread_pcts = [s['spread_pct'] for s in snapshots if s.get('spread_pct')]
+        spreads = window['spreads']
+        spreads = spreads[~np.isnan(spreads) & (spreads != 0)]
+        spread_pcts = window['spread_pcts']
+        spread_pcts = spread_pcts[~np.isnan(spread_pcts) & (spread_pcts != 0)]
         
-        if not spreads:
+        if not len(spreads):
             return {}
         
         return {
-            'min_spread': min(spreads),
-            'max_spread': max(spreads),
-            'avg_spread': np.mean(spreads),
-            'spread_volatility': np.std(spreads),
-            'avg_spread_pct': np.mean(spread_pcts) if spread_pcts else 0,
+            'min_spread': float(spreads.min()),
+            'max_spread': float(spreads.max()),
+            'avg_spread': float(spreads.mean()),
+            'spread_volatility': float(spreads.std()),
+            'avg_spread_pct': float(spread_pcts.mean()) if len(spread_pcts) else 0,
         }
     
-    def _analyze_liquidity(self, snapshots: List[Dict]) -> Dict[str, Any]:
+    def _analyze_liquidity(self, window: Dict[str, np.ndarray]) -> Dict[str, Any]:
         """
         Analysiert Liquiditäts-Profil
         
         Wie tief ist das Orderbook?
         """
-        # Berechne durchschnittliche Liquidität pro Level
-        bid_liquidity = []
-        ask_liquidity = []
+        # Liquidität pro Snapshot (Summe über alle Levels)
+        bid_liquidity = np.nansum(window['bid_sizes'], axis=1)
+        ask_liquidity = np.nansum(window['ask_sizes'], axis=1)
         
-        for snapshot in snapshots:
-            bid_liquidity.append(sum(bid[1] for bid in snapshot['bids']))
-            ask_liquidity.append(sum(ask[1] for ask in snapshot['asks']))
+        avg_bid = float(bid_liquidity.mean())
+        avg_ask = float(ask_liquidity.mean())
         
         return {
-            'avg_bid_liquidity': np.mean(bid_liquidity),
-            'avg_ask_liquidity': np.mean(ask_liquidity),
-            'liquidity_imbalance': np.mean(bid_liquidity) - np.mean(ask_liquidity),
-            'liquidity_ratio': np.mean(bid_liquidity) / np.mean(ask_liquidity) if np.mean(ask_liquidity) > 0 else 0,
+            'avg_bid_liquidity': avg_bid,
+            'avg_ask_liquidity': avg_ask,
+            'liquidity_imbalance': avg_bid - avg_ask,
+            'liquidity_ratio': avg_bid / avg_ask if avg_ask > 0 else 0,
         }
     
     def _empty_analysis(self) -> Dict[str, Any]:
@@ -0,0 +1,290 @@
+"""
+Orderbook Recorder - Kontinuierliche Orderbook-Aufzeichnung pro Symbol
+
+Statt dass jeder Request für die Dauer einer Candle selbst pollt, läuft pro
+(exchange, symbol) EIN Hintergrund-Recorder:
+- Binance: Partial-Depth WebSocket (depth20@1000ms)
+- Andere Exchanges / WebSocket-Fehler: REST fetch_orderbook im festen Takt
+- Snapshots landen in einem begrenzten Ring-Buffer (NumPy Arrays)
+- Analysen für beliebige vergangene Fenster ohne Warten
+
+Recorder ohne Zugriffe beenden sich nach `idle_timeout_seconds` selbst.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - REST fallback only
+    websockets = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderbookRingBuffer:
+    """
+    Fester Ring-Buffer für Orderbook-Snapshots
+
+    Levels werden als (capacity, depth) Arrays gespeichert, fehlende Levels
+    sind NaN. Fenster-Abfragen liefern chronologisch gestapelte Kopien.
+    """
+
+    def __init__(self, capacity: int = 360, depth: int = 20):
+        self.capacity = capacity
+        self.depth = depth
+
+        self.timestamps = np.full(capacity, np.nan)
+        self.bid_prices = np.full((capacity, depth), np.nan)
+        self.bid_sizes = np.full((capacity, depth), np.nan)
+        self.ask_prices = np.full((capacity, depth), np.nan)
+        self.ask_sizes = np.full((capacity, depth), np.nan)
+        self.spreads = np.full(capacity, np.nan)
+        self.spread_pcts = np.full(capacity, np.nan)
+
+        self._next = 0
+        self.count = 0
+
+    def _levels(self, levels: List) -> Tuple[np.ndarray, np.ndarray]:
+        prices = np.full(self.depth, np.nan)
+        sizes = np.full(self.depth, np.nan)
+        rows = [(float(level[0]), float(level[1])) for level in levels[:self.depth]]
+        if rows:
+            data = np.asarray(rows)
+            prices[:len(rows)] = data[:, 0]
+            sizes[:len(rows)] = data[:, 1]
+        return prices, sizes
+
+    def append(
+        self,
+        timestamp: float,
+        bids: List,
+        asks: List,
+        spread: Optional[float] = None,
+        spread_pct: Optional[float] = None
+    ):
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.bid_prices[i], self.bid_sizes[i] = self._levels(bids)
+        self.ask_prices[i], self.ask_sizes[i] = self._levels(asks)
+        self.spreads[i] = spread if spread is not None else np.nan
+        self.spread_pcts[i] = spread_pct if spread_pct is not None else np.nan
+
+        self._next = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, start_ts: float, end_ts: float) -> Dict[str, np.ndarray]:
+        """Snapshots mit start_ts <= ts <= end_ts, ältester zuerst"""
+        if self.count < self.capacity:
+            order = np.arange(self.count)
+        else:
+            order = np.roll(np.arange(self.capacity), -self._next)
+
+        ts = self.timestamps[order]
+        order = order[(ts >= start_ts) & (ts <= end_ts)]
+
+        return {
+            'timestamps': self.timestamps[order],
+            'bid_prices': self.bid_prices[order],
+            'bid_sizes': self.bid_sizes[order],
+            'ask_prices': self.ask_prices[order],
+            'ask_sizes': self.ask_sizes[order],
+            'spreads': self.spreads[order],
+            'spread_pcts': self.spread_pcts[order],
+        }
+
+    @property
+    def latest_timestamp(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return float(self.timestamps[(self._next - 1) % self.capacity])
+
+
+class OrderbookRecorder:
+    """Hintergrund-Recorder für ein (exchange, symbol)"""
+
+    BINANCE_DEPTH_URL = "wss://stream.binance.com:9443/ws/{symbol}@depth20@1000ms"
+
+    def __init__(
+        self,
+        exchange_collector,
+        symbol: str,
+        depth: int = 20,
+        interval_seconds: float = 10,
+        capacity: int = 360,
+        idle_timeout_seconds: float = 1800,
+        use_websocket: bool = True
+    ):
+        """
+        Args:
+            exchange_collector: ExchangeCollector (REST fallback)
+            symbol: Trading Pair
+            depth: Gespeicherte Levels pro Seite
+            interval_seconds: Snapshot-Takt
+            capacity: Ring-Buffer Größe (default: 1h bei 10s)
+            idle_timeout_seconds: Stoppt nach so langer Zeit ohne Abfrage
+            use_websocket: WebSocket nutzen wo verfügbar
+        """
+        self.collector = exchange_collector
+        self.exchange_name = getattr(exchange_collector, 'exchange_name', 'unknown').lower()
+        self.symbol = symbol
+        self.interval_seconds = interval_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.use_websocket = use_websocket and websockets is not None
+
+        self.buffer = OrderbookRingBuffer(capacity=capacity, depth=depth)
+        self.source = None
+        self.errors = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._new_snapshot = asyncio.Event()
+        self._last_access = time.monotonic()
+
+    # ==================== LIFECYCLE ====================
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.is_running:
+            self._last_access = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📚 Orderbook recorder started: {self.exchange_name} {self.symbol}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _is_idle(self) -> bool:
+        return time.monotonic() - self._last_access > self.idle_timeout_seconds
+
+    def _record(self, bids: List, asks: List, spread: Optional[float] = None, spread_pct: Optional[float] = None):
+        if spread is None and bids and asks:
+            best_bid, best_ask = float(bids[0][0]), float(asks[0][0])
+            spread = best_ask - best_bid
+            spread_pct = (spread / best_bid) * 100 if best_bid else None
+
+        self.buffer.append(time.time(), bids, asks, spread, spread_pct)
+        self._new_snapshot.set()
+
+    async def _run(self):
+        try:
+            if self.use_websocket and self.exchange_name == 'binance':
+                await self._record_binance_ws()
+            if not self._is_idle():
+                await self._record_rest()
+        finally:
+            logger.info(f"📚 Orderbook recorder stopped: {self.exchange_name} {self.symbol}")
+
+    async def _record_binance_ws(self):
+        """Binance Partial Depth Stream, gespeichert im Snapshot-Takt"""
+        url = self.BINANCE_DEPTH_URL.format(symbol=self.symbol.replace('/', '').lower())
+
+        try:
+            async with websockets.connect(url) as websocket:
+                self.source = 'websocket'
+                last_recorded = 0.0
+
+                while not self._is_idle():
+                    message = await asyncio.wait_for(websocket.recv(), timeout=30)
+                    now = time.monotonic()
+                    if now - last_recorded < self.interval_seconds:
+                        continue
+
+                    data = json.loads(message)
+                    self._record(data.get('bids', []), data.get('asks', []))
+                    last_recorded = now
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Orderbook WebSocket failed ({self.symbol}): {e} → REST fallback")
+
+    async def _record_rest(self):
+        """REST Polling im festen Takt (unabhängig von der Request-Dauer)"""
+        self.source = 'rest'
+        depth = self.buffer.depth
+
+        while not self._is_idle():
+            started = time.monotonic()
+            try:
+                orderbook = await self.collector.fetch_orderbook(symbol=self.symbol, limit=max(depth, 50))
+                self._record(
+                    orderbook['bids'][:depth],
+                    orderbook['asks'][:depth],
+                    orderbook.get('spread'),
+                    orderbook.get('spread_pct')
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Orderbook snapshot failed: {e}")
+
+            await asyncio.sleep(max(0.0, self.interval_seconds - (time.monotonic() - started)))
+
+    # ==================== READ ====================
+
+    def window(self, start_ts: float, end_ts: float) -> Dict[str, np.ndarray]:
+        self._last_access = time.monotonic()
+        return self.buffer.window(start_ts, end_ts)
+
+    async def wait_for_snapshots(self, min_snapshots: int, start_ts: float, timeout: float) -> Dict[str, np.ndarray]:
+        """Wartet (max. timeout) bis das Fenster ab start_ts min_snapshots enthält"""
+        deadline = time.monotonic() + timeout
+
+        while True:
+            window = self.window(start_ts, time.time())
+            remaining = deadline - time.monotonic()
+            if len(window['timestamps']) >= min_snapshots or remaining <= 0 or not self.is_running:
+                return window
+
+            self._new_snapshot.clear()
+            try:
+                await asyncio.wait_for(self._new_snapshot.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        latest = self.buffer.latest_timestamp
+        return {
+            'exchange': self.exchange_name,
+            'symbol': self.symbol,
+            'running': self.is_running,
+            'source': self.source,
+            'snapshots': self.buffer.count,
+            'capacity': self.buffer.capacity,
+            'latest_snapshot': datetime.fromtimestamp(latest, tz=timezone.utc) if latest else None,
+            'errors': self.errors,
+        }
+
+
+_recorders: Dict[Tuple[str, str], OrderbookRecorder] = {}
+
+
+def get_orderbook_recorder(exchange_collector, symbol: str, **kwargs) -> OrderbookRecorder:
+    """
+    Geteilter Recorder pro (exchange, symbol) - startet ihn bei Bedarf
+
+    Muss innerhalb eines laufenden Event Loops aufgerufen werden.
+    """
+    key = (getattr(exchange_collector, 'exchange_name', 'unknown').lower(), symbol)
+
+    recorder = _recorders.get(key)
+    if recorder is None:
+        recorder = _recorders[key] = OrderbookRecorder(exchange_collector, symbol, **kwargs)
+
+    recorder.start()
+    return recorder
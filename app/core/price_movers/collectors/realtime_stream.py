@@ -10,8 +10,8 @@ Für LIVE-Analyse (< 5 Minuten):
 import asyncio
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Callable
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Tuple
 import websockets
 
 
@@ -27,9 +27,11 @@ class RealtimeTradeStream:
     Unterstützt:
     - Bitget WebSocket
     - Binance WebSocket
-    - (Kraken: TODO)
+    - Kraken WebSocket (v2)
     """
     
+    SUPPORTED_EXCHANGES = ('bitget', 'binance', 'kraken')
+    
     def __init__(self, exchange_name: str):
         """
         Args:
@@ -45,7 +47,8 @@ class RealtimeTradeStream:
         self,
         symbol: str,
         duration_seconds: int = 300,  # 5 Minuten
-        on_trade_callback: Optional[Callable] = None
+        on_trade_callback: Optional[Callable] = None,
+        shared: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Streamt Trades für eine Candle-Duration
@@ -54,6 +57,7 @@ class RealtimeTradeStream:
             symbol: Trading Pair (z.B. 'BTC/USDT')
             duration_seconds: Wie lange streamen (default: 300s = 5min)
             on_trade_callback: Optional callback für jeden Trade
+            shared: Geteilte Upstream-Verbindung pro (exchange, symbol) nutzen
             
         Returns:
             Liste aller Trades
@@ -62,19 +66,45 @@ class RealtimeTradeStream:
             f"Starte WebSocket Stream für {symbol} ({duration_seconds}s)"
         )
         
+        if self.exchange_name not in self.SUPPORTED_EXCHANGES:
+            logger.error(f"WebSocket streaming not implemented for {self.exchange_name}")
+            return []
+        
         self.trades = []
         self.is_streaming = True
         
-        # Exchange-spezifische Implementation
-        if self.exchange_name == 'bitget':
-            await self._stream_bitget(symbol, duration_seconds, on_trade_callback)
-        elif self.exchange_name == 'binance':
-            await self._stream_binance(symbol, duration_seconds, on_trade_callback)
-        elif self.exchange_name == 'kraken':
-            await self._stream_kraken(symbol, duration_seconds, on_trade_callback)
+        if shared:
+            from .trade_stream_hub import get_trade_stream_hub
+            hub = get_trade_stream_hub(self.exchange_name, symbol)
+            queue = hub.subscribe()
+            pump = None
         else:
-            logger.error(f"WebSocket streaming not implemented for {self.exchange_name}")
-            return []
+            hub = None
+            queue = asyncio.Queue()
+            pump = asyncio.create_task(self._pump(symbol, queue))
+        
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + duration_seconds
+        
+        try:
+            while self.is_streaming:
+                remaining = end_time - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    # Timeout damit wir end_time checken können
+                    trade = await asyncio.wait_for(queue.get(), timeout=min(remaining, 1.0))
+                except asyncio.TimeoutError:
+                    continue
+                
+                self.trades.append(trade)
+                if on_trade_callback:
+                    on_trade_callback(trade)
+        finally:
+            if hub is not None:
+                hub.unsubscribe(queue)
+            if pump is not None:
+                pump.cancel()
         
         self.is_streaming = False
         
@@ -82,122 +112,96 @@ class RealtimeTradeStream:
         
         return self.trades
     
-    async def _stream_bitget(
-        self,
-        symbol: str,
-        duration_seconds: int,
-        callback: Optional[Callable]
-    ):
-        """Bitget WebSocket Stream"""
-        
-        # Konvertiere Symbol Format: BTC/USDT → BTCUSDT_SPBL
-        symbol_formatted = symbol.replace('/', '') + '_SPBL'
+    async def _pump(self, symbol: str, queue: asyncio.Queue):
+        async for trade in self.iter_trades(symbol):
+            queue.put_nowait(trade)
+    
+    async def iter_trades(self, symbol: str, reconnect_delay: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Eigene WebSocket-Verbindung: geparste Trades, bis stop_streaming()
         
-        ws_url = "wss://ws.bitget.com/spot/v1/stream"
+        Verbindungsabbrüche werden mit Backoff (max. 30s) neu aufgebaut.
+        """
+        ws_url, subscribe_msg = self._connection(symbol)
+        delay = reconnect_delay
+        self.is_streaming = True
         
-        try:
-            async with websockets.connect(ws_url) as websocket:
-                # Subscribe zu Trades
-                subscribe_msg = {
-                    "op": "subscribe",
-                    "args": [{
-                        "instType": "sp",
-                        "channel": "trade",
-                        "instId": symbol_formatted
-                    }]
-                }
-                
-                await websocket.send(json.dumps(subscribe_msg))
-                logger.info(f"Bitget: Subscribed to {symbol_formatted}")
-                
-                # Stream für duration_seconds
-                end_time = datetime.now() + timedelta(seconds=duration_seconds)
-                
-                while datetime.now() < end_time and self.is_streaming:
-                    try:
-                        # Timeout damit wir end_time checken können
-                        message = await asyncio.wait_for(
-                            websocket.recv(),
-                            timeout=1.0
-                        )
+        while self.is_streaming:
+            try:
+                async with websockets.connect(ws_url) as websocket:
+                    if subscribe_msg:
+                        await websocket.send(json.dumps(subscribe_msg))
+                    logger.info(f"{self.exchange_name}: Connected to {symbol} trades")
+                    delay = reconnect_delay
+                    
+                    async for message in websocket:
+                        try:
+                            trades = self._parse_message(json.loads(message), symbol)
+                        except Exception as e:
+                            logger.warning(f"Stream message error: {e}")
+                            continue
                         
-                        data = json.loads(message)
+                        for trade in trades:
+                            yield trade
                         
-                        # Prüfe ob Trade-Data
-                        if data.get('action') in ['snapshot', 'update']:
-                            for trade_raw in data.get('data', []):
-                                trade = self._parse_bitget_trade(trade_raw, symbol)
-                                self.trades.append(trade)
-                                
-                                if callback:
-                                    callback(trade)
-                    
-                    except asyncio.TimeoutError:
-                        # Normal - weiter streamen
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Stream message error: {e}")
-                        continue
-                
-        except Exception as e:
-            logger.error(f"Bitget WebSocket error: {e}", exc_info=True)
+                        if not self.is_streaming:
+                            return
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.exchange_name} WebSocket error: {e}")
+            
+            if self.is_streaming:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
     
-    async def _stream_binance(
-        self,
-        symbol: str,
-        duration_seconds: int,
-        callback: Optional[Callable]
-    ):
-        """Binance WebSocket Stream"""
+    def _connection(self, symbol: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """(WebSocket URL, Subscribe-Message) pro Exchange"""
+        if self.exchange_name == 'bitget':
+            # Konvertiere Symbol Format: BTC/USDT → BTCUSDT_SPBL
+            symbol_formatted = symbol.replace('/', '') + '_SPBL'
+            return "wss://ws.bitget.com/spot/v1/stream", {
+                "op": "subscribe",
+                "args": [{
+                    "instType": "sp",
+                    "channel": "trade",
+                    "instId": symbol_formatted
+                }]
+            }
         
-        # Konvertiere Symbol: BTC/USDT → btcusdt
+        if self.exchange_name == 'kraken':
+            # Kraken v2 nutzt das Symbol-Format BTC/USDT direkt
+            return "wss://ws.kraken.com/v2", {
+                "method": "subscribe",
+                "params": {
+                    "channel": "trade",
+                    "symbol": [symbol],
+                    "snapshot": False
+                }
+            }
+        
+        # Binance - Konvertiere Symbol: BTC/USDT → btcusdt
         symbol_formatted = symbol.replace('/', '').lower()
+        return f"wss://stream.binance.com:9443/ws/{symbol_formatted}@trade", None
+    
+    def _parse_message(self, data: Dict[str, Any], symbol: str) -> List[Dict[str, Any]]:
+        """WebSocket Message → Trades (leer für Nicht-Trade Messages)"""
+        if self.exchange_name == 'bitget':
+            if data.get('action') in ['snapshot', 'update']:
+                return [self._parse_bitget_trade(trade_raw, symbol) for trade_raw in data.get('data', [])]
+            return []
         
-        ws_url = f"wss://stream.binance.com:9443/ws/{symbol_formatted}@trade"
+        if self.exchange_name == 'kraken':
+            # Heartbeats, Status und Subscribe-Acks haben keinen trade-Channel
+            if data.get('channel') == 'trade' and data.get('type') in ['snapshot', 'update']:
+                return [self._parse_kraken_trade(trade_raw, symbol) for trade_raw in data.get('data', [])]
+            return []
         
-        try:
-            async with websockets.connect(ws_url) as websocket:
-                logger.info(f"Binance: Connected to {symbol_formatted}@trade")
-                
-                # Stream für duration_seconds
-                end_time = datetime.now() + timedelta(seconds=duration_seconds)
-                
-                while datetime.now() < end_time and self.is_streaming:
-                    try:
-                        message = await asyncio.wait_for(
-                            websocket.recv(),
-                            timeout=1.0
-                        )
-                        
-                        data = json.loads(message)
-                        
-                        # Binance Trade Format
-                        if data.get('e') == 'trade':
-                            trade = self._parse_binance_trade(data, symbol)
-                            self.trades.append(trade)
-                            
-                            if callback:
-                                callback(trade)
-                    
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Stream message error: {e}")
-                        continue
-                
-        except Exception as e:
-            logger.error(f"Binance WebSocket error: {e}", exc_info=True)
-    
-    async def _stream_kraken(
-        self,
-        symbol: str,
-        duration_seconds: int,
-        callback: Optional[Callable]
-    ):
-        """Kraken WebSocket Stream (TODO: Implementieren wenn gewünscht)"""
-        logger.warning("Kraken WebSocket streaming not yet implemented")
-        # Kraken nutzt anderes WebSocket Protokoll
-        # Implementation analog zu Bitget/Binance möglich
+        # Binance Trade Format
+        if data.get('e') == 'trade':
+            return [self._parse_binance_trade(data, symbol)]
+        return []
     
     def _parse_bitget_trade(self, trade_raw: Dict, symbol: str) -> Dict[str, Any]:
         """Parsed Bitget Trade Format"""
@@ -225,6 +229,20 @@ class RealtimeTradeStream:
             'source': 'websocket'
         }
     
+    def _parse_kraken_trade(self, trade_raw: Dict, symbol: str) -> Dict[str, Any]:
+        """Parsed Kraken v2 Trade Format (timestamp als RFC3339 in UTC)"""
+        traded_at = datetime.fromisoformat(trade_raw['timestamp'].replace('Z', '+00:00'))
+        return {
+            'id': str(trade_raw.get('trade_id')),
+            'timestamp': datetime.fromtimestamp(traded_at.timestamp()),
+            'trade_type': 'buy' if trade_raw['side'] == 'buy' else 'sell',
+            'amount': float(trade_raw['qty']),
+            'price': float(trade_raw['price']),
+            'value_usd': float(trade_raw['qty']) * float(trade_raw['price']),
+            'symbol': symbol,
+            'source': 'websocket'
+        }
+    
     def stop_streaming(self):
         """Stoppt den Stream vorzeitig"""
         self.is_streaming = False
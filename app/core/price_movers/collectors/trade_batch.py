@@ -0,0 +1,298 @@
+"""
+Trade Batch - Typisierte Trades als Struct-of-Arrays
+
+Jeder Collector liefert Trade-Dicts mit eigenen Keys (wallet_address,
+wallet_id, fromUserAccount, signature/id/tx_hash, trade_type/side, ...).
+Statt dass Dedup, Validierung, Gruppierung und Serialisierung diese Dicts
+jeweils neu normalisieren, werden sie EINMAL an der Collector-Grenze in
+Spalten überführt:
+
+- ts / amount / price / value_usd / liquidity_delta als float64
+- side und transaction_type als int8-Codes
+- Wallet- und Trade-IDs interned (int32-Code + Tabelle)
+- Die Original-Dicts bleiben als `rows` erhalten (für Felder ohne Spalte)
+
+Alle Bulk-Operationen (Dedup, Sortierung, Filter, Group-By) liefern Index-
+Arrays bzw. neue Batches, die sich Wallet-Tabelle und Rows teilen.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .trade_tape import to_epoch, trade_wallet
+
+
+# Gleiche Codes wie ImpactCalculator._SIDE_CODES (alles andere zählt als swap)
+SIDE_BUY, SIDE_SELL, SIDE_OTHER = 0, 1, 2
+SIDE_CODES = {'buy': SIDE_BUY, 'sell': SIDE_SELL}
+SIDE_NAMES = np.array(['buy', 'sell', 'swap'], dtype=object)
+
+TX_SWAP, TX_ADD_LIQUIDITY, TX_REMOVE_LIQUIDITY = 0, 1, 2
+TX_CODES = {'SWAP': TX_SWAP, 'ADD_LIQUIDITY': TX_ADD_LIQUIDITY, 'REMOVE_LIQUIDITY': TX_REMOVE_LIQUIDITY}
+TX_NAMES = np.array(['SWAP', 'ADD_LIQUIDITY', 'REMOVE_LIQUIDITY'], dtype=object)
+
+
+def native_trade_id(trade: Dict[str, Any]) -> Optional[str]:
+    """Native Trade-ID (gleiche Reihenfolge wie bisher in _deduplicate_trades)"""
+    return (
+        trade.get('signature') or
+        trade.get('transaction_hash') or
+        trade.get('id') or
+        trade.get('tx_hash')
+    )
+
+
+class TradeBatch:
+    """Trades einer Quelle als Spalten (ein Index = ein Trade)"""
+
+    def __init__(
+        self,
+        ts: np.ndarray,
+        amount: np.ndarray,
+        price: np.ndarray,
+        value_usd: np.ndarray,
+        side: np.ndarray,
+        tx_type: np.ndarray,
+        liquidity_delta: np.ndarray,
+        trade_count: np.ndarray,
+        wallet: np.ndarray,
+        wallet_codes: Dict[str, int],
+        trade_id: np.ndarray,
+        rows: List[Dict[str, Any]],
+        source: str = 'unknown',
+        wallets: Optional[List[str]] = None
+    ):
+        self.ts = ts
+        self.amount = amount
+        self.price = price
+        self.value_usd = value_usd
+        self.side = side
+        self.tx_type = tx_type
+        self.liquidity_delta = liquidity_delta
+        self.trade_count = trade_count
+        self.wallet = wallet
+        self.wallet_codes = wallet_codes
+        self.wallets = wallets if wallets is not None else list(wallet_codes)
+        self.trade_id = trade_id
+        self.rows = rows
+        self.source = source
+
+    # ==================== BUILD ====================
+
+    @classmethod
+    def from_trades(
+        cls,
+        trades: Iterable[Dict[str, Any]],
+        source: str = 'unknown',
+        with_wallets: bool = True
+    ) -> 'TradeBatch':
+        """
+        Collector-Dicts → Batch (ein Durchlauf)
+
+        Args:
+            trades: Trade-Dicts beliebiger Collectors
+            source: 'cex' / 'dex' / Collector-Name
+            with_wallets: False für CEX (keine echten Wallet-IDs)
+        """
+        rows = list(trades)
+        n = len(rows)
+
+        ts = np.empty(n)
+        amount = np.empty(n)
+        price = np.empty(n)
+        value_usd = np.empty(n)
+        side = np.empty(n, dtype=np.int8)
+        tx_type = np.empty(n, dtype=np.int8)
+        liquidity_delta = np.empty(n)
+        trade_count = np.empty(n, dtype=np.int32)
+        wallet = np.full(n, -1, dtype=np.int32)
+        trade_id = np.full(n, -1, dtype=np.int32)
+
+        wallet_codes: Dict[str, int] = {}
+        id_codes: Dict[str, int] = {}
+        side_codes = SIDE_CODES
+        tx_codes = TX_CODES
+
+        for i, trade in enumerate(rows):
+            epoch = to_epoch(trade.get('timestamp'))
+            ts[i] = np.nan if epoch is None else epoch
+
+            a = float(trade.get('amount') or 0)
+            p = float(trade.get('price') or 0)
+            amount[i] = a
+            price[i] = p
+            value = trade.get('value_usd')
+            value_usd[i] = a * p if value is None else float(value)
+
+            side[i] = side_codes.get((trade.get('trade_type') or trade.get('side') or '').lower(), SIDE_OTHER)
+            tx_type[i] = tx_codes.get(trade.get('transaction_type') or 'SWAP', TX_SWAP)
+            liquidity_delta[i] = float(trade.get('liquidity_delta') or 0)
+            trade_count[i] = trade.get('trade_count') or 1
+
+            if with_wallets:
+                address = trade_wallet(trade)
+                if address:
+                    code = wallet_codes.get(address)
+                    if code is None:
+                        code = wallet_codes[address] = len(wallet_codes)
+                    wallet[i] = code
+
+            native = native_trade_id(trade)
+            if native:
+                code = id_codes.get(native)
+                if code is None:
+                    code = id_codes[native] = len(id_codes)
+                trade_id[i] = code
+
+        return cls(
+            ts=ts,
+            amount=amount,
+            price=price,
+            value_usd=value_usd,
+            side=side,
+            tx_type=tx_type,
+            liquidity_delta=liquidity_delta,
+            trade_count=trade_count,
+            wallet=wallet,
+            wallet_codes=wallet_codes,
+            trade_id=trade_id,
+            rows=rows,
+            source=source
+        )
+
+    def take(self, index: np.ndarray) -> 'TradeBatch':
+        """Teil-Batch für Index-Array oder Bool-Maske (Tabellen werden geteilt)"""
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        rows = self.rows
+        return TradeBatch(
+            ts=self.ts[index],
+            amount=self.amount[index],
+            price=self.price[index],
+            value_usd=self.value_usd[index],
+            side=self.side[index],
+            tx_type=self.tx_type[index],
+            liquidity_delta=self.liquidity_delta[index],
+            trade_count=self.trade_count[index],
+            wallet=self.wallet[index],
+            wallet_codes=self.wallet_codes,
+            trade_id=self.trade_id[index],
+            rows=[rows[i] for i in index],
+            source=self.source,
+            wallets=self.wallets
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ==================== BULK OPS ====================
+
+    def unique_mask(self) -> np.ndarray:
+        """Erstes Vorkommen jeder Trade-ID; Trades ohne ID bleiben alle erhalten"""
+        mask = self.trade_id < 0
+        if len(self.trade_id):
+            _, first = np.unique(self.trade_id, return_index=True)
+            mask[first] = True
+        return mask
+
+    def deduplicate(self) -> 'TradeBatch':
+        return self.take(self.unique_mask())
+
+    def time_order(self) -> np.ndarray:
+        """Stabile Sortierung nach Zeit (Trades ohne Zeitstempel zuerst)"""
+        return np.argsort(np.nan_to_num(self.ts, nan=-np.inf), kind='stable')
+
+    def in_window(self, start_ts: float, end_ts: float) -> np.ndarray:
+        return (self.ts >= start_ts) & (self.ts <= end_ts)
+
+    def wallet_mask(self, address: str) -> np.ndarray:
+        code = self.wallet_codes.get(address)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.wallet == code
+
+    @property
+    def is_liquidity(self) -> np.ndarray:
+        return self.tx_type != TX_SWAP
+
+    def group_by_wallet(self, index: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Trades mit Wallet nach Wallet gruppieren
+
+        Args:
+            index: Optional Teilmenge (Reihenfolge bestimmt Gruppen- und Trade-Reihenfolge)
+
+        Returns:
+            (wallet_codes, order, counts) - Wallets in Reihenfolge des ersten
+            Auftretens; `order` sind Trade-Indizes, pro Wallet zusammenhängend
+            und innerhalb des Wallets in Eingangsreihenfolge
+        """
+        if index is None:
+            index = np.arange(len(self))
+        index = np.asarray(index, dtype=np.int64)
+        index = index[self.wallet[index] >= 0]
+        if not len(index):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+
+        codes, first, inverse = np.unique(self.wallet[index], return_index=True, return_inverse=True)
+        # Gruppen-Rang = Reihenfolge des ersten Auftretens
+        rank = np.empty(len(codes), dtype=np.int64)
+        rank[np.argsort(first, kind='stable')] = np.arange(len(codes))
+        group = rank[inverse]
+
+        order = index[np.argsort(group, kind='stable')]
+        counts = np.bincount(group, minlength=len(codes))
+        return codes[np.argsort(rank)], order, counts
+
+    def assign_wallet(self, index: Iterable[int], label: str):
+        """Trades einem Wallet/Entity-Label zuordnen (z.B. CEX Entity-ID)"""
+        code = self.wallet_codes.get(label)
+        if code is None:
+            code = self.wallet_codes[label] = len(self.wallets)
+            self.wallets.append(label)
+        self.wallet[np.fromiter(index, dtype=np.int64)] = code
+
+    # ==================== OUTPUT ====================
+
+    def datetime_at(self, i: int) -> Optional[datetime]:
+        ts = self.ts[i]
+        return None if np.isnan(ts) else datetime.fromtimestamp(float(ts), tz=timezone.utc)
+
+    def wallet_at(self, i: int) -> Optional[str]:
+        code = self.wallet[i]
+        return self.wallets[code] if code >= 0 else None
+
+    def to_dicts(self, index: Optional[Iterable[int]] = None, with_ids: bool = False) -> List[Dict[str, Any]]:
+        """
+        Normalisierte Trade-Dicts (einheitliche Keys)
+
+        Args:
+            with_ids: 'id' = Batch-Index (zum Zurückschreiben von Ergebnissen)
+        """
+        if index is None:
+            index = range(len(self))
+        result = []
+        for i in index:
+            row = self.rows[i]
+            trade = {
+                'timestamp': row.get('timestamp'),
+                'trade_type': SIDE_NAMES[self.side[i]] if self.side[i] != SIDE_OTHER else (
+                    (row.get('trade_type') or row.get('side') or 'unknown').lower()
+                ),
+                'amount': float(self.amount[i]),
+                'price': float(self.price[i]),
+                'value_usd': float(self.value_usd[i]),
+                'trade_count': int(self.trade_count[i]),
+                'wallet_address': self.wallet_at(i),
+                'transaction_type': TX_NAMES[self.tx_type[i]],
+                'liquidity_delta': float(self.liquidity_delta[i]),
+                'source': self.source,
+            }
+            if with_ids:
+                trade['id'] = str(i)
+            result.append(trade)
+        return result
@@ -0,0 +1,176 @@
+"""
+Trade Stream Hub - Eine Upstream-Verbindung pro (exchange, symbol)
+
+Statt dass jeder Stream-Request eine eigene WebSocket-Verbindung zur
+Exchange öffnet, verteilt EIN Hub die Trades an beliebig viele Abnehmer:
+- Subscriber: begrenzte asyncio.Queue pro Abnehmer; langsame Abnehmer
+  verlieren die ältesten Trades statt den Upstream zu blockieren
+- Listener: synchrone Callbacks, die jeden Trade inline verarbeiten
+  (z.B. StreamingMoverEngine.add_trade, O(1) pro Trade)
+
+Ohne Subscriber und Listener beendet sich der Upstream nach
+`idle_timeout_seconds` selbst.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .realtime_stream import RealtimeTradeStream
+
+
+logger = logging.getLogger(__name__)
+
+
+class TradeStreamHub:
+    """Fan-out eines Trade-Streams für ein (exchange, symbol)"""
+
+    def __init__(
+        self,
+        exchange_name: str,
+        symbol: str,
+        queue_size: int = 10_000,
+        idle_timeout_seconds: float = 30
+    ):
+        """
+        Args:
+            exchange_name: 'bitget', 'binance', ...
+            symbol: Trading Pair (z.B. 'BTC/USDT')
+            queue_size: Max. gepufferte Trades pro Subscriber
+            idle_timeout_seconds: Nachlaufzeit ohne Abnehmer
+        """
+        self.exchange_name = exchange_name.lower()
+        self.symbol = symbol
+        self.queue_size = queue_size
+        self.idle_timeout_seconds = idle_timeout_seconds
+
+        self.stream = RealtimeTradeStream(self.exchange_name)
+        self.subscribers: List[asyncio.Queue] = []
+        self.listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        self.stats = {'trades': 0, 'dropped': 0, 'listener_errors': 0}
+
+        self._task: Optional[asyncio.Task] = None
+        self._idle_task: Optional[asyncio.Task] = None
+
+    # ==================== LIFECYCLE ====================
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def has_consumers(self) -> bool:
+        return bool(self.subscribers or self.listeners)
+
+    def start(self):
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"📡 Trade stream hub started: {self.exchange_name} {self.symbol}")
+
+    async def stop(self):
+        self.stream.stop_streaming()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _schedule_idle_stop(self):
+        if not self.has_consumers and self.is_running and self._idle_task is None:
+            self._idle_task = asyncio.create_task(self._stop_when_idle())
+
+    async def _stop_when_idle(self):
+        await asyncio.sleep(self.idle_timeout_seconds)
+        self._idle_task = None
+        if not self.has_consumers:
+            await self.stop()
+
+    async def _run(self):
+        try:
+            async for trade in self.stream.iter_trades(self.symbol):
+                self.publish(trade)
+        finally:
+            logger.info(f"📡 Trade stream hub stopped: {self.exchange_name} {self.symbol}")
+
+    # ==================== FAN-OUT ====================
+
+    def publish(self, trade: Dict[str, Any]):
+        """Trade an alle Listener und Subscriber verteilen (blockiert nie)"""
+        self.stats['trades'] += 1
+
+        for listener in self.listeners:
+            try:
+                listener(trade)
+            except Exception as e:
+                self.stats['listener_errors'] += 1
+                logger.warning(f"Trade listener failed: {e}")
+
+        for queue in self.subscribers:
+            if queue.full():
+                # Langsamer Abnehmer → ältesten Trade verwerfen
+                queue.get_nowait()
+                self.stats['dropped'] += 1
+            queue.put_nowait(trade)
+
+    def subscribe(self, queue_size: Optional[int] = None) -> asyncio.Queue:
+        """Neue Subscriber-Queue (startet den Upstream bei Bedarf)"""
+        queue = asyncio.Queue(maxsize=queue_size or self.queue_size)
+        self.subscribers.append(queue)
+        self.start()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+        self._schedule_idle_stop()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], Any]):
+        self.listeners.append(listener)
+        self.start()
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], Any]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+        self._schedule_idle_stop()
+
+    async def trades(self, queue_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """`async for trade in hub.trades()` - Subscription für die Dauer der Iteration"""
+        queue = self.subscribe(queue_size)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'exchange': self.exchange_name,
+            'symbol': self.symbol,
+            'running': self.is_running,
+            'subscribers': len(self.subscribers),
+            'listeners': len(self.listeners),
+            **self.stats,
+        }
+
+
+_hubs: Dict[Tuple[str, str], TradeStreamHub] = {}
+
+
+def get_trade_stream_hub(exchange_name: str, symbol: str, **kwargs) -> TradeStreamHub:
+    """
+    Geteilter Hub pro (exchange, symbol)
+
+    Der Upstream startet erst mit dem ersten Subscriber/Listener.
+    """
+    key = (exchange_name.lower(), symbol)
+
+    hub = _hubs.get(key)
+    if hub is None:
+        hub = _hubs[key] = TradeStreamHub(exchange_name, symbol, **kwargs)
+
+    return hub
@@ -0,0 +1,406 @@
+"""
+Trade Tape - Lokaler Trade-Speicher pro (exchange, symbol)
+
+Statt für jede Candle-Analyse und jeden Wallet-Detail-Request die Trades
+erneut von Helius/Dexscreener/CEX zu holen, werden sie einmal in eine
+lokale SQLite-Datenbank geschrieben und danach aus Indizes gelesen.
+
+- Append-only, dedupliziert über Trade-ID (signature / tx hash / id)
+- Zeitindex (exchange, symbol, ts) und Wallet-Index (exchange, symbol, wallet, ts)
+- Merkt sich abgedeckte Zeitfenster → nur Lücken werden nachgeladen
+- Synthetische Trades (OHLCV-Fallback) werden nie gespeichert
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TAPE_PATH = os.getenv('TRADE_TAPE_PATH', os.path.join('data', 'trade_tape.sqlite'))
+
+# Intervals closer than this are merged (seconds)
+COVERAGE_TOLERANCE = 1.0
+
+# Upper bound on source calls per fetch_through (pagination of truncated gaps)
+MAX_GAP_FETCHES = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    trade_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    wallet TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (exchange, symbol, trade_id)
+);
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades (exchange, symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_trades_wallet ON trades (exchange, symbol, wallet, ts);
+
+CREATE TABLE IF NOT EXISTS coverage (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_coverage ON coverage (exchange, symbol, start_ts);
+"""
+
+
+class TradePage(list):
+    """
+    Trades of one source call plus whether they cover the requested range.
+
+    complete=True: everything in the range was returned; False: truncated,
+    only the span of the returned trades is covered; None: unknown, then
+    fetch_through compares the page size against source_limit.
+    """
+
+    def __init__(self, trades: Iterable[Dict[str, Any]] = (), complete: Optional[bool] = None):
+        super().__init__(trades)
+        self.complete = complete
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """Datetime / ISO string / seconds / milliseconds → epoch seconds (naive = UTC)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return to_epoch(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        except ValueError:
+            return None
+    return None
+
+
+def trade_wallet(trade: Dict[str, Any]) -> Optional[str]:
+    """Wallet identifier of a trade (same precedence as wallet detail lookup)."""
+    return (
+        trade.get('wallet_address') or
+        trade.get('wallet_id') or
+        trade.get('fromUserAccount') or
+        trade.get('toUserAccount')
+    )
+
+
+def is_synthetic(trade: Dict[str, Any]) -> bool:
+    """Trade derived from candles (OHLCV fallback) rather than a real fill."""
+    return bool(trade.get('synthetic')) or str(trade.get('id', '')).startswith('ohlcv_')
+
+
+def trade_id(trade: Dict[str, Any], ts: float) -> str:
+    """Stable ID - native ID if present, else a content hash (synthetic CEX trades)."""
+    native = (
+        trade.get('signature') or
+        trade.get('transaction_hash') or
+        trade.get('id') or
+        trade.get('tx_hash')
+    )
+    if native:
+        return str(native)
+
+    content = f"{ts}|{trade.get('trade_type')}|{trade.get('amount')}|{trade.get('price')}|{trade_wallet(trade)}"
+    return 'h:' + hashlib.sha1(content.encode()).hexdigest()
+
+
+def _encode(trade: Dict[str, Any]) -> str:
+    datetimes = [key for key, value in trade.items() if isinstance(value, datetime)]
+    data = {
+        key: value.isoformat() if key in datetimes else value
+        for key, value in trade.items()
+    }
+    if datetimes:
+        data['__datetimes__'] = datetimes
+    return json.dumps(data, default=str)
+
+
+def _decode(payload: str) -> Dict[str, Any]:
+    data = json.loads(payload)
+    for key in data.pop('__datetimes__', []):
+        data[key] = datetime.fromisoformat(data[key])
+    return data
+
+
+class TradeTape:
+    """
+    SQLite-backed trade store with time and wallet indexes.
+
+    All methods are synchronous and thread-safe; async callers go
+    through `fetch_through`, which runs them in a worker thread.
+    """
+
+    def __init__(self, path: str = DEFAULT_TAPE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+        self.stats = {'appended': 0, 'duplicates': 0, 'store_hits': 0, 'gap_fetches': 0}
+
+        logger.info(f"📼 TradeTape opened: {path}")
+
+    # ==================== WRITE ====================
+
+    def append(self, exchange: str, symbol: str, trades: List[Dict[str, Any]]) -> int:
+        """
+        Append trades, ignoring ones already stored (same trade ID).
+
+        Returns:
+            Number of newly stored trades
+        """
+        exchange = exchange.lower()
+        rows = []
+        for trade in trades:
+            ts = to_epoch(trade.get('timestamp'))
+            if ts is None:
+                continue
+            rows.append((exchange, symbol, trade_id(trade, ts), ts, trade_wallet(trade), _encode(trade)))
+
+        if not rows:
+            return 0
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO trades (exchange, symbol, trade_id, ts, wallet, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+            inserted = self._conn.total_changes - before
+
+        self.stats['appended'] += inserted
+        self.stats['duplicates'] += len(rows) - inserted
+        return inserted
+
+    def mark_covered(self, exchange: str, symbol: str, start_ts: float, end_ts: float):
+        """Record that [start_ts, end_ts] is completely stored (merges overlaps)."""
+        if end_ts <= start_ts:
+            return
+
+        exchange = exchange.lower()
+        with self._lock:
+            overlapping = self._conn.execute(
+                'SELECT rowid, start_ts, end_ts FROM coverage '
+                'WHERE exchange = ? AND symbol = ? AND start_ts <= ? AND end_ts >= ?',
+                (exchange, symbol, end_ts + COVERAGE_TOLERANCE, start_ts - COVERAGE_TOLERANCE)
+            ).fetchall()
+
+            for _, s, e in overlapping:
+                start_ts = min(start_ts, s)
+                end_ts = max(end_ts, e)
+
+            if overlapping:
+                self._conn.executemany(
+                    'DELETE FROM coverage WHERE rowid = ?',
+                    [(rowid,) for rowid, _, _ in overlapping]
+                )
+            self._conn.execute(
+                'INSERT INTO coverage (exchange, symbol, start_ts, end_ts) VALUES (?, ?, ?, ?)',
+                (exchange, symbol, start_ts, end_ts)
+            )
+            self._conn.commit()
+
+    # ==================== READ ====================
+
+    def missing_intervals(
+        self,
+        exchange: str,
+        symbol: str,
+        start_ts: float,
+        end_ts: float
+    ) -> List[Tuple[float, float]]:
+        """Sub-intervals of [start_ts, end_ts] not yet covered by the store."""
+        with self._lock:
+            covered = self._conn.execute(
+                'SELECT start_ts, end_ts FROM coverage '
+                'WHERE exchange = ? AND symbol = ? AND start_ts <= ? AND end_ts >= ? '
+                'ORDER BY start_ts',
+                (exchange.lower(), symbol, end_ts, start_ts)
+            ).fetchall()
+
+        gaps = []
+        cursor = start_ts
+        for s, e in covered:
+            if s > cursor + COVERAGE_TOLERANCE:
+                gaps.append((cursor, min(s, end_ts)))
+            cursor = max(cursor, e)
+            if cursor >= end_ts:
+                break
+
+        if cursor + COVERAGE_TOLERANCE < end_ts:
+            gaps.append((cursor, end_ts))
+
+        return gaps
+
+    def query(
+        self,
+        exchange: str,
+        symbol: str,
+        start_ts: float,
+        end_ts: float,
+        wallet: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Trades in [start_ts, end_ts] (optionally for one wallet), oldest first."""
+        sql = 'SELECT payload FROM trades WHERE exchange = ? AND symbol = ?'
+        params: List[Any] = [exchange.lower(), symbol]
+
+        if wallet is not None:
+            sql += ' AND wallet = ?'
+            params.append(wallet)
+
+        sql += ' AND ts >= ? AND ts <= ? ORDER BY ts'
+        params.extend([start_ts, end_ts])
+
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [_decode(payload) for (payload,) in rows]
+
+    # ==================== READ-THROUGH ====================
+
+    async def fetch_through(
+        self,
+        exchange: str,
+        symbol: str,
+        start_time: datetime,
+        end_time: datetime,
+        fetch: Callable[[datetime, datetime], Awaitable[List[Dict[str, Any]]]],
+        limit: Optional[int] = None,
+        wallet: Optional[str] = None,
+        source_limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Serve [start_time, end_time] from the store, fetching only gaps.
+
+        A gap counts as fully covered if the source says so (a TradePage
+        with complete=True) or, for plain lists, if it returned fewer than
+        `source_limit` (default: `limit`) real trades. Otherwise the
+        result may be truncated at either end (CEX sources return oldest
+        trades first, Helius newest first), so only the span between the
+        oldest and newest returned trade is marked and the rest of the gap
+        is fetched again, until the source is exhausted or stops yielding
+        new trades (at most MAX_GAP_FETCHES calls).
+
+        Empty results are not marked covered (collectors return [] on
+        errors), coverage never extends past "now" so live windows are
+        refetched, and synthetic trades (OHLCV fallback) are returned for
+        this call but neither stored nor counted as coverage.
+        """
+        start_ts = to_epoch(start_time)
+        end_ts = to_epoch(end_time)
+        now_ts = datetime.now(timezone.utc).timestamp()
+        source_limit = source_limit or limit
+
+        gaps = await asyncio.to_thread(self.missing_intervals, exchange, symbol, start_ts, end_ts)
+
+        if not gaps:
+            self.stats['store_hits'] += 1
+
+        synthetic: Dict[str, Dict[str, Any]] = {}
+        fetches = 0
+
+        while gaps and fetches < MAX_GAP_FETCHES:
+            truncated = False
+            appended = 0
+
+            for gap_start, gap_end in gaps[:MAX_GAP_FETCHES - fetches]:
+                fetches += 1
+                self.stats['gap_fetches'] += 1
+                trades = await fetch(
+                    datetime.fromtimestamp(gap_start, tz=timezone.utc),
+                    datetime.fromtimestamp(gap_end, tz=timezone.utc)
+                )
+
+                real = []
+                for trade in trades or []:
+                    ts = to_epoch(trade.get('timestamp'))
+                    if ts is None:
+                        continue
+                    if is_synthetic(trade):
+                        synthetic[trade_id(trade, ts)] = trade
+                    else:
+                        real.append((ts, trade))
+
+                if not real:
+                    continue
+
+                appended += await asyncio.to_thread(self.append, exchange, symbol, [t for _, t in real])
+
+                complete = getattr(trades, 'complete', None)
+                if complete is None:
+                    complete = bool(source_limit) and len(trades) < source_limit
+
+                if complete and len(real) == len(trades):
+                    covered_start, covered_end = gap_start, gap_end
+                else:
+                    truncated = True
+                    covered_start = min(ts for ts, _ in real)
+                    covered_end = max(ts for ts, _ in real)
+
+                await asyncio.to_thread(
+                    self.mark_covered, exchange, symbol, covered_start, min(covered_end, now_ts)
+                )
+
+            if not truncated or not appended:
+                break
+
+            # Page through what is still missing (up to "now")
+            gaps = await asyncio.to_thread(
+                self.missing_intervals, exchange, symbol, start_ts, min(end_ts, now_ts)
+            )
+
+        trades = await asyncio.to_thread(
+            self.query, exchange, symbol, start_ts, end_ts, wallet, limit
+        )
+
+        if synthetic and wallet is None:
+            trades = sorted(
+                trades + [t for t in synthetic.values() if start_ts <= to_epoch(t['timestamp']) <= end_ts],
+                key=lambda t: to_epoch(t.get('timestamp'))
+            )[:limit or None]
+
+        return trades
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._conn.execute('SELECT COUNT(*) FROM trades').fetchone()[0]
+        return {**self.stats, 'stored_trades': stored, 'path': self.path}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_tape: Optional[TradeTape] = None
+
+
+def get_trade_tape() -> TradeTape:
+    """Process-wide tape shared by collectors, analyzers and routes."""
+    global _default_tape
+    if _default_tape is None:
+        _default_tape = TradeTape()
+    return _default_tape
@@ -22,6 +22,11 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
 
+import numpy as np
+
+from .trade_batch import TradeBatch
+from .trade_tape import TradePage
+
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +61,7 @@ class UnifiedCollector:
         cex_credentials: Optional[Dict[str, Any]] = None,
         dex_api_keys: Optional[Dict[str, Any]] = None,  # ✅ NEU: für dependencies.py
         config: Optional[Dict[str, Any]] = None,
+        trade_tape: Optional[Any] = None,
         **kwargs  # ✅ ULTRA-FLEXIBLE: ignoriert unbekannte Parameter
     ):
         """
@@ -71,9 +77,11 @@ class UnifiedCollector:
             cex_credentials: Dictionary of CEX credentials (will initialize collectors)
             dex_api_keys: Dictionary of DEX API keys (für dependencies.py)
             config: Configuration dictionary
+            trade_tape: Optional TradeTape - trades are served from / written to it
             **kwargs: Alle anderen Parameter werden ignoriert
         """
         self.config = config or {}
+        self.trade_tape = trade_tape
         
         # Log ignored kwargs for debugging
         if kwargs:
@@ -417,6 +425,9 @@ class UnifiedCollector:
         """
         Fetch trades with aggregation from multiple sources
         
+        With a trade tape, only time ranges not yet stored are fetched
+        from the sources; the result is read from the tape.
+        
         Args:
             exchange: Exchange name (jupiter/raydium/binance/etc)
             symbol: Trading pair
@@ -425,7 +436,7 @@ class UnifiedCollector:
             limit: Maximum trades per source
             
         Returns:
-            Dictionary with trades and metadata
+            Dictionary with trades, their columnar TradeBatch and metadata
         """
         logger.info(f"🔍 Fetching trades: {exchange} {symbol} ({start_time} to {end_time})")
         
@@ -436,13 +447,21 @@ class UnifiedCollector:
         is_dex = self._is_dex_exchange(exchange)
         logger.info(f"🎯 Exchange '{exchange}' is DEX: {is_dex}")
         
-        if is_dex:
-            trades = await self._fetch_dex_trades(symbol, start_time, end_time, limit)
+        async def _fetch(range_start: datetime, range_end: datetime) -> List[Dict[str, Any]]:
+            if is_dex:
+                return await self._fetch_dex_trades(symbol, range_start, range_end, limit)
+            return await self._fetch_cex_trades(exchange, symbol, range_start, range_end, limit)
+        
+        if self.trade_tape is not None:
+            trades = await self.trade_tape.fetch_through(
+                exchange, symbol, start_time, end_time, _fetch, limit=limit
+            )
         else:
-            trades = await self._fetch_cex_trades(exchange, symbol, start_time, end_time, limit)
+            trades = await _fetch(start_time, end_time)
         
         return {
             'trades': trades,
+            'batch': TradeBatch.from_trades(trades, source='dex' if is_dex else 'cex', with_wallets=is_dex),
             'count': len(trades),
             'exchange': exchange,
             'symbol': symbol,
@@ -457,8 +476,14 @@ class UnifiedCollector:
         end_time: datetime,
         limit: int
     ) -> List[Dict[str, Any]]:
-        """Fetch DEX trades with fallback"""
+        """
+        Fetch DEX trades with fallback
+        
+        Returns a TradePage: complete only if Helius covered the whole
+        window and nothing was cut at `limit` (Dexscreener only tops up).
+        """
         all_trades = []
+        complete = None
         
         logger.info(f"🔄 Fetching DEX trades for {symbol}")
         
@@ -473,6 +498,8 @@ class UnifiedCollector:
                     timeout=30.0  # ✅ Increased timeout for token-based fetching
                 )
                 
+                complete = getattr(helius_trades, 'complete', None)
+                
                 if helius_trades:
                     logger.info(f"✅ Helius: {len(helius_trades)} trades")
                     all_trades.extend(helius_trades)
@@ -512,16 +539,20 @@ class UnifiedCollector:
                 logger.warning(f"⚠️ Dexscreener trades failed: {e}")
                 self._stats['dexscreener']['errors'] += 1
         
-        # 3️⃣ DEDUPLICATE AND SORT
-        unique_trades = self._deduplicate_trades(all_trades)
-        unique_trades.sort(key=lambda t: t.get('timestamp', datetime.min))
+        # 3️⃣ DEDUPLICATE AND SORT (in bulk on the columnar batch)
+        batch = TradeBatch.from_trades(all_trades, source='dex').deduplicate()
+        unique_trades = [batch.rows[i] for i in batch.time_order()]
         
         logger.info(
             f"✅ Total DEX trades: {len(unique_trades)} "
             f"(from {len(all_trades)} raw)"
         )
         
-        return unique_trades[:limit]
+        if limit and len(unique_trades) > limit:
+            unique_trades = unique_trades[:limit]
+            complete = False
+        
+        return TradePage(unique_trades, complete=complete)
     
     async def _fetch_cex_trades(
         self,
@@ -566,25 +597,8 @@ class UnifiedCollector:
         Returns:
             Deduplicated trades
         """
-        seen_ids = set()
-        unique = []
-        
-        for trade in trades:
-            trade_id = (
-                trade.get('signature') or 
-                trade.get('transaction_hash') or
-                trade.get('id') or 
-                trade.get('tx_hash')
-            )
-            
-            if trade_id and trade_id not in seen_ids:
-                seen_ids.add(trade_id)
-                unique.append(trade)
-            elif not trade_id:
-                # No ID - keep it (might be aggregated)
-                unique.append(trade)
-        
-        return unique
+        batch = TradeBatch.from_trades(trades, with_wallets=False)
+        return [trades[i] for i in np.flatnonzero(batch.unique_mask())]
     
     async def fetch_current_price(self, symbol: str) -> Optional[float]:
         """
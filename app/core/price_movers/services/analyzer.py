@@ -21,6 +21,7 @@ from app.core.price_movers.services.lightweight_entity_identifier import (
     TradingEntity
 )
 from app.core.price_movers.services.entity_classifier import EntityClassifier
+from app.core.price_movers.collectors.trade_tape import TradeTape, get_trade_tape
 from app.core.price_movers.utils.metrics import (
     detect_bot_pattern,
     detect_whale_pattern,
@@ -33,6 +34,9 @@ from app.core.price_movers.utils.metrics import (
 
 logger = logging.getLogger(__name__)
 
+# Trades per exchange request (ccxt default page size)
+TRADES_PER_REQUEST = 1000
+
 
 @dataclass
 class Trade:
@@ -134,15 +138,20 @@ class PriceMoverAnalyzer:
         self,
         exchange_collector=None,
         impact_calculator: Optional[ImpactCalculator] = None,
-        use_lightweight: bool = True
+        use_lightweight: bool = True,
+        trade_tape: Optional[TradeTape] = None
     ):
         """
         Args:
             exchange_collector: Exchange Collector (Single)
             impact_calculator: Impact Calculator
             use_lightweight: Use Lightweight Identifier
+            trade_tape: Local trade store (default: shared tape)
         """
         self.exchange_collector = exchange_collector
+        self.trade_tape = trade_tape
+        if self.trade_tape is None and exchange_collector is not None:
+            self.trade_tape = get_trade_tape()
         self.use_lightweight = use_lightweight
         
         if use_lightweight:
@@ -297,12 +306,23 @@ class PriceMoverAnalyzer:
                 timestamp=start_time
             )
             
-            # Fetch Trades
-            trades_data = await self.exchange_collector.fetch_trades(
-                symbol=symbol,
-                start_time=start_time,
-                end_time=end_time
-            )
+            # Fetch Trades (only ranges missing from the local tape)
+            async def _fetch(range_start: datetime, range_end: datetime):
+                return await self.exchange_collector.fetch_trades(
+                    symbol=symbol,
+                    start_time=range_start,
+                    end_time=range_end,
+                    limit=TRADES_PER_REQUEST
+                )
+            
+            if self.trade_tape is not None:
+                # A full page may be truncated → the tape pages through the rest
+                trades_data = await self.trade_tape.fetch_through(
+                    exchange, symbol, start_time, end_time, _fetch,
+                    source_limit=TRADES_PER_REQUEST
+                )
+            else:
+                trades_data = await _fetch(start_time, end_time)
             
             # Parse
             candle = Candle(**candle_data)
@@ -15,9 +15,12 @@ import math
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Tuple, Optional, Union
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+
+import numpy as np
 
 from app.core.price_movers.collectors.unified_collector import UnifiedCollector
+from app.core.price_movers.collectors.trade_batch import SIDE_BUY, SIDE_SELL, TradeBatch
 from app.core.price_movers.services.impact_calculator import ImpactCalculator  # ✅ HIER!
 from app.core.price_movers.services.lightweight_entity_identifier import (
     LightweightEntityIdentifier,
@@ -25,6 +28,7 @@ from app.core.price_movers.services.lightweight_entity_identifier import (
 )
 from app.core.price_movers.services.liquidity_validator import LiquidityValidator
 from app.core.price_movers.services.entity_classifier import EntityClassifier
+from app.core.price_movers.services.entity_matcher import EntityMatcher, TradeIndex
 from app.core.price_movers.utils.metrics import (
     validate_trade_data,
     validate_candle_data,
@@ -51,6 +55,11 @@ def sanitize_float(value: float) -> float:
     return value
 
 
+def sanitize_array(values: np.ndarray) -> np.ndarray:
+    """sanitize_float für ganze Spalten (NaN → 0, ±Inf → ±999)"""
+    return np.nan_to_num(values, nan=0.0, posinf=999.0, neginf=-999.0)
+
+
 def sanitize_dict_floats(data: Dict) -> Dict:
     """
     🔧 FIX: Recursively sanitize all float values in a dictionary
@@ -84,6 +93,7 @@ class Trade:
     trade_count: int = 1
     wallet_address: Optional[str] = None  # 🆕 Nur bei DEX!
     source: str = "cex"  # 'cex' oder 'dex'
+    entity_id: Optional[str] = None  # 🆕 Nur bei CEX (nach Entity-Identifikation)
 
 
 @dataclass
@@ -194,6 +204,7 @@ class HybridPriceMoverAnalyzer:
             logger.info("⚠️ Using legacy pattern-based clustering")
         
         self.classifier = EntityClassifier()
+        self.entity_matcher = EntityMatcher()
         
         logger.info("HybridPriceMoverAnalyzer initialized")
 
@@ -276,13 +287,13 @@ class HybridPriceMoverAnalyzer:
             # Check for errors
             if isinstance(cex_result, Exception):
                 logger.error(f"CEX fetch error: {cex_result}")
-                cex_candle, cex_trades = None, []
+                cex_candle, cex_trades = None, TradeBatch.from_trades([], source='cex')
             else:
                 cex_candle, cex_trades = cex_result
             
             if isinstance(dex_result, Exception):
                 logger.error(f"DEX fetch error: {dex_result}")
-                dex_candle, dex_trades = None, []
+                dex_candle, dex_trades = None, TradeBatch.from_trades([], source='dex')
             else:
                 dex_candle, dex_trades = dex_result
             
@@ -379,7 +390,7 @@ class HybridPriceMoverAnalyzer:
         timeframe: str,
         start_time: datetime,
         end_time: datetime
-    ) -> Tuple[Candle, List[Trade]]:
+    ) -> Tuple[Candle, TradeBatch]:
         """Fetch CEX data (pattern-based) - ENHANCED LOGGING"""
         
         logger.info(f"\n{'='*80}")
@@ -456,20 +467,10 @@ class HybridPriceMoverAnalyzer:
             logger.info(f"   volume: {candle.volume}")
             logger.info(f"   price_change_pct: {candle.price_change_pct}%")
             
-            # Parse trades
-            trades = []
-            for t in result['trades']:
-                trade = Trade(
-                    timestamp=t['timestamp'],
-                    trade_type=t['trade_type'],
-                    amount=t['amount'],
-                    price=t['price'],
-                    value_usd=t.get('value_usd', t['amount'] * t['price']),
-                    trade_count=t.get('trade_count', 1),
-                    wallet_address=None,  # CEX = no wallet IDs
-                    source='cex'
-                )
-                trades.append(trade)
+            # Columnar trades (built once at the collector boundary)
+            trades = result.get('batch') or TradeBatch.from_trades(
+                result['trades'], source='cex', with_wallets=False  # CEX = no wallet IDs
+            )
             
             logger.info(f"✅ CEX data complete: {len(trades)} trades")
             logger.info(f"{'='*80}\n")
@@ -487,7 +488,7 @@ class HybridPriceMoverAnalyzer:
         timeframe: str,
         start_time: datetime,
         end_time: datetime
-    ) -> Tuple[Candle, List[Trade]]:
+    ) -> Tuple[Candle, TradeBatch]:
         """Fetch DEX data (wallet-based) - ENHANCED LOGGING"""
         
         logger.info(f"\n{'='*80}")
@@ -564,26 +565,9 @@ class HybridPriceMoverAnalyzer:
             logger.info(f"   volume: {candle.volume}")
             logger.info(f"   price_change_pct: {candle.price_change_pct}%")
             
-            # Parse trades WITH wallet addresses
-            trades = []
-            wallets_with_address = 0
-            
-            for t in result['trades']:
-                wallet_addr = t.get('wallet_address')
-                if wallet_addr:
-                    wallets_with_address += 1
-                
-                trade = Trade(
-                    timestamp=t['timestamp'],
-                    trade_type=t['trade_type'],
-                    amount=t['amount'],
-                    price=t['price'],
-                    value_usd=t.get('value_usd', t['amount'] * t['price']),
-                    trade_count=t.get('trade_count', 1),
-                    wallet_address=wallet_addr,  # 🎯 DEX = REAL Wallet!
-                    source='dex'
-                )
-                trades.append(trade)
+            # Columnar trades WITH interned wallet addresses
+            trades = result.get('batch') or TradeBatch.from_trades(result['trades'], source='dex')
+            wallets_with_address = int((trades.wallet >= 0).sum())
             
             logger.info(
                 f"✅ DEX data complete: {len(trades)} trades "
@@ -599,28 +583,19 @@ class HybridPriceMoverAnalyzer:
     
     async def _analyze_cex_trades(
         self,
-        trades: List[Trade],
+        trades: TradeBatch,
         candle: Candle,
         symbol: str,
         exchange: str,
         top_n: int
     ) -> List[Dict]:
         """Analyze CEX trades (pattern-based)"""
-        if not trades:
+        if not len(trades):
             return []
         
         # Convert to dict format for entity identifier
-        trades_dict = [
-            {
-                'timestamp': t.timestamp,
-                'trade_type': t.trade_type,
-                'amount': t.amount,
-                'price': t.price,
-                'value_usd': t.value_usd,
-                'trade_count': t.trade_count
-            }
-            for t in trades
-        ]
+        # (id = batch index → entity_id can be written back onto the batch)
+        trades_dict = trades.to_dicts(with_ids=True)
         
         candle_data = {
             'timestamp': candle.timestamp,
@@ -640,12 +615,16 @@ class HybridPriceMoverAnalyzer:
             exchange=exchange
         )
         
+        # Tag trades with their entity (used by cross-exchange matching)
+        for entity in entities:
+            trades.assign_wallet((int(enriched.trade_id) for enriched in entity.trades), entity.entity_id)
+        
         # Format as movers
         return self._format_entities_as_movers(entities[:top_n], False)
     
     async def _analyze_dex_trades(
         self,
-        trades: Union[List[Trade], List[Dict]],
+        trades: Union[TradeBatch, List[Trade], List[Dict]],
         candle: Candle,
         symbol: str,
         exchange: str,
@@ -661,60 +640,42 @@ class HybridPriceMoverAnalyzer:
         logger.info(f"🔍 DEX ANALYSIS START: {len(trades)} trades for {symbol} on {exchange}")
         logger.info(f"{'='*80}")
         
-        # ==================== STEP 1: Normalize Trades ====================
+        # ==================== STEP 1: Columnar Batch ====================
         
-        normalized_trades = []
-        for idx, trade in enumerate(trades):
-            if isinstance(trade, dict):
-                normalized_trades.append(trade)
-            else:
-                trade_dict = {
-                    'timestamp': trade.timestamp,
-                    'trade_type': trade.trade_type,
-                    'amount': trade.amount,
-                    'price': trade.price,
-                    'value_usd': trade.value_usd,
-                    'trade_count': trade.trade_count,
-                    'wallet_address': trade.wallet_address,
-                    'source': trade.source
-                }
-                if hasattr(trade, 'transaction_type'):
-                    trade_dict['transaction_type'] = getattr(trade, 'transaction_type', 'SWAP')
-                if hasattr(trade, 'liquidity_delta'):
-                    trade_dict['liquidity_delta'] = getattr(trade, 'liquidity_delta', 0)
-                
-                normalized_trades.append(trade_dict)
+        if isinstance(trades, TradeBatch):
+            batch = trades
+        else:
+            batch = TradeBatch.from_trades(
+                [t if isinstance(t, dict) else asdict(t) for t in trades],
+                source='dex'
+            )
         
-        logger.info(f"✅ Step 1: Normalized {len(normalized_trades)} trades")
+        logger.info(f"✅ Step 1: {len(batch)} trades, {len(batch.wallets)} interned wallets")
         
-        # ✅ NEW STEP 1.5: Validate and Filter Trades
+        # ✅ NEW STEP 1.5: Validate and Filter Trades (vectorized)
         logger.info(f"\n{'─'*80}")
         logger.info(f"🔍 STEP 1.5: TRADE VALIDATION")
         logger.info(f"{'─'*80}")
         
-        validator = LiquidityValidator()
-        filtered = validator.filter_trades(
-            normalized_trades,
-            include_liquidity=True
-        )
+        filtered = LiquidityValidator.filter_batch(batch)
+        invalid_trades = filtered['invalid_trades']
         
         # Log invalid trades
-        if filtered['invalid_trades']:
+        if len(invalid_trades):
             logger.warning(
-                f"\n⚠️ {len(filtered['invalid_trades'])} INVALID TRADES REJECTED:"
+                f"\n⚠️ {len(invalid_trades)} INVALID TRADES REJECTED:"
             )
-            for idx, invalid in enumerate(filtered['invalid_trades'][:5]):
-                trade_data = invalid['trade']
+            for idx, i in enumerate(invalid_trades[:5]):
                 logger.warning(
-                    f"   {idx+1}. {invalid['reason']}\n"
-                    f"      Price: ${trade_data.get('price', 0):.2f}\n"
-                    f"      Amount: {trade_data.get('amount', 0):.4f}\n"
-                    f"      Value: ${trade_data.get('amount', 0) * trade_data.get('price', 0):,.2f}\n"
-                    f"      Wallet: {trade_data.get('wallet_address', 'N/A')[:16]}..."
+                    f"   {idx+1}. {LiquidityValidator.invalid_reason(batch, i)}\n"
+                    f"      Price: ${batch.price[i]:.2f}\n"
+                    f"      Amount: {batch.amount[i]:.4f}\n"
+                    f"      Value: ${batch.amount[i] * batch.price[i]:,.2f}\n"
+                    f"      Wallet: {(batch.wallet_at(i) or 'N/A')[:16]}..."
                 )
             
-            if len(filtered['invalid_trades']) > 5:
-                logger.warning(f"   ... and {len(filtered['invalid_trades']) - 5} more")
+            if len(invalid_trades) > 5:
+                logger.warning(f"   ... and {len(invalid_trades) - 5} more")
         
         # Use validated trades
         valid_swaps = filtered['valid_swaps']
@@ -724,33 +685,26 @@ class HybridPriceMoverAnalyzer:
             f"\n✅ Validation Complete:\n"
             f"   Valid Swaps: {len(valid_swaps)}\n"
             f"   Liquidity Events: {len(liquidity_events)}\n"
-            f"   Rejected: {len(filtered['invalid_trades'])}"
+            f"   Rejected: {len(invalid_trades)}"
         )
         logger.info(f"{'─'*80}\n")
         
         # Combine valid trades for analysis
-        all_valid_trades = valid_swaps + liquidity_events
+        all_valid_trades = np.concatenate((valid_swaps, liquidity_events))
         
-        if not all_valid_trades:
+        if not len(all_valid_trades):
             logger.warning("⚠️ No valid trades after filtering")
             return []
         
         # ==================== STEP 2: Group by Wallet ====================
         
-        wallet_groups = defaultdict(list)
-        trades_without_wallet = 0
-        
-        for trade in all_valid_trades:  # ✅ CHANGED: Use all_valid_trades instead of normalized_trades
-            wallet_addr = trade.get('wallet_address')
-            if wallet_addr:
-                wallet_groups[wallet_addr].append(trade)
-            else:
-                trades_without_wallet += 1
+        wallet_codes, order, counts = batch.group_by_wallet(all_valid_trades)
+        trades_without_wallet = len(all_valid_trades) - len(order)
                 
         if trades_without_wallet > 0:
             logger.warning(f"⚠️ {trades_without_wallet} trades without wallet_address")
         
-        logger.info(f"✅ Step 2: Grouped into {len(wallet_groups)} unique wallets")
+        logger.info(f"✅ Step 2: Grouped into {len(wallet_codes)} unique wallets")
         
         # ==================== STEP 3: CANDLE VALIDATION & DEBUG ====================
         
@@ -856,11 +810,29 @@ class HybridPriceMoverAnalyzer:
         
         logger.info(f"{'─'*80}\n")
         
-        # ==================== STEP 4: Analyze Each Wallet ====================
+        # ==================== STEP 4: Bulk Wallet Stats + Impact ====================
         
-        entities = []
+        n_wallets = len(wallet_codes)
+        group = np.repeat(np.arange(n_wallets), counts)
+        
+        def group_sum(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(group, weights=weights, minlength=n_wallets)
+        
+        amount = batch.amount[order]
+        price = batch.price[order]
+        side = batch.side[order]
+        
+        total_volumes = group_sum(amount)
+        total_values = group_sum(batch.value_usd[order])
+        # Calculate value_usd if missing
+        total_values = np.where(total_values == 0, group_sum(amount * price), total_values)
+        buy_volumes = group_sum(np.where(side == SIDE_BUY, amount, 0.0))
+        sell_volumes = group_sum(np.where(side == SIDE_SELL, amount, 0.0))
+        liquidity_counts = group_sum(batch.is_liquidity[order].astype(np.float64))
+        
+        impact_results: List[Optional[Dict]] = [None] * n_wallets
         stats = {
-            'total_wallets': len(wallet_groups),
+            'total_wallets': n_wallets,
             'liquidity_providers': 0,
             'total_liquidity_events': 0,
             'high_impact_count': 0,
@@ -868,88 +840,62 @@ class HybridPriceMoverAnalyzer:
             'impact_calculation_errors': 0
         }
         
-        # Process first wallet with FULL DEBUG
-        first_wallet = True
+        if n_wallets:
+            logger.info(f"\n{'='*80}")
+            logger.info(f"🔍 DETAILED ANALYSIS - First Wallet: {batch.wallets[wallet_codes[0]][:16]}...")
+            logger.info(f"{'='*80}")
+            logger.info(f"Wallet Stats:")
+            logger.info(f"   Trade Count: {counts[0]}")
+            logger.info(f"   Total Volume: {total_volumes[0]:.4f}")
+            logger.info(f"   Total Value USD: ${total_values[0]:.2f}")
+            logger.info(f"   Buy Volume: {buy_volumes[0]:.4f}")
+            logger.info(f"   Sell Volume: {sell_volumes[0]:.4f}")
+            logger.info(f"   Has Liquidity Events: {liquidity_counts[0] > 0}")
+            logger.info(f"\nPassing to ImpactCalculator (grouped, {n_wallets} wallets):")
+            logger.info(f"   candle_data: {candle_data}")
+            logger.info(f"   total_volume: {candle_data['volume']:.4f} ← CRITICAL PARAMETER")
         
-        for wallet_addr, wallet_trades in wallet_groups.items():
+        try:
+            impact_results = self.impact_calculator.calculate_grouped_impact(
+                counts=counts,
+                amount=amount,
+                price=price,
+                epochs=batch.ts[order],
+                trade_types=None,
+                candle_data=candle_data,
+                total_volume=candle_data['volume'],  # ← CRITICAL: This MUST be > 0
+                sides=side
+            )
+        except (TypeError, ValueError) as calc_error:
+            logger.error(f"❌ Grouped impact calculation failed: {calc_error}", exc_info=True)
+            stats['impact_calculation_errors'] = n_wallets
+        
+        total_volumes = sanitize_array(total_volumes)
+        total_values = sanitize_array(total_values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buy_sell_ratios = np.where(sell_volumes > 0, buy_volumes / sell_volumes, 999.0)
+        buy_sell_ratios = sanitize_array(buy_sell_ratios)
+        
+        entities = []
+        
+        for w, code in enumerate(wallet_codes):
+            wallet_addr = batch.wallets[code]
             try:
-                # ==================== Calculate Basic Stats ====================
+                total_volume = float(total_volumes[w])
+                total_value = float(total_values[w])
+                trade_count = int(counts[w])
+                buy_sell_ratio = float(buy_sell_ratios[w])
+                has_liquidity_events = bool(liquidity_counts[w] > 0)
                 
-                total_volume = sum(t.get('amount', 0) for t in wallet_trades)
-                total_value = sum(t.get('value_usd', 0) for t in wallet_trades)
+                # ==================== IMPACT RESULT ====================
                 
-                # Calculate value_usd if missing
-                if total_value == 0:
-                    total_value = sum(t.get('amount', 0) * t.get('price', 0) for t in wallet_trades)
-                
-                trade_count = len(wallet_trades)
-                
-                buy_volume = sum(
-                    t.get('amount', 0) 
-                    for t in wallet_trades 
-                    if t.get('trade_type') == 'buy'
-                )
-                sell_volume = sum(
-                    t.get('amount', 0) 
-                    for t in wallet_trades 
-                    if t.get('trade_type') == 'sell'
-                )
-                buy_sell_ratio = buy_volume / sell_volume if sell_volume > 0 else 999.0
-                
-                # Check for liquidity events
-                has_liquidity_events = any(
-                    t.get('transaction_type') in ['ADD_LIQUIDITY', 'REMOVE_LIQUIDITY']
-                    for t in wallet_trades
-                )
-                
-                # ==================== FULL DEBUG FOR FIRST WALLET ====================
-                
-                if first_wallet:
-                    logger.info(f"\n{'='*80}")
-                    logger.info(f"🔍 DETAILED ANALYSIS - First Wallet: {wallet_addr[:16]}...")
-                    logger.info(f"{'='*80}")
-                    logger.info(f"Wallet Stats:")
-                    logger.info(f"   Trade Count: {trade_count}")
-                    logger.info(f"   Total Volume: {total_volume:.4f}")
-                    logger.info(f"   Total Value USD: ${total_value:.2f}")
-                    logger.info(f"   Buy Volume: {buy_volume:.4f}")
-                    logger.info(f"   Sell Volume: {sell_volume:.4f}")
-                    logger.info(f"   Buy/Sell Ratio: {buy_sell_ratio:.2f}")
-                    logger.info(f"   Has Liquidity Events: {has_liquidity_events}")
-                    logger.info(f"\nPassing to ImpactCalculator:")
-                    logger.info(f"   wallet_trades: {len(wallet_trades)} trades")
-                    logger.info(f"   candle_data: {candle_data}")
-                    logger.info(f"   total_volume: {candle_data['volume']:.4f} ← CRITICAL PARAMETER")
-                    logger.info(f"   apply_liquidity_multipliers: True")
-                    
-                    # Show sample trades
-                    logger.info(f"\nSample wallet trades:")
-                    for i, t in enumerate(wallet_trades[:3]):
-                        logger.info(
-                            f"   Trade {i+1}: {t.get('trade_type')} "
-                            f"{t.get('amount'):.4f} @ ${t.get('price'):.2f} "
-                            f"= ${t.get('amount', 0) * t.get('price', 0):.2f}"
-                        )
-                    
-                    first_wallet = False
-                
-                # ==================== IMPACT CALCULATION ====================
-                
-                impact_result = None
-                try:
-                    impact_result = self.impact_calculator.calculate_impact_score(
-                        wallet_trades=wallet_trades,
-                        candle_data=candle_data,
-                        total_volume=candle_data['volume'],  # ← CRITICAL: This MUST be > 0
-                        apply_liquidity_multipliers=True
-                    )
-                    
-                    impact_score = impact_result['impact_score']
+                impact_result = impact_results[w]
+                if impact_result is not None:
+                    impact_score = sanitize_float(impact_result['impact_score'])
                     impact_components = impact_result['components']
                     impact_level = impact_result['impact_level']
                     
-                    # DEBUG: Log result for first wallet
-                    if wallet_addr == list(wallet_groups.keys())[0]:
+                    if w == 0:
                         logger.info(f"\n{'='*80}")
                         logger.info(f"📊 IMPACT RESULT for {wallet_addr[:16]}...")
                         logger.info(f"{'='*80}")
@@ -963,25 +909,16 @@ class HybridPriceMoverAnalyzer:
                     # Check if zero
                     if impact_score == 0:
                         stats['zero_impact_count'] += 1
-                        logger.warning(
+                        logger.debug(
                             f"⚠️ Zero impact for {wallet_addr[:16]}...\n"
                             f"   Wallet volume: {total_volume:.4f}\n"
                             f"   Candle volume: {candle_data['volume']:.4f}\n"
-                            f"   Volume ratio: {total_volume / candle_data['volume'] if candle_data['volume'] > 0 else 0:.6f}\n"
                             f"   Components: {impact_components}"
                         )
-                    
-                except Exception as calc_error:
-                    logger.error(
-                        f"❌ Impact calculation error for {wallet_addr[:16]}...: {calc_error}",
-                        exc_info=True
-                    )
-                    stats['impact_calculation_errors'] += 1
-                    impact_result = None
                 
                 # ==================== FALLBACK CALCULATION ====================
                 
-                if not impact_result or impact_result['impact_score'] == 0:
+                if not impact_result or impact_score == 0:
                     # Simple fallback
                     if candle_data['volume'] > 0:
                         volume_ratio = total_volume / candle_data['volume']
@@ -1029,10 +966,7 @@ class HybridPriceMoverAnalyzer:
                 # Track stats
                 if has_liquidity_events:
                     stats['liquidity_providers'] += 1
-                    stats['total_liquidity_events'] += sum(
-                        1 for t in wallet_trades 
-                        if t.get('transaction_type') in ['ADD_LIQUIDITY', 'REMOVE_LIQUIDITY']
-                    )
+                    stats['total_liquidity_events'] += int(liquidity_counts[w])
                 
                 if impact_score > 0.5:
                     stats['high_impact_count'] += 1
@@ -1050,19 +984,19 @@ class HybridPriceMoverAnalyzer:
                 if has_liquidity_events and impact_score > 0.1:
                     wallet_type = 'liquidity_provider'
                 
-                # Build entity
+                # Build entity (values already sanitized column-wise)
                 entity = {
                     'wallet_id': wallet_addr,
                     'wallet_address': wallet_addr,
                     'wallet_type': wallet_type,
-                    'impact_score': sanitize_float(impact_score),
+                    'impact_score': impact_score,
                     'impact_components': impact_components,
                     'impact_level': impact_level,
-                    'total_volume': sanitize_float(total_volume),
-                    'total_value_usd': sanitize_float(total_value),
+                    'total_volume': total_volume,
+                    'total_value_usd': total_value,
                     'trade_count': trade_count,
-                    'avg_trade_size': sanitize_float(total_volume / trade_count if trade_count > 0 else 0),
-                    'buy_sell_ratio': sanitize_float(buy_sell_ratio),
+                    'avg_trade_size': total_volume / trade_count if trade_count > 0 else 0.0,
+                    'buy_sell_ratio': buy_sell_ratio,
                     'has_liquidity_events': has_liquidity_events,
                     'blockchain': 'solana',
                     'dex': exchange
@@ -1114,247 +1048,39 @@ class HybridPriceMoverAnalyzer:
         self,
         cex_movers: List[Dict],
         dex_movers: List[Dict],
-        cex_trades: List,
-        dex_trades: List
+        cex_index: TradeIndex,
+        dex_index: TradeIndex
     ) -> List[Dict]:
         """
         🆕 1:1 Pattern Matching zwischen CEX Entities und DEX Wallets
         
         Vergleicht jeden CEX Entity mit jedem DEX Wallet und findet ähnliche Patterns.
+        Trades sind bereits pro Entity/Wallet gruppiert (TradeIndex), der Vergleich
+        läuft vektorisiert über alle Wallets (EntityMatcher).
         """
         if not cex_movers or not dex_movers:
             return []
         
         logger.info(f"🔍 Starting 1:1 Pattern Matching: {len(cex_movers)} CEX entities vs {len(dex_movers)} DEX wallets")
         
-        matches = []
-        
-        # Compare each CEX entity with each DEX wallet
-        for cex_entity in cex_movers[:10]:  # Top 10 CEX
-            best_match = None
-            best_score = 0.0
-            
-            for dex_wallet in dex_movers[:20]:  # Top 20 DEX
-                # Calculate similarity score
-                similarity = self._calculate_entity_similarity(
-                    cex_entity, dex_wallet, cex_trades, dex_trades
-                )
-                
-                if similarity['overall_score'] > best_score:
-                    best_score = similarity['overall_score']
-                    best_match = {
-                        'cex_entity': cex_entity['wallet_id'],
-                        'dex_wallet': dex_wallet['wallet_address'],
-                        'type': cex_entity.get('wallet_type', 'unknown'),
-                        'confidence': best_score,
-                        'similarity_breakdown': similarity,
-                        'cex_volume': cex_entity.get('total_volume', 0),
-                        'dex_volume': dex_wallet.get('total_volume', 0),
-                        'volume_diff_pct': abs(
-                            cex_entity.get('total_volume', 0) - dex_wallet.get('total_volume', 0)
-                        ) / max(cex_entity.get('total_volume', 1), dex_wallet.get('total_volume', 1)) * 100
-                    }
-            
-            # Only keep matches with confidence > 0.5 (50%)
-            if best_match and best_match['confidence'] > 0.5:
-                matches.append(best_match)
-                logger.debug(
-                    f"✓ Match found: {best_match['cex_entity']} <-> {best_match['dex_wallet'][:8]}... "
-                    f"(confidence: {best_match['confidence']:.2%})"
-                )
+        matches = self.entity_matcher.match(cex_movers, dex_movers, cex_index, dex_index)
         
-        # Sort by confidence
-        matches.sort(key=lambda m: m['confidence'], reverse=True)
+        for match in matches:
+            logger.debug(
+                f"✓ Match found: {match['cex_entity']} <-> {match['dex_wallet'][:8]}... "
+                f"(confidence: {match['confidence']:.2%})"
+            )
         
         logger.info(f"✅ 1:1 Matching complete: {len(matches)} high-confidence matches found")
         
         return matches
-    
-    def _calculate_entity_similarity(
-        self,
-        cex_entity: Dict,
-        dex_wallet: Dict,
-        cex_trades: List,
-        dex_trades: List
-    ) -> Dict:
-        """
-        Berechnet Ähnlichkeit zwischen CEX Entity und DEX Wallet
-        """
-        # 1. Volume Similarity
-        cex_vol = cex_entity.get('total_volume', 0)
-        dex_vol = dex_wallet.get('total_volume', 0)
-        
-        if cex_vol == 0 and dex_vol == 0:
-            vol_similarity = 1.0
-        elif cex_vol == 0 or dex_vol == 0:
-            vol_similarity = 0.0
-        else:
-            max_vol = max(cex_vol, dex_vol)
-            min_vol = min(cex_vol, dex_vol)
-            vol_similarity = min_vol / max_vol
-        
-        # 2. Trade Count Similarity
-        cex_count = cex_entity.get('trade_count', 0)
-        dex_count = dex_wallet.get('trade_count', 0)
-        
-        if cex_count == 0 and dex_count == 0:
-            count_similarity = 1.0
-        elif cex_count == 0 or dex_count == 0:
-            count_similarity = 0.0
-        else:
-            count_diff = abs(cex_count - dex_count)
-            count_similarity = max(0, 1.0 - (count_diff / 10.0))
-        
-        # 3. Timing Overlap
-        timing_overlap = self._calculate_timing_overlap(
-            cex_entity, dex_wallet, cex_trades, dex_trades
-        )
-        
-        # 4. Trade Size Pattern Similarity
-        size_similarity = self._calculate_size_pattern_similarity(
-            cex_entity, dex_wallet
-        )
-        
-        # Overall Score (weighted average)
-        overall_score = sanitize_float(
-            vol_similarity * 0.40 +
-            count_similarity * 0.20 +
-            timing_overlap * 0.30 +
-            size_similarity * 0.10
-        )
-        
-        return {
-            'overall_score': overall_score,
-            'volume_similarity': vol_similarity,
-            'count_similarity': count_similarity,
-            'timing_overlap': timing_overlap,
-            'size_pattern_similarity': size_similarity
-        }
-    
-    def _calculate_timing_overlap(
-        self,
-        cex_entity: Dict,
-        dex_wallet: Dict,
-        cex_trades: List,
-        dex_trades: List
-    ) -> float:
-        """
-        Berechnet zeitliche Überlappung der Trading-Aktivität
-        """
-        try:
-            # Get entity IDs
-            cex_id = cex_entity.get('wallet_id', '')
-            dex_addr = dex_wallet.get('wallet_address', '')
-            
-            # Filter trades for this entity/wallet
-            cex_entity_trades = [
-                t for t in cex_trades 
-                if hasattr(t, 'entity_id') and t.entity_id == cex_id
-            ]
-            
-            dex_wallet_trades = [
-                t for t in dex_trades 
-                if hasattr(t, 'wallet_address') and t.wallet_address == dex_addr
-            ]
-            
-            if not cex_entity_trades or not dex_wallet_trades:
-                return 0.0
-            
-            # Get timestamps
-            cex_timestamps = [t.timestamp.timestamp() for t in cex_entity_trades]
-            dex_timestamps = [t.timestamp.timestamp() for t in dex_wallet_trades]
-            
-            # Calculate time ranges
-            cex_start = min(cex_timestamps)
-            cex_end = max(cex_timestamps)
-            dex_start = min(dex_timestamps)
-            dex_end = max(dex_timestamps)
-            
-            # Calculate overlap
-            overlap_start = max(cex_start, dex_start)
-            overlap_end = min(cex_end, dex_end)
-            
-            if overlap_end <= overlap_start:
-                # No overlap - check if they're close in time
-                time_gap = min(
-                    abs(cex_start - dex_end),
-                    abs(dex_start - cex_end)
-                )
-                
-                if time_gap < 60:  # Within 1 minute
-                    return 1.0 - (time_gap / 60.0)
-                else:
-                    return 0.0
-            
-            # Calculate overlap percentage
-            overlap_duration = overlap_end - overlap_start
-            total_duration = max(cex_end - cex_start, dex_end - dex_start)
-            
-            if total_duration == 0:
-                return 1.0
-            
-            overlap_score = overlap_duration / total_duration
-            
-            return min(1.0, max(0.0, overlap_score))
-            
-        except Exception as e:
-            logger.warning(f"Timing overlap calculation error: {e}")
-            return 0.0
-    
-    def _calculate_size_pattern_similarity(
-        self,
-        cex_entity: Dict,
-        dex_wallet: Dict
-    ) -> float:
-        """
-        Vergleicht Trade-Size Patterns
-        """
-        try:
-            # Average Trade Size Similarity
-            cex_avg = cex_entity.get('avg_trade_size', 0)
-            dex_avg = dex_wallet.get('avg_trade_size', 0)
-            
-            if cex_avg == 0 and dex_avg == 0:
-                size_sim = 1.0
-            elif cex_avg == 0 or dex_avg == 0:
-                size_sim = 0.0
-            else:
-                size_ratio = min(cex_avg, dex_avg) / max(cex_avg, dex_avg)
-                size_sim = size_ratio
-            
-            # Buy/Sell Ratio Similarity
-            cex_ratio = cex_entity.get('buy_sell_ratio', 1.0)
-            dex_ratio = dex_wallet.get('buy_sell_ratio', 1.0)
-            
-            # Handle infinity
-            if math.isinf(cex_ratio):
-                cex_ratio = 100.0
-            if math.isinf(dex_ratio):
-                dex_ratio = 100.0
-            
-            if cex_ratio == 0 and dex_ratio == 0:
-                ratio_sim = 1.0
-            elif cex_ratio == 0 or dex_ratio == 0:
-                ratio_sim = 0.0
-            else:
-                ratio_similarity = min(cex_ratio, dex_ratio) / max(cex_ratio, dex_ratio)
-                ratio_sim = ratio_similarity
-            
-            # Combined pattern similarity
-            pattern_sim = (size_sim * 0.6 + ratio_sim * 0.4)
-            
-            return pattern_sim
-            
-        except Exception as e:
-            logger.warning(f"Size pattern calculation error: {e}")
-            return 0.0
 
     def _calculate_correlation(
         self,
         cex_movers: List[Dict],
         dex_movers: List[Dict],
-        cex_trades: List,
-        dex_trades: List
+        cex_trades: TradeBatch,
+        dex_trades: TradeBatch
     ) -> Dict:
         """
         Calculate cross-exchange correlation - ENHANCED with 1:1 Matching
@@ -1381,17 +1107,19 @@ class HybridPriceMoverAnalyzer:
         
         volume_correlation = sanitize_float(volume_ratio)
         
+        # Group trades once per entity / wallet
+        cex_index = TradeIndex.from_batch(cex_trades)
+        dex_index = TradeIndex.from_batch(dex_trades)
+        
         # 2. Timing Correlation
-        if cex_trades and dex_trades:
-            cex_avg_time = sum((t.timestamp.timestamp() for t in cex_trades)) / len(cex_trades)
-            dex_avg_time = sum((t.timestamp.timestamp() for t in dex_trades)) / len(dex_trades)
-            time_diff = cex_avg_time - dex_avg_time
+        if cex_index.mean_timestamp is not None and dex_index.mean_timestamp is not None:
+            time_diff = cex_index.mean_timestamp - dex_index.mean_timestamp
         else:
             time_diff = 0
         
         # 🆕 3. 1:1 Pattern Matching
         pattern_matches = self._calculate_1to1_pattern_matches(
-            cex_movers, dex_movers, cex_trades, dex_trades
+            cex_movers, dex_movers, cex_index, dex_index
         )
         
         # Calculate pattern score based on matches
@@ -1472,7 +1200,7 @@ class HybridPriceMoverAnalyzer:
         start_time: datetime,
         end_time: datetime,
         source: str
-    ) -> Tuple[Candle, List[Trade]]:
+    ) -> Tuple[Candle, TradeBatch]:
         """Generate mock data for testing"""
         import random
         
@@ -1518,9 +1246,9 @@ class HybridPriceMoverAnalyzer:
                 wallet_address=wallet,
                 source=source
             )
-            trades.append(trade)
+            trades.append(asdict(trade))
         
-        return candle, trades
+        return candle, TradeBatch.from_trades(trades, source=source, with_wallets=source == 'dex')
     
     def _empty_hybrid_response(
         self,
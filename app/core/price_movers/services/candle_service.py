@@ -0,0 +1,241 @@
+"""
+Candle Service - Persistente geschlossene Candles für Charts
+
+Statt bei jedem Chart-Request bis zu 100 Candles per ccxt neu zu laden:
+- Geschlossene Candles werden pro (source, symbol, timeframe) in SQLite gespeichert
+- Abgedeckte Zeitfenster werden gemerkt → nur Lücken werden nachgeladen
+- Höhere Timeframes werden aus gespeicherten niedrigeren gerollt (z.B. 1h aus 5m),
+  wenn diese das Fenster vollständig abdecken
+- Die noch offene Candle wird NIE gespeichert (pro Request live berechnet)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.price_movers.collectors.candle_store import (
+    TIMEFRAME_SECONDS,
+    Candle,
+    CandleStore,
+    get_candle_store,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Timeframe → niedrigere Timeframes, aus denen gerollt werden kann (gröbster zuerst)
+ROLLUP_BASES = {
+    '5m': ('1m',),
+    '15m': ('5m', '1m'),
+    '30m': ('15m', '5m', '1m'),
+    '1h': ('30m', '15m', '5m'),
+    '4h': ('1h', '30m', '15m'),
+    '1d': ('4h', '1h'),
+}
+
+# ccxt liefert max. ~1000 Bars pro Request
+OHLCV_PAGE_LIMIT = 1000
+
+
+def rollup(candles: List[Candle], timeframe_seconds: int, bars_per_candle: int) -> List[Candle]:
+    """
+    Aggregate lower-timeframe candles (sorted) into higher-timeframe candles.
+
+    Only buckets with all `bars_per_candle` lower bars are emitted.
+    """
+    result: List[Candle] = []
+    bucket: List[Candle] = []
+    bucket_ts: Optional[int] = None
+
+    def flush():
+        if bucket and len(bucket) == bars_per_candle:
+            result.append((
+                bucket_ts,
+                bucket[0][1],
+                max(c[2] for c in bucket),
+                min(c[3] for c in bucket),
+                bucket[-1][4],
+                sum(c[5] for c in bucket),
+            ))
+
+    for candle in candles:
+        ts = candle[0] - candle[0] % timeframe_seconds
+        if ts != bucket_ts:
+            flush()
+            bucket, bucket_ts = [], ts
+        bucket.append(candle)
+    flush()
+
+    return result
+
+
+class CandleService:
+    """
+    Geschlossene Candles aus dem Store, Lücken via Rollup oder ccxt
+
+    Concurrent requests for the same (source, symbol, timeframe) share one
+    fill, so polling chart clients don't hit the exchange in parallel.
+    """
+
+    def __init__(self, store: Optional[CandleStore] = None):
+        self.store = store or get_candle_store()
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self.stats = {'store_hits': 0, 'rolled_up': 0, 'fetched': 0}
+
+    @staticmethod
+    def closed_until(timeframe: str, now: Optional[float] = None) -> int:
+        """Open timestamp of the still-open bar (= end of closed history)"""
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        now = int(now if now is not None else time.time())
+        return now - now % seconds
+
+    async def get_closed_candles(
+        self,
+        source: str,
+        ccxt_exchange: Any,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int
+    ) -> List[Candle]:
+        """
+        Closed candles with start_ts <= ts < end_ts (clamped to closed bars).
+
+        Args:
+            source: Store key for the data source (e.g. 'bitget')
+            ccxt_exchange: Synchronous ccxt exchange used to fill gaps
+            symbol: Symbol as understood by the exchange
+            timeframe: '1m' ... '1d'
+        """
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        start_ts = start_ts - start_ts % seconds
+        end_ts = min(end_ts, self.closed_until(timeframe))
+
+        if end_ts <= start_ts:
+            return []
+
+        key = (source, symbol, timeframe)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            gaps = await asyncio.to_thread(self.store.missing_ranges, source, symbol, timeframe, start_ts, end_ts)
+
+            if not gaps:
+                self.stats['store_hits'] += 1
+
+            for gap_start, gap_end in gaps:
+                remaining = await self._fill_from_rollup(source, symbol, timeframe, gap_start, gap_end)
+                for missing_start, missing_end in remaining:
+                    await self._fill_from_exchange(source, ccxt_exchange, symbol, timeframe, missing_start, missing_end)
+
+        return await asyncio.to_thread(self.store.query, source, symbol, timeframe, start_ts, end_ts)
+
+    async def _fill_from_rollup(
+        self,
+        source: str,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Roll the gap up from a lower timeframe if one covers it completely
+
+        Only buckets with all lower bars present are stored and marked
+        covered; buckets with missing lower bars are left to the exchange.
+
+        Returns:
+            Sub-ranges of the gap still to be fetched
+        """
+        for base in ROLLUP_BASES.get(timeframe, ()):
+            base_gaps = await asyncio.to_thread(self.store.missing_ranges, source, symbol, base, start_ts, end_ts)
+            if not base_gaps:
+                break
+        else:
+            return [(start_ts, end_ts)]
+
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        base_candles = await asyncio.to_thread(self.store.query, source, symbol, base, start_ts, end_ts)
+        candles = rollup(base_candles, seconds, seconds // TIMEFRAME_SECONDS[base])
+
+        await asyncio.to_thread(self.store.upsert, source, symbol, timeframe, candles)
+
+        # Contiguous runs of emitted buckets are covered, the holes between them are not
+        remaining: List[Tuple[int, int]] = []
+        cursor = start_ts
+        run_start: Optional[int] = None
+        for candle in candles:
+            if candle[0] != cursor:
+                if run_start is not None:
+                    await asyncio.to_thread(self.store.mark_covered, source, symbol, timeframe, run_start, cursor)
+                remaining.append((cursor, candle[0]))
+                run_start = candle[0]
+            elif run_start is None:
+                run_start = cursor
+            cursor = candle[0] + seconds
+
+        if run_start is not None:
+            await asyncio.to_thread(self.store.mark_covered, source, symbol, timeframe, run_start, cursor)
+        if cursor < end_ts:
+            remaining.append((cursor, end_ts))
+
+        self.stats['rolled_up'] += len(candles)
+        logger.debug(
+            f"🧮 Rolled up {len(candles)} {timeframe} candles from {base} ({source} {symbol}), "
+            f"{len(remaining)} incomplete ranges left for the exchange"
+        )
+        return remaining
+
+    async def _fill_from_exchange(
+        self,
+        source: str,
+        ccxt_exchange: Any,
+        symbol: str,
+        timeframe: str,
+        start_ts: int,
+        end_ts: int
+    ):
+        """Page fetch_ohlcv over the gap; only closed bars are stored"""
+        seconds = TIMEFRAME_SECONDS[timeframe]
+        since = start_ts
+        fetched: List[Candle] = []
+
+        while since < end_ts:
+            ohlcv = await asyncio.to_thread(
+                ccxt_exchange.fetch_ohlcv, symbol, timeframe, since * 1000, OHLCV_PAGE_LIMIT
+            )
+            if not ohlcv:
+                break
+
+            page = [
+                (int(row[0] // 1000), float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5] or 0))
+                for row in ohlcv
+            ]
+            fetched.extend(c for c in page if start_ts <= c[0] < end_ts)
+
+            next_since = page[-1][0] + seconds
+            if next_since <= since or len(ohlcv) < OHLCV_PAGE_LIMIT:
+                break
+            since = next_since
+
+        await asyncio.to_thread(self.store.upsert, source, symbol, timeframe, fetched)
+        if fetched:
+            # Bars after the newest returned one may still be delayed upstream
+            covered_end = end_ts if fetched[-1][0] + seconds >= end_ts else fetched[-1][0] + seconds
+            await asyncio.to_thread(self.store.mark_covered, source, symbol, timeframe, start_ts, covered_end)
+
+        self.stats['fetched'] += len(fetched)
+        logger.info(f"📥 Stored {len(fetched)} {timeframe} candles from {source} ({symbol})")
+
+
+_candle_service: Optional[CandleService] = None
+
+
+def get_candle_service() -> CandleService:
+    """Process-wide candle service"""
+    global _candle_service
+    if _candle_service is None:
+        _candle_service = CandleService()
+    return _candle_service
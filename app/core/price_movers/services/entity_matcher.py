@@ -0,0 +1,315 @@
+"""
+Entity Matcher - CEX Entity ↔ DEX Wallet Matching
+
+Ersetzt den paarweisen Vergleich in HybridPriceMoverAnalyzer, der für jedes
+(Entity, Wallet)-Paar alle CEX- und DEX-Trades neu gefiltert hat.
+
+- Trades werden EINMAL pro Entity/Wallet gruppiert (sortierte Timestamps + Größen)
+- Volume-, Count-, Timing- und Size-Pattern-Similarity als Array-Operationen
+  über alle Wallets gleichzeitig (Intervall-Arithmetik statt Trade-Scans)
+- Kein Top-N Cap mehr nötig
+- Optionales Pruning: nur Wallets, deren Aktivitätsfenster zeitlich in der
+  Nähe der Entity liegt (sortierte Startzeiten + searchsorted)
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# Gewichte wie bisher in _calculate_entity_similarity
+SIMILARITY_WEIGHTS = {
+    'volume_similarity': 0.40,
+    'count_similarity': 0.20,
+    'timing_overlap': 0.30,
+    'size_pattern_similarity': 0.10,
+}
+
+
+def _field(trade: Any, name: str) -> Any:
+    """Feld aus Trade-Objekt oder Trade-Dict"""
+    if isinstance(trade, dict):
+        return trade.get(name)
+    return getattr(trade, name, None)
+
+
+def _ratio_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """min/max Ratio; beide 0 → 1.0, einer 0 → 0.0"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.minimum(a, b) / np.maximum(a, b)
+    return np.where(
+        (a == 0) & (b == 0), 1.0,
+        np.where((a == 0) | (b == 0), 0.0, ratio)
+    )
+
+
+class TradeIndex:
+    """
+    Trades einmal nach Entity/Wallet gruppiert
+
+    Pro Key: sortierte Timestamps (epoch) und Trade-Größen (USD).
+    Zusätzlich Aktivitätsfenster (start/end) als Arrays für Intervall-Operationen.
+    """
+
+    def __init__(self, trades: List[Any], key: Callable[[Any], Optional[str]]):
+        groups: Dict[str, List[tuple]] = defaultdict(list)
+        all_timestamps = []
+
+        for trade in trades:
+            ts = _field(trade, 'timestamp')
+            if not isinstance(ts, datetime):
+                continue
+            epoch = ts.timestamp()
+            all_timestamps.append(epoch)
+
+            group_key = key(trade)
+            if group_key:
+                value = _field(trade, 'value_usd')
+                if value is None:
+                    value = (_field(trade, 'amount') or 0) * (_field(trade, 'price') or 0)
+                groups[group_key].append((epoch, float(value)))
+
+        self.timestamps = np.asarray(all_timestamps, dtype=np.float64)
+        self.series: Dict[str, Dict[str, np.ndarray]] = {}
+
+        for group_key, rows in groups.items():
+            data = np.asarray(rows, dtype=np.float64)
+            order = np.argsort(data[:, 0], kind='stable')
+            self.series[group_key] = {
+                'timestamps': data[order, 0],
+                'sizes': data[order, 1],
+            }
+
+    @classmethod
+    def by_attribute(cls, trades: List[Any], attribute: str) -> 'TradeIndex':
+        return cls(trades, key=lambda trade: _field(trade, attribute))
+
+    @classmethod
+    def from_batch(cls, batch: Any) -> 'TradeIndex':
+        """Index direkt aus einem TradeBatch (gruppiert nach batch.wallet)"""
+        index = cls.__new__(cls)
+        valid = ~np.isnan(batch.ts)
+        index.timestamps = batch.ts[valid]
+        index.series = {}
+
+        keyed = np.flatnonzero(valid & (batch.wallet >= 0))
+        if len(keyed):
+            # Nach Wallet, innerhalb des Wallets stabil nach Zeit
+            keyed = keyed[np.lexsort((batch.ts[keyed], batch.wallet[keyed]))]
+            codes, starts = np.unique(batch.wallet[keyed], return_index=True)
+            for code, group in zip(codes, np.split(keyed, starts[1:])):
+                index.series[batch.wallets[code]] = {
+                    'timestamps': batch.ts[group],
+                    'sizes': batch.value_usd[group],
+                }
+
+        return index
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    @property
+    def mean_timestamp(self) -> Optional[float]:
+        return float(self.timestamps.mean()) if len(self.timestamps) else None
+
+    def activity_windows(self, keys: List[str]) -> tuple:
+        """(start, end) Arrays für keys - NaN für Keys ohne Trades"""
+        start = np.full(len(keys), np.nan)
+        end = np.full(len(keys), np.nan)
+        for i, key in enumerate(keys):
+            series = self.series.get(key)
+            if series is not None:
+                start[i] = series['timestamps'][0]
+                end[i] = series['timestamps'][-1]
+        return start, end
+
+
+class EntityMatcher:
+    """
+    Vektorisiertes 1:1 Matching von CEX Entities gegen DEX Wallets
+
+    Liefert dieselben Match-Dicts wie der bisherige paarweise Vergleich
+    (cex_entity, dex_wallet, confidence, similarity_breakdown, ...).
+    """
+
+    def __init__(
+        self,
+        min_confidence: float = 0.5,
+        proximity_seconds: float = 60.0,
+        prune: bool = False
+    ):
+        """
+        Args:
+            min_confidence: Matches nur mit confidence > min_confidence
+            proximity_seconds: Nicht überlappende Fenster zählen bis zu diesem
+                Abstand anteilig als Timing-Overlap
+            prune: Nur Wallets vergleichen, deren Aktivitätsfenster höchstens
+                proximity_seconds vom Entity-Fenster entfernt ist
+        """
+        self.min_confidence = min_confidence
+        self.proximity_seconds = proximity_seconds
+        self.prune = prune
+
+    # ==================== COMPONENTS ====================
+
+    def _timing_overlap(
+        self,
+        cex_start: float,
+        cex_end: float,
+        dex_start: np.ndarray,
+        dex_end: np.ndarray
+    ) -> np.ndarray:
+        """Intervall-Overlap eines CEX-Fensters mit vielen DEX-Fenstern"""
+        proximity = self.proximity_seconds
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overlap_start = np.maximum(cex_start, dex_start)
+            overlap_end = np.minimum(cex_end, dex_end)
+
+            # No overlap - check if they're close in time
+            time_gap = np.minimum(np.abs(cex_start - dex_end), np.abs(dex_start - cex_end))
+            near = np.where(time_gap < proximity, 1.0 - time_gap / proximity, 0.0)
+
+            total_duration = np.maximum(cex_end - cex_start, dex_end - dex_start)
+            overlap = np.where(
+                total_duration == 0,
+                1.0,
+                np.clip((overlap_end - overlap_start) / total_duration, 0.0, 1.0)
+            )
+
+            timing = np.where(overlap_end <= overlap_start, near, overlap)
+
+        has_trades = ~np.isnan(dex_start) & (not np.isnan(cex_start))
+        return np.where(has_trades, timing, 0.0)
+
+    @staticmethod
+    def _count_similarity(cex_count: float, dex_count: np.ndarray) -> np.ndarray:
+        dex_count = np.asarray(dex_count, dtype=np.float64)
+        diff = np.maximum(0.0, 1.0 - np.abs(cex_count - dex_count) / 10.0)
+        return np.where(
+            (cex_count == 0) & (dex_count == 0), 1.0,
+            np.where((cex_count == 0) | (dex_count == 0), 0.0, diff)
+        )
+
+    # ==================== MATCHING ====================
+
+    def match(
+        self,
+        cex_movers: List[Dict],
+        dex_movers: List[Dict],
+        cex_index: TradeIndex,
+        dex_index: TradeIndex
+    ) -> List[Dict]:
+        """
+        Bester DEX Wallet pro CEX Entity (alle gegen alle bzw. geprunt)
+
+        Returns:
+            Matches mit confidence > min_confidence, absteigend sortiert
+        """
+        if not cex_movers or not dex_movers:
+            return []
+
+        dex_keys = [m.get('wallet_address', '') for m in dex_movers]
+        dex_volume = np.array([m.get('total_volume', 0) for m in dex_movers], dtype=np.float64)
+        dex_count = np.array([m.get('trade_count', 0) for m in dex_movers], dtype=np.float64)
+        dex_avg = np.array([m.get('avg_trade_size', 0) for m in dex_movers], dtype=np.float64)
+        dex_ratio = np.nan_to_num(
+            np.array([m.get('buy_sell_ratio', 1.0) for m in dex_movers], dtype=np.float64),
+            nan=np.nan, posinf=100.0, neginf=100.0
+        )
+        dex_start, dex_end = dex_index.activity_windows(dex_keys)
+
+        if self.prune:
+            active = np.flatnonzero(~np.isnan(dex_start))
+            by_start = active[np.argsort(dex_start[active], kind='stable')]
+            sorted_starts = dex_start[by_start]
+
+        cex_keys = [m.get('wallet_id', '') for m in cex_movers]
+        cex_start, cex_end = cex_index.activity_windows(cex_keys)
+
+        matches = []
+        pairs_scored = 0
+
+        for row, cex_entity in enumerate(cex_movers):
+            if self.prune:
+                if np.isnan(cex_start[row]):
+                    continue
+                upper = np.searchsorted(sorted_starts, cex_end[row] + self.proximity_seconds, side='right')
+                candidates = by_start[:upper]
+                candidates = np.sort(
+                    candidates[dex_end[candidates] >= cex_start[row] - self.proximity_seconds]
+                )
+                if len(candidates) == 0:
+                    continue
+            else:
+                candidates = slice(None)
+
+            cex_ratio = cex_entity.get('buy_sell_ratio', 1.0)
+            if np.isinf(cex_ratio):
+                cex_ratio = 100.0
+
+            components = {
+                'volume_similarity': _ratio_similarity(
+                    cex_entity.get('total_volume', 0), dex_volume[candidates]
+                ),
+                'count_similarity': self._count_similarity(
+                    cex_entity.get('trade_count', 0), dex_count[candidates]
+                ),
+                'timing_overlap': self._timing_overlap(
+                    cex_start[row], cex_end[row], dex_start[candidates], dex_end[candidates]
+                ),
+                'size_pattern_similarity': (
+                    _ratio_similarity(cex_entity.get('avg_trade_size', 0), dex_avg[candidates]) * 0.6 +
+                    _ratio_similarity(cex_ratio, dex_ratio[candidates]) * 0.4
+                ),
+            }
+
+            overall = np.nan_to_num(
+                sum(components[name] * weight for name, weight in SIMILARITY_WEIGHTS.items()),
+                nan=0.0, posinf=999.0, neginf=-999.0
+            )
+            pairs_scored += len(overall)
+
+            best = int(np.argmax(overall))
+            confidence = float(overall[best])
+            if confidence <= self.min_confidence:
+                continue
+
+            column = best if isinstance(candidates, slice) else int(candidates[best])
+            dex_wallet = dex_movers[column]
+
+            cex_volume = cex_entity.get('total_volume', 0)
+            dex_wallet_volume = dex_wallet.get('total_volume', 0)
+            volume_base = max(cex_entity.get('total_volume', 1), dex_wallet.get('total_volume', 1))
+
+            matches.append({
+                'cex_entity': cex_entity['wallet_id'],
+                'dex_wallet': dex_wallet['wallet_address'],
+                'type': cex_entity.get('wallet_type', 'unknown'),
+                'confidence': confidence,
+                'similarity_breakdown': {
+                    'overall_score': confidence,
+                    **{name: float(values[best]) for name, values in components.items()}
+                },
+                'cex_volume': cex_volume,
+                'dex_volume': dex_wallet_volume,
+                'volume_diff_pct': (
+                    abs(cex_volume - dex_wallet_volume) / volume_base * 100 if volume_base else 0.0
+                )
+            })
+
+        matches.sort(key=lambda m: m['confidence'], reverse=True)
+
+        logger.debug(
+            f"EntityMatcher: {len(cex_movers)}x{len(dex_movers)} "
+            f"({pairs_scored} pairs scored, prune={self.prune}) → {len(matches)} matches"
+        )
+
+        return matches
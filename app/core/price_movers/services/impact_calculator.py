@@ -10,10 +10,13 @@ Berücksichtigt:
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 import statistics
+import time
+
+import numpy as np
 
 import sys
 import os
@@ -733,7 +736,8 @@ class ImpactCalculator:
         self,
         wallet_activities: Dict[str, List[Dict[str, Any]]],
         candle_data: Dict[str, Any],
-        total_volume: float
+        total_volume: float,
+        vectorized: bool = True
     ) -> Dict[str, Dict[str, Any]]:
         """
         Berechnet Impact Scores für mehrere Wallets gleichzeitig
@@ -742,6 +746,7 @@ class ImpactCalculator:
             wallet_activities: Dictionary wallet_id -> trades
             candle_data: Candle-Daten
             total_volume: Gesamt-Volume IN USD
+            vectorized: Spaltenbasierte Berechnung (False = per-Wallet Loop)
             
         Returns:
             Dictionary wallet_id -> impact_result
@@ -750,17 +755,453 @@ class ImpactCalculator:
         logger.info(f"Gesamtanzahl Wallets: {len(wallet_activities)}")
         logger.info(f"Übergebenes total_volume für Batch: {total_volume}")
 
-        results = {}
-        
-        for wallet_id, trades in wallet_activities.items():
-            logger.debug(f"Verarbeite Wallet: {wallet_id}")
-            results[wallet_id] = self.calculate_impact_score(
-                wallet_trades=trades,
-                candle_data=candle_data,
-                total_volume=total_volume
+        start = time.perf_counter()
+
+        if vectorized:
+            results = self._calculate_batch_impact_columnar(
+                wallet_activities, candle_data, total_volume
             )
+        else:
+            results = {}
+            
+            for wallet_id, trades in wallet_activities.items():
+                logger.debug(f"Verarbeite Wallet: {wallet_id}")
+                results[wallet_id] = self.calculate_impact_score(
+                    wallet_trades=trades,
+                    candle_data=candle_data,
+                    total_volume=total_volume
+                )
         
-        logger.info(f"Batch Impact berechnet für {len(results)} Wallets")
+        logger.info(
+            f"Batch Impact berechnet für {len(results)} Wallets "
+            f"({(time.perf_counter() - start) * 1000:.1f}ms, vectorized={vectorized})"
+        )
         logger.info(f"--- calculate_batch_impact END ---")
         
         return results
+
+    # ==================== COLUMNAR BATCH SCORING ====================
+
+    # trade_type → side code (alles andere zählt wie in _calculate_price_correlation als swap)
+    _SIDE_CODES = {"buy": 0, "sell": 1}
+
+    # Candle-Länge, auf die sich das Timing bezieht (wie in _calculate_timing_score)
+    CANDLE_DURATION = 300
+
+    def _calculate_batch_impact_columnar(
+        self,
+        wallet_activities: Dict[str, List[Dict[str, Any]]],
+        candle_data: Dict[str, Any],
+        total_volume: float
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Spaltenbasierte Variante von calculate_batch_impact
+        
+        Lädt alle Trades einmal in NumPy-Spalten (wallet, ts, amount, price,
+        side) und berechnet jede Komponente per Group-By-Reduktion. Liefert
+        dieselben Werte wie calculate_impact_score pro Wallet.
+        
+        Wallets mit Trades, die der Spalten-Parser nicht abbildet (fehlende
+        Zahlen, gemischte Zeitstempel-Typen, ...), laufen weiter über
+        calculate_impact_score - inklusive dessen Fehlerverhalten.
+        """
+        try:
+            candle_start, candle_values = self._columnar_candle(candle_data)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Candle not columnar-compatible ({e}) -> per-wallet loop")
+            return self.calculate_batch_impact(
+                wallet_activities, candle_data, total_volume, vectorized=False
+            )
+
+        candle_aware = candle_start.tzinfo is not None
+        candle_epoch = self._to_epoch(candle_start)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        wallet_ids: List[str] = []
+        counts: List[int] = []
+        amounts: List[float] = []
+        prices: List[float] = []
+        epochs: List[float] = []
+        sides: List[int] = []
+        liquidity: List[bool] = []
+
+        # ---------- Load columns (one pass over all trades) ----------
+        for wallet_id, trades in wallet_activities.items():
+            if not trades:
+                results[wallet_id] = self._zero_impact()
+                continue
+
+            try:
+                rows = self._trade_columns(trades, candle_aware)
+            except (TypeError, ValueError, AttributeError):
+                results[wallet_id] = self.calculate_impact_score(
+                    wallet_trades=trades,
+                    candle_data=candle_data,
+                    total_volume=total_volume
+                )
+                continue
+
+            wallet_ids.append(wallet_id)
+            counts.append(len(trades))
+            amounts.extend(rows[0])
+            prices.extend(rows[1])
+            epochs.extend(rows[2])
+            sides.extend(rows[3])
+            liquidity.extend(rows[4])
+
+        if wallet_ids:
+            scores = self._score_columns(
+                counts=np.asarray(counts, dtype=np.int64),
+                amount=np.asarray(amounts, dtype=np.float64),
+                price=np.asarray(prices, dtype=np.float64),
+                offset=np.asarray(epochs, dtype=np.float64) - candle_epoch,
+                side=np.asarray(sides, dtype=np.int8),
+                liquidity=np.asarray(liquidity, dtype=bool),
+                total_volume=total_volume,
+                **candle_values
+            )
+            for wallet_id, result in zip(wallet_ids, scores):
+                results[wallet_id] = result
+
+        # Preserve input order like the per-wallet loop
+        return {wallet_id: results[wallet_id] for wallet_id in wallet_activities}
+
+    def calculate_grouped_impact(
+        self,
+        counts: np.ndarray,
+        amount: np.ndarray,
+        price: np.ndarray,
+        epochs: np.ndarray,
+        trade_types: Optional[np.ndarray],
+        candle_data: Dict[str, Any],
+        total_volume: float,
+        sides: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Impact für Trades, die bereits als Spalten vorliegen
+        
+        Trades sind nach Gruppe zusammenhängend (counts[i] Trades pro Gruppe),
+        z.B. Entities aus dem LightweightEntityIdentifier. Spart den Umweg
+        über Trade-Dicts; Ergebnis wie calculate_batch_impact pro Gruppe.
+        
+        Args:
+            counts: Trades pro Gruppe
+            amount, price: Pro Trade
+            epochs: Trade-Zeitpunkte (epoch seconds)
+            trade_types: 'buy' / 'sell' / sonstiges pro Trade
+            candle_data: Candle-Daten
+            total_volume: Gesamt-Volume IN USD
+            sides: Statt trade_types bereits kodierte Seiten (_SIDE_CODES, sonst 2)
+            
+        Raises:
+            TypeError/ValueError wenn die Candle nicht spaltenfähig ist
+        """
+        candle_start, candle_values = self._columnar_candle(candle_data)
+        
+        if sides is None:
+            side_lookup = {}
+            sides = np.empty(len(trade_types), dtype=np.int8)
+            for i, trade_type in enumerate(trade_types):
+                code = side_lookup.get(trade_type)
+                if code is None:
+                    code = side_lookup[trade_type] = self._SIDE_CODES.get(trade_type.lower() or "unknown", 2)
+                sides[i] = code
+        
+        return self._score_columns(
+            counts=np.asarray(counts, dtype=np.int64),
+            amount=np.asarray(amount, dtype=np.float64),
+            price=np.asarray(price, dtype=np.float64),
+            offset=np.asarray(epochs, dtype=np.float64) - self._to_epoch(candle_start),
+            side=sides,
+            liquidity=np.zeros(len(sides), dtype=bool),
+            total_volume=total_volume,
+            **candle_values
+        )
+
+    @staticmethod
+    def _columnar_candle(candle_data: Dict[str, Any]) -> tuple:
+        """
+        (candle_start, Candle-Parameter für _score_columns)
+        
+        Raises TypeError/ValueError für Candles, die nur der Loop abbildet.
+        """
+        candle_start = candle_data.get("timestamp")
+        if isinstance(candle_start, str):
+            candle_start = datetime.fromisoformat(candle_start.replace('Z', '+00:00'))
+        if not isinstance(candle_start, datetime):
+            raise TypeError(f"candle timestamp: {type(candle_start).__name__}")
+
+        timing_change = candle_data.get("price_change_pct", 0.0)
+        high = candle_data.get("high", 0.0)
+        low = candle_data.get("low", 0.0)
+        candle_volume = candle_data.get("volume", 0.0)
+        for value in (timing_change, high, low, candle_volume):
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"candle value: {type(value).__name__}")
+
+        return candle_start, {
+            'timing_change': float(timing_change),
+            'correlation_change': float(candle_data.get("price_change_pct") or 0.0),
+            'high': float(high),
+            'low': float(low),
+            'candle_volume': float(candle_volume),
+        }
+
+    @staticmethod
+    def _to_epoch(ts: datetime) -> float:
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return ts.timestamp()
+
+    def _trade_columns(self, trades: List[Dict[str, Any]], candle_aware: bool) -> tuple:
+        """
+        Trades eines Wallets → (amounts, prices, epochs, sides, liquidity)
+        
+        Raises TypeError/ValueError für alles, was calculate_impact_score
+        anders behandeln würde als die Spalten-Variante.
+        """
+        amounts, prices, epochs, sides, liquidity = [], [], [], [], []
+        ts_kinds = set()
+
+        for trade in trades:
+            raw_amount = trade.get("amount", 0.0)
+            if not isinstance(raw_amount, (int, float)):
+                raise TypeError("amount")
+            amounts.append(float(raw_amount))
+            prices.append(float(trade.get("price", 0)))
+
+            ts = trade.get("timestamp")
+            ts_kinds.add(type(ts))
+            if isinstance(ts, str):
+                ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+            if not isinstance(ts, datetime) or (ts.tzinfo is not None) != candle_aware:
+                raise TypeError("timestamp")
+            epochs.append(self._to_epoch(ts))
+
+            trade_type = (
+                trade.get("trade_type", "").lower() or
+                trade.get("side", "").lower() or
+                "unknown"
+            )
+            sides.append(self._SIDE_CODES.get(trade_type, 2))
+
+            liquidity.append(trade.get('transaction_type') in ('ADD_LIQUIDITY', 'REMOVE_LIQUIDITY'))
+
+        if len(ts_kinds) > 1:
+            raise TypeError("mixed timestamp types")
+
+        return amounts, prices, epochs, sides, liquidity
+
+    @staticmethod
+    def _normalize_sizes(size: np.ndarray) -> np.ndarray:
+        """Vektorisierte Variante von normalize_size in _calculate_size_impact"""
+        return np.select(
+            [size < 10_000, size < 50_000, size < 100_000, size < 500_000],
+            [
+                size / 50_000,
+                0.2 + (size - 10_000) / 133_333,
+                0.5 + (size - 50_000) / 250_000,
+                0.7 + (size - 100_000) / 1_333_333,
+            ],
+            default=1.0
+        )
+
+    def _score_columns(
+        self,
+        counts: np.ndarray,
+        amount: np.ndarray,
+        price: np.ndarray,
+        offset: np.ndarray,
+        side: np.ndarray,
+        liquidity: np.ndarray,
+        total_volume: float,
+        timing_change: float,
+        correlation_change: float,
+        high: float,
+        low: float,
+        candle_volume: float
+    ) -> List[Dict[str, Any]]:
+        """Alle fünf Komponenten per Group-By über zusammenhängende Wallet-Blöcke"""
+        n_wallets = len(counts)
+        group = np.repeat(np.arange(n_wallets), counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        lasts = starts + counts - 1
+
+        def group_sum(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(group, weights=weights, minlength=n_wallets)
+
+        value = amount * price
+
+        components = self.aggregate_components(
+            counts=counts,
+            wallet_volume=group_sum(value),
+            max_value=np.maximum.reduceat(value, starts),
+            early_count=group_sum((offset < self.CANDLE_DURATION * 0.33).astype(np.float64)),
+            first_offset=offset[starts],
+            last_offset=offset[lasts],
+            min_offset=np.minimum.reduceat(offset, starts),
+            max_offset=np.maximum.reduceat(offset, starts),
+            offset_sum=group_sum(offset),
+            buy_volume=group_sum(np.where(side == 0, amount, 0.0)),
+            sell_volume=group_sum(np.where(side == 1, amount, 0.0)),
+            swap_volume=group_sum(np.where(side == 2, amount, 0.0)),
+            amount_sum=group_sum(amount),
+            total_volume=total_volume,
+            timing_change=timing_change,
+            correlation_change=correlation_change,
+            high=high,
+            low=low,
+            candle_volume=candle_volume
+        )
+        has_liquidity = group_sum(liquidity.astype(np.float64)) > 0
+
+        return self.component_results(components, has_liquidity, range(n_wallets))
+
+    def aggregate_components(
+        self,
+        counts: np.ndarray,
+        wallet_volume: np.ndarray,
+        max_value: np.ndarray,
+        early_count: np.ndarray,
+        first_offset: np.ndarray,
+        last_offset: np.ndarray,
+        min_offset: np.ndarray,
+        max_offset: np.ndarray,
+        offset_sum: np.ndarray,
+        buy_volume: np.ndarray,
+        sell_volume: np.ndarray,
+        swap_volume: np.ndarray,
+        amount_sum: np.ndarray,
+        total_volume: float,
+        timing_change: float,
+        correlation_change: float,
+        high: float,
+        low: float,
+        candle_volume: float
+    ) -> Dict[str, np.ndarray]:
+        """
+        Impact-Komponenten aus Aggregaten pro Wallet (ein Element pro Wallet)
+        
+        Alle Komponenten hängen nur von Summen, Min/Max und erstem/letztem
+        Trade ab - dieselben Aggregate kann ein Stream pro Trade in O(1)
+        fortschreiben (siehe StreamingMoverEngine).
+        
+        Offsets sind Sekunden seit Candle-Start, Volumes in Token-Menge
+        (buy/sell/swap/amount_sum) bzw. USD (wallet_volume, max_value).
+        
+        Returns:
+            Arrays der fünf Komponenten + 'impact_score' (ungerundet)
+        """
+        n_wallets = len(counts)
+        n = np.asarray(counts, dtype=np.float64)
+
+        # ---------- 1: Volume Ratio ----------
+        if total_volume > 0:
+            volume_ratio = np.minimum(wallet_volume / total_volume, 1.0)
+        else:
+            volume_ratio = np.zeros(n_wallets)
+
+        # ---------- 2: Timing ----------
+        candle_duration = self.CANDLE_DURATION
+        early_ratio = early_count / n
+
+        multi = n > 1
+        avg_diff = (last_offset - first_offset) / np.maximum(n - 1, 1)
+        concentration = np.where(multi, 1.0 / (1.0 + avg_diff / 60.0), 1.0)
+
+        if abs(timing_change) > SIGNIFICANT_PRICE_MOVE_PCT:
+            avg_offset = offset_sum / n
+            movement_timing = np.maximum(0, 1.0 - (avg_offset / candle_duration))
+        else:
+            movement_timing = np.zeros(n_wallets)
+
+        timing_score = np.minimum(
+            early_ratio * 0.4 + concentration * 0.3 + movement_timing * 0.3, 1.0
+        )
+
+        # ---------- 3: Size Impact ----------
+        avg_size = wallet_volume / n
+        size_impact = np.minimum(
+            self._normalize_sizes(avg_size) * 0.6 + self._normalize_sizes(max_value) * 0.4, 1.0
+        )
+
+        # ---------- 4: Price Correlation ----------
+        directional = buy_volume + sell_volume
+        all_volume = buy_volume + sell_volume + swap_volume
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buy_ratio = np.where(directional != 0, buy_volume / directional, 0.0)
+
+        if correlation_change > 0.001:
+            directional_corr = buy_ratio
+        elif correlation_change < -0.001:
+            directional_corr = 1.0 - buy_ratio
+        else:
+            directional_corr = np.full(n_wallets, 0.5)
+        directional_corr = directional_corr * min(abs(correlation_change) / 2.0, 1.0)
+
+        swap_corr = np.where(
+            (abs(correlation_change) > 0.001) & (all_volume > 0), 0.3, 0.0
+        )
+        price_correlation = np.minimum(
+            np.where(directional == 0, swap_corr, directional_corr), 1.0
+        )
+
+        # ---------- 5: Slippage ----------
+        avg_price = (high + low) / 2
+        if avg_price == 0 or candle_volume == 0:
+            slippage = np.zeros(n_wallets)
+        else:
+            volatility_pct = ((high - low) / avg_price) * 100
+            trade_volume_ratio = amount_sum / candle_volume
+            time_span = max_offset - min_offset
+            span_concentration = 1.0 / (1.0 + time_span / 60.0)
+            slippage = np.where(
+                multi,
+                np.minimum(
+                    np.minimum(trade_volume_ratio * 2.0, 1.0) *
+                    span_concentration *
+                    min(volatility_pct / 2.0, 1.0),
+                    1.0
+                ),
+                0.0
+            )
+
+        total_score = (
+            volume_ratio * IMPACT_SCORE_WEIGHTS["volume_ratio"] +
+            timing_score * IMPACT_SCORE_WEIGHTS["timing_score"] +
+            size_impact * IMPACT_SCORE_WEIGHTS["size_impact"] +
+            price_correlation * IMPACT_SCORE_WEIGHTS["price_correlation"] +
+            slippage * IMPACT_SCORE_WEIGHTS["slippage_caused"]
+        )
+
+        return {
+            "volume_ratio": volume_ratio,
+            "timing_score": timing_score,
+            "size_impact": size_impact,
+            "price_correlation": price_correlation,
+            "slippage_caused": slippage,
+            "impact_score": total_score,
+        }
+
+    def component_results(
+        self,
+        components: Dict[str, np.ndarray],
+        has_liquidity: np.ndarray,
+        indices
+    ) -> List[Dict[str, Any]]:
+        """Ergebnis-Dicts (wie calculate_impact_score) für die gewählten Wallets"""
+        total_score = components["impact_score"]
+        names = ("volume_ratio", "timing_score", "size_impact", "price_correlation", "slippage_caused")
+
+        return [
+            {
+                "impact_score": round(float(total_score[i]), 3),
+                "components": {
+                    name: round(float(components[name][i]), 3) for name in names
+                },
+                "impact_level": self._get_impact_level(float(total_score[i])),
+                "has_liquidity_events": bool(has_liquidity[i])
+            }
+            for i in indices
+        ]
@@ -13,7 +13,7 @@ Performance:
 
 import logging
 from typing import List, Dict, Any, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 from dataclasses import dataclass
 import numpy as np
@@ -140,7 +140,8 @@ class LightweightEntityIdentifier:
         trades: List[Dict[str, Any]],
         candle_data: Dict[str, Any],
         symbol: str,
-        exchange: str
+        exchange: str,
+        vectorized: bool = True
     ) -> List[TradingEntity]:
         """
         Haupt-Methode: Identifiziert Trading Entities
@@ -157,6 +158,7 @@ class LightweightEntityIdentifier:
             candle_data: Candle-Kontext
             symbol: Trading Pair
             exchange: Exchange Name
+            vectorized: Phasen 1-4 spaltenbasiert (False = Trade-für-Trade Loop)
             
         Returns:
             Liste von TradingEntity Objekten, sortiert nach Impact
@@ -168,26 +170,31 @@ class LightweightEntityIdentifier:
         start_time = datetime.now()
         logger.info(f"Starte Lightweight Entity-Identifikation für {len(trades)} Trades")
         
-        # Phase 1: Enrich Trades
-        enriched_trades = self._enrich_trades(trades, candle_data)
-        logger.debug(f"✓ Phase 1: {len(enriched_trades)} Trades enriched")
-        
-        # Phase 2: Bucket by Characteristics
-        raw_entities = self._bucket_by_characteristics(enriched_trades)
-        logger.debug(f"✓ Phase 2: {len(raw_entities)} raw entities bucketed")
-        
-        # Phase 3: Refine by Timing
-        refined_entities = self._refine_by_timing(raw_entities)
-        logger.debug(f"✓ Phase 3: {len(refined_entities)} entities after refinement")
-        
-        # Phase 4: Build Entity Profiles
-        entities = await self._build_entity_profiles(
-            refined_entities,
-            candle_data,
-            symbol,
-            exchange
-        )
-        logger.debug(f"✓ Phase 4: {len(entities)} entity profiles built")
+        if vectorized:
+            # Phase 1-4 spaltenbasiert (identische Entities)
+            entities = self._identify_columnar(trades, candle_data, symbol, exchange)
+            logger.debug(f"✓ Phase 1-4 (columnar): {len(entities)} entity profiles built")
+        else:
+            # Phase 1: Enrich Trades
+            enriched_trades = self._enrich_trades(trades, candle_data)
+            logger.debug(f"✓ Phase 1: {len(enriched_trades)} Trades enriched")
+            
+            # Phase 2: Bucket by Characteristics
+            raw_entities = self._bucket_by_characteristics(enriched_trades)
+            logger.debug(f"✓ Phase 2: {len(raw_entities)} raw entities bucketed")
+            
+            # Phase 3: Refine by Timing
+            refined_entities = self._refine_by_timing(raw_entities)
+            logger.debug(f"✓ Phase 3: {len(refined_entities)} entities after refinement")
+            
+            # Phase 4: Build Entity Profiles
+            entities = await self._build_entity_profiles(
+                refined_entities,
+                candle_data,
+                symbol,
+                exchange
+            )
+            logger.debug(f"✓ Phase 4: {len(entities)} entity profiles built")
         
         # Phase 5: Filter by Confidence
         filtered_entities = [
@@ -442,49 +449,433 @@ class LightweightEntityIdentifier:
                 total_volume=candle_data['volume']
             )
             
-            # Entity Classification
-            entity_type = self.classifier.classify(
-                avg_trade_size=avg_trade_size,
+            entities.append(self._make_entity(
+                idx=idx,
+                raw_entity=raw_entity,
                 trade_count=trade_count,
+                total_volume=total_volume,
+                total_value_usd=total_value_usd,
+                avg_trade_size=avg_trade_size,
+                buy_sell_ratio=buy_sell_ratio,
+                trade_frequency=trade_frequency,
                 size_consistency=size_consistency,
                 timing_pattern=timing_pattern,
-                buy_sell_ratio=buy_sell_ratio,
-                impact_score=impact_result['impact_score']
+                impact_result=impact_result,
+                first_trade_time=first_trade_time,
+                last_trade_time=last_trade_time,
+                symbol=symbol,
+                exchange=exchange
+            ))
+        
+        return entities
+    
+    def _make_entity(
+        self,
+        idx: int,
+        raw_entity: Dict[str, Any],
+        trade_count: int,
+        total_volume: float,
+        total_value_usd: float,
+        avg_trade_size: float,
+        buy_sell_ratio: float,
+        trade_frequency: float,
+        size_consistency: float,
+        timing_pattern: str,
+        impact_result: Dict[str, Any],
+        first_trade_time: datetime,
+        last_trade_time: datetime,
+        symbol: str,
+        exchange: str
+    ) -> TradingEntity:
+        """Klassifikation + Confidence + TradingEntity aus fertigen Kennzahlen"""
+        # Entity Classification
+        entity_type = self.classifier.classify(
+            avg_trade_size=avg_trade_size,
+            trade_count=trade_count,
+            size_consistency=size_consistency,
+            timing_pattern=timing_pattern,
+            buy_sell_ratio=buy_sell_ratio,
+            impact_score=impact_result['impact_score']
+        )
+        
+        # Confidence Score
+        confidence_score = self._calculate_confidence(
+            trade_count=trade_count,
+            size_consistency=size_consistency,
+            timing_pattern=timing_pattern,
+            is_merged=raw_entity.get('is_merged', False)
+        )
+        
+        # Entity ID
+        entity_id = f"entity_{exchange}_{symbol.replace('/', '')}_{idx}"
+        
+        return TradingEntity(
+            entity_id=entity_id,
+            entity_type=entity_type,
+            confidence_score=confidence_score,
+            trades=raw_entity['trades'],
+            trade_count=trade_count,
+            total_volume=total_volume,
+            total_value_usd=total_value_usd,
+            avg_trade_size=avg_trade_size,
+            buy_sell_ratio=buy_sell_ratio,
+            trade_frequency=trade_frequency,
+            size_consistency=size_consistency,
+            timing_pattern=timing_pattern,
+            impact_score=impact_result['impact_score'],
+            impact_level=impact_result['impact_level'],
+            impact_components=impact_result['components'],
+            first_trade_time=first_trade_time,
+            last_trade_time=last_trade_time
+        )
+    
+    # ==================== COLUMNAR PIPELINE ====================
+    
+    # Grenzen aus calculate_size_category
+    _SIZE_THRESHOLDS = np.array([1_000, 10_000, 50_000, 100_000, 500_000], dtype=np.float64)
+    
+    # Runde Zahlen aus is_round_number
+    _ROUND_NUMBERS = np.array([
+        0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 5.0,
+        10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0
+    ])
+    
+    def _enrich_columns(
+        self,
+        trades: List[Dict[str, Any]],
+        candle_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Phase 1 spaltenbasiert: ein Pass über die Trades, Features als Arrays
+        
+        Zeitstempel werden als ganzzahlige Mikrosekunden-Offsets zur Candle
+        gespeichert - damit sind Buckets, Sortierung und Gaps exakt wie bei
+        timedelta.total_seconds().
+        """
+        candle_mid = (candle_data['high'] + candle_data['low']) / 2
+        candle_start = candle_data['timestamp']
+        one_us = timedelta(microseconds=1)
+        
+        timestamps, trade_types, side_codes = [], [], []
+        amounts, prices, values, offsets = [], [], [], []
+        side_lookup: Dict[Any, int] = {}
+        
+        for trade in trades:
+            timestamp = trade['timestamp']
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            
+            amount = float(trade.get('amount', 0))
+            price = float(trade.get('price', 0))
+            value_usd = float(trade.get('value_usd', amount * price))
+            offset_us = (timestamp - candle_start) // one_us
+            trade_type = trade['trade_type']
+            
+            timestamps.append(timestamp)
+            amounts.append(amount)
+            prices.append(price)
+            values.append(value_usd)
+            offsets.append(offset_us)
+            trade_types.append(trade_type)
+            side_codes.append(side_lookup.setdefault(trade_type, len(side_lookup)))
+        
+        amount = np.asarray(amounts, dtype=np.float64)
+        offset_us = np.asarray(offsets, dtype=np.int64)
+        
+        time_bucket = np.trunc((offset_us / 1e6) / self.config['time_bucket_seconds'])
+        
+        distance = np.abs(amount[:, None] - self._ROUND_NUMBERS)
+        multiple = (amount[:, None] > self._ROUND_NUMBERS) & (np.abs(amount[:, None] % self._ROUND_NUMBERS) < 0.01)
+        
+        return {
+            'trades': trades,
+            'timestamps': timestamps,
+            'trade_types': trade_types,
+            'amounts': amounts,
+            'prices': prices,
+            'values': values,
+            'amount': amount,
+            'value_usd': np.asarray(values, dtype=np.float64),
+            'offset_us': offset_us,
+            'side': np.asarray(side_codes, dtype=np.int64),
+            'side_lookup': side_lookup,
+            'size_category': np.searchsorted(self._SIZE_THRESHOLDS, np.asarray(values), side='right'),
+            'price_level': np.where(np.asarray(prices) >= candle_mid, 1, -1),
+            'time_bucket': np.maximum(time_bucket, 0).astype(np.int64),
+            'is_round': ((distance < 0.01) | multiple).any(axis=1),
+        }
+    
+    def _group_columns(self, columns: Dict[str, Any]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Phase 2+3 spaltenbasiert
+        
+        - Bucket-Key als ein Integer-Code pro Trade (np.unique statt dict of lists)
+        - Buckets in Reihenfolge des ersten Auftretens (wie dict-Insertion)
+        - Timing-Merge als ein Sweep über die nach erstem Trade sortierten
+          Buckets: verglichen wird immer mit dem direkten Vorgänger
+        
+        Returns:
+            None wenn kein Bucket min_trades_per_entity erreicht, sonst
+            Trade-Reihenfolge (perm), Gruppen-Grenzen und Merge-Infos
+        """
+        size = columns['size_category']
+        level = columns['price_level']
+        bucket = columns['time_bucket']
+        side = columns['side']
+        offset_us = columns['offset_us']
+        
+        n_buckets_time = int(bucket.max()) + 1
+        key = ((side * 6 + size) * 2 + (level > 0)) * n_buckets_time + bucket
+        
+        _, first_index, inverse, counts = np.unique(
+            key, return_index=True, return_inverse=True, return_counts=True
+        )
+        inverse = inverse.ravel()
+        
+        kept = np.flatnonzero(counts >= self.config['min_trades_per_entity'])
+        if len(kept) == 0:
+            return None
+        
+        # Raw Entities in Reihenfolge des ersten Auftretens
+        kept = kept[np.argsort(first_index[kept], kind='stable')]
+        n_raw = len(kept)
+        rank = np.full(len(counts), -1, dtype=np.int64)
+        rank[kept] = np.arange(n_raw)
+        
+        trade_rank = rank[inverse]
+        trade_idx = np.flatnonzero(trade_rank >= 0)
+        trade_rank = trade_rank[trade_idx]
+        
+        # Erster / letzter Trade pro Raw Entity
+        first_us = np.full(n_raw, np.iinfo(np.int64).max)
+        last_us = np.full(n_raw, np.iinfo(np.int64).min)
+        np.minimum.at(first_us, trade_rank, offset_us[trade_idx])
+        np.maximum.at(last_us, trade_rank, offset_us[trade_idx])
+        
+        representative = first_index[kept]
+        raw_size = size[representative]
+        raw_level = level[representative]
+        raw_side = side[representative]
+        
+        # Phase 3: nach frühestem Trade sortieren (stabil), dann ein Sweep
+        if n_raw >= 2:
+            order = np.argsort(first_us, kind='stable')
+        else:
+            order = np.arange(n_raw)
+        
+        merge_with_prev = np.zeros(n_raw, dtype=bool)
+        if n_raw >= 2:
+            prev, curr = order[:-1], order[1:]
+            time_gap = (first_us[curr] - last_us[prev]) / 1e6
+            merge_with_prev[1:] = (
+                (time_gap < self.config['merge_time_gap_seconds']) &
+                (raw_size[curr] == raw_size[prev]) &
+                (raw_side[curr] == raw_side[prev]) &
+                (raw_level[curr] == raw_level[prev])
             )
+        
+        group_of_position = np.cumsum(~merge_with_prev) - 1
+        n_groups = int(group_of_position[-1]) + 1
+        group_sizes = np.bincount(group_of_position, minlength=n_groups)
+        
+        position = np.empty(n_raw, dtype=np.int64)
+        position[order] = np.arange(n_raw)
+        trade_position = position[trade_rank]
+        trade_group = group_of_position[trade_position]
+        merged = group_sizes[trade_group] > 1
+        
+        # Merged: chronologisch (stabil über die Bucket-Reihenfolge),
+        # sonst Eingabe-Reihenfolge innerhalb des Buckets
+        perm_local = np.lexsort((
+            trade_idx,
+            trade_position,
+            np.where(merged, offset_us[trade_idx], 0),
+            trade_group
+        ))
+        perm = trade_idx[perm_local]
+        perm_group = trade_group[perm_local]
+        
+        counts_per_group = np.bincount(perm_group, minlength=n_groups)
+        starts = np.concatenate(([0], np.cumsum(counts_per_group)[:-1]))
+        
+        return {
+            'perm': perm,
+            'perm_group': perm_group,
+            'starts': starts,
+            'counts': counts_per_group,
+            'group_sizes': group_sizes,
+            # Erste Raw Entity jeder Gruppe liefert bucket_key/characteristics
+            'leaders': kept[order[np.flatnonzero(~merge_with_prev)]],
+            'first_index': first_index,
+        }
+    
+    def _identify_columnar(
+        self,
+        trades: List[Dict[str, Any]],
+        candle_data: Dict[str, Any],
+        symbol: str,
+        exchange: str
+    ) -> List[TradingEntity]:
+        """
+        Phase 1-4 spaltenbasiert - dieselben Entities wie der Loop-Pfad
+        
+        Summen laufen über np.bincount (sequentiell, bitgleich mit sum()),
+        Mittelwert/Std pro Entity über Array-Slices wie np.mean/np.std im
+        Loop-Pfad. EnrichedTrade-Objekte werden nur für Trades erzeugt, die
+        in einer Entity landen.
+        """
+        columns = self._enrich_columns(trades, candle_data)
+        grouped = self._group_columns(columns)
+        if grouped is None:
+            return []
+        
+        perm = grouped['perm']
+        perm_group = grouped['perm_group']
+        starts = grouped['starts']
+        counts = grouped['counts']
+        n_groups = len(counts)
+        
+        # ---------- Group-By Reduktionen ----------
+        amount = columns['amount'][perm]
+        offset_us = columns['offset_us'][perm]
+        
+        total_volume = np.bincount(perm_group, weights=amount, minlength=n_groups)
+        total_value = np.bincount(perm_group, weights=columns['value_usd'][perm], minlength=n_groups)
+        
+        buy_code = columns['side_lookup'].get('buy', -1)
+        buy_counts = np.bincount(perm_group, weights=columns['side'][perm] == buy_code, minlength=n_groups)
+        
+        # Chronologische Reihenfolge pro Gruppe (stabil wie sorted())
+        chrono = np.lexsort((np.arange(len(perm)), offset_us, perm_group))
+        chrono_us = offset_us[chrono]
+        ends = starts + counts
+        
+        first_pos = perm[chrono[starts]]
+        last_pos = perm[chrono[ends - 1]]
+        time_span = (chrono_us[ends - 1] - chrono_us[starts]) / 1e6
+        
+        # ---------- EnrichedTrades (nur für Entity-Trades) ----------
+        timestamps = columns['timestamps']
+        trade_types = columns['trade_types']
+        amounts = columns['amounts']
+        prices = columns['prices']
+        values = columns['values']
+        size_category = columns['size_category'].tolist()
+        price_level = columns['price_level'].tolist()
+        time_bucket = columns['time_bucket'].tolist()
+        is_round = columns['is_round'].tolist()
+        
+        enriched: Dict[int, EnrichedTrade] = {}
+        for j in perm.tolist():
+            trade = trades[j]
+            enriched[j] = EnrichedTrade(
+                # str(timestamp) nur wenn nötig (dict.get wertet den Default immer aus)
+                trade_id=trade['id'] if 'id' in trade else str(timestamps[j]),
+                timestamp=timestamps[j],
+                trade_type=trade_types[j],
+                amount=amounts[j],
+                price=prices[j],
+                value_usd=values[j],
+                size_category=size_category[j],
+                price_level=price_level[j],
+                time_bucket=time_bucket[j],
+                is_round=is_round[j]
+            )
+        
+        # ---------- Entity Profiles ----------
+        entities = []
+        perm_list = perm.tolist()
+        
+        # Impact für alle Entities in einem spaltenbasierten Batch
+        try:
+            impact_results = self.impact_calculator.calculate_grouped_impact(
+                counts=counts,
+                amount=amount,
+                price=np.asarray(prices)[perm],
+                epochs=np.array([
+                    (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp()
+                    for ts in (timestamps[j] for j in perm_list)
+                ]),
+                trade_types=[trade_types[j] for j in perm_list],
+                candle_data=candle_data,
+                total_volume=candle_data['volume']
+            )
+        except (TypeError, ValueError, AttributeError):
+            impact_results = list(self.impact_calculator.calculate_batch_impact(
+                {
+                    idx: [enriched[j].to_dict() for j in perm_list[starts[idx]:ends[idx]]]
+                    for idx in range(n_groups)
+                },
+                candle_data=candle_data,
+                total_volume=candle_data['volume']
+            ).values())
+        
+        for idx in range(n_groups):
+            start, end = int(starts[idx]), int(ends[idx])
+            trade_count = int(counts[idx])
+            leader = int(grouped['leaders'][idx])
+            representative = int(grouped['first_index'][leader])
             
-            # Confidence Score
-            confidence_score = self._calculate_confidence(
-                trade_count=trade_count,
-                size_consistency=size_consistency,
-                timing_pattern=timing_pattern,
-                is_merged=raw_entity.get('is_merged', False)
+            bucket_key = (
+                size_category[representative],
+                price_level[representative],
+                time_bucket[representative],
+                trade_types[representative]
             )
+            raw_entity = {
+                'bucket_key': bucket_key,
+                'trades': [enriched[j] for j in perm_list[start:end]],
+                'characteristics': {
+                    'size_category': bucket_key[0],
+                    'price_level': bucket_key[1],
+                    'time_bucket': bucket_key[2],
+                    'side': bucket_key[3]
+                }
+            }
+            if grouped['group_sizes'][idx] > 1:
+                raw_entity['is_merged'] = True
+                raw_entity['merge_count'] = int(grouped['group_sizes'][idx])
+            
+            volume = float(total_volume[idx])
+            avg_trade_size = volume / trade_count if trade_count > 0 else 0
+            
+            span = float(time_span[idx])
+            trade_frequency = trade_count / span if span > 0 else 0
+            
+            buy_count = int(buy_counts[idx])
+            sell_count = trade_count - buy_count
+            buy_sell_ratio = buy_count / sell_count if sell_count > 0 else float('inf')
+            
+            sizes = amount[start:end]
+            size_mean = np.mean(sizes)
+            size_std = np.std(sizes)
+            size_consistency = 1.0 - (size_std / size_mean) if size_mean > 0 else 0
+            size_consistency = max(0.0, min(1.0, size_consistency))
+            
+            if trade_count < 3:
+                timing_pattern = 'insufficient_data'
+            else:
+                timing_pattern = self._classify_timing_diffs(np.diff(chrono_us[start:end]) / 1e6)
             
-            # Entity ID
-            entity_id = f"entity_{exchange}_{symbol.replace('/', '')}_{idx}"
+            impact_result = impact_results[idx]
             
-            # Build Entity
-            entity = TradingEntity(
-                entity_id=entity_id,
-                entity_type=entity_type,
-                confidence_score=confidence_score,
-                trades=trades,
+            entities.append(self._make_entity(
+                idx=idx,
+                raw_entity=raw_entity,
                 trade_count=trade_count,
-                total_volume=total_volume,
-                total_value_usd=total_value_usd,
+                total_volume=volume,
+                total_value_usd=float(total_value[idx]),
                 avg_trade_size=avg_trade_size,
                 buy_sell_ratio=buy_sell_ratio,
                 trade_frequency=trade_frequency,
                 size_consistency=size_consistency,
                 timing_pattern=timing_pattern,
-                impact_score=impact_result['impact_score'],
-                impact_level=impact_result['impact_level'],
-                impact_components=impact_result['components'],
-                first_trade_time=first_trade_time,
-                last_trade_time=last_trade_time
-            )
-            
-            entities.append(entity)
+                impact_result=impact_result,
+                first_trade_time=timestamps[int(first_pos[idx])],
+                last_trade_time=timestamps[int(last_pos[idx])],
+                symbol=symbol,
+                exchange=exchange
+            ))
         
         return entities
     
@@ -503,6 +894,11 @@ class LightweightEntityIdentifier:
             for i in range(len(timestamps) - 1)
         ]
         
+        return self._classify_timing_diffs(diffs)
+    
+    @staticmethod
+    def _classify_timing_diffs(diffs) -> str:
+        """Timing-Pattern aus Zeit-Differenzen (Sekunden) sortierter Trades"""
         mean_diff = np.mean(diffs)
         std_diff = np.std(diffs)
         max_diff = max(diffs)
@@ -9,6 +9,14 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+import numpy as np
+
+from app.core.price_movers.collectors.trade_batch import (
+    TradeBatch,
+    TX_SWAP,
+    TX_ADD_LIQUIDITY,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -177,3 +185,61 @@ class LiquidityValidator:
             'liquidity_events': liquidity_events,
             'invalid_trades': invalid_trades
         }
+    
+    @classmethod
+    def filter_batch(cls, batch: TradeBatch) -> Dict[str, np.ndarray]:
+        """
+        Vektorisierte Variante von filter_trades für einen TradeBatch
+        
+        Gleiche Regeln wie validate_trade; als SWAP fehlklassifizierte
+        Liquidity Events werden direkt in batch.tx_type umgeschrieben.
+        
+        Returns:
+            {
+                'valid_swaps': Index-Array,
+                'liquidity_events': Index-Array,
+                'invalid_trades': Index-Array (Gründe via invalid_reason)
+            }
+        """
+        price = batch.price
+        value_usd = batch.amount * price
+        
+        # NaN-Preise fallen wie im Einzel-Check durch den Range-Check
+        bad_price = ~((price >= cls.MIN_REASONABLE_PRICE) & (price <= cls.MAX_REASONABLE_PRICE))
+        too_large = ~bad_price & (value_usd > cls.MAX_REASONABLE_TRADE_VALUE)
+        invalid = bad_price | (too_large & (batch.tx_type == TX_SWAP))
+        
+        reclassify = (
+            ~bad_price & ~too_large &
+            (value_usd > cls.MIN_LIQUIDITY_EVENT_VALUE) &
+            (batch.tx_type == TX_SWAP) &
+            (batch.liquidity_delta > 0)
+        )
+        if reclassify.any():
+            logger.warning(f"⚠️ {int(reclassify.sum())} SWAPs mis-classified as liquidity events → Reclassifying")
+            batch.tx_type[reclassify] = TX_ADD_LIQUIDITY
+        
+        liquidity = ~invalid & (batch.tx_type != TX_SWAP)
+        
+        result = {
+            'valid_swaps': np.flatnonzero(~invalid & ~liquidity),
+            'liquidity_events': np.flatnonzero(liquidity),
+            'invalid_trades': np.flatnonzero(invalid)
+        }
+        
+        logger.info(
+            f"📊 Trade Filtering:\n"
+            f"   Valid Swaps: {len(result['valid_swaps'])}\n"
+            f"   Liquidity Events: {len(result['liquidity_events'])}\n"
+            f"   Invalid: {len(result['invalid_trades'])}"
+        )
+        
+        return result
+    
+    @classmethod
+    def invalid_reason(cls, batch: TradeBatch, i: int) -> str:
+        """Grund (wie validate_trade) für einen verworfenen Batch-Trade"""
+        price = batch.price[i]
+        if not (cls.MIN_REASONABLE_PRICE <= price <= cls.MAX_REASONABLE_PRICE):
+            return f"Abnormal price: ${price:.2f}"
+        return f"Trade too large: ${batch.amount[i] * price:,.0f}"
@@ -0,0 +1,343 @@
+"""
+Streaming Mover Engine - Inkrementelle Price-Mover Erkennung
+
+Statt alle Trades einer Candle zu sammeln und erst nach dem Close zu
+analysieren:
+- Pro Wallet/Entity laufende Aggregate (Volume, Buy/Sell, erster/letzter
+  Trade, VWAP, Timing-Offsets), pro Trade in O(1) fortgeschrieben
+- Impact wird beim Lesen vektorisiert aus den Aggregaten berechnet
+  (ImpactCalculator.aggregate_components - dieselben Formeln wie die Batch-Analyse)
+- Top-K der offenen Candle jederzeit abrufbar
+- Candle-Wechsel anhand des Trade-Zeitstempels; das finale Top-K der
+  geschlossenen Candle bleibt erhalten
+"""
+
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.price_movers.collectors.trade_stream_hub import get_trade_stream_hub
+from app.core.price_movers.services.impact_calculator import ImpactCalculator
+from app.core.price_movers.utils.clustering_utils import calculate_size_category
+
+
+logger = logging.getLogger(__name__)
+
+
+def default_entity_key(trade: Dict[str, Any]) -> str:
+    """
+    Wallet-Adresse, falls vorhanden (DEX)
+
+    Anonyme CEX-Trades werden nach Seite + Größenklasse zu Entities
+    gebündelt (wie die Size-Buckets im LightweightEntityIdentifier).
+    """
+    wallet = trade.get('wallet_address') or trade.get('wallet')
+    if wallet:
+        return wallet
+    value = float(trade.get('amount', 0)) * float(trade.get('price', 0))
+    return f"{trade.get('trade_type') or 'unknown'}_size{calculate_size_category(value)}"
+
+
+def trade_epoch(ts: Any) -> float:
+    """Trade-Zeitstempel → epoch seconds (datetime, ISO-String, s oder ms)"""
+    if isinstance(ts, datetime):
+        # Naive Zeitstempel stammen aus datetime.fromtimestamp (lokale Zeit)
+        return ts.timestamp()
+    if isinstance(ts, str):
+        return datetime.fromisoformat(ts.replace('Z', '+00:00')).timestamp()
+    ts = float(ts)
+    return ts / 1000 if ts > 1e11 else ts
+
+
+class StreamingMoverEngine:
+    """
+    Laufende Mover-Aggregate für die offene Candle eines Symbols
+
+    Aggregate liegen spaltenweise in Python-Listen (O(1) Update pro Trade);
+    erst top_k() wandelt sie in NumPy-Arrays und bewertet alle Entities
+    in einem Durchgang.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        timeframe_seconds: int = 300,
+        impact_calculator: Optional[ImpactCalculator] = None,
+        entity_key: Optional[Callable[[Dict[str, Any]], str]] = None,
+        keep_closed: int = 12,
+        top_k_closed: int = 10
+    ):
+        """
+        Args:
+            symbol: Trading Pair
+            timeframe_seconds: Candle-Länge
+            impact_calculator: Für die Impact-Formeln (default: neuer Calculator)
+            entity_key: Trade → Wallet/Entity-ID (default: default_entity_key)
+            keep_closed: Anzahl gemerkter geschlossener Candles
+            top_k_closed: Top-K, das beim Close pro Candle gespeichert wird
+        """
+        self.symbol = symbol
+        self.timeframe_seconds = timeframe_seconds
+        self.impact_calculator = impact_calculator or ImpactCalculator()
+        self.entity_key = entity_key or default_entity_key
+        self.top_k_closed = top_k_closed
+
+        self.closed: Deque[Dict[str, Any]] = deque(maxlen=keep_closed)
+        self.stats = {'trades': 0, 'late_trades': 0, 'candles_closed': 0}
+
+        self._early_offset = ImpactCalculator.CANDLE_DURATION * 0.33
+        self.candle_start: Optional[float] = None
+        self._reset(None)
+
+    # ==================== UPDATE ====================
+
+    def _reset(self, candle_start: Optional[float]):
+        self.candle_start = candle_start
+        self.open = self.high = self.low = self.close = None
+        self.volume = 0.0
+        self.value = 0.0
+        self.trade_count = 0
+
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._count: List[int] = []
+        self._value: List[float] = []
+        self._max_value: List[float] = []
+        self._amount: List[float] = []
+        self._buy: List[float] = []
+        self._sell: List[float] = []
+        self._swap: List[float] = []
+        self._early: List[int] = []
+        self._first_offset: List[float] = []
+        self._last_offset: List[float] = []
+        self._min_offset: List[float] = []
+        self._max_offset: List[float] = []
+        self._offset_sum: List[float] = []
+
+    def add_trade(self, trade: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Trade einarbeiten (O(1))
+
+        Returns:
+            Snapshot der gerade geschlossenen Candle, falls der Trade eine
+            neue Candle beginnt, sonst None
+        """
+        epoch = trade_epoch(trade['timestamp'])
+        bucket = epoch - epoch % self.timeframe_seconds
+
+        closed = None
+        if self.candle_start is None:
+            self._reset(bucket)
+        elif bucket > self.candle_start:
+            closed = self._close_candle()
+            self._reset(bucket)
+        elif bucket < self.candle_start:
+            # Verspäteter Trade einer bereits geschlossenen Candle
+            self.stats['late_trades'] += 1
+            return None
+
+        amount = float(trade.get('amount', 0))
+        price = float(trade.get('price', 0))
+        value = amount * price
+        offset = epoch - bucket
+        side = (trade.get('trade_type') or trade.get('side') or 'unknown').lower()
+
+        # ---------- Candle ----------
+        if self.open is None:
+            self.open = self.high = self.low = price
+        elif price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += amount
+        self.value += value
+        self.trade_count += 1
+        self.stats['trades'] += 1
+
+        # ---------- Entity ----------
+        key = self.entity_key(trade)
+        i = self._index.get(key)
+        if i is None:
+            self._index[key] = len(self._ids)
+            self._ids.append(key)
+            self._count.append(1)
+            self._value.append(value)
+            self._max_value.append(value)
+            self._amount.append(amount)
+            self._buy.append(amount if side == 'buy' else 0.0)
+            self._sell.append(amount if side == 'sell' else 0.0)
+            self._swap.append(amount if side not in ('buy', 'sell') else 0.0)
+            self._early.append(1 if offset < self._early_offset else 0)
+            self._first_offset.append(offset)
+            self._last_offset.append(offset)
+            self._min_offset.append(offset)
+            self._max_offset.append(offset)
+            self._offset_sum.append(offset)
+            return closed
+
+        self._count[i] += 1
+        self._value[i] += value
+        if value > self._max_value[i]:
+            self._max_value[i] = value
+        self._amount[i] += amount
+        if side == 'buy':
+            self._buy[i] += amount
+        elif side == 'sell':
+            self._sell[i] += amount
+        else:
+            self._swap[i] += amount
+        if offset < self._early_offset:
+            self._early[i] += 1
+        self._last_offset[i] = offset
+        if offset < self._min_offset[i]:
+            self._min_offset[i] = offset
+        elif offset > self._max_offset[i]:
+            self._max_offset[i] = offset
+        self._offset_sum[i] += offset
+
+        return closed
+
+    def _close_candle(self) -> Dict[str, Any]:
+        snapshot = self.snapshot(self.top_k_closed)
+        snapshot['closed'] = True
+        self.closed.append(snapshot)
+        self.stats['candles_closed'] += 1
+        return snapshot
+
+    # ==================== READ ====================
+
+    @property
+    def entity_count(self) -> int:
+        return len(self._ids)
+
+    def candle_data(self) -> Optional[Dict[str, Any]]:
+        """Offene Candle im Format der Analyzer (bis zum letzten Trade)"""
+        if self.open is None:
+            return None
+        return {
+            'timestamp': datetime.fromtimestamp(self.candle_start, tz=timezone.utc),
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+            'price_change_pct': (self.close - self.open) / self.open * 100 if self.open else 0.0,
+        }
+
+    def top_k(self, k: int = 10) -> List[Dict[str, Any]]:
+        """Top-K Entities nach Impact Score der offenen Candle"""
+        candle = self.candle_data()
+        if candle is None or k <= 0:
+            return []
+
+        counts = np.asarray(self._count, dtype=np.int64)
+        wallet_volume = np.asarray(self._value)
+        amount = np.asarray(self._amount)
+
+        components = self.impact_calculator.aggregate_components(
+            counts=counts,
+            wallet_volume=wallet_volume,
+            max_value=np.asarray(self._max_value),
+            early_count=np.asarray(self._early, dtype=np.float64),
+            first_offset=np.asarray(self._first_offset),
+            last_offset=np.asarray(self._last_offset),
+            min_offset=np.asarray(self._min_offset),
+            max_offset=np.asarray(self._max_offset),
+            offset_sum=np.asarray(self._offset_sum),
+            buy_volume=np.asarray(self._buy),
+            sell_volume=np.asarray(self._sell),
+            swap_volume=np.asarray(self._swap),
+            amount_sum=amount,
+            total_volume=self.value,
+            timing_change=candle['price_change_pct'],
+            correlation_change=candle['price_change_pct'],
+            high=candle['high'],
+            low=candle['low'],
+            candle_volume=candle['volume']
+        )
+
+        scores = components['impact_score']
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        # Score absteigend, bei Gleichstand höheres Volume zuerst
+        order = candidates[np.lexsort((-wallet_volume[candidates], -scores[candidates]))]
+
+        results = self.impact_calculator.component_results(
+            components, np.zeros(len(scores), dtype=bool), order
+        )
+
+        candle_vwap = self.value / self.volume if self.volume else 0.0
+        movers = []
+        for i, impact in zip(order, results):
+            vwap = self._value[i] / self._amount[i] if self._amount[i] else 0.0
+            movers.append({
+                'wallet_id': self._ids[i],
+                'impact_score': impact['impact_score'],
+                'impact_level': impact['impact_level'],
+                'components': impact['components'],
+                'trade_count': self._count[i],
+                'total_volume': self._amount[i],
+                'total_value_usd': self._value[i],
+                'avg_trade_size': self._value[i] / self._count[i],
+                'buy_volume': self._buy[i],
+                'sell_volume': self._sell[i],
+                'vwap': vwap,
+                'vwap_deviation_pct': (vwap - candle_vwap) / candle_vwap * 100 if candle_vwap else 0.0,
+                'first_trade': datetime.fromtimestamp(self.candle_start + self._first_offset[i], tz=timezone.utc),
+                'last_trade': datetime.fromtimestamp(self.candle_start + self._last_offset[i], tz=timezone.utc),
+            })
+
+        return movers
+
+    def snapshot(self, k: int = 10) -> Dict[str, Any]:
+        """Offene Candle + Top-K (JSON-fähig bis auf datetimes)"""
+        return {
+            'symbol': self.symbol,
+            'candle': self.candle_data(),
+            'top_movers': self.top_k(k),
+            'trade_count': self.trade_count,
+            'entity_count': self.entity_count,
+            'closed': False,
+        }
+
+
+_engines: Dict[Tuple[str, str, int], StreamingMoverEngine] = {}
+_engine_users: Dict[Tuple[str, str, int], int] = {}
+
+
+def acquire_mover_engine(exchange_name: str, symbol: str, timeframe_seconds: int = 300) -> StreamingMoverEngine:
+    """
+    Geteilte Engine pro (exchange, symbol, timeframe), gespeist vom Trade Stream Hub
+
+    Jeder acquire braucht ein release_mover_engine(); mit dem letzten
+    release wird die Engine vom Hub abgemeldet.
+    """
+    key = (exchange_name.lower(), symbol, timeframe_seconds)
+
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = StreamingMoverEngine(symbol, timeframe_seconds)
+        get_trade_stream_hub(exchange_name, symbol).add_listener(engine.add_trade)
+
+    _engine_users[key] = _engine_users.get(key, 0) + 1
+    return engine
+
+
+def release_mover_engine(exchange_name: str, symbol: str, timeframe_seconds: int = 300):
+    key = (exchange_name.lower(), symbol, timeframe_seconds)
+
+    users = _engine_users.get(key, 0) - 1
+    if users > 0:
+        _engine_users[key] = users
+        return
+
+    _engine_users.pop(key, None)
+    engine = _engines.pop(key, None)
+    if engine is not None:
+        get_trade_stream_hub(exchange_name, symbol).remove_listener(engine.add_trade)
@@ -0,0 +1,56 @@
+"""
+Gemeinsame Fixtures für die price_movers Tests
+
+Seed-basierte Factories für eine 5m-Candle und Trades darin. Tests, die
+zusätzliche Felder brauchen (Signaturen, Liquidity Events, ...), ergänzen
+jeden Trade über `decorate(rng, trade, index)` aus demselben RNG.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def candle_start():
+    return datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def make_candle(candle_start):
+    """make_candle(price_change_pct=1.2, **overrides) -> Candle-Dict"""
+    def factory(price_change_pct=1.2, **overrides):
+        candle = {
+            'timestamp': candle_start,
+            'open': 100.0,
+            'high': 103.0,
+            'low': 98.5,
+            'close': 100.0 * (1 + price_change_pct / 100),
+            'volume': 50_000.0,
+            'price_change_pct': price_change_pct,
+        }
+        candle.update(overrides)
+        return candle
+    return factory
+
+
+@pytest.fixture
+def make_trades(candle_start):
+    """make_trades(num_trades, seed, wallets=40, decorate=None) -> Trades innerhalb der Candle"""
+    def factory(num_trades, seed, wallets=40, decorate=None):
+        rng = random.Random(seed)
+        trades = []
+        for i in range(num_trades):
+            trade = {
+                'timestamp': candle_start + timedelta(seconds=rng.uniform(0, 299)),
+                'trade_type': rng.choice(['buy', 'buy', 'sell', 'swap']),
+                'amount': rng.lognormvariate(1, 2),
+                'price': rng.uniform(98, 103),
+                'wallet_address': f"wallet{rng.randrange(wallets):04d}",
+            }
+            if decorate is not None:
+                decorate(rng, trade, i)
+            trades.append(trade)
+        return trades
+    return factory
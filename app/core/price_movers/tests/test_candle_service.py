@@ -0,0 +1,84 @@
+import asyncio
+
+from app.core.price_movers.collectors.candle_store import CandleStore
+from app.core.price_movers.services.candle_service import CandleService, rollup
+
+
+DAY = 1_700_000_000 - 1_700_000_000 % 86400
+
+
+class FakeExchange:
+    """Synchrone ccxt fetch_ohlcv: eine Bar pro Timeframe-Schritt"""
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        seconds = {'1m': 60, '5m': 300, '15m': 900}[timeframe]
+        self.calls.append((timeframe, since // 1000))
+        start = since // 1000
+        return [
+            [(start + i * seconds) * 1000, 10.0 + i, 11.0 + i, 9.0 + i, 10.5 + i, 1.0]
+            for i in range(limit)
+            if start + i * seconds < DAY + 86400
+        ]
+
+
+def bars(start, count, seconds):
+    return [(start + i * seconds, 10.0 + i, 11.0 + i, 9.0 + i, 10.5 + i, 1.0) for i in range(count)]
+
+
+def test_rollup_emits_only_complete_buckets():
+    five_minute = bars(DAY, 3, 300) + bars(DAY + 900, 2, 300) + bars(DAY + 1800, 3, 300)
+
+    candles = rollup(five_minute, 900, 3)
+
+    assert [c[0] for c in candles] == [DAY, DAY + 1800]
+    ts, open_, high, low, close, volume = candles[0]
+    assert (open_, high, low, close, volume) == (10.0, 13.0, 9.0, 12.5, 3.0)
+
+
+def test_closed_candles_fetch_only_gaps():
+    service = CandleService(store=CandleStore(':memory:'))
+    exchange = FakeExchange()
+
+    async def scenario():
+        first = await service.get_closed_candles('bitget', exchange, 'SOLUSDT', '5m', DAY, DAY + 3600)
+        calls_after_first = len(exchange.calls)
+        again = await service.get_closed_candles('bitget', exchange, 'SOLUSDT', '5m', DAY, DAY + 3600)
+        wider = await service.get_closed_candles('bitget', exchange, 'SOLUSDT', '5m', DAY, DAY + 7200)
+        return first, calls_after_first, again, wider
+
+    first, calls_after_first, again, wider = asyncio.run(scenario())
+
+    assert [c[0] for c in first] == list(range(DAY, DAY + 3600, 300))
+    assert again == first
+    assert calls_after_first == 1
+    # Nur das neue Intervall wird nachgeladen
+    assert exchange.calls[1:] == [('5m', DAY + 3600)]
+    assert len(wider) == 24
+    assert service.store.missing_ranges('bitget', 'SOLUSDT', '5m', DAY, DAY + 7200) == []
+    assert service.stats['store_hits'] == 1
+
+
+def test_rollup_from_lower_timeframe_covers_complete_buckets_and_fetches_the_rest():
+    store = CandleStore(':memory:')
+    # 5m-Historie für eine Stunde, aber der Bucket 00:30-00:45 hat nur zwei Bars
+    five_minute = [c for c in bars(DAY, 12, 300) if c[0] != DAY + 1800]
+    store.upsert('bitget', 'SOLUSDT', '5m', five_minute)
+    store.mark_covered('bitget', 'SOLUSDT', '5m', DAY, DAY + 3600)
+
+    service = CandleService(store=store)
+    exchange = FakeExchange()
+
+    candles = asyncio.run(
+        service.get_closed_candles('bitget', exchange, 'SOLUSDT', '15m', DAY, DAY + 3600)
+    )
+
+    assert [c[0] for c in candles] == [DAY, DAY + 900, DAY + 1800, DAY + 2700]
+    assert service.stats['rolled_up'] == 3
+    # Nur der unvollständige Bucket geht an die Exchange
+    assert exchange.calls == [('15m', DAY + 1800)]
+    assert store.missing_ranges('bitget', 'SOLUSDT', '15m', DAY, DAY + 3600) == []
+    # Gerollte Werte stammen aus den 5m-Bars
+    assert candles[0][1:] == (10.0, 13.0, 9.0, 12.5, 3.0)
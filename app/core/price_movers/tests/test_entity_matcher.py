@@ -0,0 +1,161 @@
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.price_movers.services.entity_matcher import EntityMatcher, TradeIndex
+
+
+START = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_movers_and_trades(num_cex, num_dex, seed):
+    rng = random.Random(seed)
+    cex_movers, dex_movers, cex_trades, dex_trades = [], [], [], []
+
+    def mover(key_name, key):
+        return {
+            key_name: key,
+            'wallet_type': 'whale',
+            'total_volume': rng.choice([0.0, rng.uniform(1e3, 1e6)]),
+            'trade_count': rng.randint(0, 25),
+            'avg_trade_size': rng.choice([0.0, rng.uniform(10, 1e4)]),
+            'buy_sell_ratio': rng.choice([0.0, float('inf'), rng.uniform(0.1, 5.0)]),
+        }
+
+    def trades(owner_field, key, count):
+        offset = rng.uniform(0, 600)
+        span = rng.choice([0.0, rng.uniform(1, 300)])
+        return [
+            SimpleNamespace(**{
+                owner_field: key,
+                'timestamp': START + timedelta(seconds=offset + rng.uniform(0, span)),
+                'value_usd': rng.uniform(10, 1e4),
+            })
+            for _ in range(count)
+        ]
+
+    for i in range(num_cex):
+        cex_movers.append(mover('wallet_id', f'entity_{i}'))
+        cex_trades.extend(trades('entity_id', f'entity_{i}', rng.randint(0, 6)))
+    for i in range(num_dex):
+        dex_movers.append(mover('wallet_address', f'wallet_{i}'))
+        dex_trades.extend(trades('wallet_address', f'wallet_{i}', rng.randint(0, 6)))
+
+    return cex_movers, dex_movers, cex_trades, dex_trades
+
+
+# ==================== PAIRWISE REFERENCE ====================
+# Bisheriger Vergleich aus HybridPriceMoverAnalyzer (pro Paar alle Trades filtern)
+
+def ratio_similarity(a, b):
+    if a == 0 and b == 0:
+        return 1.0
+    if a == 0 or b == 0:
+        return 0.0
+    return min(a, b) / max(a, b)
+
+
+def timing_overlap(cex_id, dex_addr, cex_trades, dex_trades):
+    cex_ts = [t.timestamp.timestamp() for t in cex_trades if t.entity_id == cex_id]
+    dex_ts = [t.timestamp.timestamp() for t in dex_trades if t.wallet_address == dex_addr]
+    if not cex_ts or not dex_ts:
+        return 0.0
+
+    cex_start, cex_end = min(cex_ts), max(cex_ts)
+    dex_start, dex_end = min(dex_ts), max(dex_ts)
+    overlap_start = max(cex_start, dex_start)
+    overlap_end = min(cex_end, dex_end)
+
+    if overlap_end <= overlap_start:
+        time_gap = min(abs(cex_start - dex_end), abs(dex_start - cex_end))
+        return 1.0 - (time_gap / 60.0) if time_gap < 60 else 0.0
+
+    total_duration = max(cex_end - cex_start, dex_end - dex_start)
+    if total_duration == 0:
+        return 1.0
+    return min(1.0, max(0.0, (overlap_end - overlap_start) / total_duration))
+
+
+def pairwise_similarity(cex, dex, cex_trades, dex_trades):
+    count_cex, count_dex = cex['trade_count'], dex['trade_count']
+    if count_cex == 0 and count_dex == 0:
+        count_similarity = 1.0
+    elif count_cex == 0 or count_dex == 0:
+        count_similarity = 0.0
+    else:
+        count_similarity = max(0, 1.0 - abs(count_cex - count_dex) / 10.0)
+
+    cex_ratio = 100.0 if cex['buy_sell_ratio'] == float('inf') else cex['buy_sell_ratio']
+    dex_ratio = 100.0 if dex['buy_sell_ratio'] == float('inf') else dex['buy_sell_ratio']
+
+    components = {
+        'volume_similarity': ratio_similarity(cex['total_volume'], dex['total_volume']),
+        'count_similarity': count_similarity,
+        'timing_overlap': timing_overlap(cex['wallet_id'], dex['wallet_address'], cex_trades, dex_trades),
+        'size_pattern_similarity': (
+            ratio_similarity(cex['avg_trade_size'], dex['avg_trade_size']) * 0.6 +
+            ratio_similarity(cex_ratio, dex_ratio) * 0.4
+        ),
+    }
+    overall = (
+        components['volume_similarity'] * 0.40 +
+        components['count_similarity'] * 0.20 +
+        components['timing_overlap'] * 0.30 +
+        components['size_pattern_similarity'] * 0.10
+    )
+    return overall, components
+
+
+def pairwise_match(cex_movers, dex_movers, cex_trades, dex_trades):
+    matches = []
+    for cex in cex_movers:
+        best, best_score = None, 0.0
+        for dex in dex_movers:
+            score, components = pairwise_similarity(cex, dex, cex_trades, dex_trades)
+            if score > best_score:
+                best_score = score
+                best = {'cex_entity': cex['wallet_id'], 'dex_wallet': dex['wallet_address'],
+                        'confidence': score, 'components': components}
+        if best and best['confidence'] > 0.5:
+            matches.append(best)
+    matches.sort(key=lambda m: m['confidence'], reverse=True)
+    return matches
+
+
+# ==================== PARITY ====================
+
+@pytest.mark.parametrize('seed', range(20))
+def test_entity_matcher_matches_pairwise_scorer(seed):
+    cex_movers, dex_movers, cex_trades, dex_trades = make_movers_and_trades(10, 20, seed)
+
+    expected = pairwise_match(cex_movers, dex_movers, cex_trades, dex_trades)
+    actual = EntityMatcher().match(
+        cex_movers, dex_movers,
+        TradeIndex.by_attribute(cex_trades, 'entity_id'),
+        TradeIndex.by_attribute(dex_trades, 'wallet_address'),
+    )
+
+    assert len(actual) == len(expected)
+    by_entity = {m['cex_entity']: m for m in actual}
+    for reference in expected:
+        match = by_entity[reference['cex_entity']]
+        assert match['dex_wallet'] == reference['dex_wallet']
+        assert match['confidence'] == pytest.approx(reference['confidence'])
+        for name, value in reference['components'].items():
+            assert match['similarity_breakdown'][name] == pytest.approx(value)
+
+
+def test_pruning_only_skips_wallets_outside_the_proximity_window():
+    cex_movers, dex_movers, cex_trades, dex_trades = make_movers_and_trades(10, 20, seed=3)
+    cex_index = TradeIndex.by_attribute(cex_trades, 'entity_id')
+    dex_index = TradeIndex.by_attribute(dex_trades, 'wallet_address')
+
+    full = {m['cex_entity']: m for m in EntityMatcher().match(cex_movers, dex_movers, cex_index, dex_index)}
+    pruned = EntityMatcher(prune=True).match(cex_movers, dex_movers, cex_index, dex_index)
+
+    # Geprunte Matches sind nie besser als der volle Vergleich
+    for match in pruned:
+        assert match['similarity_breakdown']['timing_overlap'] > 0
+        assert match['confidence'] <= full[match['cex_entity']]['confidence'] + 1e-12
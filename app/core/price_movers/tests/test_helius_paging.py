@@ -0,0 +1,103 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.price_movers.collectors.helius_cache import HeliusTransactionCache
+from app.core.price_movers.collectors.helius_collector import HeliusCollector
+from app.core.price_movers.collectors.trade_tape import TradeTape, to_epoch
+
+
+WINDOW_START = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(minutes=10)
+NUM_SIGNATURES = 300
+SWAP_EVERY = 10  # Die meisten Signaturen sind keine Swaps
+
+
+class FakeHelius(HeliusCollector):
+    """Helius ohne Netzwerk: Signaturen/Enhanced API/Swap-Parser aus Testdaten"""
+
+    def __init__(self, tx_cache):
+        super().__init__(api_key='test', config={'tx_cache': tx_cache, 'enhanced_batch_size': 25})
+        # Eine Signatur pro Sekunde, neueste zuerst
+        self.block_times = {
+            f"sig{i}": int(to_epoch(WINDOW_START)) + i for i in range(NUM_SIGNATURES)
+        }
+        self.signature_calls = []
+        self.parsed_signatures = 0
+
+    async def _fetch_signatures(self, address, start_ts, end_ts):
+        self.signature_calls.append((start_ts, end_ts))
+        in_window = [sig for sig, ts in self.block_times.items() if start_ts <= ts <= end_ts]
+        return in_window[::-1], True
+
+    async def _post_enhanced_batch(self, signatures, semaphore):
+        self.parsed_signatures += len(signatures)
+        return [
+            {
+                'signature': sig,
+                'timestamp': self.block_times[sig],
+                'type': 'SWAP' if int(sig[3:]) % SWAP_EVERY == 0 else 'TRANSFER',
+            }
+            for sig in signatures
+        ]
+
+    def _parse_helius_enhanced_swap(self, tx, symbol=None):
+        return {
+            'id': tx['signature'],
+            'timestamp': datetime.fromtimestamp(tx['timestamp'], tz=timezone.utc),
+            'trade_type': 'buy',
+            'amount': 1.0,
+            'price': 1.0,
+            'wallet_address': 'wallet',
+        }
+
+
+def test_fetch_dex_trades_parses_until_limit_trades():
+    helius = FakeHelius(HeliusTransactionCache(':memory:'))
+
+    trades = asyncio.run(helius.fetch_dex_trades('mint', WINDOW_START, WINDOW_END, limit=10))
+
+    # 100 Signaturen reichen nicht für 10 Swaps → weiter parsen, neueste 10 zurückgeben
+    assert len(trades) == 10
+    assert trades.complete is False
+    assert max(t['timestamp'] for t in trades) == WINDOW_START + timedelta(seconds=290)
+
+    trades = asyncio.run(helius.fetch_dex_trades('mint', WINDOW_START, WINDOW_END, limit=100))
+    assert len(trades) == NUM_SIGNATURES // SWAP_EVERY
+    assert trades.complete is True
+
+
+def test_trade_tape_pages_helius_window_and_reuses_parse_cache():
+    helius = FakeHelius(HeliusTransactionCache(':memory:'))
+    tape = TradeTape(':memory:')
+
+    async def fetch(start, end):
+        return await helius.fetch_dex_trades('mint', start, end, limit=10)
+
+    trades = asyncio.run(tape.fetch_through('raydium', 'SOL/USDC', WINDOW_START, WINDOW_END, fetch, limit=1000))
+
+    # Ältere Signaturen werden nachgeladen, bis das Fenster abgedeckt ist
+    assert len(trades) == NUM_SIGNATURES // SWAP_EVERY
+    assert len(helius.signature_calls) > 1
+    assert tape.missing_intervals('raydium', 'SOL/USDC', to_epoch(WINDOW_START), to_epoch(WINDOW_END)) == []
+
+    # Jede Signatur wurde genau einmal über die Enhanced API geparst, der Rest kam aus dem Cache
+    assert helius.parsed_signatures == NUM_SIGNATURES
+    assert helius.tx_cache.stats['memory_hits'] > 0
+
+
+def test_parse_cache_round_trip_and_pruning():
+    cache = HeliusTransactionCache(':memory:', memory_size=2, max_age_days=1, max_rows=3)
+    now = int(time.time())
+    transactions = [{'signature': f"sig{i}", 'timestamp': now - i, 'type': 'SWAP'} for i in range(5)]
+    transactions.append({'signature': 'old', 'timestamp': now - 3 * 86400, 'type': 'SWAP'})
+
+    assert cache.put_many(transactions) == 6
+    # LRU hält nur die 2 zuletzt gespeicherten, sig0 kommt von Disk
+    assert set(cache.get_many(['sig0', 'sig4', 'old', 'missing'])) == {'sig0', 'sig4', 'old'}
+    assert (cache.stats['memory_hits'], cache.stats['disk_hits'], cache.stats['misses']) == (2, 1, 1)
+
+    # Zu alt + über max_rows → nur die 3 neuesten bleiben
+    assert cache.prune() == 3
+    cache._memory.clear()
+    assert set(cache.get_many([tx['signature'] for tx in transactions])) == {'sig0', 'sig1', 'sig2'}
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.price_movers.services.impact_calculator import ImpactCalculator
+
+
+def impact_fields(rng, trade, i):
+    trade['trade_type'] = rng.choice(['buy', 'sell', 'swap', ''])
+    if rng.random() < 0.02:
+        trade['transaction_type'] = 'REMOVE_LIQUIDITY'
+
+
+@pytest.fixture
+def make_wallet_activities(make_trades, candle_start):
+    def factory(num_trades, num_wallets, seed=42):
+        activities = {}
+        for trade in make_trades(num_trades, seed, wallets=num_wallets, decorate=impact_fields):
+            activities.setdefault(trade['wallet_address'], []).append(trade)
+
+        activities['wallet_empty'] = []
+        # String timestamps + 'side' instead of 'trade_type'
+        activities['wallet_iso'] = [
+            {
+                'timestamp': (candle_start + timedelta(seconds=s)).isoformat().replace('+00:00', 'Z'),
+                'side': 'BUY',
+                'amount': 120.0,
+                'price': 101.0,
+            }
+            for s in (5, 40, 41)
+        ]
+        return activities
+    return factory
+
+
+def assert_equivalent(fast, slow):
+    assert list(fast) == list(slow)
+    for wallet_id, expected in slow.items():
+        result = fast[wallet_id]
+        assert result['impact_score'] == pytest.approx(expected['impact_score'], abs=1e-3)
+        assert result.get('has_liquidity_events') == expected.get('has_liquidity_events')
+        for name, value in expected['components'].items():
+            assert result['components'][name] == pytest.approx(value, abs=1e-3), (wallet_id, name)
+
+
+@pytest.mark.parametrize('price_change_pct', [1.2, -2.5, 0.0, 0.3])
+def test_columnar_batch_matches_per_wallet_scores(price_change_pct, make_wallet_activities, make_candle):
+    calculator = ImpactCalculator()
+    activities = make_wallet_activities(num_trades=2_000, num_wallets=150)
+    candle = make_candle(price_change_pct)
+
+    slow = calculator.calculate_batch_impact(activities, candle, 250_000.0, vectorized=False)
+    fast = calculator.calculate_batch_impact(activities, candle, 250_000.0)
+
+    assert_equivalent(fast, slow)
+
+
+def test_columnar_batch_falls_back_for_irregular_wallets(make_candle, candle_start):
+    calculator = ImpactCalculator()
+    candle = make_candle()
+
+    # String amounts are scored through calculate_impact_score
+    string_amount = {
+        'wallet_str': [{'timestamp': candle_start, 'amount': '2.5', 'price': 100.0, 'trade_type': 'buy'}],
+    }
+    assert (
+        calculator.calculate_batch_impact(string_amount, candle, 1_000.0) ==
+        calculator.calculate_batch_impact(string_amount, candle, 1_000.0, vectorized=False)
+    )
+
+    # Naive trade timestamps against an aware candle fail the same way in both paths
+    naive_ts = {
+        'wallet_naive': [{'timestamp': datetime(2024, 1, 1, 12, 1), 'amount': 1.0, 'price': 100.0}],
+    }
+    for vectorized in (True, False):
+        with pytest.raises(TypeError):
+            calculator.calculate_batch_impact(naive_ts, candle, 1_000.0, vectorized=vectorized)
+
+
+@pytest.mark.benchmark
+def test_benchmark_batch_impact_100k_trades(make_wallet_activities, make_candle, timed):
+    calculator = ImpactCalculator()
+    activities = make_wallet_activities(num_trades=100_000, num_wallets=5_000)
+    candle = make_candle()
+
+    slow, loop_seconds = timed(calculator.calculate_batch_impact, activities, candle, 5_000_000.0, vectorized=False)
+    fast, columnar_seconds = timed(calculator.calculate_batch_impact, activities, candle, 5_000_000.0)
+
+    print(
+        f"\n100k trades / {len(activities)} wallets: "
+        f"loop {loop_seconds:.2f}s, columnar {columnar_seconds:.3f}s "
+        f"({loop_seconds / columnar_seconds:.0f}x)"
+    )
+    assert_equivalent(fast, slow)
+    assert columnar_seconds < loop_seconds
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.price_movers.services.lightweight_entity_identifier import LightweightEntityIdentifier
+
+
+@pytest.fixture
+def make_cex_trades(make_trades, candle_start):
+    """Anonyme CEX-Trades: Bursts, runde Größen, teils ohne ID oder mit ISO-Timestamp"""
+    def cex_fields(rng, trade, i):
+        del trade['wallet_address']
+        # Bursts on a coarse grid produce equal timestamps and mergeable buckets
+        if rng.random() < 0.3:
+            seconds = rng.randrange(0, 300, 5)
+        else:
+            seconds = rng.uniform(-2, 302)
+        timestamp = candle_start + timedelta(seconds=seconds, microseconds=rng.randrange(0, 3) * 123_457)
+        trade['timestamp'] = timestamp
+
+        if rng.random() < 0.2:
+            trade['amount'] = rng.choice([0.5, 1.0, 2.5, 10.0, 250.0])
+        if rng.random() < 0.7:
+            trade['id'] = f"t{i}"
+        if rng.random() < 0.1:
+            trade['timestamp'] = timestamp.isoformat().replace('+00:00', 'Z')
+        if rng.random() < 0.1:
+            trade['value_usd'] = trade['amount'] * trade['price'] * 1.01
+
+    def factory(num_trades, seed=7):
+        return make_trades(num_trades, seed, decorate=cex_fields)
+    return factory
+
+
+@pytest.fixture
+def identify(make_candle):
+    def run(identifier, trades, vectorized):
+        return asyncio.run(identifier.identify_entities(
+            trades, make_candle(volume=2_500_000.0), 'SOL/USDT', 'binance', vectorized=vectorized
+        ))
+    return run
+
+
+@pytest.mark.parametrize('num_trades,seed', [(5, 1), (300, 2), (3_000, 3), (3_000, 4)])
+def test_columnar_identification_matches_loop(num_trades, seed, make_cex_trades, identify):
+    identifier = LightweightEntityIdentifier()
+    trades = make_cex_trades(num_trades, seed)
+
+    expected = identify(identifier, trades, vectorized=False)
+    result = identify(identifier, trades, vectorized=True)
+
+    assert result == expected
+
+
+def test_columnar_identification_with_custom_config(make_cex_trades, identify):
+    identifier = LightweightEntityIdentifier(config={
+        'min_trades_per_entity': 1,
+        'time_bucket_seconds': 3,
+        'merge_time_gap_seconds': 60,
+        'min_confidence_score': 0.0,
+    })
+    trades = make_cex_trades(1_000, seed=11)
+
+    assert identify(identifier, trades, vectorized=True) == identify(identifier, trades, vectorized=False)
+
+
+@pytest.mark.benchmark
+def test_benchmark_identify_entities_50k_trades(make_cex_trades, identify, timed):
+    identifier = LightweightEntityIdentifier()
+    trades = make_cex_trades(50_000)
+
+    expected, loop_seconds = timed(identify, identifier, trades, vectorized=False)
+    result, columnar_seconds = timed(identify, identifier, trades, vectorized=True)
+
+    print(
+        f"\n50k trades / {len(result)} entities: "
+        f"loop {loop_seconds:.2f}s, columnar {columnar_seconds:.3f}s "
+        f"({loop_seconds / columnar_seconds:.1f}x)"
+    )
+    assert result == expected
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.core.price_movers.collectors.candle_store import CandleStore
+from app.core.price_movers.collectors.ohlcv_backfill import OHLCVBackfill, RequestBudget
+
+
+START = 1_700_000_000 - 1_700_000_000 % 60
+BARS = 1000
+END = START + BARS * 60
+
+
+class FakeExchange:
+    """ccxt-ähnliche fetch_ohlcv mit serverseitigem Seiten-Limit und optionalen Lücken"""
+
+    rateLimit = 1
+
+    def __init__(self, server_cap=200, missing=(), fail_at=None, block=None):
+        self.server_cap = server_cap
+        self.missing = missing
+        self.fail_at = fail_at
+        self.block = block
+        self.calls = []
+        self.cancelled = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        since //= 1000
+        self.calls.append(since)
+        if since == self.fail_at:
+            raise RuntimeError("exchange unavailable")
+        if self.block is not None:
+            try:
+                await self.block.wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        rows = []
+        for ts in range(since, END, 60):
+            if len(rows) == min(limit, self.server_cap):
+                break
+            if any(start <= ts < end for start, end in self.missing):
+                continue
+            rows.append([ts * 1000, 1.0, 2.0, 0.5, 1.5, 10.0])
+        return rows
+
+
+def make_backfill(exchange, **kwargs):
+    return OHLCVBackfill(exchange, 'binance', store=CandleStore(':memory:'), page_limit=500, **kwargs)
+
+
+def test_backfill_fills_range_and_skips_covered_bars():
+    exchange = FakeExchange(server_cap=200)
+    backfill = make_backfill(exchange)
+
+    first = asyncio.run(backfill.backfill('BTC/USDT', '1m', START, END))
+    second = asyncio.run(backfill.backfill('BTC/USDT', '1m', START, END))
+
+    assert (first['slices'], first['bars'], first['requests']) == (2, BARS, 6)
+    assert [c[0] for c in backfill.query('BTC/USDT', '1m', START, END)] == list(range(START, END, 60))
+    assert (second['gaps'], second['requests']) == (0, 0)
+
+
+def test_empty_page_leaves_the_rest_of_the_slice_missing():
+    # Keine Bars mehr bis zum Slice-Ende → leere Seite
+    hole = (START + 100 * 60, START + 500 * 60)
+    exchange = FakeExchange(server_cap=100, missing=[hole])
+    backfill = make_backfill(exchange)
+
+    asyncio.run(backfill.backfill('BTC/USDT', '1m', START, END))
+
+    missing = backfill.store.missing_ranges('binance', 'BTC/USDT', '1m', START, END)
+    assert missing == [(START + 100 * 60, START + 500 * 60)]
+
+
+def test_failed_slice_cancels_siblings_and_frees_the_budget():
+    exchange = FakeExchange(fail_at=START - 1000 * 60)
+    backfill = make_backfill(exchange, max_concurrency=4)
+
+    async def scenario():
+        exchange.block = asyncio.Event()
+        # 3000 Bars → 6 Slices; der dritte schlägt fehl, die anderen hängen
+        with pytest.raises(RuntimeError):
+            await backfill.backfill('BTC/USDT', '1m', START - 2000 * 60, END)
+        await asyncio.sleep(0)
+        return len(asyncio.all_tasks()) - 1
+
+    leftover_tasks = asyncio.run(scenario())
+
+    assert exchange.cancelled >= 1
+    assert leftover_tasks == 0
+    assert backfill.budget._semaphore._value == 4
+
+
+def test_budget_releases_slot_when_cancelled_while_waiting():
+    async def scenario():
+        budget = RequestBudget(interval=10.0, max_concurrency=2)
+        async with budget:
+            pass
+        # Nächster Slot erst in 10s → Abbruch während des Sleeps
+        waiter = asyncio.ensure_future(budget.__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return budget._semaphore._value
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_candle_store_coverage_merges_and_reports_gaps():
+    store = CandleStore(':memory:')
+    key = ('binance', 'BTC/USDT', '1m')
+
+    store.mark_covered(*key, 0, 60)
+    store.mark_covered(*key, 120, 180)
+    assert store.missing_ranges(*key, 0, 240) == [(60, 120), (180, 240)]
+
+    # Berührende Bereiche werden zu einem zusammengefasst
+    store.mark_covered(*key, 60, 120)
+    store.mark_covered(*key, 50, 70)
+    assert store.missing_ranges(*key, 0, 240) == [(180, 240)]
+    assert store._conn.execute('SELECT start_ts, end_ts FROM candle_coverage').fetchall() == [(0, 180)]
+
+    # Andere Timeframes teilen keine Abdeckung
+    assert store.missing_ranges('binance', 'BTC/USDT', '5m', 0, 240) == [(0, 240)]
@@ -0,0 +1,187 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.core.price_movers.collectors import orderbook_recorder
+from app.core.price_movers.collectors.orderbook_analyzer import OrderbookAnalyzer
+from app.core.price_movers.collectors.orderbook_recorder import OrderbookRecorder, OrderbookRingBuffer
+
+
+class FakeCollector:
+    """REST-Orderbook mit wanderndem Preis; kein WebSocket für 'kraken'"""
+
+    exchange_name = 'kraken'
+
+    def __init__(self, fail_first=0):
+        self.calls = 0
+        self.fail_first = fail_first
+
+    async def fetch_orderbook(self, symbol, limit):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise RuntimeError("rate limited")
+        mid = 100.0 + self.calls
+        return {
+            'bids': [[mid - 1 - i, 1.0 + i] for i in range(limit)],
+            'asks': [[mid + 1 + i, 2.0 + i] for i in range(limit)],
+            'spread': 2.0,
+            'spread_pct': 2.0 / (mid - 1) * 100,
+        }
+
+
+def make_snapshots(seed, count=12, depth=8):
+    """Zufällige Snapshots auf einem Preisraster - Levels bleiben, wandern und verschwinden"""
+    rng = random.Random(seed)
+    snapshots = []
+    for i in range(count):
+        bids = sorted(rng.sample(range(90, 100), rng.randint(0, depth)), reverse=True)
+        asks = sorted(rng.sample(range(101, 111), rng.randint(0, depth)))
+        size = lambda: rng.choice([0.0, 0.5, 1.0, 2.0, 50.0])
+        snapshots.append({
+            'timestamp': datetime.fromtimestamp(1_700_000_000 + i * 10, tz=timezone.utc),
+            'bids': [[float(p), size()] for p in bids],
+            'asks': [[float(p), size()] for p in asks],
+        })
+    return snapshots
+
+
+def make_window(snapshots, depth=8):
+    buffer = OrderbookRingBuffer(capacity=len(snapshots), depth=depth)
+    for snapshot in snapshots:
+        buffer.append(snapshot['timestamp'].timestamp(), snapshot['bids'], snapshot['asks'])
+    return buffer.window(0, float('inf'))
+
+
+def reference_large_orders(snapshots):
+    """Bisherige dict-basierte Erkennung (ohne Top-N)"""
+    orders = [
+        (s['timestamp'], price, size, side, price * size)
+        for s in snapshots
+        for side, levels in (('bid', s['bids']), ('ask', s['asks']))
+        for price, size in levels
+    ]
+    if not orders:
+        return []
+    avg_size = np.mean([o[2] for o in orders])
+    avg_value = np.mean([o[4] for o in orders])
+    return [o for o in orders if o[2] > 5 * avg_size or o[4] > 5 * avg_value]
+
+
+def reference_cancellations(snapshots):
+    cancellations = []
+    for prev, curr in zip(snapshots, snapshots[1:]):
+        for side in ('bids', 'asks'):
+            curr_prices = {level[0] for level in curr[side]}
+            for price, size in prev[side]:
+                if price not in curr_prices and size > 0:
+                    cancellations.append((curr['timestamp'], price, size, side[:-1], price * size))
+    return cancellations
+
+
+def as_tuples(records):
+    return sorted((r['timestamp'], r['price'], r['size'], r['side'], r['value_usd']) for r in records)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_vectorized_detection_matches_snapshot_loop(seed):
+    snapshots = make_snapshots(seed)
+    window = make_window(snapshots)
+    analyzer = OrderbookAnalyzer(FakeCollector())
+
+    large = analyzer._detect_large_orders(window, limit=10_000)
+    cancelled = analyzer._detect_cancellations(window, limit=10_000)
+
+    assert as_tuples(large) == sorted(reference_large_orders(snapshots))
+    assert as_tuples(cancelled) == sorted(reference_cancellations(snapshots))
+
+    # Top-N nach Value absteigend
+    top = analyzer._detect_cancellations(window)
+    expected_values = sorted((c[4] for c in reference_cancellations(snapshots)), reverse=True)[:30]
+    assert [c['value_usd'] for c in top] == expected_values
+
+
+def test_ring_buffer_keeps_latest_snapshots_in_order():
+    buffer = OrderbookRingBuffer(capacity=4, depth=3)
+    for ts in range(6):
+        buffer.append(float(ts), [[100.0 - ts, 1.0]], [[101.0 + ts, 1.0], [102.0 + ts, 2.0]], 1.0 + ts)
+
+    window = buffer.window(0, 10)
+
+    assert window['timestamps'].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert window['bid_prices'][:, 0].tolist() == [98.0, 97.0, 96.0, 95.0]
+    assert np.isnan(window['bid_prices'][:, 1:]).all()
+    assert window['ask_sizes'][0, :2].tolist() == [1.0, 2.0]
+    assert buffer.window(3, 4)['timestamps'].tolist() == [3.0, 4.0]
+    assert buffer.latest_timestamp == 5.0
+
+
+def test_recorder_polls_rest_and_survives_failures():
+    collector = FakeCollector(fail_first=1)
+
+    async def scenario():
+        recorder = OrderbookRecorder(collector, 'BTC/USD', depth=5, interval_seconds=0.01)
+        recorder.start()
+        try:
+            window = await recorder.wait_for_snapshots(min_snapshots=3, start_ts=0, timeout=2)
+        finally:
+            await recorder.stop()
+        return recorder, window
+
+    recorder, window = asyncio.run(scenario())
+
+    assert recorder.source == 'rest'
+    assert recorder.errors == 1
+    assert not recorder.is_running
+    assert len(window['timestamps']) >= 3
+    assert window['bid_prices'].shape[1] == 5
+    assert window['spreads'][0] == 2.0
+
+
+def test_analysis_serves_past_window_from_recorder_without_waiting(monkeypatch):
+    monkeypatch.setattr(orderbook_recorder, '_recorders', {})
+    collector = FakeCollector()
+    analyzer = OrderbookAnalyzer(collector)
+    snapshots = make_snapshots(seed=3, count=6)
+
+    async def scenario():
+        recorder = OrderbookRecorder(collector, 'BTC/USD', depth=8)
+        orderbook_recorder._recorders[('kraken', 'BTC/USD')] = recorder
+        now = time.time()
+        for i, snapshot in enumerate(snapshots):
+            # Vorletzter Snapshot 10s vor jetzt, der erste liegt außerhalb des Fensters
+            recorder.buffer.append(now - 70 + i * 12, snapshot['bids'], snapshot['asks'], 1.0, 1.0)
+
+        started = time.monotonic()
+        analysis = await analyzer.analyze_candle_orderbook('BTC/USD', duration_seconds=60)
+        elapsed = time.monotonic() - started
+        await recorder.stop()
+        return analysis, elapsed
+
+    analysis, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1
+    assert analysis['snapshot_count'] == 5
+    assert analysis['duration_seconds'] == 60
+    assert analysis['spread_changes']['avg_spread'] == 1.0
+
+
+def test_cold_recorder_waits_for_two_snapshots(monkeypatch):
+    monkeypatch.setattr(orderbook_recorder, '_recorders', {})
+    collector = FakeCollector()
+    analyzer = OrderbookAnalyzer(collector)
+    analyzer.snapshot_interval_seconds = 0.05
+
+    async def scenario():
+        analysis = await analyzer.analyze_candle_orderbook('BTC/USD', duration_seconds=60)
+        await orderbook_recorder._recorders[('kraken', 'BTC/USD')].stop()
+        return analysis
+
+    analysis = asyncio.run(scenario())
+
+    assert analysis['snapshot_count'] >= 2
+    # Preis wandert um 1 pro Snapshot → das oberste Bid/Ask-Level verschwindet
+    assert {c['side'] for c in analysis['order_cancellations']} == {'bid', 'ask'}
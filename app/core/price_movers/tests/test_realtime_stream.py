@@ -0,0 +1,86 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from app.core.price_movers.collectors import realtime_stream
+from app.core.price_movers.collectors.realtime_stream import RealtimeTradeStream
+
+
+KRAKEN_MESSAGES = [
+    {"method": "subscribe", "result": {"channel": "trade", "symbol": "BTC/USD"}, "success": True},
+    {"channel": "heartbeat"},
+    {"channel": "trade", "type": "update", "data": [
+        {"symbol": "BTC/USD", "side": "buy", "price": 42000.5, "qty": 0.5,
+         "ord_type": "market", "trade_id": 101, "timestamp": "2024-01-01T12:00:00.250000Z"},
+        {"symbol": "BTC/USD", "side": "sell", "price": 41999.0, "qty": 2.0,
+         "ord_type": "limit", "trade_id": 102, "timestamp": "2024-01-01T12:00:01.000000Z"},
+    ]},
+    {"channel": "trade", "type": "update", "data": [
+        {"symbol": "BTC/USD", "side": "sell", "price": 41998.0, "qty": 1.0,
+         "ord_type": "limit", "trade_id": 103, "timestamp": "2024-01-01T12:00:02.000000Z"},
+    ]},
+]
+
+
+class FakeWebSocket:
+    def __init__(self, messages):
+        self.messages = messages
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield json.dumps(message)
+
+
+def test_kraken_trades_are_streamed(monkeypatch):
+    connections = []
+
+    def connect(url):
+        websocket = FakeWebSocket(KRAKEN_MESSAGES)
+        connections.append((url, websocket))
+        return websocket
+
+    monkeypatch.setattr(realtime_stream.websockets, 'connect', connect)
+    stream = RealtimeTradeStream('kraken')
+
+    async def collect():
+        trades = []
+        async for trade in stream.iter_trades('BTC/USD'):
+            trades.append(trade)
+            if len(trades) == 3:
+                stream.stop_streaming()
+        return trades
+
+    trades = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+    url, websocket = connections[0]
+    assert url == "wss://ws.kraken.com/v2"
+    assert websocket.sent == [{
+        "method": "subscribe",
+        "params": {"channel": "trade", "symbol": ["BTC/USD"], "snapshot": False},
+    }]
+
+    assert [t['id'] for t in trades] == ['101', '102', '103']
+    assert [t['trade_type'] for t in trades] == ['buy', 'sell', 'sell']
+    assert trades[1]['value_usd'] == 41999.0 * 2.0
+    assert trades[0]['timestamp'] == datetime.fromtimestamp(
+        datetime(2024, 1, 1, 12, 0, 0, 250000, tzinfo=timezone.utc).timestamp()
+    )
+
+
+def test_unsupported_exchange_returns_no_trades():
+    stream = RealtimeTradeStream('coinbase')
+
+    assert asyncio.run(stream.stream_candle_trades('BTC/USD', duration_seconds=1, shared=False)) == []
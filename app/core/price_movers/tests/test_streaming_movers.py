@@ -0,0 +1,87 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.price_movers.collectors.trade_stream_hub import TradeStreamHub
+from app.core.price_movers.services.impact_calculator import ImpactCalculator
+from app.core.price_movers.services.streaming_movers import StreamingMoverEngine, default_entity_key
+
+
+@pytest.fixture
+def make_stream(make_trades):
+    """Trades in Ankunftsreihenfolge (aufsteigende Timestamps)"""
+    def factory(num_trades, seed=5):
+        return sorted(make_trades(num_trades, seed), key=lambda trade: trade['timestamp'])
+    return factory
+
+
+def test_top_k_matches_batch_impact(make_stream):
+    trades = make_stream(2_000)
+    engine = StreamingMoverEngine('SOL/USDT')
+    for trade in trades:
+        assert engine.add_trade(trade) is None
+
+    wallet_activities = {}
+    for trade in trades:
+        wallet_activities.setdefault(default_entity_key(trade), []).append(trade)
+
+    expected = ImpactCalculator().calculate_batch_impact(
+        wallet_activities, engine.candle_data(), engine.value
+    )
+
+    movers = engine.top_k(len(wallet_activities))
+    assert len(movers) == len(wallet_activities)
+    assert [m['impact_score'] for m in movers] == sorted((r['impact_score'] for r in expected.values()), reverse=True)
+    for mover in movers:
+        result = expected[mover['wallet_id']]
+        assert mover['impact_score'] == result['impact_score']
+        assert mover['components'] == result['components']
+        assert mover['trade_count'] == len(wallet_activities[mover['wallet_id']])
+
+    assert [m['wallet_id'] for m in engine.top_k(5)] == [m['wallet_id'] for m in movers[:5]]
+
+
+def test_candle_rollover_keeps_closed_top_k(make_stream, candle_start):
+    engine = StreamingMoverEngine('SOL/USDT', timeframe_seconds=300)
+    for trade in make_stream(200):
+        engine.add_trade(trade)
+
+    next_trade = dict(make_stream(1)[0], timestamp=candle_start + timedelta(seconds=301))
+    closed = engine.add_trade(next_trade)
+
+    assert closed['closed'] is True
+    assert closed['trade_count'] == 200
+    assert engine.trade_count == 1 and engine.entity_count == 1
+
+    late = dict(next_trade, timestamp=candle_start + timedelta(seconds=10))
+    assert engine.add_trade(late) is None
+    assert engine.stats['late_trades'] == 1
+
+
+def test_hub_fans_out_without_blocking_on_slow_subscribers(make_stream):
+    async def run():
+        hub = TradeStreamHub('binance', 'SOL/USDT', queue_size=10)
+        trades = make_stream(50)
+
+        async def fake_upstream(symbol):
+            for trade in trades:
+                yield trade
+                await asyncio.sleep(0)
+
+        hub.stream.iter_trades = fake_upstream
+        engine = StreamingMoverEngine('SOL/USDT')
+        hub.add_listener(engine.add_trade)
+        fast = hub.subscribe(queue_size=100)
+        slow = hub.subscribe()
+
+        received = [await fast.get() for _ in trades]
+        await hub.stop()
+        return hub, engine, received, slow
+
+    hub, engine, received, slow = asyncio.run(run())
+
+    assert received == make_stream(50)
+    assert engine.trade_count == 50
+    assert slow.qsize() == 10
+    assert hub.stats['dropped'] == 40
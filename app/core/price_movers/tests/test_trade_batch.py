@@ -0,0 +1,115 @@
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from app.core.price_movers.collectors.trade_batch import TradeBatch, native_trade_id
+from app.core.price_movers.services.analyzer_hybrid import Candle, HybridPriceMoverAnalyzer
+from app.core.price_movers.services.liquidity_validator import LiquidityValidator
+
+
+@pytest.fixture
+def make_dex_trades(make_trades):
+    """DEX-Swaps mit Preis-Ausreißern, Liquidity Events und ~5% Duplikaten über mehrere Quellen"""
+    def factory(num_trades, seed=11, wallets=300):
+        def dex_fields(rng, trade, i):
+            trade['trade_type'] = rng.choice(['buy', 'sell', 'BUY'])
+            if rng.random() < 2 / 32:
+                trade['price'] = rng.choice([0.5, 20_000.0])
+            trade['value_usd'] = trade['amount'] * trade['price']
+            trade['signature'] = f"sig{rng.randrange(int(num_trades * 0.95))}"
+            trade['transaction_type'] = rng.choice(['SWAP'] * 20 + ['ADD_LIQUIDITY', 'REMOVE_LIQUIDITY'])
+            trade['liquidity_delta'] = rng.choice([0, 0, 0, 250.0])
+
+        return make_trades(num_trades, seed, wallets=wallets, decorate=dex_fields)
+    return factory
+
+
+def candle_for(trades, candle_start):
+    return Candle(
+        timestamp=candle_start, open=100.0, high=103.0, low=98.0, close=101.5,
+        volume=sum(t['amount'] for t in trades)
+    )
+
+
+def dict_path(trades):
+    """Bisheriger Pfad: Dedup, Validierung und Gruppierung über Dicts"""
+    seen, unique = set(), []
+    for trade in trades:
+        trade_id = native_trade_id(trade)
+        if trade_id is None or trade_id not in seen:
+            seen.add(trade_id)
+            unique.append(trade)
+
+    filtered = LiquidityValidator.filter_trades(unique)
+    wallets = defaultdict(list)
+    for trade in filtered['valid_swaps'] + filtered['liquidity_events']:
+        wallets[trade['wallet_address']].append(trade)
+    return unique, filtered, wallets
+
+
+def test_deduplicate_keeps_first_occurrence(make_dex_trades):
+    trades = make_dex_trades(2_000)
+    trades.append(dict(trades[0], signature=None))
+
+    unique, _, _ = dict_path(trades)
+    batch = TradeBatch.from_trades(trades, source='dex').deduplicate()
+
+    assert batch.rows == unique
+
+
+def test_filter_batch_matches_filter_trades(make_dex_trades):
+    trades = make_dex_trades(2_000)
+    unique, filtered, wallets = dict_path(trades)
+    batch = TradeBatch.from_trades(unique, source='dex')
+
+    result = LiquidityValidator.filter_batch(batch)
+
+    assert [unique[i] for i in result['invalid_trades']] == [t['trade'] for t in filtered['invalid_trades']]
+    assert [unique[i]['signature'] for i in result['valid_swaps']] == [t['signature'] for t in filtered['valid_swaps']]
+    assert [unique[i]['signature'] for i in result['liquidity_events']] == [t['signature'] for t in filtered['liquidity_events']]
+    assert len(result['invalid_trades']) and len(result['liquidity_events'])
+
+    codes, order, counts = batch.group_by_wallet(
+        list(result['valid_swaps']) + list(result['liquidity_events'])
+    )
+    assert [batch.wallets[c] for c in codes] == list(wallets)
+    assert counts.tolist() == [len(group) for group in wallets.values()]
+
+
+@pytest.mark.benchmark
+def test_benchmark_dex_candle_50k_trades(make_dex_trades, candle_start, timed):
+    analyzer = HybridPriceMoverAnalyzer()
+    trades = make_dex_trades(50_000, wallets=5_000)
+    candle = candle_for(trades, candle_start)
+    candle_data = {
+        'timestamp': candle.timestamp, 'open': candle.open, 'high': candle.high,
+        'low': candle.low, 'close': candle.close, 'volume': candle.volume,
+        'price_change_pct': candle.price_change_pct,
+    }
+
+    def score_dicts():
+        _, _, wallets = dict_path(trades)
+        return {
+            wallet: analyzer.impact_calculator.calculate_impact_score(
+                wallet_trades, candle_data, total_volume=candle.volume
+            )['impact_score']
+            for wallet, wallet_trades in wallets.items()
+        }
+
+    def score_batch():
+        batch = TradeBatch.from_trades(trades, source='dex').deduplicate()
+        return asyncio.run(analyzer._analyze_dex_trades(batch, candle, 'SOL/USDT', 'jupiter', len(expected)))
+
+    expected, dict_seconds = timed(score_dicts)
+    movers, batch_seconds = timed(score_batch)
+
+    print(
+        f"\n50k trades / {len(expected)} wallets per candle: "
+        f"dicts {dict_seconds:.2f}s, batch {batch_seconds:.3f}s "
+        f"({dict_seconds / batch_seconds:.1f}x)"
+    )
+    for mover in movers:
+        if mover['impact_components'].get('calculation_method') != 'fallback':
+            assert mover['impact_score'] == pytest.approx(expected[mover['wallet_address']], abs=1e-3)
+    assert batch_seconds < dict_seconds
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.price_movers.collectors.trade_tape import TradeTape, to_epoch
+
+
+WINDOW_START = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(minutes=5)
+
+
+def make_trades(count):
+    return [
+        {
+            'id': f"t{i}",
+            'timestamp': WINDOW_START + timedelta(seconds=i),
+            'trade_type': 'buy',
+            'amount': 1.0,
+            'price': 100.0,
+        }
+        for i in range(count)
+    ]
+
+
+def paged_source(trades, page_size, newest_first=False):
+    """Quelle wie ccxt (älteste zuerst) bzw. Helius (neueste zuerst), max. page_size Trades"""
+    calls = []
+
+    async def fetch(start, end):
+        calls.append((start, end))
+        in_range = [t for t in trades if start <= t['timestamp'] <= end]
+        if newest_first:
+            return in_range[::-1][:page_size]
+        return in_range[:page_size]
+
+    return fetch, calls
+
+
+def run_fetch(tape, fetch, **kwargs):
+    return asyncio.run(tape.fetch_through('binance', 'BTC/USDT', WINDOW_START, WINDOW_END, fetch, **kwargs))
+
+
+def test_truncated_pages_are_fetched_until_source_is_exhausted():
+    trades = make_trades(250)
+    for newest_first in (False, True):
+        tape = TradeTape(':memory:')
+        fetch, calls = paged_source(trades, 100, newest_first=newest_first)
+
+        result = run_fetch(tape, fetch, source_limit=100)
+
+        assert [t['id'] for t in result] == [t['id'] for t in trades]
+        assert tape.missing_intervals('binance', 'BTC/USDT', to_epoch(WINDOW_START), to_epoch(WINDOW_END)) == []
+
+        # Zweiter Aufruf kommt komplett aus dem Store
+        calls.clear()
+        assert len(run_fetch(tape, fetch, source_limit=100)) == 250
+        assert calls == []
+
+
+def test_unknown_page_size_only_covers_returned_span():
+    tape = TradeTape(':memory:')
+    trades = make_trades(50)
+
+    async def fetch(start, end):
+        # Liefert immer dieselben (neuesten) Trades, ignoriert das Zeitfenster
+        return trades[40:]
+
+    run_fetch(tape, fetch)
+
+    gaps = tape.missing_intervals('binance', 'BTC/USDT', to_epoch(WINDOW_START), to_epoch(WINDOW_END))
+    assert gaps[0] == (to_epoch(WINDOW_START), to_epoch(trades[40]['timestamp']))
+
+
+def test_synthetic_trades_are_returned_but_not_stored():
+    tape = TradeTape(':memory:')
+    synthetic = [dict(t, id=f"ohlcv_{i}", synthetic=True) for i, t in enumerate(make_trades(4))]
+
+    async def fetch(start, end):
+        return synthetic
+
+    result = run_fetch(tape, fetch, source_limit=1000)
+
+    assert len(result) == 4
+    assert tape.get_stats()['stored_trades'] == 0
+    assert tape.missing_intervals('binance', 'BTC/USDT', to_epoch(WINDOW_START), to_epoch(WINDOW_END))
@@ -30,6 +30,8 @@ from app.core.backend_crypto_tracker.api.routes import transaction_routes
 from app.core.backend_crypto_tracker.api.routes import scanner_routes
 from app.core.backend_crypto_tracker.api.routes.frontend_routes import router as frontend_router
 from app.core.backend_crypto_tracker.api.routes.wallet_routes import router as wallet_router
+from app.core.backend_crypto_tracker.blockchain.utils.http_session import close_shared_session
+from app.core.backend_crypto_tracker.scanner.token_analyzer import shutdown_stage_pool
 #price mover routers
 from app.core.price_movers.api.routes import router as price_movers_router
 from app.core.price_movers.api.analyze_routes import router as analyze_router
@@ -252,6 +254,12 @@ async def lifespan(app: FastAPI):
     monitor_task = asyncio.create_task(live_otc_monitor(shutdown_event))
     logger.info("Live OTC monitor task started")
 
+    # Beim letzten Stopp/Absturz unterbrochene Token-Scans am Checkpoint fortsetzen
+    try:
+        await scanner_routes.get_scanner_controller().start()
+    except Exception as e:
+        logger.error(f"Could not resume interrupted scans: {e}")
+
     yield
 
     logger.info("Shutting down Low-Cap Token Analyzer")
@@ -264,6 +272,10 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
 
+    # Stop the holder classification worker processes
+    await asyncio.to_thread(shutdown_stage_pool)
+    await close_shared_session()
+
     try:
         await asyncio.sleep(1)
         tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
@@ -2,6 +2,8 @@
 Fix Remaining Database Tables
 
 This script adds missing columns to tables that exist but are incomplete.
+Duplicate wallet analyses (same token and wallet) are moved to
+wallet_analyses_archive before the unique key is created - nothing is dropped.
 
 Usage:
     python3 scripts/fix_remaining_tables.py
@@ -65,6 +67,42 @@ def add_column_if_missing(cursor, schema, table, column, definition):
         return True
 
 
+def archive_duplicate_wallet_analyses(cursor, schema):
+    """Move all but the newest row per (token_address, chain, wallet_address) to wallet_analyses_archive"""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.wallet_analyses_archive
+        (LIKE {schema}.wallet_analyses INCLUDING DEFAULTS);
+    """)
+
+    # Columns added to wallet_analyses after the archive was created
+    cursor.execute("""
+        SELECT attname, format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum;
+    """, (f"{schema}.wallet_analyses",))
+    columns = cursor.fetchall()
+    for column, definition in columns + [('archived_at', 'TIMESTAMP DEFAULT NOW()')]:
+        if not column_exists(cursor, schema, 'wallet_analyses_archive', column):
+            cursor.execute(f'ALTER TABLE {schema}.wallet_analyses_archive ADD COLUMN "{column}" {definition};')
+
+    column_list = ", ".join(f'"{column}"' for column, _ in columns)
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {schema}.wallet_analyses a
+            USING {schema}.wallet_analyses b
+            WHERE a.token_address = b.token_address
+            AND a.chain = b.chain
+            AND a.wallet_address = b.wallet_address
+            AND a.id < b.id
+            RETURNING a.*
+        )
+        INSERT INTO {schema}.wallet_analyses_archive ({column_list})
+        SELECT {column_list} FROM moved;
+    """)
+    return cursor.rowcount
+
+
 def main():
     print("=" * 70)
     print("  🔧 Fixing Remaining Tables")
@@ -126,6 +164,7 @@ def main():
         add_column_if_missing(cursor, schema, 'scan_jobs', 'started_at', 'TIMESTAMP')
         add_column_if_missing(cursor, schema, 'scan_jobs', 'completed_at', 'TIMESTAMP')
         add_column_if_missing(cursor, schema, 'scan_jobs', 'error_message', 'TEXT')
+        add_column_if_missing(cursor, schema, 'scan_jobs', 'checkpoint', 'TEXT')
 
         # Fix scan_results table
         print("\n3️⃣  Fixing scan_results table...")
@@ -147,6 +186,34 @@ def main():
         add_column_if_missing(cursor, schema, 'scan_results', 'risk_flags', 'JSON')
         add_column_if_missing(cursor, schema, 'scan_results', 'scan_date', 'TIMESTAMP')
 
+        # Index for keyset pagination of the analysis history
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_scan_result_history
+            ON {schema}.scan_results(token_address, chain, created_at, id);
+        """)
+        print("   ✅ History index ready")
+
+        # Fix wallet_analyses table (bulk upserts need a unique key)
+        print("\n4️⃣  Fixing wallet_analyses table...")
+
+        cursor.execute("SELECT to_regclass(%s);", (f"{schema}.wallet_analyses",))
+        if cursor.fetchone()[0]:
+            # Keep the newest row per (token, wallet); older duplicates are moved
+            # to wallet_analyses_archive instead of being dropped
+            archived = archive_duplicate_wallet_analyses(cursor, schema)
+            if archived:
+                print(f"   ✅ Moved {archived} duplicate wallet analyses to {schema}.wallet_analyses_archive")
+            else:
+                print("   ✓ No duplicate wallet analyses")
+
+            cursor.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_wallet_analysis_token_wallet
+                ON {schema}.wallet_analyses(token_address, chain, wallet_address);
+            """)
+            print("   ✅ Unique index on (token_address, chain, wallet_address) ready")
+        else:
+            print("   ℹ️  Table wallet_analyses does not exist yet")
+
         # Commit all changes
         conn.commit()
         print("\n✅ All changes committed")
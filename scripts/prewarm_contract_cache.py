@@ -0,0 +1,58 @@
+"""
+Prewarm: Contract Analysis Cache
+================================
+
+Fills the persistent, content-addressed contract analysis cache for a list
+of contracts, so later security scans (also after restarts) are served from
+the cache. Clones/proxies with identical source are analysed only once.
+
+Input file: one contract per line, "<chain>,<address>" (lines starting with # are ignored)
+
+    python3 scripts/prewarm_contract_cache.py contracts.csv --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.backend_crypto_tracker.services.contract.security_scanner import SecurityScanner
+
+logger = logging.getLogger(__name__)
+
+
+def read_contracts(path: str):
+    contracts = []
+    with open(path) as contract_file:
+        for line in contract_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            chain, address = (part.strip() for part in line.split(",", 1))
+            contracts.append((address, chain.lower()))
+    return contracts
+
+
+async def prewarm(path: str, concurrency: int):
+    contracts = read_contracts(path)
+    logger.info(f"🔥 Prewarming contract analysis cache for {len(contracts)} contracts...")
+
+    async with SecurityScanner() as scanner:
+        stats = await scanner.prewarm_cache(contracts, concurrency=concurrency)
+        logger.info(f"✅ Done: {stats}")
+        logger.info(f"📊 Cache: {scanner.analysis_cache.get_stats()}")
+        await scanner.analysis_cache.close()
+
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Prewarm the contract analysis cache")
+    parser.add_argument("contracts", help="File with one '<chain>,<address>' per line")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    result = asyncio.run(prewarm(args.contracts, args.concurrency))
+    sys.exit(1 if result["failed"] else 0)
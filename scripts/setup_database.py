@@ -208,6 +208,116 @@ def create_transactions_table(engine) -> dict:
     return result
 
 
+def create_historical_prices_table(engine) -> dict:
+    """
+    Erstellt die historical_prices Tabelle (Tagespreis-Cache für USD-Enrichment).
+
+    Returns:
+        dict: Status-Information über die Migration
+    """
+    result = {
+        "success": False,
+        "table_existed": False,
+        "errors": []
+    }
+
+    try:
+        result["table_existed"] = table_exists(engine, "historical_prices")
+
+        if result["table_existed"]:
+            result["success"] = True
+            return result
+
+        logger.info("📦 Creating table 'historical_prices'...")
+
+        create_table_sql = """
+        CREATE TABLE IF NOT EXISTS historical_prices (
+            token_key VARCHAR(42) NOT NULL,
+            price_date DATE NOT NULL,
+            price_usd DOUBLE PRECISION NOT NULL,
+            token_symbol VARCHAR(20),
+            source VARCHAR(20),
+            fetched_at TIMESTAMP DEFAULT NOW(),
+            CONSTRAINT pk_historical_prices PRIMARY KEY (token_key, price_date)
+        );
+        """
+
+        with engine.connect() as conn:
+            conn.execute(text(create_table_sql))
+            conn.commit()
+
+        logger.info("✅ Table 'historical_prices' created")
+        result["success"] = True
+
+    except Exception as e:
+        logger.error(f"❌ historical_prices migration failed: {e}", exc_info=True)
+        result["errors"].append(str(e))
+
+    return result
+
+
+def create_wallet_hourly_activity_table(engine) -> dict:
+    """
+    Erstellt die wallet_hourly_activity Tabelle (Stunden-Rollups für Heatmap)
+    und befüllt sie einmalig aus den bestehenden Transaktionen.
+
+    Returns:
+        dict: Status-Information über die Migration
+    """
+    result = {
+        "success": False,
+        "table_existed": False,
+        "backfill": None,
+        "errors": []
+    }
+
+    try:
+        result["table_existed"] = table_exists(engine, "wallet_hourly_activity")
+
+        if result["table_existed"]:
+            result["success"] = True
+            return result
+
+        logger.info("📦 Creating table 'wallet_hourly_activity'...")
+
+        create_table_sql = """
+        CREATE TABLE IF NOT EXISTS wallet_hourly_activity (
+            address VARCHAR(42) NOT NULL,
+            activity_date DATE NOT NULL,
+            hour SMALLINT NOT NULL,
+            day_of_week SMALLINT NOT NULL,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            volume_usd DOUBLE PRECISION NOT NULL DEFAULT 0,
+            enriched_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT NOW(),
+            CONSTRAINT pk_wallet_hourly_activity PRIMARY KEY (address, activity_date, hour)
+        );
+        CREATE INDEX IF NOT EXISTS idx_wallet_hourly_activity_date ON wallet_hourly_activity(activity_date);
+        """
+
+        with engine.connect() as conn:
+            conn.execute(text(create_table_sql))
+            conn.commit()
+
+        logger.info("✅ Table 'wallet_hourly_activity' created")
+
+        if table_exists(engine, "transactions"):
+            from sqlalchemy.orm import Session
+            from app.core.otc_analysis.analysis import activity_rollup
+
+            logger.info("🔄 Backfilling activity rollups from transactions...")
+            with Session(engine) as session:
+                result["backfill"] = activity_rollup.rebuild(session)
+
+        result["success"] = True
+
+    except Exception as e:
+        logger.error(f"❌ wallet_hourly_activity migration failed: {e}", exc_info=True)
+        result["errors"].append(str(e))
+
+    return result
+
+
 def setup_database_on_startup():
     """
     Hauptfunktion für automatische Migration beim App-Start.
@@ -229,6 +339,12 @@ def setup_database_on_startup():
         # Create table if needed
         result = create_transactions_table(engine)
         
+        prices_result = create_historical_prices_table(engine)
+        result["errors"].extend(prices_result["errors"])
+        
+        rollup_result = create_wallet_hourly_activity_table(engine)
+        result["errors"].extend(rollup_result["errors"])
+        
         if result["success"]:
             logger.info("✅ Database setup complete")
         else: